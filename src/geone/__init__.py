@@ -3,19 +3,23 @@ from ._version import __version__
 
 # import all modules
 from . import blockdata
+from . import config
 from . import covModel
 from . import customcolors
 from . import deesseinterface
 from . import geosclassicinterface
 from . import grf
+from . import grfSpectral
 from . import img
 from . import imgplot
 from . import imgplot3d
 from . import img
 from . import markovChain
 from . import multiGaussian
+from . import parallel
 from . import pgs
 from . import randProcess
+from . import randomStream
 from . import srf
 from . import tools
 
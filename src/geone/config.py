@@ -0,0 +1,343 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# -------------------------------------------------------------------------
+# Python module:  'config.py'
+# author:         agent
+# date:           oct-2026
+# -------------------------------------------------------------------------
+
+"""
+Module for configuring the cpu resources used by geone.
+
+The parallel entry points of geone (functions with suffix `_mp`, functions
+running the C libraries deesse and geosclassic with OpenMP threads, linear
+algebra of numpy / scipy running on BLAS threads) share a budget of cpus
+(cores), by default all the cpus of the system. The budget is split between:
+
+- the number of processes (`nproc`), for the functions with suffix `_mp`
+- the number of OpenMP threads per process (`nthreads_per_proc`), for the \
+C libraries
+- the number of BLAS threads per process (`nthreads_blas`), for numpy / scipy
+
+so that their product does not exceed the budget (no oversubscription). The
+budget can be set globally with the function :func:`set_cpu_budget`, or
+within a `with` block with the context manager :func:`cpu_budget`.
+
+The number of BLAS threads is controlled with the package `threadpoolctl`
+if it is installed; otherwise, the environment variables of the BLAS
+libraries (e.g. `OPENBLAS_NUM_THREADS`) are set for the worker processes
+started by geone, which is effective only for the processes that do not
+inherit the already loaded libraries (start method 'spawn' or 'forkserver',
+see function :func:`parallel.set_start_method`).
+
+Example
+-------
+>>> from geone import config
+>>> with config.cpu_budget(16):
+>>>     sim = geone.grf.grf2D_mp(cov_model, dimension, nreal=100, nproc=4)
+>>>     print(config.last_allocation())
+{'ncpu': 16, 'nproc': 4, 'nthreads_per_proc': 4, 'nthreads_blas': 4, 'blas_control': 'threadpoolctl'}
+"""
+
+import contextlib
+import multiprocessing
+import os
+
+try:
+    import threadpoolctl
+except ImportError:
+    threadpoolctl = None
+
+# ============================================================================
+class ConfigError(Exception):
+    """
+    Custom exception related to `config` module.
+    """
+    pass
+# ============================================================================
+
+# Cpu budget (`None`: all the cpus of the system)
+_ncpu = None
+
+# Number of BLAS threads in the main process (`None`: not limited by geone)
+_nthreads_blas = None
+
+# Limiter of the BLAS threads in the current process (threadpoolctl)
+_blas_limiter = None
+
+# Allocation used by the last parallel entry point
+_last_allocation = None
+
+# Environment variables setting the number of threads of the BLAS libraries
+_blas_env_vars = (
+    'OPENBLAS_NUM_THREADS',
+    'MKL_NUM_THREADS',
+    'BLIS_NUM_THREADS',
+    'VECLIB_MAXIMUM_THREADS',
+    'NUMEXPR_NUM_THREADS',
+)
+
+# ----------------------------------------------------------------------------
+def cpu_count():
+    """
+    Returns the number of cpus of the budget.
+
+    This number is used instead of the total number of cpus of the system by
+    all the parallel entry points of geone.
+
+    Returns
+    -------
+    ncpu : int
+        number of cpus of the budget (see function :func:`set_cpu_budget`),
+        by default: total number of cpus of the system (retrieved by
+        `multiprocessing.cpu_count()`)
+    """
+    # fname = 'cpu_count'
+
+    if _ncpu is None:
+        return multiprocessing.cpu_count()
+
+    return _ncpu
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def blas_control():
+    """
+    Returns the mechanism used for controlling the number of BLAS threads.
+
+    Returns
+    -------
+    control : str
+        - 'threadpoolctl': the package `threadpoolctl` is used (effective in \
+        all the processes)
+        - 'environment': environment variables of the BLAS libraries are set \
+        for the worker processes (effective in processes started with the \
+        start method 'spawn' or 'forkserver' only)
+    """
+    # fname = 'blas_control'
+
+    if threadpoolctl is not None:
+        return 'threadpoolctl'
+
+    return 'environment'
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _limit_blas_threads(nthreads):
+    """
+    Limits the number of BLAS threads in the current process.
+
+    Parameters
+    ----------
+    nthreads : int or `None`
+        number of BLAS threads, `None` for removing the limit set previously
+    """
+    # fname = '_limit_blas_threads'
+
+    global _blas_limiter
+
+    if threadpoolctl is None:
+        return
+
+    if _blas_limiter is not None:
+        _blas_limiter.restore_original_limits()
+        _blas_limiter = None
+
+    if nthreads is not None:
+        _blas_limiter = threadpoolctl.threadpool_limits(limits=int(nthreads), user_api='blas')
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def set_cpu_budget(ncpu=None, nthreads_blas=None):
+    """
+    Sets the cpu budget of geone.
+
+    The budget applies to the parallel entry points called (and to the worker
+    processes started, see function :func:`parallel.start_pool`) afterwards.
+
+    Parameters
+    ----------
+    ncpu : int, optional
+        number of cpus (> 0); by default (`None`): all the cpus of the system
+        (budget removed)
+
+    nthreads_blas : int, optional
+        number of BLAS threads in the main process (> 0); by default (`None`):
+        `ncpu` if `ncpu` is given, not limited otherwise
+    """
+    fname = 'set_cpu_budget'
+
+    global _ncpu, _nthreads_blas
+
+    if ncpu is not None and int(ncpu) < 1:
+        err_msg = f'{fname}: `ncpu` invalid (should be a positive integer)'
+        raise ConfigError(err_msg)
+
+    if nthreads_blas is not None and int(nthreads_blas) < 1:
+        err_msg = f'{fname}: `nthreads_blas` invalid (should be a positive integer)'
+        raise ConfigError(err_msg)
+
+    _ncpu = None if ncpu is None else int(ncpu)
+    if nthreads_blas is None:
+        nthreads_blas = _ncpu
+    _nthreads_blas = None if nthreads_blas is None else int(nthreads_blas)
+
+    _limit_blas_threads(_nthreads_blas)
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def get_cpu_budget():
+    """
+    Returns the cpu budget of geone.
+
+    Returns
+    -------
+    budget : dict
+        with keys:
+
+        - 'ncpu': number of cpus (see function :func:`cpu_count`)
+        - 'nthreads_blas': number of BLAS threads in the main process \
+        (`None` if not limited)
+        - 'blas_control': mechanism used for controlling the number of \
+        BLAS threads (see function :func:`blas_control`)
+    """
+    # fname = 'get_cpu_budget'
+
+    return {'ncpu': cpu_count(), 'nthreads_blas': _nthreads_blas, 'blas_control': blas_control()}
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+@contextlib.contextmanager
+def cpu_budget(ncpu=None, nthreads_blas=None):
+    """
+    Context manager setting the cpu budget of geone within a `with` block.
+
+    The previous budget is restored at the end of the block.
+
+    Parameters
+    ----------
+    ncpu : int, optional
+        number of cpus, see function :func:`set_cpu_budget`
+    nthreads_blas : int, optional
+        number of BLAS threads in the main process, see function
+        :func:`set_cpu_budget`
+    """
+    # fname = 'cpu_budget'
+
+    ncpu_prev, nthreads_blas_prev = _ncpu, _nthreads_blas
+    set_cpu_budget(ncpu, nthreads_blas)
+    try:
+        yield
+    finally:
+        set_cpu_budget(ncpu_prev, nthreads_blas_prev)
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def allocation(nproc, nthreads_per_proc=None):
+    """
+    Splits the cpu budget between processes, OpenMP threads and BLAS threads.
+
+    Parameters
+    ----------
+    nproc : int
+        number of processes (> 0)
+    nthreads_per_proc : int, optional
+        number of OpenMP threads per process; by default (`None`): the maximal
+        integer (but at least 1) such that `nproc*nthreads_per_proc <= ncpu`,
+        where ncpu is the number of cpus of the budget (see function
+        :func:`cpu_count`)
+
+    Returns
+    -------
+    alloc : dict
+        with keys:
+
+        - 'ncpu': number of cpus of the budget
+        - 'nproc': number of processes
+        - 'nthreads_per_proc': number of OpenMP threads per process
+        - 'nthreads_blas': number of BLAS threads per process (equal to \
+        `nthreads_per_proc`, the C libraries and the BLAS do not run \
+        simultaneously in a process)
+        - 'blas_control': mechanism used for controlling the number of \
+        BLAS threads (see function :func:`blas_control`)
+    """
+    # fname = 'allocation'
+
+    ncpu = cpu_count()
+    nproc = max(int(nproc), 1)
+    if nthreads_per_proc is None:
+        nthreads_per_proc = max(ncpu // nproc, 1)
+    nthreads_per_proc = max(int(nthreads_per_proc), 1)
+
+    return {'ncpu': ncpu,
+            'nproc': nproc,
+            'nthreads_per_proc': nthreads_per_proc,
+            'nthreads_blas': nthreads_per_proc,
+            'blas_control': blas_control()}
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _record_allocation(alloc):
+    """
+    Records the allocation used by a parallel entry point.
+
+    Parameters
+    ----------
+    alloc : dict
+        allocation (see function :func:`allocation`)
+    """
+    # fname = '_record_allocation'
+
+    global _last_allocation
+
+    _last_allocation = dict(alloc)
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def last_allocation():
+    """
+    Returns the allocation used by the last parallel entry point.
+
+    Returns
+    -------
+    alloc : dict or `None`
+        effective allocation (see function :func:`allocation`) used by the last
+        function with suffix `_mp` called, `None` if none has been called
+    """
+    # fname = 'last_allocation'
+
+    if _last_allocation is None:
+        return None
+
+    return dict(_last_allocation)
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+@contextlib.contextmanager
+def _blas_env(nthreads):
+    """
+    Context manager setting the environment variables of the BLAS libraries.
+
+    The environment is inherited by the processes started within the `with`
+    block; the previous values are restored at the end of the block.
+
+    Parameters
+    ----------
+    nthreads : int
+        number of BLAS threads
+    """
+    # fname = '_blas_env'
+
+    env_prev = {key: os.environ.get(key) for key in _blas_env_vars}
+    for key in _blas_env_vars:
+        os.environ[key] = str(int(nthreads))
+    try:
+        yield
+    finally:
+        for key, val in env_prev.items():
+            if val is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = val
+# ----------------------------------------------------------------------------
@@ -24,11 +24,12 @@ import scipy.optimize
 from scipy import stats
 import pyvista as pv
 import copy
-import multiprocessing
 
 from geone import img
 from geone import imgplot as imgplt
 from geone import imgplot3d as imgplt3
+from geone import parallel
+from geone import randomStream
 
 # ============================================================================
 class CovModelError(Exception):
@@ -11078,6 +11079,7 @@ def sgs(x, v, xu, cov_model,
         nneighborMax=12,
         nreal=1,
         seed=None,
+        rng=None,
         verbose=0):
     """
     Performs Sequential Gaussian Simulation (SGS) at given location(s).
@@ -11199,7 +11201,15 @@ def sgs(x, v, xu, cov_model,
         number of realization(s)
 
     seed : int, optional
-        seed for initializing random number generator
+        seed for initializing random number generator (global random state of
+        `numpy.random`, reset to `seed+k` for the k-th realization);
+        used only if `rng=None`
+
+    rng : int, or :class:`numpy.random.SeedSequence`, or :class:`numpy.random.Generator`, or sequence, optional
+        random number generator specification (see module :mod:`randomStream`);
+        by default (`None`): the global random state of `numpy.random` is used
+        (see `seed`); otherwise, each realization is generated with its own
+        independent stream spawned from `rng` (and `seed` is ignored)
 
     verbose : int, default: 0
         verbose mode, higher implies more printing (info)
@@ -11465,17 +11475,26 @@ def sgs(x, v, xu, cov_model,
     mat = np.ones((nneighborMax+1, nneighborMax+1)) # allocate kriging matrix
     b = np.ones(nneighborMax+1) # allocate second member
 
-    if seed is None:
-        seed = np.random.randint(1, 1000000)
-    seed = int(seed)
+    # Random number generator (stream) for each realization
+    try:
+        rngs = randomStream.rng_streams(rng, nreal)
+    except Exception as exc:
+        err_msg = f'{fname}: `rng` invalid'
+        raise CovModelError(err_msg) from exc
+
+    if rng is None:
+        if seed is None:
+            seed = np.random.randint(1, 1000000)
+        seed = int(seed)
 
     if verbose > 0:
         progress_old = 0
     for k in range(nreal):
         # Initialize random number generator
-        np.random.seed(seed+k)
+        if rng is None:
+            np.random.seed(seed+k)
         # set path
-        ind_u = np.random.permutation(nu_new)
+        ind_u = rngs[k].permutation(nu_new)
         x_all[n:, :] = xu_new[ind_u]
         if mean_x is not None:
             mean_all[n:] = mean_xu_new[ind_u]
@@ -11552,7 +11571,7 @@ def sgs(x, v, xu, cov_model,
                 mu = vneigh.dot(w[:nn])
 
             # Draw value in N(mu, std^2)
-            v_all[n+j] = np.random.normal(loc=mu, scale=std)
+            v_all[n+j] = rngs[k].normal(loc=mu, scale=std)
 
         # Store k-th realization
         for j in range(nu_new):
@@ -11579,6 +11598,7 @@ def sgs_mp(
         nneighborMax=12,
         nreal=1,
         seed=None,
+        rng=None,
         verbose=0,
         nproc=-1):
     """
@@ -11592,7 +11612,7 @@ def sgs_mp(
 
     - if `nproc > 0`: n = `nproc`,
     - if `nproc <= 0`: n = max(nmax+`nproc`, 1), where nmax is the total \
-    number of cpu(s) of the system (retrieved by `multiprocessing.cpu_count()`), \
+    number of cpu(s) of the system (retrieved by :func:`config.cpu_count`), \
     i.e. all cpus except `-nproc` is used (but at least one)
 
     Then, n parallel processes are launched [parallel calls of the
@@ -11601,18 +11621,16 @@ def sgs_mp(
 
     Note that, if `nreal` < n, then n is reduced to `nreal`.
 
-    Specifying a `seed` guarantees reproducible results whatever the number
-    of processes used.
+    Specifying a `seed` (or a `rng`) guarantees reproducible results whatever
+    the number of processes used; with `rng`, the results are the same as those
+    of the function :func:`covModel.sgs` with the same `rng`.
 
     See function :func:`covModel.sgs` for details.
     """
     fname = 'sgs_mp'
 
     # Set number of processes (n)
-    if nproc > 0:
-        n = nproc
-    else:
-        n = min(multiprocessing.cpu_count()+nproc, 1)
+    n = parallel.get_nproc(nproc)
 
     if nreal < n:
         n = nreal
@@ -11624,13 +11642,21 @@ def sgs_mp(
     if verbose > 0:
         print(f'{fname}: running sgs on {n} processes...')
 
-    # Set seed (base)
-    if seed is None:
-        seed = np.random.randint(1, 1000000)
-    seed = int(seed)
+    if rng is None:
+        # Set seed (base)
+        if seed is None:
+            seed = np.random.randint(1, 1000000)
+        seed = int(seed)
+    else:
+        # Set one stream per realization
+        try:
+            rng_ss = randomStream.spawn_seed_sequences(rng, nreal)
+        except Exception as exc:
+            err_msg = f'{fname}: `rng` invalid'
+            raise CovModelError(err_msg) from exc
 
     # Set pool of n workers
-    pool = multiprocessing.Pool(n)
+    pool = parallel.get_pool(n)
     out_pool = []
     for i in range(n):
         # Set i-th process
@@ -11639,13 +11665,16 @@ def sgs_mp(
                     mean_x=mean_x, mean_xu=mean_xu, var_x=var_x, var_xu=var_xu,
                     alpha_xu=alpha_xu, beta_xu=beta_xu, gamma_xu=gamma_xu,
                     dmax=dmax, nneighborMax=nneighborMax,
-                    nreal=ids_proc[i+1]-ids_proc[i], seed=seed+ids_proc[i],
+                    nreal=ids_proc[i+1]-ids_proc[i],
                     verbose=verbose*(i>0))
+        if rng is None:
+            kwargs['seed'] = seed+ids_proc[i]
+        else:
+            kwargs['rng'] = rng_ss[ids_proc[i]:ids_proc[i+1]]
         out_pool.append(pool.apply_async(sgs, args=(x, v, xu, cov_model), kwds=kwargs))
 
-    # Properly end working process
-    pool.close() # Prevents any more tasks from being submitted to the pool,
-    pool.join()  # then, wait for the worker processes to exit.
+    # Wait for the tasks and release the pool
+    parallel.release_pool(pool, out_pool)
 
     # Get result from each process
     out = [w.get() for w in out_pool]
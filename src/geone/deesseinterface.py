@@ -13,9 +13,10 @@ Module for interfacing deesse (in C) for python.
 
 import numpy as np
 import sys, os, copy
-import multiprocessing
 
+from geone import config
 from geone import img
+from geone import parallel
 from geone.deesse_core import deesse
 from geone.img import Img, PointSet
 from geone.blockdata import BlockData
@@ -5349,7 +5350,7 @@ def deesseRun(
 
     nthreads : int, default: -1
         number of thread(s) to use for C program;
-        `nthreads = -n <= 0`: maximal number of threads of the system except n
+        `nthreads = -n <= 0`: maximal number of threads (see function :func:`config.cpu_count`) except n
         (but at least 1)
 
     verbose : int, default: 2
@@ -5484,11 +5485,11 @@ def deesseRun(
 
     # Set number of threads
     if nthreads <= 0:
-        nth = max(os.cpu_count() + nthreads, 1)
+        nth = max(config.cpu_count() + nthreads, 1)
     else:
         nth = nthreads
 
-    if verbose > 0 and nth > os.cpu_count():
+    if verbose > 0 and nth > config.cpu_count():
         print(f'{fname}: WARNING: number of threads used will exceed number of cpu(s) of the system...')
 
     if deesse_input.mask is not None and add_data_point_to_mask and deesse_input.dataPointSet is not None:
@@ -5620,14 +5621,14 @@ def deesseRun_mp(
         number of processes; by default (`None`):
         `nproc` is set to `min(nmax-1, nreal)` (but at least 1), where nmax is
         the total number of cpu(s) of the system (retrieved by
-        `multiprocessing.cpu_count()`)
+        :func:`config.cpu_count`)
 
     nthreads_per_proc : int, optional
         number of thread(s) per process (should be > 0); by default (`None`):
         `nthreads_per_proc` is automatically computed as the maximal integer
         (but at least 1) such that `nproc*nthreads_per_proc <= nmax-1`, where
         nmax is the total number of cpu(s) of the system (retrieved by
-        `multiprocessing.cpu_count()`)
+        :func:`config.cpu_count`)
     """
     fname = 'deesseRun_mp'
 
@@ -5646,7 +5647,7 @@ def deesseRun_mp(
 
     # Set number of processes: nproc
     if nproc is None:
-        nproc = max(min(multiprocessing.cpu_count()-1, deesse_input.nrealization), 1)
+        nproc = max(min(config.cpu_count()-1, deesse_input.nrealization), 1)
     else:
         nproc_tmp = nproc
         nproc = max(min(int(nproc), deesse_input.nrealization), 1)
@@ -5655,13 +5656,13 @@ def deesseRun_mp(
 
     # Set number of threads per process: nth
     if nthreads_per_proc is None:
-        nth = max(int(np.floor((multiprocessing.cpu_count()-1) / nproc)), 1)
+        nth = max(int(np.floor((config.cpu_count()-1) / nproc)), 1)
     else:
         nth = max(int(nthreads_per_proc), 1)
         if verbose > 1 and nth != nthreads_per_proc:
             print(f'{fname}: number of threads per process has been changed (now: nthreads_per_proc={nth})')
 
-    if verbose > 0 and nproc * nth > multiprocessing.cpu_count():
+    if verbose > 0 and nproc * nth > config.cpu_count():
         print(f'{fname}: WARNING: total number of cpu(s) used will exceed number of cpu(s) of the system...')
 
     if deesse_input.mask is not None and add_data_point_to_mask and deesse_input.dataPointSet is not None:
@@ -5696,7 +5697,7 @@ def deesseRun_mp(
     init_seed = deesse_input.seed
 
     # Set pool of nproc workers
-    pool = multiprocessing.Pool(nproc)
+    pool = parallel.get_pool(nproc, nthreads_per_proc=nth)
     out_pool = []
     for i, input in enumerate(deesse_input_proc):
         # Adapt deesse input for i-th process
@@ -5711,9 +5712,8 @@ def deesseRun_mp(
         # Launch deesse (i-th process)
         out_pool.append(pool.apply_async(deesseRun, args=(input, False, nth, verb)))
 
-    # Properly end working process
-    pool.close() # Prevents any more tasks from being submitted to the pool,
-    pool.join()  # then, wait for the worker processes to exit.
+    # Wait for the tasks and release the pool
+    parallel.release_pool(pool, out_pool)
 
     # Get result from each process
     deesse_output_proc = [p.get() for p in out_pool]
@@ -6090,7 +6090,7 @@ def imgPyramidImage(
 
     nthreads : int, default: -1
         number of thread(s) to use for C program;
-        `nthreads = -n <= 0`: maximal number of threads of the system except n
+        `nthreads = -n <= 0`: maximal number of threads (see function :func:`config.cpu_count`) except n
         (but at least 1)
 
     verbose : int, default: 0
@@ -6169,11 +6169,11 @@ def imgPyramidImage(
 
     # Set number of threads
     if nthreads <= 0:
-        nth = max(os.cpu_count() + nthreads, 1)
+        nth = max(config.cpu_count() + nthreads, 1)
     else:
         nth = nthreads
 
-    if verbose > 0 and nth > os.cpu_count():
+    if verbose > 0 and nth > config.cpu_count():
         print(f'{fname}: WARNING: number of threads used will exceed number of cpu(s) of the system...')
 
     # Compute pyramid (launch C code)
@@ -6265,7 +6265,7 @@ def imgCategoricalToContinuous(
 
     nthreads : int, default: -1
         number of thread(s) to use for C program;
-        `nthreads = -n <= 0`: maximal number of threads of the system except n
+        `nthreads = -n <= 0`: maximal number of threads (see function :func:`config.cpu_count`) except n
         (but at least 1)
 
     verbose : int, default: 0
@@ -6318,11 +6318,11 @@ def imgCategoricalToContinuous(
 
     # Set number of threads
     if nthreads <= 0:
-        nth = max(os.cpu_count() + nthreads, 1)
+        nth = max(config.cpu_count() + nthreads, 1)
     else:
         nth = nthreads
 
-    if verbose > 0 and nth > os.cpu_count():
+    if verbose > 0 and nth > config.cpu_count():
         print(f'{fname}: WARNING: number of threads used will exceed number of cpu(s) of the system...')
 
     for ind in varInd:
@@ -9983,7 +9983,7 @@ def deesseXRun(
 
     nthreads : int, default: -1
         number of thread(s) to use for C program;
-        `nthreads = -n <= 0`: maximal number of threads of the system except n
+        `nthreads = -n <= 0`: maximal number of threads (see function :func:`config.cpu_count`) except n
         (but at least 1)
 
     verbose : int, default: 2
@@ -10070,11 +10070,11 @@ def deesseXRun(
 
     # Set number of threads
     if nthreads <= 0:
-        nth = max(os.cpu_count() + nthreads, 1)
+        nth = max(config.cpu_count() + nthreads, 1)
     else:
         nth = nthreads
 
-    if verbose > 0 and nth > os.cpu_count():
+    if verbose > 0 and nth > config.cpu_count():
         print(f'{fname}: WARNING: number of threads used will exceed number of cpu(s) of the system...')
 
     if verbose > 1:
@@ -10187,14 +10187,14 @@ def deesseXRun_mp(
         number of processes; by default (`None`):
         `nproc` is set to `min(nmax-1, nreal)` (but at least 1), where nmax is
         the total number of cpu(s) of the system (retrieved by
-        `multiprocessing.cpu_count()`)
+        :func:`config.cpu_count`)
 
     nthreads_per_proc : int, optional
         number of thread(s) per process (should be > 0); by default (`None`):
         `nthreads_per_proc` is automatically computed as the maximal integer
         (but at least 1) such that `nproc*nthreads_per_proc <= nmax-1`, where
         nmax is the total number of cpu(s) of the system (retrieved by
-        `multiprocessing.cpu_count()`)
+        :func:`config.cpu_count`)
     """
     fname = 'deesseXRun_mp'
 
@@ -10213,7 +10213,7 @@ def deesseXRun_mp(
 
     # Set number of processes: nproc
     if nproc is None:
-        nproc = max(min(multiprocessing.cpu_count()-1, deesseX_input.nrealization), 1)
+        nproc = max(min(config.cpu_count()-1, deesseX_input.nrealization), 1)
     else:
         nproc_tmp = nproc
         nproc = max(min(int(nproc), deesseX_input.nrealization), 1)
@@ -10222,13 +10222,13 @@ def deesseXRun_mp(
 
     # Set number of threads per process: nth
     if nthreads_per_proc is None:
-        nth = max(int(np.floor((multiprocessing.cpu_count()-1) / nproc)), 1)
+        nth = max(int(np.floor((config.cpu_count()-1) / nproc)), 1)
     else:
         nth = max(int(nthreads_per_proc), 1)
         if verbose > 1 and nth != nthreads_per_proc:
             print(f'{fname}: number of threads per process has been changed (now: nthreads_per_proc={nth})')
 
-    if verbose > 0 and nproc * nth > multiprocessing.cpu_count():
+    if verbose > 0 and nproc * nth > config.cpu_count():
         print(f'{fname}: WARNING: total number of cpu(s) used will exceed number of cpu(s) of the system...')
 
     # Set the distribution of the realizations over the processes
@@ -10250,7 +10250,7 @@ def deesseXRun_mp(
     init_seed = deesseX_input.seed
 
     # Set pool of nproc workers
-    pool = multiprocessing.Pool(nproc)
+    pool = parallel.get_pool(nproc, nthreads_per_proc=nth)
     out_pool = []
     for i, input in enumerate(deesseX_input_proc):
         # Adapt deesseX input for i-th process
@@ -10265,9 +10265,8 @@ def deesseXRun_mp(
         # Launch deesseX (i-th process)
         out_pool.append(pool.apply_async(deesseXRun, args=(input, nth, verb)))
 
-    # Properly end working process
-    pool.close() # Prevents any more tasks from being submitted to the pool,
-    pool.join()  # then, wait for the worker processes to exit.
+    # Wait for the tasks and release the pool
+    parallel.release_pool(pool, out_pool)
 
     # Get result from each process
     deesseX_output_proc = [p.get() for p in out_pool]
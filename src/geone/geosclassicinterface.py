@@ -13,11 +13,12 @@ Module for interfacing classical geostatistics programs (in C) for python
 """
 
 import numpy as np
-import sys, os
+import sys
 import copy
-import multiprocessing
 
+from geone import config
 from geone import img
+from geone import parallel
 from geone.geosclassic_core import geosclassic
 from geone import covModel as gcm
 from geone.img import Img, PointSet
@@ -1997,7 +1998,7 @@ def simulate1D(
 
     nthreads : int, default: -1
         number of thread(s) to use for "GeosClassicSim" C program;
-        `nthreads = -n <= 0`: maximal number of threads of the system except n
+        `nthreads = -n <= 0`: maximal number of threads (see function :func:`config.cpu_count`) except n
         (but at least 1)
 
     verbose : int, default: 2
@@ -2518,11 +2519,11 @@ def simulate1D(
 
     # --- Set number of threads
     if nthreads <= 0:
-        nth = max(os.cpu_count() + nthreads, 1)
+        nth = max(config.cpu_count() + nthreads, 1)
     else:
         nth = nthreads
 
-    if verbose > 0 and nth > os.cpu_count():
+    if verbose > 0 and nth > config.cpu_count():
         print(f'{fname}: WARNING: number of threads used will exceed number of cpu(s) of the system...')
 
     if not aggregate_data_by_simul:
@@ -2807,14 +2808,14 @@ def simulate1D_mp(
         number of processes; by default (`None`):
         `nproc` is set to `min(nmax-1, nreal)` (but at least 1), where nmax is
         the total number of cpu(s) of the system (retrieved by
-        `multiprocessing.cpu_count()`)
+        :func:`config.cpu_count`)
 
     nthreads_per_proc : int, optional
         number of thread(s) per process (should be > 0); by default (`None`):
         `nthreads_per_proc` is automatically computed as the maximal integer
         (but at least 1) such that `nproc*nthreads_per_proc <= nmax-1`, where
         nmax is the total number of cpu(s) of the system (retrieved by
-        `multiprocessing.cpu_count()`)
+        :func:`config.cpu_count`)
 
     treat_image_one_by_one : bool, default: False
         keyword argument passed to the function :func:`img.gatherImages`:
@@ -2830,7 +2831,7 @@ def simulate1D_mp(
 
     # Set number of processes: nproc
     if nproc is None:
-        nproc = max(min(multiprocessing.cpu_count()-1, nreal), 1)
+        nproc = max(min(config.cpu_count()-1, nreal), 1)
     else:
         nproc_tmp = nproc
         nproc = max(min(int(nproc), nreal), 1)
@@ -2839,13 +2840,13 @@ def simulate1D_mp(
 
     # Set number of threads per process: nth
     if nthreads_per_proc is None:
-        nth = max(int(np.floor((multiprocessing.cpu_count()-1) / nproc)), 1)
+        nth = max(int(np.floor((config.cpu_count()-1) / nproc)), 1)
     else:
         nth = max(int(nthreads_per_proc), 1)
         if verbose > 1 and nth != nthreads_per_proc:
             print(f'{fname}: number of threads per process has been changed (now: nthreads_per_proc={nth})')
 
-    if verbose > 0 and nproc * nth > multiprocessing.cpu_count():
+    if verbose > 0 and nproc * nth > config.cpu_count():
         print(f'{fname}: WARNING: total number of cpu(s) used will exceed number of cpu(s) of the system...')
 
     # Set the distribution of the realizations over the processes
@@ -2870,7 +2871,7 @@ def simulate1D_mp(
     outputReportFile_p = None
 
     # Set pool of nproc workers
-    pool = multiprocessing.Pool(nproc)
+    pool = parallel.get_pool(nproc, nthreads_per_proc=nth)
     out_pool = []
     for i in range(nproc):
         # Adapt input for i-th process
@@ -2914,9 +2915,8 @@ def simulate1D_mp(
                 )
             )
 
-    # Properly end working process
-    pool.close() # Prevents any more tasks from being submitted to the pool,
-    pool.join()  # then, wait for the worker processes to exit.
+    # Wait for the tasks and release the pool
+    parallel.release_pool(pool, out_pool)
 
     # Get result from each process
     geosclassic_output_proc = [p.get() for p in out_pool]
@@ -3206,7 +3206,7 @@ def simulate2D(
 
     nthreads : int, default: -1
         number of thread(s) to use for "GeosClassicSim" C program;
-        `nthreads = -n <= 0`: maximal number of threads of the system except n
+        `nthreads = -n <= 0`: maximal number of threads (see function :func:`config.cpu_count`) except n
         (but at least 1)
 
     verbose : int, default: 2
@@ -3738,11 +3738,11 @@ def simulate2D(
 
     # --- Set number of threads
     if nthreads <= 0:
-        nth = max(os.cpu_count() + nthreads, 1)
+        nth = max(config.cpu_count() + nthreads, 1)
     else:
         nth = nthreads
 
-    if verbose > 0 and nth > os.cpu_count():
+    if verbose > 0 and nth > config.cpu_count():
         print(f'{fname}: WARNING: number of threads used will exceed number of cpu(s) of the system...')
 
     if not aggregate_data_by_simul:
@@ -4027,14 +4027,14 @@ def simulate2D_mp(
         number of processes; by default (`None`):
         `nproc` is set to `min(nmax-1, nreal)` (but at least 1), where nmax is
         the total number of cpu(s) of the system (retrieved by
-        `multiprocessing.cpu_count()`)
+        :func:`config.cpu_count`)
 
     nthreads_per_proc : int, optional
         number of thread(s) per process (should be > 0); by default (`None`):
         `nthreads_per_proc` is automatically computed as the maximal integer
         (but at least 1) such that `nproc*nthreads_per_proc <= nmax-1`, where
         nmax is the total number of cpu(s) of the system (retrieved by
-        `multiprocessing.cpu_count()`)
+        :func:`config.cpu_count`)
 
     treat_image_one_by_one : bool, default: False
         keyword argument passed to the function :func:`img.gatherImages`:
@@ -4050,7 +4050,7 @@ def simulate2D_mp(
 
     # Set number of processes: nproc
     if nproc is None:
-        nproc = max(min(multiprocessing.cpu_count()-1, nreal), 1)
+        nproc = max(min(config.cpu_count()-1, nreal), 1)
     else:
         nproc_tmp = nproc
         nproc = max(min(int(nproc), nreal), 1)
@@ -4059,13 +4059,13 @@ def simulate2D_mp(
 
     # Set number of threads per process: nth
     if nthreads_per_proc is None:
-        nth = max(int(np.floor((multiprocessing.cpu_count()-1) / nproc)), 1)
+        nth = max(int(np.floor((config.cpu_count()-1) / nproc)), 1)
     else:
         nth = max(int(nthreads_per_proc), 1)
         if verbose > 1 and nth != nthreads_per_proc:
             print(f'{fname}: number of threads per process has been changed (now: nthreads_per_proc={nth})')
 
-    if verbose > 0 and nproc * nth > multiprocessing.cpu_count():
+    if verbose > 0 and nproc * nth > config.cpu_count():
         print(f'{fname}: WARNING: total number of cpu(s) used will exceed number of cpu(s) of the system...')
 
     # Set the distribution of the realizations over the processes
@@ -4090,7 +4090,7 @@ def simulate2D_mp(
     outputReportFile_p = None
 
     # Set pool of nproc workers
-    pool = multiprocessing.Pool(nproc)
+    pool = parallel.get_pool(nproc, nthreads_per_proc=nth)
     out_pool = []
     for i in range(nproc):
         # Adapt input for i-th process
@@ -4134,9 +4134,8 @@ def simulate2D_mp(
                 )
             )
 
-    # Properly end working process
-    pool.close() # Prevents any more tasks from being submitted to the pool,
-    pool.join()  # then, wait for the worker processes to exit.
+    # Wait for the tasks and release the pool
+    parallel.release_pool(pool, out_pool)
 
     # Get result from each process
     geosclassic_output_proc = [p.get() for p in out_pool]
@@ -4427,7 +4426,7 @@ def simulate3D(
 
     nthreads : int, default: -1
         number of thread(s) to use for "GeosClassicSim" C program;
-        `nthreads = -n <= 0`: maximal number of threads of the system except n
+        `nthreads = -n <= 0`: maximal number of threads (see function :func:`config.cpu_count`) except n
         (but at least 1)
 
     verbose : int, default: 2
@@ -4979,11 +4978,11 @@ def simulate3D(
 
     # --- Set number of threads
     if nthreads <= 0:
-        nth = max(os.cpu_count() + nthreads, 1)
+        nth = max(config.cpu_count() + nthreads, 1)
     else:
         nth = nthreads
 
-    if verbose > 0 and nth > os.cpu_count():
+    if verbose > 0 and nth > config.cpu_count():
         print(f'{fname}: WARNING: number of threads used will exceed number of cpu(s) of the system...')
 
     if not aggregate_data_by_simul:
@@ -5268,14 +5267,14 @@ def simulate3D_mp(
         number of processes; by default (`None`):
         `nproc` is set to `min(nmax-1, nreal)` (but at least 1), where nmax is
         the total number of cpu(s) of the system (retrieved by
-        `multiprocessing.cpu_count()`)
+        :func:`config.cpu_count`)
 
     nthreads_per_proc : int, optional
         number of thread(s) per process (should be > 0); by default (`None`):
         `nthreads_per_proc` is automatically computed as the maximal integer
         (but at least 1) such that `nproc*nthreads_per_proc <= nmax-1`, where
         nmax is the total number of cpu(s) of the system (retrieved by
-        `multiprocessing.cpu_count()`)
+        :func:`config.cpu_count`)
 
     treat_image_one_by_one : bool, default: False
         keyword argument passed to the function :func:`img.gatherImages`:
@@ -5291,7 +5290,7 @@ def simulate3D_mp(
 
     # Set number of processes: nproc
     if nproc is None:
-        nproc = max(min(multiprocessing.cpu_count()-1, nreal), 1)
+        nproc = max(min(config.cpu_count()-1, nreal), 1)
     else:
         nproc_tmp = nproc
         nproc = max(min(int(nproc), nreal), 1)
@@ -5300,13 +5299,13 @@ def simulate3D_mp(
 
     # Set number of threads per process: nth
     if nthreads_per_proc is None:
-        nth = max(int(np.floor((multiprocessing.cpu_count()-1) / nproc)), 1)
+        nth = max(int(np.floor((config.cpu_count()-1) / nproc)), 1)
     else:
         nth = max(int(nthreads_per_proc), 1)
         if verbose > 1 and nth != nthreads_per_proc:
             print(f'{fname}: number of threads per process has been changed (now: nthreads_per_proc={nth})')
 
-    if verbose > 0 and nproc * nth > multiprocessing.cpu_count():
+    if verbose > 0 and nproc * nth > config.cpu_count():
         print(f'{fname}: WARNING: total number of cpu(s) used will exceed number of cpu(s) of the system...')
 
     # Set the distribution of the realizations over the processes
@@ -5331,7 +5330,7 @@ def simulate3D_mp(
     outputReportFile_p = None
 
     # Set pool of nproc workers
-    pool = multiprocessing.Pool(nproc)
+    pool = parallel.get_pool(nproc, nthreads_per_proc=nth)
     out_pool = []
     for i in range(nproc):
         # Adapt input for i-th process
@@ -5375,9 +5374,8 @@ def simulate3D_mp(
                 )
             )
 
-    # Properly end working process
-    pool.close() # Prevents any more tasks from being submitted to the pool,
-    pool.join()  # then, wait for the worker processes to exit.
+    # Wait for the tasks and release the pool
+    parallel.release_pool(pool, out_pool)
 
     # Get result from each process
     geosclassic_output_proc = [p.get() for p in out_pool]
@@ -5581,7 +5579,7 @@ def estimate1D(
 
     nthreads : int, default: -1
         number of thread(s) to use for "GeosClassicSim" C program;
-        `nthreads = -n <= 0`: maximal number of threads of the system except n
+        `nthreads = -n <= 0`: maximal number of threads (see function :func:`config.cpu_count`) except n
         (but at least 1)
 
     verbose : int, default: 2
@@ -5942,11 +5940,11 @@ def estimate1D(
 
     # --- Set number of threads
     if nthreads <= 0:
-        nth = max(os.cpu_count() + nthreads, 1)
+        nth = max(config.cpu_count() + nthreads, 1)
     else:
         nth = nthreads
 
-    if verbose > 0 and nth > os.cpu_count():
+    if verbose > 0 and nth > config.cpu_count():
         print(f'{fname}: WARNING: number of threads used will exceed number of cpu(s) of the system...')
 
     if verbose > 1:
@@ -6166,7 +6164,7 @@ def estimate2D(
 
     nthreads : int, default: -1
         number of thread(s) to use for "GeosClassicSim" C program;
-        `nthreads = -n <= 0`: maximal number of threads of the system except n
+        `nthreads = -n <= 0`: maximal number of threads (see function :func:`config.cpu_count`) except n
         (but at least 1)
 
     verbose : int, default: 2
@@ -6549,11 +6547,11 @@ def estimate2D(
 
     # --- Set number of threads
     if nthreads <= 0:
-        nth = max(os.cpu_count() + nthreads, 1)
+        nth = max(config.cpu_count() + nthreads, 1)
     else:
         nth = nthreads
 
-    if verbose > 0 and nth > os.cpu_count():
+    if verbose > 0 and nth > config.cpu_count():
         print(f'{fname}: WARNING: number of threads used will exceed number of cpu(s) of the system...')
 
     if verbose > 1:
@@ -6774,7 +6772,7 @@ def estimate3D(
 
     nthreads : int, default: -1
         number of thread(s) to use for "GeosClassicSim" C program;
-        `nthreads = -n <= 0`: maximal number of threads of the system except n
+        `nthreads = -n <= 0`: maximal number of threads (see function :func:`config.cpu_count`) except n
         (but at least 1)
 
     verbose : int, default: 2
@@ -7180,11 +7178,11 @@ def estimate3D(
 
     # --- Set number of threads
     if nthreads <= 0:
-        nth = max(os.cpu_count() + nthreads, 1)
+        nth = max(config.cpu_count() + nthreads, 1)
     else:
         nth = nthreads
 
-    if verbose > 0 and nth > os.cpu_count():
+    if verbose > 0 and nth > config.cpu_count():
         print(f'{fname}: WARNING: number of threads used will exceed number of cpu(s) of the system...')
 
     if verbose > 1:
@@ -7720,7 +7718,7 @@ def simulateIndicator1D(
 
     nthreads : int, default: -1
         number of thread(s) to use for "GeosClassicIndicatorSim" C program;
-        `nthreads = -n <= 0`: maximal number of threads of the system except n
+        `nthreads = -n <= 0`: maximal number of threads (see function :func:`config.cpu_count`) except n
         (but at least 1)
 
     verbose : int, default: 2
@@ -8025,11 +8023,11 @@ def simulateIndicator1D(
 
     # --- Set number of threads
     if nthreads <= 0:
-        nth = max(os.cpu_count() + nthreads, 1)
+        nth = max(config.cpu_count() + nthreads, 1)
     else:
         nth = nthreads
 
-    if verbose > 0 and nth > os.cpu_count():
+    if verbose > 0 and nth > config.cpu_count():
         print(f'{fname}: WARNING: number of threads used will exceed number of cpu(s) of the system...')
 
     if verbose > 1:
@@ -8126,14 +8124,14 @@ def simulateIndicator1D_mp(
         number of processes; by default (`None`):
         `nproc` is set to `min(nmax-1, nreal)` (but at least 1), where nmax is
         the total number of cpu(s) of the system (retrieved by
-        `multiprocessing.cpu_count()`)
+        :func:`config.cpu_count`)
 
     nthreads_per_proc : int, optional
         number of thread(s) per process (should be > 0); by default (`None`):
         `nthreads_per_proc` is automatically computed as the maximal integer
         (but at least 1) such that `nproc*nthreads_per_proc <= nmax-1`, where
         nmax is the total number of cpu(s) of the system (retrieved by
-        `multiprocessing.cpu_count()`)
+        :func:`config.cpu_count`)
 
     treat_image_one_by_one : bool, default: False
         keyword argument passed to the function :func:`img.gatherImages`:
@@ -8149,7 +8147,7 @@ def simulateIndicator1D_mp(
 
     # Set number of processes: nproc
     if nproc is None:
-        nproc = max(min(multiprocessing.cpu_count()-1, nreal), 1)
+        nproc = max(min(config.cpu_count()-1, nreal), 1)
     else:
         nproc_tmp = nproc
         nproc = max(min(int(nproc), nreal), 1)
@@ -8158,13 +8156,13 @@ def simulateIndicator1D_mp(
 
     # Set number of threads per process: nth
     if nthreads_per_proc is None:
-        nth = max(int(np.floor((multiprocessing.cpu_count()-1) / nproc)), 1)
+        nth = max(int(np.floor((config.cpu_count()-1) / nproc)), 1)
     else:
         nth = max(int(nthreads_per_proc), 1)
         if verbose > 1 and nth != nthreads_per_proc:
             print(f'{fname}: number of threads per process has been changed (now: nthreads_per_proc={nth})')
 
-    if verbose > 0 and nproc * nth > multiprocessing.cpu_count():
+    if verbose > 0 and nproc * nth > config.cpu_count():
         print(f'{fname}: WARNING: total number of cpu(s) used will exceed number of cpu(s) of the system...')
 
     # Set the distribution of the realizations over the processes
@@ -8189,7 +8187,7 @@ def simulateIndicator1D_mp(
     outputReportFile_p = None
 
     # Set pool of nproc workers
-    pool = multiprocessing.Pool(nproc)
+    pool = parallel.get_pool(nproc, nthreads_per_proc=nth)
     out_pool = []
     for i in range(nproc):
         # Adapt input for i-th process
@@ -8224,9 +8222,8 @@ def simulateIndicator1D_mp(
                 )
             )
 
-    # Properly end working process
-    pool.close() # Prevents any more tasks from being submitted to the pool,
-    pool.join()  # then, wait for the worker processes to exit.
+    # Wait for the tasks and release the pool
+    parallel.release_pool(pool, out_pool)
 
     # Get result from each process
     geosclassic_output_proc = [p.get() for p in out_pool]
@@ -8419,7 +8416,7 @@ def simulateIndicator2D(
 
     nthreads : int, default: -1
         number of thread(s) to use for "GeosClassicIndicatorSim" C program;
-        `nthreads = -n <= 0`: maximal number of threads of the system except n
+        `nthreads = -n <= 0`: maximal number of threads (see function :func:`config.cpu_count`) except n
         (but at least 1)
 
     verbose : int, default: 2
@@ -8739,11 +8736,11 @@ def simulateIndicator2D(
 
     # --- Set number of threads
     if nthreads <= 0:
-        nth = max(os.cpu_count() + nthreads, 1)
+        nth = max(config.cpu_count() + nthreads, 1)
     else:
         nth = nthreads
 
-    if verbose > 0 and nth > os.cpu_count():
+    if verbose > 0 and nth > config.cpu_count():
         print(f'{fname}: WARNING: number of threads used will exceed number of cpu(s) of the system...')
 
     if verbose > 1:
@@ -8840,14 +8837,14 @@ def simulateIndicator2D_mp(
         number of processes; by default (`None`):
         `nproc` is set to `min(nmax-1, nreal)` (but at least 1), where nmax is
         the total number of cpu(s) of the system (retrieved by
-        `multiprocessing.cpu_count()`)
+        :func:`config.cpu_count`)
 
     nthreads_per_proc : int, optional
         number of thread(s) per process (should be > 0); by default (`None`):
         `nthreads_per_proc` is automatically computed as the maximal integer
         (but at least 1) such that `nproc*nthreads_per_proc <= nmax-1`, where
         nmax is the total number of cpu(s) of the system (retrieved by
-        `multiprocessing.cpu_count()`)
+        :func:`config.cpu_count`)
 
     treat_image_one_by_one : bool, default: False
         keyword argument passed to the function :func:`img.gatherImages`:
@@ -8863,7 +8860,7 @@ def simulateIndicator2D_mp(
 
     # Set number of processes: nproc
     if nproc is None:
-        nproc = max(min(multiprocessing.cpu_count()-1, nreal), 1)
+        nproc = max(min(config.cpu_count()-1, nreal), 1)
     else:
         nproc_tmp = nproc
         nproc = max(min(int(nproc), nreal), 1)
@@ -8872,13 +8869,13 @@ def simulateIndicator2D_mp(
 
     # Set number of threads per process: nth
     if nthreads_per_proc is None:
-        nth = max(int(np.floor((multiprocessing.cpu_count()-1) / nproc)), 1)
+        nth = max(int(np.floor((config.cpu_count()-1) / nproc)), 1)
     else:
         nth = max(int(nthreads_per_proc), 1)
         if verbose > 1 and nth != nthreads_per_proc:
             print(f'{fname}: number of threads per process has been changed (now: nthreads_per_proc={nth})')
 
-    if verbose > 0 and nproc * nth > multiprocessing.cpu_count():
+    if verbose > 0 and nproc * nth > config.cpu_count():
         print(f'{fname}: WARNING: total number of cpu(s) used will exceed number of cpu(s) of the system...')
 
     # Set the distribution of the realizations over the processes
@@ -8903,7 +8900,7 @@ def simulateIndicator2D_mp(
     outputReportFile_p = None
 
     # Set pool of nproc workers
-    pool = multiprocessing.Pool(nproc)
+    pool = parallel.get_pool(nproc, nthreads_per_proc=nth)
     out_pool = []
     for i in range(nproc):
         # Adapt input for i-th process
@@ -8938,9 +8935,8 @@ def simulateIndicator2D_mp(
                 )
             )
 
-    # Properly end working process
-    pool.close() # Prevents any more tasks from being submitted to the pool,
-    pool.join()  # then, wait for the worker processes to exit.
+    # Wait for the tasks and release the pool
+    parallel.release_pool(pool, out_pool)
 
     # Get result from each process
     geosclassic_output_proc = [p.get() for p in out_pool]
@@ -9134,7 +9130,7 @@ def simulateIndicator3D(
 
     nthreads : int, default: -1
         number of thread(s) to use for "GeosClassicIndicatorSim" C program;
-        `nthreads = -n <= 0`: maximal number of threads of the system except n
+        `nthreads = -n <= 0`: maximal number of threads (see function :func:`config.cpu_count`) except n
         (but at least 1)
 
     verbose : int, default: 2
@@ -9465,11 +9461,11 @@ def simulateIndicator3D(
 
     # --- Set number of threads
     if nthreads <= 0:
-        nth = max(os.cpu_count() + nthreads, 1)
+        nth = max(config.cpu_count() + nthreads, 1)
     else:
         nth = nthreads
 
-    if verbose > 0 and nth > os.cpu_count():
+    if verbose > 0 and nth > config.cpu_count():
         print(f'{fname}: WARNING: number of threads used will exceed number of cpu(s) of the system...')
 
     if verbose > 1:
@@ -9566,14 +9562,14 @@ def simulateIndicator3D_mp(
         number of processes; by default (`None`):
         `nproc` is set to `min(nmax-1, nreal)` (but at least 1), where nmax is
         the total number of cpu(s) of the system (retrieved by
-        `multiprocessing.cpu_count()`)
+        :func:`config.cpu_count`)
 
     nthreads_per_proc : int, optional
         number of thread(s) per process (should be > 0); by default (`None`):
         `nthreads_per_proc` is automatically computed as the maximal integer
         (but at least 1) such that `nproc*nthreads_per_proc <= nmax-1`, where
         nmax is the total number of cpu(s) of the system (retrieved by
-        `multiprocessing.cpu_count()`)
+        :func:`config.cpu_count`)
 
     treat_image_one_by_one : bool, default: False
         keyword argument passed to the function :func:`img.gatherImages`:
@@ -9589,7 +9585,7 @@ def simulateIndicator3D_mp(
 
     # Set number of processes: nproc
     if nproc is None:
-        nproc = max(min(multiprocessing.cpu_count()-1, nreal), 1)
+        nproc = max(min(config.cpu_count()-1, nreal), 1)
     else:
         nproc_tmp = nproc
         nproc = max(min(int(nproc), nreal), 1)
@@ -9598,13 +9594,13 @@ def simulateIndicator3D_mp(
 
     # Set number of threads per process: nth
     if nthreads_per_proc is None:
-        nth = max(int(np.floor((multiprocessing.cpu_count()-1) / nproc)), 1)
+        nth = max(int(np.floor((config.cpu_count()-1) / nproc)), 1)
     else:
         nth = max(int(nthreads_per_proc), 1)
         if verbose > 1 and nth != nthreads_per_proc:
             print(f'{fname}: number of threads per process has been changed (now: nthreads_per_proc={nth})')
 
-    if verbose > 0 and nproc * nth > multiprocessing.cpu_count():
+    if verbose > 0 and nproc * nth > config.cpu_count():
         print(f'{fname}: WARNING: total number of cpu(s) used will exceed number of cpu(s) of the system...')
 
     # Set the distribution of the realizations over the processes
@@ -9629,7 +9625,7 @@ def simulateIndicator3D_mp(
     outputReportFile_p = None
 
     # Set pool of nproc workers
-    pool = multiprocessing.Pool(nproc)
+    pool = parallel.get_pool(nproc, nthreads_per_proc=nth)
     out_pool = []
     for i in range(nproc):
         # Adapt input for i-th process
@@ -9664,9 +9660,8 @@ def simulateIndicator3D_mp(
                 )
             )
 
-    # Properly end working process
-    pool.close() # Prevents any more tasks from being submitted to the pool,
-    pool.join()  # then, wait for the worker processes to exit.
+    # Wait for the tasks and release the pool
+    parallel.release_pool(pool, out_pool)
 
     # Get result from each process
     geosclassic_output_proc = [p.get() for p in out_pool]
@@ -9863,7 +9858,7 @@ def estimateIndicator1D(
 
     nthreads : int, default: -1
         number of thread(s) to use for "GeosClassicIndicatorSim" C program;
-        `nthreads = -n <= 0`: maximal number of threads of the system except n
+        `nthreads = -n <= 0`: maximal number of threads (see function :func:`config.cpu_count`) except n
         (but at least 1)
 
     verbose : int, default: 2
@@ -10176,11 +10171,11 @@ def estimateIndicator1D(
 
     # --- Set number of threads
     if nthreads <= 0:
-        nth = max(os.cpu_count() + nthreads, 1)
+        nth = max(config.cpu_count() + nthreads, 1)
     else:
         nth = nthreads
 
-    if verbose > 0 and nth > os.cpu_count():
+    if verbose > 0 and nth > config.cpu_count():
         print(f'{fname}: WARNING: number of threads used will exceed number of cpu(s) of the system...')
 
     if verbose > 1:
@@ -10389,7 +10384,7 @@ def estimateIndicator2D(
 
     nthreads : int, default: -1
         number of thread(s) to use for "GeosClassicIndicatorSim" C program;
-        `nthreads = -n <= 0`: maximal number of threads of the system except n
+        `nthreads = -n <= 0`: maximal number of threads (see function :func:`config.cpu_count`) except n
         (but at least 1)
 
     verbose : int, default: 2
@@ -10717,11 +10712,11 @@ def estimateIndicator2D(
 
     # --- Set number of threads
     if nthreads <= 0:
-        nth = max(os.cpu_count() + nthreads, 1)
+        nth = max(config.cpu_count() + nthreads, 1)
     else:
         nth = nthreads
 
-    if verbose > 0 and nth > os.cpu_count():
+    if verbose > 0 and nth > config.cpu_count():
         print(f'{fname}: WARNING: number of threads used will exceed number of cpu(s) of the system...')
 
     if verbose > 1:
@@ -10931,7 +10926,7 @@ def estimateIndicator3D(
 
     nthreads : int, default: -1
         number of thread(s) to use for "GeosClassicIndicatorSim" C program;
-        `nthreads = -n <= 0`: maximal number of threads of the system except n
+        `nthreads = -n <= 0`: maximal number of threads (see function :func:`config.cpu_count`) except n
         (but at least 1)
 
     verbose : int, default: 2
@@ -11270,11 +11265,11 @@ def estimateIndicator3D(
 
     # --- Set number of threads
     if nthreads <= 0:
-        nth = max(os.cpu_count() + nthreads, 1)
+        nth = max(config.cpu_count() + nthreads, 1)
     else:
         nth = nthreads
 
-    if verbose > 0 and nth > os.cpu_count():
+    if verbose > 0 and nth > config.cpu_count():
         print(f'{fname}: WARNING: number of threads used will exceed number of cpu(s) of the system...')
 
     if verbose > 1:
@@ -11364,7 +11359,7 @@ def imgDistanceImage(
 
     nthreads : int, default: -1
         number of thread(s) to use for C program;
-        `nthreads = -n <= 0`: maximal number of threads of the system except n
+        `nthreads = -n <= 0`: maximal number of threads (see function :func:`config.cpu_count`) except n
         (but at least 1)
 
     verbose : int, default: 0
@@ -11405,11 +11400,11 @@ def imgDistanceImage(
 
     # Set number of threads
     if nthreads <= 0:
-        nth = max(os.cpu_count() + nthreads, 1)
+        nth = max(config.cpu_count() + nthreads, 1)
     else:
         nth = nthreads
 
-    if verbose > 0 and nth > os.cpu_count():
+    if verbose > 0 and nth > config.cpu_count():
         print(f'{fname}: WARNING: number of threads used will exceed number of cpu(s) of the system...')
 
     # Compute distances (launch C code)
@@ -11823,7 +11818,7 @@ def imgTwoPointStatisticsImage(
 
     nthreads : int, default: -1
         number of thread(s) to use for C program;
-        `nthreads = -n <= 0`: maximal number of threads of the system except n
+        `nthreads = -n <= 0`: maximal number of threads (see function :func:`config.cpu_count`) except n
         (but at least 1)
 
     verbose : int, default: 0
@@ -11920,11 +11915,11 @@ def imgTwoPointStatisticsImage(
 
     # Set number of threads
     if nthreads <= 0:
-        nth = max(os.cpu_count() + nthreads, 1)
+        nth = max(config.cpu_count() + nthreads, 1)
     else:
         nth = nthreads
 
-    if verbose > 0 and nth > os.cpu_count():
+    if verbose > 0 and nth > config.cpu_count():
         print(f'{fname}: WARNING: number of threads used will exceed number of cpu(s) of the system...')
 
     # Set C function to launch for computing two-point statistics
@@ -12197,7 +12192,7 @@ def imgConnectivityGammaCurves(
 
     nthreads : int, default: -1
         number of thread(s) to use for C program;
-        `nthreads = -n <= 0`: maximal number of threads of the system except n
+        `nthreads = -n <= 0`: maximal number of threads (see function :func:`config.cpu_count`) except n
         (but at least 1)
 
     verbose : int, default: 0
@@ -12269,11 +12264,11 @@ def imgConnectivityGammaCurves(
 
     # Set number of threads
     if nthreads <= 0:
-        nth = max(os.cpu_count() + nthreads, 1)
+        nth = max(config.cpu_count() + nthreads, 1)
     else:
         nth = nthreads
 
-    if verbose > 0 and nth > os.cpu_count():
+    if verbose > 0 and nth > config.cpu_count():
         print(f'{fname}: WARNING: number of threads used will exceed number of cpu(s) of the system...')
 
     # Set C function to launch for computing Gamma curves
@@ -12402,7 +12397,7 @@ def imgConnectivityEulerNumber(
 
     nthreads : int, default: -1
         number of thread(s) to use for C program;
-        `nthreads = -n <= 0`: maximal number of threads of the system except n
+        `nthreads = -n <= 0`: maximal number of threads (see function :func:`config.cpu_count`) except n
         (but at least 1)
 
     verbose : int, default: 0
@@ -12460,11 +12455,11 @@ def imgConnectivityEulerNumber(
 
     # Set number of threads
     if nthreads <= 0:
-        nth = max(os.cpu_count() + nthreads, 1)
+        nth = max(config.cpu_count() + nthreads, 1)
     else:
         nth = nthreads
 
-    if verbose > 0 and nth > os.cpu_count():
+    if verbose > 0 and nth > config.cpu_count():
         print(f'{fname}: WARNING: number of threads used will exceed number of cpu(s) of the system...')
 
     # Compute Euler number (launch C code)
@@ -12555,7 +12550,7 @@ def imgConnectivityEulerNumberCurves(
 
     nthreads : int, default: -1
         number of thread(s) to use for C program;
-        `nthreads = -n <= 0`: maximal number of threads of the system except n
+        `nthreads = -n <= 0`: maximal number of threads (see function :func:`config.cpu_count`) except n
         (but at least 1)
 
     verbose : int, default: 0
@@ -12623,11 +12618,11 @@ def imgConnectivityEulerNumberCurves(
 
     # Set number of threads
     if nthreads <= 0:
-        nth = max(os.cpu_count() + nthreads, 1)
+        nth = max(config.cpu_count() + nthreads, 1)
     else:
         nth = nthreads
 
-    if verbose > 0 and nth > os.cpu_count():
+    if verbose > 0 and nth > config.cpu_count():
         print(f'{fname}: WARNING: number of threads used will exceed number of cpu(s) of the system...')
 
     # Compute Euler number curves (launch C code)
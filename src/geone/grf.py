@@ -30,8 +30,12 @@ Journal of Computational and Graphical Statistics 3(4):409-432, \
 """
 
 import numpy as np
+import scipy.fft
+import scipy.linalg
 from geone import covModel as gcm
 from geone import img
+from geone import parallel
+from geone import randomStream
 
 # ============================================================================
 class GrfError(Exception):
@@ -71,291 +75,633 @@ def extension_min(r, n, s=1.0):
 # ----------------------------------------------------------------------------
 
 # ----------------------------------------------------------------------------
-def grf1D(
-        cov_model,
-        dimension, spacing=1.0, origin=0.0,
-        x=None, v=None,
-        aggregate_data_op=None,
-        aggregate_data_op_kwargs=None,
-        mean=None, var=None,
-        nreal=1,
-        extensionMin=None, rangeFactorForExtensionMin=1.0,
-        crop=True,
-        method=3, conditioningMethod=2,
-        measureErrVar=0.0, tolInvKappa=1.e-10,
-        verbose=1,
-        printInfo=None):
+def _cov_matrix_from_ccirc(ccirc, ind1, ind2):
     """
-    Generates Gaussian Random Fields (GRF) in 1D via Fast Fourier Transform (FFT).
-
-    In brief, the GRFs
-
-    - are generated using the given covariance model (`cov_model`),
-    - may have a specified mean (`mean`) and variance (`var`), which can be non stationary,
-    - may be conditioned to location(s) `x` with value(s) `v`.
+    Extracts a covariance matrix from the circulant embedding (first line).
 
     Parameters
     ----------
-    cov_model : :class:`geone.covModel.CovModel1D`, or function (`callable`)
-        covariance model in 1D or directly a function of covariance
+    ccirc : nd array
+        coefficients of the embedding matrix (first line), array of shape (N,)
+        in 1D, (N2, N1) in 2D, (N3, N2, N1) in 3D
+    ind1 : sequence of 1D arrays of ints
+        index of a first set of n1 nodes along each axis of `ccirc`, i.e.
+        `(ix,)` in 1D, `(iy, ix)` in 2D, `(iz, iy, ix)` in 3D
+    ind2 : sequence of 1D arrays of ints
+        index of a second set of n2 nodes along each axis of `ccirc` (as `ind1`)
 
-    dimension : int
-        `dimension=nx`, number of cells in the 1D simulation grid
+    Returns
+    -------
+    r : 2D array of shape (n1, n2)
+        covariance matrix, `r[i, j]` is the covariance between the i-th node
+        of the first set and the j-th node of the second set
+    """
+    # fname = '_cov_matrix_from_ccirc'
 
-    spacing : float, default: 1.0
-        `spacing=sx`, cell size
+    k = tuple(np.mod(np.asarray(j2)[np.newaxis, :] - np.asarray(j1)[:, np.newaxis], n)
+              for j1, j2, n in zip(ind1, ind2, ccirc.shape))
+    return ccirc[k]
+# ----------------------------------------------------------------------------
 
-    origin : float, default: 0.0
-        `origin=ox`, origin of the 1D simulation grid (left border)
+# ----------------------------------------------------------------------------
+def _cov_matrix_cond_from_ccirc(ccirc, ind, diagEntry):
+    """
+    Computes the covariance matrix rAA of the conditioning nodes from the circulant embedding.
 
-    x : 1D array-like of floats, optional
-        data points locations (float coordinates); note: if one point, a float
-        is accepted
+    Parameters
+    ----------
+    ccirc : nd array
+        coefficients of the embedding matrix (first line), see
+        function :func:`_cov_matrix_from_ccirc`
+    ind : sequence of 1D arrays of ints
+        index of the conditioning nodes along each axis of `ccirc`, see
+        function :func:`_cov_matrix_from_ccirc`
+    diagEntry : float
+        value set on the diagonal
 
-    v : 1D array-like of floats, optional
-        data values at `x` (`v[i]` is the data value at `x[i]`), array of same
-        length as `x` (or float if one point)
+    Returns
+    -------
+    rAA : 2D array of shape (nc, nc)
+        covariance matrix of the nc conditioning nodes (symmetric)
+    """
+    # fname = '_cov_matrix_cond_from_ccirc'
 
-    aggregate_data_op : str {'sgs', 'krige', 'min', 'max', 'mean', 'quantile', 'most_freq', 'random'}, optional
-        operation used to aggregate data points falling in the same grid cells
+    rAA = np.triu(_cov_matrix_from_ccirc(ccirc, ind, ind), 1)
+    rAA = rAA + rAA.T
+    np.fill_diagonal(rAA, diagEntry)
+    return rAA
+# ----------------------------------------------------------------------------
 
-        - if `aggregate_data_op='sgs'`: function :func:`covModel.sgs` is used \
-        with the covariance model `cov_model` given in arguments
-        - if `aggregate_data_op='krige'`: function :func:`covModel.krige` is used \
-        with the covariance model `cov_model` given in arguments
-        - if `aggregate_data_op='most_freq'`: most frequent value is selected \
-        (smallest one if more than one value with the maximal frequence)
-        - if `aggregate_data_op='random'`: value from a random point is selected
-        - otherwise: the function `numpy.<aggregate_data_op>` is used with the \
-        additional parameters given by `aggregate_data_op_kwargs`, note that, e.g. \
-        `aggregate_data_op='quantile'` requires the additional parameter \
-        `q=<quantile_to_compute>`
+# ----------------------------------------------------------------------------
+def _krige_var_reduction(rAAcho, ccirc, indnc, indc, block_size):
+    """
+    Computes the variance reduction diag(rBA * rAA^(-1) * rAB) by blocks.
 
-        Note: if `aggregate_data_op='sgs'` or `aggregate_data_op='random'`, the
-        aggregation is done for each realization (simulation), i.e. each simulation
-        on the grid starts with a new set of values in conditioning grid cells;
-        if `aggregate_data_op='sgs'` or `aggregate_data_op='krige'`, then
-        `cov_model` must be a covariance model and not directly the covariance
-        function
+    The rows of rBA are extracted from the circulant embedding by blocks of
+    (at most) `block_size` non-conditioning nodes, and the variance reduction
+    of each node is the squared norm of the corresponding column of
+    C^(-T) * rAB, where rAA = C^T * C is the Cholesky decomposition of rAA
+    (computed once), i.e. one triangular solve is done per block.
 
-        By default (`None`): `aggregate_data_op='sgs'` is used
+    Parameters
+    ----------
+    rAAcho : tuple
+        Cholesky decomposition of rAA, as returned by
+        :func:`scipy.linalg.cho_factor`
+    ccirc : nd array
+        coefficients of the embedding matrix (first line), see
+        function :func:`_cov_matrix_from_ccirc`
+    indnc : sequence of 1D arrays of ints
+        index of the nnc non-conditioning nodes along each axis of `ccirc`,
+        see function :func:`_cov_matrix_from_ccirc`
+    indc : sequence of 1D arrays of ints
+        index of the nc conditioning nodes along each axis of `ccirc`,
+        see function :func:`_cov_matrix_from_ccirc`
+    block_size : int
+        number of non-conditioning nodes treated at once
 
-    aggregate_data_op_kwargs : dict, optional
-        keyword arguments to be passed to `geone.covModel.sgs`,
-        `geone.covModel.krige`, or `numpy.<aggregate_data_op>`, according to
-        the parameter `aggregate_data_op`
+    Returns
+    -------
+    red : 1D array of shape (nnc,)
+        variance reduction at the non-conditioning nodes
+    """
+    # fname = '_krige_var_reduction'
+
+    c, lower = rAAcho
+    nnc = len(indnc[0])
+    red = np.zeros(nnc)
+    for j0 in range(0, nnc, block_size):
+        j1 = min(j0 + block_size, nnc)
+        rBA = _cov_matrix_from_ccirc(ccirc, tuple(k[j0:j1] for k in indnc), indc)
+        # solve C^T * y = rAB (C upper), or C * y = rAB (C lower)
+        y = scipy.linalg.solve_triangular(c, rBA.T, trans=0 if lower else 1, lower=lower, check_finite=False)
+        red[j0:j1] = np.einsum('ij,ij->j', y, y)
+    return red
+# ----------------------------------------------------------------------------
 
-    mean : function (`callable`), or array-like of floats, or float, optional
-        kriging mean value:
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+def _grf_simulate(grf, sim, ireal0, fname, verbose):
+    """
+    Generates GRF realizations from the result of the preliminary computation.
 
-        - if a function: function of one argument (xi) that returns the mean at \
-        location xi
-        - if array-like: its size must be equal to the number of grid cells \
-        (the array is reshaped if needed), mean values at grid cells (for \
-        non-stationary mean)
-        - if a float: same mean value at every grid cell
+    This function is used by the functions :func:`grf1D`, :func:`grf2D`,
+    :func:`grf3D` (for all the realizations at once), and by the functions
+    :func:`grf1D_mp`, :func:`grf2D_mp`, :func:`grf3D_mp` (for a slice of
+    realizations in each process).
 
-        By default (`None`): the mean of data value (`v`) (0.0 if no data) is
-        considered at every grid cell
+    Parameters
+    ----------
+    grf : nd array
+        C-contiguous array of shape (m, ) + `sim['grfShape']`, filled in place
+        with the realizations of index `ireal0`, ..., `ireal0+m-1`
+    sim : dict
+        result of the preliminary computation (see e.g. function
+        :func:`_grf1D_preliminary`); `sim['rngs']` (random number generators)
+        and `sim['v_agg']` (values at conditioning cells, if conditional
+        simulation) are given for the m realizations to generate
+    ireal0 : int
+        index of the first realization to generate
+    fname : str
+        name of the calling function (for displaying)
+    verbose : int
+        verbose mode (see e.g. function :func:`grf1D`)
+    """
+    # fname = '_grf_simulate'
 
-    var : function (`callable`), or array-like of floats, or float, optional
-        kriging variance value:
+    dtype = sim['dtype']
+    if dtype == np.float64:
+        fft = np.fft    # double precision
+    else:
+        fft = scipy.fft # single precision is preserved by `scipy.fft`
 
-        - if a function: function of one argument (xi) that returns the variance \
-        at location xi
-        - if array-like: its size must be equal to the number of grid cells \
-        (the array is reshaped if needed), variance values at grid cells (for \
-        non-stationary variance)
-        - if a float: same variance value at every grid cell
+    cdtype = np.promote_types(dtype, np.complex64) # complex type associated to dtype
 
-        By default (`None`): not used (use of covariance model only)
+    nreal = sim['nreal']
+    method = sim['method']
+    rngs = sim['rngs']
+    lamSqrt = sim['lamSqrt']
+    shapeEmb = sim['shapeEmb']
+    N = int(np.prod(shapeEmb))
 
-    nreal : int, default: 1
-        number of realization(s)
+    m = grf.shape[0]
+    cropSlice = tuple(slice(0, n) for n in grf.shape[1:])
 
-    extensionMin : int, optional
-        minimal extension in cells (see note 1 below)
+    # Unconditional simulation
+    # ========================
+    # Method A: Generating one real GRF Z
+    # --------
+    # 1. Generate a real gaussian white noise W ~ N(0,1) on G (embedding grid)
+    # 2. Compute Z = Q^(*) D Q * W
+    #    [OR: Z = Q D Q^(*) * W], where
+    #       Q is normalized DFT matrix
+    #       D = diag(lamSqrt)
+    #    i.e:
+    #       Z = DFT^(-1)(D * DFT(W))
+    #       [OR: Z = DFT(D * DFT^(-1)(W))]
+    #
+    # Method B: Generating one real GRF Z (1D only)
+    # --------
+    # 1. Assuming N=2L even, generate
+    #       V1 = (V1(1),...,V1(L-1)) ~ 1/sqrt(2) N(0, 1)
+    #       V2 = (V2(1),...,V2(L-1)) ~ 1/sqrt(2) N(0, 1)
+    #    and set
+    #       X = (X(0),...,X(N-1)) on G
+    #    with
+    #       X(0) ~ N(0,1)
+    #       X(L) ~ N(0,1)
+    #    and
+    #       X(k) = V1(k) + i V2(k)
+    #       X(N-k) = V1(k) - i V2(k)
+    #    for k = 1,...,L-1
+    # 2. Compute Z = Q^(*) D * X
+    #    [OR: Z = Q D * X], where
+    #       Q is normalized DFT matrix
+    #       D = diag(lamSqrt)
+    #    i.e:
+    #       Z = N^(1/2) * DFT^(-1)(D * X)
+    #       [OR: Z = 1/N^(1/2) * DFT(D * X]
+    #
+    # Method C: Generating two independent real GRFs Z1, Z2
+    # --------
+    # (With a legacy random state, the realizations are generated by pairs, and
+    # if the number of realizations is odd, the last realization is generated
+    # using method A; otherwise, each realization is generated from its own
+    # stream, as Z1 only.)
+    # 1. Generate two independent real gaussian white noises W1,W2 ~ N(0,1) on G (embedding grid)
+    #    and let W = W1 + i * W2 (complex value)
+    # 2. Compute Z = Q^(*) D * W
+    #    [OR: Z = Q D * W], where
+    #       Q is normalized DFT matrix
+    #       D = diag(lamSqrt)
+    #    i.e:
+    #       Z = N^(1/2) * DFT^(-1)(D * W)
+    #       [OR: Z = 1/N^(1/2) * DFT(D * W)]
+    #    Then the real and imaginary parts of Z are two independent GRFs
+    if method == 1:
+        # Method A
+        # --------
+        for i in range(m):
+            if verbose > 2:
+                print(f'{fname}: unconditional simulation {ireal0+i+1:4d} of {nreal:4d}...')
 
-        By default (`None`): minimal extension is automatically computed:
+            W = rngs[i].normal(size=shapeEmb).astype(dtype, copy=False)
 
-        - based on the range of the covariance model, if `cov_model` is given as \
-        an instance of :class:`geone.CovModel.CovModel1D`)
-        - set to `nx-1`, if `cov_model` is given as a function (`callable`)
+            Z = fft.ifftn(lamSqrt * fft.fftn(W))
+            # ...note that Im(Z) = 0
+            grf[i] = np.real(Z[cropSlice])
 
-    rangeFactorForExtensionMin : float, default: 1.0
-        factor by which the range of the covariance model is multiplied before
-        computing the default minimal extension, if `cov_model` is given as
-        an instance of :class:`geone.CovModel.CovModel1D`) and if
-        `extensionMin=None` (not used otherwise)
+    elif method == 2:
+        # Method B
+        # --------
+        L = N // 2
+        for i in range(m):
+            if verbose > 2:
+                print(f'{fname}: unconditional simulation {ireal0+i+1:4d} of {nreal:4d}...')
 
-    crop : bool, default: True
-        indicates if the extended generated field (simulation) will be cropped to
-        original dimension; note that `crop=False` is not valid with conditioning
-        or non-stationary mean or non-stationary variance
+            X1 = np.zeros(N)
+            X2 = np.zeros(N)
 
-    method : int, default: 3
-        indicates which method is used to generate unconditional simulations;
-        for each method the Discrete Fourier Transform (DFT) "lam" of the
-        circulant embedding of the covariance matrix is used, and periodic and
-        stationary GRFs are generated
+            X1[[0,L]] = rngs[i].normal(size=2)
+            X1[range(1,L)] = 1./np.sqrt(2) * rngs[i].normal(size=L-1)
+            X1[list(reversed(range(L+1,N)))] = X1[range(1,L)]
 
-        - `method=1` (method A): generate one GRF Z as follows:
-            - generate one real gaussian white noise W
-            - apply fft (or fft inverse) on W to get X
-            - multiply X by "lam" (term by term)
-            - apply fft inverse (or fft) to get Z
-        - `method=2` (method B): generate one GRF Z as follows:
-           - generate directly X (from method A)
-           - multiply X by lam (term by term)
-           - apply fft inverse (or fft) to get Z
-        - `method=3` (method C, default): generate two independent GRFs Z1, Z2 as follows:
-           - generate two independant real gaussian white noises W1, W2 and set \
-           W = W1 + i * W2
-           - apply fft (or fft inverse) on W to get X
-           - multiply X by "lam" (term by term)
-           - apply fft inverse (or fft) to get Z, and set Z1 = Re(Z), Z2 = Im(Z); \
-           note: if `nreal` is odd, the last field is generated using method A
+            X2[range(1,L)] = 1./np.sqrt(2) * rngs[i].normal(size=L-1)
+            X2[list(reversed(range(L+1,N)))] = - X2[range(1,L)]
 
-    conditioningMethod : int, default: 2
-        indicates which method is used to update the simulations to account for
-        conditioning data; let
+            X = np.array(X1, dtype=cdtype)
+            X.imag = X2
 
-        * A: index of conditioning cells
-        * B: index of non-conditioning cells
-        * Zobs: vector of values of the unconditional simulation Z at conditioning cells
-        * :math:`r = \\left(\\begin{array}{cc} r_{AA} & r_{AB}\\\\r_{BA} & r_{BB}\\end{array}\\right)` \
-        the covariance matrix, where index A (resp. B) refers to conditioning \
-        (resp. non-conditioning) index in the grid;
+            Z = fft.ifft(lamSqrt * X)
+            Z *= np.sqrt(N)
 
-        an unconditional simulation Z is updated into a conditional simulation ZCond as
-        follows; let
+            grf[i] = np.real(Z[cropSlice])
 
-        * ZCond[A] = Zobs
-        * ZCond[B] = Z[B] + rBA * rAA^(-1) * (Zobs - Z[A])
+    elif method == 3 and not isinstance(rngs[0], np.random.RandomState):
+        # Method C, one realization per stream
+        # --------
+        for i in range(m):
+            if verbose > 2:
+                print(f'{fname}: unconditional simulation {ireal0+i+1:4d} of {nreal:4d}...')
 
-        i.e. the update consists in adding the kriging estimates of the residues
-        to an unconditional simulation
+            W = np.array(rngs[i].normal(size=shapeEmb), dtype=cdtype)
+            W.imag = rngs[i].normal(size=shapeEmb)
+            Z = fft.ifftn(lamSqrt * W)
+            Z *= np.sqrt(N)
 
-        * `conditioningMethod=1` (method CondtioningA): the matrix M = rBA * rAA^(-1) \
-        is explicitly computed (warning: could require large amount of memory), \
-        then all the simulations are updated by a sum and a multiplication by the \
-        matrix M
-        * `conditioningMethod=2` (method CondtioningB, default): for each simulation, \
-        the linear system rAA * x = Zobs - Z[A] is solved and then, the multiplication \
-        by rBA is done via fft
+            grf[i] = np.real(Z[cropSlice])
 
-        Note: parameter `conditioningMethod` is used only for conditional simulation
+    elif method == 3:
+        # Method C, legacy random state (same for all realizations)
+        # --------
+        for i in np.arange(0, m-1, 2):
+            if verbose > 2:
+                print(f'{fname}: unconditional simulation {ireal0+i+1:4d}-{ireal0+i+2:4d} of {nreal:4d}...')
 
-    measureErrVar : float, default: 0.0
-        measurement error variance; the error on conditioning data is assumed to
-        follow the distrubution N(0, `measureErrVar` * I); i.e.
-        rAA + `measureErrVar` * I is considered instead of rAA for stabilizing the
-        linear system for this matrix;
-        note: parameter `measureErrVar` is used only for conditional simulation
+            W = np.array(rngs[i].normal(size=shapeEmb), dtype=cdtype)
+            W.imag = rngs[i+1].normal(size=shapeEmb)
+            Z = fft.ifftn(lamSqrt * W)
+            Z *= np.sqrt(N)
+            #  Z = 1/np.sqrt(N) * np.fft.fftn(lamSqrt * W)] # see above: [OR:...]
 
-    tolInvKappa : float, default: 1.e-10
-        the simulation is stopped if the inverse of the condition number of rAA
-        is above `tolInvKappa`;
-        note: parameter `tolInvKappa` is used only for conditional simulation
+            grf[i] = np.real(Z[cropSlice])
+            grf[i+1] = np.imag(Z[cropSlice])
 
-    verbose : int, default: 1
-        verbose mode, higher implies more printing (info):
+        if np.mod(m, 2) == 1:
+            if verbose > 2:
+                print(f'{fname}: unconditional simulation {ireal0+m:4d} of {nreal:4d}...')
 
-        - 0: no display
-        - 1: warnings
-        - 2: warnings + basic info
-        - 3 (or >2): all information
+            W = rngs[m-1].normal(size=shapeEmb).astype(dtype, copy=False)
 
-        note that if an error occurred, it is raised
+            Z = fft.ifftn(lamSqrt * fft.fftn(W))
+            # ...note that Im(Z) = 0
+            grf[m-1] = np.real(Z[cropSlice])
 
-    printInfo : bool, optional
-        deprecated, use `verbose` instead;
+    varUpdate = sim['varUpdate']
+    if varUpdate is not None:
+        grf *= varUpdate
 
-        - if `printInfo=False`, `verbose` is set to 1 (overwritten)
-        - if `printInfo=True`, `verbose` is set to 3 (overwritten)
-        - if `printInfo=None` (default): not used
+    grf += sim['mean']
 
-    Returns
-    -------
-    grf : 2D array of shape (`nreal`, n1)
-        GRF realizations, with n1 = nx (= dimension) if `crop=True`, but
-        n1 >= nx if `crop=False`;
-        `grf[i, j]`: value of the i-th realisation at grid cell of index j
+    # Conditional simulation
+    # ----------------------
+    # Let
+    #    A: index of conditioning nodes
+    #    B: index of non-conditioning nodes
+    #    Zobs: vector of values at conditioning nodes
+    # and
+    #        +         +
+    #        | rAA rAB |
+    #    r = |         |
+    #        | rBA rBB |
+    #        +         +
+    # the covariance matrix, where index A (resp. B) refers to
+    # conditioning (resp. non-conditioning) index in the grid.
+    #
+    # Then, from an unconditional simulation Z, we retrieve a conditional
+    # simulation ZCond as follows.
+    # Let
+    #    ZCond[A] = Zobs
+    #    ZCond[B] = Z[B] + rBA * rAA^(-1) * (Zobs - Z[A])
+    #
+    # Note: the linear algebra is done for each realization separately (matrix-
+    # vector products and solves): the result for one realization does not
+    # depend on the other realizations generated in the same call (which is not
+    # guaranteed by BLAS routines with a varying number of columns).
+    conditioningMethod = sim['conditioningMethod']
+    if conditioningMethod is not None:
+        # We work with single indices...
+        grf = grf.reshape(m, -1) # view on grf
 
-    Notes
-    -----
-    1. For reproducing covariance model, the dimension of GRF should be large
-    enough; let K an integer such that K*`spacing` is greater or equal to the
-    correlation range, then:
+        v_agg = sim['v_agg']
+        indc = sim['indc']
+        indnc = sim['indnc']
+        nnc = len(indnc)
 
-    - correlation accross opposite border should be removed by extending \
-    the domain sufficiently, i.e.
+        # Non-stationary variance (flattened), or None
+        if varUpdate is not None and varUpdate.size > 1:
+            varUpdate = varUpdate.reshape(-1)
+        else:
+            varUpdate = None
 
-        `extensionMin` >= K - 1
+        if conditioningMethod == 1:
+            # Method ConditioningA
+            # --------------------
+            if verbose > 1:
+                print(f'{fname}: updating conditional simulations...')
 
-    - two cells could not be correlated simultaneously regarding both \
-    distances between them (with respect to the periodic grid), i.e. one \
-    should have
+            # Update each simulation,
+            # use the matrix rBA * rAA^(-1) already computed
+            rBArAAinv = sim['rBArAAinv']
+            for i in range(m):
+                grf[i, indnc] = grf[i, indnc] + np.dot(rBArAAinv, v_agg[i] - grf[i, indc])
 
-        `dimension+extensionMin` >= 2*K - 1.
+            grf[:, indc] = v_agg
 
-    To sum up, `extensionMin` should be chosen such that
+        elif conditioningMethod == 2:
+            # Method ConditioningB
+            # --------------------
+            # Update each simulation successively as follows:
+            #    - solve rAA * x = Zobs - z[A]
+            #    - do the multiplication rBA * x via the circulant embedding of the
+            #      covariance matrix (using fft)
+            if verbose > 1:
+                print(f'{fname}: solving linear systems for conditioning...')
 
-        `dimension+extensionMin` >= max(`dimension`, K) + K - 1
+            lam = sim['lam']
+            indcEmb = sim['indcEmb']
+            indncEmb = sim['indncEmb']
 
-    i.e.
+            # Compute residues (one row per simulation)
+            residu = v_agg - grf[:, indc]
+            # ... update if non-stationary variance is specified
+            if varUpdate is not None:
+                residu = 1./varUpdate[indc] * residu
 
-        `extensionMin` >= max(K-1, 2*K-`dimension`-1)
+            # Compute x = rAA^(-1) * residu (one row per simulation)
+            rAAinvResidu = np.array([scipy.linalg.cho_solve(sim['rAAcho'], r) for r in residu]).reshape(m, -1)
 
-    2. For large data set:
+            del(residu)
 
-    - `conditioningMethod` should be set to 2 for using FFT
+            rAAinvResiduEmb = np.zeros(N, dtype=dtype)
 
-    - `measureErrVar` can be set to a small positive value to stabilize the \
-    covariance matrix for conditioning locations (solving linear system).
+            for i in range(m):
+                if verbose > 2:
+                    print(f'{fname}: updating conditional simulation {ireal0+i+1:4d} of {nreal:4d}...')
 
-    3. Some mathematical details:
+                # Compute
+                #    Z = rBA * x via the circulant embedding of the covariance matrix
+                rAAinvResiduEmb[indcEmb] = rAAinvResidu[i]
+                Z = fft.ifftn(lam * fft.fftn(rAAinvResiduEmb.reshape(shapeEmb)))
+                # ...note that Im(Z) = 0
+                Z = np.real(Z.reshape(-1)[indncEmb])
 
-    Discrete Fourier Transform (DFT) of a vector x of length N is given by
+                # ... update if non-stationary covariance is specified
+                if varUpdate is not None:
+                    Z = varUpdate[indnc] * Z
 
-        c = DFT(x) = F * x
+                grf[i, indnc] = grf[i, indnc] + Z
+                grf[i, indc] = v_agg[i]
 
-    where F is the N x N matrix with coefficients
+        elif conditioningMethod == 3:
+            # Method ConditioningC
+            # --------------------
+            # Update all simulations as follows:
+            #    - solve rAA * x = Zobs - z[A] for each simulation
+            #    - do the multiplication rBA * x by chunks of non-conditioning
+            #      nodes, the rows of rBA being extracted from the circulant
+            #      embedding of the covariance matrix
+            if verbose > 1:
+                print(f'{fname}: updating conditional simulations...')
 
-        F(j,k) = [exp(-i*2*pi*j*k/N)], 0 <= j,k <= N-1
+            ccirc = sim['ccirc']
+            indcAxes = sim['indcAxes']
+            indncAxes = sim['indncAxes']
+            conditioningChunkSize = sim['conditioningChunkSize']
 
-    We have
+            # Compute residues (one row per simulation)
+            residu = v_agg - grf[:, indc]
+            # ... update if non-stationary variance is specified
+            if varUpdate is not None:
+                residu = 1./varUpdate[indc] * residu
 
-        F^(-1) = 1/N * F^(*)
+            # Compute x = rAA^(-1) * residu (one row per simulation)
+            rAAinvResidu = np.array([scipy.linalg.cho_solve(sim['rAAcho'], r) for r in residu]).reshape(m, -1)
 
-    where ^(*) denotes the conjugate transpose.
+            del(residu)
 
-    Let
+            for j0 in range(0, nnc, conditioningChunkSize):
+                j1 = min(j0 + conditioningChunkSize, nnc)
+                if verbose > 2:
+                    print(f'{fname}: updating non-conditioning nodes {j0+1}-{j1} of {nnc}...')
 
-        Q = 1/N^(1/2) * F
+                # Extract the rows of rBA for the current chunk of non-conditioning nodes
+                rBA = _cov_matrix_from_ccirc(ccirc, tuple(k[j0:j1] for k in indncAxes), indcAxes)
 
-    Then Q is unitary, i.e. Q^(-1) = Q^(*)
+                # Compute Z = rBA * x, for each simulation
+                for i in range(m):
+                    Z = np.dot(rBA, rAAinvResidu[i])
 
-    Then, we have
+                    # ... update if non-stationary covariance is specified
+                    if varUpdate is not None:
+                        Z = varUpdate[indnc[j0:j1]] * Z
 
-        DFT = F = N^(1/2) * Q,
+                    grf[i, indnc[j0:j1]] += Z
 
-        DFT^(-1) = 1/N * F^(*) = 1/N^(1/2) * Q^(*)
+            grf[:, indc] = v_agg
+# ----------------------------------------------------------------------------
 
-    Using `numpy` package:
+# Entries of the result of the preliminary computation for GRF simulation
+# that are shared (read only) between processes (other entries are copied)
+_grf_shared_keys = ('lamSqrt', 'lam', 'ccirc', 'rBArAAinv', 'mean', 'varUpdate', 'indnc', 'indncEmb')
 
-        `numpy.fft.fft()` = DFT()
+# ----------------------------------------------------------------------------
+def _grf_simulate_mp_worker(sim, grf_desc, ireal0, ireal1, fname, verbose):
+    """
+    Generates a slice of GRF realizations in a process (worker).
 
-        `numpy.fft.ifft()` = DFT^(-1)()
+    Parameters
+    ----------
+    sim : dict
+        result of the preliminary computation (see function :func:`_grf_simulate`),
+        where the entries listed in `_grf_shared_keys` and the Cholesky factor
+        of rAA (`sim['rAAcho'][0]`) are given as shared arrays (descriptions),
+        and `sim['rngs']`, `sim['v_agg']` are given for the realizations of the
+        slice only
+    grf_desc : tuple
+        description of the output array, of shape (nreal, ) + `sim['grfShape']`
+        (see function :func:`parallel._output_array_create`)
+    ireal0 : int
+        index of the first realization of the slice
+    ireal1 : int
+        index of the last realization of the slice + 1
+    fname : str
+        name of the calling function (for displaying)
+    verbose : int
+        verbose mode
     """
-    fname = 'grf1D'
+    # fname = '_grf_simulate_mp_worker'
+
+    shm_list = []
+    try:
+        for key in _grf_shared_keys:
+            if sim.get(key) is not None:
+                sim[key] = parallel._shared_array_attach(sim[key], shm_list)
+        if sim.get('rAAcho') is not None:
+            sim['rAAcho'] = (parallel._shared_array_attach(sim['rAAcho'][0], shm_list), sim['rAAcho'][1])
+
+        grf = parallel._output_array_attach(grf_desc, shm_list)
+        _grf_simulate(grf[ireal0:ireal1], sim, ireal0, fname, verbose)
+        if isinstance(grf, np.memmap):
+            grf.flush()
+
+    finally:
+        # Release references to shared memory before closing
+        sim = None
+        grf = None
+        for shm in shm_list:
+            shm.close()
+# ----------------------------------------------------------------------------
 
-    # Set verbose mode according to printInfo (if given)
-    if printInfo is not None:
-        if printInfo:
-            verbose = 3
-        else:
-            verbose = 1
+# ----------------------------------------------------------------------------
+def _grf_simulate_mp(sim, nproc, fname, verbose, out=None):
+    """
+    Generates GRF realizations from the result of the preliminary computation, using multiprocessing.
+
+    The large arrays of the preliminary computation (`sim`) are put in shared
+    memory (read only), and each process generates a slice of realizations,
+    written directly in a shared output array, or in the file of `out` if it
+    is a :class:`numpy.memmap` (see function :func:`parallel._output_array_create`).
+
+    Parameters
+    ----------
+    sim : dict
+        result of the preliminary computation (see function :func:`_grf_simulate`)
+    nproc : int
+        number of processes (see e.g. function :func:`grf1D_mp`)
+    fname : str
+        name of the calling function (for displaying)
+    verbose : int
+        verbose mode
+    out : nd array, optional
+        output array of shape (nreal, ) + `sim['grfShape']` and type
+        `sim['dtype']` (checked with the function :func:`parallel._valid_output_array`);
+        by default (`None`): a new array is returned
+
+    Returns
+    -------
+    grf : nd array
+        GRF realizations, array of shape (nreal, ) + `sim['grfShape']`
+        (`out` if given)
+    """
+    # fname = '_grf_simulate_mp'
+
+    nreal = sim['nreal']
+
+    # Set number of processes (n)
+    n = parallel.get_nproc(nproc)
+
+    # Set index for distributing realizations
+    if nreal < n:
+        n = nreal
+
+    q, r = np.divmod(nreal, n)
+    ids_proc = [i*q + min(i, r) for i in range(n+1)]
+
+    if verbose > 1:
+        print(f'{fname}: running simulation on {n} processes...')
+
+    shm_list = []
+    try:
+        # Shared arrays
+        sim_shared = dict(sim)
+        for key in _grf_shared_keys:
+            if sim.get(key) is not None:
+                sim_shared[key] = parallel._shared_array_create(sim[key], shm_list)
+        if sim.get('rAAcho') is not None:
+            sim_shared['rAAcho'] = (parallel._shared_array_create(sim['rAAcho'][0], shm_list), sim['rAAcho'][1])
+
+        grf_desc = parallel._output_array_create(out, (nreal, ) + sim['grfShape'], sim['dtype'], shm_list)
+
+        # Set pool of n workers
+        pool = parallel.get_pool(n)
+        out_pool = []
+        for i in range(n):
+            # Set i-th process
+            sim_proc = dict(sim_shared)
+            sim_proc['rngs'] = sim['rngs'][ids_proc[i]:ids_proc[i+1]]
+            if sim.get('v_agg') is not None:
+                sim_proc['v_agg'] = sim['v_agg'][ids_proc[i]:ids_proc[i+1]]
+            out_pool.append(pool.apply_async(_grf_simulate_mp_worker,
+                                             args=(sim_proc, grf_desc, ids_proc[i], ids_proc[i+1], fname, verbose*(i==0))))
+
+        # Wait for the tasks and release the pool
+        parallel.release_pool(pool, out_pool)
+
+        # Check each process (an error occurred in a process is raised)
+        for w in out_pool:
+            w.get()
+
+        # Get result
+        grf = parallel._output_array_get(grf_desc, out, shm_list)
+
+    finally:
+        for shm in shm_list:
+            shm.close()
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    return grf
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _grf1D_preliminary(
+        fname,
+        cov_model,
+        dimension, spacing=1.0, origin=0.0,
+        x=None, v=None,
+        aggregate_data_op=None,
+        aggregate_data_op_kwargs=None,
+        mean=None, var=None,
+        nreal=1,
+        extensionMin=None, rangeFactorForExtensionMin=1.0,
+        crop=True,
+        method=3, conditioningMethod=2,
+        conditioningChunkSize=None,
+        measureErrVar=0.0, tolInvKappa=1.e-10,
+        dtype='float64',
+        rng=None,
+        verbose=1):
+    """
+    Preliminary computation for GRF simulations in 1D (see function :func:`grf1D`).
+
+    This function checks the parameters and computes the circulant embedding
+    of the covariance matrix and its DFT; for conditional simulations, the
+    data points are aggregated in the grid cells and the Cholesky decomposition
+    of the covariance matrix of the conditioning locations is computed.
+
+    The parameters are the same as those of the function :func:`grf1D`
+    (`nreal` is assumed to be a positive int), and `fname` is the name of
+    the calling function (for displaying).
+
+    Returns
+    -------
+    sim : dict
+        parameters and arrays used for generating the realizations (see
+        function :func:`_grf_simulate`)
+    """
+    # Floating point type of the output
+    try:
+        dtype = np.dtype(dtype)
+    except Exception as exc:
+        err_msg = f'{fname}: `dtype` invalid'
+        raise GrfError(err_msg) from exc
+
+    if dtype not in (np.float64, np.float32):
+        err_msg = f"{fname}: `dtype` invalid, should be 'float64' or 'float32'"
+        raise GrfError(err_msg)
 
     # Check first argument and get covariance function
     if cov_model.__class__.__name__ == 'function':
@@ -378,13 +724,12 @@ def grf1D(
     if aggregate_data_op is None:
         aggregate_data_op = 'sgs'
 
-    # Number of realization(s)
-    nreal = int(nreal) # cast to int if needed
-
-    if nreal <= 0:
-        if verbose > 0:
-            print(f'{fname}: WARNING: `nreal` <= 0: `None` is returned')
-        return None
+    # Random number generator (stream) for each realization
+    try:
+        rngs = randomStream.rng_streams(rng, nreal)
+    except Exception as exc:
+        err_msg = f'{fname}: `rng` invalid'
+        raise GrfError(err_msg) from exc
 
     if verbose > 1:
         print(f'{fname}: Preliminary computation...')
@@ -403,10 +748,16 @@ def grf1D(
         raise GrfError(err_msg)
 
     if x is not None:
-        if conditioningMethod not in (1, 2):
+        if conditioningMethod not in (1, 2, 3):
             err_msg = f'{fname}: `conditioningMethod` invalid'
             raise GrfError(err_msg)
 
+        if conditioningChunkSize is not None:
+            conditioningChunkSize = int(conditioningChunkSize) # cast to int if needed
+            if conditioningChunkSize <= 0:
+                err_msg = f'{fname}: `conditioningChunkSize` invalid'
+                raise GrfError(err_msg)
+
         if v is None:
             err_msg = f'{fname}: `x` is given (not `None`) but `v` is not given (`None`)'
             raise GrfError(err_msg)
@@ -520,6 +871,7 @@ def grf1D(
                             mean_x=mean_x, mean_xu=mean_x_agg,
                             var_x=var_x, var_xu=var_x_agg,
                             nreal=nreal, seed=None,
+                            rng=None if randomStream.is_legacy(rng) else rngs,
                             verbose=0, **aggregate_data_op_kwargs)
                 except Exception as exc:
                     err_msg = f"{fname}: aggratating data points in grid failed (`aggregate_data_op='{aggregate_data_op}'`)"
@@ -549,9 +901,10 @@ def grf1D(
                 raise GrfError(err_msg)
 
             # next realizations of v_agg
+            # (with independent streams, the first one is also drawn with its own stream)
             v_agg = np.vstack((v_agg, np.zeros((nreal-1, v_agg.size))))
-            for i in range(1, nreal):
-                v_agg[i] = [v[np.random.choice(np.where(i_inv==j)[0])] for j in range(len(xx_agg))]
+            for i in range(int(randomStream.is_legacy(rng)), nreal):
+                v_agg[i] = [v[rngs[i].choice(np.where(i_inv==j)[0])] for j in range(len(xx_agg))]
         else:
             # Aggregate data on grid cell by using the given operation
             xx = x[:, 0]
@@ -650,9 +1003,10 @@ def grf1D(
 
     # Take the square root of the (updated) DFT coefficients
     # ------------------------------------------------------
-    lamSqrt = np.sqrt(lam)
+    lamSqrt = np.sqrt(lam).astype(dtype, copy=False)
+    lam = lam.astype(dtype, copy=False)
 
-    if x is None or conditioningMethod == 1:
+    if x is None or conditioningMethod in (1, 3):
         del(lam)
 
     # For specified variance
@@ -688,20 +1042,27 @@ def grf1D(
         nc = len(xx_agg)
 
         # rAA
-        rAA = np.zeros((nc, nc))
-
         diagEntry = ccirc[0] + measureErrVar
-        for i in range(nc):
-            rAA[i,i] = diagEntry
-            for j in range(i+1, nc):
-                rAA[i,j] = ccirc[np.mod(indc[j]-indc[i], N)]
-                rAA[j,i] = rAA[i,j]
+        rAA = _cov_matrix_cond_from_ccirc(ccirc, (indc,), diagEntry)
 
         # Test if rAA is almost singular...
-        if 1./np.linalg.cond(rAA) < tolInvKappa:
+        # (rAA is symmetric: its condition number is computed from its eigen values)
+        rAAeig = np.abs(np.linalg.eigvalsh(rAA))
+        if np.min(rAAeig) < tolInvKappa * np.max(rAAeig):
             err_msg = f'{fname}: conditioning issue: condition number of matrix rAA is too big'
             raise GrfError(err_msg)
 
+        del(rAAeig)
+
+        # Cholesky decomposition of rAA (used for solving linear systems)
+        try:
+            rAAcho = scipy.linalg.cho_factor(rAA, overwrite_a=True)
+        except np.linalg.LinAlgError as exc:
+            err_msg = f'{fname}: conditioning issue: matrix rAA is not positive definite'
+            raise GrfError(err_msg) from exc
+
+        del(rAA)
+
         # Compute:
         #    indnc: node index of non-conditioning node (nearest node)
         indnc = np.asarray(np.setdiff1d(np.arange(nx), indc), dtype=int)
@@ -715,18 +1076,15 @@ def grf1D(
 
             # Compute the parts rBA of the covariance matrix (see above)
             # rBA
-            rBA = np.zeros((nnc, nc))
-            for j in range(nc):
-                k = np.mod(indc[j] - indnc, N)
-                rBA[:,j] = ccirc[k]
+            rBA = _cov_matrix_from_ccirc(ccirc, (indnc,), (indc,))
 
             if verbose > 1:
                 print(f'{fname}: Computing rBA * rAA^(-1)...')
 
-            # compute rBA * rAA^(-1)
-            rBArAAinv = np.dot(rBA, np.linalg.inv(rAA))
+            # compute rBA * rAA^(-1) = (rAA^(-1) * rAB)^T
+            rBArAAinv = scipy.linalg.cho_solve(rAAcho, rBA.T).T
 
-            del(rAA, rBA)
+            del(rAAcho, rBA)
 
             # If a variance var is specified, then the matrix r should be updated
             # by the following operation:
@@ -748,6 +1106,17 @@ def grf1D(
             indcEmb = indc
             indncEmb = indnc
 
+        elif conditioningMethod == 3:
+            # Method ConditioningC
+            # --------------------
+            # Keep index along each axis for indc and indnc
+            # (to extract chunks of rBA from the circulant embedding)
+            indcAxes = (indc,)
+            indncAxes = (indnc,)
+
+            if conditioningChunkSize is None:
+                conditioningChunkSize = max(2**22 // nc, 1)
+
         if mean is None:
             # Set mean for grf
             mean = np.array([np.mean(v)])
@@ -757,226 +1126,71 @@ def grf1D(
             # Set mean for grf
             mean = np.array([0.0])
 
-    del(ccirc)
-    #### End of preliminary computation ####
+    if x is None or conditioningMethod != 3:
+        del(ccirc)
 
-    # Unconditional simulation
-    # ========================
-    # Method A: Generating one real GRF Z
-    # --------
-    # 1. Generate a real gaussian white noise W ~ N(0,1) on G (1D grid)
-    # 2. Compute Z = Q^(*) D Q * W
-    #    [OR: Z = Q D Q^(*) * W], where
-    #       Q is normalized DFT matrix
-    #       D = diag(lamSqrt)
-    #    i.e:
-    #       Z = DFT^(-1)(D * DFT(W))
-    #       [OR: Z = DFT(D * DFT^(-1)(W))]
-    #
-    # Method B: Generating one real GRF Z
-    # --------
-    # 1. Assuming N=2L even, generate
-    #       V1 = (V1(1),...,V1(L-1)) ~ 1/sqrt(2) N(0, 1)
-    #       V2 = (V2(1),...,V2(L-1)) ~ 1/sqrt(2) N(0, 1)
-    #    and set
-    #       X = (X(0),...,X(N-1)) on G
-    #    with
-    #       X(0) ~ N(0,1)
-    #       X(L) ~ N(0,1)
-    #    and
-    #       X(k) = V1(k) + i V2(k)
-    #       X(N-k) = V1(k) - i V2(k)
-    #    for k = 1,...,L-1
-    # 2. Compute Z = Q^(*) D * X
-    #    [OR: Z = Q D * X], where
-    #       Q is normalized DFT matrix
-    #       D = diag(lamSqrt)
-    #    i.e:
-    #       Z = N^(1/2) * DFT^(-1)(D * X)
-    #       [OR: Z = 1/N^(1/2) * DFT(D * X]
-    #
-    # Method C: Generating two independent real GRFs Z1, Z2
-    # --------
-    # (If nreal is odd, the last realization is generated using method A.)
-    # 1. Generate two independent real gaussian white noises W1,W2 ~ N(0,1) on G (1D grid)
-    #    and let W = W1 + i * W2 (complex value)
-    # 2. Compute Z = Q^(*) D * W
-    #    [OR: Z = Q D * W], where
-    #       Q is normalized DFT matrix
-    #       D = diag(lamSqrt)
-    #    i.e:
-    #       Z = N^(1/2) * DFT^(-1)(D * W)
-    #       [OR: Z = 1/N^(1/2) * DFT(D * W)]
-    #    Then the real and imaginary parts of Z are two independent GRFs
+    # Parameters for the simulation
+    # -----------------------------
     if crop:
         grfNx = nx
     else:
         grfNx = N
 
-    grf = np.zeros((nreal, grfNx))
+    sim = dict(
+        nreal=nreal, dtype=dtype, method=method,
+        shapeEmb=(N,), grfShape=(grfNx,),
+        lamSqrt=lamSqrt, mean=mean, varUpdate=None,
+        conditioningMethod=None, rngs=rngs)
 
-    if method == 1:
-        # Method A
-        # --------
-        for i in range(nreal):
-            if verbose > 2:
-                print(f'{fname}: unconditional simulation {i+1:4d} of {nreal:4d}...')
+    if var is not None:
+        sim['varUpdate'] = varUpdate
 
-            W = np.random.normal(size=N)
+    if x is not None:
+        sim.update(conditioningMethod=conditioningMethod, v_agg=v_agg, indc=indc, indnc=indnc)
+        if conditioningMethod == 1:
+            sim.update(rBArAAinv=rBArAAinv)
+        elif conditioningMethod == 2:
+            sim.update(rAAcho=rAAcho, lam=lam, indcEmb=indcEmb, indncEmb=indncEmb)
+        elif conditioningMethod == 3:
+            sim.update(rAAcho=rAAcho, ccirc=ccirc, indcAxes=indcAxes, indncAxes=indncAxes,
+                       conditioningChunkSize=conditioningChunkSize)
+    #### End of preliminary computation ####
 
-            Z = np.fft.ifft(lamSqrt * np.fft.fft(W))
-            # ...note that Im(Z) = 0
-            grf[i] = np.real(Z[0:grfNx])
+    return sim
+# ----------------------------------------------------------------------------
 
-    elif method == 2:
-        # Method B
-        # --------
-        for i in range(nreal):
-            if verbose > 2:
-                print(f'{fname}: unconditional simulation {i+1:4d} of {nreal:4d}...')
+# ----------------------------------------------------------------------------
+def grf1D(
+        cov_model,
+        dimension, spacing=1.0, origin=0.0,
+        x=None, v=None,
+        aggregate_data_op=None,
+        aggregate_data_op_kwargs=None,
+        mean=None, var=None,
+        nreal=1,
+        extensionMin=None, rangeFactorForExtensionMin=1.0,
+        crop=True,
+        method=3, conditioningMethod=2,
+        conditioningChunkSize=None,
+        measureErrVar=0.0, tolInvKappa=1.e-10,
+        dtype='float64',
+        rng=None,
+        out=None,
+        verbose=1,
+        printInfo=None):
+    """
+    Generates Gaussian Random Fields (GRF) in 1D via Fast Fourier Transform (FFT).
 
-            X1 = np.zeros(N)
-            X2 = np.zeros(N)
+    In brief, the GRFs
 
-            X1[[0,L]] = np.random.normal(size=2)
-            X1[range(1,L)] = 1./np.sqrt(2) * np.random.normal(size=L-1)
-            X1[list(reversed(range(L+1,N)))] = X1[range(1,L)]
+    - are generated using the given covariance model (`cov_model`),
+    - may have a specified mean (`mean`) and variance (`var`), which can be non stationary,
+    - may be conditioned to location(s) `x` with value(s) `v`.
 
-            X2[range(1,L)] = 1./np.sqrt(2) * np.random.normal(size=L-1)
-            X2[list(reversed(range(L+1,N)))] = - X2[range(1,L)]
-
-            X = np.array(X1, dtype=complex)
-            X.imag = X2
-
-            Z = np.sqrt(N) * np.fft.ifft(lamSqrt * X)
-
-            grf[i] = np.real(Z[0:grfNx])
-
-    elif method == 3:
-        # Method C
-        # --------
-        for i in np.arange(0, nreal-1, 2):
-            if verbose > 2:
-                print(f'{fname}: unconditional simulation {i+1:4d}-{i+2:4d} of {nreal:4d}...')
-
-            W = np.array(np.random.normal(size=N), dtype=complex)
-            W.imag = np.random.normal(size=N)
-            Z = np.sqrt(N) * np.fft.ifft(lamSqrt * W)
-            #  Z = 1/sqrt(N) * np.fft.fft(lamSqrt * W)] # see above: [OR:...]
-
-            grf[i] = np.real(Z[0:grfNx])
-            grf[i+1] = np.imag(Z[0:grfNx])
-
-        if np.mod(nreal, 2) == 1:
-            if verbose > 2:
-                print(f'{fname}: unconditional simulation {nreal:4d} of {nreal:4d}...')
-
-            W = np.random.normal(size=N)
-            Z = np.fft.ifft(lamSqrt * np.fft.fft(W))
-
-            grf[nreal-1] = np.real(Z[0:grfNx])
-
-    if var is not None:
-        grf = varUpdate * grf
-
-    grf = mean + grf
-
-    # Conditional simulation
-    # ----------------------
-    # Let
-    #    A: index of conditioning nodes
-    #    B: index of non-conditioning nodes
-    #    Zobs: vector of values at conditioning nodes
-    # and
-    #        +         +
-    #        | rAA rAB |
-    #    r = |         |
-    #        | rBA rBB |
-    #        +         +
-    # the covariance matrix, where index A (resp. B) refers to
-    # conditioning (resp. non-conditioning) index in the grid.
-    #
-    # Then, from an unconditional simulation Z, we retrieve a conditional
-    # simulation ZCond as follows.
-    # Let
-    #    ZCond[A] = Zobs
-    #    ZCond[B] = Z[B] + rBA * rAA^(-1) * (Zobs - Z[A])
-    if x is not None:
-        if conditioningMethod == 1:
-            # Method ConditioningA
-            # --------------------
-            if verbose > 1:
-                print(f'{fname}: updating conditional simulations...')
-
-            # Update all simulations at a time,
-            # use the matrix rBA * rAA^(-1) already computed
-            grf[:,indnc] = grf[:,indnc] + np.transpose(np.dot(rBArAAinv, np.transpose(v_agg - grf[:,indc])))
-            grf[:,indc] = v_agg
-
-        elif conditioningMethod == 2:
-            # Method ConditioningB
-            # --------------------
-            # Update each simulation successively as follows:
-            #    - solve rAA * x = Zobs - z[A]
-            #    - do the multiplication rBA * x via the circulant embedding of the
-            #      covariance matrix (using fft)
-            rAAinvResiduEmb = np.zeros(N)
-
-            for i in range(nreal):
-                if verbose > 2:
-                    print(f'{fname}: updating conditional simulation {i+1:4d} of {nreal:4d}...')
-
-                # Compute residue
-                residu = v_agg[i] - grf[i,indc]
-                # ... update if non-stationary variance is specified
-                if var is not None and var.size > 1:
-                    residu = 1./varUpdate[indc] * residu
-
-                # Compute
-                #    x = rAA^(-1) * residu, and then
-                #    Z = rBA * x via the circulant embedding of the covariance matrix
-                rAAinvResiduEmb[indcEmb] = np.linalg.solve(rAA, residu)
-                Z = np.fft.ifft(lam * np.fft.fft(rAAinvResiduEmb))
-                # ...note that Im(Z) = 0
-                Z = np.real(Z[indncEmb])
-
-                # ... update if non-stationary covariance is specified
-                if var is not None and var.size > 1:
-                    Z = varUpdate[indnc] * Z
-
-                grf[i, indnc] = grf[i, indnc] + Z
-                grf[i, indc] = v_agg[i]
-
-    return grf
-# ----------------------------------------------------------------------------
-
-# ----------------------------------------------------------------------------
-def krige1D(
-        cov_model,
-        dimension, spacing=1.0, origin=0.0,
-        x=None, v=None,
-        aggregate_data_op=None,
-        aggregate_data_op_kwargs=None,
-        mean=None, var=None,
-        extensionMin=None, rangeFactorForExtensionMin=1.0,
-        conditioningMethod=1, # note: set conditioningMethod=2 if unable to allocate memory
-        measureErrVar=0.0, tolInvKappa=1.e-10,
-        computeKrigSD=True,
-        verbose=1,
-        printInfo=None):
-    """
-    Computes kriging estimates and standard deviations in 1D via FFT.
-
-    It is a simple kriging
-
-    - of value(s) `v` at location(s) `x`,
-    - based on the given covariance model (`cov_model`),
-    - it may account for a specified mean (`mean`) and variance (`var`), which can be non stationary.
-
-    Parameters
-    ----------
-    cov_model : :class:`geone.covModel.CovModel1D`, or function (`callable`)
-        covariance model in 1D or directly a function of covariance
+    Parameters
+    ----------
+    cov_model : :class:`geone.covModel.CovModel1D`, or function (`callable`)
+        covariance model in 1D or directly a function of covariance
 
     dimension : int
         `dimension=nx`, number of cells in the 1D simulation grid
@@ -995,25 +1209,32 @@ def krige1D(
         data values at `x` (`v[i]` is the data value at `x[i]`), array of same
         length as `x` (or float if one point)
 
-    aggregate_data_op : str {'krige', 'min', 'max', 'mean', 'quantile', 'most_freq'}, optional
+    aggregate_data_op : str {'sgs', 'krige', 'min', 'max', 'mean', 'quantile', 'most_freq', 'random'}, optional
         operation used to aggregate data points falling in the same grid cells
 
+        - if `aggregate_data_op='sgs'`: function :func:`covModel.sgs` is used \
+        with the covariance model `cov_model` given in arguments
         - if `aggregate_data_op='krige'`: function :func:`covModel.krige` is used \
         with the covariance model `cov_model` given in arguments
         - if `aggregate_data_op='most_freq'`: most frequent value is selected \
         (smallest one if more than one value with the maximal frequence)
+        - if `aggregate_data_op='random'`: value from a random point is selected
         - otherwise: the function `numpy.<aggregate_data_op>` is used with the \
         additional parameters given by `aggregate_data_op_kwargs`, note that, e.g. \
         `aggregate_data_op='quantile'` requires the additional parameter \
         `q=<quantile_to_compute>`
 
-        Note: if `aggregate_data_op='krige'`, then `cov_model` must be a
-        covariance model and not directly the covariance function
+        Note: if `aggregate_data_op='sgs'` or `aggregate_data_op='random'`, the
+        aggregation is done for each realization (simulation), i.e. each simulation
+        on the grid starts with a new set of values in conditioning grid cells;
+        if `aggregate_data_op='sgs'` or `aggregate_data_op='krige'`, then
+        `cov_model` must be a covariance model and not directly the covariance
+        function
 
-        By default (`None`): `aggregate_data_op='krige'` is used
+        By default (`None`): `aggregate_data_op='sgs'` is used
 
     aggregate_data_op_kwargs : dict, optional
-        keyword arguments to be passed to `geone.covModel.krige`,
+        keyword arguments to be passed to `geone.covModel.sgs`,
         `geone.covModel.krige`, or `numpy.<aggregate_data_op>`, according to
         the parameter `aggregate_data_op`
 
@@ -1042,6 +1263,9 @@ def krige1D(
 
         By default (`None`): not used (use of covariance model only)
 
+    nreal : int, default: 1
+        number of realization(s)
+
     extensionMin : int, optional
         minimal extension in cells (see note 1 below)
 
@@ -1057,47 +1281,126 @@ def krige1D(
         an instance of :class:`geone.CovModel.CovModel1D`) and if
         `extensionMin=None` (not used otherwise)
 
-    conditioningMethod : int, default: 1
+    crop : bool, default: True
+        indicates if the extended generated field (simulation) will be cropped to
+        original dimension; note that `crop=False` is not valid with conditioning
+        or non-stationary mean or non-stationary variance
+
+    method : int, default: 3
+        indicates which method is used to generate unconditional simulations;
+        for each method the Discrete Fourier Transform (DFT) "lam" of the
+        circulant embedding of the covariance matrix is used, and periodic and
+        stationary GRFs are generated
+
+        - `method=1` (method A): generate one GRF Z as follows:
+            - generate one real gaussian white noise W
+            - apply fft (or fft inverse) on W to get X
+            - multiply X by "lam" (term by term)
+            - apply fft inverse (or fft) to get Z
+        - `method=2` (method B): generate one GRF Z as follows:
+           - generate directly X (from method A)
+           - multiply X by lam (term by term)
+           - apply fft inverse (or fft) to get Z
+        - `method=3` (method C, default): generate two independent GRFs Z1, Z2 as follows:
+           - generate two independant real gaussian white noises W1, W2 and set \
+           W = W1 + i * W2
+           - apply fft (or fft inverse) on W to get X
+           - multiply X by "lam" (term by term)
+           - apply fft inverse (or fft) to get Z, and set Z1 = Re(Z), Z2 = Im(Z); \
+           note: with a random stream per realization (see `rng`), each \
+           realization is generated from its own stream, as Z1 (Z2 is \
+           discarded); with the global random state of `numpy.random` \
+           (`rng=None`) or a :class:`numpy.random.RandomState`, the \
+           realizations are generated by pairs (Z1, Z2), and if `nreal` is \
+           odd, the last field is generated using method A
+
+    conditioningMethod : int, default: 2
         indicates which method is used to update the simulations to account for
         conditioning data; let
 
         * A: index of conditioning cells
         * B: index of non-conditioning cells
+        * Zobs: vector of values of the unconditional simulation Z at conditioning cells
         * :math:`r = \\left(\\begin{array}{cc} r_{AA} & r_{AB}\\\\r_{BA} & r_{BB}\\end{array}\\right)` \
         the covariance matrix, where index A (resp. B) refers to conditioning \
         (resp. non-conditioning) index in the grid;
 
-        then, thre kriging estimates and kriging variances are
+        an unconditional simulation Z is updated into a conditional simulation ZCond as
+        follows; let
 
-        * krig[B]    = mean + rBA * rAA^(-1) * (v - mean)
-        * krigVar[B] = diag(rBB - rBA * rAA^(-1) * rAB)
+        * ZCond[A] = Zobs
+        * ZCond[B] = Z[B] + rBA * rAA^(-1) * (Zobs - Z[A])
 
-        and the computation is done according to `conditioningMethod`:
+        i.e. the update consists in adding the kriging estimates of the residues
+        to an unconditional simulation
 
-        * `conditioningMethod=1` (method CondtioningA, default): the matrices \
-        rBA, RAA^(-1) are explicitly computed (warning: could require large \
-        amount of memory)
-        * `conditioningMethod=2` (method CondtioningB): for kriging estimates, \
-        the linear system rAA * y = (v - mean) is solved, and then mean + rBA*y is \
-        computed; for kriging variances, for each column u[j] of rAB, the linear \
-        system rAA * y = u[j] is solved, and then rBB[j,j] - y^t*y is computed
+        * `conditioningMethod=1` (method CondtioningA): the matrix M = rBA * rAA^(-1) \
+        is explicitly computed (warning: could require large amount of memory), \
+        then all the simulations are updated by a sum and a multiplication by the \
+        matrix M
+        * `conditioningMethod=2` (method CondtioningB, default): for each simulation, \
+        the linear system rAA * x = Zobs - Z[A] is solved and then, the multiplication \
+        by rBA is done via fft
+        * `conditioningMethod=3` (method CondtioningC): the linear systems \
+        rAA * x = Zobs - Z[A] are solved for each simulation, and then, \
+        the multiplication by rBA is done by chunks of non-conditioning cells, \
+        the corresponding rows of rBA being extracted from the circulant \
+        embedding of the covariance matrix (the matrix rBA is never stored \
+        entirely, and no fft is needed)
 
-        Note: set `conditioningMethod=2` if unable to allocate memory
+        In every case, the matrix rAA is never inverted explicitly: its
+        Cholesky decomposition is computed once and used for solving the
+        linear systems.
+
+        Note: parameter `conditioningMethod` is used only for conditional simulation
+
+    conditioningChunkSize : int, optional
+        number of non-conditioning cells updated at once with
+        `conditioningMethod=3`, i.e. number of rows of the chunks of rBA;
+        by default (`None`): set such that each chunk of rBA has about
+        2^22 entries;
+        note: parameter `conditioningChunkSize` is used only for conditional
+        simulation with `conditioningMethod=3`
 
     measureErrVar : float, default: 0.0
         measurement error variance; the error on conditioning data is assumed to
         follow the distrubution N(0, `measureErrVar` * I); i.e.
         rAA + `measureErrVar` * I is considered instead of rAA for stabilizing the
-        linear system for this matrix
+        linear system for this matrix;
+        note: parameter `measureErrVar` is used only for conditional simulation
 
     tolInvKappa : float, default: 1.e-10
-        the computation is stopped if the inverse of the condition number of rAA
-        is above `tolInvKappa`
+        the simulation is stopped if the inverse of the condition number of rAA
+        is above `tolInvKappa`;
+        note: parameter `tolInvKappa` is used only for conditional simulation
 
-    computeKrigSD : bool, default: True
-        indicates if the kriging standard deviations are computed
+    dtype : str or numpy.dtype {'float64', 'float32'}, default: 'float64'
+        floating point type of the output GRFs; the FFTs (generation of the
+        unconditional fields and update accounting for conditioning data) are
+        computed with the corresponding precision (single precision FFTs are
+        computed with `scipy.fft`), whereas the linear algebra involving the
+        covariance matrix rAA of the conditioning locations is always done in
+        double precision (float64)
+
+    rng : int, or :class:`numpy.random.SeedSequence`, or :class:`numpy.random.Generator`, or sequence, optional
+        random number generator specification (see module :mod:`randomStream`);
+        by default (`None`): the global random state of `numpy.random` is used;
+        otherwise, independent streams are spawned from `rng`, one per
+        realization (the i-th stream depends only on `rng` and i), and the
+        i-th realization is generated with the i-th stream only (whatever
+        `method`), hence it does not depend on `nreal`; passing a slice
+        `spawn_seed_sequences(rng, nreal)[i0:i1]` (see function
+        :func:`randomStream.spawn_seed_sequences`) as `rng` (with
+        `nreal=i1-i0`) gives the realizations i0, ..., i1-1 of the whole set
+
+    out : nd array, optional
+        C-contiguous array of shape (nreal, ) + shape of the output (see below)
+        and of type `dtype`, in which the realizations are written (and which
+        is returned), e.g. a :class:`numpy.memmap` for writing the realizations
+        directly in a file (without holding them in memory);
+        by default (`None`): a new array is allocated
 
-    verbose : int, default: 2
+    verbose : int, default: 1
         verbose mode, higher implies more printing (info):
 
         - 0: no display
@@ -1116,14 +1419,10 @@ def krige1D(
 
     Returns
     -------
-    krig : 1D array of shape (nx,)
-        kriging estimates, with nx (= dimension);
-        `krig[j]`: value at grid cell of index j
-
-    krigSD : 1D array of shape (nx,), optional
-        kriging standard deviations, with nx (= dimension);
-        `krigSD[j]`: value at grid cell of index j;
-        returned if `computeKrigSD=True`
+    grf : 2D array of shape (`nreal`, n1)
+        GRF realizations, with n1 = nx (= dimension) if `crop=True`, but
+        n1 >= nx if `crop=False`;
+        `grf[i, j]`: value of the i-th realisation at grid cell of index j
 
     Notes
     -----
@@ -1152,7 +1451,8 @@ def krige1D(
 
     2. For large data set:
 
-    - `conditioningMethod` should be set to 2 for using FFT
+    - `conditioningMethod` should be set to 2 (using FFT) or 3 (by chunks), \
+    the whole matrix rBA being not stored in these cases
 
     - `measureErrVar` can be set to a small positive value to stabilize the \
     covariance matrix for conditioning locations (solving linear system).
@@ -1191,7 +1491,7 @@ def krige1D(
 
         `numpy.fft.ifft()` = DFT^(-1)()
     """
-    fname = 'krige1D'
+    fname = 'grf1D'
 
     # Set verbose mode according to printInfo (if given)
     if printInfo is not None:
@@ -1200,727 +1500,418 @@ def krige1D(
         else:
             verbose = 1
 
-    # Check third argument and get covariance function
-    if cov_model.__class__.__name__ == 'function':
-        # covariance function is given
-        cov_func = cov_model
-        cov_range = None # unknown range
-    elif isinstance(cov_model, gcm.CovModel1D):
-        # Prevent calculation if covariance model is not stationary
-        if not cov_model.is_stationary():
-            err_msg = f'{fname}: `cov_model` is not stationary: {fname} cannot be applied (use `geone.geosclassicinterface` package)'
-            raise GrfError(err_msg)
+    # Number of realization(s)
+    nreal = int(nreal) # cast to int if needed
 
-        cov_func = cov_model.func() # covariance function
-        cov_range = cov_model.r()
+    if nreal <= 0:
+        if verbose > 0:
+            print(f'{fname}: WARNING: `nreal` <= 0: `None` is returned')
+        return None
+
+    # Preliminary computation
+    sim = _grf1D_preliminary(
+            fname, cov_model, dimension, spacing, origin, x, v,
+            aggregate_data_op, aggregate_data_op_kwargs, mean, var, nreal,
+            extensionMin, rangeFactorForExtensionMin, crop, method,
+            conditioningMethod, conditioningChunkSize, measureErrVar,
+            tolInvKappa, dtype, rng, verbose)
+
+    # Generate the realizations
+    if out is None:
+        grf = np.zeros((nreal, ) + sim['grfShape'], dtype=sim['dtype'])
+    elif parallel._valid_output_array(out, (nreal, ) + sim['grfShape'], sim['dtype']):
+        grf = out
     else:
-        err_msg = f'{fname}: `cov_model` invalid'
+        err_msg = f'{fname}: `out` invalid (shape or type not valid, or not C-contiguous)'
         raise GrfError(err_msg)
 
-    # aggregate_data_op (default)
-    if aggregate_data_op is None:
-        aggregate_data_op = 'krige'
+    _grf_simulate(grf, sim, 0, fname, verbose)
 
-    nx = dimension
-    sx = spacing
-    ox = origin
+    return grf
+# ----------------------------------------------------------------------------
 
-    if x is None and v is not None:
-        err_msg = f'{fname}: `x` is not given (`None`) but `v` is given (not `None`)'
-        raise GrfError(err_msg)
+# ----------------------------------------------------------------------------
+def grf1D_mp(
+        cov_model,
+        dimension, spacing=1.0, origin=0.0,
+        x=None, v=None,
+        aggregate_data_op=None,
+        aggregate_data_op_kwargs=None,
+        mean=None, var=None,
+        nreal=1,
+        extensionMin=None, rangeFactorForExtensionMin=1.0,
+        crop=True,
+        method=3, conditioningMethod=2,
+        conditioningChunkSize=None,
+        measureErrVar=0.0, tolInvKappa=1.e-10,
+        dtype='float64',
+        rng=None,
+        out=None,
+        verbose=1,
+        printInfo=None,
+        nproc=-1):
+    """
+    Computes the same as the function :func:`grf.grf1D`, using multiprocessing.
+
+    All the parameters except `nproc` are the same as those of the function
+    :func:`grf.grf1D`.
+
+    The number of processes used (in parallel) is n, and determined by the
+    parameter `nproc` (int, optional) as follows:
+
+    - if `nproc > 0`: n = `nproc`,
+    - if `nproc <= 0`: n = max(nmax+`nproc`, 1), where nmax is the total \
+    number of cpu(s) of the system (retrieved by :func:`config.cpu_count`), \
+    i.e. all cpus except `-nproc` is used (but at least one)
+
+    The preliminary computation (circulant embedding of the covariance matrix
+    and its DFT, treatment of the conditioning data, Cholesky decomposition of
+    the covariance matrix of the conditioning locations) is done once; the
+    resulting arrays are put in shared memory and used (read only) by n
+    parallel processes. The set of realizations (specified by `nreal`) is
+    distributed in a balanced way over the processes, each process writing
+    its realizations directly in a shared output array (copied in the returned
+    array), or in the file of `out` if it is a :class:`numpy.memmap` (opened
+    in mode 'r+' or 'w+').
+
+    Note that, if `nreal` < n, then n is reduced to `nreal`.
+
+    Each realization is generated with its own stream (see parameter `rng`),
+    hence the result is the same as the one of the function :func:`grf.grf1D`
+    with the same `rng`, whatever the number of processes; if `rng` is `None`
+    (default) or a :class:`numpy.random.RandomState`, a seed is first drawn from
+    it (see function :func:`randomStream.seed_from_rng`) and used as `rng`.
+
+    See function :func:`grf.grf1D` for details.
+    """
+    fname = 'grf1D_mp'
 
-    if x is not None:
-        if conditioningMethod not in (1, 2):
-            err_msg = f'{fname}: `conditioningMethod` invalid'
-            raise GrfError(err_msg)
+    # Set verbose mode according to printInfo (if given)
+    if printInfo is not None:
+        if printInfo:
+            verbose = 3
+        else:
+            verbose = 1
 
-        if v is None:
-            err_msg = f'{fname}: `x` is given (not `None`) but `v` is not given (`None`)'
-            raise GrfError(err_msg)
+    # Number of realization(s)
+    nreal = int(nreal) # cast to int if needed
 
-        x = np.asarray(x, dtype='float').reshape(-1, 1) # cast in 2-dimensional array if needed
-        v = np.asarray(v, dtype='float').reshape(-1) # cast in 1-dimensional array if needed
-        if len(v) != x.shape[0]:
-            err_msg = f'{fname}: length of `v` is not valid'
-            raise GrfError(err_msg)
+    if nreal <= 0:
+        if verbose > 0:
+            print(f'{fname}: WARNING: `nreal` <= 0: `None` is returned')
+        return None
 
-    mean_x = mean
-    if mean is not None:
-        if callable(mean):
-            if x is not None:
-                mean_x = mean(x[:, 0])
-            xi = ox + sx*(0.5+np.arange(nx)) # x-coordinate of cell center
-            mean = mean(xi) # replace function 'mean' by its evaluation on the grid
-        else:
-            mean = np.asarray(mean, dtype='float').reshape(-1) # cast in 1-dimensional array if needed
-            if mean.size == 1:
-                if x is not None:
-                    mean_x = mean
-            elif mean.size == nx:
-                # mean = mean.reshape(nx)
-                if x is not None:
-                    mean_x = img.Img_interp_func(img.Img(nx, 1, 1, sx, 1., 1., ox, 0., 0., nv=1, val=mean), iy=0, iz=0)(x)
-            else:
-                err_msg = f'{fname}: size of `mean` is not valid'
-                raise GrfError(err_msg)
+    # Random number generator: the streams of the realizations are spawned
+    # (legacy random state cannot be shared between processes)
+    if randomStream.is_legacy(rng):
+        rng = randomStream.seed_from_rng(rng)
+
+    # Preliminary computation
+    sim = _grf1D_preliminary(
+            fname, cov_model, dimension, spacing, origin, x, v,
+            aggregate_data_op, aggregate_data_op_kwargs, mean, var, nreal,
+            extensionMin, rangeFactorForExtensionMin, crop, method,
+            conditioningMethod, conditioningChunkSize, measureErrVar,
+            tolInvKappa, dtype, rng, verbose)
+
+    # Generate the realizations
+    if out is not None and not parallel._valid_output_array(out, (nreal, ) + sim['grfShape'], sim['dtype']):
+        err_msg = f'{fname}: `out` invalid (shape or type not valid, or not C-contiguous)'
+        raise GrfError(err_msg)
 
-    var_x = var
-    if var is not None:
-        if callable(var):
-            if x is not None:
-                var_x = var(x[:, 0])
-            xi = ox + sx*(0.5+np.arange(nx)) # x-coordinate of cell center
-            var = var(xi) # replace function 'var' by its evaluation on the grid
-        else:
-            var = np.asarray(var, dtype='float').reshape(-1) # cast in 1-dimensional array if needed
-            if var.size == 1:
-                if x is not None:
-                    var_x = var
-            elif var.size == nx:
-                # var = var.reshape(nx)
-                if x is not None:
-                    var_x = img.Img_interp_func(img.Img(nx, 1, 1, sx, 1., 1., ox, 0., 0., nv=1, val=var), iy=0, iz=0)(x)
-            else:
-                err_msg = f'{fname}: size of `var` is not valid'
-                raise GrfError(err_msg)
+    grf = _grf_simulate_mp(sim, nproc, fname, verbose, out=out)
 
-    if x is None:
-        # No data: kriging return the mean and the standard deviation...
-        krig = np.zeros(nx)
-        if mean is not None:
-            krig[...] = mean
-        if computeKrigSD:
-            krigSD = np.zeros(nx)
-            if var is not None:
-                krigSD[...] = np.sqrt(var)
-            else:
-                krigSD[...] = np.sqrt(cov_func(0.))
-            return krig, krigSD
-        else:
-            return krig
+    return grf
+# ----------------------------------------------------------------------------
 
-    if aggregate_data_op_kwargs is None:
-        aggregate_data_op_kwargs = {}
+# ----------------------------------------------------------------------------
+def krige1D(
+        cov_model,
+        dimension, spacing=1.0, origin=0.0,
+        x=None, v=None,
+        aggregate_data_op=None,
+        aggregate_data_op_kwargs=None,
+        mean=None, var=None,
+        extensionMin=None, rangeFactorForExtensionMin=1.0,
+        conditioningMethod=1, # note: set conditioningMethod=2 if unable to allocate memory
+        measureErrVar=0.0, tolInvKappa=1.e-10,
+        computeKrigSD=True,
+        block_size=None,
+        dtype='float64',
+        verbose=1,
+        printInfo=None):
+    """
+    Computes kriging estimates and standard deviations in 1D via FFT.
 
-    if aggregate_data_op == 'krige':
-        if cov_range is None:
-            # cov_model is directly the covariance function
-            err_msg = f"{fname}: `cov_model` must be a model (not directly a function) when `aggregate_data_op='{aggregate_data_op}'` is used"
-            raise GrfError(err_msg)
+    It is a simple kriging
 
-        # Get grid cell with at least one data point:
-        # x_agg: 2D array, each row contains the coordinates of the center of such cell
-        try:
-            im_tmp = img.imageFromPoints(
-                    x, values=None, varname=None,
-                    nx=nx, sx=sx, ox=ox,
-                    indicator_var=True, count_var=False)
-        except Exception as exc:
-            err_msg = f'{fname}: cannot set image from points'
-            raise GrfError(err_msg) from exc
+    - of value(s) `v` at location(s) `x`,
+    - based on the given covariance model (`cov_model`),
+    - it may account for a specified mean (`mean`) and variance (`var`), which can be non stationary.
 
-        ind_agg = np.where(im_tmp.val[0])
-        if len(ind_agg[0]) == 0:
-            err_msg = f'{fname}: no data point in grid'
-            raise GrfError(err_msg)
+    Parameters
+    ----------
+    cov_model : :class:`geone.covModel.CovModel1D`, or function (`callable`)
+        covariance model in 1D or directly a function of covariance
 
-        x_agg = im_tmp.xx()[ind_agg].reshape(-1, 1)
-        # x_agg = im_tmp.xx()[*ind_agg].reshape(-1, 1)
-        ind_agg = ind_agg[2:] # remove index along z and y axes
-        del(im_tmp)
-        # Compute
-        # - kriging estimate (v_agg) and kriging std (v_agg_std) at x_agg,
-        # - or nreal simulation(s) (v_agg) at x_agg
-        if mean is not None and mean.size > 1:
-            mean_x_agg = mean[ind_agg]
-            # mean_x_agg = mean[*ind_agg]
-        else:
-            mean_x_agg = mean
-        if var is not None and var.size > 1:
-            var_x_agg = var[ind_agg]
-            # var_x_agg = var[*ind_agg]
-        else:
-            var_x_agg = var
-        try:
-            v_agg, v_agg_std = gcm.krige(
-                    x, v, x_agg, cov_model, method='simple_kriging',
-                    mean_x=mean_x, mean_xu=mean_x_agg,
-                    var_x=var_x, var_xu=var_x_agg,
-                    verbose=0, **aggregate_data_op_kwargs)
-        except Exception as exc:
-            err_msg = f"{fname}: aggratating data points in grid failed (`aggregate_data_op='{aggregate_data_op}'`)"
-            raise GrfError(err_msg) from exc
+    dimension : int
+        `dimension=nx`, number of cells in the 1D simulation grid
 
-        xx_agg = x_agg[:, 0]
-        # yy_agg = 0.5*np.ones_like(xx_agg)
-        # zz_agg = 0.5*np.ones_like(xx_agg)
-    else:
-        # Aggregate data on grid cell by using the given operation
-        xx = x[:, 0]
-        yy = 0.5*np.ones_like(xx)
-        zz = 0.5*np.ones_like(xx)
-        try:
-            xx_agg, yy_agg, zz_agg, v_agg = img.aggregateDataPointsWrtGrid(
-                    xx, yy, zz, v,
-                    nx, 1, 1, sx, 1.0, 1.0, ox, 0.0, 0.0,
-                    op=aggregate_data_op, **aggregate_data_op_kwargs)
-        except Exception as exc:
-            err_msg = f"{fname}: aggratating data points in grid failed (`aggregate_data_op='{aggregate_data_op}'`)"
-            raise GrfError(err_msg) from exc
+    spacing : float, default: 1.0
+        `spacing=sx`, cell size
 
-        if len(xx_agg) == 0:
-            err_msg = f'{fname}: no data point in grid'
-            raise GrfError(err_msg)
+    origin : float, default: 0.0
+        `origin=ox`, origin of the 1D simulation grid (left border)
 
-    if extensionMin is None:
-        # default extensionMin
-        if cov_range is not None: # known range
-            # ... based on range of covariance model
-            extensionMin = extension_min(rangeFactorForExtensionMin*cov_range, nx, s=sx)
-        else:
-            # ... based on dimension
-            extensionMin = dimension - 1
+    x : 1D array-like of floats, optional
+        data points locations (float coordinates); note: if one point, a float
+        is accepted
 
-    Nmin = nx + extensionMin
+    v : 1D array-like of floats, or 2D array-like of floats, optional
+        data values at `x` (`v[i]` is the data value at `x[i]`), array of same
+        length as `x` (or float if one point); several data sets sharing the
+        same locations `x` can be given as a 2D array of shape (ndataset, n),
+        `v[k, i]` being the value at `x[i]` of the k-th data set: then, the
+        embedding, the decomposition of the covariance matrix of the
+        conditioning locations and the kriging standard deviations are computed
+        once, and the kriging estimates of all data sets are computed together
 
-    if verbose > 1:
-        print(f'{fname}: Computing circulant embedding...')
+    aggregate_data_op : str {'krige', 'min', 'max', 'mean', 'quantile', 'most_freq'}, optional
+        operation used to aggregate data points falling in the same grid cells
 
-    # Circulant embedding of the covariance matrix
-    # --------------------------------------------
-    # The embedding matrix is a circulant matrix of size N x N, computed from
-    # the covariance function.
-    # To take a maximal benefit of Fast Fourier Transform (FFT) for computing DFT,
-    # we choose
-    #    N = 2^g (a power of 2), with N >= Nmin, N >= 2
-    g = int(max(np.ceil(np.log2(Nmin)), 1.0))
-    N = int(2**g)
+        - if `aggregate_data_op='krige'`: function :func:`covModel.krige` is used \
+        with the covariance model `cov_model` given in arguments
+        - if `aggregate_data_op='most_freq'`: most frequent value is selected \
+        (smallest one if more than one value with the maximal frequence)
+        - otherwise: the function `numpy.<aggregate_data_op>` is used with the \
+        additional parameters given by `aggregate_data_op_kwargs`, note that, e.g. \
+        `aggregate_data_op='quantile'` requires the additional parameter \
+        `q=<quantile_to_compute>`
 
-    if verbose > 1:
-        print(f'{fname}: embedding dimension: {N}')
+        Note: if `aggregate_data_op='krige'`, then `cov_model` must be a
+        covariance model and not directly the covariance function
 
-    # ccirc: coefficient of the embedding matrix (first line), vector of size N
-    L = int (N/2)
-    h = np.arange(-L, L, dtype=float) * sx # [-L ... 0 ... L-1] * sx
-    ccirc = cov_func(h)
+        By default (`None`): `aggregate_data_op='krige'` is used
 
-    del(h)
+    aggregate_data_op_kwargs : dict, optional
+        keyword arguments to be passed to `geone.covModel.krige`,
+        `geone.covModel.krige`, or `numpy.<aggregate_data_op>`, according to
+        the parameter `aggregate_data_op`
 
-    # ...shift first L index to the end of the axis, i.e.:
-    #    [-L ... 0 ... L-1] -> [0 ... L-1 -L ... -1]
-    ind = np.arange(L)
-    ccirc = ccirc[np.hstack((ind+L, ind))]
+    mean : function (`callable`), or array-like of floats, or float, optional
+        kriging mean value:
 
-    del(ind)
+        - if a function: function of one argument (xi) that returns the mean at \
+        location xi
+        - if array-like: its size must be equal to the number of grid cells \
+        (the array is reshaped if needed), mean values at grid cells (for \
+        non-stationary mean)
+        - if a float: same mean value at every grid cell
 
-    if verbose > 1:
-        print(f'{fname}: Computing FFT of circulant matrix...')
+        By default (`None`): the mean of data value (`v`) (0.0 if no data) is
+        considered at every grid cell
 
-    # Compute the Discrete Fourier Transform (DFT) of ccric, via FFT
-    # --------------------------------------------------------------
-    # The DFT coefficients
-    #   lam = DFT(ccirc) = (lam(0),lam(1),...,lam(N-1))
-    # are the eigen values of the embedding matrix.
-    # We have:
-    #   a) lam are real coefficients, because the embedding matrix is symmetric
-    #   b) lam(k) = lam(N-k), k=1,...,N-1, because the coefficients ccirc are real
-    lam = np.real(np.fft.fft(ccirc))
-    # ...note that the imaginary parts are equal to 0
+    var : function (`callable`), or array-like of floats, or float, optional
+        kriging variance value:
 
-    # -------------------------------------
-    # If some DFT coefficients are negative, then set them to zero
-    # and update them to fit the marginals distribution (approximate embedding)
-    if np.min(lam) < 0:
-        lam = np.sum(lam)/np.sum(np.maximum(lam, 0.)) * np.maximum(lam, 0.)
+        - if a function: function of one argument (xi) that returns the variance \
+        at location xi
+        - if array-like: its size must be equal to the number of grid cells \
+        (the array is reshaped if needed), variance values at grid cells (for \
+        non-stationary variance)
+        - if a float: same variance value at every grid cell
 
-    # Take the square root of the (updated) DFT coefficients
-    # ------------------------------------------------------
-    lamSqrt = np.sqrt(lam)
+        By default (`None`): not used (use of covariance model only)
 
-    # For specified variance
-    # ----------------------
-    # Compute updating factor
-    if var is not None:
-        varUpdate = np.sqrt(var/cov_func(0.))
+    extensionMin : int, optional
+        minimal extension in cells (see note 1 below)
 
-    # Kriging
-    # -------
-    # Let
-    #    A: index of conditioning nodes
-    #    B: index of non-conditioning nodes
-    #    Zobs: vector of values at conditioning nodes
-    # and
-    #        +         +
-    #        | rAA rAB |
-    #    r = |         |
-    #        | rBA rBB |
-    #        +         +
-    # the covariance matrix, where index A (resp. B) refers to
-    # conditioning (resp. non-conditioning) index in the grid.
-    #
-    # Then, the kriging estimates are
-    #     mean + rBA * rAA^(-1) * (v - mean)
-    # and the kriging standard deviation
-    #    diag(rBB - rBA * rAA^(-1) * rAB)
+        By default (`None`): minimal extension is automatically computed:
 
-    # Compute the part rAA of the covariance matrix
-    # Note: if a variance var is specified, then the matrix r should be updated
-    # by the following operation:
-    #    diag((var/cov_func(0))^1/2) * r * diag((var/cov_func(0))^1/2)
-    # which is accounting in the computation of kriging estimates and standard
-    # deviation below
+        - based on the range of the covariance model, if `cov_model` is given as \
+        an instance of :class:`geone.CovModel.CovModel1D`)
+        - set to `nx-1`, if `cov_model` is given as a function (`callable`)
 
-    if verbose > 1:
-        print(f'{fname}: Computing covariance matrix (rAA) for conditioning locations...')
+    rangeFactorForExtensionMin : float, default: 1.0
+        factor by which the range of the covariance model is multiplied before
+        computing the default minimal extension, if `cov_model` is given as
+        an instance of :class:`geone.CovModel.CovModel1D`) and if
+        `extensionMin=None` (not used otherwise)
 
-    # Compute
-    #    indc: node index of conditioning node,
-    #          rounded to lower index if between two grid node and index is positive
-    indc_f = (xx_agg-origin)/spacing
-    indc = indc_f.astype(int)
-    indc = indc - 1 * np.all((indc == indc_f, indc > 0), axis=0)
+    conditioningMethod : int, default: 1
+        indicates which method is used to update the simulations to account for
+        conditioning data; let
 
-    nc = len(xx_agg)
+        * A: index of conditioning cells
+        * B: index of non-conditioning cells
+        * :math:`r = \\left(\\begin{array}{cc} r_{AA} & r_{AB}\\\\r_{BA} & r_{BB}\\end{array}\\right)` \
+        the covariance matrix, where index A (resp. B) refers to conditioning \
+        (resp. non-conditioning) index in the grid;
 
-    # rAA
-    rAA = np.zeros((nc, nc))
+        then, thre kriging estimates and kriging variances are
 
-    diagEntry = ccirc[0] + measureErrVar
-    for i in range(nc):
-        rAA[i,i] = diagEntry
-        for j in range(i+1, nc):
-            rAA[i,j] = ccirc[np.mod(indc[j]-indc[i], N)]
-            rAA[j,i] = rAA[i,j]
+        * krig[B]    = mean + rBA * rAA^(-1) * (v - mean)
+        * krigVar[B] = diag(rBB - rBA * rAA^(-1) * rAB)
 
-    # Test if rAA is almost singular...
-    if 1./np.linalg.cond(rAA) < tolInvKappa:
-        err_msg = f'{fname}: conditioning issue: condition number of matrix rAA is too big'
-        raise GrfError(err_msg)
+        and the computation is done according to `conditioningMethod`:
 
-    # Compute:
-    #    indnc: node index of non-conditioning node (nearest node)
-    indnc = np.asarray(np.setdiff1d(np.arange(nx), indc), dtype=int)
-    nnc = len(indnc)
+        * `conditioningMethod=1` (method CondtioningA, default): the matrices \
+        rBA, RAA^(-1) are explicitly computed (warning: could require large \
+        amount of memory)
+        * `conditioningMethod=2` (method CondtioningB): for kriging estimates, \
+        the linear system rAA * y = (v - mean) is solved, and then mean + rBA*y is \
+        computed (via FFT); for kriging variances, the columns of rAB are \
+        extracted by blocks (see `block_size`) and rBB[j,j] - y[j]^t*y[j] is \
+        computed, where y[j] solves C^t * y[j] = rAB[:,j], with rAA = C^t * C \
+        the Cholesky decomposition of rAA
 
-    if mean is None:
-        # Set mean for kriging
-        mean = np.array([np.mean(v)])
+        In every case, the matrix rAA is never inverted explicitly: its
+        Cholesky decomposition is computed once and used for solving the
+        linear systems.
 
-    # Initialize
-    krig = np.zeros(nx)
-    if computeKrigSD:
-        krigSD = np.zeros(nx)
+        Note: set `conditioningMethod=2` if unable to allocate memory
 
-    if mean.size == 1:
-        v_agg = v_agg - mean
-    else:
-        v_agg = v_agg - mean[indc]
+    measureErrVar : float, default: 0.0
+        measurement error variance; the error on conditioning data is assumed to
+        follow the distrubution N(0, `measureErrVar` * I); i.e.
+        rAA + `measureErrVar` * I is considered instead of rAA for stabilizing the
+        linear system for this matrix
 
-    if var is not None and var.size > 1:
-        v_agg = 1./varUpdate[indc] * v_agg
+    tolInvKappa : float, default: 1.e-10
+        the computation is stopped if the inverse of the condition number of rAA
+        is above `tolInvKappa`
 
-    if conditioningMethod == 1:
-        # Method ConditioningA
-        # --------------------
-        if verbose > 1:
-            print(f'{fname}: Computing covariance matrix (rBA) for non-conditioning / conditioning locations...')
+    computeKrigSD : bool, default: True
+        indicates if the kriging standard deviations are computed
 
-        # Compute the parts rBA of the covariance matrix (see above)
-        # rBA
-        rBA = np.zeros((nnc, nc))
-        for j in range(nc):
-            k = np.mod(indc[j] - indnc, N)
-            rBA[:,j] = ccirc[k]
+    block_size : int, optional
+        number of non-conditioning cells for which the kriging standard
+        deviation is computed at once with `conditioningMethod=2`, i.e. number
+        of columns of the blocks of rAB (the memory used is proportional to
+        `block_size` times the number of conditioning cells); by default
+        (`None`): set such that each block of rAB has about 2^22 entries;
+        note: parameter `block_size` is used only with `conditioningMethod=2`
+        and `computeKrigSD=True`
+
+    dtype : str or numpy.dtype {'float64', 'float32'}, default: 'float64'
+        floating point type of the output arrays (kriging estimates and
+        standard deviations); the FFTs are computed with the corresponding
+        precision (single precision FFTs are computed with `scipy.fft`),
+        whereas the linear algebra involving the covariance matrix rAA of the
+        conditioning locations is always done in double precision (float64)
 
-        del(ccirc)
+    verbose : int, default: 2
+        verbose mode, higher implies more printing (info):
 
-        if verbose > 1:
-            print(f'{fname}: Computing rBA * rAA^(-1)...')
+        - 0: no display
+        - 1: warnings
+        - 2: warnings + basic info
+        - 3 (or >2): all information
 
-        # compute rBA * rAA^(-1)
-        rBArAAinv = np.dot(rBA, np.linalg.inv(rAA))
+        note that if an error occurred, it is raised
 
-        del(rAA)
-        if not computeKrigSD:
-            del(rBA)
+    printInfo : bool, optional
+        deprecated, use `verbose` instead;
 
-        # Compute kriging estimates
-        if verbose > 1:
-            print(f'{fname}: computing kriging estimates...')
+        - if `printInfo=False`, `verbose` is set to 1 (overwritten)
+        - if `printInfo=True`, `verbose` is set to 3 (overwritten)
+        - if `printInfo=None` (default): not used
 
-        krig[indnc] = np.dot(rBArAAinv, v_agg)
-        krig[indc] = v_agg
+    Returns
+    -------
+    krig : 1D array of shape (nx,), or 2D array of shape (ndataset, nx)
+        kriging estimates, with nx (= dimension);
+        `krig[j]`: value at grid cell of index j;
+        if `v` is given as a 2D array (several data sets): `krig[k, j]`: value
+        at grid cell of index j, for the k-th data set
 
-        if computeKrigSD:
-            # Compute kriging standard deviation
-            if verbose > 1:
-                print(f'{fname}: computing kriging standard deviation ...')
+    krigSD : 1D array of shape (nx,), optional
+        kriging standard deviations, with nx (= dimension);
+        `krigSD[j]`: value at grid cell of index j;
+        returned if `computeKrigSD=True`
 
-            for j in range(nnc):
-                krigSD[indnc[j]] = np.dot(rBArAAinv[j,:], rBA[j,:])
-            krigSD[indnc] = np.sqrt(np.maximum(diagEntry - krigSD[indnc], 0.))
+    Notes
+    -----
+    1. For reproducing covariance model, the dimension of GRF should be large
+    enough; let K an integer such that K*`spacing` is greater or equal to the
+    correlation range, then:
 
-            del(rBA)
+    - correlation accross opposite border should be removed by extending \
+    the domain sufficiently, i.e.
 
-    elif conditioningMethod == 2:
-        # Method ConditioningB
-        # --------------------
-        if not computeKrigSD:
-            del(ccirc)
+        `extensionMin` >= K - 1
 
-        if verbose > 1:
-            print(f'{fname}: Computing index in the embedding grid for non-conditioning / conditioning locations...')
+    - two cells could not be correlated simultaneously regarding both \
+    distances between them (with respect to the periodic grid), i.e. one \
+    should have
 
-        # Compute index in the embedding grid for indc and indnc
-        # (to allow use of fft)
-        indcEmb = indc
-        indncEmb = indnc
+        `dimension+extensionMin` >= 2*K - 1.
 
-        # Compute kriging estimates
-        if verbose > 1:
-            print(f'{fname}: computing kriging estimates...')
+    To sum up, `extensionMin` should be chosen such that
 
-        # Compute
-        #    u = rAA^(-1) * v_agg, and then
-        #    Z = rBA * u via the circulant embedding of the covariance matrix
-        uEmb = np.zeros(N)
-        uEmb[indcEmb] = np.linalg.solve(rAA, v_agg)
-        Z = np.fft.ifft(lam * np.fft.fft(uEmb))
-        # ...note that Im(Z) = 0
-        krig[indnc] = np.real(Z[indncEmb])
-        krig[indc] = v_agg
+        `dimension+extensionMin` >= max(`dimension`, K) + K - 1
 
-        if computeKrigSD:
-            # Compute kriging standard deviation
-            if verbose > 1:
-                print(f'{fname}: computing kriging standard deviation ...')
+    i.e.
 
-            for j in range(nnc):
-                u = ccirc[np.mod(indc - indnc[j], N)] # j-th row of rBA
-                krigSD[indnc[j]] = np.dot(u,np.linalg.solve(rAA, u))
+        `extensionMin` >= max(K-1, 2*K-`dimension`-1)
 
-            del(ccirc)
+    2. For large data set:
 
-            krigSD[indnc] = np.sqrt(np.maximum(diagEntry - krigSD[indnc], 0.))
+    - `conditioningMethod` should be set to 2 for using FFT
 
-    if aggregate_data_op == 'krige' and computeKrigSD:
-        # Set kriging standard deviation at grid cell containing a data
-        krigSD[indc] = v_agg_std
+    - `measureErrVar` can be set to a small positive value to stabilize the \
+    covariance matrix for conditioning locations (solving linear system).
 
-    # ... update if non-stationary covariance is specified
-    if var is not None:
-        if var.size > 1:
-            krig = varUpdate * krig
-        if computeKrigSD:
-            krigSD = varUpdate * krigSD
+    3. Some mathematical details:
 
-    krig = krig + mean
+    Discrete Fourier Transform (DFT) of a vector x of length N is given by
 
-    if computeKrigSD:
-        return krig, krigSD
-    else:
-        return krig
-# ----------------------------------------------------------------------------
+        c = DFT(x) = F * x
 
-# ----------------------------------------------------------------------------
-def grf2D(
-        cov_model,
-        dimension, spacing=(1.0, 1.0), origin=(0.0, 0.0),
-        x=None, v=None,
-        aggregate_data_op=None,
-        aggregate_data_op_kwargs=None,
-        mean=None, var=None,
-        nreal=1,
-        extensionMin=None, rangeFactorForExtensionMin=1.0,
-        crop=True,
-        method=3, conditioningMethod=2,
-        measureErrVar=0.0, tolInvKappa=1.e-10,
-        verbose=1,
-        printInfo=None):
-    """
-    Generates Gaussian Random Fields (GRF) in 2D via Fast Fourier Transform (FFT).
+    where F is the N x N matrix with coefficients
 
-    In brief, the GRFs
+        F(j,k) = [exp(-i*2*pi*j*k/N)], 0 <= j,k <= N-1
 
-    - are generated using the given covariance model (`cov_model`),
-    - may have a specified mean (`mean`) and variance (`var`), which can be non stationary,
-    - may be conditioned to location(s) `x` with value(s) `v`.
+    We have
 
-    Parameters
-    ----------
-    cov_model : :class:`geone.covModel.CovModel2D`, or :class:`geone.covModel.CovModel1D`, or function (`callable`)
-        covariance model in 2D, or covariance model in 1D interpreted as an omni-
-        directional covariance model, or directly a function of covariance (taking
-        2D lag vector(s) as argument)
+        F^(-1) = 1/N * F^(*)
 
-    dimension : 2-tuple of ints
-        `dimension=(nx, ny)`, number of cells in the 2D simulation grid along
-        each axis
+    where ^(*) denotes the conjugate transpose.
 
-    spacing : 2-tuple of floats, default: (1.0, 1.0)
-        `spacing=(sx, sy)`, cell size along each axis
+    Let
 
-    origin : 2-tuple of floats, default: (0.0, 0.0)
-        `origin=(ox, oy)`, origin of the 2D simulation grid (lower-left corner)
+        Q = 1/N^(1/2) * F
 
-    x : 2D array of floats of shape (n, 2), optional
-        data points locations, with n the number of data points, each row of `x`
-        is the float coordinates of one data point; note: if n=1, a 1D array of
-        shape (2,) is accepted
+    Then Q is unitary, i.e. Q^(-1) = Q^(*)
 
-    v : 1D array of floats of shape (n,), optional
-        data values at `x` (`v[i]` is the data value at `x[i]`)
+    Then, we have
 
-    aggregate_data_op : str {'sgs', 'krige', 'min', 'max', 'mean', 'quantile', 'most_freq', 'random'}, optional
-        operation used to aggregate data points falling in the same grid cells
+        DFT = F = N^(1/2) * Q,
 
-        - if `aggregate_data_op='sgs'`: function :func:`covModel.sgs` is used \
-        with the covariance model `cov_model` given in arguments
-        - if `aggregate_data_op='krige'`: function :func:`covModel.krige` is used \
-        with the covariance model `cov_model` given in arguments
-        - if `aggregate_data_op='most_freq'`: most frequent value is selected \
-        (smallest one if more than one value with the maximal frequence)
-        - if `aggregate_data_op='random'`: value from a random point is selected
-        - otherwise: the function `numpy.<aggregate_data_op>` is used with the \
-        additional parameters given by `aggregate_data_op_kwargs`, note that, e.g. \
-        `aggregate_data_op='quantile'` requires the additional parameter \
-        `q=<quantile_to_compute>`
+        DFT^(-1) = 1/N * F^(*) = 1/N^(1/2) * Q^(*)
 
-        Note: if `aggregate_data_op='sgs'` or `aggregate_data_op='random'`, the
-        aggregation is done for each realization (simulation), i.e. each simulation
-        on the grid starts with a new set of values in conditioning grid cells;
-        if `aggregate_data_op='sgs'` or `aggregate_data_op='krige'`, then
-        `cov_model` must be a covariance model and not directly the covariance
-        function
+    Using `numpy` package:
 
-        By default (`None`): `aggregate_data_op='sgs'` is used
-
-    aggregate_data_op_kwargs : dict, optional
-        keyword arguments to be passed to `geone.covModel.sgs`,
-        `geone.covModel.krige`, or `numpy.<aggregate_data_op>`, according to
-        the parameter `aggregate_data_op`
-
-    mean : function (`callable`), or array-like of floats, or float, optional
-        kriging mean value:
-
-        - if a function: function of two arguments (xi, yi) that returns the mean \
-        at location (xi, yi)
-        - if array-like: its size must be equal to the number of grid cells \
-        (the array is reshaped if needed), mean values at grid cells (for \
-        non-stationary mean)
-        - if a float: same mean value at every grid cell
-
-        By default (`None`): the mean of data value (`v`) (0.0 if no data) is
-        considered at every grid cell
-
-    var : function (`callable`), or array-like of floats, or float, optional
-        kriging variance value:
-
-        - if a function: function of two arguments (xi, yi) that returns the \
-        variance at location (xi, yi)
-        - if array-like: its size must be equal to the number of grid cells \
-        (the array is reshaped if needed), variance values at grid cells (for \
-        non-stationary variance)
-        - if a float: same variance value at every grid cell
-
-        By default (`None`): not used (use of covariance model only)
-
-    nreal : int, default: 1
-        number of realization(s)
-
-    extensionMin : sequence of 2 ints, optional
-        minimal extension in cells along each axis (see note 1 below)
-
-        By default (`None`): minimal extension is automatically computed:
-
-        - based on the range of the covariance model, if `cov_model` is given as \
-        an instance of :class:`geone.CovModel.CovModel1D` (or \
-        :class:`geone.CovModel.CovModel2D`)
-        - set to (`nx-1`, `ny-1`), if `cov_model` is given as a function \
-        (`callable`)
-
-    rangeFactorForExtensionMin : float, default: 1.0
-        factor by which the ranges of the covariance model are multiplied before
-        computing the default minimal extension, if `cov_model` is given as
-        an instance of :class:`geone.CovModel.CovModel1D` (or
-        :class:`geone.CovModel.CovModel2D`) and if `extensionMin=None`
-        (not used otherwise)
-
-    crop : bool, default: True
-        indicates if the extended generated field (simulation) will be cropped to
-        original dimension; note that `crop=False` is not valid with conditioning
-        or non-stationary mean or non-stationary variance
-
-    method : int, default: 3
-        indicates which method is used to generate unconditional simulations;
-        for each method the Discrete Fourier Transform (DFT) "lam" of the
-        circulant embedding of the covariance matrix is used, and periodic and
-        stationary GRFs are generated
-
-        - `method=1` (method A): generate one GRF Z as follows:
-            - generate one real gaussian white noise W
-            - apply fft (or fft inverse) on W to get X
-            - multiply X by "lam" (term by term)
-            - apply fft inverse (or fft) to get Z
-        - `method=2` (method B, not implemented!): generate one GRF Z as follows:
-           - generate directly X (from method A)
-           - multiply X by lam (term by term)
-           - apply fft inverse (or fft) to get Z
-        - `method=3` (method C, default): generate two independent GRFs Z1, Z2 as follows:
-           - generate two independant real gaussian white noises W1, W2 and set \
-           W = W1 + i * W2
-           - apply fft (or fft inverse) on W to get X
-           - multiply X by "lam" (term by term)
-           - apply fft inverse (or fft) to get Z, and set Z1 = Re(Z), Z2 = Im(Z); \
-           note: if `nreal` is odd, the last field is generated using method A
-
-    conditioningMethod : int, default: 2
-        indicates which method is used to update the simulations to account for
-        conditioning data; let
-
-        * A: index of conditioning cells
-        * B: index of non-conditioning cells
-        * Zobs: vector of values of the unconditional simulation Z at conditioning cells
-        * :math:`r = \\left(\\begin{array}{cc} r_{AA} & r_{AB}\\\\r_{BA} & r_{BB}\\end{array}\\right)` \
-        the covariance matrix, where index A (resp. B) refers to conditioning \
-        (resp. non-conditioning) index in the grid;
-
-        an unconditional simulation Z is updated into a conditional simulation ZCond as
-        follows; let
-
-        * ZCond[A] = Zobs
-        * ZCond[B] = Z[B] + rBA * rAA^(-1) * (Zobs - Z[A])
-
-        i.e. the update consists in adding the kriging estimates of the residues
-        to an unconditional simulation
-
-        * `conditioningMethod=1` (method CondtioningA): the matrix M = rBA * rAA^(-1) \
-        is explicitly computed (warning: could require large amount of memory), \
-        then all the simulations are updated by a sum and a multiplication by the \
-        matrix M
-        * `conditioningMethod=2` (method CondtioningB, default): for each simulation, \
-        the linear system rAA * x = Zobs - Z[A] is solved and then, the multiplication \
-        by rBA is done via fft
-
-        Note: parameter `conditioningMethod` is used only for conditional simulation
-
-    measureErrVar : float, default: 0.0
-        measurement error variance; the error on conditioning data is assumed to
-        follow the distrubution N(0, `measureErrVar` * I); i.e.
-        rAA + `measureErrVar` * I is considered instead of rAA for stabilizing the
-        linear system for this matrix;
-        note: parameter `measureErrVar` is used only for conditional simulation
-
-    tolInvKappa : float, default: 1.e-10
-        the simulation is stopped if the inverse of the condition number of rAA
-        is above `tolInvKappa`;
-        note: parameter `tolInvKappa` is used only for conditional simulation
-
-    verbose : int, default: 1
-        verbose mode, higher implies more printing (info):
-
-        - 0: no display
-        - 1: warnings
-        - 2: warnings + basic info
-        - 3 (or >2): all information
-
-        note that if an error occurred, it is raised
-
-    printInfo : bool, optional
-        deprecated, use `verbose` instead;
-
-        - if `printInfo=False`, `verbose` is set to 1 (overwritten)
-        - if `printInfo=True`, `verbose` is set to 3 (overwritten)
-        - if `printInfo=None` (default): not used
-
-    Returns
-    -------
-    grf : 3D array of shape (`nreal`, n2, n1)
-        GRF realizations, with
-
-        * n1 = nx (= dimension[0]), n2 = ny (= dimension[1]), if `crop=True`,
-        * but n1 >= nx, n2 >= ny if `crop=False`
-
-        `grf[i, iy, ix]`: value of the i-th realisation at grid cell of index
-        ix (resp. iy) along x (resp. y) axis
-
-    Notes
-    -----
-    1. For reproducing covariance model, the dimension of GRF should be large
-    enough; let K an integer such that K*`spacing` is greater or equal to the
-    correlation range, then:
-
-    - correlation accross opposite border should be removed by extending \
-    the domain sufficiently, i.e.
-
-        `extensionMin` >= K - 1
-
-    - two cells could not be correlated simultaneously regarding both \
-    distances between them (with respect to the periodic grid), i.e. one \
-    should have
-
-        `dimension+extensionMin` >= 2*K - 1.
-
-    To sum up, `extensionMin` should be chosen such that
-
-        `dimension+extensionMin` >= max(`dimension`, K) + K - 1
-
-    i.e.
-
-        `extensionMin` >= max(K-1, 2*K-`dimension`-1)
-
-    2. For large data set:
-
-    - `conditioningMethod` should be set to 2 for using FFT
-
-    - `measureErrVar` can be set to a small positive value to stabilize the \
-    covariance matrix for conditioning locations (solving linear system).
-
-    3. Some mathematical details:
-
-    Discrete Fourier Transform (DFT) of an array x of dim N1 x N2 is given by
-
-        c = DFT(x) = F * x
-
-    where F is the the (N1*N2) x (N1*N2) matrix with coefficients
-
-        F(j,k) = [exp( -i*2*pi*(j^t*k)/(N1*N2) )], j=(j1,j2), k=(k1,k2) in G,
-
-    and
-
-        G = {n=(n1,n2), 0 <= n1 <= N1-1, 0 <= n2 <= N2-1}
-
-    denotes the indices grid and where we use the bijection
-
-        (n1,n2) in G -> n1 + n2 * N1 in {0,...,N1*N2-1},
-
-    between the multiple-indices and the single indices.
-
-    With N = N1*N2, we have
-
-        F^(-1) = 1/N * F^(*)
-
-    where ^(*) denotes the conjugate transpose.
-
-    Let
-
-        Q = 1/N^(1/2) * F
-
-    Then Q is unitary, i.e. Q^(-1) = Q^(*)
-
-    Then, we have
-
-        DFT = F = N^(1/2) * Q,
-
-        DFT^(-1) = 1/N * F^(*) = 1/N^(1/2) * Q^(*)
-
-    Using `numpy` package:
-
-        numpy.fft.fft2() = DFT()
+        `numpy.fft.fft()` = DFT()
 
-        numpy.fft.ifft2() = DFT^(-1)()
+        `numpy.fft.ifft()` = DFT^(-1)()
     """
-    fname = 'grf2D'
+    fname = 'krige1D'
+
+    # Floating point type of the output, and FFT module to use
+    try:
+        dtype = np.dtype(dtype)
+    except Exception as exc:
+        err_msg = f'{fname}: `dtype` invalid'
+        raise GrfError(err_msg) from exc
+
+    if dtype == np.float64:
+        fft = np.fft    # double precision
+    elif dtype == np.float32:
+        fft = scipy.fft # single precision is preserved by `scipy.fft`
+    else:
+        err_msg = f"{fname}: `dtype` invalid, should be 'float64' or 'float32'"
+        raise GrfError(err_msg)
 
     # Set verbose mode according to printInfo (if given)
     if printInfo is not None:
@@ -1929,62 +1920,30 @@ def grf2D(
         else:
             verbose = 1
 
-    # Check first argument and get covariance function
+    # Check third argument and get covariance function
     if cov_model.__class__.__name__ == 'function':
         # covariance function is given
         cov_func = cov_model
         cov_range = None # unknown range
-    elif isinstance(cov_model, gcm.CovModel2D):
-        # Prevent calculation if covariance model is not stationary
-        if not cov_model.is_stationary():
-            err_msg = f'{fname}: `cov_model` is not stationary: {fname} cannot be applied (use `geone.geosclassicinterface` package)'
-            raise GrfError(err_msg)
-
-        cov_func = cov_model.func() # covariance function
-        cov_range = cov_model.rxy()
     elif isinstance(cov_model, gcm.CovModel1D):
-        cov_model = gcm.covModel1D_to_covModel2D(cov_model) # convert model 1D in 2D
-        # -> cov_model will not be modified at exit
         # Prevent calculation if covariance model is not stationary
         if not cov_model.is_stationary():
             err_msg = f'{fname}: `cov_model` is not stationary: {fname} cannot be applied (use `geone.geosclassicinterface` package)'
             raise GrfError(err_msg)
 
         cov_func = cov_model.func() # covariance function
-        cov_range = cov_model.rxy()
+        cov_range = cov_model.r()
     else:
         err_msg = f'{fname}: `cov_model` invalid'
         raise GrfError(err_msg)
 
     # aggregate_data_op (default)
     if aggregate_data_op is None:
-        aggregate_data_op = 'sgs'
-
-    # Number of realization(s)
-    nreal = int(nreal) # cast to int if needed
+        aggregate_data_op = 'krige'
 
-    if nreal <= 0:
-        if verbose > 0:
-            print(f'{fname}: WARNING: `nreal` <= 0: `None` is returned')
-        return None
-
-    if verbose > 1:
-        print(f'{fname}: Preliminary computation...')
-
-    #### Preliminary computation ####
-    nx, ny = dimension
-    sx, sy = spacing
-    ox, oy = origin
-
-    nxy = nx*ny
-
-    if method not in (1, 2, 3):
-        err_msg = f'{fname}: `method` invalid'
-        raise GrfError(err_msg)
-
-    if method == 2:
-        err_msg = f'{fname}: `method=2` not implemented'
-        raise GrfError(err_msg)
+    nx = dimension
+    sx = spacing
+    ox = origin
 
     if x is None and v is not None:
         err_msg = f'{fname}: `x` is not given (`None`) but `v` is given (not `None`)'
@@ -1995,13 +1954,22 @@ def grf2D(
             err_msg = f'{fname}: `conditioningMethod` invalid'
             raise GrfError(err_msg)
 
+        if block_size is not None:
+            block_size = int(block_size) # cast to int if needed
+            if block_size <= 0:
+                err_msg = f'{fname}: `block_size` invalid'
+                raise GrfError(err_msg)
+
         if v is None:
             err_msg = f'{fname}: `x` is given (not `None`) but `v` is not given (`None`)'
             raise GrfError(err_msg)
 
-        x = np.asarray(x, dtype='float').reshape(-1, 2) # cast in 2-dimensional array if needed
-        v = np.asarray(v, dtype='float').reshape(-1) # cast in 1-dimensional array if needed
-        if len(v) != x.shape[0]:
+        x = np.asarray(x, dtype='float').reshape(-1, 1) # cast in 2-dimensional array if needed
+        v = np.asarray(v, dtype='float')
+        if v.ndim != 2:
+            v = v.reshape(-1) # cast in 1-dimensional array if needed
+        # else: several data sets (one per row of v)
+        if v.shape[-1] != x.shape[0]:
             err_msg = f'{fname}: length of `v` is not valid'
             raise GrfError(err_msg)
 
@@ -2009,20 +1977,18 @@ def grf2D(
     if mean is not None:
         if callable(mean):
             if x is not None:
-                mean_x = mean(x[:, 0], x[:, 1])
+                mean_x = mean(x[:, 0])
             xi = ox + sx*(0.5+np.arange(nx)) # x-coordinate of cell center
-            yi = oy + sy*(0.5+np.arange(ny)) # y-coordinate of cell center
-            yyi, xxi = np.meshgrid(yi, xi, indexing='ij')
-            mean = mean(xxi, yyi) # replace function 'mean' by its evaluation on the grid
+            mean = mean(xi) # replace function 'mean' by its evaluation on the grid
         else:
             mean = np.asarray(mean, dtype='float').reshape(-1) # cast in 1-dimensional array if needed
             if mean.size == 1:
                 if x is not None:
                     mean_x = mean
-            elif mean.size == nxy:
-                mean = mean.reshape(ny, nx)
+            elif mean.size == nx:
+                # mean = mean.reshape(nx)
                 if x is not None:
-                    mean_x = img.Img_interp_func(img.Img(nx, ny, 1, sx, sy, 1., ox, oy, 0., nv=1, val=mean), iz=0)(x)
+                    mean_x = img.Img_interp_func(img.Img(nx, 1, 1, sx, 1., 1., ox, 0., 0., nv=1, val=mean), iy=0, iz=0)(x)
             else:
                 err_msg = f'{fname}: size of `mean` is not valid'
                 raise GrfError(err_msg)
@@ -2030,200 +1996,159 @@ def grf2D(
     var_x = var
     if var is not None:
         if callable(var):
+            if x is not None:
+                var_x = var(x[:, 0])
             xi = ox + sx*(0.5+np.arange(nx)) # x-coordinate of cell center
-            yi = oy + sy*(0.5+np.arange(ny)) # y-coordinate of cell center
-            yyi, xxi = np.meshgrid(yi, xi, indexing='ij')
-            var = var(xxi, yyi) # replace function 'var' by its evaluation on the grid
+            var = var(xi) # replace function 'var' by its evaluation on the grid
         else:
             var = np.asarray(var, dtype='float').reshape(-1) # cast in 1-dimensional array if needed
             if var.size == 1:
                 if x is not None:
                     var_x = var
-            elif var.size == nxy:
-                var = var.reshape(ny, nx)
+            elif var.size == nx:
+                # var = var.reshape(nx)
                 if x is not None:
-                    var_x = img.Img_interp_func(img.Img(nx, ny, 1, sx, sy, 1., ox, oy, 0., nv=1, val=var), iz=0)(x)
+                    var_x = img.Img_interp_func(img.Img(nx, 1, 1, sx, 1., 1., ox, 0., 0., nv=1, val=var), iy=0, iz=0)(x)
             else:
                 err_msg = f'{fname}: size of `var` is not valid'
                 raise GrfError(err_msg)
 
-    # data point set from x, v
-    if x is not None:
-        if aggregate_data_op_kwargs is None:
-            aggregate_data_op_kwargs = {}
-        if aggregate_data_op == 'krige' or aggregate_data_op == 'sgs':
-            if cov_range is None:
-                # cov_model is directly the covariance function
-                err_msg = f"{fname}: `cov_model` must be a model (not directly a function) when `aggregate_data_op='{aggregate_data_op}'` is used"
-                raise GrfError(err_msg)
-
-            # Get grid cell with at least one data point:
-            # x_agg: 2D array, each row contains the coordinates of the center of such cell
-            try:
-                im_tmp = img.imageFromPoints(
-                        x, values=None, varname=None,
-                        nx=nx, ny=ny, sx=sx, sy=sy, ox=ox, oy=oy,
-                        indicator_var=True, count_var=False)
-            except Exception as exc:
-                err_msg = f'{fname}: cannot set image from points'
-                raise GrfError(err_msg) from exc
-
-            ind_agg = np.where(im_tmp.val[0])
-            if len(ind_agg[0]) == 0:
-                err_msg = f'{fname}: no data point in grid'
-                raise GrfError(err_msg)
-
-            x_agg = np.array((im_tmp.xx()[ind_agg].reshape(-1), im_tmp.yy()[ind_agg].reshape(-1))).T
-            # x_agg = np.array((im_tmp.xx()[*ind_agg].reshape(-1), im_tmp.yy()[*ind_agg].reshape(-1))).T
-            ind_agg = ind_agg[1:] # remove index along z axis
-            del(im_tmp)
-            # Compute
-            # - kriging estimate (v_agg) and kriging std (v_agg_std) at x_agg,
-            # - or nreal simulation(s) (v_agg) at x_agg
-            if mean is not None and mean.size > 1:
-                mean_x_agg = mean[ind_agg]
-                # mean_x_agg = mean[*ind_agg]
-            else:
-                mean_x_agg = mean
-            if var is not None and var.size > 1:
-                var_x_agg = var[ind_agg]
-                # var_x_agg = var[*ind_agg]
-            else:
-                var_x_agg = var
-            if aggregate_data_op == 'krige':
-                try:
-                    v_agg, v_agg_std = gcm.krige(
-                            x, v, x_agg, cov_model, method='simple_kriging',
-                            mean_x=mean_x, mean_xu=mean_x_agg,
-                            var_x=var_x, var_xu=var_x_agg,
-                            verbose=0, **aggregate_data_op_kwargs)
-                except Exception as exc:
-                    err_msg = f"{fname}: aggratating data points in grid failed (`aggregate_data_op='{aggregate_data_op}'`)"
-                    raise GrfError(err_msg) from exc
-
-                # all real (same values)
-                v_agg = np.tile(v_agg, nreal).reshape(nreal, -1)
+    if x is None:
+        # No data: kriging return the mean and the standard deviation...
+        krig = np.zeros(nx, dtype=dtype)
+        if mean is not None:
+            krig[...] = mean
+        if computeKrigSD:
+            krigSD = np.zeros(nx, dtype=dtype)
+            if var is not None:
+                krigSD[...] = np.sqrt(var)
             else:
-                try:
-                    v_agg = gcm.sgs(
-                            x, v, x_agg, cov_model, method='simple_kriging',
-                            mean_x=mean_x, mean_xu=mean_x_agg,
-                            var_x=var_x, var_xu=var_x_agg,
-                            nreal=nreal, seed=None,
-                            verbose=0, **aggregate_data_op_kwargs)
-                except Exception as exc:
-                    err_msg = f"{fname}: aggratating data points in grid failed (`aggregate_data_op='{aggregate_data_op}'`)"
-                    raise GrfError(err_msg) from exc
-
-            xx_agg, yy_agg = x_agg.T
-            # zz_agg = 0.5*np.ones_like(xx_agg)
-        elif aggregate_data_op == 'random':
-            # Aggregate data on grid cell by taking random point
-            xx, yy = x.T
-            zz = 0.5*np.ones_like(xx)
-            # first realization of v_agg
-            try:
-                xx_agg, yy_agg, zz_agg, v_agg, i_inv = img.aggregateDataPointsWrtGrid(
-                        xx, yy, zz, v,
-                        nx, ny, nz, sx, sy, sz, ox, oy, oz,
-                        op=aggregate_data_op, return_inverse=True,
-                        **aggregate_data_op_kwargs)
-            except Exception as exc:
-                err_msg = f"{fname}: aggratating data points in grid failed (`aggregate_data_op='{aggregate_data_op}'`)"
-                raise GrfError(err_msg) from exc
-
-            if len(xx_agg) == 0:
-                err_msg = f'{fname}: no data point in grid'
-                raise GrfError(err_msg)
-
-            # next realizations of v_agg
-            v_agg = np.vstack((v_agg, np.zeros((nreal-1, v_agg.size))))
-            for i in range(1, nreal):
-                v_agg[i] = [v[np.random.choice(np.where(i_inv==j)[0])] for j in range(len(xx_agg))]
+                krigSD[...] = np.sqrt(cov_func(0.))
+            return krig, krigSD
         else:
-            # Aggregate data on grid cell by using the given operation
-            xx, yy = x.T
-            zz = 0.5*np.ones_like(xx)
-            try:
-                xx_agg, yy_agg, zz_agg, v_agg = img.aggregateDataPointsWrtGrid(
-                        xx, yy, zz, v,
-                        nx, ny, 1, sx, sy, 1.0, ox, oy, 0.0,
-                        op=aggregate_data_op, **aggregate_data_op_kwargs)
-            except Exception as exc:
-                err_msg = f"{fname}: aggratating data points in grid failed (`aggregate_data_op='{aggregate_data_op}'`)"
-                raise GrfError(err_msg) from exc
-
-            if len(xx_agg) == 0:
-                err_msg = f'{fname}: no data point in grid'
-                raise GrfError(err_msg)
+            return krig
 
-            # all real (same values)
-            v_agg = np.tile(v_agg, nreal).reshape(nreal, -1)
+    if aggregate_data_op_kwargs is None:
+        aggregate_data_op_kwargs = {}
 
-    if not crop:
-        if x is not None: # conditional simulation
-            err_msg = f'{fname}: `crop=False` cannot be used with conditional simulation'
+    if aggregate_data_op == 'krige':
+        if cov_range is None:
+            # cov_model is directly the covariance function
+            err_msg = f"{fname}: `cov_model` must be a model (not directly a function) when `aggregate_data_op='{aggregate_data_op}'` is used"
             raise GrfError(err_msg)
 
-        if mean is not None and mean.size > 1:
-            err_msg = f'{fname}: `crop=False` cannot be used with non-stationary mean'
+        # Get grid cell with at least one data point:
+        # x_agg: 2D array, each row contains the coordinates of the center of such cell
+        try:
+            im_tmp = img.imageFromPoints(
+                    x, values=None, varname=None,
+                    nx=nx, sx=sx, ox=ox,
+                    indicator_var=True, count_var=False)
+        except Exception as exc:
+            err_msg = f'{fname}: cannot set image from points'
+            raise GrfError(err_msg) from exc
+
+        ind_agg = np.where(im_tmp.val[0])
+        if len(ind_agg[0]) == 0:
+            err_msg = f'{fname}: no data point in grid'
             raise GrfError(err_msg)
 
+        x_agg = im_tmp.xx()[ind_agg].reshape(-1, 1)
+        # x_agg = im_tmp.xx()[*ind_agg].reshape(-1, 1)
+        ind_agg = ind_agg[2:] # remove index along z and y axes
+        del(im_tmp)
+        # Compute
+        # - kriging estimate (v_agg) and kriging std (v_agg_std) at x_agg,
+        # - or nreal simulation(s) (v_agg) at x_agg
+        if mean is not None and mean.size > 1:
+            mean_x_agg = mean[ind_agg]
+            # mean_x_agg = mean[*ind_agg]
+        else:
+            mean_x_agg = mean
         if var is not None and var.size > 1:
-            err_msg = f'{fname}: `crop=False` cannot be used with non-stationary variance'
+            var_x_agg = var[ind_agg]
+            # var_x_agg = var[*ind_agg]
+        else:
+            var_x_agg = var
+        try:
+            if v.ndim == 2:
+                # several data sets (the kriging std does not depend on the data values)
+                v_agg = np.zeros((v.shape[0], x_agg.shape[0]))
+                for k, vk in enumerate(v):
+                    v_agg[k], v_agg_std = gcm.krige(
+                            x, vk, x_agg, cov_model, method='simple_kriging',
+                            mean_x=mean_x, mean_xu=mean_x_agg,
+                            var_x=var_x, var_xu=var_x_agg,
+                            verbose=0, **aggregate_data_op_kwargs)
+            else:
+                v_agg, v_agg_std = gcm.krige(
+                        x, v, x_agg, cov_model, method='simple_kriging',
+                        mean_x=mean_x, mean_xu=mean_x_agg,
+                        var_x=var_x, var_xu=var_x_agg,
+                        verbose=0, **aggregate_data_op_kwargs)
+        except Exception as exc:
+            err_msg = f"{fname}: aggratating data points in grid failed (`aggregate_data_op='{aggregate_data_op}'`)"
+            raise GrfError(err_msg) from exc
+
+        xx_agg = x_agg[:, 0]
+        # yy_agg = 0.5*np.ones_like(xx_agg)
+        # zz_agg = 0.5*np.ones_like(xx_agg)
+    else:
+        # Aggregate data on grid cell by using the given operation
+        xx = x[:, 0]
+        yy = 0.5*np.ones_like(xx)
+        zz = 0.5*np.ones_like(xx)
+        try:
+            xx_agg, yy_agg, zz_agg, v_agg = img.aggregateDataPointsWrtGrid(
+                    xx, yy, zz, v,
+                    nx, 1, 1, sx, 1.0, 1.0, ox, 0.0, 0.0,
+                    op=aggregate_data_op, **aggregate_data_op_kwargs)
+        except Exception as exc:
+            err_msg = f"{fname}: aggratating data points in grid failed (`aggregate_data_op='{aggregate_data_op}'`)"
+            raise GrfError(err_msg) from exc
+
+        if len(xx_agg) == 0:
+            err_msg = f'{fname}: no data point in grid'
             raise GrfError(err_msg)
 
     if extensionMin is None:
         # default extensionMin
         if cov_range is not None: # known range
             # ... based on range of covariance model
-            extensionMin = [extension_min(rangeFactorForExtensionMin*r, n, s) for r, n, s in zip(cov_range, dimension, spacing)]
+            extensionMin = extension_min(rangeFactorForExtensionMin*cov_range, nx, s=sx)
         else:
             # ... based on dimension
-            extensionMin = [nx-1, ny-1]
+            extensionMin = dimension - 1
 
-    N1min = nx + extensionMin[0]
-    N2min = ny + extensionMin[1]
+    Nmin = nx + extensionMin
 
     if verbose > 1:
         print(f'{fname}: Computing circulant embedding...')
 
     # Circulant embedding of the covariance matrix
     # --------------------------------------------
-    # The embedding matrix is a (N1,N2)-nested block circulant matrix, computed from
+    # The embedding matrix is a circulant matrix of size N x N, computed from
     # the covariance function.
     # To take a maximal benefit of Fast Fourier Transform (FFT) for computing DFT,
     # we choose
-    #     N1 = 2^g1 (a power of 2), with N1 >= N1min, N1 >= 2
-    #     N2 = 2^g2 (a power of 2), with N2 >= N2min, N2 >= 2
-    g1 = int(max(np.ceil(np.log2(N1min)), 1.0))
-    g2 = int(max(np.ceil(np.log2(N2min)), 1.0))
-    N1 = int(2**g1)
-    N2 = int(2**g2)
+    #    N = 2^g (a power of 2), with N >= Nmin, N >= 2
+    g = int(max(np.ceil(np.log2(Nmin)), 1.0))
+    N = int(2**g)
 
     if verbose > 1:
-        print(f'{fname}: embedding dimension: {N1} x {N2}')
+        print(f'{fname}: embedding dimension: {N}')
 
-    N = N1*N2
-
-    # ccirc: coefficient of the embedding matrix (N2, N1) array
-    L1 = int (N1/2)
-    L2 = int (N2/2)
-    h1 = np.arange(-L1, L1, dtype=float) * sx # [-L1 ... 0 ... L1-1] * sx
-    h2 = np.arange(-L2, L2, dtype=float) * sy # [-L2 ... 0 ... L2-1] * sy
-
-    hh = np.meshgrid(h1, h2)
-    ccirc = cov_func(np.hstack((hh[0].reshape(-1,1), hh[1].reshape(-1,1))))
-    ccirc.resize(N2, N1)
+    # ccirc: coefficient of the embedding matrix (first line), vector of size N
+    L = int (N/2)
+    h = np.arange(-L, L, dtype=float) * sx # [-L ... 0 ... L-1] * sx
+    ccirc = cov_func(h)
 
-    del(h1, h2, hh)
+    del(h)
 
-    # ...shift first L1 index to the end of the axis 1:
-    ind = np.arange(L1)
-    ccirc = ccirc[:, np.hstack((ind+L1, ind))]
-    # ...shift first L2 index to the end of the axis 0:
-    ind = np.arange(L2)
-    ccirc = ccirc[np.hstack((ind+L2, ind)), :]
+    # ...shift first L index to the end of the axis, i.e.:
+    #    [-L ... 0 ... L-1] -> [0 ... L-1 -L ... -1]
+    ind = np.arange(L)
+    ccirc = ccirc[np.hstack((ind+L, ind))]
 
     del(ind)
 
@@ -2232,16 +2157,15 @@ def grf2D(
 
     # Compute the Discrete Fourier Transform (DFT) of ccric, via FFT
     # --------------------------------------------------------------
-    # The (2-dimensional) DFT coefficients
-    #   lam = DFT(ccirc) = {lam(k1,k2), 0<=k1<=N1-1, 0<=k2<=N2-1}
+    # The DFT coefficients
+    #   lam = DFT(ccirc) = (lam(0),lam(1),...,lam(N-1))
     # are the eigen values of the embedding matrix.
     # We have:
     #   a) lam are real coefficients, because the embedding matrix is symmetric
-    #   b) lam(k1,k2) = lam(N1-k1,N2-k2), 1<=k1<=N1-1, 1<=k2<=N2-1, because the coefficients ccirc are real
-    lam = np.real(np.fft.fft2(ccirc))
+    #   b) lam(k) = lam(N-k), k=1,...,N-1, because the coefficients ccirc are real
+    lam = np.real(np.fft.fft(ccirc))
     # ...note that the imaginary parts are equal to 0
 
-    # Eventual use of approximate embedding
     # -------------------------------------
     # If some DFT coefficients are negative, then set them to zero
     # and update them to fit the marginals distribution (approximate embedding)
@@ -2250,1015 +2174,1134 @@ def grf2D(
 
     # Take the square root of the (updated) DFT coefficients
     # ------------------------------------------------------
-    lamSqrt = np.sqrt(lam)
-
-    if x is None or conditioningMethod == 1:
-        del(lam)
+    lamSqrt = np.sqrt(lam).astype(dtype, copy=False)
+    lam = lam.astype(dtype, copy=False)
 
     # For specified variance
     # ----------------------
     # Compute updating factor
     if var is not None:
-        varUpdate = np.sqrt(var/cov_func(np.zeros(2)))
+        varUpdate = np.sqrt(var/cov_func(0.))
 
-    # Dealing with conditioning
-    # -------------------------
-    if x is not None:
-        if verbose > 1:
-            print(f'{fname}: Treatment of conditioning data...')
-        # Compute the part rAA of the covariance matrix
-        #        +         +
-        #        | rAA rAB |
-        #    r = |         |
-        #        | rBA rBB |
-        #        +         +
-        # where index A (resp. B) refers to
-        # conditioning (resp. non-conditioning) index in the grid.
+    # Kriging
+    # -------
+    # Let
+    #    A: index of conditioning nodes
+    #    B: index of non-conditioning nodes
+    #    Zobs: vector of values at conditioning nodes
+    # and
+    #        +         +
+    #        | rAA rAB |
+    #    r = |         |
+    #        | rBA rBB |
+    #        +         +
+    # the covariance matrix, where index A (resp. B) refers to
+    # conditioning (resp. non-conditioning) index in the grid.
+    #
+    # Then, the kriging estimates are
+    #     mean + rBA * rAA^(-1) * (v - mean)
+    # and the kriging standard deviation
+    #    diag(rBB - rBA * rAA^(-1) * rAB)
 
-        if verbose > 1:
-            print(f'{fname}: Computing covariance matrix (rAA) for conditioning locations...')
+    # Compute the part rAA of the covariance matrix
+    # Note: if a variance var is specified, then the matrix r should be updated
+    # by the following operation:
+    #    diag((var/cov_func(0))^1/2) * r * diag((var/cov_func(0))^1/2)
+    # which is accounting in the computation of kriging estimates and standard
+    # deviation below
 
-        # Compute
-        #    indc: node index of conditioning node,
-        #          rounded to lower index if between two grid node and index is positive
-        indc_f = (np.array((xx_agg, yy_agg)).T-origin)/spacing
-        indc = indc_f.astype(int)
-        indc = indc - 1 * np.all((indc == indc_f, indc > 0), axis=0)
-        ix, iy = indc[:, 0], indc[:, 1]
+    if verbose > 1:
+        print(f'{fname}: Computing covariance matrix (rAA) for conditioning locations...')
 
-        indc = ix + iy * nx # single-indices
+    # Compute
+    #    indc: node index of conditioning node,
+    #          rounded to lower index if between two grid node and index is positive
+    indc_f = (xx_agg-origin)/spacing
+    indc = indc_f.astype(int)
+    indc = indc - 1 * np.all((indc == indc_f, indc > 0), axis=0)
 
-        nc = len(xx_agg)
+    nc = len(xx_agg)
 
-        # rAA
-        rAA = np.zeros((nc, nc))
+    # rAA
+    diagEntry = ccirc[0] + measureErrVar
+    rAA = _cov_matrix_cond_from_ccirc(ccirc, (indc,), diagEntry)
 
-        diagEntry = ccirc[0, 0] + measureErrVar
-        for i in range(nc):
-            rAA[i,i] = diagEntry
-            for j in range(i+1, nc):
-                rAA[i,j] = ccirc[np.mod(iy[j]-iy[i], N2), np.mod(ix[j]-ix[i], N1)]
-                rAA[j,i] = rAA[i,j]
+    # Test if rAA is almost singular...
+    # (rAA is symmetric: its condition number is computed from its eigen values)
+    rAAeig = np.abs(np.linalg.eigvalsh(rAA))
+    if np.min(rAAeig) < tolInvKappa * np.max(rAAeig):
+        err_msg = f'{fname}: conditioning issue: condition number of matrix rAA is too big'
+        raise GrfError(err_msg)
 
-        # Test if rAA is almost singular...
-        if 1./np.linalg.cond(rAA) < tolInvKappa:
-            err_msg = f'{fname}: conditioning issue: condition number of matrix rAA is too big'
-            raise GrfError(err_msg)
+    del(rAAeig)
 
-        # Compute:
-        #    indnc: node index of non-conditioning node (nearest node)
-        indnc = np.asarray(np.setdiff1d(np.arange(nxy), indc), dtype=int)
-        nnc = len(indnc)
+    # Cholesky decomposition of rAA (computed once, used for solving linear systems)
+    try:
+        rAAcho = scipy.linalg.cho_factor(rAA, overwrite_a=True)
+    except np.linalg.LinAlgError as exc:
+        err_msg = f'{fname}: conditioning issue: matrix rAA is not positive definite'
+        raise GrfError(err_msg) from exc
 
-        ky = np.floor_divide(indnc, nx)
-        kx = np.mod(indnc, nx)
+    del(rAA)
 
-        if conditioningMethod == 1:
-            # Method ConditioningA
-            # --------------------
-            if verbose > 1:
-                print(f'{fname}: Computing covariance matrix (rBA) for non-conditioning / conditioning locations...')
+    # Compute:
+    #    indnc: node index of non-conditioning node (nearest node)
+    indnc = np.asarray(np.setdiff1d(np.arange(nx), indc), dtype=int)
+    nnc = len(indnc)
 
-            # Compute the parts rBA of the covariance matrix (see above)
-            # rBA
-            rBA = np.zeros((nnc, nc))
-            for j in range(nc):
-                rBA[:,j] = ccirc[np.mod(iy[j] - ky, N2), np.mod(ix[j] - kx, N1)]
+    # Initialize
+    # (the first axis of krig corresponds to the data sets if several ones are given)
+    krig = np.zeros(v_agg.shape[:-1] + (nx, ), dtype=dtype)
+    if computeKrigSD:
+        krigSD = np.zeros(nx, dtype=dtype)
 
-            if verbose > 1:
-                print(f'{fname}: Computing rBA * rAA^(-1)...')
+    if mean is None:
+        # Set mean for kriging (mean of the data, for each data set)
+        mean = np.mean(v, axis=-1, keepdims=True)
+        v_agg = v_agg - mean
+    elif mean.size == 1:
+        v_agg = v_agg - mean
+    else:
+        v_agg = v_agg - mean[indc]
 
-            # compute rBA * rAA^(-1)
-            rBArAAinv = np.dot(rBA, np.linalg.inv(rAA))
+    if var is not None and var.size > 1:
+        v_agg = 1./varUpdate[indc] * v_agg
 
-            del(rAA, rBA)
+    if conditioningMethod == 1:
+        # Method ConditioningA
+        # --------------------
+        if verbose > 1:
+            print(f'{fname}: Computing covariance matrix (rBA) for non-conditioning / conditioning locations...')
 
-            # If a variance var is specified, then the matrix r should be updated
-            # by the following operation:
-            #    diag((var/cov_func(0))^1/2) * r * diag((var/cov_func(0))^1/2)
-            # Hence, if a non-stationary variance is specified,
-            # the matrix rBA * rAA^(-1) should be consequently updated
-            # by multiplying its columns by 1/varUpdate[indc] and its rows by varUpdate[indnc]
-            if var is not None and var.size > 1:
-                rBArAAinv = np.transpose(varUpdate.reshape(-1)[indnc] * np.transpose(1./varUpdate.reshape(-1)[indc] * rBArAAinv))
+        # Compute the parts rBA of the covariance matrix (see above)
+        # rBA
+        rBA = _cov_matrix_from_ccirc(ccirc, (indnc,), (indc,))
 
-        elif conditioningMethod == 2:
-            # Method ConditioningB
-            # --------------------
-            if verbose > 1:
-                print(f'{fname}: Computing index in the embedding grid for non-conditioning / conditioning locations...')
+        del(ccirc)
 
-            # Compute index in the embedding grid for indc and indnc
-            # (to allow use of fft)
-            indcEmb =  iy * N1 + ix
-            indncEmb = ky * N1 + kx
+        if verbose > 1:
+            print(f'{fname}: Computing rBA * rAA^(-1)...')
 
-        del(ix, iy, kx, ky)
+        # compute rBA * rAA^(-1) = (rAA^(-1) * rAB)^T
+        rBArAAinv = scipy.linalg.cho_solve(rAAcho, rBA.T).T
 
-        if mean is None:
-            # Set mean for grf
-            mean = np.array([np.mean(v)])
+        del(rAAcho)
+        if not computeKrigSD:
+            del(rBA)
 
-    else: # x is None (unconditional)
-        if mean is None:
-            # Set mean for grf
-            mean = np.array([0.0])
+        # Compute kriging estimates
+        if verbose > 1:
+            print(f'{fname}: computing kriging estimates...')
 
-    del(ccirc)
-    #### End of preliminary computation ####
+        krig[..., indnc] = np.dot(rBArAAinv, v_agg.T).T
+        krig[..., indc] = v_agg
 
-    # Unconditional simulation
-    # ========================
-    # Method A: Generating one real GRF Z
-    # --------
-    # 1. Generate a real gaussian white noise W ~ N(0,1) on G (2D grid)
-    # 2. Compute Z = Q^(*) D Q * W
-    #    [OR: Z = Q D Q^(*) * W], where
-    #       Q is normalized DFT matrix
-    #       D = diag(lamSqrt)
-    #    i.e:
-    #       Z = DFT^(-1)(D * DFT(W))
-    #       [OR: Z = DFT(D * DFT^(-1)(W))]
-    #
-    # Method B: Generating one real GRF Z
-    # --------
-    # Not implemented
-    #
-    # Method C: Generating two independent real GRFs Z1, Z2
-    # --------
-    # (If nreal is odd, the last realization is generated using method A.)
-    # 1. Generate two independent real gaussian white noises W1,W2 ~ N(0,1) on G (2D grid)
-    #    and let W = W1 + i * W2 (complex value)
-    # 2. Compute Z = Q^(*) D * W
-    #    [OR: Z = Q D * W], where
-    #       Q is normalized DFT matrix
-    #       D = diag(lamSqrt)
-    #    i.e:
-    #       Z = N^(1/2) * DFT^(-1)(D * W)
-    #       [OR: Z = 1/N^(1/2) * DFT(D * W)]
-    #    Then the real and imaginary parts of Z are two independent GRFs
-    if crop:
-        grfNx, grfNy = nx, ny
-    else:
-        grfNx, grfNy = N1, N2
+        if computeKrigSD:
+            # Compute kriging standard deviation
+            if verbose > 1:
+                print(f'{fname}: computing kriging standard deviation ...')
 
-    grf = np.zeros((nreal, grfNy, grfNx))
+            # diag(rBA * rAA^(-1) * rAB), row by row (without loop)
+            krigSD[indnc] = np.sqrt(np.maximum(diagEntry - np.einsum('ij,ij->i', rBArAAinv, rBA), 0.))
 
-    if method == 1:
-        # Method A
-        # --------
-        for i in range(nreal):
-            if verbose > 2:
-                print(f'{fname}: unconditional simulation {i+1:4d} of {nreal:4d}...')
+            del(rBA)
 
-            W = np.random.normal(size=(N2, N1))
+    elif conditioningMethod == 2:
+        # Method ConditioningB
+        # --------------------
+        if not computeKrigSD:
+            del(ccirc)
 
-            Z = np.fft.ifft2(lamSqrt * np.fft.fft2(W))
-            # ...note that Im(Z) = 0
-            grf[i] = np.real(Z[0:grfNy, 0:grfNx])
+        if verbose > 1:
+            print(f'{fname}: Computing index in the embedding grid for non-conditioning / conditioning locations...')
 
-    elif method == 2:
-        # Method B
-        # --------
-        err_msg = f'{fname}: (unconditional simulation) `method=2` not implemented'
-        raise GrfError(err_msg)
+        # Compute index in the embedding grid for indc and indnc
+        # (to allow use of fft)
+        indcEmb = indc
+        indncEmb = indnc
 
-    elif method == 3:
-        # Method C
-        # --------
-        for i in np.arange(0, nreal-1, 2):
-            if verbose > 2:
-                print(f'{fname}: unconditional simulation {i+1:4d}-{i+2:4d} of {nreal:4d}...')
+        # Compute kriging estimates
+        if verbose > 1:
+            print(f'{fname}: computing kriging estimates...')
+
+        # Compute
+        #    u = rAA^(-1) * v_agg, and then
+        #    Z = rBA * u via the circulant embedding of the covariance matrix
+        # (for all data sets at once: batched solve and FFTs along the last axis)
+        uEmb = np.zeros(v_agg.shape[:-1] + (N, ), dtype=dtype)
+        uEmb[..., indcEmb] = scipy.linalg.cho_solve(rAAcho, v_agg.T).T
+        Z = fft.ifft(lam * fft.fft(uEmb))
+        # ...note that Im(Z) = 0
+        krig[..., indnc] = np.real(Z[..., indncEmb])
+        krig[..., indc] = v_agg
 
-            W = np.array(np.random.normal(size=(N2, N1)), dtype=complex)
-            W.imag = np.random.normal(size=(N2, N1))
-            Z = np.sqrt(N) * np.fft.ifft2(lamSqrt * W)
-            #  Z = 1/np.sqrt(N) * np.fft.fft2(lamSqrt * W)] # see above: [OR:...]
+        if computeKrigSD:
+            # Compute kriging standard deviation
+            if verbose > 1:
+                print(f'{fname}: computing kriging standard deviation ...')
 
-            grf[i] = np.real(Z[0:grfNy, 0:grfNx])
-            grf[i+1] = np.imag(Z[0:grfNy, 0:grfNx])
+            if block_size is None:
+                block_size = max(2**22 // nc, 1)
 
-        if np.mod(nreal, 2) == 1:
-            if verbose > 2:
-                print(f'{fname}: unconditional simulation {nreal:4d} of {nreal:4d}...')
+            # diag(rBA * rAA^(-1) * rAB), by blocks of non-conditioning cells
+            krigSD[indnc] = np.sqrt(np.maximum(diagEntry - _krige_var_reduction(rAAcho, ccirc, (indnc,), (indc,), block_size), 0.))
 
-            W = np.random.normal(size=(N2, N1))
+            del(ccirc)
 
-            Z = np.fft.ifft2(lamSqrt * np.fft.fft2(W))
-            # ...note that Im(Z) = 0
-            grf[nreal-1] = np.real(Z[0:grfNy, 0:grfNx])
+    if aggregate_data_op == 'krige' and computeKrigSD:
+        # Set kriging standard deviation at grid cell containing a data
+        krigSD[indc] = v_agg_std
 
+    # ... update if non-stationary covariance is specified
     if var is not None:
-        grf = varUpdate * grf
+        if var.size > 1:
+            krig *= varUpdate
+        if computeKrigSD:
+            krigSD *= varUpdate
 
-    grf = mean + grf
+    krig += mean
 
-    # Conditional simulation
-    # ----------------------
-    # Let
-    #    A: index of conditioning nodes
-    #    B: index of non-conditioning nodes
-    #    Zobs: vector of values at conditioning nodes
-    # and
-    #        +         +
-    #        | rAA rAB |
-    #    r = |         |
-    #        | rBA rBB |
-    #        +         +
-    # the covariance matrix, where index A (resp. B) refers to
-    # conditioning (resp. non-conditioning) index in the grid.
-    #
-    # Then, from an unconditional simulation Z, we retrieve a conditional
-    # simulation ZCond as follows.
-    # Let
-    #    ZCond[A] = Zobs
-    #    ZCond[B] = Z[B] + rBA * rAA^(-1) * (Zobs - Z[A])
-    if x is not None:
-        # We work with single indices...
-        grf.resize(nreal, grfNx*grfNy)
-
-        if conditioningMethod == 1:
-            # Method ConditioningA
-            # --------------------
-            if verbose > 1:
-                print(f'{fname}: updating conditional simulations...')
-
-            # Update all simulations at a time,
-            # use the matrix rBA * rAA^(-1) already computed
-            grf[:,indnc] = grf[:,indnc] + np.transpose(np.dot(rBArAAinv, np.transpose(v_agg - grf[:,indc])))
-            grf[:,indc] = v_agg
-
-        elif conditioningMethod == 2:
-            # Method ConditioningB
-            # --------------------
-            # Update each simulation successively as follows:
-            #    - solve rAA * x = Zobs - z[A]
-            #    - do the multiplication rBA * x via the circulant embedding of the
-            #      covariance matrix (using fft)
-            rAAinvResiduEmb = np.zeros(N2*N1)
-
-            for i in range(nreal):
-                if verbose > 2:
-                    print(f'{fname}: updating conditional simulation {i+1:4d} of {nreal:4d}...')
-
-                # Compute residue
-                residu = v_agg[i] - grf[i, indc]
-                # ... update if non-stationary variance is specified
-                if var is not None and var.size > 1:
-                    residu = 1./varUpdate.reshape(-1)[indc] * residu
-
-                # Compute
-                #    x = rAA^(-1) * residu, and then
-                #    Z = rBA * x via the circulant embedding of the covariance matrix
-                rAAinvResiduEmb[indcEmb] = np.linalg.solve(rAA, residu)
-                Z = np.fft.ifft2(lam * np.fft.fft2(rAAinvResiduEmb.reshape(N2, N1)))
-                # ...note that Im(Z) = 0
-                Z = np.real(Z.reshape(-1)[indncEmb])
-
-                # ... update if non-stationary covariance is specified
-                if var is not None and var.size > 1:
-                    Z = varUpdate.reshape(-1)[indnc] * Z
-
-                grf[i, indnc] = grf[i, indnc] + Z
-                grf[i, indc] = v_agg[i]
-
-        # Reshape grf as initially
-        grf.resize(nreal, grfNy, grfNx)
-
-    return grf
+    if computeKrigSD:
+        return krig, krigSD
+    else:
+        return krig
 # ----------------------------------------------------------------------------
 
 # ----------------------------------------------------------------------------
-def krige2D(
+# ----------------------------------------------------------------------------
+def _grf2D_preliminary(
+        fname,
         cov_model,
         dimension, spacing=(1.0, 1.0), origin=(0.0, 0.0),
         x=None, v=None,
         aggregate_data_op=None,
         aggregate_data_op_kwargs=None,
         mean=None, var=None,
+        nreal=1,
         extensionMin=None, rangeFactorForExtensionMin=1.0,
-        conditioningMethod=1, # note: set conditioningMethod=2 if unable to allocate memory
+        crop=True,
+        method=3, conditioningMethod=2,
+        conditioningChunkSize=None,
         measureErrVar=0.0, tolInvKappa=1.e-10,
-        computeKrigSD=True,
-        verbose=1,
-        printInfo=None):
+        dtype='float64',
+        rng=None,
+        verbose=1):
     """
-    Computes kriging estimates and standard deviations in 2D via FFT.
+    Preliminary computation for GRF simulations in 2D (see function :func:`grf2D`).
 
-    It is a simple kriging
+    This function checks the parameters and computes the circulant embedding
+    of the covariance matrix and its DFT; for conditional simulations, the
+    data points are aggregated in the grid cells and the Cholesky decomposition
+    of the covariance matrix of the conditioning locations is computed.
 
-    - of value(s) `v` at location(s) `x`,
-    - based on the given covariance model (`cov_model`),
-    - it may account for a specified mean (`mean`) and variance (`var`), which can be non stationary.
+    The parameters are the same as those of the function :func:`grf2D`
+    (`nreal` is assumed to be a positive int), and `fname` is the name of
+    the calling function (for displaying).
 
-    Parameters
-    ----------
-    cov_model : :class:`geone.covModel.CovModel2D`, or :class:`geone.covModel.CovModel1D`, or function (`callable`)
-        covariance model in 2D, or covariance model in 1D interpreted as an omni-
-        directional covariance model, or directly a function of covariance (taking
-        2D lag vector(s) as argument)
+    Returns
+    -------
+    sim : dict
+        parameters and arrays used for generating the realizations (see
+        function :func:`_grf_simulate`)
+    """
+    # Floating point type of the output
+    try:
+        dtype = np.dtype(dtype)
+    except Exception as exc:
+        err_msg = f'{fname}: `dtype` invalid'
+        raise GrfError(err_msg) from exc
+
+    if dtype not in (np.float64, np.float32):
+        err_msg = f"{fname}: `dtype` invalid, should be 'float64' or 'float32'"
+        raise GrfError(err_msg)
 
-    dimension : 2-tuple of ints
-        `dimension=(nx, ny)`, number of cells in the 2D simulation grid along
-        each axis
+    # Check first argument and get covariance function
+    if cov_model.__class__.__name__ == 'function':
+        # covariance function is given
+        cov_func = cov_model
+        cov_range = None # unknown range
+    elif isinstance(cov_model, gcm.CovModel2D):
+        # Prevent calculation if covariance model is not stationary
+        if not cov_model.is_stationary():
+            err_msg = f'{fname}: `cov_model` is not stationary: {fname} cannot be applied (use `geone.geosclassicinterface` package)'
+            raise GrfError(err_msg)
 
-    spacing : 2-tuple of floats, default: (1.0, 1.0)
-        `spacing=(sx, sy)`, cell size along each axis
+        cov_func = cov_model.func() # covariance function
+        cov_range = cov_model.rxy()
+    elif isinstance(cov_model, gcm.CovModel1D):
+        cov_model = gcm.covModel1D_to_covModel2D(cov_model) # convert model 1D in 2D
+        # -> cov_model will not be modified at exit
+        # Prevent calculation if covariance model is not stationary
+        if not cov_model.is_stationary():
+            err_msg = f'{fname}: `cov_model` is not stationary: {fname} cannot be applied (use `geone.geosclassicinterface` package)'
+            raise GrfError(err_msg)
 
-    origin : 2-tuple of floats, default: (0.0, 0.0)
-        `origin=(ox, oy)`, origin of the 2D simulation grid (lower-left corner)
+        cov_func = cov_model.func() # covariance function
+        cov_range = cov_model.rxy()
+    else:
+        err_msg = f'{fname}: `cov_model` invalid'
+        raise GrfError(err_msg)
 
-    x : 2D array of floats of shape (n, 2), optional
-        data points locations, with n the number of data points, each row of `x`
-        is the float coordinates of one data point; note: if n=1, a 1D array of
-        shape (2,) is accepted
+    # aggregate_data_op (default)
+    if aggregate_data_op is None:
+        aggregate_data_op = 'sgs'
 
-    v : 1D array of floats of shape (n,), optional
-        data values at `x` (`v[i]` is the data value at `x[i]`)
+    # Random number generator (stream) for each realization
+    try:
+        rngs = randomStream.rng_streams(rng, nreal)
+    except Exception as exc:
+        err_msg = f'{fname}: `rng` invalid'
+        raise GrfError(err_msg) from exc
 
-    aggregate_data_op : str {'krige', 'min', 'max', 'mean', 'quantile', 'most_freq'}, optional
-        operation used to aggregate data points falling in the same grid cells
+    if verbose > 1:
+        print(f'{fname}: Preliminary computation...')
 
-        - if `aggregate_data_op='krige'`: function :func:`covModel.krige` is used \
-        with the covariance model `cov_model` given in arguments
-        - if `aggregate_data_op='most_freq'`: most frequent value is selected \
-        (smallest one if more than one value with the maximal frequence)
-        - otherwise: the function `numpy.<aggregate_data_op>` is used with the \
-        additional parameters given by `aggregate_data_op_kwargs`, note that, e.g. \
-        `aggregate_data_op='quantile'` requires the additional parameter \
-        `q=<quantile_to_compute>`
+    #### Preliminary computation ####
+    nx, ny = dimension
+    sx, sy = spacing
+    ox, oy = origin
 
-        Note: if `aggregate_data_op='krige'`, then `cov_model` must be a
-        covariance model and not directly the covariance function
+    nxy = nx*ny
 
-        By default (`None`): `aggregate_data_op='krige'` is used
+    if method not in (1, 2, 3):
+        err_msg = f'{fname}: `method` invalid'
+        raise GrfError(err_msg)
 
-    aggregate_data_op_kwargs : dict, optional
-        keyword arguments to be passed to `geone.covModel.krige`,
-        `geone.covModel.krige`, or `numpy.<aggregate_data_op>`, according to
-        the parameter `aggregate_data_op`
+    if method == 2:
+        err_msg = f'{fname}: `method=2` not implemented'
+        raise GrfError(err_msg)
 
-    mean : function (`callable`), or array-like of floats, or float, optional
-        kriging mean value:
+    if x is None and v is not None:
+        err_msg = f'{fname}: `x` is not given (`None`) but `v` is given (not `None`)'
+        raise GrfError(err_msg)
 
-        - if a function: function of two arguments (xi, yi) that returns the mean \
-        at location (xi, yi)
-        - if array-like: its size must be equal to the number of grid cells \
-        (the array is reshaped if needed), mean values at grid cells (for \
-        non-stationary mean)
-        - if a float: same mean value at every grid cell
+    if x is not None:
+        if conditioningMethod not in (1, 2, 3):
+            err_msg = f'{fname}: `conditioningMethod` invalid'
+            raise GrfError(err_msg)
 
-        By default (`None`): the mean of data value (`v`) (0.0 if no data) is
-        considered at every grid cell
+        if conditioningChunkSize is not None:
+            conditioningChunkSize = int(conditioningChunkSize) # cast to int if needed
+            if conditioningChunkSize <= 0:
+                err_msg = f'{fname}: `conditioningChunkSize` invalid'
+                raise GrfError(err_msg)
 
-    var : function (`callable`), or array-like of floats, or float, optional
-        kriging variance value:
+        if v is None:
+            err_msg = f'{fname}: `x` is given (not `None`) but `v` is not given (`None`)'
+            raise GrfError(err_msg)
 
-        - if a function: function of two arguments (xi, yi) that returns the \
-        variance at location (xi, yi)
-        - if array-like: its size must be equal to the number of grid cells \
-        (the array is reshaped if needed), variance values at grid cells (for \
-        non-stationary variance)
-        - if a float: same variance value at every grid cell
+        x = np.asarray(x, dtype='float').reshape(-1, 2) # cast in 2-dimensional array if needed
+        v = np.asarray(v, dtype='float').reshape(-1) # cast in 1-dimensional array if needed
+        if len(v) != x.shape[0]:
+            err_msg = f'{fname}: length of `v` is not valid'
+            raise GrfError(err_msg)
 
-        By default (`None`): not used (use of covariance model only)
+    mean_x = mean
+    if mean is not None:
+        if callable(mean):
+            if x is not None:
+                mean_x = mean(x[:, 0], x[:, 1])
+            xi = ox + sx*(0.5+np.arange(nx)) # x-coordinate of cell center
+            yi = oy + sy*(0.5+np.arange(ny)) # y-coordinate of cell center
+            yyi, xxi = np.meshgrid(yi, xi, indexing='ij')
+            mean = mean(xxi, yyi) # replace function 'mean' by its evaluation on the grid
+        else:
+            mean = np.asarray(mean, dtype='float').reshape(-1) # cast in 1-dimensional array if needed
+            if mean.size == 1:
+                if x is not None:
+                    mean_x = mean
+            elif mean.size == nxy:
+                mean = mean.reshape(ny, nx)
+                if x is not None:
+                    mean_x = img.Img_interp_func(img.Img(nx, ny, 1, sx, sy, 1., ox, oy, 0., nv=1, val=mean), iz=0)(x)
+            else:
+                err_msg = f'{fname}: size of `mean` is not valid'
+                raise GrfError(err_msg)
 
-    extensionMin : sequence of 2 ints, optional
-        minimal extension in cells along each axis (see note 1 below)
+    var_x = var
+    if var is not None:
+        if callable(var):
+            xi = ox + sx*(0.5+np.arange(nx)) # x-coordinate of cell center
+            yi = oy + sy*(0.5+np.arange(ny)) # y-coordinate of cell center
+            yyi, xxi = np.meshgrid(yi, xi, indexing='ij')
+            var = var(xxi, yyi) # replace function 'var' by its evaluation on the grid
+        else:
+            var = np.asarray(var, dtype='float').reshape(-1) # cast in 1-dimensional array if needed
+            if var.size == 1:
+                if x is not None:
+                    var_x = var
+            elif var.size == nxy:
+                var = var.reshape(ny, nx)
+                if x is not None:
+                    var_x = img.Img_interp_func(img.Img(nx, ny, 1, sx, sy, 1., ox, oy, 0., nv=1, val=var), iz=0)(x)
+            else:
+                err_msg = f'{fname}: size of `var` is not valid'
+                raise GrfError(err_msg)
 
-        By default (`None`): minimal extension is automatically computed:
+    # data point set from x, v
+    if x is not None:
+        if aggregate_data_op_kwargs is None:
+            aggregate_data_op_kwargs = {}
+        if aggregate_data_op == 'krige' or aggregate_data_op == 'sgs':
+            if cov_range is None:
+                # cov_model is directly the covariance function
+                err_msg = f"{fname}: `cov_model` must be a model (not directly a function) when `aggregate_data_op='{aggregate_data_op}'` is used"
+                raise GrfError(err_msg)
 
-        - based on the range of the covariance model, if `cov_model` is given as \
-        an instance of :class:`geone.CovModel.CovModel1D` (or \
-        :class:`geone.CovModel.CovModel2D`)
-        - set to (`nx-1`, `ny-1`), if `cov_model` is given as a function \
-        (`callable`)
+            # Get grid cell with at least one data point:
+            # x_agg: 2D array, each row contains the coordinates of the center of such cell
+            try:
+                im_tmp = img.imageFromPoints(
+                        x, values=None, varname=None,
+                        nx=nx, ny=ny, sx=sx, sy=sy, ox=ox, oy=oy,
+                        indicator_var=True, count_var=False)
+            except Exception as exc:
+                err_msg = f'{fname}: cannot set image from points'
+                raise GrfError(err_msg) from exc
 
-    rangeFactorForExtensionMin : float, default: 1.0
-        factor by which the ranges of the covariance model are multiplied before
-        computing the default minimal extension, if `cov_model` is given as
-        an instance of :class:`geone.CovModel.CovModel1D` (or
-        :class:`geone.CovModel.CovModel2D`) and if `extensionMin=None`
-        (not used otherwise)
+            ind_agg = np.where(im_tmp.val[0])
+            if len(ind_agg[0]) == 0:
+                err_msg = f'{fname}: no data point in grid'
+                raise GrfError(err_msg)
 
-    conditioningMethod : int, default: 1
-        indicates which method is used to update the simulations to account for
-        conditioning data; let
+            x_agg = np.array((im_tmp.xx()[ind_agg].reshape(-1), im_tmp.yy()[ind_agg].reshape(-1))).T
+            # x_agg = np.array((im_tmp.xx()[*ind_agg].reshape(-1), im_tmp.yy()[*ind_agg].reshape(-1))).T
+            ind_agg = ind_agg[1:] # remove index along z axis
+            del(im_tmp)
+            # Compute
+            # - kriging estimate (v_agg) and kriging std (v_agg_std) at x_agg,
+            # - or nreal simulation(s) (v_agg) at x_agg
+            if mean is not None and mean.size > 1:
+                mean_x_agg = mean[ind_agg]
+                # mean_x_agg = mean[*ind_agg]
+            else:
+                mean_x_agg = mean
+            if var is not None and var.size > 1:
+                var_x_agg = var[ind_agg]
+                # var_x_agg = var[*ind_agg]
+            else:
+                var_x_agg = var
+            if aggregate_data_op == 'krige':
+                try:
+                    v_agg, v_agg_std = gcm.krige(
+                            x, v, x_agg, cov_model, method='simple_kriging',
+                            mean_x=mean_x, mean_xu=mean_x_agg,
+                            var_x=var_x, var_xu=var_x_agg,
+                            verbose=0, **aggregate_data_op_kwargs)
+                except Exception as exc:
+                    err_msg = f"{fname}: aggratating data points in grid failed (`aggregate_data_op='{aggregate_data_op}'`)"
+                    raise GrfError(err_msg) from exc
 
-        * A: index of conditioning cells
-        * B: index of non-conditioning cells
-        * :math:`r = \\left(\\begin{array}{cc} r_{AA} & r_{AB}\\\\r_{BA} & r_{BB}\\end{array}\\right)` \
-        the covariance matrix, where index A (resp. B) refers to conditioning \
-        (resp. non-conditioning) index in the grid;
+                # all real (same values)
+                v_agg = np.tile(v_agg, nreal).reshape(nreal, -1)
+            else:
+                try:
+                    v_agg = gcm.sgs(
+                            x, v, x_agg, cov_model, method='simple_kriging',
+                            mean_x=mean_x, mean_xu=mean_x_agg,
+                            var_x=var_x, var_xu=var_x_agg,
+                            nreal=nreal, seed=None,
+                            rng=None if randomStream.is_legacy(rng) else rngs,
+                            verbose=0, **aggregate_data_op_kwargs)
+                except Exception as exc:
+                    err_msg = f"{fname}: aggratating data points in grid failed (`aggregate_data_op='{aggregate_data_op}'`)"
+                    raise GrfError(err_msg) from exc
 
-        then, thre kriging estimates and kriging variances are
+            xx_agg, yy_agg = x_agg.T
+            # zz_agg = 0.5*np.ones_like(xx_agg)
+        elif aggregate_data_op == 'random':
+            # Aggregate data on grid cell by taking random point
+            xx, yy = x.T
+            zz = 0.5*np.ones_like(xx)
+            # first realization of v_agg
+            try:
+                xx_agg, yy_agg, zz_agg, v_agg, i_inv = img.aggregateDataPointsWrtGrid(
+                        xx, yy, zz, v,
+                        nx, ny, 1, sx, sy, 1.0, ox, oy, 0.0,
+                        op=aggregate_data_op, return_inverse=True,
+                        **aggregate_data_op_kwargs)
+            except Exception as exc:
+                err_msg = f"{fname}: aggratating data points in grid failed (`aggregate_data_op='{aggregate_data_op}'`)"
+                raise GrfError(err_msg) from exc
 
-        * krig[B]    = mean + rBA * rAA^(-1) * (v - mean)
-        * krigVar[B] = diag(rBB - rBA * rAA^(-1) * rAB)
+            if len(xx_agg) == 0:
+                err_msg = f'{fname}: no data point in grid'
+                raise GrfError(err_msg)
 
-        and the computation is done according to `conditioningMethod`:
+            # next realizations of v_agg
+            # (with independent streams, the first one is also drawn with its own stream)
+            v_agg = np.vstack((v_agg, np.zeros((nreal-1, v_agg.size))))
+            for i in range(int(randomStream.is_legacy(rng)), nreal):
+                v_agg[i] = [v[rngs[i].choice(np.where(i_inv==j)[0])] for j in range(len(xx_agg))]
+        else:
+            # Aggregate data on grid cell by using the given operation
+            xx, yy = x.T
+            zz = 0.5*np.ones_like(xx)
+            try:
+                xx_agg, yy_agg, zz_agg, v_agg = img.aggregateDataPointsWrtGrid(
+                        xx, yy, zz, v,
+                        nx, ny, 1, sx, sy, 1.0, ox, oy, 0.0,
+                        op=aggregate_data_op, **aggregate_data_op_kwargs)
+            except Exception as exc:
+                err_msg = f"{fname}: aggratating data points in grid failed (`aggregate_data_op='{aggregate_data_op}'`)"
+                raise GrfError(err_msg) from exc
 
-        * `conditioningMethod=1` (method CondtioningA, default): the matrices \
-        rBA, RAA^(-1) are explicitly computed (warning: could require large \
-        amount of memory)
-        * `conditioningMethod=2` (method CondtioningB): for kriging estimates, \
-        the linear system rAA * y = (v - mean) is solved, and then mean + rBA*y is \
-        computed; for kriging variances, for each column u[j] of rAB, the linear \
-        system rAA * y = u[j] is solved, and then rBB[j,j] - y^t*y is computed
+            if len(xx_agg) == 0:
+                err_msg = f'{fname}: no data point in grid'
+                raise GrfError(err_msg)
 
-        Note: set `conditioningMethod=2` if unable to allocate memory
+            # all real (same values)
+            v_agg = np.tile(v_agg, nreal).reshape(nreal, -1)
 
-    measureErrVar : float, default: 0.0
-        measurement error variance; the error on conditioning data is assumed to
-        follow the distrubution N(0, `measureErrVar` * I); i.e.
-        rAA + `measureErrVar` * I is considered instead of rAA for stabilizing the
-        linear system for this matrix
+    if not crop:
+        if x is not None: # conditional simulation
+            err_msg = f'{fname}: `crop=False` cannot be used with conditional simulation'
+            raise GrfError(err_msg)
 
-    tolInvKappa : float, default: 1.e-10
-        the computation is stopped if the inverse of the condition number of rAA
-        is above `tolInvKappa`
+        if mean is not None and mean.size > 1:
+            err_msg = f'{fname}: `crop=False` cannot be used with non-stationary mean'
+            raise GrfError(err_msg)
 
-    computeKrigSD : bool, default: True
-        indicates if the kriging standard deviations are computed
+        if var is not None and var.size > 1:
+            err_msg = f'{fname}: `crop=False` cannot be used with non-stationary variance'
+            raise GrfError(err_msg)
 
-    verbose : int, default: 1
-        verbose mode, higher implies more printing (info):
+    if extensionMin is None:
+        # default extensionMin
+        if cov_range is not None: # known range
+            # ... based on range of covariance model
+            extensionMin = [extension_min(rangeFactorForExtensionMin*r, n, s) for r, n, s in zip(cov_range, dimension, spacing)]
+        else:
+            # ... based on dimension
+            extensionMin = [nx-1, ny-1]
 
-        - 0: no display
-        - 1: warnings
-        - 2: warnings + basic info
-        - 3 (or >2): all information
+    N1min = nx + extensionMin[0]
+    N2min = ny + extensionMin[1]
 
-        note that if an error occurred, it is raised
+    if verbose > 1:
+        print(f'{fname}: Computing circulant embedding...')
 
-    printInfo : bool, optional
-        deprecated, use `verbose` instead;
+    # Circulant embedding of the covariance matrix
+    # --------------------------------------------
+    # The embedding matrix is a (N1,N2)-nested block circulant matrix, computed from
+    # the covariance function.
+    # To take a maximal benefit of Fast Fourier Transform (FFT) for computing DFT,
+    # we choose
+    #     N1 = 2^g1 (a power of 2), with N1 >= N1min, N1 >= 2
+    #     N2 = 2^g2 (a power of 2), with N2 >= N2min, N2 >= 2
+    g1 = int(max(np.ceil(np.log2(N1min)), 1.0))
+    g2 = int(max(np.ceil(np.log2(N2min)), 1.0))
+    N1 = int(2**g1)
+    N2 = int(2**g2)
 
-        - if `printInfo=False`, `verbose` is set to 1 (overwritten)
-        - if `printInfo=True`, `verbose` is set to 3 (overwritten)
-        - if `printInfo=None` (default): not used
+    if verbose > 1:
+        print(f'{fname}: embedding dimension: {N1} x {N2}')
 
-    Returns
-    -------
-    krig : 2D array of shape (ny, nx)
-        kriging estimates, with (nx, ny) (= dimension);
-        `krig[iy, ix]`: value at grid cell of index ix (resp. iy) along x (resp. y)
-        axis
+    N = N1*N2
 
-    krigSD : 2D array of shape (ny, nx), optional
-        kriging standard deviations, with (nx, ny) (= dimension);
-        `krigSD[iy, ix]`: value at grid cell of index ix (resp. iy) along x (resp. y)
-        axis; returned if `computeKrigSD=True`
+    # ccirc: coefficient of the embedding matrix (N2, N1) array
+    L1 = int (N1/2)
+    L2 = int (N2/2)
+    h1 = np.arange(-L1, L1, dtype=float) * sx # [-L1 ... 0 ... L1-1] * sx
+    h2 = np.arange(-L2, L2, dtype=float) * sy # [-L2 ... 0 ... L2-1] * sy
 
-    Notes
-    -----
-    1. For reproducing covariance model, the dimension of GRF should be large
-    enough; let K an integer such that K*`spacing` is greater or equal to the
-    correlation range, then:
+    hh = np.meshgrid(h1, h2)
+    ccirc = cov_func(np.hstack((hh[0].reshape(-1,1), hh[1].reshape(-1,1))))
+    ccirc.resize(N2, N1)
 
-    - correlation accross opposite border should be removed by extending \
-    the domain sufficiently, i.e.
+    del(h1, h2, hh)
 
-        `extensionMin` >= K - 1
+    # ...shift first L1 index to the end of the axis 1:
+    ind = np.arange(L1)
+    ccirc = ccirc[:, np.hstack((ind+L1, ind))]
+    # ...shift first L2 index to the end of the axis 0:
+    ind = np.arange(L2)
+    ccirc = ccirc[np.hstack((ind+L2, ind)), :]
 
-    - two cells could not be correlated simultaneously regarding both \
-    distances between them (with respect to the periodic grid), i.e. one \
-    should have
+    del(ind)
 
-        `dimension+extensionMin` >= 2*K - 1.
+    if verbose > 1:
+        print(f'{fname}: Computing FFT of circulant matrix...')
 
-    To sum up, `extensionMin` should be chosen such that
+    # Compute the Discrete Fourier Transform (DFT) of ccric, via FFT
+    # --------------------------------------------------------------
+    # The (2-dimensional) DFT coefficients
+    #   lam = DFT(ccirc) = {lam(k1,k2), 0<=k1<=N1-1, 0<=k2<=N2-1}
+    # are the eigen values of the embedding matrix.
+    # We have:
+    #   a) lam are real coefficients, because the embedding matrix is symmetric
+    #   b) lam(k1,k2) = lam(N1-k1,N2-k2), 1<=k1<=N1-1, 1<=k2<=N2-1, because the coefficients ccirc are real
+    lam = np.real(np.fft.fft2(ccirc))
+    # ...note that the imaginary parts are equal to 0
 
-        `dimension+extensionMin` >= max(`dimension`, K) + K - 1
+    # Eventual use of approximate embedding
+    # -------------------------------------
+    # If some DFT coefficients are negative, then set them to zero
+    # and update them to fit the marginals distribution (approximate embedding)
+    if np.min(lam) < 0:
+        lam = np.sum(lam)/np.sum(np.maximum(lam, 0.)) * np.maximum(lam, 0.)
 
-    i.e.
+    # Take the square root of the (updated) DFT coefficients
+    # ------------------------------------------------------
+    lamSqrt = np.sqrt(lam).astype(dtype, copy=False)
+    lam = lam.astype(dtype, copy=False)
 
-        `extensionMin` >= max(K-1, 2*K-`dimension`-1)
+    if x is None or conditioningMethod in (1, 3):
+        del(lam)
 
-    2. For large data set:
+    # For specified variance
+    # ----------------------
+    # Compute updating factor
+    if var is not None:
+        varUpdate = np.sqrt(var/cov_func(np.zeros(2)))
 
-    - `conditioningMethod` should be set to 2 for using FFT
+    # Dealing with conditioning
+    # -------------------------
+    if x is not None:
+        if verbose > 1:
+            print(f'{fname}: Treatment of conditioning data...')
+        # Compute the part rAA of the covariance matrix
+        #        +         +
+        #        | rAA rAB |
+        #    r = |         |
+        #        | rBA rBB |
+        #        +         +
+        # where index A (resp. B) refers to
+        # conditioning (resp. non-conditioning) index in the grid.
 
-    - `measureErrVar` can be set to a small positive value to stabilize the \
-    covariance matrix for conditioning locations (solving linear system).
+        if verbose > 1:
+            print(f'{fname}: Computing covariance matrix (rAA) for conditioning locations...')
 
-    3. Some mathematical details:
+        # Compute
+        #    indc: node index of conditioning node,
+        #          rounded to lower index if between two grid node and index is positive
+        indc_f = (np.array((xx_agg, yy_agg)).T-origin)/spacing
+        indc = indc_f.astype(int)
+        indc = indc - 1 * np.all((indc == indc_f, indc > 0), axis=0)
+        ix, iy = indc[:, 0], indc[:, 1]
 
-    Discrete Fourier Transform (DFT) of an array x of dim N1 x N2 is given by
+        indc = ix + iy * nx # single-indices
 
-        c = DFT(x) = F * x
-
-    where F is the the (N1*N2) x (N1*N2) matrix with coefficients
+        nc = len(xx_agg)
 
-        F(j,k) = [exp( -i*2*pi*(j^t*k)/(N1*N2) )], j=(j1,j2), k=(k1,k2) in G,
+        # rAA
+        diagEntry = ccirc[0, 0] + measureErrVar
+        rAA = _cov_matrix_cond_from_ccirc(ccirc, (iy, ix), diagEntry)
 
-    and
+        # Test if rAA is almost singular...
+        # (rAA is symmetric: its condition number is computed from its eigen values)
+        rAAeig = np.abs(np.linalg.eigvalsh(rAA))
+        if np.min(rAAeig) < tolInvKappa * np.max(rAAeig):
+            err_msg = f'{fname}: conditioning issue: condition number of matrix rAA is too big'
+            raise GrfError(err_msg)
 
-        G = {n=(n1,n2), 0 <= n1 <= N1-1, 0 <= n2 <= N2-1}
+        del(rAAeig)
 
-    denotes the indices grid and where we use the bijection
+        # Cholesky decomposition of rAA (used for solving linear systems)
+        try:
+            rAAcho = scipy.linalg.cho_factor(rAA, overwrite_a=True)
+        except np.linalg.LinAlgError as exc:
+            err_msg = f'{fname}: conditioning issue: matrix rAA is not positive definite'
+            raise GrfError(err_msg) from exc
 
-        (n1,n2) in G -> n1 + n2 * N1 in {0,...,N1*N2-1},
+        del(rAA)
 
-    between the multiple-indices and the single indices.
+        # Compute:
+        #    indnc: node index of non-conditioning node (nearest node)
+        indnc = np.asarray(np.setdiff1d(np.arange(nxy), indc), dtype=int)
+        nnc = len(indnc)
 
-    With N = N1*N2, we have
+        ky = np.floor_divide(indnc, nx)
+        kx = np.mod(indnc, nx)
 
-        F^(-1) = 1/N * F^(*)
+        if conditioningMethod == 1:
+            # Method ConditioningA
+            # --------------------
+            if verbose > 1:
+                print(f'{fname}: Computing covariance matrix (rBA) for non-conditioning / conditioning locations...')
 
-    where ^(*) denotes the conjugate transpose.
+            # Compute the parts rBA of the covariance matrix (see above)
+            # rBA
+            rBA = _cov_matrix_from_ccirc(ccirc, (ky, kx), (iy, ix))
 
-    Let
+            if verbose > 1:
+                print(f'{fname}: Computing rBA * rAA^(-1)...')
 
-        Q = 1/N^(1/2) * F
+            # compute rBA * rAA^(-1) = (rAA^(-1) * rAB)^T
+            rBArAAinv = scipy.linalg.cho_solve(rAAcho, rBA.T).T
 
-    Then Q is unitary, i.e. Q^(-1) = Q^(*)
+            del(rAAcho, rBA)
 
-    Then, we have
+            # If a variance var is specified, then the matrix r should be updated
+            # by the following operation:
+            #    diag((var/cov_func(0))^1/2) * r * diag((var/cov_func(0))^1/2)
+            # Hence, if a non-stationary variance is specified,
+            # the matrix rBA * rAA^(-1) should be consequently updated
+            # by multiplying its columns by 1/varUpdate[indc] and its rows by varUpdate[indnc]
+            if var is not None and var.size > 1:
+                rBArAAinv = np.transpose(varUpdate.reshape(-1)[indnc] * np.transpose(1./varUpdate.reshape(-1)[indc] * rBArAAinv))
 
-        DFT = F = N^(1/2) * Q,
+        elif conditioningMethod == 2:
+            # Method ConditioningB
+            # --------------------
+            if verbose > 1:
+                print(f'{fname}: Computing index in the embedding grid for non-conditioning / conditioning locations...')
 
-        DFT^(-1) = 1/N * F^(*) = 1/N^(1/2) * Q^(*)
+            # Compute index in the embedding grid for indc and indnc
+            # (to allow use of fft)
+            indcEmb =  iy * N1 + ix
+            indncEmb = ky * N1 + kx
 
-    Using `numpy` package:
+        elif conditioningMethod == 3:
+            # Method ConditioningC
+            # --------------------
+            # Keep index along each axis for indc and indnc
+            # (to extract chunks of rBA from the circulant embedding)
+            indcAxes = (iy, ix)
+            indncAxes = (ky, kx)
 
-        numpy.fft.fft2() = DFT()
+            if conditioningChunkSize is None:
+                conditioningChunkSize = max(2**22 // nc, 1)
 
-        numpy.fft.ifft2() = DFT^(-1)()
-    """
-    fname = 'krige2D'
+        del(ix, iy, kx, ky)
 
-    # Set verbose mode according to printInfo (if given)
-    if printInfo is not None:
-        if printInfo:
-            verbose = 3
-        else:
-            verbose = 1
+        if mean is None:
+            # Set mean for grf
+            mean = np.array([np.mean(v)])
 
-    # Check third argument and get covariance function
-    if cov_model.__class__.__name__ == 'function':
-        # covariance function is given
-        cov_func = cov_model
-        cov_range = None # unknown range
-    elif isinstance(cov_model, gcm.CovModel2D):
-        # Prevent calculation if covariance model is not stationary
-        if not cov_model.is_stationary():
-            err_msg = f'{fname}: `cov_model` is not stationary: {fname} cannot be applied (use `geone.geosclassicinterface` package)'
-            raise GrfError(err_msg)
+    else: # x is None (unconditional)
+        if mean is None:
+            # Set mean for grf
+            mean = np.array([0.0])
 
-        cov_func = cov_model.func() # covariance function
-        cov_range = cov_model.rxy()
-    elif isinstance(cov_model, gcm.CovModel1D):
-        cov_model = gcm.covModel1D_to_covModel2D(cov_model) # convert model 1D in 2D
-        # -> cov_model will not be modified at exit
-        # Prevent calculation if covariance model is not stationary
-        if not cov_model.is_stationary():
-            err_msg = f'{fname}: `cov_model` is not stationary: {fname} cannot be applied (use `geone.geosclassicinterface` package)'
-            raise GrfError(err_msg)
+    if x is None or conditioningMethod != 3:
+        del(ccirc)
 
-        cov_func = cov_model.func() # covariance function
-        cov_range = cov_model.rxy()
+    # Parameters for the simulation
+    # -----------------------------
+    if crop:
+        grfNx, grfNy = nx, ny
     else:
-        err_msg = f'{fname}: `cov_model` invalid'
-        raise GrfError(err_msg)
+        grfNx, grfNy = N1, N2
 
-    # aggregate_data_op (default)
-    if aggregate_data_op is None:
-        aggregate_data_op = 'krige'
+    sim = dict(
+        nreal=nreal, dtype=dtype, method=method,
+        shapeEmb=(N2, N1), grfShape=(grfNy, grfNx),
+        lamSqrt=lamSqrt, mean=mean, varUpdate=None,
+        conditioningMethod=None, rngs=rngs)
 
-    nx, ny = dimension
-    sx, sy = spacing
-    ox, oy = origin
+    if var is not None:
+        sim['varUpdate'] = varUpdate
 
-    nxy = nx*ny
+    if x is not None:
+        sim.update(conditioningMethod=conditioningMethod, v_agg=v_agg, indc=indc, indnc=indnc)
+        if conditioningMethod == 1:
+            sim.update(rBArAAinv=rBArAAinv)
+        elif conditioningMethod == 2:
+            sim.update(rAAcho=rAAcho, lam=lam, indcEmb=indcEmb, indncEmb=indncEmb)
+        elif conditioningMethod == 3:
+            sim.update(rAAcho=rAAcho, ccirc=ccirc, indcAxes=indcAxes, indncAxes=indncAxes,
+                       conditioningChunkSize=conditioningChunkSize)
+    #### End of preliminary computation ####
 
-    if x is None and v is not None:
-        err_msg = f'{fname}: `x` is not given (`None`) but `v` is given (not `None`)'
-        raise GrfError(err_msg)
+    return sim
+# ----------------------------------------------------------------------------
 
-    if x is not None:
-        if conditioningMethod not in (1, 2):
-            err_msg = f'{fname}: `conditioningMethod` invalid'
-            raise GrfError(err_msg)
+# ----------------------------------------------------------------------------
+def grf2D(
+        cov_model,
+        dimension, spacing=(1.0, 1.0), origin=(0.0, 0.0),
+        x=None, v=None,
+        aggregate_data_op=None,
+        aggregate_data_op_kwargs=None,
+        mean=None, var=None,
+        nreal=1,
+        extensionMin=None, rangeFactorForExtensionMin=1.0,
+        crop=True,
+        method=3, conditioningMethod=2,
+        conditioningChunkSize=None,
+        measureErrVar=0.0, tolInvKappa=1.e-10,
+        dtype='float64',
+        rng=None,
+        out=None,
+        verbose=1,
+        printInfo=None):
+    """
+    Generates Gaussian Random Fields (GRF) in 2D via Fast Fourier Transform (FFT).
 
-        if v is None:
-            err_msg = f'{fname}: `x` is given (not `None`) but `v` is not given (`None`)'
-            raise GrfError(err_msg)
+    In brief, the GRFs
 
-        x = np.asarray(x, dtype='float').reshape(-1, 2) # cast in 2-dimensional array if needed
-        v = np.asarray(v, dtype='float').reshape(-1) # cast in 1-dimensional array if needed
-        if len(v) != x.shape[0]:
-            err_msg = f'{fname}: length of `v` is not valid'
-            raise GrfError(err_msg)
+    - are generated using the given covariance model (`cov_model`),
+    - may have a specified mean (`mean`) and variance (`var`), which can be non stationary,
+    - may be conditioned to location(s) `x` with value(s) `v`.
 
-    mean_x = mean
-    if mean is not None:
-        if callable(mean):
-            if x is not None:
-                mean_x = mean(x[:, 0], x[:, 1])
-            xi = ox + sx*(0.5+np.arange(nx)) # x-coordinate of cell center
-            yi = oy + sy*(0.5+np.arange(ny)) # y-coordinate of cell center
-            yyi, xxi = np.meshgrid(yi, xi, indexing='ij')
-            mean = mean(xxi, yyi) # replace function 'mean' by its evaluation on the grid
-        else:
-            mean = np.asarray(mean, dtype='float').reshape(-1) # cast in 1-dimensional array if needed
-            if mean.size == 1:
-                if x is not None:
-                    mean_x = mean
-            elif mean.size == nxy:
-                mean = mean.reshape(ny, nx)
-                if x is not None:
-                    mean_x = img.Img_interp_func(img.Img(nx, ny, 1, sx, sy, 1., ox, oy, 0., nv=1, val=mean), iz=0)(x)
-            else:
-                err_msg = f'{fname}: size of `mean` is not valid'
-                raise GrfError(err_msg)
+    Parameters
+    ----------
+    cov_model : :class:`geone.covModel.CovModel2D`, or :class:`geone.covModel.CovModel1D`, or function (`callable`)
+        covariance model in 2D, or covariance model in 1D interpreted as an omni-
+        directional covariance model, or directly a function of covariance (taking
+        2D lag vector(s) as argument)
 
-    var_x = var
-    if var is not None:
-        if callable(var):
-            xi = ox + sx*(0.5+np.arange(nx)) # x-coordinate of cell center
-            yi = oy + sy*(0.5+np.arange(ny)) # y-coordinate of cell center
-            yyi, xxi = np.meshgrid(yi, xi, indexing='ij')
-            var = var(xxi, yyi) # replace function 'var' by its evaluation on the grid
-        else:
-            var = np.asarray(var, dtype='float').reshape(-1) # cast in 1-dimensional array if needed
-            if var.size == 1:
-                if x is not None:
-                    var_x = var
-            elif var.size == nxy:
-                var = var.reshape(ny, nx)
-                if x is not None:
-                    var_x = img.Img_interp_func(img.Img(nx, ny, 1, sx, sy, 1., ox, oy, 0., nv=1, val=var), iz=0)(x)
-            else:
-                err_msg = f'{fname}: size of `var` is not valid'
-                raise GrfError(err_msg)
+    dimension : 2-tuple of ints
+        `dimension=(nx, ny)`, number of cells in the 2D simulation grid along
+        each axis
 
-    if x is None:
-        # No data: kriging return the mean and the standard deviation...
-        krig = np.zeros((ny, nx))
-        if mean is not None:
-            krig[...] = mean
-        if computeKrigSD:
-            krigSD = np.zeros((ny, nx))
-            if var is not None:
-                krigSD[...] = np.sqrt(var)
-            else:
-                krigSD[...] = np.sqrt(cov_func(np.zeros(2)))
-            return krig, krigSD
-        else:
-            return krig
+    spacing : 2-tuple of floats, default: (1.0, 1.0)
+        `spacing=(sx, sy)`, cell size along each axis
 
-    if aggregate_data_op_kwargs is None:
-        aggregate_data_op_kwargs = {}
+    origin : 2-tuple of floats, default: (0.0, 0.0)
+        `origin=(ox, oy)`, origin of the 2D simulation grid (lower-left corner)
 
-    if aggregate_data_op == 'krige':
-        if cov_range is None:
-            # cov_model is directly the covariance function
-            err_msg = f"{fname}: `cov_model` must be a model (not directly a function) when `aggregate_data_op='{aggregate_data_op}'` is used"
-            raise GrfError(err_msg)
+    x : 2D array of floats of shape (n, 2), optional
+        data points locations, with n the number of data points, each row of `x`
+        is the float coordinates of one data point; note: if n=1, a 1D array of
+        shape (2,) is accepted
 
-        # Get grid cell with at least one data point:
-        # x_agg: 2D array, each row contains the coordinates of the center of such cell
-        try:
-            im_tmp = img.imageFromPoints(
-                    x, values=None, varname=None,
-                    nx=nx, ny=ny, sx=sx, sy=sy, ox=ox, oy=oy,
-                    indicator_var=True, count_var=False)
-        except Exception as exc:
-            err_msg = f'{fname}: cannot set image from points'
-            raise GrfError(err_msg) from exc
+    v : 1D array of floats of shape (n,), optional
+        data values at `x` (`v[i]` is the data value at `x[i]`)
 
-        ind_agg = np.where(im_tmp.val[0])
-        if len(ind_agg[0]) == 0:
-            err_msg = f'{fname}: no data point in grid'
-            raise GrfError(err_msg)
+    aggregate_data_op : str {'sgs', 'krige', 'min', 'max', 'mean', 'quantile', 'most_freq', 'random'}, optional
+        operation used to aggregate data points falling in the same grid cells
 
-        x_agg = np.array((im_tmp.xx()[ind_agg].reshape(-1), im_tmp.yy()[ind_agg].reshape(-1))).T
-        # x_agg = np.array((im_tmp.xx()[*ind_agg].reshape(-1), im_tmp.yy()[*ind_agg].reshape(-1))).T
-        ind_agg = ind_agg[1:] # remove index along z axis
-        del(im_tmp)
-        # Compute
-        # - kriging estimate (v_agg) and kriging std (v_agg_std) at x_agg,
-        # - or nreal simulation(s) (v_agg) at x_agg
-        if mean is not None and mean.size > 1:
-            mean_x_agg = mean[ind_agg]
-            # mean_x_agg = mean[*ind_agg]
-        else:
-            mean_x_agg = mean
-        if var is not None and var.size > 1:
-            var_x_agg = var[ind_agg]
-            # var_x_agg = var[*ind_agg]
-        else:
-            var_x_agg = var
-        try:
-            v_agg, v_agg_std = gcm.krige(
-                    x, v, x_agg, cov_model, method='simple_kriging',
-                    mean_x=mean_x, mean_xu=mean_x_agg,
-                    var_x=var_x, var_xu=var_x_agg,
-                    verbose=0, **aggregate_data_op_kwargs)
-        except Exception as exc:
-            err_msg = f"{fname}: aggratating data points in grid failed (`aggregate_data_op='{aggregate_data_op}'`)"
-            raise GrfError(err_msg) from exc
-
-        xx_agg, yy_agg = x_agg.T
-        # zz_agg = 0.5*np.ones_like(xx_agg)
-    else:
-        # Aggregate data on grid cell by using the given operation
-        xx, yy = x.T
-        zz = 0.5*np.ones_like(xx)
-        try:
-            xx_agg, yy_agg, zz_agg, v_agg = img.aggregateDataPointsWrtGrid(
-                    xx, yy, zz, v,
-                    nx, ny, 1, sx, sy, 1.0, ox, oy, 0.0,
-                    op=aggregate_data_op, **aggregate_data_op_kwargs)
-        except Exception as exc:
-            err_msg = f"{fname}: aggratating data points in grid failed (`aggregate_data_op='{aggregate_data_op}'`)"
-            raise GrfError(err_msg) from exc
+        - if `aggregate_data_op='sgs'`: function :func:`covModel.sgs` is used \
+        with the covariance model `cov_model` given in arguments
+        - if `aggregate_data_op='krige'`: function :func:`covModel.krige` is used \
+        with the covariance model `cov_model` given in arguments
+        - if `aggregate_data_op='most_freq'`: most frequent value is selected \
+        (smallest one if more than one value with the maximal frequence)
+        - if `aggregate_data_op='random'`: value from a random point is selected
+        - otherwise: the function `numpy.<aggregate_data_op>` is used with the \
+        additional parameters given by `aggregate_data_op_kwargs`, note that, e.g. \
+        `aggregate_data_op='quantile'` requires the additional parameter \
+        `q=<quantile_to_compute>`
 
-        if len(xx_agg) == 0:
-            err_msg = f'{fname}: no data point in grid'
-            raise GrfError(err_msg)
+        Note: if `aggregate_data_op='sgs'` or `aggregate_data_op='random'`, the
+        aggregation is done for each realization (simulation), i.e. each simulation
+        on the grid starts with a new set of values in conditioning grid cells;
+        if `aggregate_data_op='sgs'` or `aggregate_data_op='krige'`, then
+        `cov_model` must be a covariance model and not directly the covariance
+        function
 
-    if extensionMin is None:
-        # default extensionMin
-        if cov_range is not None: # known range
-            # ... based on range of covariance model
-            extensionMin = [extension_min(rangeFactorForExtensionMin*r, n, s) for r, n, s in zip(cov_range, dimension, spacing)]
-        else:
-            # ... based on dimension
-            extensionMin = [nx-1, ny-1]
+        By default (`None`): `aggregate_data_op='sgs'` is used
 
-    N1min = nx + extensionMin[0]
-    N2min = ny + extensionMin[1]
+    aggregate_data_op_kwargs : dict, optional
+        keyword arguments to be passed to `geone.covModel.sgs`,
+        `geone.covModel.krige`, or `numpy.<aggregate_data_op>`, according to
+        the parameter `aggregate_data_op`
 
-    if verbose > 1:
-        print(f'{fname}: Computing circulant embedding...')
+    mean : function (`callable`), or array-like of floats, or float, optional
+        kriging mean value:
 
-    # Circulant embedding of the covariance matrix
-    # --------------------------------------------
-    # The embedding matrix is a (N1,N2)-nested block circulant matrix, computed from
-    # the covariance function.
-    # To take a maximal benefit of Fast Fourier Transform (FFT) for computing DFT,
-    # we choose
-    #     N1 = 2^g1 (a power of 2), with N1 >= N1min, N1 >= 2
-    #     N2 = 2^g2 (a power of 2), with N2 >= N2min, N2 >= 2
-    g1 = int(max(np.ceil(np.log2(N1min)), 1.0))
-    g2 = int(max(np.ceil(np.log2(N2min)), 1.0))
-    N1 = int(2**g1)
-    N2 = int(2**g2)
+        - if a function: function of two arguments (xi, yi) that returns the mean \
+        at location (xi, yi)
+        - if array-like: its size must be equal to the number of grid cells \
+        (the array is reshaped if needed), mean values at grid cells (for \
+        non-stationary mean)
+        - if a float: same mean value at every grid cell
 
-    if verbose > 1:
-        print(f'{fname}: embedding dimension: {N1} x {N2}')
+        By default (`None`): the mean of data value (`v`) (0.0 if no data) is
+        considered at every grid cell
 
-    N = N1*N2
+    var : function (`callable`), or array-like of floats, or float, optional
+        kriging variance value:
 
-    # ccirc: coefficient of the embedding matrix (N2, N1) array
-    L1 = int (N1/2)
-    L2 = int (N2/2)
-    h1 = np.arange(-L1, L1, dtype=float) * sx # [-L1 ... 0 ... L1-1] * sx
-    h2 = np.arange(-L2, L2, dtype=float) * sy # [-L2 ... 0 ... L2-1] * sy
+        - if a function: function of two arguments (xi, yi) that returns the \
+        variance at location (xi, yi)
+        - if array-like: its size must be equal to the number of grid cells \
+        (the array is reshaped if needed), variance values at grid cells (for \
+        non-stationary variance)
+        - if a float: same variance value at every grid cell
 
-    hh = np.meshgrid(h1, h2)
-    ccirc = cov_func(np.hstack((hh[0].reshape(-1,1), hh[1].reshape(-1,1))))
-    ccirc.resize(N2, N1)
+        By default (`None`): not used (use of covariance model only)
 
-    del(h1, h2, hh)
+    nreal : int, default: 1
+        number of realization(s)
 
-    # ...shift first L1 index to the end of the axis 1:
-    ind = np.arange(L1)
-    ccirc = ccirc[:, np.hstack((ind+L1, ind))]
-    # ...shift first L2 index to the end of the axis 0:
-    ind = np.arange(L2)
-    ccirc = ccirc[np.hstack((ind+L2, ind)), :]
+    extensionMin : sequence of 2 ints, optional
+        minimal extension in cells along each axis (see note 1 below)
 
-    del(ind)
+        By default (`None`): minimal extension is automatically computed:
 
-    if verbose > 1:
-        print(f'{fname}: Computing FFT of circulant matrix...')
+        - based on the range of the covariance model, if `cov_model` is given as \
+        an instance of :class:`geone.CovModel.CovModel1D` (or \
+        :class:`geone.CovModel.CovModel2D`)
+        - set to (`nx-1`, `ny-1`), if `cov_model` is given as a function \
+        (`callable`)
 
-    # Compute the Discrete Fourier Transform (DFT) of ccric, via FFT
-    # --------------------------------------------------------------
-    # The (2-dimensional) DFT coefficients
-    #   lam = DFT(ccirc) = {lam(k1,k2), 0<=k1<=N1-1, 0<=k2<=N2-1}
-    # are the eigen values of the embedding matrix.
-    # We have:
-    #   a) lam are real coefficients, because the embedding matrix is symmetric
-    #   b) lam(k1,k2) = lam(N1-k1,N2-k2), 1<=k1<=N1-1, 1<=k2<=N2-1, because the coefficients ccirc are real
-    lam = np.real(np.fft.fft2(ccirc))
-    # ...note that the imaginary parts are equal to 0
+    rangeFactorForExtensionMin : float, default: 1.0
+        factor by which the ranges of the covariance model are multiplied before
+        computing the default minimal extension, if `cov_model` is given as
+        an instance of :class:`geone.CovModel.CovModel1D` (or
+        :class:`geone.CovModel.CovModel2D`) and if `extensionMin=None`
+        (not used otherwise)
 
-    # Eventual use of approximate embedding
-    # -------------------------------------
-    # If some DFT coefficients are negative, then set them to zero
-    # and update them to fit the marginals distribution (approximate embedding)
-    if np.min(lam) < 0:
-        lam = np.sum(lam)/np.sum(np.maximum(lam, 0.)) * np.maximum(lam, 0.)
+    crop : bool, default: True
+        indicates if the extended generated field (simulation) will be cropped to
+        original dimension; note that `crop=False` is not valid with conditioning
+        or non-stationary mean or non-stationary variance
 
-    # Take the square root of the (updated) DFT coefficients
-    # ------------------------------------------------------
-    lamSqrt = np.sqrt(lam)
+    method : int, default: 3
+        indicates which method is used to generate unconditional simulations;
+        for each method the Discrete Fourier Transform (DFT) "lam" of the
+        circulant embedding of the covariance matrix is used, and periodic and
+        stationary GRFs are generated
 
-    # For specified variance
-    # ----------------------
-    # Compute updating factor
-    if var is not None:
-        varUpdate = np.sqrt(var/cov_func(np.zeros(2)))
+        - `method=1` (method A): generate one GRF Z as follows:
+            - generate one real gaussian white noise W
+            - apply fft (or fft inverse) on W to get X
+            - multiply X by "lam" (term by term)
+            - apply fft inverse (or fft) to get Z
+        - `method=2` (method B, not implemented!): generate one GRF Z as follows:
+           - generate directly X (from method A)
+           - multiply X by lam (term by term)
+           - apply fft inverse (or fft) to get Z
+        - `method=3` (method C, default): generate two independent GRFs Z1, Z2 as follows:
+           - generate two independant real gaussian white noises W1, W2 and set \
+           W = W1 + i * W2
+           - apply fft (or fft inverse) on W to get X
+           - multiply X by "lam" (term by term)
+           - apply fft inverse (or fft) to get Z, and set Z1 = Re(Z), Z2 = Im(Z); \
+           note: with a random stream per realization (see `rng`), each \
+           realization is generated from its own stream, as Z1 (Z2 is \
+           discarded); with the global random state of `numpy.random` \
+           (`rng=None`) or a :class:`numpy.random.RandomState`, the \
+           realizations are generated by pairs (Z1, Z2), and if `nreal` is \
+           odd, the last field is generated using method A
 
-    # Kriging
-    # -------
-    # Let
-    #    A: index of conditioning nodes
-    #    B: index of non-conditioning nodes
-    #    Zobs: vector of values at conditioning nodes
-    # and
-    #        +         +
-    #        | rAA rAB |
-    #    r = |         |
-    #        | rBA rBB |
-    #        +         +
-    # the covariance matrix, where index A (resp. B) refers to
-    # conditioning (resp. non-conditioning) index in the grid.
-    #
-    # Then, the kriging estimates are
-    #     mean + rBA * rAA^(-1) * (v - mean)
-    # and the kriging standard deviation
-    #    diag(rBB - rBA * rAA^(-1) * rAB)
+    conditioningMethod : int, default: 2
+        indicates which method is used to update the simulations to account for
+        conditioning data; let
 
-    # Compute the part rAA of the covariance matrix
-    # Note: if a variance var is specified, then the matrix r should be updated
-    # by the following operation:
-    #    diag((var/cov_func(0))^1/2) * r * diag((var/cov_func(0))^1/2)
-    # which is accounting in the computation of kriging estimates and standard
-    # deviation below
+        * A: index of conditioning cells
+        * B: index of non-conditioning cells
+        * Zobs: vector of values of the unconditional simulation Z at conditioning cells
+        * :math:`r = \\left(\\begin{array}{cc} r_{AA} & r_{AB}\\\\r_{BA} & r_{BB}\\end{array}\\right)` \
+        the covariance matrix, where index A (resp. B) refers to conditioning \
+        (resp. non-conditioning) index in the grid;
 
-    if verbose > 1:
-        print(f'{fname}: Computing covariance matrix (rAA) for conditioning locations...')
+        an unconditional simulation Z is updated into a conditional simulation ZCond as
+        follows; let
 
-    # Compute
-    #    indc: node index of conditioning node,
-    #          rounded to lower index if between two grid node and index is positive
-    indc_f = (np.array((xx_agg, yy_agg)).T-origin)/spacing
-    indc = indc_f.astype(int)
-    indc = indc - 1 * np.all((indc == indc_f, indc > 0), axis=0)
-    ix, iy = indc[:, 0], indc[:, 1]
+        * ZCond[A] = Zobs
+        * ZCond[B] = Z[B] + rBA * rAA^(-1) * (Zobs - Z[A])
 
-    indc = ix + iy * nx # single-indices
+        i.e. the update consists in adding the kriging estimates of the residues
+        to an unconditional simulation
 
-    nc = len(xx_agg)
+        * `conditioningMethod=1` (method CondtioningA): the matrix M = rBA * rAA^(-1) \
+        is explicitly computed (warning: could require large amount of memory), \
+        then all the simulations are updated by a sum and a multiplication by the \
+        matrix M
+        * `conditioningMethod=2` (method CondtioningB, default): for each simulation, \
+        the linear system rAA * x = Zobs - Z[A] is solved and then, the multiplication \
+        by rBA is done via fft
+        * `conditioningMethod=3` (method CondtioningC): the linear systems \
+        rAA * x = Zobs - Z[A] are solved for each simulation, and then, \
+        the multiplication by rBA is done by chunks of non-conditioning cells, \
+        the corresponding rows of rBA being extracted from the circulant \
+        embedding of the covariance matrix (the matrix rBA is never stored \
+        entirely, and no fft is needed)
 
-    # rAA
-    rAA = np.zeros((nc, nc))
+        In every case, the matrix rAA is never inverted explicitly: its
+        Cholesky decomposition is computed once and used for solving the
+        linear systems.
 
-    diagEntry = ccirc[0, 0] + measureErrVar
-    for i in range(nc):
-        rAA[i,i] = diagEntry
-        for j in range(i+1, nc):
-            rAA[i,j] = ccirc[np.mod(iy[j]-iy[i], N2), np.mod(ix[j]-ix[i], N1)]
-            rAA[j,i] = rAA[i,j]
+        Note: parameter `conditioningMethod` is used only for conditional simulation
 
-    # Test if rAA is almost singular...
-    if 1./np.linalg.cond(rAA) < tolInvKappa:
-        err_msg = f'{fname}: conditioning issue: condition number of matrix rAA is too big'
-        raise GrfError(err_msg)
+    conditioningChunkSize : int, optional
+        number of non-conditioning cells updated at once with
+        `conditioningMethod=3`, i.e. number of rows of the chunks of rBA;
+        by default (`None`): set such that each chunk of rBA has about
+        2^22 entries;
+        note: parameter `conditioningChunkSize` is used only for conditional
+        simulation with `conditioningMethod=3`
 
-    # Compute:
-    #    indnc: node index of non-conditioning node (nearest node)
-    indnc = np.asarray(np.setdiff1d(np.arange(nxy), indc), dtype=int)
-    nnc = len(indnc)
+    measureErrVar : float, default: 0.0
+        measurement error variance; the error on conditioning data is assumed to
+        follow the distrubution N(0, `measureErrVar` * I); i.e.
+        rAA + `measureErrVar` * I is considered instead of rAA for stabilizing the
+        linear system for this matrix;
+        note: parameter `measureErrVar` is used only for conditional simulation
 
-    ky = np.floor_divide(indnc, nx)
-    kx = np.mod(indnc, nx)
+    tolInvKappa : float, default: 1.e-10
+        the simulation is stopped if the inverse of the condition number of rAA
+        is above `tolInvKappa`;
+        note: parameter `tolInvKappa` is used only for conditional simulation
 
-    if mean is None:
-        # Set mean for kriging
-        mean = np.array([np.mean(v)])
+    dtype : str or numpy.dtype {'float64', 'float32'}, default: 'float64'
+        floating point type of the output GRFs; the FFTs (generation of the
+        unconditional fields and update accounting for conditioning data) are
+        computed with the corresponding precision (single precision FFTs are
+        computed with `scipy.fft`), whereas the linear algebra involving the
+        covariance matrix rAA of the conditioning locations is always done in
+        double precision (float64)
+
+    rng : int, or :class:`numpy.random.SeedSequence`, or :class:`numpy.random.Generator`, or sequence, optional
+        random number generator specification (see module :mod:`randomStream`);
+        by default (`None`): the global random state of `numpy.random` is used;
+        otherwise, independent streams are spawned from `rng`, one per
+        realization (the i-th stream depends only on `rng` and i), and the
+        i-th realization is generated with the i-th stream only (whatever
+        `method`), hence it does not depend on `nreal`; passing a slice
+        `spawn_seed_sequences(rng, nreal)[i0:i1]` (see function
+        :func:`randomStream.spawn_seed_sequences`) as `rng` (with
+        `nreal=i1-i0`) gives the realizations i0, ..., i1-1 of the whole set
+
+    out : nd array, optional
+        C-contiguous array of shape (nreal, ) + shape of the output (see below)
+        and of type `dtype`, in which the realizations are written (and which
+        is returned), e.g. a :class:`numpy.memmap` for writing the realizations
+        directly in a file (without holding them in memory);
+        by default (`None`): a new array is allocated
 
-    # Initialize
-    krig = np.zeros(ny*nx)
-    if computeKrigSD:
-        krigSD = np.zeros(ny*nx)
+    verbose : int, default: 1
+        verbose mode, higher implies more printing (info):
 
-    if mean.size == 1:
-        v_agg = v_agg - mean
-    else:
-        v_agg = v_agg - mean.reshape(-1)[indc]
+        - 0: no display
+        - 1: warnings
+        - 2: warnings + basic info
+        - 3 (or >2): all information
 
-    if var is not None and var.size > 1:
-        v_agg = 1./varUpdate.reshape(-1)[indc] * v_agg
+        note that if an error occurred, it is raised
 
-    if conditioningMethod == 1:
-        # Method ConditioningA
-        # --------------------
-        if verbose > 1:
-            print(f'{fname}: Computing covariance matrix (rBA) for non-conditioning / conditioning locations...')
+    printInfo : bool, optional
+        deprecated, use `verbose` instead;
 
-        # Compute the parts rBA of the covariance matrix (see above)
-        # rBA
-        rBA = np.zeros((nnc, nc))
-        for j in range(nc):
-            rBA[:,j] = ccirc[np.mod(iy[j] - ky, N2), np.mod(ix[j] - kx, N1)]
+        - if `printInfo=False`, `verbose` is set to 1 (overwritten)
+        - if `printInfo=True`, `verbose` is set to 3 (overwritten)
+        - if `printInfo=None` (default): not used
 
-        del(ix, iy, kx, ky)
-        del(ccirc)
+    Returns
+    -------
+    grf : 3D array of shape (`nreal`, n2, n1)
+        GRF realizations, with
 
-        if verbose > 1:
-            print(f'{fname}: Computing rBA * rAA^(-1)...')
+        * n1 = nx (= dimension[0]), n2 = ny (= dimension[1]), if `crop=True`,
+        * but n1 >= nx, n2 >= ny if `crop=False`
 
-        # compute rBA * rAA^(-1)
-        rBArAAinv = np.dot(rBA, np.linalg.inv(rAA))
+        `grf[i, iy, ix]`: value of the i-th realisation at grid cell of index
+        ix (resp. iy) along x (resp. y) axis
 
-        del(rAA)
-        if not computeKrigSD:
-            del(rBA)
+    Notes
+    -----
+    1. For reproducing covariance model, the dimension of GRF should be large
+    enough; let K an integer such that K*`spacing` is greater or equal to the
+    correlation range, then:
 
-        # Compute kriging estimates
-        if verbose > 1:
-            print(f'{fname}: computing kriging estimates...')
+    - correlation accross opposite border should be removed by extending \
+    the domain sufficiently, i.e.
 
-        krig[indnc] = np.dot(rBArAAinv, v_agg)
-        krig[indc] = v_agg
+        `extensionMin` >= K - 1
 
-        if computeKrigSD:
-            # Compute kriging standard deviation
-            if verbose > 1:
-                print(f'{fname}: computing kriging standard deviation ...')
+    - two cells could not be correlated simultaneously regarding both \
+    distances between them (with respect to the periodic grid), i.e. one \
+    should have
 
-            for j in range(nnc):
-                krigSD[indnc[j]] = np.dot(rBArAAinv[j,:], rBA[j,:])
-            krigSD[indnc] = np.sqrt(np.maximum(diagEntry - krigSD[indnc], 0.))
+        `dimension+extensionMin` >= 2*K - 1.
 
-            del(rBA)
+    To sum up, `extensionMin` should be chosen such that
 
-    elif conditioningMethod == 2:
-        # Method ConditioningB
-        # --------------------
-        if not computeKrigSD:
-            del(ccirc)
+        `dimension+extensionMin` >= max(`dimension`, K) + K - 1
 
-        if verbose > 1:
-            print(f'{fname}: Computing index in the embedding grid for non-conditioning / conditioning locations...')
+    i.e.
 
-        # Compute index in the embedding grid for indc and indnc
-        # (to allow use of fft)
-        indcEmb =  iy * N1 + ix
-        indncEmb = ky * N1 + kx
+        `extensionMin` >= max(K-1, 2*K-`dimension`-1)
 
-        # Compute kriging estimates
-        if verbose > 1:
-            print(f'{fname}: computing kriging estimates...')
+    2. For large data set:
 
-        # Compute
-        #    u = rAA^(-1) * v_agg, and then
-        #    Z = rBA * u via the circulant embedding of the covariance matrix
-        uEmb = np.zeros(N2*N1)
-        uEmb[indcEmb] = np.linalg.solve(rAA, v_agg)
-        Z = np.fft.ifft2(lam * np.fft.fft2(uEmb.reshape(N2, N1)))
-        # ...note that Im(Z) = 0
-        krig[indnc] = np.real(Z.reshape(-1)[indncEmb])
-        krig[indc] = v_agg
+    - `conditioningMethod` should be set to 2 (using FFT) or 3 (by chunks), \
+    the whole matrix rBA being not stored in these cases
 
-        if computeKrigSD:
-            # Compute kriging standard deviation
-            if verbose > 1:
-                print(f'{fname}: computing kriging standard deviation ...')
+    - `measureErrVar` can be set to a small positive value to stabilize the \
+    covariance matrix for conditioning locations (solving linear system).
+
+    3. Some mathematical details:
 
-            for j in range(nnc):
-                u = ccirc[np.mod(iy - ky[j], N2), np.mod(ix - kx[j], N1)] # j-th row of rBA
-                krigSD[indnc[j]] = np.dot(u,np.linalg.solve(rAA, u))
+    Discrete Fourier Transform (DFT) of an array x of dim N1 x N2 is given by
 
-            del(ccirc)
+        c = DFT(x) = F * x
 
-            krigSD[indnc] = np.sqrt(np.maximum(diagEntry - krigSD[indnc], 0.))
+    where F is the the (N1*N2) x (N1*N2) matrix with coefficients
 
-        del(ix, iy, kx, ky)
+        F(j,k) = [exp( -i*2*pi*(j^t*k)/(N1*N2) )], j=(j1,j2), k=(k1,k2) in G,
 
-    if aggregate_data_op == 'krige' and computeKrigSD:
-        # Set kriging standard deviation at grid cell containing a data
-        krigSD[indc] = v_agg_std
+    and
 
-    # ... update if non-stationary covariance is specified
-    if var is not None:
-        if var.size > 1:
-            krig = varUpdate.reshape(-1) * krig
-        if computeKrigSD:
-            krigSD = varUpdate.reshape(-1) * krigSD
+        G = {n=(n1,n2), 0 <= n1 <= N1-1, 0 <= n2 <= N2-1}
 
-    krig.resize(ny, nx)
-    if computeKrigSD:
-        krigSD.resize(ny, nx)
+    denotes the indices grid and where we use the bijection
+
+        (n1,n2) in G -> n1 + n2 * N1 in {0,...,N1*N2-1},
 
-    krig = krig + mean
+    between the multiple-indices and the single indices.
 
-    if computeKrigSD:
-        return krig, krigSD
+    With N = N1*N2, we have
+
+        F^(-1) = 1/N * F^(*)
+
+    where ^(*) denotes the conjugate transpose.
+
+    Let
+
+        Q = 1/N^(1/2) * F
+
+    Then Q is unitary, i.e. Q^(-1) = Q^(*)
+
+    Then, we have
+
+        DFT = F = N^(1/2) * Q,
+
+        DFT^(-1) = 1/N * F^(*) = 1/N^(1/2) * Q^(*)
+
+    Using `numpy` package:
+
+        numpy.fft.fft2() = DFT()
+
+        numpy.fft.ifft2() = DFT^(-1)()
+    """
+    fname = 'grf2D'
+
+    # Set verbose mode according to printInfo (if given)
+    if printInfo is not None:
+        if printInfo:
+            verbose = 3
+        else:
+            verbose = 1
+
+    # Number of realization(s)
+    nreal = int(nreal) # cast to int if needed
+
+    if nreal <= 0:
+        if verbose > 0:
+            print(f'{fname}: WARNING: `nreal` <= 0: `None` is returned')
+        return None
+
+    # Preliminary computation
+    sim = _grf2D_preliminary(
+            fname, cov_model, dimension, spacing, origin, x, v,
+            aggregate_data_op, aggregate_data_op_kwargs, mean, var, nreal,
+            extensionMin, rangeFactorForExtensionMin, crop, method,
+            conditioningMethod, conditioningChunkSize, measureErrVar,
+            tolInvKappa, dtype, rng, verbose)
+
+    # Generate the realizations
+    if out is None:
+        grf = np.zeros((nreal, ) + sim['grfShape'], dtype=sim['dtype'])
+    elif parallel._valid_output_array(out, (nreal, ) + sim['grfShape'], sim['dtype']):
+        grf = out
     else:
-        return krig
+        err_msg = f'{fname}: `out` invalid (shape or type not valid, or not C-contiguous)'
+        raise GrfError(err_msg)
+
+    _grf_simulate(grf, sim, 0, fname, verbose)
+
+    return grf
 # ----------------------------------------------------------------------------
 
 # ----------------------------------------------------------------------------
-def grf3D(
+def grf2D_mp(
         cov_model,
-        dimension, spacing=(1.0, 1.0, 1.0), origin=(0.0, 0.0, 0.0),
+        dimension, spacing=(1.0, 1.0), origin=(0.0, 0.0),
         x=None, v=None,
         aggregate_data_op=None,
         aggregate_data_op_kwargs=None,
@@ -3267,78 +3310,170 @@ def grf3D(
         extensionMin=None, rangeFactorForExtensionMin=1.0,
         crop=True,
         method=3, conditioningMethod=2,
+        conditioningChunkSize=None,
+        measureErrVar=0.0, tolInvKappa=1.e-10,
+        dtype='float64',
+        rng=None,
+        out=None,
+        verbose=1,
+        printInfo=None,
+        nproc=-1):
+    """
+    Computes the same as the function :func:`grf.grf2D`, using multiprocessing.
+
+    All the parameters except `nproc` are the same as those of the function
+    :func:`grf.grf2D`.
+
+    The number of processes used (in parallel) is n, and determined by the
+    parameter `nproc` (int, optional) as follows:
+
+    - if `nproc > 0`: n = `nproc`,
+    - if `nproc <= 0`: n = max(nmax+`nproc`, 1), where nmax is the total \
+    number of cpu(s) of the system (retrieved by :func:`config.cpu_count`), \
+    i.e. all cpus except `-nproc` is used (but at least one)
+
+    The preliminary computation (circulant embedding of the covariance matrix
+    and its DFT, treatment of the conditioning data, Cholesky decomposition of
+    the covariance matrix of the conditioning locations) is done once; the
+    resulting arrays are put in shared memory and used (read only) by n
+    parallel processes. The set of realizations (specified by `nreal`) is
+    distributed in a balanced way over the processes, each process writing
+    its realizations directly in a shared output array (copied in the returned
+    array), or in the file of `out` if it is a :class:`numpy.memmap` (opened
+    in mode 'r+' or 'w+').
+
+    Note that, if `nreal` < n, then n is reduced to `nreal`.
+
+    Each realization is generated with its own stream (see parameter `rng`),
+    hence the result is the same as the one of the function :func:`grf.grf2D`
+    with the same `rng`, whatever the number of processes; if `rng` is `None`
+    (default) or a :class:`numpy.random.RandomState`, a seed is first drawn from
+    it (see function :func:`randomStream.seed_from_rng`) and used as `rng`.
+
+    See function :func:`grf.grf2D` for details.
+    """
+    fname = 'grf2D_mp'
+
+    # Set verbose mode according to printInfo (if given)
+    if printInfo is not None:
+        if printInfo:
+            verbose = 3
+        else:
+            verbose = 1
+
+    # Number of realization(s)
+    nreal = int(nreal) # cast to int if needed
+
+    if nreal <= 0:
+        if verbose > 0:
+            print(f'{fname}: WARNING: `nreal` <= 0: `None` is returned')
+        return None
+
+    # Random number generator: the streams of the realizations are spawned
+    # (legacy random state cannot be shared between processes)
+    if randomStream.is_legacy(rng):
+        rng = randomStream.seed_from_rng(rng)
+
+    # Preliminary computation
+    sim = _grf2D_preliminary(
+            fname, cov_model, dimension, spacing, origin, x, v,
+            aggregate_data_op, aggregate_data_op_kwargs, mean, var, nreal,
+            extensionMin, rangeFactorForExtensionMin, crop, method,
+            conditioningMethod, conditioningChunkSize, measureErrVar,
+            tolInvKappa, dtype, rng, verbose)
+
+    # Generate the realizations
+    if out is not None and not parallel._valid_output_array(out, (nreal, ) + sim['grfShape'], sim['dtype']):
+        err_msg = f'{fname}: `out` invalid (shape or type not valid, or not C-contiguous)'
+        raise GrfError(err_msg)
+
+    grf = _grf_simulate_mp(sim, nproc, fname, verbose, out=out)
+
+    return grf
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def krige2D(
+        cov_model,
+        dimension, spacing=(1.0, 1.0), origin=(0.0, 0.0),
+        x=None, v=None,
+        aggregate_data_op=None,
+        aggregate_data_op_kwargs=None,
+        mean=None, var=None,
+        extensionMin=None, rangeFactorForExtensionMin=1.0,
+        conditioningMethod=1, # note: set conditioningMethod=2 if unable to allocate memory
         measureErrVar=0.0, tolInvKappa=1.e-10,
+        computeKrigSD=True,
+        block_size=None,
+        dtype='float64',
         verbose=1,
         printInfo=None):
     """
-    Generates Gaussian Random Fields (GRF) in 3D via Fast Fourier Transform (FFT).
+    Computes kriging estimates and standard deviations in 2D via FFT.
 
-    In brief, the GRFs
+    It is a simple kriging
 
-    - are generated using the given covariance model (`cov_model`),
-    - may have a specified mean (`mean`) and variance (`var`), which can be non stationary,
-    - may be conditioned to location(s) `x` with value(s) `v`.
+    - of value(s) `v` at location(s) `x`,
+    - based on the given covariance model (`cov_model`),
+    - it may account for a specified mean (`mean`) and variance (`var`), which can be non stationary.
 
     Parameters
     ----------
-    cov_model : :class:`geone.covModel.CovModel3D`, or :class:`geone.covModel.CovModel1D`, or function (`callable`)
-        covariance model in 3D, or covariance model in 1D interpreted as an omni-
+    cov_model : :class:`geone.covModel.CovModel2D`, or :class:`geone.covModel.CovModel1D`, or function (`callable`)
+        covariance model in 2D, or covariance model in 1D interpreted as an omni-
         directional covariance model, or directly a function of covariance (taking
-        3D lag vector(s) as argument)
+        2D lag vector(s) as argument)
 
-    dimension : 3-tuple of ints
-        `dimension=(nx, ny, nz)`, number of cells in the 3D simulation grid along
+    dimension : 2-tuple of ints
+        `dimension=(nx, ny)`, number of cells in the 2D simulation grid along
         each axis
 
-    spacing : 3-tuple of floats, default: (1.0,1.0, 1.0)
-        `spacing=(sx, sy, sz)`, cell size along each axis
+    spacing : 2-tuple of floats, default: (1.0, 1.0)
+        `spacing=(sx, sy)`, cell size along each axis
 
-    origin : 3-tuple of floats, default: (0.0, 0.0, 0.0)
-        `origin=(ox, oy, oz)`, origin of the 3D simulation grid (bottom-lower-left
-        corner)
+    origin : 2-tuple of floats, default: (0.0, 0.0)
+        `origin=(ox, oy)`, origin of the 2D simulation grid (lower-left corner)
 
-    x : 2D array of floats of shape (n, 3), optional
+    x : 2D array of floats of shape (n, 2), optional
         data points locations, with n the number of data points, each row of `x`
         is the float coordinates of one data point; note: if n=1, a 1D array of
-        shape (3,) is accepted
+        shape (2,) is accepted
 
-    v : 1D array of floats of shape (n,), optional
-        data values at `x` (`v[i]` is the data value at `x[i]`)
+    v : 1D array of floats of shape (n,), or 2D array of floats of shape (ndataset, n), optional
+        data values at `x` (`v[i]` is the data value at `x[i]`); several data
+        sets sharing the same locations `x` can be given as a 2D array,
+        `v[k, i]` being the value at `x[i]` of the k-th data set: then, the
+        embedding, the decomposition of the covariance matrix of the
+        conditioning locations and the kriging standard deviations are computed
+        once, and the kriging estimates of all data sets are computed together
 
-    aggregate_data_op : str {'sgs', 'krige', 'min', 'max', 'mean', 'quantile', 'most_freq', 'random'}, optional
+    aggregate_data_op : str {'krige', 'min', 'max', 'mean', 'quantile', 'most_freq'}, optional
         operation used to aggregate data points falling in the same grid cells
 
-        - if `aggregate_data_op='sgs'`: function :func:`covModel.sgs` is used \
-        with the covariance model `cov_model` given in arguments
         - if `aggregate_data_op='krige'`: function :func:`covModel.krige` is used \
         with the covariance model `cov_model` given in arguments
         - if `aggregate_data_op='most_freq'`: most frequent value is selected \
         (smallest one if more than one value with the maximal frequence)
-        - if `aggregate_data_op='random'`: value from a random point is selected
         - otherwise: the function `numpy.<aggregate_data_op>` is used with the \
         additional parameters given by `aggregate_data_op_kwargs`, note that, e.g. \
         `aggregate_data_op='quantile'` requires the additional parameter \
         `q=<quantile_to_compute>`
 
-        Note: if `aggregate_data_op='sgs'` or `aggregate_data_op='random'`, the
-        aggregation is done for each realization (simulation), i.e. each simulation
-        on the grid starts with a new set of values in conditioning grid cells;
-        if `aggregate_data_op='sgs'` or `aggregate_data_op='krige'`, then
-        `cov_model` must be a covariance model and not directly the covariance
-        function
+        Note: if `aggregate_data_op='krige'`, then `cov_model` must be a
+        covariance model and not directly the covariance function
 
-        By default (`None`): `aggregate_data_op='sgs'` is used
+        By default (`None`): `aggregate_data_op='krige'` is used
 
     aggregate_data_op_kwargs : dict, optional
-        keyword arguments to be passed to `geone.covModel.sgs`,
+        keyword arguments to be passed to `geone.covModel.krige`,
         `geone.covModel.krige`, or `numpy.<aggregate_data_op>`, according to
         the parameter `aggregate_data_op`
 
     mean : function (`callable`), or array-like of floats, or float, optional
         kriging mean value:
 
-        - if a function: function of three arguments (xi, yi, zi) that returns \
-        the mean at location (xi, yi, zi)
+        - if a function: function of two arguments (xi, yi) that returns the mean \
+        at location (xi, yi)
         - if array-like: its size must be equal to the number of grid cells \
         (the array is reshaped if needed), mean values at grid cells (for \
         non-stationary mean)
@@ -3350,8 +3485,8 @@ def grf3D(
     var : function (`callable`), or array-like of floats, or float, optional
         kriging variance value:
 
-        - if a function: function of three arguments (xi, yi, yi) that returns \
-        the variance at location (xi, yi, zi)
+        - if a function: function of two arguments (xi, yi) that returns the \
+        variance at location (xi, yi)
         - if array-like: its size must be equal to the number of grid cells \
         (the array is reshaped if needed), variance values at grid cells (for \
         non-stationary variance)
@@ -3359,96 +3494,85 @@ def grf3D(
 
         By default (`None`): not used (use of covariance model only)
 
-    nreal : int, default: 1
-        number of realization(s)
-
-    extensionMin : sequence of 3 ints, optional
+    extensionMin : sequence of 2 ints, optional
         minimal extension in cells along each axis (see note 1 below)
 
         By default (`None`): minimal extension is automatically computed:
 
         - based on the range of the covariance model, if `cov_model` is given as \
         an instance of :class:`geone.CovModel.CovModel1D` (or \
-        :class:`geone.CovModel.CovModel3D`)
-        - set to (`nx-1`, `ny-1`, `nz-1`), if `cov_model` is given as a function \
+        :class:`geone.CovModel.CovModel2D`)
+        - set to (`nx-1`, `ny-1`), if `cov_model` is given as a function \
         (`callable`)
 
     rangeFactorForExtensionMin : float, default: 1.0
         factor by which the ranges of the covariance model are multiplied before
         computing the default minimal extension, if `cov_model` is given as
         an instance of :class:`geone.CovModel.CovModel1D` (or
-        :class:`geone.CovModel.CovModel3D`) and if `extensionMin=None`
+        :class:`geone.CovModel.CovModel2D`) and if `extensionMin=None`
         (not used otherwise)
 
-    crop : bool, default: True
-        indicates if the extended generated field (simulation) will be cropped to
-        original dimension; note that `crop=False` is not valid with conditioning
-        or non-stationary mean or non-stationary variance
-
-    method : int, default: 3
-        indicates which method is used to generate unconditional simulations;
-        for each method the Discrete Fourier Transform (DFT) "lam" of the
-        circulant embedding of the covariance matrix is used, and periodic and
-        stationary GRFs are generated
-
-        - `method=1` (method A): generate one GRF Z as follows:
-            - generate one real gaussian white noise W
-            - apply fft (or fft inverse) on W to get X
-            - multiply X by "lam" (term by term)
-            - apply fft inverse (or fft) to get Z
-        - `method=2` (method B, not implemented!): generate one GRF Z as follows:
-           - generate directly X (from method A)
-           - multiply X by lam (term by term)
-           - apply fft inverse (or fft) to get Z
-        - `method=3` (method C, default): generate two independent GRFs Z1, Z2 as follows:
-           - generate two independant real gaussian white noises W1, W2 and set \
-           W = W1 + i * W2
-           - apply fft (or fft inverse) on W to get X
-           - multiply X by "lam" (term by term)
-           - apply fft inverse (or fft) to get Z, and set Z1 = Re(Z), Z2 = Im(Z); \
-           note: if `nreal` is odd, the last field is generated using method A
-
-    conditioningMethod : int, default: 2
+    conditioningMethod : int, default: 1
         indicates which method is used to update the simulations to account for
         conditioning data; let
 
         * A: index of conditioning cells
         * B: index of non-conditioning cells
-        * Zobs: vector of values of the unconditional simulation Z at conditioning cells
         * :math:`r = \\left(\\begin{array}{cc} r_{AA} & r_{AB}\\\\r_{BA} & r_{BB}\\end{array}\\right)` \
         the covariance matrix, where index A (resp. B) refers to conditioning \
         (resp. non-conditioning) index in the grid;
 
-        an unconditional simulation Z is updated into a conditional simulation ZCond as
-        follows; let
+        then, thre kriging estimates and kriging variances are
 
-        * ZCond[A] = Zobs
-        * ZCond[B] = Z[B] + rBA * rAA^(-1) * (Zobs - Z[A])
+        * krig[B]    = mean + rBA * rAA^(-1) * (v - mean)
+        * krigVar[B] = diag(rBB - rBA * rAA^(-1) * rAB)
 
-        i.e. the update consists in adding the kriging estimates of the residues
-        to an unconditional simulation
+        and the computation is done according to `conditioningMethod`:
 
-        * `conditioningMethod=1` (method CondtioningA): the matrix M = rBA * rAA^(-1) \
-        is explicitly computed (warning: could require large amount of memory), \
-        then all the simulations are updated by a sum and a multiplication by the \
-        matrix M
-        * `conditioningMethod=2` (method CondtioningB, default): for each simulation, \
-        the linear system rAA * x = Zobs - Z[A] is solved and then, the multiplication \
-        by rBA is done via fft
+        * `conditioningMethod=1` (method CondtioningA, default): the matrices \
+        rBA, RAA^(-1) are explicitly computed (warning: could require large \
+        amount of memory)
+        * `conditioningMethod=2` (method CondtioningB): for kriging estimates, \
+        the linear system rAA * y = (v - mean) is solved, and then mean + rBA*y is \
+        computed (via FFT); for kriging variances, the columns of rAB are \
+        extracted by blocks (see `block_size`) and rBB[j,j] - y[j]^t*y[j] is \
+        computed, where y[j] solves C^t * y[j] = rAB[:,j], with rAA = C^t * C \
+        the Cholesky decomposition of rAA
 
-        Note: parameter `conditioningMethod` is used only for conditional simulation
+        In every case, the matrix rAA is never inverted explicitly: its
+        Cholesky decomposition is computed once and used for solving the
+        linear systems.
+
+        Note: set `conditioningMethod=2` if unable to allocate memory
 
     measureErrVar : float, default: 0.0
         measurement error variance; the error on conditioning data is assumed to
         follow the distrubution N(0, `measureErrVar` * I); i.e.
         rAA + `measureErrVar` * I is considered instead of rAA for stabilizing the
-        linear system for this matrix;
-        note: parameter `measureErrVar` is used only for conditional simulation
+        linear system for this matrix
 
     tolInvKappa : float, default: 1.e-10
-        the simulation is stopped if the inverse of the condition number of rAA
-        is above `tolInvKappa`;
-        note: parameter `tolInvKappa` is used only for conditional simulation
+        the computation is stopped if the inverse of the condition number of rAA
+        is above `tolInvKappa`
+
+    computeKrigSD : bool, default: True
+        indicates if the kriging standard deviations are computed
+
+    block_size : int, optional
+        number of non-conditioning cells for which the kriging standard
+        deviation is computed at once with `conditioningMethod=2`, i.e. number
+        of columns of the blocks of rAB (the memory used is proportional to
+        `block_size` times the number of conditioning cells); by default
+        (`None`): set such that each block of rAB has about 2^22 entries;
+        note: parameter `block_size` is used only with `conditioningMethod=2`
+        and `computeKrigSD=True`
+
+    dtype : str or numpy.dtype {'float64', 'float32'}, default: 'float64'
+        floating point type of the output arrays (kriging estimates and
+        standard deviations); the FFTs are computed with the corresponding
+        precision (single precision FFTs are computed with `scipy.fft`),
+        whereas the linear algebra involving the covariance matrix rAA of the
+        conditioning locations is always done in double precision (float64)
 
     verbose : int, default: 1
         verbose mode, higher implies more printing (info):
@@ -3469,14 +3593,16 @@ def grf3D(
 
     Returns
     -------
-    grf : 4D array of shape (`nreal`, n3, n2, n1)
-        GRF realizations, with
-
-        * n1 = nx (= dimension[0]), n2 = ny (= dimension[1]), n3 = nz (= dimension[2]), if `crop=True`,
-        * but n1 >= nx, n2 >= ny, n3 >= nz if `crop=False`;
+    krig : 2D array of shape (ny, nx), or 3D array of shape (ndataset, ny, nx)
+        kriging estimates, with (nx, ny) (= dimension);
+        `krig[iy, ix]`: value at grid cell of index ix (resp. iy) along x (resp. y)
+        axis; if `v` is given as a 2D array (several data sets):
+        `krig[k, iy, ix]`: value for the k-th data set
 
-        `grf[i, iz, iy, ix]`: value of the i-th realisation at grid cell of index
-        ix (resp. iy, iz) along x (resp. y, z) axis
+    krigSD : 2D array of shape (ny, nx), optional
+        kriging standard deviations, with (nx, ny) (= dimension);
+        `krigSD[iy, ix]`: value at grid cell of index ix (resp. iy) along x (resp. y)
+        axis; returned if `computeKrigSD=True`
 
     Notes
     -----
@@ -3512,26 +3638,25 @@ def grf3D(
 
     3. Some mathematical details:
 
-    Discrete Fourier Transform (DFT) of an array x of dim N1 x N2 x N3 is
-    given by
+    Discrete Fourier Transform (DFT) of an array x of dim N1 x N2 is given by
 
         c = DFT(x) = F * x
 
-    where F is the the (N1*N2*N3) x (N1*N2*N3) matrix with coefficients
+    where F is the the (N1*N2) x (N1*N2) matrix with coefficients
 
-        F(j,k) = [exp( -i*2*pi*(j^t*k)/(N1*N2*N3) )], j=(j1,j2,j3), k=(k1,k2,k3) in G,
+        F(j,k) = [exp( -i*2*pi*(j^t*k)/(N1*N2) )], j=(j1,j2), k=(k1,k2) in G,
 
     and
 
-        G = {n=(n1,n2,n3), 0 <= n1 <= N1-1, 0 <= n2 <= N2-1, 0 <= n3 <= N3-1}
+        G = {n=(n1,n2), 0 <= n1 <= N1-1, 0 <= n2 <= N2-1}
 
     denotes the indices grid and where we use the bijection
 
-        (n1,n2,n3) in G -> n1 + n2 * N1 + n3 * N1 * N2 in {0,...,N1*N2*N3-1},
+        (n1,n2) in G -> n1 + n2 * N1 in {0,...,N1*N2-1},
 
     between the multiple-indices and the single indices.
 
-    With N = N1*N2*N3, we have
+    With N = N1*N2, we have
 
         F^(-1) = 1/N * F^(*)
 
@@ -3551,11 +3676,26 @@ def grf3D(
 
     Using `numpy` package:
 
-        numpy.fft.fftn() = DFT()
+        numpy.fft.fft2() = DFT()
 
-        numpy.fft.ifftn() = DFT^(-1)()
+        numpy.fft.ifft2() = DFT^(-1)()
     """
-    fname = 'grf3D'
+    fname = 'krige2D'
+
+    # Floating point type of the output, and FFT module to use
+    try:
+        dtype = np.dtype(dtype)
+    except Exception as exc:
+        err_msg = f'{fname}: `dtype` invalid'
+        raise GrfError(err_msg) from exc
+
+    if dtype == np.float64:
+        fft = np.fft    # double precision
+    elif dtype == np.float32:
+        fft = scipy.fft # single precision is preserved by `scipy.fft`
+    else:
+        err_msg = f"{fname}: `dtype` invalid, should be 'float64' or 'float32'"
+        raise GrfError(err_msg)
 
     # Set verbose mode according to printInfo (if given)
     if printInfo is not None:
@@ -3564,21 +3704,21 @@ def grf3D(
         else:
             verbose = 1
 
-    # Check first argument and get covariance function
+    # Check third argument and get covariance function
     if cov_model.__class__.__name__ == 'function':
         # covariance function is given
         cov_func = cov_model
         cov_range = None # unknown range
-    elif isinstance(cov_model, gcm.CovModel3D):
+    elif isinstance(cov_model, gcm.CovModel2D):
         # Prevent calculation if covariance model is not stationary
         if not cov_model.is_stationary():
             err_msg = f'{fname}: `cov_model` is not stationary: {fname} cannot be applied (use `geone.geosclassicinterface` package)'
             raise GrfError(err_msg)
 
         cov_func = cov_model.func() # covariance function
-        cov_range = cov_model.rxyz()
+        cov_range = cov_model.rxy()
     elif isinstance(cov_model, gcm.CovModel1D):
-        cov_model = gcm.covModel1D_to_covModel3D(cov_model) # convert model 1D in 3D
+        cov_model = gcm.covModel1D_to_covModel2D(cov_model) # convert model 1D in 2D
         # -> cov_model will not be modified at exit
         # Prevent calculation if covariance model is not stationary
         if not cov_model.is_stationary():
@@ -3586,41 +3726,20 @@ def grf3D(
             raise GrfError(err_msg)
 
         cov_func = cov_model.func() # covariance function
-        cov_range = cov_model.rxyz()
+        cov_range = cov_model.rxy()
     else:
         err_msg = f'{fname}: `cov_model` invalid'
         raise GrfError(err_msg)
 
     # aggregate_data_op (default)
     if aggregate_data_op is None:
-        aggregate_data_op = 'sgs'
-
-    # Number of realization(s)
-    nreal = int(nreal) # cast to int if needed
-
-    if nreal <= 0:
-        if verbose > 0:
-            print(f'{fname}: WARNING: `nreal` <= 0: `None` is returned')
-        return None
-
-    if verbose > 1:
-        print(f'{fname}: Preliminary computation...')
+        aggregate_data_op = 'krige'
 
-    #### Preliminary computation ####
-    nx, ny, nz = dimension
-    sx, sy, sz = spacing
-    ox, oy, oz = origin
+    nx, ny = dimension
+    sx, sy = spacing
+    ox, oy = origin
 
     nxy = nx*ny
-    nxyz = nxy * nz
-
-    if method not in (1, 2, 3):
-        err_msg = f'{fname}: `method` invalid'
-        raise GrfError(err_msg)
-
-    if method == 2:
-        err_msg = f'{fname}: `method=2` not implemented'
-        raise GrfError(err_msg)
 
     if x is None and v is not None:
         err_msg = f'{fname}: `x` is not given (`None`) but `v` is given (not `None`)'
@@ -3631,13 +3750,22 @@ def grf3D(
             err_msg = f'{fname}: `conditioningMethod` invalid'
             raise GrfError(err_msg)
 
+        if block_size is not None:
+            block_size = int(block_size) # cast to int if needed
+            if block_size <= 0:
+                err_msg = f'{fname}: `block_size` invalid'
+                raise GrfError(err_msg)
+
         if v is None:
             err_msg = f'{fname}: `x` is given (not `None`) but `v` is not given (`None`)'
             raise GrfError(err_msg)
 
-        x = np.asarray(x, dtype='float').reshape(-1, 3) # cast in 3-dimensional array if needed
-        v = np.asarray(v, dtype='float').reshape(-1) # cast in 1-dimensional array if needed
-        if len(v) != x.shape[0]:
+        x = np.asarray(x, dtype='float').reshape(-1, 2) # cast in 2-dimensional array if needed
+        v = np.asarray(v, dtype='float')
+        if v.ndim != 2:
+            v = v.reshape(-1) # cast in 1-dimensional array if needed
+        # else: several data sets (one per row of v)
+        if v.shape[-1] != x.shape[0]:
             err_msg = f'{fname}: length of `v` is not valid'
             raise GrfError(err_msg)
 
@@ -3645,21 +3773,20 @@ def grf3D(
     if mean is not None:
         if callable(mean):
             if x is not None:
-                mean_x = mean(x[:, 0], x[:, 1], x[:, 2])
+                mean_x = mean(x[:, 0], x[:, 1])
             xi = ox + sx*(0.5+np.arange(nx)) # x-coordinate of cell center
             yi = oy + sy*(0.5+np.arange(ny)) # y-coordinate of cell center
-            zi = oz + sz*(0.5+np.arange(nz)) # z-coordinate of cell center
-            zzi, yyi, xxi = np.meshgrid(zi, yi, xi, indexing='ij')
-            mean = mean(xxi, yyi, zzi) # replace function 'mean' by its evaluation on the grid
+            yyi, xxi = np.meshgrid(yi, xi, indexing='ij')
+            mean = mean(xxi, yyi) # replace function 'mean' by its evaluation on the grid
         else:
             mean = np.asarray(mean, dtype='float').reshape(-1) # cast in 1-dimensional array if needed
             if mean.size == 1:
                 if x is not None:
                     mean_x = mean
-            elif mean.size == nxyz:
-                mean = mean.reshape(nz, ny, nx)
+            elif mean.size == nxy:
+                mean = mean.reshape(ny, nx)
                 if x is not None:
-                    mean_x = img.Img_interp_func(img.Img(nx, ny, nz, sx, sy, sz, ox, oy, oz, nv=1, val=mean))(x)
+                    mean_x = img.Img_interp_func(img.Img(nx, ny, 1, sx, sy, 1., ox, oy, 0., nv=1, val=mean), iz=0)(x)
             else:
                 err_msg = f'{fname}: size of `mean` is not valid'
                 raise GrfError(err_msg)
@@ -3669,509 +3796,1437 @@ def grf3D(
         if callable(var):
             xi = ox + sx*(0.5+np.arange(nx)) # x-coordinate of cell center
             yi = oy + sy*(0.5+np.arange(ny)) # y-coordinate of cell center
-            zi = oz + sz*(0.5+np.arange(nz)) # z-coordinate of cell center
-            zzi, yyi, xxi = np.meshgrid(zi, yi, xi, indexing='ij')
-            var = var(xxi, yyi, zzi) # replace function 'var' by its evaluation on the grid
+            yyi, xxi = np.meshgrid(yi, xi, indexing='ij')
+            var = var(xxi, yyi) # replace function 'var' by its evaluation on the grid
         else:
             var = np.asarray(var, dtype='float').reshape(-1) # cast in 1-dimensional array if needed
             if var.size == 1:
                 if x is not None:
                     var_x = var
-            elif var.size == nxyz:
-                var = var.reshape(nz, ny, nx)
+            elif var.size == nxy:
+                var = var.reshape(ny, nx)
                 if x is not None:
-                    var_x = img.Img_interp_func(img.Img(nx, ny, nz, sx, sy, sz, ox, oy, oz, nv=1, val=var))(x)
+                    var_x = img.Img_interp_func(img.Img(nx, ny, 1, sx, sy, 1., ox, oy, 0., nv=1, val=var), iz=0)(x)
             else:
                 err_msg = f'{fname}: size of `var` is not valid'
                 raise GrfError(err_msg)
 
-    # data point set from x, v
-    if x is not None:
-        if aggregate_data_op_kwargs is None:
-            aggregate_data_op_kwargs = {}
-        if aggregate_data_op == 'krige' or aggregate_data_op == 'sgs':
-            if cov_range is None:
-                # cov_model is directly the covariance function
-                err_msg = f"{fname}: `cov_model` must be a model (not directly a function) when `aggregate_data_op='{aggregate_data_op}'` is used"
-                raise GrfError(err_msg)
+    if x is None:
+        # No data: kriging return the mean and the standard deviation...
+        krig = np.zeros((ny, nx), dtype=dtype)
+        if mean is not None:
+            krig[...] = mean
+        if computeKrigSD:
+            krigSD = np.zeros((ny, nx), dtype=dtype)
+            if var is not None:
+                krigSD[...] = np.sqrt(var)
+            else:
+                krigSD[...] = np.sqrt(cov_func(np.zeros(2)))
+            return krig, krigSD
+        else:
+            return krig
 
-            # Get grid cell with at least one data point:
-            # x_agg: 2D array, each row contains the coordinates of the center of such cell
-            try:
-                im_tmp = img.imageFromPoints(
-                        x, values=None, varname=None,
-                        nx=nx, ny=ny, nz=nz, sx=sx, sy=sy, sz=sz, ox=ox, oy=oy, oz=oz,
-                        indicator_var=True, count_var=False)
-            except Exception as exc:
-                err_msg = f'{fname}: cannot set image from points'
-                raise GrfError(err_msg) from exc
+    if aggregate_data_op_kwargs is None:
+        aggregate_data_op_kwargs = {}
 
-            ind_agg = np.where(im_tmp.val[0])
-            if len(ind_agg[0]) == 0:
-                err_msg = f'{fname}: no data point in grid'
-                raise GrfError(err_msg)
+    if aggregate_data_op == 'krige':
+        if cov_range is None:
+            # cov_model is directly the covariance function
+            err_msg = f"{fname}: `cov_model` must be a model (not directly a function) when `aggregate_data_op='{aggregate_data_op}'` is used"
+            raise GrfError(err_msg)
 
-            x_agg = np.array((im_tmp.xx()[ind_agg].reshape(-1), im_tmp.yy()[ind_agg].reshape(-1), im_tmp.zz()[ind_agg].reshape(-1))).T
-            # x_agg = np.array((im_tmp.xx()[*ind_agg].reshape(-1), im_tmp.yy()[*ind_agg].reshape(-1), im_tmp.zz()[*ind_agg].reshape(-1))).T
-            del(im_tmp)
-            # Compute
-            # - kriging estimate (v_agg) and kriging std (v_agg_std) at x_agg,
-            # - or nreal simulation(s) (v_agg) at x_agg
-            if mean is not None and mean.size > 1:
-                mean_x_agg = mean[ind_agg]
-                # mean_x_agg = mean[*ind_agg]
-            else:
-                mean_x_agg = mean
-            if var is not None and var.size > 1:
-                var_x_agg = var[ind_agg]
-                # var_x_agg = var[*ind_agg]
-            else:
-                var_x_agg = var
-            if aggregate_data_op == 'krige':
-                try:
-                    v_agg, v_agg_std = gcm.krige(
-                            x, v, x_agg, cov_model, method='simple_kriging',
-                            mean_x=mean_x, mean_xu=mean_x_agg,
-                            var_x=var_x, var_xu=var_x_agg,
+        # Get grid cell with at least one data point:
+        # x_agg: 2D array, each row contains the coordinates of the center of such cell
+        try:
+            im_tmp = img.imageFromPoints(
+                    x, values=None, varname=None,
+                    nx=nx, ny=ny, sx=sx, sy=sy, ox=ox, oy=oy,
+                    indicator_var=True, count_var=False)
+        except Exception as exc:
+            err_msg = f'{fname}: cannot set image from points'
+            raise GrfError(err_msg) from exc
+
+        ind_agg = np.where(im_tmp.val[0])
+        if len(ind_agg[0]) == 0:
+            err_msg = f'{fname}: no data point in grid'
+            raise GrfError(err_msg)
+
+        x_agg = np.array((im_tmp.xx()[ind_agg].reshape(-1), im_tmp.yy()[ind_agg].reshape(-1))).T
+        # x_agg = np.array((im_tmp.xx()[*ind_agg].reshape(-1), im_tmp.yy()[*ind_agg].reshape(-1))).T
+        ind_agg = ind_agg[1:] # remove index along z axis
+        del(im_tmp)
+        # Compute
+        # - kriging estimate (v_agg) and kriging std (v_agg_std) at x_agg,
+        # - or nreal simulation(s) (v_agg) at x_agg
+        if mean is not None and mean.size > 1:
+            mean_x_agg = mean[ind_agg]
+            # mean_x_agg = mean[*ind_agg]
+        else:
+            mean_x_agg = mean
+        if var is not None and var.size > 1:
+            var_x_agg = var[ind_agg]
+            # var_x_agg = var[*ind_agg]
+        else:
+            var_x_agg = var
+        try:
+            if v.ndim == 2:
+                # several data sets (the kriging std does not depend on the data values)
+                v_agg = np.zeros((v.shape[0], x_agg.shape[0]))
+                for k, vk in enumerate(v):
+                    v_agg[k], v_agg_std = gcm.krige(
+                            x, vk, x_agg, cov_model, method='simple_kriging',
+                            mean_x=mean_x, mean_xu=mean_x_agg,
+                            var_x=var_x, var_xu=var_x_agg,
                             verbose=0, **aggregate_data_op_kwargs)
-                except Exception as exc:
-                    err_msg = f"{fname}: aggratating data points in grid failed (`aggregate_data_op='{aggregate_data_op}'`)"
-                    raise GrfError(err_msg) from exc
+            else:
+                v_agg, v_agg_std = gcm.krige(
+                        x, v, x_agg, cov_model, method='simple_kriging',
+                        mean_x=mean_x, mean_xu=mean_x_agg,
+                        var_x=var_x, var_xu=var_x_agg,
+                        verbose=0, **aggregate_data_op_kwargs)
+        except Exception as exc:
+            err_msg = f"{fname}: aggratating data points in grid failed (`aggregate_data_op='{aggregate_data_op}'`)"
+            raise GrfError(err_msg) from exc
+
+        xx_agg, yy_agg = x_agg.T
+        # zz_agg = 0.5*np.ones_like(xx_agg)
+    else:
+        # Aggregate data on grid cell by using the given operation
+        xx, yy = x.T
+        zz = 0.5*np.ones_like(xx)
+        try:
+            xx_agg, yy_agg, zz_agg, v_agg = img.aggregateDataPointsWrtGrid(
+                    xx, yy, zz, v,
+                    nx, ny, 1, sx, sy, 1.0, ox, oy, 0.0,
+                    op=aggregate_data_op, **aggregate_data_op_kwargs)
+        except Exception as exc:
+            err_msg = f"{fname}: aggratating data points in grid failed (`aggregate_data_op='{aggregate_data_op}'`)"
+            raise GrfError(err_msg) from exc
+
+        if len(xx_agg) == 0:
+            err_msg = f'{fname}: no data point in grid'
+            raise GrfError(err_msg)
+
+    if extensionMin is None:
+        # default extensionMin
+        if cov_range is not None: # known range
+            # ... based on range of covariance model
+            extensionMin = [extension_min(rangeFactorForExtensionMin*r, n, s) for r, n, s in zip(cov_range, dimension, spacing)]
+        else:
+            # ... based on dimension
+            extensionMin = [nx-1, ny-1]
+
+    N1min = nx + extensionMin[0]
+    N2min = ny + extensionMin[1]
+
+    if verbose > 1:
+        print(f'{fname}: Computing circulant embedding...')
+
+    # Circulant embedding of the covariance matrix
+    # --------------------------------------------
+    # The embedding matrix is a (N1,N2)-nested block circulant matrix, computed from
+    # the covariance function.
+    # To take a maximal benefit of Fast Fourier Transform (FFT) for computing DFT,
+    # we choose
+    #     N1 = 2^g1 (a power of 2), with N1 >= N1min, N1 >= 2
+    #     N2 = 2^g2 (a power of 2), with N2 >= N2min, N2 >= 2
+    g1 = int(max(np.ceil(np.log2(N1min)), 1.0))
+    g2 = int(max(np.ceil(np.log2(N2min)), 1.0))
+    N1 = int(2**g1)
+    N2 = int(2**g2)
+
+    if verbose > 1:
+        print(f'{fname}: embedding dimension: {N1} x {N2}')
+
+    N = N1*N2
+
+    # ccirc: coefficient of the embedding matrix (N2, N1) array
+    L1 = int (N1/2)
+    L2 = int (N2/2)
+    h1 = np.arange(-L1, L1, dtype=float) * sx # [-L1 ... 0 ... L1-1] * sx
+    h2 = np.arange(-L2, L2, dtype=float) * sy # [-L2 ... 0 ... L2-1] * sy
+
+    hh = np.meshgrid(h1, h2)
+    ccirc = cov_func(np.hstack((hh[0].reshape(-1,1), hh[1].reshape(-1,1))))
+    ccirc.resize(N2, N1)
+
+    del(h1, h2, hh)
+
+    # ...shift first L1 index to the end of the axis 1:
+    ind = np.arange(L1)
+    ccirc = ccirc[:, np.hstack((ind+L1, ind))]
+    # ...shift first L2 index to the end of the axis 0:
+    ind = np.arange(L2)
+    ccirc = ccirc[np.hstack((ind+L2, ind)), :]
+
+    del(ind)
+
+    if verbose > 1:
+        print(f'{fname}: Computing FFT of circulant matrix...')
+
+    # Compute the Discrete Fourier Transform (DFT) of ccric, via FFT
+    # --------------------------------------------------------------
+    # The (2-dimensional) DFT coefficients
+    #   lam = DFT(ccirc) = {lam(k1,k2), 0<=k1<=N1-1, 0<=k2<=N2-1}
+    # are the eigen values of the embedding matrix.
+    # We have:
+    #   a) lam are real coefficients, because the embedding matrix is symmetric
+    #   b) lam(k1,k2) = lam(N1-k1,N2-k2), 1<=k1<=N1-1, 1<=k2<=N2-1, because the coefficients ccirc are real
+    lam = np.real(np.fft.fft2(ccirc))
+    # ...note that the imaginary parts are equal to 0
+
+    # Eventual use of approximate embedding
+    # -------------------------------------
+    # If some DFT coefficients are negative, then set them to zero
+    # and update them to fit the marginals distribution (approximate embedding)
+    if np.min(lam) < 0:
+        lam = np.sum(lam)/np.sum(np.maximum(lam, 0.)) * np.maximum(lam, 0.)
+
+    # Take the square root of the (updated) DFT coefficients
+    # ------------------------------------------------------
+    lamSqrt = np.sqrt(lam).astype(dtype, copy=False)
+    lam = lam.astype(dtype, copy=False)
+
+    # For specified variance
+    # ----------------------
+    # Compute updating factor
+    if var is not None:
+        varUpdate = np.sqrt(var/cov_func(np.zeros(2)))
+
+    # Kriging
+    # -------
+    # Let
+    #    A: index of conditioning nodes
+    #    B: index of non-conditioning nodes
+    #    Zobs: vector of values at conditioning nodes
+    # and
+    #        +         +
+    #        | rAA rAB |
+    #    r = |         |
+    #        | rBA rBB |
+    #        +         +
+    # the covariance matrix, where index A (resp. B) refers to
+    # conditioning (resp. non-conditioning) index in the grid.
+    #
+    # Then, the kriging estimates are
+    #     mean + rBA * rAA^(-1) * (v - mean)
+    # and the kriging standard deviation
+    #    diag(rBB - rBA * rAA^(-1) * rAB)
+
+    # Compute the part rAA of the covariance matrix
+    # Note: if a variance var is specified, then the matrix r should be updated
+    # by the following operation:
+    #    diag((var/cov_func(0))^1/2) * r * diag((var/cov_func(0))^1/2)
+    # which is accounting in the computation of kriging estimates and standard
+    # deviation below
+
+    if verbose > 1:
+        print(f'{fname}: Computing covariance matrix (rAA) for conditioning locations...')
+
+    # Compute
+    #    indc: node index of conditioning node,
+    #          rounded to lower index if between two grid node and index is positive
+    indc_f = (np.array((xx_agg, yy_agg)).T-origin)/spacing
+    indc = indc_f.astype(int)
+    indc = indc - 1 * np.all((indc == indc_f, indc > 0), axis=0)
+    ix, iy = indc[:, 0], indc[:, 1]
+
+    indc = ix + iy * nx # single-indices
+
+    nc = len(xx_agg)
+
+    # rAA
+    diagEntry = ccirc[0, 0] + measureErrVar
+    rAA = _cov_matrix_cond_from_ccirc(ccirc, (iy, ix), diagEntry)
+
+    # Test if rAA is almost singular...
+    # (rAA is symmetric: its condition number is computed from its eigen values)
+    rAAeig = np.abs(np.linalg.eigvalsh(rAA))
+    if np.min(rAAeig) < tolInvKappa * np.max(rAAeig):
+        err_msg = f'{fname}: conditioning issue: condition number of matrix rAA is too big'
+        raise GrfError(err_msg)
+
+    del(rAAeig)
+
+    # Cholesky decomposition of rAA (computed once, used for solving linear systems)
+    try:
+        rAAcho = scipy.linalg.cho_factor(rAA, overwrite_a=True)
+    except np.linalg.LinAlgError as exc:
+        err_msg = f'{fname}: conditioning issue: matrix rAA is not positive definite'
+        raise GrfError(err_msg) from exc
+
+    del(rAA)
+
+    # Compute:
+    #    indnc: node index of non-conditioning node (nearest node)
+    indnc = np.asarray(np.setdiff1d(np.arange(nxy), indc), dtype=int)
+    nnc = len(indnc)
+
+    ky = np.floor_divide(indnc, nx)
+    kx = np.mod(indnc, nx)
+
+    # Initialize
+    # (the first axis of krig corresponds to the data sets if several ones are given)
+    krig = np.zeros(v_agg.shape[:-1] + (ny*nx, ), dtype=dtype)
+    if computeKrigSD:
+        krigSD = np.zeros(ny*nx, dtype=dtype)
+
+    if mean is None:
+        # Set mean for kriging (mean of the data, for each data set)
+        mean = np.mean(v, axis=-1, keepdims=True)
+        v_agg = v_agg - mean
+        mean = mean.reshape(mean.shape[:-1] + (1, ) * 2) # (to be added to the estimates on the grid)
+    elif mean.size == 1:
+        v_agg = v_agg - mean
+    else:
+        v_agg = v_agg - mean.reshape(-1)[indc]
+
+    if var is not None and var.size > 1:
+        v_agg = 1./varUpdate.reshape(-1)[indc] * v_agg
+
+    if conditioningMethod == 1:
+        # Method ConditioningA
+        # --------------------
+        if verbose > 1:
+            print(f'{fname}: Computing covariance matrix (rBA) for non-conditioning / conditioning locations...')
+
+        # Compute the parts rBA of the covariance matrix (see above)
+        # rBA
+        rBA = _cov_matrix_from_ccirc(ccirc, (ky, kx), (iy, ix))
+
+        del(ix, iy, kx, ky)
+        del(ccirc)
+
+        if verbose > 1:
+            print(f'{fname}: Computing rBA * rAA^(-1)...')
+
+        # compute rBA * rAA^(-1) = (rAA^(-1) * rAB)^T
+        rBArAAinv = scipy.linalg.cho_solve(rAAcho, rBA.T).T
+
+        del(rAAcho)
+        if not computeKrigSD:
+            del(rBA)
+
+        # Compute kriging estimates
+        if verbose > 1:
+            print(f'{fname}: computing kriging estimates...')
+
+        krig[..., indnc] = np.dot(rBArAAinv, v_agg.T).T
+        krig[..., indc] = v_agg
+
+        if computeKrigSD:
+            # Compute kriging standard deviation
+            if verbose > 1:
+                print(f'{fname}: computing kriging standard deviation ...')
+
+            # diag(rBA * rAA^(-1) * rAB), row by row (without loop)
+            krigSD[indnc] = np.sqrt(np.maximum(diagEntry - np.einsum('ij,ij->i', rBArAAinv, rBA), 0.))
+
+            del(rBA)
+
+    elif conditioningMethod == 2:
+        # Method ConditioningB
+        # --------------------
+        if not computeKrigSD:
+            del(ccirc)
+
+        if verbose > 1:
+            print(f'{fname}: Computing index in the embedding grid for non-conditioning / conditioning locations...')
+
+        # Compute index in the embedding grid for indc and indnc
+        # (to allow use of fft)
+        indcEmb =  iy * N1 + ix
+        indncEmb = ky * N1 + kx
+
+        # Compute kriging estimates
+        if verbose > 1:
+            print(f'{fname}: computing kriging estimates...')
+
+        # Compute
+        #    u = rAA^(-1) * v_agg, and then
+        #    Z = rBA * u via the circulant embedding of the covariance matrix
+        # (for all data sets at once: batched solve and FFTs along the last two axes)
+        uEmb = np.zeros(v_agg.shape[:-1] + (N2*N1, ), dtype=dtype)
+        uEmb[..., indcEmb] = scipy.linalg.cho_solve(rAAcho, v_agg.T).T
+        Z = fft.ifft2(lam * fft.fft2(uEmb.reshape(v_agg.shape[:-1] + (N2, N1))))
+        # ...note that Im(Z) = 0
+        krig[..., indnc] = np.real(Z.reshape(v_agg.shape[:-1] + (-1, ))[..., indncEmb])
+        krig[..., indc] = v_agg
+
+        if computeKrigSD:
+            # Compute kriging standard deviation
+            if verbose > 1:
+                print(f'{fname}: computing kriging standard deviation ...')
+
+            if block_size is None:
+                block_size = max(2**22 // nc, 1)
+
+            # diag(rBA * rAA^(-1) * rAB), by blocks of non-conditioning cells
+            krigSD[indnc] = np.sqrt(np.maximum(diagEntry - _krige_var_reduction(rAAcho, ccirc, (ky, kx), (iy, ix), block_size), 0.))
+
+            del(ccirc)
+
+        del(ix, iy, kx, ky)
+
+    if aggregate_data_op == 'krige' and computeKrigSD:
+        # Set kriging standard deviation at grid cell containing a data
+        krigSD[indc] = v_agg_std
+
+    # ... update if non-stationary covariance is specified
+    if var is not None:
+        if var.size > 1:
+            krig *= varUpdate.reshape(-1)
+        if computeKrigSD:
+            krigSD *= varUpdate.reshape(-1)
+
+    krig = krig.reshape(krig.shape[:-1] + (ny, nx))
+    if computeKrigSD:
+        krigSD.resize(ny, nx)
+
+    krig += mean
+
+    if computeKrigSD:
+        return krig, krigSD
+    else:
+        return krig
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+def _grf3D_preliminary(
+        fname,
+        cov_model,
+        dimension, spacing=(1.0, 1.0, 1.0), origin=(0.0, 0.0, 0.0),
+        x=None, v=None,
+        aggregate_data_op=None,
+        aggregate_data_op_kwargs=None,
+        mean=None, var=None,
+        nreal=1,
+        extensionMin=None, rangeFactorForExtensionMin=1.0,
+        crop=True,
+        method=3, conditioningMethod=2,
+        conditioningChunkSize=None,
+        measureErrVar=0.0, tolInvKappa=1.e-10,
+        dtype='float64',
+        rng=None,
+        verbose=1):
+    """
+    Preliminary computation for GRF simulations in 3D (see function :func:`grf3D`).
+
+    This function checks the parameters and computes the circulant embedding
+    of the covariance matrix and its DFT; for conditional simulations, the
+    data points are aggregated in the grid cells and the Cholesky decomposition
+    of the covariance matrix of the conditioning locations is computed.
+
+    The parameters are the same as those of the function :func:`grf3D`
+    (`nreal` is assumed to be a positive int), and `fname` is the name of
+    the calling function (for displaying).
+
+    Returns
+    -------
+    sim : dict
+        parameters and arrays used for generating the realizations (see
+        function :func:`_grf_simulate`)
+    """
+    # Floating point type of the output
+    try:
+        dtype = np.dtype(dtype)
+    except Exception as exc:
+        err_msg = f'{fname}: `dtype` invalid'
+        raise GrfError(err_msg) from exc
+
+    if dtype not in (np.float64, np.float32):
+        err_msg = f"{fname}: `dtype` invalid, should be 'float64' or 'float32'"
+        raise GrfError(err_msg)
+
+    # Check first argument and get covariance function
+    if cov_model.__class__.__name__ == 'function':
+        # covariance function is given
+        cov_func = cov_model
+        cov_range = None # unknown range
+    elif isinstance(cov_model, gcm.CovModel3D):
+        # Prevent calculation if covariance model is not stationary
+        if not cov_model.is_stationary():
+            err_msg = f'{fname}: `cov_model` is not stationary: {fname} cannot be applied (use `geone.geosclassicinterface` package)'
+            raise GrfError(err_msg)
+
+        cov_func = cov_model.func() # covariance function
+        cov_range = cov_model.rxyz()
+    elif isinstance(cov_model, gcm.CovModel1D):
+        cov_model = gcm.covModel1D_to_covModel3D(cov_model) # convert model 1D in 3D
+        # -> cov_model will not be modified at exit
+        # Prevent calculation if covariance model is not stationary
+        if not cov_model.is_stationary():
+            err_msg = f'{fname}: `cov_model` is not stationary: {fname} cannot be applied (use `geone.geosclassicinterface` package)'
+            raise GrfError(err_msg)
+
+        cov_func = cov_model.func() # covariance function
+        cov_range = cov_model.rxyz()
+    else:
+        err_msg = f'{fname}: `cov_model` invalid'
+        raise GrfError(err_msg)
+
+    # aggregate_data_op (default)
+    if aggregate_data_op is None:
+        aggregate_data_op = 'sgs'
+
+    # Random number generator (stream) for each realization
+    try:
+        rngs = randomStream.rng_streams(rng, nreal)
+    except Exception as exc:
+        err_msg = f'{fname}: `rng` invalid'
+        raise GrfError(err_msg) from exc
+
+    if verbose > 1:
+        print(f'{fname}: Preliminary computation...')
+
+    #### Preliminary computation ####
+    nx, ny, nz = dimension
+    sx, sy, sz = spacing
+    ox, oy, oz = origin
+
+    nxy = nx*ny
+    nxyz = nxy * nz
+
+    if method not in (1, 2, 3):
+        err_msg = f'{fname}: `method` invalid'
+        raise GrfError(err_msg)
+
+    if method == 2:
+        err_msg = f'{fname}: `method=2` not implemented'
+        raise GrfError(err_msg)
+
+    if x is None and v is not None:
+        err_msg = f'{fname}: `x` is not given (`None`) but `v` is given (not `None`)'
+        raise GrfError(err_msg)
+
+    if x is not None:
+        if conditioningMethod not in (1, 2, 3):
+            err_msg = f'{fname}: `conditioningMethod` invalid'
+            raise GrfError(err_msg)
+
+        if conditioningChunkSize is not None:
+            conditioningChunkSize = int(conditioningChunkSize) # cast to int if needed
+            if conditioningChunkSize <= 0:
+                err_msg = f'{fname}: `conditioningChunkSize` invalid'
+                raise GrfError(err_msg)
+
+        if v is None:
+            err_msg = f'{fname}: `x` is given (not `None`) but `v` is not given (`None`)'
+            raise GrfError(err_msg)
+
+        x = np.asarray(x, dtype='float').reshape(-1, 3) # cast in 3-dimensional array if needed
+        v = np.asarray(v, dtype='float').reshape(-1) # cast in 1-dimensional array if needed
+        if len(v) != x.shape[0]:
+            err_msg = f'{fname}: length of `v` is not valid'
+            raise GrfError(err_msg)
+
+    mean_x = mean
+    if mean is not None:
+        if callable(mean):
+            if x is not None:
+                mean_x = mean(x[:, 0], x[:, 1], x[:, 2])
+            xi = ox + sx*(0.5+np.arange(nx)) # x-coordinate of cell center
+            yi = oy + sy*(0.5+np.arange(ny)) # y-coordinate of cell center
+            zi = oz + sz*(0.5+np.arange(nz)) # z-coordinate of cell center
+            zzi, yyi, xxi = np.meshgrid(zi, yi, xi, indexing='ij')
+            mean = mean(xxi, yyi, zzi) # replace function 'mean' by its evaluation on the grid
+        else:
+            mean = np.asarray(mean, dtype='float').reshape(-1) # cast in 1-dimensional array if needed
+            if mean.size == 1:
+                if x is not None:
+                    mean_x = mean
+            elif mean.size == nxyz:
+                mean = mean.reshape(nz, ny, nx)
+                if x is not None:
+                    mean_x = img.Img_interp_func(img.Img(nx, ny, nz, sx, sy, sz, ox, oy, oz, nv=1, val=mean))(x)
+            else:
+                err_msg = f'{fname}: size of `mean` is not valid'
+                raise GrfError(err_msg)
+
+    var_x = var
+    if var is not None:
+        if callable(var):
+            xi = ox + sx*(0.5+np.arange(nx)) # x-coordinate of cell center
+            yi = oy + sy*(0.5+np.arange(ny)) # y-coordinate of cell center
+            zi = oz + sz*(0.5+np.arange(nz)) # z-coordinate of cell center
+            zzi, yyi, xxi = np.meshgrid(zi, yi, xi, indexing='ij')
+            var = var(xxi, yyi, zzi) # replace function 'var' by its evaluation on the grid
+        else:
+            var = np.asarray(var, dtype='float').reshape(-1) # cast in 1-dimensional array if needed
+            if var.size == 1:
+                if x is not None:
+                    var_x = var
+            elif var.size == nxyz:
+                var = var.reshape(nz, ny, nx)
+                if x is not None:
+                    var_x = img.Img_interp_func(img.Img(nx, ny, nz, sx, sy, sz, ox, oy, oz, nv=1, val=var))(x)
+            else:
+                err_msg = f'{fname}: size of `var` is not valid'
+                raise GrfError(err_msg)
+
+    # data point set from x, v
+    if x is not None:
+        if aggregate_data_op_kwargs is None:
+            aggregate_data_op_kwargs = {}
+        if aggregate_data_op == 'krige' or aggregate_data_op == 'sgs':
+            if cov_range is None:
+                # cov_model is directly the covariance function
+                err_msg = f"{fname}: `cov_model` must be a model (not directly a function) when `aggregate_data_op='{aggregate_data_op}'` is used"
+                raise GrfError(err_msg)
+
+            # Get grid cell with at least one data point:
+            # x_agg: 2D array, each row contains the coordinates of the center of such cell
+            try:
+                im_tmp = img.imageFromPoints(
+                        x, values=None, varname=None,
+                        nx=nx, ny=ny, nz=nz, sx=sx, sy=sy, sz=sz, ox=ox, oy=oy, oz=oz,
+                        indicator_var=True, count_var=False)
+            except Exception as exc:
+                err_msg = f'{fname}: cannot set image from points'
+                raise GrfError(err_msg) from exc
+
+            ind_agg = np.where(im_tmp.val[0])
+            if len(ind_agg[0]) == 0:
+                err_msg = f'{fname}: no data point in grid'
+                raise GrfError(err_msg)
+
+            x_agg = np.array((im_tmp.xx()[ind_agg].reshape(-1), im_tmp.yy()[ind_agg].reshape(-1), im_tmp.zz()[ind_agg].reshape(-1))).T
+            # x_agg = np.array((im_tmp.xx()[*ind_agg].reshape(-1), im_tmp.yy()[*ind_agg].reshape(-1), im_tmp.zz()[*ind_agg].reshape(-1))).T
+            del(im_tmp)
+            # Compute
+            # - kriging estimate (v_agg) and kriging std (v_agg_std) at x_agg,
+            # - or nreal simulation(s) (v_agg) at x_agg
+            if mean is not None and mean.size > 1:
+                mean_x_agg = mean[ind_agg]
+                # mean_x_agg = mean[*ind_agg]
+            else:
+                mean_x_agg = mean
+            if var is not None and var.size > 1:
+                var_x_agg = var[ind_agg]
+                # var_x_agg = var[*ind_agg]
+            else:
+                var_x_agg = var
+            if aggregate_data_op == 'krige':
+                try:
+                    v_agg, v_agg_std = gcm.krige(
+                            x, v, x_agg, cov_model, method='simple_kriging',
+                            mean_x=mean_x, mean_xu=mean_x_agg,
+                            var_x=var_x, var_xu=var_x_agg,
+                            verbose=0, **aggregate_data_op_kwargs)
+                except Exception as exc:
+                    err_msg = f"{fname}: aggratating data points in grid failed (`aggregate_data_op='{aggregate_data_op}'`)"
+                    raise GrfError(err_msg) from exc
+
+                # all real (same values)
+                v_agg = np.tile(v_agg, nreal).reshape(nreal, -1)
+            else:
+                try:
+                    v_agg = gcm.sgs(
+                            x, v, x_agg, cov_model, method='simple_kriging',
+                            mean_x=mean_x, mean_xu=mean_x_agg,
+                            var_x=var_x, var_xu=var_x_agg,
+                            nreal=nreal, seed=None,
+                            rng=None if randomStream.is_legacy(rng) else rngs,
+                            verbose=0, **aggregate_data_op_kwargs)
+                except Exception as exc:
+                    err_msg = f"{fname}: aggratating data points in grid failed (`aggregate_data_op='{aggregate_data_op}'`)"
+                    raise GrfError(err_msg) from exc
+
+            xx_agg, yy_agg, zz_agg = x_agg.T
+        elif aggregate_data_op == 'random':
+            # Aggregate data on grid cell by taking random point
+            xx, yy, zz = x.T
+            # first realization of v_agg
+            try:
+                xx_agg, yy_agg, zz_agg, v_agg, i_inv = img.aggregateDataPointsWrtGrid(
+                        xx, yy, zz, v,
+                        nx, ny, nz, sx, sy, sz, ox, oy, oz,
+                        op=aggregate_data_op, return_inverse=True,
+                        **aggregate_data_op_kwargs)
+            except Exception as exc:
+                err_msg = f"{fname}: aggratating data points in grid failed (`aggregate_data_op='{aggregate_data_op}'`)"
+                raise GrfError(err_msg) from exc
+
+            if len(xx_agg) == 0:
+                err_msg = f'{fname}: no data point in grid'
+                raise GrfError(err_msg)
+
+            # next realizations of v_agg
+            # (with independent streams, the first one is also drawn with its own stream)
+            v_agg = np.vstack((v_agg, np.zeros((nreal-1, v_agg.size))))
+            for i in range(int(randomStream.is_legacy(rng)), nreal):
+                v_agg[i] = [v[rngs[i].choice(np.where(i_inv==j)[0])] for j in range(len(xx_agg))]
+        else:
+            # Aggregate data on grid cell by using the given operation
+            xx, yy, zz = x.T
+            try:
+                xx_agg, yy_agg, zz_agg, v_agg = img.aggregateDataPointsWrtGrid(
+                        xx, yy, zz, v,
+                        nx, ny, nz, sx, sy, sz, ox, oy, oz,
+                        op=aggregate_data_op, **aggregate_data_op_kwargs)
+            except Exception as exc:
+                err_msg = f"{fname}: aggratating data points in grid failed (`aggregate_data_op='{aggregate_data_op}'`)"
+                raise GrfError(err_msg) from exc
+
+            if len(xx_agg) == 0:
+                err_msg = f'{fname}: no data point in grid'
+                raise GrfError(err_msg)
+
+            # all real (same values)
+            v_agg = np.tile(v_agg, nreal).reshape(nreal, -1)
+
+    if not crop:
+        if x is not None: # conditional simulation
+            err_msg = f'{fname}: `crop=False` cannot be used with conditional simulation'
+            raise GrfError(err_msg)
+
+        if mean is not None and mean.size > 1:
+            err_msg = f'{fname}: `crop=False` cannot be used with non-stationary mean'
+            raise GrfError(err_msg)
+
+        if var is not None and var.size > 1:
+            err_msg = f'{fname}: `crop=False` cannot be used with non-stationary variance'
+            raise GrfError(err_msg)
+
+    if extensionMin is None:
+        # default extensionMin
+        if cov_range is not None: # known range
+            # ... based on range of covariance model
+            extensionMin = [extension_min(rangeFactorForExtensionMin*r, n, s) for r, n, s in zip(cov_range, dimension, spacing)]
+        else:
+            # ... based on dimension
+            extensionMin = [nx-1, ny-1, nz-1] # default
+
+    N1min = nx + extensionMin[0]
+    N2min = ny + extensionMin[1]
+    N3min = nz + extensionMin[2]
+
+    if verbose > 1:
+        print(f'{fname}: Computing circulant embedding...')
+
+    # Circulant embedding of the covariance matrix
+    # --------------------------------------------
+    # The embedding matrix is a (N1,N2,N3)-nested block circulant matrix, computed from
+    # the covariance function.
+    # To take a maximal benefit of Fast Fourier Transform (FFT) for computing DFT,
+    # we choose
+    #     N1 = 2^g1 (a power of 2), with N1 >= N1min, N1 >= 2
+    #     N2 = 2^g2 (a power of 2), with N2 >= N2min, N2 >= 2
+    #     N3 = 2^g3 (a power of 2), with N3 >= N3min, N3 >= 2
+    g1 = int(max(np.ceil(np.log2(N1min)), 1.0))
+    g2 = int(max(np.ceil(np.log2(N2min)), 1.0))
+    g3 = int(max(np.ceil(np.log2(N3min)), 1.0))
+    N1 = int(2**g1)
+    N2 = int(2**g2)
+    N3 = int(2**g3)
+
+    if verbose > 1:
+        print(f'{fname}: embedding dimension: {N1} x {N2} x {N3}')
+
+    N12 = N1*N2
+    N = N12 * N3
+
+    # ccirc: coefficient of the embedding matrix, (N3, N2, N1) array
+    L1 = int (N1/2)
+    L2 = int (N2/2)
+    L3 = int (N3/2)
+    h1 = np.arange(-L1, L1, dtype=float) * sx # [-L1 ... 0 ... L1-1] * sx
+    h2 = np.arange(-L2, L2, dtype=float) * sy # [-L2 ... 0 ... L2-1] * sy
+    h3 = np.arange(-L3, L3, dtype=float) * sz # [-L3 ... 0 ... L3-1] * sz
+
+    hh = np.meshgrid(h2, h3, h1) # as this! hh[i]: (N3, N2, N1) array
+                                 # hh[0]: y-coord, hh[1]: z-coord, hh[2]: x-coord
+    ccirc = cov_func(np.hstack((hh[2].reshape(-1,1), hh[0].reshape(-1,1), hh[1].reshape(-1,1))))
+    ccirc.resize(N3, N2, N1)
+
+    del(h1, h2, h3, hh)
+
+    # ...shift first L1 index to the end of the axis 2:
+    ind = np.arange(L1)
+    ccirc = ccirc[:,:, np.hstack((ind+L1, ind))]
+    # ...shift first L2 index to the end of the axis 1:
+    ind = np.arange(L2)
+    ccirc = ccirc[:, np.hstack((ind+L2, ind)), :]
+    # ...shift first L3 index to the end of the axis 0:
+    ind = np.arange(L3)
+    ccirc = ccirc[np.hstack((ind+L3, ind)), :,:]
+
+    del(ind)
+
+    if verbose > 1:
+        print(f'{fname}: Computing FFT of circulant matrix...')
+
+    # Compute the Discrete Fourier Transform (DFT) of ccric, via FFT
+    # --------------------------------------------------------------
+    # The (3-dimensional) DFT coefficients
+    #   lam = DFT(ccirc) = {lam(k1,k2,k3), 0<=k1<=N1-1, 0<=k2<=N2-1, 0<=k3<=N3-1}
+    # are the eigen values of the embedding matrix.
+    # We have:
+    #   a) lam are real coefficients, because the embedding matrix is symmetric
+    #   b) lam(k1,k2,k3) = lam(N1-k1,N2-k2,N3-k3), 1<=k1<=N1-1, 1<=k2<=N2-1, 1<=k3<=N3-1, because the coefficients ccirc are real
+    lam = np.real(np.fft.fftn(ccirc))
+    # ...note that the imaginary parts are equal to 0
+
+    # Eventual use of approximate embedding
+    # -------------------------------------
+    # If some DFT coefficients are negative, then set them to zero
+    # and update them to fit the marginals distribution (approximate embedding)
+    if np.min(lam) < 0:
+        lam = np.sum(lam)/np.sum(np.maximum(lam, 0.)) * np.maximum(lam, 0.)
+
+    # Take the square root of the (updated) DFT coefficients
+    # ------------------------------------------------------
+    lamSqrt = np.sqrt(lam).astype(dtype, copy=False)
+    lam = lam.astype(dtype, copy=False)
+
+    if x is None or conditioningMethod in (1, 3):
+        del(lam)
+
+    # For specified variance
+    # ----------------------
+    # Compute updating factor
+    if var is not None:
+        varUpdate = np.sqrt(var/cov_func(np.zeros(3)))
+
+    # Dealing with conditioning
+    # -------------------------
+    if x is not None:
+        if verbose > 1:
+            print(f'{fname}: Treatment of conditioning data...')
+        # Compute the part rAA of the covariance matrix
+        #        +         +
+        #        | rAA rAB |
+        #    r = |         |
+        #        | rBA rBB |
+        #        +         +
+        # where index A (resp. B) refers to
+        # conditioning (resp. non-conditioning) index in the grid.
+
+        if verbose > 1:
+            print(f'{fname}: Computing covariance matrix (rAA) for conditioning locations...')
+
+        # Compute
+        #    indc: node index of conditioning node,
+        #          rounded to lower index if between two grid node and index is positive
+        indc_f = (np.array((xx_agg, yy_agg, zz_agg)).T-origin)/spacing
+        indc = indc_f.astype(int)
+        indc = indc - 1 * np.all((indc == indc_f, indc > 0), axis=0)
+        ix, iy, iz = indc[:, 0], indc[:, 1], indc[:, 2]
+
+        indc = ix + iy * nx + iz * nxy # single-indices
+
+        nc = len(xx_agg)
+
+        # rAA
+        diagEntry = ccirc[0, 0, 0] + measureErrVar
+        rAA = _cov_matrix_cond_from_ccirc(ccirc, (iz, iy, ix), diagEntry)
+
+        # Test if rAA is almost singular...
+        # (rAA is symmetric: its condition number is computed from its eigen values)
+        rAAeig = np.abs(np.linalg.eigvalsh(rAA))
+        if np.min(rAAeig) < tolInvKappa * np.max(rAAeig):
+            err_msg = f'{fname}: conditioning issue: condition number of matrix rAA is too big'
+            raise GrfError(err_msg)
+
+        del(rAAeig)
+
+        # Cholesky decomposition of rAA (used for solving linear systems)
+        try:
+            rAAcho = scipy.linalg.cho_factor(rAA, overwrite_a=True)
+        except np.linalg.LinAlgError as exc:
+            err_msg = f'{fname}: conditioning issue: matrix rAA is not positive definite'
+            raise GrfError(err_msg) from exc
+
+        del(rAA)
+
+        # Compute:
+        #    indnc: node index of non-conditioning node (nearest node)
+        indnc = np.asarray(np.setdiff1d(np.arange(nxyz), indc), dtype=int)
+        nnc = len(indnc)
+
+        kz = np.floor_divide(indnc, nxy)
+        kk = np.mod(indnc, nxy)
+        ky = np.floor_divide(kk, nx)
+        kx = np.mod(kk, nx)
+        del(kk)
+
+        if conditioningMethod == 1:
+            # Method ConditioningA
+            # --------------------
+            if verbose > 1:
+                print(f'{fname}: Computing covariance matrix (rBA) for non-conditioning / conditioning locations...')
+
+            # Compute the parts rBA of the covariance matrix (see above)
+            # rBA
+            rBA = _cov_matrix_from_ccirc(ccirc, (kz, ky, kx), (iz, iy, ix))
+
+            if verbose > 1:
+                print(f'{fname}: Computing rBA * rAA^(-1)...')
+
+            # compute rBA * rAA^(-1) = (rAA^(-1) * rAB)^T
+            rBArAAinv = scipy.linalg.cho_solve(rAAcho, rBA.T).T
+
+            del(rAAcho, rBA)
+
+            # If a variance var is specified, then the matrix r should be updated
+            # by the following operation:
+            #    diag((var/cov_func(0))^1/2) * r * diag((var/cov_func(0))^1/2)
+            # Hence, if a non-stationary variance is specified,
+            # the matrix rBA * rAA^(-1) should be consequently updated
+            # by multiplying its columns by 1/varUpdate[indc] and its rows by varUpdate[indnc]
+            if var is not None and var.size > 1:
+                rBArAAinv = np.transpose(varUpdate.reshape(-1)[indnc] * np.transpose(1./varUpdate.reshape(-1)[indc] * rBArAAinv))
+
+        elif conditioningMethod == 2:
+            # Method ConditioningB
+            # --------------------
+            if verbose > 1:
+                print(f'{fname}: Computing index in the embedding grid for non-conditioning / conditioning locations...')
+
+            # Compute index in the embedding grid for indc and indnc
+            # (to allow use of fft)
+            indcEmb =  iz * N12 + iy * N1 + ix
+            indncEmb = kz * N12 + ky * N1 + kx
+
+        elif conditioningMethod == 3:
+            # Method ConditioningC
+            # --------------------
+            # Keep index along each axis for indc and indnc
+            # (to extract chunks of rBA from the circulant embedding)
+            indcAxes = (iz, iy, ix)
+            indncAxes = (kz, ky, kx)
+
+            if conditioningChunkSize is None:
+                conditioningChunkSize = max(2**22 // nc, 1)
+
+        del(ix, iy, iz, kx, ky, kz)
+
+        if mean is None:
+            # Set mean for grf
+            mean = np.array([np.mean(v)])
+
+    else: # x is None (unconditional)
+        if mean is None:
+            # Set mean for grf
+            mean = np.array([0.0])
+
+    if x is None or conditioningMethod != 3:
+        del(ccirc)
+
+    # Parameters for the simulation
+    # -----------------------------
+    if crop:
+        grfNx, grfNy, grfNz = nx, ny, nz
+    else:
+        grfNx, grfNy, grfNz = N1, N2, N3
+
+    sim = dict(
+        nreal=nreal, dtype=dtype, method=method,
+        shapeEmb=(N3, N2, N1), grfShape=(grfNz, grfNy, grfNx),
+        lamSqrt=lamSqrt, mean=mean, varUpdate=None,
+        conditioningMethod=None, rngs=rngs)
+
+    if var is not None:
+        sim['varUpdate'] = varUpdate
+
+    if x is not None:
+        sim.update(conditioningMethod=conditioningMethod, v_agg=v_agg, indc=indc, indnc=indnc)
+        if conditioningMethod == 1:
+            sim.update(rBArAAinv=rBArAAinv)
+        elif conditioningMethod == 2:
+            sim.update(rAAcho=rAAcho, lam=lam, indcEmb=indcEmb, indncEmb=indncEmb)
+        elif conditioningMethod == 3:
+            sim.update(rAAcho=rAAcho, ccirc=ccirc, indcAxes=indcAxes, indncAxes=indncAxes,
+                       conditioningChunkSize=conditioningChunkSize)
+    #### End of preliminary computation ####
+
+    return sim
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def grf3D(
+        cov_model,
+        dimension, spacing=(1.0, 1.0, 1.0), origin=(0.0, 0.0, 0.0),
+        x=None, v=None,
+        aggregate_data_op=None,
+        aggregate_data_op_kwargs=None,
+        mean=None, var=None,
+        nreal=1,
+        extensionMin=None, rangeFactorForExtensionMin=1.0,
+        crop=True,
+        method=3, conditioningMethod=2,
+        conditioningChunkSize=None,
+        measureErrVar=0.0, tolInvKappa=1.e-10,
+        dtype='float64',
+        rng=None,
+        out=None,
+        verbose=1,
+        printInfo=None):
+    """
+    Generates Gaussian Random Fields (GRF) in 3D via Fast Fourier Transform (FFT).
+
+    In brief, the GRFs
+
+    - are generated using the given covariance model (`cov_model`),
+    - may have a specified mean (`mean`) and variance (`var`), which can be non stationary,
+    - may be conditioned to location(s) `x` with value(s) `v`.
+
+    Parameters
+    ----------
+    cov_model : :class:`geone.covModel.CovModel3D`, or :class:`geone.covModel.CovModel1D`, or function (`callable`)
+        covariance model in 3D, or covariance model in 1D interpreted as an omni-
+        directional covariance model, or directly a function of covariance (taking
+        3D lag vector(s) as argument)
+
+    dimension : 3-tuple of ints
+        `dimension=(nx, ny, nz)`, number of cells in the 3D simulation grid along
+        each axis
+
+    spacing : 3-tuple of floats, default: (1.0,1.0, 1.0)
+        `spacing=(sx, sy, sz)`, cell size along each axis
+
+    origin : 3-tuple of floats, default: (0.0, 0.0, 0.0)
+        `origin=(ox, oy, oz)`, origin of the 3D simulation grid (bottom-lower-left
+        corner)
+
+    x : 2D array of floats of shape (n, 3), optional
+        data points locations, with n the number of data points, each row of `x`
+        is the float coordinates of one data point; note: if n=1, a 1D array of
+        shape (3,) is accepted
+
+    v : 1D array of floats of shape (n,), optional
+        data values at `x` (`v[i]` is the data value at `x[i]`)
+
+    aggregate_data_op : str {'sgs', 'krige', 'min', 'max', 'mean', 'quantile', 'most_freq', 'random'}, optional
+        operation used to aggregate data points falling in the same grid cells
+
+        - if `aggregate_data_op='sgs'`: function :func:`covModel.sgs` is used \
+        with the covariance model `cov_model` given in arguments
+        - if `aggregate_data_op='krige'`: function :func:`covModel.krige` is used \
+        with the covariance model `cov_model` given in arguments
+        - if `aggregate_data_op='most_freq'`: most frequent value is selected \
+        (smallest one if more than one value with the maximal frequence)
+        - if `aggregate_data_op='random'`: value from a random point is selected
+        - otherwise: the function `numpy.<aggregate_data_op>` is used with the \
+        additional parameters given by `aggregate_data_op_kwargs`, note that, e.g. \
+        `aggregate_data_op='quantile'` requires the additional parameter \
+        `q=<quantile_to_compute>`
+
+        Note: if `aggregate_data_op='sgs'` or `aggregate_data_op='random'`, the
+        aggregation is done for each realization (simulation), i.e. each simulation
+        on the grid starts with a new set of values in conditioning grid cells;
+        if `aggregate_data_op='sgs'` or `aggregate_data_op='krige'`, then
+        `cov_model` must be a covariance model and not directly the covariance
+        function
+
+        By default (`None`): `aggregate_data_op='sgs'` is used
+
+    aggregate_data_op_kwargs : dict, optional
+        keyword arguments to be passed to `geone.covModel.sgs`,
+        `geone.covModel.krige`, or `numpy.<aggregate_data_op>`, according to
+        the parameter `aggregate_data_op`
+
+    mean : function (`callable`), or array-like of floats, or float, optional
+        kriging mean value:
+
+        - if a function: function of three arguments (xi, yi, zi) that returns \
+        the mean at location (xi, yi, zi)
+        - if array-like: its size must be equal to the number of grid cells \
+        (the array is reshaped if needed), mean values at grid cells (for \
+        non-stationary mean)
+        - if a float: same mean value at every grid cell
+
+        By default (`None`): the mean of data value (`v`) (0.0 if no data) is
+        considered at every grid cell
+
+    var : function (`callable`), or array-like of floats, or float, optional
+        kriging variance value:
+
+        - if a function: function of three arguments (xi, yi, yi) that returns \
+        the variance at location (xi, yi, zi)
+        - if array-like: its size must be equal to the number of grid cells \
+        (the array is reshaped if needed), variance values at grid cells (for \
+        non-stationary variance)
+        - if a float: same variance value at every grid cell
 
-                # all real (same values)
-                v_agg = np.tile(v_agg, nreal).reshape(nreal, -1)
-            else:
-                try:
-                    v_agg = gcm.sgs(
-                            x, v, x_agg, cov_model, method='simple_kriging',
-                            mean_x=mean_x, mean_xu=mean_x_agg,
-                            var_x=var_x, var_xu=var_x_agg,
-                            nreal=nreal, seed=None,
-                            verbose=0, **aggregate_data_op_kwargs)
-                except Exception as exc:
-                    err_msg = f"{fname}: aggratating data points in grid failed (`aggregate_data_op='{aggregate_data_op}'`)"
-                    raise GrfError(err_msg) from exc
+        By default (`None`): not used (use of covariance model only)
 
-            xx_agg, yy_agg, zz_agg = x_agg.T
-        elif aggregate_data_op == 'random':
-            # Aggregate data on grid cell by taking random point
-            xx, yy, zz = x.T
-            # first realization of v_agg
-            try:
-                xx_agg, yy_agg, zz_agg, v_agg, i_inv = img.aggregateDataPointsWrtGrid(
-                        xx, yy, zz, v,
-                        nx, ny, nz, sx, sy, sz, ox, oy, oz,
-                        op=aggregate_data_op, return_inverse=True,
-                        **aggregate_data_op_kwargs)
-            except Exception as exc:
-                err_msg = f"{fname}: aggratating data points in grid failed (`aggregate_data_op='{aggregate_data_op}'`)"
-                raise GrfError(err_msg) from exc
+    nreal : int, default: 1
+        number of realization(s)
 
-            if len(xx_agg) == 0:
-                err_msg = f'{fname}: no data point in grid'
-                raise GrfError(err_msg)
+    extensionMin : sequence of 3 ints, optional
+        minimal extension in cells along each axis (see note 1 below)
 
-            # next realizations of v_agg
-            v_agg = np.vstack((v_agg, np.zeros((nreal-1, v_agg.size))))
-            for i in range(1, nreal):
-                v_agg[i] = [v[np.random.choice(np.where(i_inv==j)[0])] for j in range(len(xx_agg))]
-        else:
-            # Aggregate data on grid cell by using the given operation
-            xx, yy, zz = x.T
-            try:
-                xx_agg, yy_agg, zz_agg, v_agg = img.aggregateDataPointsWrtGrid(
-                        xx, yy, zz, v,
-                        nx, ny, nz, sx, sy, sz, ox, oy, oz,
-                        op=aggregate_data_op, **aggregate_data_op_kwargs)
-            except Exception as exc:
-                err_msg = f"{fname}: aggratating data points in grid failed (`aggregate_data_op='{aggregate_data_op}'`)"
-                raise GrfError(err_msg) from exc
+        By default (`None`): minimal extension is automatically computed:
 
-            if len(xx_agg) == 0:
-                err_msg = f'{fname}: no data point in grid'
-                raise GrfError(err_msg)
+        - based on the range of the covariance model, if `cov_model` is given as \
+        an instance of :class:`geone.CovModel.CovModel1D` (or \
+        :class:`geone.CovModel.CovModel3D`)
+        - set to (`nx-1`, `ny-1`, `nz-1`), if `cov_model` is given as a function \
+        (`callable`)
 
-            # all real (same values)
-            v_agg = np.tile(v_agg, nreal).reshape(nreal, -1)
+    rangeFactorForExtensionMin : float, default: 1.0
+        factor by which the ranges of the covariance model are multiplied before
+        computing the default minimal extension, if `cov_model` is given as
+        an instance of :class:`geone.CovModel.CovModel1D` (or
+        :class:`geone.CovModel.CovModel3D`) and if `extensionMin=None`
+        (not used otherwise)
 
-    if not crop:
-        if x is not None: # conditional simulation
-            err_msg = f'{fname}: `crop=False` cannot be used with conditional simulation'
-            raise GrfError(err_msg)
+    crop : bool, default: True
+        indicates if the extended generated field (simulation) will be cropped to
+        original dimension; note that `crop=False` is not valid with conditioning
+        or non-stationary mean or non-stationary variance
 
-        if mean is not None and mean.size > 1:
-            err_msg = f'{fname}: `crop=False` cannot be used with non-stationary mean'
-            raise GrfError(err_msg)
+    method : int, default: 3
+        indicates which method is used to generate unconditional simulations;
+        for each method the Discrete Fourier Transform (DFT) "lam" of the
+        circulant embedding of the covariance matrix is used, and periodic and
+        stationary GRFs are generated
 
-        if var is not None and var.size > 1:
-            err_msg = f'{fname}: `crop=False` cannot be used with non-stationary variance'
-            raise GrfError(err_msg)
+        - `method=1` (method A): generate one GRF Z as follows:
+            - generate one real gaussian white noise W
+            - apply fft (or fft inverse) on W to get X
+            - multiply X by "lam" (term by term)
+            - apply fft inverse (or fft) to get Z
+        - `method=2` (method B, not implemented!): generate one GRF Z as follows:
+           - generate directly X (from method A)
+           - multiply X by lam (term by term)
+           - apply fft inverse (or fft) to get Z
+        - `method=3` (method C, default): generate two independent GRFs Z1, Z2 as follows:
+           - generate two independant real gaussian white noises W1, W2 and set \
+           W = W1 + i * W2
+           - apply fft (or fft inverse) on W to get X
+           - multiply X by "lam" (term by term)
+           - apply fft inverse (or fft) to get Z, and set Z1 = Re(Z), Z2 = Im(Z); \
+           note: with a random stream per realization (see `rng`), each \
+           realization is generated from its own stream, as Z1 (Z2 is \
+           discarded); with the global random state of `numpy.random` \
+           (`rng=None`) or a :class:`numpy.random.RandomState`, the \
+           realizations are generated by pairs (Z1, Z2), and if `nreal` is \
+           odd, the last field is generated using method A
 
-    if extensionMin is None:
-        # default extensionMin
-        if cov_range is not None: # known range
-            # ... based on range of covariance model
-            extensionMin = [extension_min(rangeFactorForExtensionMin*r, n, s) for r, n, s in zip(cov_range, dimension, spacing)]
-        else:
-            # ... based on dimension
-            extensionMin = [nx-1, ny-1, nz-1] # default
+    conditioningMethod : int, default: 2
+        indicates which method is used to update the simulations to account for
+        conditioning data; let
 
-    N1min = nx + extensionMin[0]
-    N2min = ny + extensionMin[1]
-    N3min = nz + extensionMin[2]
+        * A: index of conditioning cells
+        * B: index of non-conditioning cells
+        * Zobs: vector of values of the unconditional simulation Z at conditioning cells
+        * :math:`r = \\left(\\begin{array}{cc} r_{AA} & r_{AB}\\\\r_{BA} & r_{BB}\\end{array}\\right)` \
+        the covariance matrix, where index A (resp. B) refers to conditioning \
+        (resp. non-conditioning) index in the grid;
 
-    if verbose > 1:
-        print(f'{fname}: Computing circulant embedding...')
+        an unconditional simulation Z is updated into a conditional simulation ZCond as
+        follows; let
 
-    # Circulant embedding of the covariance matrix
-    # --------------------------------------------
-    # The embedding matrix is a (N1,N2,N3)-nested block circulant matrix, computed from
-    # the covariance function.
-    # To take a maximal benefit of Fast Fourier Transform (FFT) for computing DFT,
-    # we choose
-    #     N1 = 2^g1 (a power of 2), with N1 >= N1min, N1 >= 2
-    #     N2 = 2^g2 (a power of 2), with N2 >= N2min, N2 >= 2
-    #     N3 = 2^g3 (a power of 2), with N3 >= N3min, N3 >= 2
-    g1 = int(max(np.ceil(np.log2(N1min)), 1.0))
-    g2 = int(max(np.ceil(np.log2(N2min)), 1.0))
-    g3 = int(max(np.ceil(np.log2(N3min)), 1.0))
-    N1 = int(2**g1)
-    N2 = int(2**g2)
-    N3 = int(2**g3)
+        * ZCond[A] = Zobs
+        * ZCond[B] = Z[B] + rBA * rAA^(-1) * (Zobs - Z[A])
 
-    if verbose > 1:
-        print(f'{fname}: embedding dimension: {N1} x {N2} x {N3}')
+        i.e. the update consists in adding the kriging estimates of the residues
+        to an unconditional simulation
 
-    N12 = N1*N2
-    N = N12 * N3
+        * `conditioningMethod=1` (method CondtioningA): the matrix M = rBA * rAA^(-1) \
+        is explicitly computed (warning: could require large amount of memory), \
+        then all the simulations are updated by a sum and a multiplication by the \
+        matrix M
+        * `conditioningMethod=2` (method CondtioningB, default): for each simulation, \
+        the linear system rAA * x = Zobs - Z[A] is solved and then, the multiplication \
+        by rBA is done via fft
+        * `conditioningMethod=3` (method CondtioningC): the linear systems \
+        rAA * x = Zobs - Z[A] are solved for each simulation, and then, \
+        the multiplication by rBA is done by chunks of non-conditioning cells, \
+        the corresponding rows of rBA being extracted from the circulant \
+        embedding of the covariance matrix (the matrix rBA is never stored \
+        entirely, and no fft is needed)
 
-    # ccirc: coefficient of the embedding matrix, (N3, N2, N1) array
-    L1 = int (N1/2)
-    L2 = int (N2/2)
-    L3 = int (N3/2)
-    h1 = np.arange(-L1, L1, dtype=float) * sx # [-L1 ... 0 ... L1-1] * sx
-    h2 = np.arange(-L2, L2, dtype=float) * sy # [-L2 ... 0 ... L2-1] * sy
-    h3 = np.arange(-L3, L3, dtype=float) * sz # [-L3 ... 0 ... L3-1] * sz
+        In every case, the matrix rAA is never inverted explicitly: its
+        Cholesky decomposition is computed once and used for solving the
+        linear systems.
 
-    hh = np.meshgrid(h2, h3, h1) # as this! hh[i]: (N3, N2, N1) array
-                                 # hh[0]: y-coord, hh[1]: z-coord, hh[2]: x-coord
-    ccirc = cov_func(np.hstack((hh[2].reshape(-1,1), hh[0].reshape(-1,1), hh[1].reshape(-1,1))))
-    ccirc.resize(N3, N2, N1)
+        Note: parameter `conditioningMethod` is used only for conditional simulation
 
-    del(h1, h2, h3, hh)
+    conditioningChunkSize : int, optional
+        number of non-conditioning cells updated at once with
+        `conditioningMethod=3`, i.e. number of rows of the chunks of rBA;
+        by default (`None`): set such that each chunk of rBA has about
+        2^22 entries;
+        note: parameter `conditioningChunkSize` is used only for conditional
+        simulation with `conditioningMethod=3`
 
-    # ...shift first L1 index to the end of the axis 2:
-    ind = np.arange(L1)
-    ccirc = ccirc[:,:, np.hstack((ind+L1, ind))]
-    # ...shift first L2 index to the end of the axis 1:
-    ind = np.arange(L2)
-    ccirc = ccirc[:, np.hstack((ind+L2, ind)), :]
-    # ...shift first L3 index to the end of the axis 0:
-    ind = np.arange(L3)
-    ccirc = ccirc[np.hstack((ind+L3, ind)), :,:]
+    measureErrVar : float, default: 0.0
+        measurement error variance; the error on conditioning data is assumed to
+        follow the distrubution N(0, `measureErrVar` * I); i.e.
+        rAA + `measureErrVar` * I is considered instead of rAA for stabilizing the
+        linear system for this matrix;
+        note: parameter `measureErrVar` is used only for conditional simulation
 
-    del(ind)
+    tolInvKappa : float, default: 1.e-10
+        the simulation is stopped if the inverse of the condition number of rAA
+        is above `tolInvKappa`;
+        note: parameter `tolInvKappa` is used only for conditional simulation
 
-    if verbose > 1:
-        print(f'{fname}: Computing FFT of circulant matrix...')
+    dtype : str or numpy.dtype {'float64', 'float32'}, default: 'float64'
+        floating point type of the output GRFs; the FFTs (generation of the
+        unconditional fields and update accounting for conditioning data) are
+        computed with the corresponding precision (single precision FFTs are
+        computed with `scipy.fft`), whereas the linear algebra involving the
+        covariance matrix rAA of the conditioning locations is always done in
+        double precision (float64)
+
+    rng : int, or :class:`numpy.random.SeedSequence`, or :class:`numpy.random.Generator`, or sequence, optional
+        random number generator specification (see module :mod:`randomStream`);
+        by default (`None`): the global random state of `numpy.random` is used;
+        otherwise, independent streams are spawned from `rng`, one per
+        realization (the i-th stream depends only on `rng` and i), and the
+        i-th realization is generated with the i-th stream only (whatever
+        `method`), hence it does not depend on `nreal`; passing a slice
+        `spawn_seed_sequences(rng, nreal)[i0:i1]` (see function
+        :func:`randomStream.spawn_seed_sequences`) as `rng` (with
+        `nreal=i1-i0`) gives the realizations i0, ..., i1-1 of the whole set
+
+    out : nd array, optional
+        C-contiguous array of shape (nreal, ) + shape of the output (see below)
+        and of type `dtype`, in which the realizations are written (and which
+        is returned), e.g. a :class:`numpy.memmap` for writing the realizations
+        directly in a file (without holding them in memory);
+        by default (`None`): a new array is allocated
 
-    # Compute the Discrete Fourier Transform (DFT) of ccric, via FFT
-    # --------------------------------------------------------------
-    # The (3-dimensional) DFT coefficients
-    #   lam = DFT(ccirc) = {lam(k1,k2,k3), 0<=k1<=N1-1, 0<=k2<=N2-1, 0<=k3<=N3-1}
-    # are the eigen values of the embedding matrix.
-    # We have:
-    #   a) lam are real coefficients, because the embedding matrix is symmetric
-    #   b) lam(k1,k2,k3) = lam(N1-k1,N2-k2,N3-k3), 1<=k1<=N1-1, 1<=k2<=N2-1, 1<=k3<=N3-1, because the coefficients ccirc are real
-    lam = np.real(np.fft.fftn(ccirc))
-    # ...note that the imaginary parts are equal to 0
+    verbose : int, default: 1
+        verbose mode, higher implies more printing (info):
 
-    # Eventual use of approximate embedding
-    # -------------------------------------
-    # If some DFT coefficients are negative, then set them to zero
-    # and update them to fit the marginals distribution (approximate embedding)
-    if np.min(lam) < 0:
-        lam = np.sum(lam)/np.sum(np.maximum(lam, 0.)) * np.maximum(lam, 0.)
+        - 0: no display
+        - 1: warnings
+        - 2: warnings + basic info
+        - 3 (or >2): all information
 
-    # Take the square root of the (updated) DFT coefficients
-    # ------------------------------------------------------
-    lamSqrt = np.sqrt(lam)
+        note that if an error occurred, it is raised
 
-    if x is None or conditioningMethod == 1:
-        del(lam)
+    printInfo : bool, optional
+        deprecated, use `verbose` instead;
 
-    # For specified variance
-    # ----------------------
-    # Compute updating factor
-    if var is not None:
-        varUpdate = np.sqrt(var/cov_func(np.zeros(3)))
+        - if `printInfo=False`, `verbose` is set to 1 (overwritten)
+        - if `printInfo=True`, `verbose` is set to 3 (overwritten)
+        - if `printInfo=None` (default): not used
 
-    # Dealing with conditioning
-    # -------------------------
-    if x is not None:
-        if verbose > 1:
-            print(f'{fname}: Treatment of conditioning data...')
-        # Compute the part rAA of the covariance matrix
-        #        +         +
-        #        | rAA rAB |
-        #    r = |         |
-        #        | rBA rBB |
-        #        +         +
-        # where index A (resp. B) refers to
-        # conditioning (resp. non-conditioning) index in the grid.
+    Returns
+    -------
+    grf : 4D array of shape (`nreal`, n3, n2, n1)
+        GRF realizations, with
 
-        if verbose > 1:
-            print(f'{fname}: Computing covariance matrix (rAA) for conditioning locations...')
+        * n1 = nx (= dimension[0]), n2 = ny (= dimension[1]), n3 = nz (= dimension[2]), if `crop=True`,
+        * but n1 >= nx, n2 >= ny, n3 >= nz if `crop=False`;
+
+        `grf[i, iz, iy, ix]`: value of the i-th realisation at grid cell of index
+        ix (resp. iy, iz) along x (resp. y, z) axis
+
+    Notes
+    -----
+    1. For reproducing covariance model, the dimension of GRF should be large
+    enough; let K an integer such that K*`spacing` is greater or equal to the
+    correlation range, then:
 
-        # Compute
-        #    indc: node index of conditioning node,
-        #          rounded to lower index if between two grid node and index is positive
-        indc_f = (np.array((xx_agg, yy_agg, zz_agg)).T-origin)/spacing
-        indc = indc_f.astype(int)
-        indc = indc - 1 * np.all((indc == indc_f, indc > 0), axis=0)
-        ix, iy, iz = indc[:, 0], indc[:, 1], indc[:, 2]
+    - correlation accross opposite border should be removed by extending \
+    the domain sufficiently, i.e.
 
-        indc = ix + iy * nx + iz * nxy # single-indices
+        `extensionMin` >= K - 1
 
-        nc = len(xx_agg)
+    - two cells could not be correlated simultaneously regarding both \
+    distances between them (with respect to the periodic grid), i.e. one \
+    should have
 
-        # rAA
-        rAA = np.zeros((nc, nc))
+        `dimension+extensionMin` >= 2*K - 1.
 
-        diagEntry = ccirc[0, 0, 0] + measureErrVar
-        for i in range(nc):
-            rAA[i,i] = diagEntry
-            for j in range(i+1, nc):
-                rAA[i,j] = ccirc[np.mod(iz[j]-iz[i], N3), np.mod(iy[j]-iy[i], N2), np.mod(ix[j]-ix[i], N1)]
-                rAA[j,i] = rAA[i,j]
+    To sum up, `extensionMin` should be chosen such that
 
-        # Test if rAA is almost singular...
-        if 1./np.linalg.cond(rAA) < tolInvKappa:
-            err_msg = f'{fname}: conditioning issue: condition number of matrix rAA is too big'
-            raise GrfError(err_msg)
+        `dimension+extensionMin` >= max(`dimension`, K) + K - 1
 
-        # Compute:
-        #    indnc: node index of non-conditioning node (nearest node)
-        indnc = np.asarray(np.setdiff1d(np.arange(nxyz), indc), dtype=int)
-        nnc = len(indnc)
+    i.e.
 
-        kz = np.floor_divide(indnc, nxy)
-        kk = np.mod(indnc, nxy)
-        ky = np.floor_divide(kk, nx)
-        kx = np.mod(kk, nx)
-        del(kk)
+        `extensionMin` >= max(K-1, 2*K-`dimension`-1)
 
-        if conditioningMethod == 1:
-            # Method ConditioningA
-            # --------------------
-            if verbose > 1:
-                print(f'{fname}: Computing covariance matrix (rBA) for non-conditioning / conditioning locations...')
+    2. For large data set:
 
-            # Compute the parts rBA of the covariance matrix (see above)
-            # rBA
-            rBA = np.zeros((nnc, nc))
-            for j in range(nc):
-                rBA[:,j] = ccirc[np.mod(iz[j] - kz, N3), np.mod(iy[j] - ky, N2), np.mod(ix[j] - kx, N1)]
+    - `conditioningMethod` should be set to 2 (using FFT) or 3 (by chunks), \
+    the whole matrix rBA being not stored in these cases
 
-            if verbose > 1:
-                print(f'{fname}: Computing rBA * rAA^(-1)...')
+    - `measureErrVar` can be set to a small positive value to stabilize the \
+    covariance matrix for conditioning locations (solving linear system).
 
-            # compute rBA * rAA^(-1)
-            rBArAAinv = np.dot(rBA, np.linalg.inv(rAA))
+    3. Some mathematical details:
 
-            del(rAA, rBA)
+    Discrete Fourier Transform (DFT) of an array x of dim N1 x N2 x N3 is
+    given by
 
-            # If a variance var is specified, then the matrix r should be updated
-            # by the following operation:
-            #    diag((var/cov_func(0))^1/2) * r * diag((var/cov_func(0))^1/2)
-            # Hence, if a non-stationary variance is specified,
-            # the matrix rBA * rAA^(-1) should be consequently updated
-            # by multiplying its columns by 1/varUpdate[indc] and its rows by varUpdate[indnc]
-            if var is not None and var.size > 1:
-                rBArAAinv = np.transpose(varUpdate.reshape(-1)[indnc] * np.transpose(1./varUpdate.reshape(-1)[indc] * rBArAAinv))
+        c = DFT(x) = F * x
 
-        elif conditioningMethod == 2:
-            # Method ConditioningB
-            # --------------------
-            if verbose > 1:
-                print(f'{fname}: Computing index in the embedding grid for non-conditioning / conditioning locations...')
+    where F is the the (N1*N2*N3) x (N1*N2*N3) matrix with coefficients
 
-            # Compute index in the embedding grid for indc and indnc
-            # (to allow use of fft)
-            indcEmb =  iz * N12 + iy * N1 + ix
-            indncEmb = kz * N12 + ky * N1 + kx
+        F(j,k) = [exp( -i*2*pi*(j^t*k)/(N1*N2*N3) )], j=(j1,j2,j3), k=(k1,k2,k3) in G,
 
-        del(ix, iy, iz, kx, ky, kz)
+    and
 
-        if mean is None:
-            # Set mean for grf
-            mean = np.array([np.mean(v)])
+        G = {n=(n1,n2,n3), 0 <= n1 <= N1-1, 0 <= n2 <= N2-1, 0 <= n3 <= N3-1}
 
-    else: # x is None (unconditional)
-        if mean is None:
-            # Set mean for grf
-            mean = np.array([0.0])
+    denotes the indices grid and where we use the bijection
 
-    del(ccirc)
-    #### End of preliminary computation ####
+        (n1,n2,n3) in G -> n1 + n2 * N1 + n3 * N1 * N2 in {0,...,N1*N2*N3-1},
 
-    # Unconditional simulation
-    # ========================
-    # Method A: Generating one real GRF Z
-    # --------
-    # 1. Generate a real gaussian white noise W ~ N(0,1) on G (3D grid)
-    # 2. Compute Z = Q^(*) D Q * W
-    #    [OR: Z = Q D Q^(*) * W], where
-    #       Q is normalized DFT matrix
-    #       D = diag(lamSqrt)
-    #    i.e:
-    #       Z = DFT^(-1)(D * DFT(W))
-    #       [OR: Z = DFT(D * DFT^(-1)(W))]
-    #
-    # Method B: Generating one real GRF Z
-    # --------
-    # Not implemented
-    #
-    # Method C: Generating two independent real GRFs Z1, Z2
-    # --------
-    # (If nreal is odd, the last realization is generated using method A.)
-    # 1. Generate two independent real gaussian white noises W1,W2 ~ N(0,1) on G (3D grid)
-    #    and let W = W1 + i * W2 (complex value)
-    # 2. Compute Z = Q^(*) D * W
-    #    [OR: Z = Q D * W], where
-    #       Q is normalized DFT matrix
-    #       D = diag(lamSqrt)
-    #    i.e:
-    #       Z = N^(1/2) * DFT^(-1)(D * W)
-    #       [OR: Z = 1/N^(1/2) * DFT(D * W)]
-    #    Then the real and imaginary parts of Z are two independent GRFs
-    if crop:
-        grfNx, grfNy, grfNz = nx, ny, nz
-    else:
-        grfNx, grfNy, grfNz = N1, N2, N3
+    between the multiple-indices and the single indices.
 
-    grf = np.zeros((nreal, grfNz, grfNy, grfNx))
+    With N = N1*N2*N3, we have
 
-    if method == 1:
-        # Method A
-        # --------
-        for i in range(nreal):
-            if verbose > 2:
-                print(f'{fname}: unconditional simulation {i+1:4d} of {nreal:4d}...')
+        F^(-1) = 1/N * F^(*)
 
-            W = np.random.normal(size=(N3, N2, N1))
+    where ^(*) denotes the conjugate transpose.
 
-            Z = np.fft.ifftn(lamSqrt * np.fft.fftn(W))
-            # ...note that Im(Z) = 0
-            grf[i] = np.real(Z[0:grfNz, 0:grfNy, 0:grfNx])
+    Let
 
-    elif method == 2:
-        # Method B
-        # --------
-        err_msg = f'{fname}: (unconditional simulation) `method=2` not implemented'
-        raise GrfError(err_msg)
+        Q = 1/N^(1/2) * F
 
-    elif method == 3:
-        # Method C
-        # --------
-        for i in np.arange(0, nreal-1, 2):
-            if verbose > 2:
-                print(f'{fname}: unconditional simulation {i+1:4d}-{i+2:4d} of {nreal:4d}...')
+    Then Q is unitary, i.e. Q^(-1) = Q^(*)
 
-            W = np.array(np.random.normal(size=(N3, N2, N1)), dtype=complex)
-            W.imag = np.random.normal(size=(N3, N2, N1))
-            Z = np.sqrt(N) * np.fft.ifftn(lamSqrt * W)
-            #  Z = 1/np.sqrt(N) * np.fft.fftn(lamSqrt * W)] # see above: [OR:...]
+    Then, we have
 
-            grf[i] = np.real(Z[0:grfNz, 0:grfNy, 0:grfNx])
-            grf[i+1] = np.imag(Z[0:grfNz, 0:grfNy, 0:grfNx])
+        DFT = F = N^(1/2) * Q,
 
-        if np.mod(nreal, 2) == 1:
-            if verbose > 2:
-                print(f'{fname}: unconditional simulation {nreal:4d} of {nreal:4d}...')
+        DFT^(-1) = 1/N * F^(*) = 1/N^(1/2) * Q^(*)
 
-            W = np.random.normal(size=(N3, N2, N1))
+    Using `numpy` package:
 
-            Z = np.fft.ifftn(lamSqrt * np.fft.fftn(W))
-            # ...note that Im(Z) = 0
-            grf[nreal-1] = np.real(Z[0:grfNz, 0:grfNy, 0:grfNx])
+        numpy.fft.fftn() = DFT()
 
-    if var is not None:
-        grf = varUpdate * grf
+        numpy.fft.ifftn() = DFT^(-1)()
+    """
+    fname = 'grf3D'
 
-    grf = mean + grf
+    # Set verbose mode according to printInfo (if given)
+    if printInfo is not None:
+        if printInfo:
+            verbose = 3
+        else:
+            verbose = 1
 
-    # Conditional simulation
-    # ----------------------
-    # Let
-    #    A: index of conditioning nodes
-    #    B: index of non-conditioning nodes
-    #    Zobs: vector of values at conditioning nodes
-    # and
-    #        +         +
-    #        | rAA rAB |
-    #    r = |         |
-    #        | rBA rBB |
-    #        +         +
-    # the covariance matrix, where index A (resp. B) refers to
-    # conditioning (resp. non-conditioning) index in the grid.
-    #
-    # Then, from an unconditional simulation Z, we retrieve a conditional
-    # simulation ZCond as follows.
-    # Let
-    #    ZCond[A] = Zobs
-    #    ZCond[B] = Z[B] + rBA * rAA^(-1) * (Zobs - Z[A])
-    if x is not None:
-        # We work with single indices...
-        grf.resize(nreal, grfNx*grfNy*grfNz)
+    # Number of realization(s)
+    nreal = int(nreal) # cast to int if needed
 
-        if conditioningMethod == 1:
-            # Method ConditioningA
-            # --------------------
-            if verbose > 1:
-                print(f'{fname}: updating conditional simulations...')
+    if nreal <= 0:
+        if verbose > 0:
+            print(f'{fname}: WARNING: `nreal` <= 0: `None` is returned')
+        return None
 
-            # Update all simulations at a time,
-            # use the matrix rBA * rAA^(-1) already computed
-            grf[:,indnc] = grf[:,indnc] + np.transpose(np.dot(rBArAAinv, np.transpose(v_agg - grf[:,indc])))
-            grf[:,indc] = v_agg
+    # Preliminary computation
+    sim = _grf3D_preliminary(
+            fname, cov_model, dimension, spacing, origin, x, v,
+            aggregate_data_op, aggregate_data_op_kwargs, mean, var, nreal,
+            extensionMin, rangeFactorForExtensionMin, crop, method,
+            conditioningMethod, conditioningChunkSize, measureErrVar,
+            tolInvKappa, dtype, rng, verbose)
+
+    # Generate the realizations
+    if out is None:
+        grf = np.zeros((nreal, ) + sim['grfShape'], dtype=sim['dtype'])
+    elif parallel._valid_output_array(out, (nreal, ) + sim['grfShape'], sim['dtype']):
+        grf = out
+    else:
+        err_msg = f'{fname}: `out` invalid (shape or type not valid, or not C-contiguous)'
+        raise GrfError(err_msg)
 
-        elif conditioningMethod == 2:
-            # Method ConditioningB
-            # --------------------
-            # Update each simulation successively as follows:
-            #    - solve rAA * x = Zobs - z[A]
-            #    - do the multiplication rBA * x via the circulant embedding of the
-            #      covariance matrix (using fft)
-            rAAinvResiduEmb = np.zeros(N3*N2*N1)
+    _grf_simulate(grf, sim, 0, fname, verbose)
 
-            for i in range(nreal):
-                if verbose > 2:
-                    print(f'{fname}: updating conditional simulation {i+1:4d} of {nreal:4d}...')
+    return grf
+# ----------------------------------------------------------------------------
 
-                # Compute residue
-                residu = v_agg[i] - grf[i, indc]
-                # ... update if non-stationary variance is specified
-                if var is not None and var.size > 1:
-                    residu = 1./varUpdate.reshape(-1)[indc] * residu
+# ----------------------------------------------------------------------------
+def grf3D_mp(
+        cov_model,
+        dimension, spacing=(1.0, 1.0, 1.0), origin=(0.0, 0.0, 0.0),
+        x=None, v=None,
+        aggregate_data_op=None,
+        aggregate_data_op_kwargs=None,
+        mean=None, var=None,
+        nreal=1,
+        extensionMin=None, rangeFactorForExtensionMin=1.0,
+        crop=True,
+        method=3, conditioningMethod=2,
+        conditioningChunkSize=None,
+        measureErrVar=0.0, tolInvKappa=1.e-10,
+        dtype='float64',
+        rng=None,
+        out=None,
+        verbose=1,
+        printInfo=None,
+        nproc=-1):
+    """
+    Computes the same as the function :func:`grf.grf3D`, using multiprocessing.
+
+    All the parameters except `nproc` are the same as those of the function
+    :func:`grf.grf3D`.
+
+    The number of processes used (in parallel) is n, and determined by the
+    parameter `nproc` (int, optional) as follows:
+
+    - if `nproc > 0`: n = `nproc`,
+    - if `nproc <= 0`: n = max(nmax+`nproc`, 1), where nmax is the total \
+    number of cpu(s) of the system (retrieved by :func:`config.cpu_count`), \
+    i.e. all cpus except `-nproc` is used (but at least one)
+
+    The preliminary computation (circulant embedding of the covariance matrix
+    and its DFT, treatment of the conditioning data, Cholesky decomposition of
+    the covariance matrix of the conditioning locations) is done once; the
+    resulting arrays are put in shared memory and used (read only) by n
+    parallel processes. The set of realizations (specified by `nreal`) is
+    distributed in a balanced way over the processes, each process writing
+    its realizations directly in a shared output array (copied in the returned
+    array), or in the file of `out` if it is a :class:`numpy.memmap` (opened
+    in mode 'r+' or 'w+').
+
+    Note that, if `nreal` < n, then n is reduced to `nreal`.
+
+    Each realization is generated with its own stream (see parameter `rng`),
+    hence the result is the same as the one of the function :func:`grf.grf3D`
+    with the same `rng`, whatever the number of processes; if `rng` is `None`
+    (default) or a :class:`numpy.random.RandomState`, a seed is first drawn from
+    it (see function :func:`randomStream.seed_from_rng`) and used as `rng`.
+
+    See function :func:`grf.grf3D` for details.
+    """
+    fname = 'grf3D_mp'
 
-                # Compute
-                #    x = rAA^(-1) * residu, and then
-                #    Z = rBA * x via the circulant embedding of the covariance matrix
-                rAAinvResiduEmb[indcEmb] = np.linalg.solve(rAA, residu)
-                Z = np.fft.ifftn(lam * np.fft.fftn(rAAinvResiduEmb.reshape(N3, N2, N1)))
-                # ...note that Im(Z) = 0
-                Z = np.real(Z.reshape(-1)[indncEmb])
+    # Set verbose mode according to printInfo (if given)
+    if printInfo is not None:
+        if printInfo:
+            verbose = 3
+        else:
+            verbose = 1
 
-                # ... update if non-stationary covariance is specified
-                if var is not None and var.size > 1:
-                    Z = varUpdate.reshape(-1)[indnc] * Z
+    # Number of realization(s)
+    nreal = int(nreal) # cast to int if needed
 
-                grf[i, indnc] = grf[i, indnc] + Z
-                grf[i, indc] = v_agg[i]
+    if nreal <= 0:
+        if verbose > 0:
+            print(f'{fname}: WARNING: `nreal` <= 0: `None` is returned')
+        return None
 
-        # Reshape grf as initially
-        grf.resize(nreal, grfNz, grfNy, grfNx)
+    # Random number generator: the streams of the realizations are spawned
+    # (legacy random state cannot be shared between processes)
+    if randomStream.is_legacy(rng):
+        rng = randomStream.seed_from_rng(rng)
+
+    # Preliminary computation
+    sim = _grf3D_preliminary(
+            fname, cov_model, dimension, spacing, origin, x, v,
+            aggregate_data_op, aggregate_data_op_kwargs, mean, var, nreal,
+            extensionMin, rangeFactorForExtensionMin, crop, method,
+            conditioningMethod, conditioningChunkSize, measureErrVar,
+            tolInvKappa, dtype, rng, verbose)
+
+    # Generate the realizations
+    if out is not None and not parallel._valid_output_array(out, (nreal, ) + sim['grfShape'], sim['dtype']):
+        err_msg = f'{fname}: `out` invalid (shape or type not valid, or not C-contiguous)'
+        raise GrfError(err_msg)
+
+    grf = _grf_simulate_mp(sim, nproc, fname, verbose, out=out)
 
     return grf
 # ----------------------------------------------------------------------------
@@ -4188,6 +5243,8 @@ def krige3D(
         conditioningMethod=1, # note: set conditioningMethod=2 if unable to allocate memory
         measureErrVar=0.0, tolInvKappa=1.e-10,
         computeKrigSD=True,
+        block_size=None,
+        dtype='float64',
         verbose=1,
         printInfo=None):
     """
@@ -4222,8 +5279,13 @@ def krige3D(
         is the float coordinates of one data point; note: if n=1, a 1D array of
         shape (3,) is accepted
 
-    v : 1D array of floats of shape (n,), optional
-        data values at `x` (`v[i]` is the data value at `x[i]`)
+    v : 1D array of floats of shape (n,), or 2D array of floats of shape (ndataset, n), optional
+        data values at `x` (`v[i]` is the data value at `x[i]`); several data
+        sets sharing the same locations `x` can be given as a 2D array,
+        `v[k, i]` being the value at `x[i]` of the k-th data set: then, the
+        embedding, the decomposition of the covariance matrix of the
+        conditioning locations and the kriging standard deviations are computed
+        once, and the kriging estimates of all data sets are computed together
 
     aggregate_data_op : str {'krige', 'min', 'max', 'mean', 'quantile', 'most_freq'}, optional
         operation used to aggregate data points falling in the same grid cells
@@ -4317,8 +5379,14 @@ def krige3D(
         amount of memory)
         * `conditioningMethod=2` (method CondtioningB): for kriging estimates, \
         the linear system rAA * y = (v - mean) is solved, and then mean + rBA*y is \
-        computed; for kriging variances, for each column u[j] of rAB, the linear \
-        system rAA * y = u[j] is solved, and then rBB[j,j] - y^t*y is computed
+        computed (via FFT); for kriging variances, the columns of rAB are \
+        extracted by blocks (see `block_size`) and rBB[j,j] - y[j]^t*y[j] is \
+        computed, where y[j] solves C^t * y[j] = rAB[:,j], with rAA = C^t * C \
+        the Cholesky decomposition of rAA
+
+        In every case, the matrix rAA is never inverted explicitly: its
+        Cholesky decomposition is computed once and used for solving the
+        linear systems.
 
         Note: set `conditioningMethod=2` if unable to allocate memory
 
@@ -4335,6 +5403,22 @@ def krige3D(
     computeKrigSD : bool, default: True
         indicates if the kriging standard deviations are computed
 
+    block_size : int, optional
+        number of non-conditioning cells for which the kriging standard
+        deviation is computed at once with `conditioningMethod=2`, i.e. number
+        of columns of the blocks of rAB (the memory used is proportional to
+        `block_size` times the number of conditioning cells); by default
+        (`None`): set such that each block of rAB has about 2^22 entries;
+        note: parameter `block_size` is used only with `conditioningMethod=2`
+        and `computeKrigSD=True`
+
+    dtype : str or numpy.dtype {'float64', 'float32'}, default: 'float64'
+        floating point type of the output arrays (kriging estimates and
+        standard deviations); the FFTs are computed with the corresponding
+        precision (single precision FFTs are computed with `scipy.fft`),
+        whereas the linear algebra involving the covariance matrix rAA of the
+        conditioning locations is always done in double precision (float64)
+
     verbose : int, default: 1
         verbose mode, higher implies more printing (info):
 
@@ -4354,10 +5438,11 @@ def krige3D(
 
     Returns
     -------
-    krig : 3D array of shape (nz, ny, nx)
+    krig : 3D array of shape (nz, ny, nx), or 4D array of shape (ndataset, nz, ny, nx)
         kriging estimates, with (nx, ny, nz) (= dimension);
         `krig[iz, iy, ix]`: value at grid cell of index ix (resp. iy, iz) along x
-        (resp. y, z) axis
+        (resp. y, z) axis; if `v` is given as a 2D array (several data sets):
+        `krig[k, iz, iy, ix]`: value for the k-th data set
 
     krigSD : 3D array of shape (nz, ny, nx), optional
         kriging standard deviations, with (nx, ny, nz) (= dimension);
@@ -4443,6 +5528,21 @@ def krige3D(
     """
     fname = 'krige3D'
 
+    # Floating point type of the output, and FFT module to use
+    try:
+        dtype = np.dtype(dtype)
+    except Exception as exc:
+        err_msg = f'{fname}: `dtype` invalid'
+        raise GrfError(err_msg) from exc
+
+    if dtype == np.float64:
+        fft = np.fft    # double precision
+    elif dtype == np.float32:
+        fft = scipy.fft # single precision is preserved by `scipy.fft`
+    else:
+        err_msg = f"{fname}: `dtype` invalid, should be 'float64' or 'float32'"
+        raise GrfError(err_msg)
+
     # Set verbose mode according to printInfo (if given)
     if printInfo is not None:
         if printInfo:
@@ -4497,13 +5597,22 @@ def krige3D(
             err_msg = f'{fname}: `conditioningMethod` invalid'
             raise GrfError(err_msg)
 
+        if block_size is not None:
+            block_size = int(block_size) # cast to int if needed
+            if block_size <= 0:
+                err_msg = f'{fname}: `block_size` invalid'
+                raise GrfError(err_msg)
+
         if v is None:
             err_msg = f'{fname}: `x` is given (not `None`) but `v` is not given (`None`)'
             raise GrfError(err_msg)
 
         x = np.asarray(x, dtype='float').reshape(-1, 3) # cast in 3-dimensional array if needed
-        v = np.asarray(v, dtype='float').reshape(-1) # cast in 1-dimensional array if needed
-        if len(v) != x.shape[0]:
+        v = np.asarray(v, dtype='float')
+        if v.ndim != 2:
+            v = v.reshape(-1) # cast in 1-dimensional array if needed
+        # else: several data sets (one per row of v)
+        if v.shape[-1] != x.shape[0]:
             err_msg = f'{fname}: length of `v` is not valid'
             raise GrfError(err_msg)
 
@@ -4553,11 +5662,11 @@ def krige3D(
 
     if x is None:
         # No data: kriging return the mean and the standard deviation...
-        krig = np.zeros((nz, ny, nx))
+        krig = np.zeros((nz, ny, nx), dtype=dtype)
         if mean is not None:
             krig[...] = mean
         if computeKrigSD:
-            krigSD = np.zeros((nz, ny, nx))
+            krigSD = np.zeros((nz, ny, nx), dtype=dtype)
             if var is not None:
                 krigSD[...] = np.sqrt(var)
             else:
@@ -4608,11 +5717,21 @@ def krige3D(
         else:
             var_x_agg = var
         try:
-            v_agg, v_agg_std = gcm.krige(
-                    x, v, x_agg, cov_model, method='simple_kriging',
-                    mean_x=mean_x, mean_xu=mean_x_agg,
-                    var_x=var_x, var_xu=var_x_agg,
-                    verbose=0, **aggregate_data_op_kwargs)
+            if v.ndim == 2:
+                # several data sets (the kriging std does not depend on the data values)
+                v_agg = np.zeros((v.shape[0], x_agg.shape[0]))
+                for k, vk in enumerate(v):
+                    v_agg[k], v_agg_std = gcm.krige(
+                            x, vk, x_agg, cov_model, method='simple_kriging',
+                            mean_x=mean_x, mean_xu=mean_x_agg,
+                            var_x=var_x, var_xu=var_x_agg,
+                            verbose=0, **aggregate_data_op_kwargs)
+            else:
+                v_agg, v_agg_std = gcm.krige(
+                        x, v, x_agg, cov_model, method='simple_kriging',
+                        mean_x=mean_x, mean_xu=mean_x_agg,
+                        var_x=var_x, var_xu=var_x_agg,
+                        verbose=0, **aggregate_data_op_kwargs)
         except Exception as exc:
             err_msg = f"{fname}: aggratating data points in grid failed (`aggregate_data_op='{aggregate_data_op}'`)"
             raise GrfError(err_msg) from exc
@@ -4722,7 +5841,8 @@ def krige3D(
 
     # Take the square root of the (updated) DFT coefficients
     # ------------------------------------------------------
-    lamSqrt = np.sqrt(lam)
+    lamSqrt = np.sqrt(lam).astype(dtype, copy=False)
+    lam = lam.astype(dtype, copy=False)
 
     # For specified variance
     # ----------------------
@@ -4773,20 +5893,27 @@ def krige3D(
     nc = len(xx_agg)
 
     # rAA
-    rAA = np.zeros((nc, nc))
-
     diagEntry = ccirc[0, 0, 0] + measureErrVar
-    for i in range(nc):
-        rAA[i,i] = diagEntry
-        for j in range(i+1, nc):
-            rAA[i,j] = ccirc[np.mod(iz[j]-iz[i], N3), np.mod(iy[j]-iy[i], N2), np.mod(ix[j]-ix[i], N1)]
-            rAA[j,i] = rAA[i,j]
+    rAA = _cov_matrix_cond_from_ccirc(ccirc, (iz, iy, ix), diagEntry)
 
     # Test if rAA is almost singular...
-    if 1./np.linalg.cond(rAA) < tolInvKappa:
+    # (rAA is symmetric: its condition number is computed from its eigen values)
+    rAAeig = np.abs(np.linalg.eigvalsh(rAA))
+    if np.min(rAAeig) < tolInvKappa * np.max(rAAeig):
         err_msg = f'{fname}: conditioning issue: condition number of matrix rAA is too big'
         raise GrfError(err_msg)
 
+    del(rAAeig)
+
+    # Cholesky decomposition of rAA (computed once, used for solving linear systems)
+    try:
+        rAAcho = scipy.linalg.cho_factor(rAA, overwrite_a=True)
+    except np.linalg.LinAlgError as exc:
+        err_msg = f'{fname}: conditioning issue: matrix rAA is not positive definite'
+        raise GrfError(err_msg) from exc
+
+    del(rAA)
+
     # Compute:
     #    indnc: node index of non-conditioning node (nearest node)
     indnc = np.asarray(np.setdiff1d(np.arange(nxyz), indc), dtype=int)
@@ -4798,16 +5925,18 @@ def krige3D(
     kx = np.mod(kk, nx)
     del(kk)
 
-    if mean is None:
-        # Set mean for kriging
-        mean = np.array([np.mean(v)])
-
     # Initialize
-    krig = np.zeros(nz*ny*nx)
+    # (the first axis of krig corresponds to the data sets if several ones are given)
+    krig = np.zeros(v_agg.shape[:-1] + (nz*ny*nx, ), dtype=dtype)
     if computeKrigSD:
-        krigSD = np.zeros(nz*ny*nx)
+        krigSD = np.zeros(nz*ny*nx, dtype=dtype)
 
-    if mean.size == 1:
+    if mean is None:
+        # Set mean for kriging (mean of the data, for each data set)
+        mean = np.mean(v, axis=-1, keepdims=True)
+        v_agg = v_agg - mean
+        mean = mean.reshape(mean.shape[:-1] + (1, ) * 3) # (to be added to the estimates on the grid)
+    elif mean.size == 1:
         v_agg = v_agg - mean
     else:
         v_agg = v_agg - mean.reshape(-1)[indc]
@@ -4823,9 +5952,7 @@ def krige3D(
 
         # Compute the parts rBA of the covariance matrix (see above)
         # rBA
-        rBA = np.zeros((nnc, nc))
-        for j in range(nc):
-            rBA[:,j] = ccirc[np.mod(iz[j] - kz, N3), np.mod(iy[j] - ky, N2), np.mod(ix[j] - kx, N1)]
+        rBA = _cov_matrix_from_ccirc(ccirc, (kz, ky, kx), (iz, iy, ix))
 
         del(ix, iy, iz, kx, ky, kz)
         del(ccirc)
@@ -4833,10 +5960,10 @@ def krige3D(
         if verbose > 1:
             print(f'{fname}: Computing rBA * rAA^(-1)...')
 
-        # compute rBA * rAA^(-1)
-        rBArAAinv = np.dot(rBA, np.linalg.inv(rAA))
+        # compute rBA * rAA^(-1) = (rAA^(-1) * rAB)^T
+        rBArAAinv = scipy.linalg.cho_solve(rAAcho, rBA.T).T
 
-        del(rAA)
+        del(rAAcho)
         if not computeKrigSD:
             del(rBA)
 
@@ -4844,17 +5971,16 @@ def krige3D(
         if verbose > 1:
             print(f'{fname}: computing kriging estimates...')
 
-        krig[indnc] = np.dot(rBArAAinv, v_agg)
-        krig[indc] = v_agg
+        krig[..., indnc] = np.dot(rBArAAinv, v_agg.T).T
+        krig[..., indc] = v_agg
 
         if computeKrigSD:
             # Compute kriging standard deviation
             if verbose > 1:
                 print(f'{fname}: computing kriging standard deviation ...')
 
-            for j in range(nnc):
-                krigSD[indnc[j]] = np.dot(rBArAAinv[j,:], rBA[j,:])
-            krigSD[indnc] = np.sqrt(np.maximum(diagEntry - krigSD[indnc], 0.))
+            # diag(rBA * rAA^(-1) * rAB), row by row (without loop)
+            krigSD[indnc] = np.sqrt(np.maximum(diagEntry - np.einsum('ij,ij->i', rBArAAinv, rBA), 0.))
 
             del(rBA)
 
@@ -4879,25 +6005,26 @@ def krige3D(
         # Compute
         #    u = rAA^(-1) * v_agg, and then
         #    Z = rBA * u via the circulant embedding of the covariance matrix
-        uEmb = np.zeros(N3*N2*N1)
-        uEmb[indcEmb] = np.linalg.solve(rAA, v_agg)
-        Z = np.fft.ifftn(lam * np.fft.fftn(uEmb.reshape(N3, N2, N1)))
+        # (for all data sets at once: batched solve and FFTs along the last three axes)
+        uEmb = np.zeros(v_agg.shape[:-1] + (N3*N2*N1, ), dtype=dtype)
+        uEmb[..., indcEmb] = scipy.linalg.cho_solve(rAAcho, v_agg.T).T
+        Z = fft.ifftn(lam * fft.fftn(uEmb.reshape(v_agg.shape[:-1] + (N3, N2, N1)), axes=(-3, -2, -1)), axes=(-3, -2, -1))
         # ...note that Im(Z) = 0
-        krig[indnc] = np.real(Z.reshape(-1)[indncEmb])
-        krig[indc] = v_agg
+        krig[..., indnc] = np.real(Z.reshape(v_agg.shape[:-1] + (-1, ))[..., indncEmb])
+        krig[..., indc] = v_agg
 
         if computeKrigSD:
             # Compute kriging standard deviation
             if verbose > 1:
                 print(f'{fname}: computing kriging standard deviation ...')
 
-            for j in range(nnc):
-                u = ccirc[np.mod(iz - kz[j], N3), np.mod(iy - ky[j], N2), np.mod(ix - kx[j], N1)] # j-th row of rBA
-                krigSD[indnc[j]] = np.dot(u,np.linalg.solve(rAA, u))
+            if block_size is None:
+                block_size = max(2**22 // nc, 1)
 
-            del(ccirc)
+            # diag(rBA * rAA^(-1) * rAB), by blocks of non-conditioning cells
+            krigSD[indnc] = np.sqrt(np.maximum(diagEntry - _krige_var_reduction(rAAcho, ccirc, (kz, ky, kx), (iz, iy, ix), block_size), 0.))
 
-            krigSD[indnc] = np.sqrt(np.maximum(diagEntry - krigSD[indnc], 0.))
+            del(ccirc)
 
         del(ix, iy, iz, kx, ky, kz)
 
@@ -4908,15 +6035,15 @@ def krige3D(
     # ... update if non-stationary covariance is specified
     if var is not None:
         if var.size > 1:
-            krig = varUpdate.reshape(-1) * krig
+            krig *= varUpdate.reshape(-1)
         if computeKrigSD:
-            krigSD = varUpdate.reshape(-1) * krigSD
+            krigSD *= varUpdate.reshape(-1)
 
-    krig.resize(nz, ny, nx)
+    krig = krig.reshape(krig.shape[:-1] + (nz, ny, nx))
     if computeKrigSD:
         krigSD.resize(nz, ny, nx)
 
-    krig = krig + mean
+    krig += mean
 
     if computeKrigSD:
         return krig, krigSD
@@ -0,0 +1,949 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# -------------------------------------------------------------------------
+# Python module:  'grfSpectral.py'
+# author:         agent
+# date:           oct-2026
+# -------------------------------------------------------------------------
+
+"""
+Module for gaussian random fields (GRF) simulations in 1D, 2D and 3D,
+based on a spectral method (spectral turning bands, or random Fourier
+features).
+
+Unlike the functions of the module :mod:`grf` (circulant embedding), no
+extended grid is used: the memory requirement is of the order of the size of
+the simulation grid, which allows to simulate very large grids. A GRF Z with
+the covariance model `cov_model` (stationary) is approximated by a sum of
+cosine waves
+
+.. math::
+    Z(x) = \\sum_{k=1}^{M} a_k \\cos(\\langle \\omega_k, x \\rangle + \\varphi_k)
+
+where the phases :math:`\\varphi_k` are uniform on :math:`[0, 2\\pi[`, and the
+wave vectors :math:`\\omega_k` are drawn from the spectral measure of the
+covariance model: for each elementary contribution (except nugget), the
+directions are uniform on the unit sphere (turning bands method in 3D, the
+covariance on the lines being :math:`s \\mapsto \\frac{d}{ds}(s\\rho(s))`, where
+:math:`\\rho` is the isotropic elementary covariance), and the norms are drawn
+from the spectral measure of the covariance on the lines, computed
+numerically (once) on a fine discretization. In 1D, the spectral measure of
+the elementary covariance is directly used. The nugget contribution is
+simulated by an independent white noise.
+
+For a finite number of waves M, the fields are only approximately Gaussian
+(central limit theorem), the covariance model being reproduced in
+expectation.
+
+References
+----------
+- G\\. Matheron (1973) \\
+The intrinsic random functions and their applications. \\
+Advances in Applied Probability 5(3):439-468, \\
+`doi:10.2307/1425829 <https://dx.doi.org/10.2307/1425829>`_
+- M\\. Shinozuka (1971) \\
+Simulation of multivariate and multidimensional random processes. \\
+The Journal of the Acoustical Society of America 49(1B):357-368, \\
+`doi:10.1121/1.1912338 <https://dx.doi.org/10.1121/1.1912338>`_
+- C\\. Lantuejoul (2002) \\
+Geostatistical Simulation, Models and Algorithms. \\
+Springer Berlin, Heidelberg, \\
+`doi:10.1007/978-3-662-04808-5 <https://dx.doi.org/10.1007/978-3-662-04808-5>`_
+"""
+
+import numpy as np
+import scipy.linalg
+from geone import covModel as gcm
+from geone import img
+from geone import parallel
+from geone import randomStream
+
+# ============================================================================
+class GrfSpectralError(Exception):
+    """
+    Custom exception related to `grfSpectral` module.
+    """
+    pass
+# ============================================================================
+
+# Elementary covariance functions (of unit weight and range) handled by the
+# spectral method, from type of elementary model
+_elem_cov_func = {
+    'spherical':               gcm.cov_sph,
+    'exponential':             gcm.cov_exp,
+    'gaussian':                gcm.cov_gau,
+    'linear':                  gcm.cov_lin,
+    'cubic':                   gcm.cov_cub,
+    'sinus_cardinal':          gcm.cov_sinc,
+    'gamma':                   gcm.cov_gamma,
+    'exponential_generalized': gcm.cov_exp_gen,
+    'matern':                  gcm.cov_matern,
+}
+
+# Discretization (in unit of range) used for computing the spectral measure of
+# elementary covariance models: lags k*_spectral_ds, k=0,...,_spectral_n/2
+_spectral_ds = 0.01
+_spectral_n = 2**13
+
+# ----------------------------------------------------------------------------
+def _elem_spectrum(t, p, line):
+    """
+    Computes the spectral measure of an elementary covariance model of unit range.
+
+    Parameters
+    ----------
+    t : str
+        type of elementary covariance model (key of `_elem_cov_func`)
+    p : dict
+        parameters of the elementary model (`'w'` and `'r'` are ignored)
+    line : bool
+        - if `True`: the spectral measure of the covariance on the lines of \
+        the turning bands method in 3D, i.e. of the function \
+        s -> d/ds (s f(s)), where f is the (isotropic) elementary covariance \
+        function of unit range, is computed
+        - if `False`: the spectral measure of f is computed
+
+    Returns
+    -------
+    cdf : 1D array
+        cumulative distribution function of the (discretized) spectral measure,
+        `cdf[k]` is the probability of a frequency less than or equal to `k*dw`
+    dw : float
+        frequency step
+
+    Notes
+    -----
+    An error is raised if the spectral measure has significant negative
+    masses, i.e. if the covariance model is not valid (in 3D, if `line=True`).
+    """
+    fname = '_elem_spectrum'
+
+    f = _elem_cov_func[t]
+    kwargs = {key: val for key, val in p.items() if key not in ('w', 'r')}
+
+    L = _spectral_n // 2
+    ds = _spectral_ds
+    s = np.arange(L+1) * ds # [0, ..., L] * ds
+
+    if line:
+        # c(s) = d/ds (s f(s)), by centered finite difference, with g(s) = s f(s) (odd function)
+        sm = s - 0.5*ds
+        c = ((s + 0.5*ds) * f(s + 0.5*ds, **kwargs) - sm * f(np.abs(sm), **kwargs)) / ds
+    else:
+        c = f(s, **kwargs)
+
+    # Symmetric extension (first line of a circulant matrix) and its DFT
+    ccirc = np.hstack((c, c[L-1:0:-1]))
+    lam = np.real(np.fft.fft(ccirc))
+
+    # Spectral masses at frequencies k*dw, k=0,...,L (lam(k) = lam(N-k))
+    mass = lam[:L+1]
+    mass[1:L] = 2.0 * mass[1:L]
+
+    if np.sum(np.minimum(mass, 0.)) < -1.e-2 * np.sum(np.maximum(mass, 0.)):
+        err_msg = f"{fname}: elementary covariance model of type '{t}' not valid (in {3 if line else 1}D) for the spectral method"
+        raise GrfSpectralError(err_msg)
+
+    cdf = np.cumsum(np.maximum(mass, 0.))
+    cdf = cdf / cdf[-1]
+    dw = np.pi / (L * ds)
+
+    return cdf, dw
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _spectral_waves(cov_model, dim, nfeatures, rng):
+    """
+    Draws the waves (wave vectors, phases and amplitudes) of one GRF.
+
+    Parameters
+    ----------
+    cov_model : :class:`geone.covModel.CovModel1D`, or :class:`geone.covModel.CovModel2D`, or :class:`geone.covModel.CovModel3D`
+        covariance model (stationary) in dimension `dim`
+    dim : int
+        space dimension (1, 2, or 3)
+    nfeatures : int
+        number of waves per elementary contribution (except nugget)
+    rng : :class:`numpy.random.Generator` or :class:`numpy.random.RandomState`
+        random number generator
+
+    Returns
+    -------
+    omega : 2D array of shape (M, dim)
+        wave vectors (one per row), in the coordinates system of the grid
+    phi : 1D array of shape (M,)
+        phases
+    amp : 1D array of shape (M,)
+        amplitudes
+    """
+    # fname = '_spectral_waves'
+
+    if dim == 1:
+        mrot = np.ones((1, 1))
+    else:
+        mrot = cov_model.mrot()
+
+    omega, phi, amp = [], [], []
+    for t, p in cov_model.elem:
+        if t == 'nugget':
+            continue
+
+        cdf, dw = _elem_spectrum(t, p, line=dim > 1)
+        # norms of wave vectors (uniform within the frequency bins)
+        k = np.minimum(np.searchsorted(cdf, rng.random(size=nfeatures), side='right'), len(cdf)-1)
+        w_norm = np.abs(k + rng.random(size=nfeatures) - 0.5) * dw
+        # directions
+        if dim == 1:
+            u = np.ones((nfeatures, 1))
+        else:
+            u = rng.normal(size=(nfeatures, 3))
+            u = (u / np.sqrt(np.sum(u**2, axis=1)).reshape(-1, 1))[:, :dim]
+
+        # wave vectors for unit ranges along the axes of the model, then in
+        # the coordinates system of the grid
+        omega.append(np.dot(w_norm.reshape(-1, 1) * u / np.asarray(p['r'], dtype='float').reshape(-1)[:dim], mrot.T))
+        phi.append(2.0 * np.pi * rng.random(size=nfeatures))
+        amp.append(np.full(nfeatures, np.sqrt(2.0 * p['w'] / nfeatures)))
+
+    if len(omega) == 0:
+        return np.zeros((0, dim)), np.zeros(0), np.zeros(0)
+
+    return np.vstack(omega), np.hstack(phi), np.hstack(amp)
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _cell_coordinates(j0, j1, dimension, spacing, origin):
+    """
+    Returns the coordinates of the center of grid cells of flat index in [j0, j1[.
+
+    Parameters
+    ----------
+    j0, j1 : int
+        range of flat indices (C order, i.e. x-axis first)
+    dimension, spacing, origin : sequences of length dim
+        (nx, ...), (sx, ...), (ox, ...) of the grid
+
+    Returns
+    -------
+    xc : 2D array of shape (j1-j0, dim)
+        coordinates of the cell centers
+    """
+    # fname = '_cell_coordinates'
+
+    j = np.arange(j0, j1)
+    xc = np.empty((j1-j0, len(dimension)))
+    for i, (n, s, o) in enumerate(zip(dimension, spacing, origin)):
+        xc[:, i] = o + s * (0.5 + np.mod(j, n))
+        j = j // n
+    return xc
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _spectral_eval(xc, omega, phi, amp):
+    """
+    Evaluates a sum of cosine waves at given points.
+
+    Parameters
+    ----------
+    xc : 2D array of shape (m, dim)
+        points
+    omega, phi, amp : arrays
+        waves (see function :func:`_spectral_waves`)
+
+    Returns
+    -------
+    z : 1D array of shape (m,)
+        `z[j] = sum_k amp[k] * cos(<omega[k], xc[j]> + phi[k])`
+    """
+    # fname = '_spectral_eval'
+
+    # phase and sum computed term by term (no matrix product), so that the
+    # result at a point does not depend on the other points
+    a = np.tile(phi, (xc.shape[0], 1))
+    for i in range(xc.shape[1]):
+        a += np.outer(xc[:, i], omega[:, i])
+    a = np.cos(a, out=a)
+    a *= amp
+    return np.sum(a, axis=1)
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _grfSpectral_tiles(grf_out, j0, j1, waves, krig, grid, tileSize):
+    """
+    Evaluates the (unconditional or conditional) GRFs on grid cells of flat index in [j0, j1[, by tiles.
+
+    Parameters
+    ----------
+    grf_out : 2D array of shape (nreal, ncells)
+        output array (updated in place)
+    j0, j1 : int
+        range of flat indices of cells
+    waves : list
+        waves of each realization (3-tuples, see function :func:`_spectral_waves`)
+    krig : 3-tuple or None
+        `(cov_model, xd, wd)` for conditional simulation, where `xd` are the
+        data locations, and `wd[i]` the vector rAA^(-1) * (residues at `xd`)
+        for the i-th realization; `None` for unconditional simulation
+    grid : 3-tuple
+        `(dimension, spacing, origin)` of the grid
+    tileSize : int
+        number of cells per tile
+    """
+    # fname = '_grfSpectral_tiles'
+
+    for k0 in range(j0, j1, tileSize):
+        k1 = min(k0 + tileSize, j1)
+        xc = _cell_coordinates(k0, k1, *grid)
+        for i, (omega, phi, amp) in enumerate(waves):
+            grf_out[i, k0:k1] = _spectral_eval(xc, omega, phi, amp)
+
+        if krig is not None:
+            # Add kriging of the residues (simple kriging, zero mean)
+            cov_model, xd, wd = krig
+            rBA = cov_model.func()((xc[:, np.newaxis, :] - xd[np.newaxis, :, :]).reshape(-1, xd.shape[1])).reshape(k1-k0, -1)
+            # sum computed term by term (no matrix product), so that the result
+            # does not depend on the tiles
+            for i in range(len(wd)):
+                grf_out[i, k0:k1] += np.sum(rBA * wd[i], axis=1)
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _grfSpectral_tiles_mp_worker(grf_desc, j0, j1, waves, krig, grid, tileSize):
+    """
+    Runs :func:`_grfSpectral_tiles` in a process (worker), with a shared output array (see :func:`parallel._output_array_create`).
+    """
+    # fname = '_grfSpectral_tiles_mp_worker'
+
+    shm_list = []
+    try:
+        grf_out = parallel._output_array_attach(grf_desc, shm_list)
+        _grfSpectral_tiles(grf_out, j0, j1, waves, krig, grid, tileSize)
+        if isinstance(grf_out, np.memmap):
+            grf_out.flush()
+    finally:
+        grf_out = None
+        for shm in shm_list:
+            shm.close()
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _grfSpectral(
+        cov_model, dim,
+        dimension, spacing, origin,
+        x, v,
+        mean,
+        nreal,
+        nfeatures,
+        measureErrVar, tolInvKappa,
+        tileSize,
+        nproc,
+        dtype,
+        rng,
+        out,
+        verbose,
+        fname):
+    """
+    Generates GRFs in 1D, 2D or 3D via a spectral method (common part).
+
+    See functions :func:`grfSpectral1D`, :func:`grfSpectral2D`,
+    :func:`grfSpectral3D`, where `dimension`, `spacing`, `origin` are
+    sequences (of length `dim`), and `cov_model` is a covariance model
+    in dimension `dim`.
+    """
+    # Floating point type of the output
+    try:
+        dtype = np.dtype(dtype)
+    except Exception as exc:
+        err_msg = f'{fname}: `dtype` invalid'
+        raise GrfSpectralError(err_msg) from exc
+
+    if dtype not in (np.float64, np.float32):
+        err_msg = f"{fname}: `dtype` invalid, should be 'float64' or 'float32'"
+        raise GrfSpectralError(err_msg)
+
+    # Prevent calculation if covariance model is not stationary
+    if not cov_model.is_stationary():
+        err_msg = f'{fname}: `cov_model` is not stationary: {fname} cannot be applied (use `geone.geosclassicinterface` package)'
+        raise GrfSpectralError(err_msg)
+
+    for t, p in cov_model.elem:
+        if t != 'nugget' and t not in _elem_cov_func:
+            err_msg = f"{fname}: elementary covariance model of type '{t}' not handled by the spectral method"
+            raise GrfSpectralError(err_msg)
+
+    # Number of realization(s)
+    nreal = int(nreal) # cast to int if needed
+
+    if nreal <= 0:
+        if verbose > 0:
+            print(f'{fname}: WARNING: `nreal` <= 0: `None` is returned')
+        return None
+
+    nfeatures = int(nfeatures) # cast to int if needed
+    if nfeatures <= 0:
+        err_msg = f'{fname}: `nfeatures` invalid'
+        raise GrfSpectralError(err_msg)
+
+    # Random number generator (stream) for each realization
+    try:
+        rngs = randomStream.rng_streams(rng, nreal)
+    except Exception as exc:
+        err_msg = f'{fname}: `rng` invalid'
+        raise GrfSpectralError(err_msg) from exc
+
+    dimension = tuple(int(n) for n in dimension)
+    spacing = tuple(float(s) for s in spacing)
+    origin = tuple(float(o) for o in origin)
+    ncells = int(np.prod(dimension))
+    grid_shape = dimension[::-1]
+
+    if out is not None and not parallel._valid_output_array(out, (nreal, ) + grid_shape, dtype):
+        err_msg = f'{fname}: `out` invalid (shape or type not valid, or not C-contiguous)'
+        raise GrfSpectralError(err_msg)
+
+    if x is None and v is not None:
+        err_msg = f'{fname}: `x` is not given (`None`) but `v` is given (not `None`)'
+        raise GrfSpectralError(err_msg)
+
+    if x is not None:
+        if v is None:
+            err_msg = f'{fname}: `x` is given (not `None`) but `v` is not given (`None`)'
+            raise GrfSpectralError(err_msg)
+
+        x = np.asarray(x, dtype='float').reshape(-1, dim) # cast in 2-dimensional array if needed
+        v = np.asarray(v, dtype='float').reshape(-1) # cast in 1-dimensional array if needed
+        if len(v) != x.shape[0]:
+            err_msg = f'{fname}: length of `v` is not valid'
+            raise GrfSpectralError(err_msg)
+
+    # Mean (on the grid, and at data points)
+    mean_x = mean
+    if mean is None:
+        if x is not None:
+            mean = np.array([np.mean(v)])
+        else:
+            mean = np.array([0.0])
+        mean_x = mean
+    elif callable(mean):
+        if x is not None:
+            mean_x = mean(*x.T)
+        xi = [o + s*(0.5+np.arange(n)) for n, s, o in zip(dimension, spacing, origin)] # coordinates of cell centers along each axis
+        mean = np.asarray(mean(*np.meshgrid(*xi[::-1], indexing='ij')[::-1]), dtype='float') # replace function 'mean' by its evaluation on the grid
+    else:
+        mean = np.asarray(mean, dtype='float').reshape(-1) # cast in 1-dimensional array if needed
+        if mean.size == 1:
+            mean_x = mean
+        elif mean.size == ncells:
+            mean = mean.reshape(grid_shape)
+            if x is not None:
+                nxyz = dimension + (1,)*(3-dim)
+                sxyz = spacing + (1.,)*(3-dim)
+                oxyz = origin + (0.,)*(3-dim)
+                ind_fixed = dict(iy=0, iz=0) if dim == 1 else (dict(iz=0) if dim == 2 else {})
+                mean_x = img.Img_interp_func(img.Img(*nxyz, *sxyz, *oxyz, nv=1, val=mean), **ind_fixed)(x)
+        else:
+            err_msg = f'{fname}: size of `mean` is not valid'
+            raise GrfSpectralError(err_msg)
+
+    # Nugget contribution (simulated as a white noise)
+    w_nugget = np.sum([p['w'] for t, p in cov_model.elem if t == 'nugget'])
+
+    # Number of cells per tile
+    if tileSize is None:
+        tileSize = max(2**22 // (nfeatures * max(len(cov_model.elem), 1) + (0 if x is None else len(v))), 1)
+    else:
+        tileSize = int(tileSize) # cast to int if needed
+        if tileSize <= 0:
+            err_msg = f'{fname}: `tileSize` invalid'
+            raise GrfSpectralError(err_msg)
+
+    # Waves of each realization
+    if verbose > 1:
+        print(f'{fname}: Drawing waves ({nfeatures} per elementary contribution)...')
+
+    waves = [_spectral_waves(cov_model, dim, nfeatures, rngs[i]) for i in range(nreal)]
+
+    # Conditioning data: kriging of residues
+    krig = None
+    if x is not None:
+        if verbose > 1:
+            print(f'{fname}: Treatment of conditioning data...')
+
+        cov_func = cov_model.func() # covariance function
+        nc = len(v)
+
+        # Covariance matrix rAA of data points and its Cholesky decomposition
+        rAA = cov_func((x[:, np.newaxis, :] - x[np.newaxis, :, :]).reshape(-1, dim)).reshape(nc, nc)
+        rAA[np.diag_indices(nc)] += measureErrVar
+
+        rAAeig = np.abs(np.linalg.eigvalsh(rAA))
+        if np.min(rAAeig) < tolInvKappa * np.max(rAAeig):
+            err_msg = f'{fname}: conditioning issue: condition number of matrix rAA is too big'
+            raise GrfSpectralError(err_msg)
+
+        try:
+            rAAcho = scipy.linalg.cho_factor(rAA, overwrite_a=True)
+        except np.linalg.LinAlgError as exc:
+            err_msg = f'{fname}: conditioning issue: matrix rAA is not positive definite'
+            raise GrfSpectralError(err_msg) from exc
+
+        # Residues at data points (one row per realization)
+        residu = np.zeros((nreal, nc))
+        for i in range(nreal):
+            residu[i] = v - mean_x - _spectral_eval(x, *waves[i])
+            if w_nugget > 0:
+                residu[i] -= np.sqrt(w_nugget) * rngs[i].normal(size=nc)
+
+        krig = (cov_model, x, scipy.linalg.cho_solve(rAAcho, residu.T).T)
+
+    # Evaluation on the grid, by tiles
+    n = parallel.get_nproc(nproc)
+
+    # index of first cell for each process (multiple of tileSize)
+    ntile = -(-ncells // tileSize)
+    n = min(n, ntile)
+    q, r = np.divmod(ntile, n)
+    ids_proc = [min((i*q + min(i, r)) * tileSize, ncells) for i in range(n+1)]
+
+    if verbose > 1:
+        print(f'{fname}: Evaluating GRFs on the grid ({ntile} tile(s), {n} process(es))...')
+
+    grid = (dimension, spacing, origin)
+    if n == 1:
+        if out is None:
+            grf_out = np.zeros((nreal, ncells), dtype=dtype)
+        else:
+            grf_out = out.reshape(nreal, ncells) # view (out is C-contiguous)
+        _grfSpectral_tiles(grf_out, 0, ncells, waves, krig, grid, tileSize)
+    else:
+        shm_list = []
+        try:
+            grf_desc = parallel._output_array_create(out, (nreal, ncells), dtype, shm_list)
+
+            # Set pool of n workers
+            pool = parallel.get_pool(n)
+            out_pool = [pool.apply_async(_grfSpectral_tiles_mp_worker,
+                                         args=(grf_desc, ids_proc[i], ids_proc[i+1], waves, krig, grid, tileSize))
+                        for i in range(n)]
+
+            # Wait for the tasks and release the pool
+            parallel.release_pool(pool, out_pool)
+
+            # Check each process (an error occurred in a process is raised)
+            for w in out_pool:
+                w.get()
+
+            grf_out = parallel._output_array_get(grf_desc, None if out is None else out.reshape(nreal, ncells), shm_list)
+
+        finally:
+            for shm in shm_list:
+                shm.close()
+                try:
+                    shm.unlink()
+                except FileNotFoundError:
+                    pass
+
+    if out is None:
+        grf_out = grf_out.reshape((nreal, ) + grid_shape)
+    else:
+        grf_out = out
+
+    # Nugget contribution
+    if w_nugget > 0:
+        for i in range(nreal):
+            grf_out[i] += (np.sqrt(w_nugget) * rngs[i].normal(size=grid_shape)).astype(dtype, copy=False)
+
+    # Mean
+    grf_out += mean.astype(dtype, copy=False)
+
+    return grf_out
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def grfSpectral1D(
+        cov_model,
+        dimension, spacing=1.0, origin=0.0,
+        x=None, v=None,
+        mean=None,
+        nreal=1,
+        nfeatures=1000,
+        measureErrVar=0.0, tolInvKappa=1.e-10,
+        tileSize=None,
+        nproc=1,
+        dtype='float64',
+        rng=None,
+        out=None,
+        verbose=1):
+    """
+    Generates Gaussian Random Fields (GRF) in 1D via a spectral method.
+
+    The GRFs are generated as sums of cosine waves (see module
+    :mod:`grfSpectral`), evaluated on the grid by tiles (the memory requirement
+    is of the order of the size of the grid), and may be conditioned to
+    location(s) `x` with value(s) `v` by simple kriging of the residues.
+
+    Parameters
+    ----------
+    cov_model : :class:`geone.covModel.CovModel1D`
+        covariance model in 1D (stationary), the elementary contributions of
+        type 'power' are not handled
+
+    dimension : int
+        `dimension=nx`, number of cells in the 1D simulation grid
+
+    spacing : float, default: 1.0
+        `spacing=sx`, cell size
+
+    origin : float, default: 0.0
+        `origin=ox`, origin of the 1D simulation grid (left border)
+
+    x : 1D array-like of floats, optional
+        data points locations (float coordinates); note: if one point, a float
+        is accepted
+
+    v : 1D array-like of floats, optional
+        data values at `x` (`v[i]` is the data value at `x[i]`), array of same
+        length as `x` (or float if one point)
+
+    mean : function (`callable`), or array-like of floats, or float, optional
+        mean value:
+
+        - if a function: function of one argument (xi) that returns the mean at \
+        location xi
+        - if array-like: its size must be equal to the number of grid cells \
+        (the array is reshaped if needed), mean values at grid cells (for \
+        non-stationary mean)
+        - if a float: same mean value at every grid cell
+
+        By default (`None`): the mean of data value (`v`) (0.0 if no data) is
+        considered at every grid cell
+
+    nreal : int, default: 1
+        number of realization(s)
+
+    nfeatures : int, default: 1000
+        number of cosine waves per elementary contribution (except nugget)
+        of the covariance model; the larger, the closer to a Gaussian field
+
+    measureErrVar : float, default: 0.0
+        measurement error variance; the error on conditioning data is assumed to
+        follow the distrubution N(0, `measureErrVar` * I); i.e.
+        rAA + `measureErrVar` * I is considered instead of rAA (covariance
+        matrix of the data locations) for stabilizing the linear system;
+        note: parameter `measureErrVar` is used only for conditional simulation
+
+    tolInvKappa : float, default: 1.e-10
+        the simulation is stopped if the inverse of the condition number of rAA
+        is above `tolInvKappa`;
+        note: parameter `tolInvKappa` is used only for conditional simulation
+
+    tileSize : int, optional
+        number of grid cells evaluated at once; by default (`None`): set such
+        that about 2^22 waves (and covariances to data points) are evaluated
+        at once
+
+    nproc : int, default: 1
+        number of processes used for evaluating the tiles in parallel:
+
+        - if `nproc > 0`: n = `nproc`,
+        - if `nproc <= 0`: n = max(nmax+`nproc`, 1), where nmax is the total \
+        number of cpu(s) of the system (retrieved by :func:`config.cpu_count`)
+
+        the result does not depend on `nproc` (nor on `tileSize`): the sums
+        over the waves and the data points are computed cell by cell in a fixed
+        order, independently of the tiles
+
+    dtype : str or numpy.dtype {'float64', 'float32'}, default: 'float64'
+        floating point type of the output GRFs (the computation is done in
+        double precision)
+
+    rng : int, or :class:`numpy.random.SeedSequence`, or :class:`numpy.random.Generator`, or sequence, optional
+        random number generator specification (see module :mod:`randomStream`);
+        by default (`None`): the global random state of `numpy.random` is used;
+        otherwise, each realization is generated with its own independent
+        stream spawned from `rng`
+
+    out : nd array, optional
+        C-contiguous array of shape (`nreal`, ) + shape of the grid (see below)
+        and of type `dtype`, in which the realizations are written (and which
+        is returned), e.g. a :class:`numpy.memmap` for writing the realizations
+        directly in a file (the processes write directly in the file if `out`
+        is a :class:`numpy.memmap` opened in mode 'r+' or 'w+');
+        by default (`None`): a new array is allocated
+
+    verbose : int, default: 1
+        verbose mode, higher implies more printing (info):
+
+        - 0: no display
+        - 1: warnings
+        - 2 (or >1): warnings + basic info
+
+        note that if an error occurred, it is raised
+
+    Returns
+    -------
+    grf : 2D array of shape (`nreal`, nx)
+        GRF realizations, `grf[i, j]`: value of the i-th realisation at grid
+        cell of index j
+
+    Notes
+    -----
+    The nugget contribution of the covariance model is simulated by a white
+    noise, drawn independently on the grid cells and at the data points.
+    """
+    fname = 'grfSpectral1D'
+
+    if not isinstance(cov_model, gcm.CovModel1D):
+        err_msg = f'{fname}: `cov_model` invalid'
+        raise GrfSpectralError(err_msg)
+
+    return _grfSpectral(
+            cov_model, 1, (dimension,), (spacing,), (origin,), x, v, mean, nreal,
+            nfeatures, measureErrVar, tolInvKappa, tileSize, nproc, dtype, rng,
+            out, verbose, fname)
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def grfSpectral2D(
+        cov_model,
+        dimension, spacing=(1.0, 1.0), origin=(0.0, 0.0),
+        x=None, v=None,
+        mean=None,
+        nreal=1,
+        nfeatures=1000,
+        measureErrVar=0.0, tolInvKappa=1.e-10,
+        tileSize=None,
+        nproc=1,
+        dtype='float64',
+        rng=None,
+        out=None,
+        verbose=1):
+    """
+    Generates Gaussian Random Fields (GRF) in 2D via a spectral method.
+
+    The GRFs are generated as sums of cosine waves (see module
+    :mod:`grfSpectral`), evaluated on the grid by tiles (the memory requirement
+    is of the order of the size of the grid), and may be conditioned to
+    location(s) `x` with value(s) `v` by simple kriging of the residues.
+
+    Parameters
+    ----------
+    cov_model : :class:`geone.covModel.CovModel2D`, or :class:`geone.covModel.CovModel1D`
+        covariance model in 2D, or covariance model in 1D interpreted as an
+        omni-directional covariance model (stationary); the elementary
+        contributions must be valid in 3D (types 'power' and 'linear' are not
+        handled)
+
+    dimension : 2-tuple of ints
+        `dimension=(nx, ny)`, number of cells in the 2D simulation grid along
+        each axis
+
+    spacing : 2-tuple of floats, default: (1.0, 1.0)
+        `spacing=(sx, sy)`, cell size along each axis
+
+    origin : 2-tuple of floats, default: (0.0, 0.0)
+        `origin=(ox, oy)`, origin of the 2D simulation grid (bottom-lower-left
+        corner)
+
+    x : 2D array of floats of shape (n, 2), optional
+        data points locations, with n the number of data points, each row of `x`
+        is the float coordinates of one data point; note: if n=1, a 1D array of
+        shape (2,) is accepted
+
+    v : 1D array of floats of shape (n,), optional
+        data values at `x` (`v[i]` is the data value at `x[i]`)
+
+    mean : function (`callable`), or array-like of floats, or float, optional
+        mean value:
+
+        - if a function: function of two arguments (xi, yi) that returns the \
+        mean at location (xi, yi)
+        - if array-like: its size must be equal to the number of grid cells \
+        (the array is reshaped if needed), mean values at grid cells (for \
+        non-stationary mean)
+        - if a float: same mean value at every grid cell
+
+        By default (`None`): the mean of data value (`v`) (0.0 if no data) is
+        considered at every grid cell
+
+    nreal : int, default: 1
+        number of realization(s)
+
+    nfeatures : int, default: 1000
+        number of cosine waves per elementary contribution (except nugget)
+        of the covariance model; the larger, the closer to a Gaussian field
+
+    measureErrVar : float, default: 0.0
+        measurement error variance (see function :func:`grfSpectral1D`)
+
+    tolInvKappa : float, default: 1.e-10
+        the simulation is stopped if the inverse of the condition number of rAA
+        is above `tolInvKappa` (see function :func:`grfSpectral1D`)
+
+    tileSize : int, optional
+        number of grid cells evaluated at once (see function
+        :func:`grfSpectral1D`)
+
+    nproc : int, default: 1
+        number of processes used for evaluating the tiles in parallel (see
+        function :func:`grfSpectral1D`)
+
+    dtype : str or numpy.dtype {'float64', 'float32'}, default: 'float64'
+        floating point type of the output GRFs (the computation is done in
+        double precision)
+
+    rng : int, or :class:`numpy.random.SeedSequence`, or :class:`numpy.random.Generator`, or sequence, optional
+        random number generator specification (see function
+        :func:`grfSpectral1D`)
+
+    out : nd array, optional
+        array in which the realizations are written (see function
+        :func:`grfSpectral1D`)
+
+    verbose : int, default: 1
+        verbose mode (see function :func:`grfSpectral1D`)
+
+    Returns
+    -------
+    grf : 3D array of shape (`nreal`, ny, nx)
+        GRF realizations, `grf[i, iy, ix]`: value of the i-th realisation at
+        grid cell of index ix (resp. iy) along x (resp. y) axis
+    """
+    fname = 'grfSpectral2D'
+
+    if isinstance(cov_model, gcm.CovModel1D):
+        cov_model = gcm.covModel1D_to_covModel2D(cov_model) # convert model 1D in 2D
+        # -> cov_model will not be modified at exit
+
+    if not isinstance(cov_model, gcm.CovModel2D):
+        err_msg = f'{fname}: `cov_model` invalid'
+        raise GrfSpectralError(err_msg)
+
+    return _grfSpectral(
+            cov_model, 2, dimension, spacing, origin, x, v, mean, nreal,
+            nfeatures, measureErrVar, tolInvKappa, tileSize, nproc, dtype, rng,
+            out, verbose, fname)
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def grfSpectral3D(
+        cov_model,
+        dimension, spacing=(1.0, 1.0, 1.0), origin=(0.0, 0.0, 0.0),
+        x=None, v=None,
+        mean=None,
+        nreal=1,
+        nfeatures=1000,
+        measureErrVar=0.0, tolInvKappa=1.e-10,
+        tileSize=None,
+        nproc=1,
+        dtype='float64',
+        rng=None,
+        out=None,
+        verbose=1):
+    """
+    Generates Gaussian Random Fields (GRF) in 3D via a spectral method.
+
+    The GRFs are generated as sums of cosine waves (see module
+    :mod:`grfSpectral`), evaluated on the grid by tiles (the memory requirement
+    is of the order of the size of the grid), and may be conditioned to
+    location(s) `x` with value(s) `v` by simple kriging of the residues.
+
+    Parameters
+    ----------
+    cov_model : :class:`geone.covModel.CovModel3D`, or :class:`geone.covModel.CovModel1D`
+        covariance model in 3D, or covariance model in 1D interpreted as an
+        omni-directional covariance model (stationary); the elementary
+        contributions must be valid in 3D (types 'power' and 'linear' are not
+        handled)
+
+    dimension : 3-tuple of ints
+        `dimension=(nx, ny, nz)`, number of cells in the 3D simulation grid along
+        each axis
+
+    spacing : 3-tuple of floats, default: (1.0,1.0, 1.0)
+        `spacing=(sx, sy, sz)`, cell size along each axis
+
+    origin : 3-tuple of floats, default: (0.0, 0.0, 0.0)
+        `origin=(ox, oy, oz)`, origin of the 3D simulation grid (bottom-lower-left
+        corner)
+
+    x : 2D array of floats of shape (n, 3), optional
+        data points locations, with n the number of data points, each row of `x`
+        is the float coordinates of one data point; note: if n=1, a 1D array of
+        shape (3,) is accepted
+
+    v : 1D array of floats of shape (n,), optional
+        data values at `x` (`v[i]` is the data value at `x[i]`)
+
+    mean : function (`callable`), or array-like of floats, or float, optional
+        mean value:
+
+        - if a function: function of three arguments (xi, yi, zi) that returns \
+        the mean at location (xi, yi, zi)
+        - if array-like: its size must be equal to the number of grid cells \
+        (the array is reshaped if needed), mean values at grid cells (for \
+        non-stationary mean)
+        - if a float: same mean value at every grid cell
+
+        By default (`None`): the mean of data value (`v`) (0.0 if no data) is
+        considered at every grid cell
+
+    nreal : int, default: 1
+        number of realization(s)
+
+    nfeatures : int, default: 1000
+        number of cosine waves per elementary contribution (except nugget)
+        of the covariance model; the larger, the closer to a Gaussian field
+
+    measureErrVar : float, default: 0.0
+        measurement error variance (see function :func:`grfSpectral1D`)
+
+    tolInvKappa : float, default: 1.e-10
+        the simulation is stopped if the inverse of the condition number of rAA
+        is above `tolInvKappa` (see function :func:`grfSpectral1D`)
+
+    tileSize : int, optional
+        number of grid cells evaluated at once (see function
+        :func:`grfSpectral1D`)
+
+    nproc : int, default: 1
+        number of processes used for evaluating the tiles in parallel (see
+        function :func:`grfSpectral1D`)
+
+    dtype : str or numpy.dtype {'float64', 'float32'}, default: 'float64'
+        floating point type of the output GRFs (the computation is done in
+        double precision)
+
+    rng : int, or :class:`numpy.random.SeedSequence`, or :class:`numpy.random.Generator`, or sequence, optional
+        random number generator specification (see function
+        :func:`grfSpectral1D`)
+
+    out : nd array, optional
+        array in which the realizations are written (see function
+        :func:`grfSpectral1D`)
+
+    verbose : int, default: 1
+        verbose mode (see function :func:`grfSpectral1D`)
+
+    Returns
+    -------
+    grf : 4D array of shape (`nreal`, nz, ny, nx)
+        GRF realizations, `grf[i, iz, iy, ix]`: value of the i-th realisation at
+        grid cell of index ix (resp. iy, iz) along x (resp. y, z) axis
+    """
+    fname = 'grfSpectral3D'
+
+    if isinstance(cov_model, gcm.CovModel1D):
+        cov_model = gcm.covModel1D_to_covModel3D(cov_model) # convert model 1D in 3D
+        # -> cov_model will not be modified at exit
+
+    if not isinstance(cov_model, gcm.CovModel3D):
+        err_msg = f'{fname}: `cov_model` invalid'
+        raise GrfSpectralError(err_msg)
+
+    return _grfSpectral(
+            cov_model, 3, dimension, spacing, origin, x, v, mean, nreal,
+            nfeatures, measureErrVar, tolInvKappa, tileSize, nproc, dtype, rng,
+            out, verbose, fname)
+# ----------------------------------------------------------------------------
@@ -69,7 +69,7 @@ class Img(object):
     nv : int, default: 0
         number of variable(s) / attribute(s)
 
-    val : 4D array of float of shape (`nv`, `nz`, `ny`, `nx`)
+    val : 4D array of float (float64 or float32) of shape (`nv`, `nz`, `ny`, `nx`)
         attribute(s) / variable(s) values:
 
         - `val[iv, iz, iy, ix]`: value of the variable iv attached to the \
@@ -249,7 +249,10 @@ class Img(object):
             number of variable(s) / attribute(s) attached to the grid cells
 
         val : float or array-like of size `nv*nz*ny*nx`
-            attribute(s) / variable(s) values
+            attribute(s) / variable(s) values; an array of floats in single
+            (float32) or double (float64) precision keeps its type (and is not
+            copied if it can be reshaped as a view), any other input is
+            converted to float (float64)
 
         varname : str or 1D array-like of strs of length `nv`, optional
             variable name(s); if one variable name is given for multiple
@@ -273,9 +276,11 @@ class Img(object):
         self.oz = float(oz)
         self.nv = int(nv)
 
-        valarr = np.asarray(val, dtype=float) # possibly 0-dimensional
+        valarr = np.asarray(val) # possibly 0-dimensional
+        if valarr.dtype not in (np.float32, np.float64):
+            valarr = valarr.astype(float)
         if valarr.size == 1:
-            valarr = valarr.flat[0] * np.ones(nx*ny*nz*nv)
+            valarr = np.full(nx*ny*nz*nv, valarr.flat[0], dtype=valarr.dtype)
         elif valarr.size != nx*ny*nz*nv:
             err_msg = f'{fname}: `val` does not have an acceptable size'
             raise ImgError(err_msg)
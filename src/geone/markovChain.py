@@ -11,7 +11,9 @@
 Module for simulation of Markov Chain on finite sets of states.
 """
 
+import collections
 import numpy as np
+from geone import randomStream
 
 # ============================================================================
 class MarkovChainError(Exception):
@@ -295,8 +297,296 @@ def compute_mc_pinv(kernel):
     return pinv
 # ----------------------------------------------------------------------------
 
+# ============================================================================
+class KernelPower(object):
+    """
+    Class providing the powers of the transition kernel of a Markov chain.
+
+    The powers of the kernel are computed on demand, i.e. without storing all
+    the powers up to a given exponent. If the kernel is diagonalizable (with a
+    well-conditioned basis of eigen vectors), it is diagonalized once,
+    :math:`kernel = s \\cdot diag(val) \\cdot s^{-1}`, and any power (or any
+    element of a power) is obtained by
+    :math:`kernel^k = s \\cdot diag(val^k) \\cdot s^{-1}`; otherwise, the
+    powers are computed by exponentiation by squaring. The matrices returned
+    by the method :meth:`power` are kept in a cache (LRU). Pre-computed
+    powers (3d-array `kernel_pow`, as accepted by the function
+    :func:`simulate_mc` in previous versions) can be given, they are then used
+    for the corresponding exponents.
+
+    An instance of this class can be passed (parameter `kernel_pow`) to the
+    functions :func:`simulate_mc`, :func:`compute_mc_kernel_rev` and
+    :func:`compute_mc_cov`, and reused for several calls.
+
+    **Attributes**
+
+    kernel : 2d-array of shape (n, n)
+        transition kernel of a Markov chain on a set of states
+        :math:`S=\\{0, \ldots, n-1\\}` (see function :func:`simulate_mc`)
+
+    n : int
+        number of states
+
+    maxsize : int
+        maximal number of matrices kept in the cache
+
+    diagonalizable : bool
+        - if `True`: the powers are computed from the diagonalization of the \
+        kernel
+        - if `False`: the powers are computed by exponentiation by squaring
+    """
+    def __init__(self, kernel, maxsize=128, cond_max=1.e8, kernel_pow=None):
+        """
+        Inits an instance of the class.
+
+        Parameters
+        ----------
+        kernel : 2d-array of shape (n, n)
+            transition kernel
+
+        maxsize : int, default: 128
+            maximal number of matrices kept in the cache
+
+        cond_max : float, default: 1.e8
+            maximal condition number of the matrix of eigen vectors for
+            using the diagonalization of the kernel
+
+        kernel_pow : 3d-array of shape (m, n, n), optional
+            pre-computed powers of the kernel, `kernel_pow[k]` being the kernel
+            raised to the power `k`; these matrices are used for the exponents
+            `k < m`, the other powers are computed as described in the class
+        """
+        fname = 'KernelPower'
+
+        kernel = np.asarray(kernel, dtype='float')
+        if kernel.ndim != 2 or kernel.shape[0] != kernel.shape[1]:
+            err_msg = f'{fname}: `kernel` invalid'
+            raise MarkovChainError(err_msg)
+
+        self.kernel = kernel
+        self.n = kernel.shape[0]
+        self.maxsize = maxsize
+
+        self._cache = collections.OrderedDict()
+        self._pinv = None
+
+        # Pre-computed powers
+        if kernel_pow is not None:
+            kernel_pow = np.array(kernel_pow, dtype='float')
+            if kernel_pow.ndim != 3 or kernel_pow.shape[1:] != kernel.shape:
+                err_msg = f'{fname}: `kernel_pow` invalid'
+                raise MarkovChainError(err_msg)
+
+            kernel_pow.flags.writeable = False
+        self._kernel_pow = kernel_pow
+
+        # Diagonalization of kernel: kernel = s.dot(diag(val)).dot(sinv)
+        self.diagonalizable = False
+        try:
+            val, s = np.linalg.eig(kernel)
+            if np.linalg.cond(s) < cond_max:
+                sinv = np.linalg.inv(s)
+                self.diagonalizable = np.allclose((s*val).dot(sinv), kernel, rtol=0.0, atol=1.e-12)
+        except:
+            pass
+
+        if self.diagonalizable:
+            if np.all(val.imag == 0.0) and np.all(s.imag == 0.0):
+                val, s, sinv = val.real, s.real, sinv.real
+            self._val, self._s, self._sinv = val, s, sinv
+        else:
+            self._val, self._s, self._sinv = None, None, None
+            # kernel raised to power 2**i, for i = 0, 1, ...
+            self._pow2 = [kernel]
+
+    # ------------------------------------------------------------------------
+    def __repr__(self):
+        out = f'*** KernelPower object ***\nn = {self.n}\ndiagonalizable = {self.diagonalizable}\ncache: {len(self._cache)} / {self.maxsize} matrices\n*****'
+        return out
+
+    # ------------------------------------------------------------------------
+    @property
+    def pinv(self):
+        """
+        Invariant distribution of the Markov chain (see function :func:`compute_mc_pinv`).
+        """
+        if self._pinv is None:
+            self._pinv = compute_mc_pinv(self.kernel)
+        return self._pinv
+
+    # ------------------------------------------------------------------------
+    def power(self, k):
+        """
+        Returns the kernel raised to a given power.
+
+        Parameters
+        ----------
+        k : int
+            exponent (non-negative)
+
+        Returns
+        -------
+        p : 2d-array of shape (n, n)
+            kernel raised to the power `k` (read-only array)
+        """
+        fname = 'power'
+
+        k = int(k)
+        if k < 0:
+            err_msg = f'{fname}: `k` must be non-negative'
+            raise MarkovChainError(err_msg)
+
+        if self._kernel_pow is not None and k < self._kernel_pow.shape[0]:
+            return self._kernel_pow[k]
+
+        p = self._cache.get(k)
+        if p is not None:
+            self._cache.move_to_end(k)
+            return p
+
+        if k == 0:
+            p = np.eye(self.n)
+        elif k == 1:
+            p = self.kernel.copy()
+        elif self.diagonalizable:
+            p = self.powers([k])[0]
+        else:
+            # Exponentiation by squaring
+            i = 0
+            while k >> i:
+                if i == len(self._pow2):
+                    self._pow2.append(self._pow2[-1].dot(self._pow2[-1]))
+                if (k >> i) & 1:
+                    p = self._pow2[i].copy() if p is None else p.dot(self._pow2[i])
+                i = i + 1
+
+        p.flags.writeable = False
+        self._cache[k] = p
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+        return p
+
+    # ------------------------------------------------------------------------
+    def powers(self, k):
+        """
+        Returns the kernel raised to given powers.
+
+        Parameters
+        ----------
+        k : 1d-array-like of ints
+            exponents (non-negative)
+
+        Returns
+        -------
+        p : 3d-array of shape (len(k), n, n)
+            `p[l]` is the kernel raised to the power `k[l]`
+        """
+        # fname = 'powers'
+
+        k = np.asarray(k, dtype='int').reshape(-1)
+        if not self.diagonalizable:
+            return np.array([self.power(kk) for kk in k]).reshape(-1, self.n, self.n)
+
+        p = np.einsum('il,kl,lj->kij', self._s, self._val**k[:, np.newaxis], self._sinv)
+        p = np.clip(p.real, 0.0, 1.0)
+        # exact values for k = 0, 1
+        p[k == 0] = np.eye(self.n)
+        p[k == 1] = self.kernel
+        if self._kernel_pow is not None:
+            # pre-computed powers
+            ind = k < self._kernel_pow.shape[0]
+            p[ind] = self._kernel_pow[k[ind]]
+        return p
+
+    # ------------------------------------------------------------------------
+    def elements(self, k, i, j):
+        """
+        Returns elements of powers of the kernel.
+
+        Parameters
+        ----------
+        k : array-like of ints
+            exponents (non-negative)
+
+        i : array-like of ints
+            row indices
+
+        j : array-like of ints
+            column indices
+
+        Returns
+        -------
+        v : nd-array
+            elements :math:`kernel^k[i, j]`, where `k`, `i`, `j` are
+            broadcast together (the shape of `v` is the broadcast shape)
+        """
+        # fname = 'elements'
+
+        k, i, j = np.broadcast_arrays(np.asarray(k, dtype='int'), np.asarray(i, dtype='int'), np.asarray(j, dtype='int'))
+        if not self.diagonalizable:
+            k_unique, k_inv = np.unique(k, return_inverse=True)
+            return self.powers(k_unique)[k_inv.reshape(k.shape), i, j]
+
+        v = np.sum(self._s[i] * self._val**k[..., np.newaxis] * self._sinv.T[j], axis=-1)
+        v = np.asarray(np.clip(v.real, 0.0, 1.0))
+        # exact values for k = 0, 1
+        ind = k == 0
+        v[ind] = i[ind] == j[ind]
+        ind = k == 1
+        v[ind] = self.kernel[i[ind], j[ind]]
+        if self._kernel_pow is not None:
+            # pre-computed powers
+            ind = k < self._kernel_pow.shape[0]
+            v[ind] = self._kernel_pow[k[ind], i[ind], j[ind]]
+        return v
+
+    # ------------------------------------------------------------------------
+    def columns(self, k, j):
+        """
+        Returns columns of powers of the kernel.
+
+        Parameters
+        ----------
+        k : 1d-array-like of ints
+            exponents (non-negative)
+
+        j : 1d-array-like of ints
+            column indices, same length as `k`
+
+        Returns
+        -------
+        v : 2d-array of shape (len(k), n)
+            `v[l]` is the column of index `j[l]` of the kernel raised to the
+            power `k[l]`, i.e. :math:`v[l, i] = kernel^{k[l]}[i, j[l]]`
+        """
+        # fname = 'columns'
+
+        k, j = np.broadcast_arrays(np.asarray(k, dtype='int').reshape(-1), np.asarray(j, dtype='int').reshape(-1))
+        if not self.diagonalizable:
+            v = np.zeros((len(k), self.n))
+            for kk in np.unique(k):
+                ind = np.where(k == kk)[0]
+                v[ind] = self.power(kk)[:, j[ind]].T
+            return v
+
+        v = (self._val**k[:, np.newaxis] * self._sinv.T[j]).dot(self._s.T)
+        v = np.clip(v.real, 0.0, 1.0)
+        # exact values for k = 0, 1
+        ind = np.where(k == 0)[0]
+        v[ind] = 0.0
+        v[ind, j[ind]] = 1.0
+        ind = k == 1
+        v[ind] = self.kernel[:, j[ind]].T
+        if self._kernel_pow is not None:
+            # pre-computed powers
+            ind = k < self._kernel_pow.shape[0]
+            v[ind] = self._kernel_pow[k[ind], :, j[ind]]
+        return v
+# ============================================================================
+
 # ----------------------------------------------------------------------------
-def compute_mc_kernel_rev(kernel, pinv=None):
+def compute_mc_kernel_rev(kernel, pinv=None, kernel_pow=None):
     """
     Computes the reverse transition kernel of a Markov chain for a given kernel.
 
@@ -320,6 +610,11 @@ def compute_mc_kernel_rev(kernel, pinv=None):
         invariant distribution of the Markov chain;
         by default (`None`): `pinv` is automatically computed
 
+    kernel_pow : :class:`KernelPower`, or 3d-array of shape (m, n, n), optional
+        provider of the powers of the kernel (for `kernel`), its invariant
+        distribution is used if `pinv=None`; a 3d-array of pre-computed powers
+        of the kernel is wrapped in a provider (see class :class:`KernelPower`)
+
     Returns
     -------
     kernel_rev : 2d-array of shape (n, n)
@@ -328,10 +623,21 @@ def compute_mc_kernel_rev(kernel, pinv=None):
         - :math:`kernel\_rev[i, j] = pinv[i]^{-1} \cdot kernel[j, i] \cdot pinv[j]`
     """
     fname = 'compute_mc_kernel_rev'
-    
+
+    if kernel_pow is not None and not isinstance(kernel_pow, KernelPower):
+        # Pre-computed powers of the kernel
+        try:
+            kernel_pow = KernelPower(kernel, kernel_pow=kernel_pow)
+        except Exception as exc:
+            err_msg = f'{fname}: `kernel_pow` invalid'
+            raise MarkovChainError(err_msg) from exc
+
     if pinv is None:
         try:
-            pinv = compute_mc_pinv(kernel)
+            if kernel_pow is not None:
+                pinv = kernel_pow.pinv
+            else:
+                pinv = compute_mc_pinv(kernel)
         except Exception as exc:
             err_msg = f'{fname}: computing invariant distribution failed'
             raise MarkovChainError(err_msg) from exc
@@ -346,7 +652,7 @@ def compute_mc_kernel_rev(kernel, pinv=None):
 # ----------------------------------------------------------------------------
 
 # ----------------------------------------------------------------------------
-def compute_mc_cov(kernel, pinv=None, nsteps=1):
+def compute_mc_cov(kernel, pinv=None, nsteps=1, kernel_pow=None):
     """
     Computes covariances of indicators for a Markov chain, accross time steps.
 
@@ -373,6 +679,12 @@ def compute_mc_cov(kernel, pinv=None, nsteps=1):
     nsteps : int, default: 1
         number of (time) steps for which the covariance is computed
 
+    kernel_pow : :class:`KernelPower`, or 3d-array of shape (m, n, n), optional
+        provider of the powers of the kernel (for `kernel`);
+        by default (`None`): a new provider is created;
+        a 3d-array of pre-computed powers of the kernel is wrapped in a
+        provider (see class :class:`KernelPower`)
+
     Returns
     -------
     mc_cov : 3d-array of shape (nstep, n, n)
@@ -385,28 +697,89 @@ def compute_mc_cov(kernel, pinv=None, nsteps=1):
     """
     fname = 'compute_mc_cov'
 
-    # Diagonalization of kernel: kernel = s.dot(diag(val)).dot(sinv)
-    val, s = np.linalg.eig(kernel)
-    val = np.real(val) # take the real part (if needed)
-    s = np.real(s)     # take the real part (if needed)
-    sinv = np.linalg.inv(s)
+    if kernel_pow is not None and not isinstance(kernel_pow, KernelPower):
+        # Pre-computed powers of the kernel
+        try:
+            kernel_pow = KernelPower(kernel, kernel_pow=kernel_pow)
+        except Exception as exc:
+            err_msg = f'{fname}: `kernel_pow` invalid'
+            raise MarkovChainError(err_msg) from exc
+
+    # Provider of the powers of the kernel
+    if kernel_pow is None:
+        kernel_pow = KernelPower(kernel)
 
     if pinv is None:
         try:
-            pinv = compute_mc_pinv(kernel)
+            pinv = kernel_pow.pinv
         except Exception as exc:
             err_msg = f'{fname}: computing invariant distribution failed'
             raise MarkovChainError(err_msg) from exc
 
-    n = kernel.shape[0]
-    mc_cov = np.zeros((nsteps, n, n))
-    for m in range(nsteps):
-        km = s.dot(np.diag(val**m)).dot(sinv)
-        mc_cov[m, :, :] = np.repeat(pinv, n).reshape(n, n)*km - np.outer(pinv, pinv)
+    km = kernel_pow.powers(np.arange(nsteps))
+    mc_cov = pinv[np.newaxis, :, np.newaxis]*km - np.outer(pinv, pinv)
 
     return mc_cov
 # ----------------------------------------------------------------------------
 
+# Maximal number of random values (nreal x nsteps) drawn at once in function
+# `simulate_mc` (realizations are generated by blocks)
+_simulate_mc_block_size = 2**22
+
+# ----------------------------------------------------------------------------
+def _mc_cdf_search_table(cdf):
+    """
+    Sets a table for drawing indices from several rows of cumulative probabilities.
+
+    The row `i` of `cdf` is shifted by `i` and the rows are concatenated, so
+    that the index drawn with a random value `u` in [0, 1[ in the row `i` (the
+    first index `j` such that `u < cdf[i, j]`) is retrieved by a (vectorized)
+    binary search for `u + i` in the table (see function :func:`_mc_draw`).
+
+    Parameters
+    ----------
+    cdf : 2d-array of shape (n, m)
+        cumulative probabilities, each row is non-decreasing in [0, 1]
+
+    Returns
+    -------
+    table : 1d-array of shape (n*m, )
+        table of shifted cumulative probabilities
+    """
+    # fname = '_mc_cdf_search_table'
+
+    return (cdf + np.arange(cdf.shape[0])[:, np.newaxis]).reshape(-1)
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _mc_draw(table, m, row, u):
+    """
+    Draws indices from rows of cumulative probabilities (vectorized).
+
+    Parameters
+    ----------
+    table : 1d-array
+        table of shifted cumulative probabilities, as returned by the function
+        :func:`_mc_cdf_search_table`
+    m : int
+        length of each row
+    row : nd-array of ints
+        index of the row used for each draw
+    u : nd-array of floats
+        random values in [0, 1[, one for each draw (same shape as `row`)
+
+    Returns
+    -------
+    ind : nd-array of ints
+        drawn indices (same shape as `row`), `ind[k]` is the first index `j`
+        such that `u[k] < cdf[row[k], j]` (or m-1 if none, rounding errors)
+    """
+    # fname = '_mc_draw'
+
+    ind = np.searchsorted(table, u + row, side='right') - m * row
+    return np.minimum(ind, m-1, out=ind)
+# ----------------------------------------------------------------------------
+
 # ----------------------------------------------------------------------------
 def simulate_mc(
         kernel,
@@ -416,7 +789,8 @@ def simulate_mc(
         pstep0=None,
         pinv=None,
         kernel_rev=None, kernel_pow=None,
-        nreal=1):
+        nreal=1,
+        rng=None):
     """
     Generates (conditional) Markov chains for a given kernel.
 
@@ -465,27 +839,57 @@ def simulate_mc(
         by default (`None`): `kernel_rev` is automatically computed;
         note: only used for conditional simulation
 
-    kernel_pow : 3d-array of shape (m, n, n), optional
-        pre-computed kernel raised to power 0, 1, ..., m-1:
-
-        - :math:`kernel\_pow[k] = kernel^k`
-
-        note: only used for conditional simulation
+    kernel_pow : :class:`KernelPower`, or 3d-array of shape (m, n, n), optional
+        provider of the powers of the kernel (for `kernel`), can be reused
+        for several calls;
+        by default (`None`): a new provider is created;
+        note: only used for conditional simulation; a 3d-array of shape
+        (m, n, n) of pre-computed powers of the kernel (`kernel_pow[k]` being
+        the kernel raised to the power `k`) can also be given, it is then used
+        for the exponents `k < m` (see class :class:`KernelPower`)
 
     nreal : int, default: 1
         number of realization(s), number of generated chain(s)
 
+    rng : int, or :class:`numpy.random.SeedSequence`, or :class:`numpy.random.Generator`, or sequence, optional
+        random number generator specification (see module :mod:`randomStream`);
+        by default (`None`): the global random state of `numpy.random` is used;
+        otherwise, each chain is generated with its own independent stream
+        spawned from `rng`
+
     Returns
     -------
     x : 3d-array of shape (nreal, nsteps)
         generated Markov chain (conditional to `data_ind, data_val` if present), `x[i]` is
         the i-th realization
+
+    Notes
+    -----
+    The realizations are generated simultaneously (by blocks), step by step,
+    the draws being vectorized over the realizations; each realization uses
+    its own random numbers (one per step, drawn from its stream), so that the
+    result does not depend on the size of the blocks.
     """
     fname = 'simulate_mc'
 
+    # Random number generator (stream) for each realization
+    try:
+        rngs = randomStream.rng_streams(rng, nreal)
+    except Exception as exc:
+        err_msg = f'{fname}: `rng` invalid'
+        raise MarkovChainError(err_msg) from exc
+
     # Number of categories (order of the kernel)
     n = kernel.shape[0]
 
+    if kernel_pow is not None and not isinstance(kernel_pow, KernelPower):
+        # Pre-computed powers of the kernel
+        try:
+            kernel_pow = KernelPower(kernel, kernel_pow=kernel_pow)
+        except Exception as exc:
+            err_msg = f'{fname}: `kernel_pow` invalid'
+            raise MarkovChainError(err_msg) from exc
+
     # Check category values
     if categVal is None:
         categVal = np.arange(n)
@@ -540,18 +944,6 @@ def simulate_mc(
         # Compute conditional cdf from the transition kernel
         kernel_cdf = np.cumsum(kernel, axis=1)
 
-        # Generate X
-        x = []
-        for _ in range(nreal):
-            # Generate one chain (realization)
-            xk = - np.ones(nsteps, dtype='int')
-            u = np.random.random(size=nsteps)
-            xk[0] = np.where(u[0] < x0_cdf)[0][0]
-            for i in range(1, nsteps):
-                xk[i] = np.where(u[i] < kernel_cdf[int(xk[i-1])])[0][0]
-            # Append realization to x
-            x.append(xk)
-
     else:
         inds = np.argsort(data_ind)
         if data_ind[inds[0]] > 0:
@@ -571,64 +963,82 @@ def simulate_mc(
             kernel_cdf = np.cumsum(kernel, axis=1)
 
         if nhd > 1:
-            # Compute list of kernel raise to power 0, 1, 2, ..., m-1 for further computation
-            m = max(np.diff([data_ind[j] for j in inds])) + 1
+            # Provider of the powers of the kernel
             if kernel_pow is None:
-                kernel_pow = np.zeros((m, n, n))
-                kernel_pow[0] = np.eye(n)
-                m0 = 1
-            else:
-                m0 = kernel_pow.shape[0]
-                if m0 < m:
-                    kernel_pow = np.concatenate((kernel_pow, np.zeros((m-m0, n, n))), axis=0)
-            for i in range(m0, m):
-                kernel_pow[i] = kernel_pow[i-1].dot(kernel)
+                kernel_pow = KernelPower(kernel)
             #
             # With k1 < k2 < k3, we have:
             #     Prob(x[k2]=i2 | x[k1]=i1, x[k3]=i3) = kernel^(k2-k1)[i1, i2] * kernel^(k3-k2)[i2, i3] / kernel^(k3-k1)[i1, i3]
             # Check validity of conditioning points:
             #    check that the denominator above is positive for each pair (k1, k3) of consecutive conditioning points, i.e.
             #       Prob(x[k1]=i1 | x[k3]=i3) = kernel^(k3-k1)[i1, i3] > 0
-            if np.any(np.isclose([kernel_pow[data_ind[inds[i+1]]-data_ind[inds[i]], int(data_val[inds[i]]), int(data_val[inds[i+1]])] for i in range(nhd-1)], 0)):
-            # if np.any([kernel_pow[data_ind[inds[i+1]]-data_ind[inds[i]], int(data_val[inds[i]]), int(data_val[inds[i+1]])] < 1.e-20 for i in range(nhd-1)]):
+            if np.any(np.isclose(kernel_pow.elements(np.diff(data_ind[inds]), data_val[inds[:-1]], data_val[inds[1:]]), 0)):
                 err_msg = f'{fname}: invalid conditioning points wrt. kernel'
                 raise MarkovChainError(err_msg)
 
-        # Generate X
-        x = []
-        for _ in range(nreal):
-            # Generate one chain (realization)
+    # Generate X
+    # The chains are generated by blocks of realizations, all the chains of a
+    # block being generated simultaneously, step by step (vectorized draws),
+    # with the random numbers of each chain drawn from its own stream
+    if nhd == 0:
+        x0_table = _mc_cdf_search_table(x0_cdf[np.newaxis, :])
+    if nhd == 0 or data_ind[inds[-1]] < nsteps-1:
+        kernel_table = _mc_cdf_search_table(kernel_cdf)
+    if nhd > 0 and data_ind[inds[0]] > 0:
+        kernel_rev_table = _mc_cdf_search_table(kernel_rev_cdf)
+    if nhd > 1:
+        # Pairs of consecutive conditioning points (sorted): index of the
+        # first and second points, value at the second point
+        seg_start = data_ind[inds[:-1]]
+        seg_end = data_ind[inds[1:]]
+        seg_end_val = data_val[inds[1:]]
+        seg_len = seg_end - seg_start
+        # Columns of the kernel raised to the powers 0, ..., seg_len[l], for
+        # the column of index seg_end_val[l], for each pair l (stacked):
+        #    kernel^d[:, seg_end_val[l]] = kernel_pow_col[seg_col_start[l] + d]
+        seg_col_start = np.hstack(([0], np.cumsum(seg_len + 1)[:-1]))
+        kernel_pow_col = kernel_pow.columns(
+                np.hstack([np.arange(seg_len[l] + 1) for l in range(nhd-1)]),
+                np.repeat(seg_end_val, seg_len + 1))
+
+    x = np.zeros((nreal, nsteps), dtype='int')
+    nb = max(1, _simulate_mc_block_size // max(nsteps, 1))
+    for i0 in range(0, nreal, nb):
+        i1 = min(i0 + nb, nreal)
+        # Random numbers in [0,1[ (one row per chain)
+        u = np.array([rngs[ireal].random(size=nsteps) for ireal in range(i0, i1)])
+        xb = x[i0:i1]
+        if nhd == 0:
+            xb[:, 0] = _mc_draw(x0_table, n, np.zeros(i1-i0, dtype='int'), u[:, 0])
+            for i in range(1, nsteps):
+                xb[:, i] = _mc_draw(kernel_table, n, xb[:, i-1], u[:, i])
+        else:
             # Initialization
-            xk = - np.ones(nsteps, dtype='int')
-            xk[data_ind] = data_val
-            #
-            # Random numbers in [0,1[
-            u = np.random.random(size=nsteps)
+            xb[:, data_ind] = data_val
             #
             # Simulate in reverse order the values before the first conditioning point (sorted)
             for i in range(data_ind[inds[0]]-1, -1, -1):
-                xk[i] = np.where(u[i] < kernel_rev_cdf[int(xk[i+1])])[0][0]
-            # Simulate the values between the pairs of consecutive conditioning points (sorted)
+                xb[:, i] = _mc_draw(kernel_rev_table, n, xb[:, i+1], u[:, i])
+            #
+            # Simulate the values between the pairs of consecutive conditioning points (sorted),
+            # all the pairs being treated simultaneously
             # With k1 < k2 < k3, we have:
             #     Prob(x[k2]=i2 | x[k1]=i1, x[k3]=i3) = kernel^(k2-k1)[i1, i2] * kernel^(k3-k2)[i2, i3] / kernel^(k3-k1)[i1, i3]
-            for ii in range(nhd-1):
-                # Simulate the values between the ii-th and (ii+1)-th conditioning points (sorted)
-                xend_ind = data_ind[inds[ii+1]]
-                xend_val = int(data_val[inds[ii+1]])
-                for i in range(data_ind[inds[ii]]+1, data_ind[inds[ii+1]]):
-                    prob = np.array([kernel_pow[1, int(xk[i-1]), j]*kernel_pow[xend_ind-i, j, xend_val]/kernel_pow[xend_ind-i+1, int(xk[i-1]), xend_val] for j in range(n)])
-                    cdf = np.cumsum(prob)
-                    # if i==11:
-                    #     print(k, i, kernel_pow[xend_ind-i+1, int(xk[i-1]), xend_val], prob, cdf)
-                    xk[i] = np.where(u[i] < cdf)[0][0]
+            if nhd > 1:
+                for t in range(1, seg_len.max()):
+                    iseg = np.where(seg_len > t)[0]
+                    i = seg_start[iseg] + t # current step in each pair
+                    d = seg_end[iseg] - i   # number of steps to the second point of each pair
+                    icol = seg_col_start[iseg] + d
+                    xprev = xb[:, i-1]
+                    # prob[k, l, j]: probability of state j at step i[l], for chain k
+                    prob = kernel[xprev] * kernel_pow_col[icol] / kernel_pow_col[icol+1, xprev][..., np.newaxis]
+                    cdf = np.cumsum(prob, axis=-1)
+                    xb[:, i] = np.minimum(np.sum(u[:, i, np.newaxis] >= cdf, axis=-1), n-1)
+            #
             # Simulate the values after the last conditioning point (sorted)
             for i in range(data_ind[inds[-1]]+1, nsteps):
-                xk[i] = np.where(u[i] < kernel_cdf[int(xk[i-1])])[0][0]
-
-            # Append realization to x
-            x.append(xk)
-
-    x = np.asarray(x)
+                xb[:, i] = _mc_draw(kernel_table, n, xb[:, i-1], u[:, i])
 
     # Set original values
     x = categVal[x]
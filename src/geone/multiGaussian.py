@@ -12,12 +12,18 @@ Module for multi-Gaussian simulation and estimation in 1D, 2D and 3D,
 based on functions in other geone modules (wrapper).
 """
 
+import os
+import tempfile
 import numpy as np
+import scipy.linalg
 import inspect
 from geone import covModel as gcm
 from geone import img
 from geone import geosclassicinterface as gci
 from geone import grf
+from geone import grfSpectral
+from geone import parallel
+from geone import randomStream
 
 # ============================================================================
 class MultiGaussianError(Exception):
@@ -27,6 +33,266 @@ class MultiGaussianError(Exception):
     pass
 # ============================================================================
 
+# Parameters of the cost model used to select the algorithm (`algo='auto'`):
+# rough throughput (floating point operations per second) of one process,
+# and number of operations for evaluating one cosine wave at one cell
+# (spectral method)
+_cost_flops = 1.e9
+_cost_cos = 20
+
+# ----------------------------------------------------------------------------
+def _available_memory():
+    """
+    Returns the available physical memory (in bytes), or `None` if unknown.
+    """
+    # fname = '_available_memory'
+
+    try:
+        mem = os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return None
+    if mem <= 0:
+        return None
+    return mem
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _memmap_create(filename, shape, dtype):
+    """
+    Creates a new array backed by a file (:class:`numpy.memmap`, mode 'w+').
+
+    Parameters
+    ----------
+    filename : str or `None`
+        name of the file (overwritten if it exists); if `None`, a new
+        temporary file (not deleted afterward) is created in the default
+        directory for temporary files (see :func:`tempfile.mkstemp`)
+    shape : tuple of ints
+        shape of the array
+    dtype : numpy.dtype
+        type of the array
+
+    Returns
+    -------
+    a : :class:`numpy.memmap`
+        array (initialized to zero) backed by the file `a.filename`
+    """
+    # fname = '_memmap_create'
+
+    if filename is None:
+        fd, filename = tempfile.mkstemp(prefix='geone_', suffix='.dat')
+        os.close(fd)
+
+    return np.memmap(filename, dtype=dtype, mode='w+', shape=shape)
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _algo_cost(
+        cov_model, d,
+        dimension, spacing,
+        x, mode,
+        nproc,
+        dtype,
+        kwargs):
+    """
+    Estimates the cost (runtime and peak memory) of each algorithm.
+
+    This is the cost model used for selecting the algorithm in function
+    :func:`multiGaussianRun` with `algo='auto'`. The estimates are rough
+    (order of magnitude): they are based on the number of floating point
+    operations of the main steps (FFTs on the embedding grid for 'fft', sum of
+    cosine waves for 'spectral', resolution of one kriging system per cell for
+    'classic', and factorization of the covariance matrix of the conditioning
+    locations) and on the size of the main arrays.
+
+    Parameters
+    ----------
+    cov_model : :class:`geone.CovModel.CovModel<d>D`
+        covariance model (see function :func:`multiGaussianRun`)
+    d : int
+        space dimension (1, 2, or 3)
+    dimension : [sequence of] int(s)
+        number of cells along each axis
+    spacing : [sequence of] float(s)
+        cell size along each axis
+    x : array-like of floats, or `None`
+        data points locations
+    mode : str {'simulation', 'estimation'}
+        mode of computation
+    nproc : int
+        number of processes used (by the algorithms that can run in parallel)
+    dtype : numpy.dtype
+        floating point type of the output
+    kwargs : dict
+        keyword arguments passed to the function that is called (parameters
+        as `nreal`, `extensionMin`, `nneighborMax`, `nfeatures`, ... are
+        taken into account)
+
+    Returns
+    -------
+    cost : dict
+        `cost[algo]`, for `algo` in ('fft', 'classic', 'spectral'): 2-tuple
+        `(time, mem)`, estimated runtime (in seconds) and peak memory (in
+        bytes), or `None` if the algorithm cannot be used
+    """
+    # fname = '_algo_cost'
+
+    n = np.atleast_1d(dimension).astype('int')
+    s = np.atleast_1d(spacing).astype('float')
+    if len(s) == 1:
+        s = np.repeat(s, d)
+    ngrid = float(np.prod(n))
+    nc = 0 if x is None else np.asarray(x).reshape(-1, d).shape[0]
+    itemsize = dtype.itemsize
+    nreal = max(int(kwargs.get('nreal', 1)), 1) if mode == 'simulation' else 1
+    stationary = cov_model.is_stationary()
+
+    # Cost for factorizing the covariance matrix of the conditioning locations
+    t_cond = 10.0 * nc**3
+    m_cond = 16.0 * nc**2
+
+    cost = {}
+
+    # FFT (circulant embedding)
+    # -------------------------
+    if stationary:
+        if isinstance(cov_model, gcm.CovModel1D):
+            r = np.repeat(cov_model.r(), d)
+        elif d == 2:
+            r = np.asarray(cov_model.rxy())
+        else:
+            r = np.asarray(cov_model.rxyz())
+        extensionMin = kwargs.get('extensionMin')
+        if extensionMin is None:
+            rangeFactor = kwargs.get('rangeFactorForExtensionMin', 1.0)
+            extensionMin = [grf.extension_min(rangeFactor*ri, ni, si) for ri, ni, si in zip(r, n, s)]
+        nemb = float(np.prod([2**int(max(np.ceil(np.log2(ni + ei)), 1.0)) for ni, ei in zip(n, np.atleast_1d(extensionMin))]))
+        t_fft = 5.0 * nemb * np.log2(nemb) # one FFT on the embedding grid
+        m_emb = 48.0 * nemb # DFT coefficients (and square root), and one complex array
+        if mode == 'simulation':
+            # two realizations per complex FFT, one more FFT for conditioning
+            t_real = 0.5 * t_fft * (1 + (nc > 0))
+            time = t_cond + nreal * t_real / nproc
+            mem = m_emb + 32.0 * nemb * (nproc - 1) + nreal * ngrid * itemsize + m_cond
+        else:
+            time = 3.0 * t_fft + t_cond
+            mem = m_emb + 2.0 * ngrid * itemsize + m_cond
+            if kwargs.get('conditioningMethod', 1) == 1:
+                # matrices rBA and rBA * rAA^(-1)
+                time = time + 2.0 * ngrid * nc**2
+                mem = mem + 16.0 * ngrid * nc
+            elif kwargs.get('computeKrigSD', True):
+                # triangular solves for kriging standard deviation (by blocks)
+                time = time + ngrid * nc**2
+                mem = mem + 8.0 * 2**22
+        cost['fft'] = (time / _cost_flops, mem)
+    else:
+        cost['fft'] = None
+
+    # Spectral method (simulation only)
+    # ---------------------------------
+    if mode == 'simulation' and stationary \
+            and kwargs.get('var') is None \
+            and np.all([t == 'nugget' or (t in grfSpectral._elem_cov_func and not (t == 'linear' and d > 1)) for t, _ in cov_model.elem]):
+        nfeatures = int(kwargs.get('nfeatures', 1000))
+        nelem = max(len([t for t, _ in cov_model.elem if t != 'nugget']), 1)
+        t_real = ngrid * nfeatures * nelem * (2*d + _cost_cos) + 2.0 * ngrid * nc
+        time = t_cond + nreal * t_real / nproc
+        mem = nreal * ngrid * itemsize + 24.0 * 2**22 * nproc + m_cond
+        cost['spectral'] = (time / _cost_flops, mem)
+    else:
+        cost['spectral'] = None
+
+    # Classic (sequential simulation / kriging in a search neighborhood)
+    # -------------------------------------------------------------------
+    nneighborMax = int(kwargs.get('nneighborMax', 12))
+    if nneighborMax > 0:
+        k = nneighborMax
+    elif mode == 'simulation':
+        k = nc + ngrid
+    else:
+        k = nc
+    t_cell = k**3/3.0 + 2.0 * k**2 + 200.0 * k # kriging system and search of neighbors
+    if mode == 'simulation':
+        time = nreal * ngrid * t_cell / nproc
+        mem = nreal * ngrid * (8.0 + itemsize) + 8.0 * ngrid * nproc
+    else:
+        time = ngrid * t_cell
+        mem = 2.0 * ngrid * (8.0 + itemsize)
+    cost['classic'] = (time / _cost_flops, mem)
+
+    return cost
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _algo_auto(
+        cov_model, d,
+        dimension, spacing,
+        x, mode,
+        use_multiprocessing,
+        dtype,
+        kwargs,
+        verbose,
+        fname):
+    """
+    Selects the algorithm for function :func:`multiGaussianRun` (`algo='auto'`).
+
+    The cost of each algorithm is estimated (see function :func:`_algo_cost`),
+    and the fastest one whose peak memory fits in the available memory is
+    selected (the one requiring the least memory if none fits).
+
+    Parameters
+    ----------
+    cov_model, d, dimension, spacing, x, mode, dtype, kwargs :
+        see function :func:`_algo_cost`
+    use_multiprocessing : bool
+        indicates if multiprocessing is used (see function
+        :func:`multiGaussianRun`); the number of processes is then given by
+        `kwargs['nproc']` if present, and all cpus except one otherwise
+    verbose : int
+        verbose mode, the decision is printed if `verbose > 1`
+    fname : str
+        name of the calling function (for printing)
+
+    Returns
+    -------
+    algo : str {'fft', 'classic', 'spectral'}
+        selected algorithm
+    """
+    if use_multiprocessing:
+        nproc = kwargs.get('nproc', -1)
+        if nproc is None:
+            nproc = -1
+        nproc = parallel.get_nproc(nproc)
+    else:
+        nproc = 1
+
+    cost = _algo_cost(cov_model, d, dimension, spacing, x, mode, nproc, dtype, kwargs)
+    mem_avail = _available_memory()
+
+    candidates = [a for a, c in cost.items() if c is not None]
+    feasible = [a for a in candidates if mem_avail is None or cost[a][1] <= mem_avail]
+    if feasible:
+        algo = min(feasible, key=lambda a: cost[a][0])
+    else:
+        algo = min(candidates, key=lambda a: cost[a][1])
+        if verbose > 0:
+            print(f"{fname}: WARNING: `algo='auto'`: estimated peak memory exceeds available memory for every algorithm")
+
+    if verbose > 1:
+        print(f"{fname}: `algo='auto'`: estimated cost (runtime, peak memory), with {nproc} process(es):")
+        for a, c in cost.items():
+            if c is None:
+                print(f"    '{a}': not applicable")
+            else:
+                print(f"    '{a}': {c[0]:.2g} s, {c[1]/2**20:.4g} MB")
+        if mem_avail is not None:
+            print(f"    (available memory: {mem_avail/2**20:.4g} MB)")
+        print(f"{fname}: `algo='auto'`: '{algo}' selected")
+
+    return algo
+# ----------------------------------------------------------------------------
+
 # ----------------------------------------------------------------------------
 def multiGaussianRun(
         cov_model,
@@ -35,9 +301,12 @@ def multiGaussianRun(
         mode='simulation',
         algo='fft',
         output_mode='img',
+        memmap_filename=None,
         retrieve_warnings=False,
         verbose=2,
         use_multiprocessing=False,
+        dtype='float64',
+        rng=None,
         **kwargs):
     """
     Runs multi-Gaussian simulation or estimation.
@@ -95,21 +364,64 @@ def multiGaussianRun(
         - `mode='simulation'`: generates multi-Gaussian simulations
         - `mode='estimation'`: computes multi-Gaussian estimation (and st. dev.)
 
-    algo : str {'fft', 'classic'}, default: 'fft'
+    algo : str {'fft', 'classic', 'spectral', 'auto'}, default: 'fft'
         defines the algorithm used:
 
         - `algo='fft'`: algorithm based on circulant embedding and FFT, function \
         called for <d>D (d = 1, 2, or 3):
-            - 'geone.grf.grf<d>D',   `if mode='simulation'`
+            - 'geone.grf.grf<d>D',   `if mode='simulation'` \
+            ('geone.grf.grf<d>D_mp' if `use_multiprocessing=True`)
             - 'geone.grf.krige<d>D', `if mode='estimation'`
+        - `algo='spectral'`: algorithm based on a spectral method (sum of \
+        cosine waves, no extended grid, suitable for very large grids), \
+        only for `mode='simulation'`, function called for <d>D (d = 1, 2, or 3):
+            - 'geone.grfSpectral.grfSpectral<d>D'
         - `algo='classic'`: "classic" algorithm, based on the resolution of \
         kriging system considered points in a search ellipsoid, function called \
         for <d>D (d = 1, 2, or 3):
             - 'geone.geoscalassicinterface.simulate<d>D', `if mode='simulation'`
             - 'geone.geoscalassicinterface.estimate<d>D', `if mode='estimation'`
-
-    output_mode : str {'array', 'img'}, default: 'img'
-        defines the type of output returned (see below)
+        - `algo='auto'`: one of the above algorithms is selected automatically: \
+        the runtime and the peak memory of each algorithm are roughly \
+        estimated from the grid size, the ranges of the covariance model \
+        (size of the embedding grid for FFT), the number of data points, the \
+        number of realizations, the parameters in `kwargs` and the number of \
+        processes (see `use_multiprocessing`); the fastest algorithm whose \
+        peak memory fits in the available memory is selected (the estimates \
+        and the decision are printed if `verbose > 1`); note that the \
+        algorithms are not equivalent ('spectral' gives approximately \
+        Gaussian fields, 'classic' uses a search neighborhood)
+
+    output_mode : str {'array', 'img', 'memmap'}, default: 'img'
+        defines the type of output returned (see below); the conversions
+        between the block of realizations (array) and the image do not copy
+        the values: with `output_mode='img'`, the array of values of the output
+        image (`output.val`) is a view of the block of realizations computed
+        with `algo='fft'` or `algo='spectral'`, and with `output_mode='array'`,
+        the output array is a view of the values of the image computed with
+        `algo='classic'`; the values are copied only in the following cases:
+
+        - with `mode='estimation'`, if the kriging estimates and standard \
+        deviations are both computed (they are stacked in one array)
+        - with `algo='classic'`, if `dtype='float32'` (conversion from double \
+        precision)
+        - with `output_mode='memmap'`, if the computed values are not written \
+        directly in the file (see below)
+
+        with `output_mode='memmap'`, the output is an array backed by a file
+        (:class:`numpy.memmap`), i.e. the realizations are not held in memory;
+        with `mode='simulation'` and `algo='fft'` or `algo='spectral'`, the
+        realizations are written directly in the file (also by the parallel
+        processes if `use_multiprocessing=True`), except if `crop=False` is
+        given in `kwargs`; in the other cases (`algo='classic'`,
+        `mode='estimation'`), the result is computed in memory and then copied
+        once in the file
+
+    memmap_filename : str, optional
+        name of the file used with `output_mode='memmap'` (overwritten if it
+        exists); by default (`None`): a new temporary file is created (see
+        :func:`tempfile.mkstemp`); note that the file is not deleted
+        afterward (its name is given by `output.filename`)
 
     retrieve_warnings : bool, default: False
         indicates if the warnings encountered during the run are retrieved in
@@ -121,16 +433,35 @@ def multiGaussianRun(
     use_multiprocessing : bool, default: False
         indicates if multiprocessing is used, i.e. if the computation is done
         in parallel processes: if `use_multiprocessing=True`, and
-        `mode='simulation'` and `algo='classic'`, the function
-        `geone.geoscalassicinterface.simulate<d>D_mp` is used instead of
-        `geone.geoscalassicinterface.simulate<d>D`; in other cases
-        (`mode='estimation'` or `algo='fft'`), `use_multiprocessing` is ignored
+        `mode='simulation'` and `algo='classic'` (resp. `algo='fft'`), the
+        function `geone.geoscalassicinterface.simulate<d>D_mp` (resp.
+        `geone.grf.grf<d>D_mp`) is used instead of
+        `geone.geoscalassicinterface.simulate<d>D` (resp. `geone.grf.grf<d>D`);
+        with `algo='spectral'`, the parameter `nproc=-1` (all cpus except one)
+        is passed to the function that is called (if `nproc` is not given in
+        `kwargs`); with `mode='estimation'`, `use_multiprocessing` is ignored
+
+    dtype : str or numpy.dtype {'float64', 'float32'}, default: 'float64'
+        floating point type of the output (array or values of the image);
+        with `algo='fft'`, `dtype` is passed to the function that is called
+        (the computations are then done in the given precision, except the
+        linear algebra for conditioning which is always done in double
+        precision); with `algo='classic'` or `algo='spectral'`, the computation
+        is done in double precision and the result is converted afterward if
+        needed
+
+    rng : int, or :class:`numpy.random.SeedSequence`, or :class:`numpy.random.Generator`, or sequence, optional
+        random number generator specification (see module :mod:`randomStream`),
+        used only if `mode='simulation'`; with `algo='fft'` or `algo='spectral'`,
+        `rng` is passed to the function that is called; with `algo='classic'`, if `rng` is given
+        (not `None`) and the keyword argument `seed` is not given (see `kwargs`),
+        the seed is drawn from `rng`
 
     kwargs : dict
         keyword arguments (additional parameters) to be passed to the function
         that is called (according to `algo` and space dimension);
-        note: argument `mask` can also be used with `algo='fft'`; in this case
-        the mask is applied afterward
+        note: argument `mask` can also be used with `algo='fft'` or
+        `algo='spectral'`; in this case the mask is applied afterward
 
     Returns
     -------
@@ -153,10 +484,13 @@ def multiGaussianRun(
             - `output.nv=1` if `mode='estimation'` with kriging estimate only
             - `output.nv=2` if `mode='estimation'` with krig. est. and st. dev.
             - `output.nv=nreal` if `mode='simulation'`
+        - if `output_mode='memmap'`: output is a :class:`numpy.memmap` (array \
+        backed by the file `output.filename`) of the same shape as for \
+        `output_mode='array'`
 
     warnings : list of strs, optional
         list of distinct warnings encountered (can be empty) during the run
-        (no warning (empty list) if `algo='fft'`);
+        (no warning (empty list) if `algo='fft'` or `algo='spectral'`);
         returned if `retrieve_warnings=True`
     """
     fname = 'multiGaussianRun'
@@ -165,12 +499,26 @@ def multiGaussianRun(
         err_msg = f"{fname}: `mode` invalid, should be 'simulation' or 'estimation' (default)"
         raise MultiGaussianError(err_msg)
 
-    if algo not in ('fft', 'FFT', 'classic', 'CLASSIC'):
-        err_msg = f"{fname}: `algo` invalid, should be 'fft' (default) or 'classic'"
+    if algo not in ('fft', 'FFT', 'classic', 'CLASSIC', 'spectral', 'SPECTRAL', 'auto', 'AUTO'):
+        err_msg = f"{fname}: `algo` invalid, should be 'fft' (default), 'classic', 'spectral' or 'auto'"
+        raise MultiGaussianError(err_msg)
+
+    if algo in ('spectral', 'SPECTRAL') and mode == 'estimation':
+        err_msg = f"{fname}: `algo='spectral'` cannot be used with `mode='estimation'`"
+        raise MultiGaussianError(err_msg)
+
+    if output_mode not in ('array', 'img', 'memmap'):
+        err_msg = f"{fname}: `output_mode` invalid, should be 'array', 'img' (default) or 'memmap'"
         raise MultiGaussianError(err_msg)
 
-    if output_mode not in ('array', 'img'):
-        err_msg = f"{fname}: `output_mode` invalid, should be 'array' or 'img' (default)"
+    try:
+        dtype = np.dtype(dtype)
+    except Exception as exc:
+        err_msg = f'{fname}: `dtype` invalid'
+        raise MultiGaussianError(err_msg) from exc
+
+    if dtype not in (np.float32, np.float64):
+        err_msg = f"{fname}: `dtype` invalid, should be 'float64' (default) or 'float32'"
         raise MultiGaussianError(err_msg)
 
     # Set space dimension: d
@@ -218,8 +566,24 @@ def multiGaussianRun(
 
     # Note: data (x, v) not checked here, directly passed to further function
 
-    if algo in ('fft', 'FFT'):
-        if mode == 'estimation':
+    if algo in ('auto', 'AUTO'):
+        # Select the algorithm according to the estimated cost
+        try:
+            algo = _algo_auto(cov_model, d, dimension, spacing, x, mode, use_multiprocessing, dtype, kwargs, verbose, fname)
+        except Exception as exc:
+            err_msg = f'{fname}: automatic selection of the algorithm failed'
+            raise MultiGaussianError(err_msg) from exc
+
+    if algo in ('fft', 'FFT', 'spectral', 'SPECTRAL'):
+        if algo in ('spectral', 'SPECTRAL'):
+            # mode == 'simulation'
+            if d == 1:
+                run_f = grfSpectral.grfSpectral1D
+            elif d == 2:
+                run_f = grfSpectral.grfSpectral2D
+            elif d == 3:
+                run_f = grfSpectral.grfSpectral3D
+        elif mode == 'estimation':
             if d == 1:
                 run_f = grf.krige1D
             elif d == 2:
@@ -227,12 +591,20 @@ def multiGaussianRun(
             elif d == 3:
                 run_f = grf.krige3D
         elif mode == 'simulation':
-            if d == 1:
-                run_f = grf.grf1D
-            elif d == 2:
-                run_f = grf.grf2D
-            elif d == 3:
-                run_f = grf.grf3D
+            if use_multiprocessing:
+                if d == 1:
+                    run_f = grf.grf1D_mp
+                elif d == 2:
+                    run_f = grf.grf2D_mp
+                elif d == 3:
+                    run_f = grf.grf3D_mp
+            else:
+                if d == 1:
+                    run_f = grf.grf1D
+                elif d == 2:
+                    run_f = grf.grf2D
+                elif d == 3:
+                    run_f = grf.grf3D
 
         # Filter unused keyword arguments
         run_f_set_of_all_args = set([val.name for val in inspect.signature(run_f).parameters.values()])
@@ -241,7 +613,7 @@ def multiGaussianRun(
         kwargs_unexpected_keys = set(kwargs.keys()).difference(run_f_set_of_all_args)
         apply_mask = False # default
         if kwargs_unexpected_keys:
-            if algo=='fft' and 'mask' in kwargs_unexpected_keys:
+            if 'mask' in kwargs_unexpected_keys:
                 kwargs_unexpected_keys.remove('mask')
                 if kwargs['mask'] is not None:
                     try:
@@ -257,8 +629,25 @@ def multiGaussianRun(
                     s = "', '".join(kwargs_unexpected_keys)
                     print(f"{fname}: WARNING: unexpected keyword arguments (`{s}`) passed to function '{run_f.__module__}.{run_f.__name__}' were ignored")
 
+        if mode == 'simulation':
+            kwargs_new['rng'] = rng
+
+        if use_multiprocessing and algo in ('spectral', 'SPECTRAL') and 'nproc' not in kwargs_new:
+            kwargs_new['nproc'] = -1
+
+        if output_mode == 'memmap' and mode == 'simulation' and kwargs_new.get('crop', True):
+            # Realizations written directly in the file
+            try:
+                kwargs_new['out'] = _memmap_create(
+                        memmap_filename,
+                        (int(kwargs_new.get('nreal', 1)), ) + tuple(np.atleast_1d(dimension)[::-1]),
+                        dtype)
+            except Exception as exc:
+                err_msg = f'{fname}: cannot create file for `output_mode=memmap`'
+                raise MultiGaussianError(err_msg) from exc
+
         try:
-            output = run_f(cov_model, dimension, spacing=spacing, origin=origin, x=x, v=v, verbose=verbose, **kwargs_new)
+            output = run_f(cov_model, dimension, spacing=spacing, origin=origin, x=x, v=v, dtype=dtype, verbose=verbose, **kwargs_new)
         except Exception as exc:
             err_msg = f'{fname}: computation failed'
             raise MultiGaussianError(err_msg) from exc
@@ -269,19 +658,34 @@ def multiGaussianRun(
         #    output is an array (kriging estimate only) or a 2-tuple of array (kriging estimate and standard deviation);
         #    each array with d dimension
         if mode == 'estimation':
-            if isinstance(output, tuple):
-                output = np.asarray(output)
+            if not isinstance(output, tuple):
+                output = (output, )
+            if output_mode == 'memmap':
+                output_mm = _memmap_create(memmap_filename, (len(output), ) + output[0].shape, output[0].dtype)
+                for i, a in enumerate(output):
+                    output_mm[i] = a
+                output = output_mm
+            elif len(output) == 1:
+                output = output[0][np.newaxis] # view
             else:
-                output = output[np.newaxis, :]
+                output = np.asarray(output) # stacked (copy)
+        elif output_mode == 'memmap' and not isinstance(output, np.memmap):
+            # (realizations not written directly in the file)
+            output_mm = _memmap_create(memmap_filename, output.shape, output.dtype)
+            output_mm[...] = output
+            output = output_mm
         if apply_mask:
             output[:, ~mask] = np.nan
         if output_mode == 'img':
+            # (output.val is a view of the array output)
             output = img.Img(
                 *np.hstack((np.atleast_1d(dimension), np.ones(3-d, dtype='int'))),
                 *np.hstack((np.atleast_1d(spacing), np.ones(3-d))),
                 *np.hstack((np.atleast_1d(origin), np.zeros(3-d))),
                 nv=output.shape[0], val=output)
-        warnings = [] # no warning available if algo = 'fft'
+        elif output_mode == 'memmap':
+            output.flush()
+        warnings = [] # no warning available if algo = 'fft' or 'spectral'
 
     elif algo in ('classic', 'CLASSIC'):
         if mode == 'estimation':
@@ -318,6 +722,13 @@ def multiGaussianRun(
                 s = "', '".join(kwargs_unexpected_keys)
                 print(f"{fname}: WARNING: unexpected keyword arguments (`{s}`) passed to function '{run_f.__module__}.{run_f.__name__}' were ignored")
 
+        if mode == 'simulation' and not randomStream.is_legacy(rng) and kwargs_new.get('seed') is None:
+            try:
+                kwargs_new['seed'] = randomStream.seed_from_rng(rng)
+            except Exception as exc:
+                err_msg = f'{fname}: `rng` invalid'
+                raise MultiGaussianError(err_msg) from exc
+
         try:
             output = run_f(cov_model, dimension, spacing=spacing, origin=origin, x=x, v=v, verbose=verbose, **kwargs_new)
         except Exception as exc:
@@ -326,12 +737,283 @@ def multiGaussianRun(
 
         warnings = output['warnings']
         output = output['image']
-        if output_mode == 'array':
-            # get the array of value and remove extra dimension for 1D and 2D
-            output = output.val.reshape(-1, *np.atleast_1d(dimension)[::-1])
+        if output_mode == 'memmap':
+            # copy (and conversion if needed) of the values in the file
+            output_mm = _memmap_create(memmap_filename, (output.nv, ) + tuple(np.atleast_1d(dimension)[::-1]), dtype)
+            output_mm[...] = output.val.reshape(output_mm.shape)
+            output_mm.flush()
+            output = output_mm
+        else:
+            if output.val.dtype != dtype:
+                output.val = output.val.astype(dtype)
+            if output_mode == 'array':
+                # get the array of value and remove extra dimension for 1D and 2D
+                # (view of the values of the image)
+                output = output.val.reshape(-1, *np.atleast_1d(dimension)[::-1])
 
     if retrieve_warnings:
         return output, warnings
     else:
         return output
 # ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+class GaussianConditionalKernel(object):
+    """
+    Class defining a kernel for sampling a Gaussian vector component by component.
+
+    This class is used for Gibbs or Metropolis-Hasting updates of a Gaussian
+    vector Y ~ N(mean, cov) of size n, e.g. the values of a latent field at
+    conditioning locations (see functions :func:`srf.srf_mg_mc` and
+    :func:`pgs.pluriGaussianSim`).
+
+    The covariance matrix is factorized once, and the precision matrix
+    Q = cov^(-1) is used to get the conditional distributions given the current
+    values y (state of the kernel):
+
+    - Y[k] given all the other components ("leave-one-out"): \
+    N(y[k] - r[k]/Q[k, k], 1/Q[k, k])
+    - Y[B] given Y[not B], for a block of indexes B: \
+    N(y[B] - Q[B, B]^(-1) r[B], Q[B, B]^(-1))
+
+    where r = Q (y - mean) is kept up to date when the values are updated, at
+    a cost O(n) per updated component (instead of solving a kriging system of
+    order n-1 for each component).
+
+    **Attributes**
+
+    n : int
+        size of the Gaussian vector
+
+    mean : 1d-array of shape (n, )
+        mean of the Gaussian vector
+
+    cov : 2d-array of shape (n, n)
+        covariance matrix of the Gaussian vector
+
+    Q : 2d-array of shape (n, n)
+        precision matrix (inverse of `cov`)
+
+    y : 1d-array of shape (n, ), or `None`
+        current values (state of the kernel), set by the methods
+        :meth:`set_values` or :meth:`sample_unconditional`
+
+    **Private attributes (SHOULD NOT BE SET DIRECTLY)**
+
+    _L : 2d-array of shape (n, n)
+        lower Cholesky factor of `cov`
+
+    _Qdiag : 1d-array of shape (n, )
+        diagonal of `Q`
+
+    _r : 1d-array of shape (n, ), or `None`
+        vector Q (y - mean)
+
+    Parameters
+    ----------
+    cov : 2d-array of shape (n, n)
+        covariance matrix (symmetric positive definite)
+
+    mean : float or 1d-array of shape (n, ), default: 0.0
+        mean
+
+    Examples
+    --------
+    Gibbs sampler (single-site updates in random order) of N(0, cov):
+
+        >>> kernel = GaussianConditionalKernel(cov)
+        >>> kernel.sample_unconditional(rng)
+        >>> for k in rng.permutation(kernel.n):
+        >>>     mu, std = kernel.conditional_mean_std(k)
+        >>>     kernel.update(k, rng.normal(loc=mu, scale=std))
+    """
+    def __init__(self, cov, mean=0.0):
+        """
+        Inits an instance of the class.
+
+        Parameters
+        ----------
+        cov : 2d-array of shape (n, n)
+            covariance matrix (symmetric positive definite)
+
+        mean : float or 1d-array of shape (n, ), default: 0.0
+            mean
+        """
+        fname = 'GaussianConditionalKernel'
+
+        cov = np.asarray(cov, dtype='float')
+        if cov.ndim != 2 or cov.shape[0] != cov.shape[1]:
+            err_msg = f'{fname}: `cov` is not a square matrix (2d array)'
+            raise MultiGaussianError(err_msg)
+
+        self.n = cov.shape[0]
+        self.cov = cov
+
+        mean = np.asarray(mean, dtype='float').reshape(-1)
+        if mean.size == 1:
+            mean = mean[0] * np.ones(self.n)
+        elif mean.size != self.n:
+            err_msg = f'{fname}: size of `mean` is not valid'
+            raise MultiGaussianError(err_msg)
+
+        self.mean = mean
+
+        try:
+            self._L = scipy.linalg.cholesky(cov, lower=True)
+        except np.linalg.LinAlgError as exc:
+            err_msg = f'{fname}: `cov` is not positive definite'
+            raise MultiGaussianError(err_msg) from exc
+
+        self.Q = scipy.linalg.cho_solve((self._L, True), np.eye(self.n))
+        self._Qdiag = np.diag(self.Q).copy()
+
+        self.y = None
+        self._r = None
+
+    # ------------------------------------------------------------------------
+    # def __str__(self):
+    #     return self.__repr__()
+
+    def __repr__(self):
+        out = f'*** GaussianConditionalKernel object ***\nn = {self.n}'
+        return out
+    # ------------------------------------------------------------------------
+
+    # ------------------------------------------------------------------------
+    def set_values(self, y):
+        """
+        Sets the current values (state of the kernel).
+
+        Parameters
+        ----------
+        y : 1d-array of shape (n, )
+            values
+        """
+        self.y = np.array(y, dtype='float').reshape(self.n)
+        self._r = self.Q.dot(self.y - self.mean)
+    # ------------------------------------------------------------------------
+
+    # ------------------------------------------------------------------------
+    def sample_unconditional(self, rng=None):
+        """
+        Draws values in N(mean, cov), and sets them as current values.
+
+        Parameters
+        ----------
+        rng : any type, optional
+            random number generator specification (see module
+            :mod:`randomStream`), a sequence is not accepted
+
+        Returns
+        -------
+        y : 1d-array of shape (n, )
+            values drawn (current values, attribute `y`)
+        """
+        rng = randomStream.rng_stream(rng)
+        self.set_values(self.mean + self._L.dot(rng.normal(size=self.n)))
+        return self.y
+    # ------------------------------------------------------------------------
+
+    # ------------------------------------------------------------------------
+    def conditional_mean_std(self, ind=None):
+        """
+        Returns the leave-one-out conditional means and standard deviations.
+
+        For each index k in `ind`, the mean and standard deviation of Y[k]
+        given the current values of all the other components are computed
+        (vectorized).
+
+        Parameters
+        ----------
+        ind : int or 1d-array of ints, optional
+            index(es) of the component(s); by default (`None`): all components
+
+        Returns
+        -------
+        mu : float or 1d-array
+            conditional mean(s)
+        std : float or 1d-array
+            conditional standard deviation(s)
+        """
+        if ind is None:
+            ind = slice(None)
+        Qkk = self._Qdiag[ind]
+        return self.y[ind] - self._r[ind]/Qkk, 1.0/np.sqrt(Qkk)
+    # ------------------------------------------------------------------------
+
+    # ------------------------------------------------------------------------
+    def update(self, ind, val):
+        """
+        Updates the current values of some components.
+
+        The cost is O(n) per updated component.
+
+        Parameters
+        ----------
+        ind : int or 1d-array of ints
+            index(es) of the component(s) to be updated (distinct indexes)
+        val : float or 1d-array
+            new value(s)
+        """
+        delta = val - self.y[ind]
+        if np.ndim(ind) == 0:
+            self._r += self.Q[:, ind] * delta
+        else:
+            self._r += self.Q[:, ind].dot(delta)
+        self.y[ind] = val
+    # ------------------------------------------------------------------------
+
+    # ------------------------------------------------------------------------
+    def refresh(self):
+        """
+        Recomputes the vector Q (y - mean) from the current values.
+
+        This avoids the accumulation of rounding errors after many updates
+        (cost O(n^2)).
+        """
+        self._r = self.Q.dot(self.y - self.mean)
+    # ------------------------------------------------------------------------
+
+    # ------------------------------------------------------------------------
+    def sample_block(self, ind, rng=None):
+        """
+        Draws values of a block of components given all the other components.
+
+        The values of Y[ind] are drawn in the (joint) conditional distribution
+        of Y[ind] given the current values of the components not in `ind`;
+        the current values are not updated (see method :meth:`update`).
+
+        Parameters
+        ----------
+        ind : 1d-array of ints
+            indexes of the components of the block (distinct indexes)
+        rng : any type, optional
+            random number generator specification (see module
+            :mod:`randomStream`), a sequence is not accepted
+
+        Returns
+        -------
+        val : 1d-array of shape (len(ind), )
+            values drawn for Y[ind]
+        """
+        fname = 'sample_block'
+
+        rng = randomStream.rng_stream(rng)
+        ind = np.atleast_1d(ind)
+        if len(ind) == 1:
+            mu, std = self.conditional_mean_std(ind)
+            return mu + std * rng.normal(size=1)
+
+        # Q[B, B] = U^T U (Cholesky), then
+        #    mean: y[B] - Q[B, B]^(-1) r[B]
+        #    cov: Q[B, B]^(-1) = U^(-1) U^(-T)
+        try:
+            U = scipy.linalg.cholesky(self.Q[np.ix_(ind, ind)], lower=False)
+        except np.linalg.LinAlgError as exc:
+            err_msg = f'{fname}: precision matrix of the block is not positive definite'
+            raise MultiGaussianError(err_msg) from exc
+
+        mu = self.y[ind] - scipy.linalg.cho_solve((U, False), self._r[ind])
+        return mu + scipy.linalg.solve_triangular(U, rng.normal(size=len(ind)), lower=False)
+    # ------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
@@ -0,0 +1,617 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# -------------------------------------------------------------------------
+# Python module:  'parallel.py'
+# author:         agent
+# date:           oct-2026
+# -------------------------------------------------------------------------
+
+"""
+Module for running tasks in parallel (multiprocessing).
+
+The functions of geone with the suffix `_mp` (e.g. `grf.grf2D_mp`,
+`geosclassicinterface.simulate2D_mp`, `deesseinterface.deesseRun_mp`,
+`tools.is_in_polygon_mp`) distribute their work over a pool of worker
+processes, obtained with the function :func:`get_pool`:
+
+- by default, a new pool is started at each call, and terminated at the end \
+of the call
+- if a persistent pool has been started (see functions :func:`start_pool`, \
+:func:`shutdown_pool` and the context manager :func:`persistent_pool`), it is \
+used by all the `_mp` functions, so that successive calls pay no cost for \
+starting processes (and importing modules in them)
+
+The start method of the processes ('fork', 'spawn' or 'forkserver', see
+:func:`multiprocessing.get_context`) can be set with the function
+:func:`set_start_method`.
+
+The number of processes, and the number of threads in each process, are
+determined according to the cpu budget (see module :mod:`config`); the number
+of BLAS threads in each worker process is limited accordingly, to prevent
+oversubscription.
+
+Large arrays are passed to (and retrieved from) the worker processes through
+shared memory blocks rather than being pickled (see the private functions
+`_shared_array_create`, `_output_array_create`, etc.).
+
+Example
+-------
+>>> from geone import parallel
+>>> with parallel.persistent_pool(nproc=8):
+>>>     for cov_model in cov_model_list:
+>>>         sim = geone.grf.grf2D_mp(cov_model, dimension, nreal=100, nproc=8)
+"""
+
+import atexit
+import contextlib
+import mmap
+import multiprocessing
+
+import numpy as np
+
+from geone import config
+
+# ============================================================================
+class ParallelError(Exception):
+    """
+    Custom exception related to `parallel` module.
+    """
+    pass
+# ============================================================================
+
+# Start method of the worker processes (`None`: default of the platform)
+_start_method = None
+
+# Persistent pool (`None`: no persistent pool), its number of processes and
+# number of BLAS threads per process
+_persistent_pool = None
+_persistent_pool_nproc = 0
+_persistent_pool_nthreads_blas = None
+
+# ----------------------------------------------------------------------------
+def set_start_method(method=None):
+    """
+    Sets the start method of the worker processes.
+
+    A running persistent pool (see function :func:`start_pool`) is shut down
+    if its start method differs.
+
+    Parameters
+    ----------
+    method : str {'fork', 'spawn', 'forkserver'}, optional
+        start method (see :func:`multiprocessing.get_context`); by default
+        (`None`): the default start method of the platform is used
+    """
+    fname = 'set_start_method'
+
+    global _start_method
+
+    if method is not None and method not in multiprocessing.get_all_start_methods():
+        err_msg = f'{fname}: start method `{method}` not available (available: {multiprocessing.get_all_start_methods()})'
+        raise ParallelError(err_msg)
+
+    if method != _start_method:
+        shutdown_pool()
+    _start_method = method
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def get_start_method():
+    """
+    Returns the start method of the worker processes.
+
+    Returns
+    -------
+    method : str
+        start method used for the worker processes
+    """
+    # fname = 'get_start_method'
+
+    return multiprocessing.get_context(_start_method).get_start_method()
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def get_nproc(nproc, nmax=None):
+    """
+    Returns the number of processes to be used.
+
+    Parameters
+    ----------
+    nproc : int
+        number of processes specified by the user:
+
+        - if `nproc > 0`: n = `nproc`,
+        - if `nproc <= 0`: n = max(ncpu+`nproc`, 1), where ncpu is the total \
+        number of cpu(s) (cpu budget, retrieved by :func:`config.cpu_count`), \
+        i.e. all cpus except `-nproc` is used (but at least one)
+
+    nmax : int, optional
+        maximal number of processes (e.g. number of tasks), if given, n is set
+        to min(n, `nmax`) (but at least one)
+
+    Returns
+    -------
+    n : int
+        number of processes
+    """
+    # fname = 'get_nproc'
+
+    if nproc > 0:
+        n = int(nproc)
+    else:
+        n = max(config.cpu_count() + int(nproc), 1)
+
+    if nmax is not None:
+        n = max(min(n, int(nmax)), 1)
+
+    return n
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _pool_worker_init(nthreads):
+    """
+    Initializes a worker process.
+
+    The persistent pool is not inherited, and the cpu budget of the worker
+    process is set to its share (limiting its BLAS threads).
+
+    Parameters
+    ----------
+    nthreads : int
+        number of threads of the worker process
+    """
+    # fname = '_pool_worker_init'
+
+    global _persistent_pool, _persistent_pool_nproc, _persistent_pool_nthreads_blas
+
+    _persistent_pool = None
+    _persistent_pool_nproc = 0
+    _persistent_pool_nthreads_blas = None
+    config.set_cpu_budget(nthreads)
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _pool_create(nproc):
+    """
+    Starts a new pool of worker processes.
+
+    Parameters
+    ----------
+    nproc : int
+        number of processes
+
+    Returns
+    -------
+    pool : :class:`multiprocessing.pool.Pool`
+        pool of `nproc` processes
+    nthreads : int
+        number of (BLAS) threads per process, according to the cpu budget
+    """
+    # fname = '_pool_create'
+
+    nthreads = config.allocation(nproc)['nthreads_blas']
+    with config._blas_env(nthreads):
+        pool = multiprocessing.get_context(_start_method).Pool(nproc, initializer=_pool_worker_init, initargs=(nthreads, ))
+
+    return pool, nthreads
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def start_pool(nproc=-1):
+    """
+    Starts a persistent pool of worker processes.
+
+    The persistent pool is used by all the functions with suffix `_mp`, until
+    it is shut down (see function :func:`shutdown_pool`); a running persistent
+    pool is shut down first. The tasks of a function are queued in the pool,
+    which is then never busier than its number of processes. The number of
+    BLAS threads of each process is set according to the cpu budget (see
+    module :mod:`config`) when the pool is started.
+
+    Parameters
+    ----------
+    nproc : int, default: -1
+        number of processes (see function :func:`get_nproc`)
+    """
+    # fname = 'start_pool'
+
+    global _persistent_pool, _persistent_pool_nproc, _persistent_pool_nthreads_blas
+
+    shutdown_pool()
+    n = get_nproc(nproc)
+    _persistent_pool, _persistent_pool_nthreads_blas = _pool_create(n)
+    _persistent_pool_nproc = n
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def shutdown_pool():
+    """
+    Shuts down the persistent pool of worker processes (if any).
+    """
+    # fname = 'shutdown_pool'
+
+    global _persistent_pool, _persistent_pool_nproc, _persistent_pool_nthreads_blas
+
+    if _persistent_pool is not None:
+        _persistent_pool.close()
+        _persistent_pool.join()
+    _persistent_pool = None
+    _persistent_pool_nproc = 0
+    _persistent_pool_nthreads_blas = None
+# ----------------------------------------------------------------------------
+
+atexit.register(shutdown_pool)
+
+# ----------------------------------------------------------------------------
+def pool_nproc():
+    """
+    Returns the number of processes of the persistent pool.
+
+    Returns
+    -------
+    n : int
+        number of processes of the persistent pool, 0 if no persistent pool is
+        running
+    """
+    # fname = 'pool_nproc'
+
+    return _persistent_pool_nproc
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+@contextlib.contextmanager
+def persistent_pool(nproc=-1):
+    """
+    Context manager running a persistent pool of worker processes.
+
+    Within the `with` block, all the functions with suffix `_mp` use the same
+    pool of worker processes (see function :func:`start_pool`), which is shut
+    down at the end of the block.
+
+    Parameters
+    ----------
+    nproc : int, default: -1
+        number of processes (see function :func:`get_nproc`)
+    """
+    # fname = 'persistent_pool'
+
+    start_pool(nproc)
+    try:
+        yield
+    finally:
+        shutdown_pool()
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def get_pool(nproc, nthreads_per_proc=None):
+    """
+    Returns a pool of worker processes for running tasks.
+
+    The allocation of the cpus (see function :func:`config.allocation`) is
+    recorded, and can be retrieved with the function
+    :func:`config.last_allocation`.
+
+    Parameters
+    ----------
+    nproc : int
+        number of processes (> 0) required
+    nthreads_per_proc : int, optional
+        number of (OpenMP) threads used by each task, if known (for recording
+        the allocation)
+
+    Returns
+    -------
+    pool : :class:`multiprocessing.pool.Pool`
+        the persistent pool if running (see function :func:`start_pool`),
+        a new pool of `nproc` processes otherwise; in both cases the pool has to
+        be released with the function :func:`release_pool`
+    """
+    # fname = 'get_pool'
+
+    if _persistent_pool is not None:
+        pool, nthreads_blas = _persistent_pool, _persistent_pool_nthreads_blas
+        nproc = min(nproc, _persistent_pool_nproc)
+    else:
+        pool, nthreads_blas = _pool_create(nproc)
+
+    alloc = config.allocation(nproc, nthreads_per_proc)
+    alloc['nthreads_blas'] = nthreads_blas
+    config._record_allocation(alloc)
+
+    return pool
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def release_pool(pool, out_pool):
+    """
+    Waits for the tasks submitted to a pool, and releases the pool.
+
+    Parameters
+    ----------
+    pool : :class:`multiprocessing.pool.Pool`
+        pool returned by the function :func:`get_pool`
+    out_pool : list of :class:`multiprocessing.pool.AsyncResult`
+        results of the tasks submitted to the pool; when the function returns
+        all the tasks are done
+    """
+    # fname = 'release_pool'
+
+    if pool is _persistent_pool:
+        # Persistent pool: kept running
+        for w in out_pool:
+            w.wait()
+    else:
+        pool.close() # Prevents any more tasks from being submitted to the pool,
+        pool.join()  # then, wait for the worker processes to exit.
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _shared_array_create(a, shm_list):
+    """
+    Copies an array in a new shared memory block.
+
+    Parameters
+    ----------
+    a : nd array
+        array to be copied
+    shm_list : list
+        list of shared memory blocks, the new block is appended to it (the
+        caller is responsible for closing and unlinking the blocks)
+
+    Returns
+    -------
+    desc : 3-tuple
+        description `(name, shape, dtype)` of the shared array, to be passed to
+        the function :func:`_shared_array_attach` (in another process)
+    """
+    # fname = '_shared_array_create'
+
+    from multiprocessing import shared_memory
+
+    a = np.asarray(a)
+    shm = shared_memory.SharedMemory(create=True, size=max(a.nbytes, 1))
+    shm_list.append(shm)
+    b = np.ndarray(a.shape, dtype=a.dtype, buffer=shm.buf)
+    b[...] = a
+    return (shm.name, a.shape, a.dtype.str)
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _shared_array_attach(desc, shm_list):
+    """
+    Gets an array stored in a shared memory block.
+
+    Parameters
+    ----------
+    desc : 3-tuple
+        description `(name, shape, dtype)` of the shared array, as returned by
+        the function :func:`_shared_array_create`
+    shm_list : list
+        list of shared memory blocks, the attached block is appended to it (the
+        caller is responsible for closing the blocks, once the returned array
+        is no longer used)
+
+    Returns
+    -------
+    a : nd array
+        array using the shared memory block as buffer
+    """
+    # fname = '_shared_array_attach'
+
+    from multiprocessing import shared_memory
+
+    name, shape, dtype = desc
+    shm = shared_memory.SharedMemory(name=name)
+    shm_list.append(shm)
+    return np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _shared_kwargs_create(kwargs, shm_list):
+    """
+    Puts the arrays of keyword arguments in shared memory.
+
+    The arrays (:class:`numpy.ndarray`) given directly as keyword argument
+    (e.g. `x`, `v`), or as entry of a dictionary given as keyword argument
+    (e.g. `params_T['mean']`), are copied in shared memory blocks, and set to
+    `None` in the returned keyword arguments.
+
+    Parameters
+    ----------
+    kwargs : dict
+        keyword arguments
+    shm_list : list
+        list of shared memory blocks (see function :func:`_shared_array_create`)
+
+    Returns
+    -------
+    kwargs_proc : dict
+        keyword arguments, with the shared arrays replaced by `None`
+    shared_desc : dict
+        descriptions of the shared arrays, with key `key` or `(key, k)`
+        for `kwargs[key]` or `kwargs[key][k]`, to be passed to the function
+        :func:`_shared_kwargs_attach` (in another process)
+    """
+    # fname = '_shared_kwargs_create'
+
+    kwargs_proc = dict(kwargs)
+    shared_desc = {}
+    for key, val in kwargs.items():
+        if isinstance(val, np.ndarray):
+            shared_desc[key] = _shared_array_create(val, shm_list)
+            kwargs_proc[key] = None
+        elif isinstance(val, dict):
+            kwargs_proc[key] = dict(val)
+            for k, vv in val.items():
+                if isinstance(vv, np.ndarray):
+                    shared_desc[(key, k)] = _shared_array_create(vv, shm_list)
+                    kwargs_proc[key][k] = None
+
+    return kwargs_proc, shared_desc
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _shared_kwargs_attach(kwargs, shared_desc, shm_list):
+    """
+    Gets keyword arguments whose arrays are stored in shared memory.
+
+    Parameters
+    ----------
+    kwargs : dict
+        keyword arguments, as returned by the function :func:`_shared_kwargs_create`
+    shared_desc : dict
+        descriptions of the shared arrays, as returned by the function
+        :func:`_shared_kwargs_create`
+    shm_list : list
+        list of shared memory blocks (see function :func:`_shared_array_attach`)
+
+    Returns
+    -------
+    kwargs : dict
+        keyword arguments, with the arrays using shared memory blocks as buffer
+    """
+    # fname = '_shared_kwargs_attach'
+
+    kwargs = dict(kwargs)
+    for key, desc in shared_desc.items():
+        if isinstance(key, tuple):
+            kwargs[key[0]] = dict(kwargs[key[0]])
+            kwargs[key[0]][key[1]] = _shared_array_attach(desc, shm_list)
+        else:
+            kwargs[key] = _shared_array_attach(desc, shm_list)
+
+    return kwargs
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _valid_output_array(out, shape, dtype):
+    """
+    Checks if an array given by the user can be used as output array.
+
+    Parameters
+    ----------
+    out : any type
+        array given by the user (e.g. a :class:`numpy.memmap`)
+    shape : tuple of ints
+        expected shape
+    dtype : numpy.dtype
+        expected type
+
+    Returns
+    -------
+    ok : bool
+        `True` if `out` is a C-contiguous and writeable array of shape `shape`
+        and type `dtype`
+    """
+    # fname = '_valid_output_array'
+
+    return isinstance(out, np.ndarray) and out.shape == tuple(shape) and out.dtype == dtype \
+        and out.flags.c_contiguous and out.flags.writeable
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _output_array_create(out, shape, dtype, shm_list):
+    """
+    Sets an output array written by several processes.
+
+    If `out` is a :class:`numpy.memmap` mapping a file opened in mode 'r+' or
+    'w+', the processes write directly in the file (no copy); otherwise, a new
+    shared memory block (initialized to zero) is used, and the result has to
+    be retrieved with the function :func:`_output_array_get`.
+
+    Parameters
+    ----------
+    out : nd array or `None`
+        output array given by the user (checked with the function
+        :func:`_valid_output_array`), or `None`
+    shape : tuple of ints
+        shape of the output array (if `out` is given, `out` is of the same
+        size, possibly with another shape)
+    dtype : numpy.dtype
+        type of the output array
+    shm_list : list
+        list of shared memory blocks (see function :func:`_shared_array_create`)
+
+    Returns
+    -------
+    desc : tuple
+        description of the output array, to be passed to the function
+        :func:`_output_array_attach` (in another process):
+
+        - `(filename, offset, shape, dtype)` if the processes write directly \
+        in the file of `out`
+        - `(name, shape, dtype)` otherwise (see function :func:`_shared_array_create`)
+    """
+    # fname = '_output_array_create'
+
+    if isinstance(out, np.memmap) and isinstance(out.base, mmap.mmap) \
+            and out.filename is not None and out.mode in ('r+', 'w+'):
+        # (out is C-contiguous, of size prod(shape): the file is mapped with the given shape)
+        return (out.filename, out.offset, tuple(shape), out.dtype.str)
+
+    return _shared_array_create(np.zeros(shape, dtype=dtype), shm_list)
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _output_array_attach(desc, shm_list):
+    """
+    Gets an output array set by the function :func:`_output_array_create`.
+
+    Parameters
+    ----------
+    desc : tuple
+        description of the output array, as returned by the function
+        :func:`_output_array_create`
+    shm_list : list
+        list of shared memory blocks (see function :func:`_shared_array_attach`)
+
+    Returns
+    -------
+    a : nd array
+        output array (a :class:`numpy.memmap`, to be flushed after writing,
+        or an array using a shared memory block as buffer)
+    """
+    # fname = '_output_array_attach'
+
+    if len(desc) == 4:
+        filename, offset, shape, dtype = desc
+        return np.memmap(filename, dtype=dtype, mode='r+', offset=offset, shape=shape)
+
+    return _shared_array_attach(desc, shm_list)
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _output_array_get(desc, out, shm_list):
+    """
+    Gets the result written by several processes in an output array.
+
+    Parameters
+    ----------
+    desc : tuple
+        description of the output array, as returned by the function
+        :func:`_output_array_create`
+    out : nd array or `None`
+        output array given by the user, or `None`
+    shm_list : list
+        list of shared memory blocks (see function :func:`_shared_array_attach`)
+
+    Returns
+    -------
+    a : nd array
+        `out` (containing the result), or a new array (copy of the shared
+        output array) if `out` is `None`
+    """
+    # fname = '_output_array_get'
+
+    if len(desc) == 4:
+        # result written directly in the file of `out`
+        return out
+
+    a = _shared_array_attach(desc, shm_list)
+    if out is None:
+        return np.array(a)
+
+    out[...] = a
+    return out
+# ----------------------------------------------------------------------------
@@ -14,6 +14,8 @@ Module for plurig-Gaussian simulations in 1D, 2D and 3D.
 import numpy as np
 from geone import covModel as gcm
 from geone import multiGaussian
+from geone import parallel
+from geone import randomStream
 
 # ============================================================================
 class PgsError(Exception):
@@ -23,13 +25,462 @@ class PgsError(Exception):
     pass
 # ============================================================================
 
+# ----------------------------------------------------------------------------
+class FlagLookup(object):
+    """
+    Class defining a flag function (truncation rule) by a lookup raster.
+
+    The rectangle [t1_min, t1_max] x [t2_min, t2_max] of the plane (T1, T2)
+    is divided in nt1 x nt2 cells, and the flag value of each cell is
+    evaluated once (at the center of the cell). An instance of this class is
+    a function (callable) of two arguments (t1, t2), that returns the flag
+    value of the cell containing the point (t1, t2) (a point outside the
+    rectangle is moved to the nearest cell), by vectorized index lookup;
+    it can be used in place of the flag function in the functions
+    :func:`pluriGaussianSim_unconditional` and :func:`pluriGaussianSim`, and
+    reused for several calls.
+
+    Note that the flag values are then approximated near the boundaries
+    between the regions of the truncation rule, at the resolution of the
+    raster.
+
+    **Attributes**
+
+    t1_min : float
+        minimal value of t1 (lower bound of the raster)
+
+    t1_max : float
+        maximal value of t1 (upper bound of the raster)
+
+    t2_min : float
+        minimal value of t2 (lower bound of the raster)
+
+    t2_max : float
+        maximal value of t2 (upper bound of the raster)
+
+    val : 2d-array of shape (nt1, nt2)
+        flag values, `val[i, j]` is the value in the cell of index `i` along
+        t1 and `j` along t2, i.e. the cell centered at
+        (t1_min + (i+0.5)*(t1_max-t1_min)/nt1, t2_min + (j+0.5)*(t2_max-t2_min)/nt2)
+    """
+    def __init__(self,
+                 flag_value,
+                 t1_min=-5.0, t1_max=5.0,
+                 t2_min=-5.0, t2_max=5.0,
+                 nt1=1000, nt2=1000):
+        """
+        Inits an instance of the class.
+
+        Parameters
+        ----------
+        flag_value : function (`callable`), or 2d-array of shape (nt1, nt2)
+            function of two arguments (t1, t2) that returns the flag value
+            at (t1, t2), evaluated (vectorized) at the center of the cells of
+            the raster; or flag values in the cells (attribute `val`)
+
+        t1_min : float, default: -5.0
+            minimal value of t1
+
+        t1_max : float, default: 5.0
+            maximal value of t1
+
+        t2_min : float, default: -5.0
+            minimal value of t2
+
+        t2_max : float, default: 5.0
+            maximal value of t2
+
+        nt1 : int, default: 1000
+            number of cells along t1 (unused if `flag_value` is an array)
+
+        nt2 : int, default: 1000
+            number of cells along t2 (unused if `flag_value` is an array)
+        """
+        fname = 'FlagLookup'
+
+        if not t1_min < t1_max or not t2_min < t2_max:
+            err_msg = f'{fname}: bounds of the raster invalid'
+            raise PgsError(err_msg)
+
+        self.t1_min = float(t1_min)
+        self.t1_max = float(t1_max)
+        self.t2_min = float(t2_min)
+        self.t2_max = float(t2_max)
+
+        if callable(flag_value):
+            nt1 = int(nt1)
+            nt2 = int(nt2)
+            if nt1 <= 0 or nt2 <= 0:
+                err_msg = f'{fname}: `nt1` or `nt2` invalid'
+                raise PgsError(err_msg)
+            t1, t2 = np.meshgrid(self.cell_centers(1, nt1), self.cell_centers(2, nt2), indexing='ij')
+            try:
+                val = np.asarray(flag_value(t1, t2))
+            except Exception as exc:
+                err_msg = f'{fname}: evaluation of `flag_value` failed'
+                raise PgsError(err_msg) from exc
+            if val.shape != t1.shape:
+                val = np.array([flag_value(a, b) for a, b in zip(t1.reshape(-1), t2.reshape(-1))]).reshape(t1.shape)
+        else:
+            val = np.asarray(flag_value)
+            if val.ndim != 2 or val.size == 0:
+                err_msg = f'{fname}: `flag_value` invalid, should be a function (callable) of two arguments or a 2d-array'
+                raise PgsError(err_msg)
+
+        self.val = val
+
+    # ------------------------------------------------------------------------
+    def __repr__(self):
+        out = '*** FlagLookup object ***'
+        out = out + '\n' + f't1: [{self.t1_min}, {self.t1_max}], {self.val.shape[0]} cells'
+        out = out + '\n' + f't2: [{self.t2_min}, {self.t2_max}], {self.val.shape[1]} cells'
+        out = out + '\n' + f'flag values: {np.unique(self.val)}'
+        out = out + '\n' + '*****'
+        return out
+    # ------------------------------------------------------------------------
+
+    # ------------------------------------------------------------------------
+    def cell_centers(self, axis, n=None):
+        """
+        Returns the centers of the cells of the raster along an axis.
+
+        Parameters
+        ----------
+        axis : int
+            1 (for t1) or 2 (for t2)
+
+        n : int, optional
+            number of cells along the axis, by default (`None`): retrieved from
+            the attribute `val`
+
+        Returns
+        -------
+        t : 1d-array
+            centers of the cells along the axis
+        """
+        # fname = 'cell_centers'
+
+        if axis == 1:
+            a, b = self.t1_min, self.t1_max
+        else:
+            a, b = self.t2_min, self.t2_max
+        if n is None:
+            n = self.val.shape[axis-1]
+        return a + (np.arange(n) + 0.5) * ((b - a) / n)
+    # ------------------------------------------------------------------------
+
+    # ------------------------------------------------------------------------
+    @classmethod
+    def from_polygons(cls,
+                      polygons, values, default_value,
+                      t1_min=-5.0, t1_max=5.0,
+                      t2_min=-5.0, t2_max=5.0,
+                      nt1=1000, nt2=1000):
+        """
+        Sets a flag function from a partition of the plane (T1, T2) in polygons.
+
+        Parameters
+        ----------
+        polygons : sequence of 2d-arrays
+            polygons in the plane (T1, T2), each one given by its vertices
+            (see function :func:`tools.is_in_polygon`)
+
+        values : sequence
+            flag values, `values[i]` is the flag value in `polygons[i]`; if
+            polygons overlap, the last one (in the sequence) prevails
+
+        default_value : int or float
+            flag value outside all the polygons
+
+        t1_min, t1_max, t2_min, t2_max, nt1, nt2 :
+            see method :meth:`__init__`
+
+        Returns
+        -------
+        flag_lookup : :class:`FlagLookup`
+            flag function defined on the raster
+        """
+        fname = 'from_polygons'
+
+        from geone import tools
+
+        if len(polygons) != len(values):
+            err_msg = f'{fname}: `polygons` and `values` of different lengths'
+            raise PgsError(err_msg)
+
+        fl = cls(np.full((int(nt1), int(nt2)), default_value), t1_min, t1_max, t2_min, t2_max)
+        t1, t2 = np.meshgrid(fl.cell_centers(1), fl.cell_centers(2), indexing='ij')
+        t = np.array((t1.reshape(-1), t2.reshape(-1))).T
+        val = fl.val.reshape(-1)
+        for vertices, value in zip(polygons, values):
+            val[tools.is_in_polygon(t, np.asarray(vertices, dtype='float'))] = value
+        return fl
+    # ------------------------------------------------------------------------
+
+    # ------------------------------------------------------------------------
+    def __call__(self, t1, t2):
+        """
+        Returns the flag value(s) at (t1, t2), by lookup in the raster.
+
+        Parameters
+        ----------
+        t1 : array-like or float
+            value(s) of T1
+
+        t2 : array-like or float
+            value(s) of T2 (broadcast with `t1`)
+
+        Returns
+        -------
+        flag : nd-array or value
+            flag value(s) of the cell(s) containing (t1, t2)
+        """
+        # fname = '__call__'
+
+        nt1, nt2 = self.val.shape
+        # index of the cell along each axis (clipping before casting to int
+        # gives the floor of non-negative values)
+        i1 = np.clip((np.asarray(t1) - self.t1_min) * (nt1 / (self.t1_max - self.t1_min)), 0, nt1-1).astype(np.intp)
+        i2 = np.clip((np.asarray(t2) - self.t2_min) * (nt2 / (self.t2_max - self.t2_min)), 0, nt2-1).astype(np.intp)
+        i1 *= nt2
+        i1 += i2
+        return np.take(self.val.reshape(-1), i1)
+    # ------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _pgs_mp_worker(
+        pgs_func, kwargs, shared_desc, ireal0, ireal1, rng, per_real,
+        Z_desc, T_desc, ok_desc, fname):
+    """
+    Generates a block of pluri-Gaussian realizations in a process (worker).
+
+    Parameters
+    ----------
+    pgs_func : function
+        pluri-Gaussian simulation function (:func:`pluriGaussianSim_unconditional`
+        or :func:`pluriGaussianSim`)
+    kwargs : dict
+        keyword arguments for `pgs_func` (except `nreal`, `rng`,
+        `full_output`, `verbose`), as returned by the function
+        :func:`parallel._shared_kwargs_create`
+    shared_desc : dict
+        descriptions of the shared arrays of the keyword arguments, as
+        returned by the function :func:`parallel._shared_kwargs_create`
+    ireal0 : int
+        index of the first realization of the block
+    ireal1 : int
+        index of the last realization of the block + 1
+    rng : list of :class:`numpy.random.SeedSequence`
+        seed sequences of the realizations of the block
+    per_real : bool
+        - if `True`: `pgs_func` is called for each realization of the block \
+        (with `nreal=1`), the realizations that failed are skipped
+        - if `False`: `pgs_func` is called once for all the realizations of \
+        the block (no realization can fail)
+    Z_desc : tuple
+        description of the shared output array for Z, of shape
+        (nreal, ) + grid shape (see function :func:`parallel._output_array_create`)
+    T_desc : list of tuples
+        descriptions of the shared output arrays for T1 and T2, of shape
+        (nreal, ) + grid shape (empty list if T1 and T2 are not retrieved)
+    ok_desc : tuple
+        description of the shared output array of flags (bools) indicating
+        the realizations successfully generated, of shape (nreal, )
+    fname : str
+        name of the calling function (for error message)
+
+    Returns
+    -------
+    n_cond_ok : list
+        number of conditioning data honoured (see function
+        :func:`pluriGaussianSim`) for each realization of the block (`None`
+        for the realizations that failed, or if not retrieved)
+    """
+    # fname = '_pgs_mp_worker'
+
+    shm_list = []
+    try:
+        kwargs = parallel._shared_kwargs_attach(kwargs, shared_desc, shm_list)
+        full_output = len(T_desc) > 0
+
+        Z = parallel._output_array_attach(Z_desc, shm_list)
+        T = [parallel._output_array_attach(desc, shm_list) for desc in T_desc]
+        ok = parallel._output_array_attach(ok_desc, shm_list)
+
+        if per_real:
+            blocks = [(i, i+1, rng[i-ireal0:i-ireal0+1]) for i in range(ireal0, ireal1)]
+        else:
+            blocks = [(ireal0, ireal1, rng)]
+
+        n_cond_ok = (ireal1-ireal0)*[None]
+        for i0, i1, rng_block in blocks:
+            out = pgs_func(**kwargs, nreal=i1-i0, rng=rng_block, full_output=full_output, verbose=0)
+            if full_output:
+                Z_real, T_real = out[0], out[1:3]
+            else:
+                Z_real, T_real = out, []
+            if len(Z_real) == 0:
+                continue
+
+            Z_real_cast = Z_real.astype(Z.dtype)
+            if not np.all(Z_real_cast == Z_real):
+                err_msg = f'{fname}: flag values cannot be stored with type {Z.dtype} (`dtype_Z`)'
+                raise PgsError(err_msg)
+
+            Z[i0:i1] = Z_real_cast
+            for sim_T, sim_T_real in zip(T, T_real):
+                sim_T[i0:i1] = sim_T_real
+            ok[i0:i1] = True
+            if full_output and len(out) == 4:
+                n_cond_ok[i0-ireal0:i1-ireal0] = out[3]
+
+        return n_cond_ok
+
+    finally:
+        # Release references to shared memory before closing
+        kwargs = None
+        out, Z_real, Z_real_cast, T_real = None, None, None, None
+        Z, T, ok, sim_T = None, None, None, None
+        for shm in shm_list:
+            shm.close()
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _pgs_mp(pgs_func, kwargs, dimension, dtype_Z, nreal, rng, full_output, nproc, fname, verbose):
+    """
+    Generates pluri-Gaussian realizations using multiprocessing.
+
+    The arrays of the keyword arguments (data, mean, variance, ...) are put in
+    shared memory (read only), and the realizations are distributed by blocks
+    over a pool of processes; each realization is generated with its own
+    stream spawned from `rng`, and written in shared output arrays.
+
+    Parameters
+    ----------
+    pgs_func : function
+        pluri-Gaussian simulation function (:func:`pluriGaussianSim_unconditional`
+        or :func:`pluriGaussianSim`)
+    kwargs : dict
+        keyword arguments for `pgs_func` (except `nreal`, `rng`,
+        `full_output`, `verbose`)
+    dimension : int or sequence of ints
+        number of grid cells (see `pgs_func`)
+    dtype_Z : numpy.dtype
+        type of the output array for Z
+    nreal : int
+        number of realizations
+    rng : int, or :class:`numpy.random.SeedSequence`, or :class:`numpy.random.Generator`, or sequence
+        random number generator specification (see module :mod:`randomStream`),
+        not legacy
+    full_output : bool
+        see `pgs_func`
+    nproc : int
+        number of processes (see e.g. function :func:`pluriGaussianSim_mp`)
+    fname : str
+        name of the calling function (for displaying)
+    verbose : int
+        verbose mode
+
+    Returns
+    -------
+    out : nd-array, or tuple
+        output of `pgs_func` (as with `nreal` realizations)
+    """
+    # fname = '_pgs_mp'
+
+    # Independent streams, one per realization
+    try:
+        ss = randomStream.spawn_seed_sequences(rng, nreal)
+    except Exception as exc:
+        err_msg = f'{fname}: `rng` invalid'
+        raise PgsError(err_msg) from exc
+
+    # Set number of processes (n)
+    n = parallel.get_nproc(nproc)
+
+    # Set index for distributing realizations
+    if nreal < n:
+        n = nreal
+
+    q, r = np.divmod(nreal, n)
+    ids_proc = [i*q + min(i, r) for i in range(n+1)]
+
+    if verbose > 1:
+        print(f'{fname}: running simulation on {n} processes...')
+
+    conditional = pgs_func is pluriGaussianSim and kwargs.get('x') is not None
+    shape = (nreal, ) + tuple(np.atleast_1d(dimension)[::-1])
+
+    shm_list = []
+    try:
+        # Shared arrays
+        kwargs_proc, shared_desc = parallel._shared_kwargs_create(kwargs, shm_list)
+        Z_desc = parallel._output_array_create(None, shape, np.dtype(dtype_Z), shm_list)
+        if full_output:
+            T_desc = [parallel._output_array_create(None, shape, np.dtype('float64'), shm_list) for _ in range(2)]
+        else:
+            T_desc = []
+        ok_desc = parallel._output_array_create(None, (nreal, ), np.dtype('bool'), shm_list)
+
+        # Set pool of n workers
+        pool = parallel.get_pool(n)
+        out_pool = []
+        for i in range(n):
+            # Set i-th process (a conditional realization can fail: one call per realization)
+            out_pool.append(pool.apply_async(_pgs_mp_worker,
+                                             args=(pgs_func, kwargs_proc, shared_desc,
+                                                   ids_proc[i], ids_proc[i+1], ss[ids_proc[i]:ids_proc[i+1]], conditional,
+                                                   Z_desc, T_desc, ok_desc, fname)))
+
+        # Wait for the tasks and release the pool
+        parallel.release_pool(pool, out_pool)
+
+        # Check each process (an error occurred in a process is raised)
+        n_cond_ok = sum([w.get() for w in out_pool], [])
+
+        # Get result (successful realizations)
+        ok = parallel._shared_array_attach(ok_desc, shm_list)
+        ireal_ok = np.where(ok)[0]
+        ok = None
+        if verbose > 0 and len(ireal_ok) < nreal:
+            print(f'{fname}: WARNING: some realization failed (missing)')
+
+        Z = parallel._shared_array_attach(Z_desc, shm_list)
+        Z = Z[ireal_ok]
+        if full_output:
+            T = []
+            for desc in T_desc:
+                sim_T = parallel._shared_array_attach(desc, shm_list)
+                T.append(sim_T[ireal_ok])
+                sim_T = None
+            n_cond_ok = [n_cond_ok[ireal] for ireal in ireal_ok]
+
+    finally:
+        for shm in shm_list:
+            shm.close()
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    if full_output:
+        if pgs_func is pluriGaussianSim:
+            return Z, T[0], T[1], n_cond_ok
+        return Z, T[0], T[1]
+    else:
+        return Z
+# ----------------------------------------------------------------------------
+
 # ----------------------------------------------------------------------------
 def pluriGaussianSim_unconditional(
         cov_model_T1, cov_model_T2, flag_value,
         dimension, spacing=None, origin=None,
         algo_T1='fft', params_T1={},
         algo_T2='fft', params_T2={},
+        flag_lookup=None,
         nreal=1,
+        rng=None,
         full_output=True,
         verbose=1):
     """
@@ -59,7 +510,8 @@ def pluriGaussianSim_unconditional(
 
     flag_value : function (`callable`)
         function of tow arguments (xi, yi) that returns the "flag_value" at
-        location (xi, yi)
+        location (xi, yi), e.g. an instance of :class:`FlagLookup` (see also
+        `flag_lookup` below)
 
     dimension : [sequence of] int(s)
         number of cells along each axis, for simulation in:
@@ -110,9 +562,26 @@ def pluriGaussianSim_unconditional(
         that is called (according to `algo_T2` and space dimension) for simulation
         of T2
 
+    flag_lookup : bool or dict, optional
+        if `True` or a dict: `flag_value` is first compiled into a lookup raster
+        over the plane (T1, T2), i.e. replaced by
+        `FlagLookup(flag_value, **flag_lookup)` (with default parameters if
+        `flag_lookup=True`), see class :class:`FlagLookup`, so that the flag
+        function is evaluated by vectorized index lookup;
+        by default (`None`): `flag_value` is used as given (note that an
+        instance of :class:`FlagLookup` can also be given directly as
+        `flag_value`, and reused for several calls)
+
     nreal : int, default: 1
         number of realization(s)
 
+    rng : int, or :class:`numpy.random.SeedSequence`, or :class:`numpy.random.Generator`, or sequence, optional
+        random number generator specification (see module :mod:`randomStream`);
+        by default (`None`): the global random state of `numpy.random` is used;
+        otherwise, each realization is generated with its own independent
+        stream spawned from `rng` (used for all the random draws of the
+        realization, including the simulation of the fields T1 and T2)
+
     full_output : bool, default: True
         - if `True`: simulation(s) of Z, T1, and T2 are retrieved in output
         - if `False`: simulation(s) of Z only is retrieved in output
@@ -157,6 +626,15 @@ def pluriGaussianSim_unconditional(
         err_msg = f'{fname}: `flag_value` invalid, should be a function (callable) of two arguments'
         raise PgsError(err_msg)
 
+    if flag_lookup is not None and flag_lookup is not False and not isinstance(flag_value, FlagLookup):
+        if flag_lookup is True:
+            flag_lookup = {}
+        try:
+            flag_value = FlagLookup(flag_value, **flag_lookup)
+        except Exception as exc:
+            err_msg = f'{fname}: cannot set lookup raster for `flag_value` (`flag_lookup` invalid?)'
+            raise PgsError(err_msg) from exc
+
     if algo_T1 not in ('fft', 'FFT', 'classic', 'CLASSIC', 'deterministic', 'DETERMINISTIC'):
         err_msg = f"{fname}: `algo_T1` invalid, should be 'fft' (default) or 'classic' or 'deterministic'"
         raise PgsError(err_msg)
@@ -252,13 +730,28 @@ def pluriGaussianSim_unconditional(
         params_T2['verbose'] = 0
         # params_T2['verbose'] = verbose
 
+    # Random number generators for T1 and T2
+    if randomStream.is_legacy(rng):
+        rng_T1, rng_T2 = rng, rng
+    else:
+        # two independent streams (one for T1 and one for T2) spawned from the
+        # stream of each realization
+        try:
+            rng_ss = [ss.spawn(2) for ss in randomStream.spawn_seed_sequences(rng, nreal)]
+        except Exception as exc:
+            err_msg = f'{fname}: `rng` invalid'
+            raise PgsError(err_msg) from exc
+
+        rng_T1 = [ss[0] for ss in rng_ss]
+        rng_T2 = [ss[1] for ss in rng_ss]
+
     # Generate T1
     if cov_model_T1 is not None:
         try:
             sim_T1 = multiGaussian.multiGaussianRun(
                     cov_model_T1, dimension, spacing, origin,
                     mode='simulation', algo=algo_T1, output_mode='array',
-                    **params_T1, nreal=nreal)
+                    **params_T1, nreal=nreal, rng=rng_T1)
         except Exception as exc:
             err_msg = f'{fname}: simulation of T1 failed'
             raise PgsError(err_msg) from exc
@@ -276,7 +769,7 @@ def pluriGaussianSim_unconditional(
             sim_T2 = multiGaussian.multiGaussianRun(
                     cov_model_T2, dimension, spacing, origin,
                     mode='simulation', algo=algo_T2, output_mode='array',
-                    **params_T2, nreal=nreal)
+                    **params_T2, nreal=nreal, rng=rng_T2)
         except Exception as exc:
             err_msg = f'{fname}: simulation of T2 failed'
             raise PgsError(err_msg) from exc
@@ -299,6 +792,89 @@ def pluriGaussianSim_unconditional(
         return Z
 # ----------------------------------------------------------------------------
 
+# ----------------------------------------------------------------------------
+def pluriGaussianSim_unconditional_mp(
+        cov_model_T1, cov_model_T2, flag_value,
+        dimension, spacing=None, origin=None,
+        algo_T1='fft', params_T1={},
+        algo_T2='fft', params_T2={},
+        flag_lookup=None,
+        nreal=1,
+        rng=None,
+        full_output=True,
+        verbose=1,
+        dtype_Z='int8',
+        nproc=-1):
+    """
+    Computes the same as the function :func:`pgs.pluriGaussianSim_unconditional`, using multiprocessing.
+
+    All the parameters except `dtype_Z` and `nproc` are the same as those of
+    the function :func:`pgs.pluriGaussianSim_unconditional`.
+
+    The number of processes used (in parallel) is n, and determined by the
+    parameter `nproc` (int, optional) as follows:
+
+    - if `nproc > 0`: n = `nproc`,
+    - if `nproc <= 0`: n = max(nmax+`nproc`, 1), where nmax is the total \
+    number of cpu(s) of the system (retrieved by :func:`config.cpu_count`), \
+    i.e. all cpus except `-nproc` is used (but at least one)
+
+    The arrays given in argument (arrays in the dictionaries of
+    parameters, ...) are put in shared memory and used (read only) by the n
+    parallel processes. The set of realizations (specified by `nreal`) is
+    distributed in a balanced way over the processes;
+    each process generates T1 and T2 for its block of realizations, and
+    writes the realizations of Z (and T1, T2) directly in shared output arrays
+    (copied in the returned arrays). The array of the realizations of Z is of
+    type `dtype_Z` (str or numpy.dtype, default: 'int8'), which reduces the
+    memory used for categorical variables (an error is raised if the flag
+    values cannot be represented with this type). Note that `flag_value` must
+    be picklable (e.g. a function defined at the top level of a module, or an
+    instance of :class:`FlagLookup`).
+
+    Note that, if `nreal` < n, then n is reduced to `nreal`.
+
+    Each realization is generated with its own stream (see parameter `rng`),
+    hence the result is the same as the one of the function :func:`pgs.pluriGaussianSim_unconditional`
+    with the same `rng` (except the type of the array of Z), whatever the
+    number of processes; if `rng` is `None` (default) or a
+    :class:`numpy.random.RandomState`, a seed is first drawn from it (see
+    function :func:`randomStream.seed_from_rng`) and used as `rng`.
+
+    See function :func:`pgs.pluriGaussianSim_unconditional` for details.
+    """
+    fname = 'pluriGaussianSim_unconditional_mp'
+
+    kwargs = dict(
+            cov_model_T1=cov_model_T1,
+            cov_model_T2=cov_model_T2,
+            flag_value=flag_value,
+            dimension=dimension,
+            spacing=spacing,
+            origin=origin,
+            algo_T1=algo_T1,
+            params_T1=params_T1,
+            algo_T2=algo_T2,
+            params_T2=params_T2,
+            flag_lookup=flag_lookup
+            )
+
+    # Number of realization(s)
+    nreal = int(nreal) # cast to int if needed
+
+    if nreal <= 0:
+        return pluriGaussianSim_unconditional(**kwargs, nreal=nreal, rng=rng, full_output=full_output, verbose=verbose)
+
+    # Random number generator: the streams of the realizations are spawned
+    # (legacy random state cannot be shared between processes)
+    if randomStream.is_legacy(rng):
+        rng = randomStream.seed_from_rng(rng)
+
+    return _pgs_mp(
+            pluriGaussianSim_unconditional, kwargs, dimension, dtype_Z,
+            nreal, rng, full_output, nproc, fname, verbose)
+# ----------------------------------------------------------------------------
+
 # ----------------------------------------------------------------------------
 def pluriGaussianSim(
         cov_model_T1, cov_model_T2, flag_value,
@@ -306,11 +882,13 @@ def pluriGaussianSim(
         x=None, v=None,
         algo_T1='fft', params_T1={},
         algo_T2='fft', params_T2={},
+        flag_lookup=None,
         accept_init=0.25, accept_pow=2.0,
-        mh_iter_min=100, mh_iter_max=200,
+        mh_iter_min=100, mh_iter_max=200, mh_block_size=1,
         ntry_max=1,
         retrieve_real_anyway=False,
         nreal=1,
+        rng=None,
         full_output=True,
         verbose=1):
     """
@@ -340,7 +918,8 @@ def pluriGaussianSim(
 
     flag_value : function (`callable`)
         function of tow arguments (xi, yi) that returns the "flag_value" at
-        location (xi, yi)
+        location (xi, yi), e.g. an instance of :class:`FlagLookup` (see also
+        `flag_lookup` below)
 
     dimension : [sequence of] int(s)
         number of cells along each axis, for simulation in:
@@ -404,6 +983,16 @@ def pluriGaussianSim(
         that is called (according to `algo_T2` and space dimension) for simulation
         of T2
 
+    flag_lookup : bool or dict, optional
+        if `True` or a dict: `flag_value` is first compiled into a lookup raster
+        over the plane (T1, T2), i.e. replaced by
+        `FlagLookup(flag_value, **flag_lookup)` (with default parameters if
+        `flag_lookup=True`), see class :class:`FlagLookup`, so that the flag
+        function is evaluated by vectorized index lookup;
+        by default (`None`): `flag_value` is used as given (note that an
+        instance of :class:`FlagLookup` can also be given directly as
+        `flag_value`, and reused for several calls)
+
     accept_init : float, default: 0.25
         initial acceptation probability
         (see parameters `mh_iter_min`, `mh_iter_max`)
@@ -440,6 +1029,18 @@ def pluriGaussianSim(
                     * else (conditioning not ok): \
                     reject the new candidate
 
+    mh_block_size : int, default: 1
+        number of conditioning locations updated together (block) in the
+        Metropolis-Hasting algorithm: at each iteration, the conditioning
+        locations (not ok only, if `nit >= mh_iter_min`) are visited in random
+        order by blocks, the new candidates for a block are drawn in the
+        conditional distribution of T1 and T2 given the values at the other
+        conditioning locations (precision matrix, see class
+        :class:`multiGaussian.GaussianConditionalKernel`), and accepted or
+        rejected together (as above, with "conditioning ok" meaning
+        conditioning ok at every location of the block); `mh_block_size=1`
+        gives single-site updates
+
     ntry_max : int, default: 1
         number of trial(s) per realization before giving up if something goes
         wrong
@@ -454,6 +1055,13 @@ def pluriGaussianSim(
     nreal : int, default: 1
         number of realization(s)
 
+    rng : int, or :class:`numpy.random.SeedSequence`, or :class:`numpy.random.Generator`, or sequence, optional
+        random number generator specification (see module :mod:`randomStream`);
+        by default (`None`): the global random state of `numpy.random` is used;
+        otherwise, each realization is generated with its own independent
+        stream spawned from `rng` (used for all the random draws of the
+        realization, including the simulation of the fields T1 and T2)
+
     full_output : bool, default: True
         - if `True`: simulation(s) of Z, T1, T2, and `n_cond_ok` are \
         retrieved in output
@@ -511,6 +1119,15 @@ def pluriGaussianSim(
         err_msg = f'{fname}: `flag_value` invalid, should be a function (callable) of two arguments'
         raise PgsError(err_msg)
 
+    if flag_lookup is not None and flag_lookup is not False and not isinstance(flag_value, FlagLookup):
+        if flag_lookup is True:
+            flag_lookup = {}
+        try:
+            flag_value = FlagLookup(flag_value, **flag_lookup)
+        except Exception as exc:
+            err_msg = f'{fname}: cannot set lookup raster for `flag_value` (`flag_lookup` invalid?)'
+            raise PgsError(err_msg) from exc
+
     if algo_T1 not in ('fft', 'FFT', 'classic', 'CLASSIC', 'deterministic', 'DETERMINISTIC'):
         err_msg = f"{fname}: `algo_T1` invalid, should be 'fft' (default) or 'classic' or 'deterministic'"
         raise PgsError(err_msg)
@@ -519,6 +1136,11 @@ def pluriGaussianSim(
         err_msg = f"{fname}: `algo_T2` invalid, should be 'fft' (default) or 'classic' or 'deterministic'"
         raise PgsError(err_msg)
 
+    mh_block_size = int(mh_block_size) # cast to int if needed
+    if mh_block_size <= 0:
+        err_msg = f'{fname}: `mh_block_size` invalid'
+        raise PgsError(err_msg)
+
     # Ignore covariance model if 'algo' is deterministic for T1, T2
     if algo_T1 in ('deterministic', 'DETERMINISTIC'):
         cov_model_T1 = None
@@ -831,6 +1453,12 @@ def pluriGaussianSim(
                 varUpdate = np.sqrt(var_T1[x_var_T1_grid_ind]/cov0_T1)
                 mat_T1 = varUpdate*(mat_T1.T*varUpdate).T
 
+            # Kernel for simulating T1 at x (mat_T1 factorized once)
+            try:
+                kernel_T1 = multiGaussian.GaussianConditionalKernel(mat_T1, mean=mean_T1[x_mean_T1_grid_ind])
+            except:
+                kernel_T1 = None
+
         if cov_model_T2 is not None:
             # Set kriging matrix for T2 (mat_T2) of order npt, "over every conditioining point"
             mat_T2 = np.ones((npt, npt))
@@ -848,6 +1476,12 @@ def pluriGaussianSim(
                 varUpdate = np.sqrt(var_T2[x_var_T2_grid_ind]/cov0_T2)
                 mat_T2 = varUpdate*(mat_T2.T*varUpdate).T
 
+            # Kernel for simulating T2 at x (mat_T2 factorized once)
+            try:
+                kernel_T2 = multiGaussian.GaussianConditionalKernel(mat_T2, mean=mean_T2[x_mean_T2_grid_ind])
+            except:
+                kernel_T2 = None
+
     # Set (again if given) default parameter 'mean' and 'var' for T1, T2
     if cov_model_T1 is not None:
         params_T1['mean'] = mean_T1
@@ -874,6 +1508,13 @@ def pluriGaussianSim(
         params_T2['verbose'] = 0
         # params_T2['verbose'] = verbose
 
+    # Random number generator (stream) for each realization
+    try:
+        rngs = randomStream.rng_streams(rng, nreal)
+    except Exception as exc:
+        err_msg = f'{fname}: `rng` invalid'
+        raise PgsError(err_msg) from exc
+
     # Initialization for output
     Z = []
     if full_output:
@@ -899,7 +1540,7 @@ def pluriGaussianSim(
                         sim_T1 = multiGaussian.multiGaussianRun(
                                 cov_model_T1, dimension, spacing, origin,
                                 mode='simulation', algo=algo_T1, output_mode='array',
-                                **params_T1, nreal=1)
+                                **params_T1, nreal=1, rng=rngs[ireal])
                     except:
                         sim_ok = False
                         if verbose > 2:
@@ -922,7 +1563,7 @@ def pluriGaussianSim(
                         sim_T2 = multiGaussian.multiGaussianRun(
                                 cov_model_T2, dimension, spacing, origin,
                                 mode='simulation', algo=algo_T2, output_mode='array',
-                                **params_T2, nreal=1)
+                                **params_T2, nreal=1, rng=rngs[ireal])
                     except:
                         sim_ok = False
                         if verbose > 2:
@@ -943,66 +1584,29 @@ def pluriGaussianSim(
                 # Conditional case
                 # ----------------
                 v_T = np.zeros((npt, 2))
-                # Initialize: unconditional simulation of T1 at x (values in v_T[:,0])
-                ind = np.random.permutation(npt)
-                for j, k in enumerate(ind):
-                    if cov_model_T1 is not None:
-                        # Simulate value at x[k] (= x[ind[j]]), conditionally to the previous ones
-                        # Solve the kriging system (for T1)
-                        try:
-                            w = np.linalg.solve(
-                                    mat_T1[ind[:j], :][:, ind[:j]], # kriging matrix
-                                    mat_T1[ind[:j], ind[j]], # second member
-                                )
-                        except:
-                            sim_ok = False
-                            break
-
-                        # Mean (kriged) value at x[k]
-                        mu_T1_k = mean_T1[x_mean_T1_grid_ind[k]] + (v_T[ind[:j], 0] - mean_T1[x_mean_T1_grid_ind[ind[:j]]]).dot(w)
-                        # Standard deviation (of kriging) at x[k]
-                        std_T1_k = np.sqrt(np.maximum(0, cov0_T1 - np.dot(w, mat_T1[ind[:j], ind[j]])))
-                        # Draw value in N(mu_T1_k, std_T1_k^2)
-                        v_T[k, 0] = np.random.normal(loc=mu_T1_k, scale=std_T1_k)
-                    else:
-                        v_T[k, 0] = mean_T1[x_mean_T1_grid_ind[k]]
-
-                if not sim_ok:
+                # Initialize: unconditional simulation of T1 and T2 at x (values in v_T)
+                if (cov_model_T1 is not None and kernel_T1 is None) or (cov_model_T2 is not None and kernel_T2 is None):
+                    sim_ok = False
                     if verbose > 2:
-                        print('    ... cannot solve kriging system (for T1, initialization)')
+                        print('    ... cannot solve kriging system (for T1 or T2, initialization)')
                     continue
 
-                # Initialize: unconditional simulation of T2 at x (values in v_T[:,1])
-                ind = np.random.permutation(npt)
-                for j, k in enumerate(ind):
-                    if cov_model_T2 is not None:
-                        # Simulate value at x[k] (= x[ind[j]]), conditionally to the previous ones
-                        # Solve the kriging system (for T2)
-                        try:
-                            w = np.linalg.solve(
-                                    mat_T2[ind[:j], :][:, ind[:j]], # kriging matrix
-                                    mat_T2[ind[:j], ind[j]], # second member
-                                )
-                        except:
-                            sim_ok = False
-                            break
-
-                        # Mean (kriged) value at x[k]
-                        mu_T2_k = mean_T2[x_mean_T2_grid_ind[k]] + (v_T[ind[:j], 1] - mean_T2[x_mean_T2_grid_ind[ind[:j]]]).dot(w)
-                        # Standard deviation (of kriging) at x[k]
-                        std_T2_k = np.sqrt(np.maximum(0, cov0_T2 - np.dot(w, mat_T2[ind[:j], ind[j]])))
-                        # Draw value in N(mu_T2_k, std_T2_k^2)
-                        v_T[k, 1] = np.random.normal(loc=mu_T2_k, scale=std_T2_k)
-                    else:
-                        v_T[k, 1] = mean_T2[x_mean_T2_grid_ind[k]]
-
-                if not sim_ok:
-                    if verbose > 2:
-                        print('    ... cannot solve kriging system (for T2, initialization)')
-                    continue
+                if cov_model_T1 is not None:
+                    v_T[:, 0] = kernel_T1.sample_unconditional(rngs[ireal])
+                else:
+                    v_T[:, 0] = mean_T1[x_mean_T1_grid_ind]
 
-                # Update simulated values v_T at x using Metropolis-Hasting (MH) algorithm
-                v_T_k_new = np.zeros(2)
+                if cov_model_T2 is not None:
+                    v_T[:, 1] = kernel_T2.sample_unconditional(rngs[ireal])
+                else:
+                    v_T[:, 1] = mean_T2[x_mean_T2_grid_ind]
+
+                # Update simulated values v_T at x using Metropolis-Hasting (MH) algorithm:
+                # the conditioning locations are visited (in random order) by blocks of
+                # `mh_block_size` locations, the new candidates at the locations of a block
+                # are drawn in the conditional distribution of T1 (resp. T2) given the values
+                # at the other locations (using the precision matrix of T1 (resp. T2) at x,
+                # factorized once, see class `multiGaussian.GaussianConditionalKernel`)
                 stop_mh = False
                 for nit in range(mh_iter_max):
                     #hd_ok = np.array([flag_value(v_T[k, 0], v_T[k, 1]) == v[k] for k in range(npt)])
@@ -1017,73 +1621,36 @@ def pluriGaussianSim(
                         p_accept = accept_init * np.power(1.0 - nit/mh_iter_min, accept_pow)
                     if verbose > 3:
                         print(f'   ... sim {ireal+1} of {nreal}: MH iter {nit+1} of {mh_iter_min},  {mh_iter_max}...')
-                    ind = np.random.permutation(npt)
-                    for k in ind:
-                        if nit >= mh_iter_min and hd_ok[k]:
-                           #print('skip')
-                           continue
-                        #
-                        # Sequence of indexes without k
-                        indmat = np.hstack((np.arange(k), np.arange(k+1, npt)))
-                        # Simulate possible new value v_T_new at x[k], conditionally to all the ohter ones
-                        #
+                    if cov_model_T1 is not None:
+                        kernel_T1.refresh()
+                    if cov_model_T2 is not None:
+                        kernel_T2.refresh()
+                    ind = rngs[ireal].permutation(npt)
+                    if nit >= mh_iter_min:
+                        # skip the locations where the conditioning is ok
+                        ind = ind[~hd_ok[ind]]
+                    for i in range(0, len(ind), mh_block_size):
+                        indb = ind[i:i+mh_block_size]
+                        # Simulate possible new values at x[indb], conditionally to all the other ones
                         if cov_model_T1 is not None:
-                            # Solve the kriging system for T1
-                            try:
-                                w = np.linalg.solve(
-                                        mat_T1[indmat, :][:, indmat], # kriging matrix
-                                        mat_T1[indmat, k], # second member
-                                    )
-                            except:
-                                sim_ok = False
-                                if verbose > 2:
-                                    print('   ... cannot solve kriging system (for T1)')
-                                break
-                            #
-                            # Mean (kriged) value at x[k]
-                            mu_T1_k = mean_T1[x_mean_T1_grid_ind[k]] + (v_T[indmat, 0] - mean_T1[x_mean_T1_grid_ind[indmat]]).dot(w)
-                            # Standard deviation (of kriging) at x[k]
-                            std_T1_k = np.sqrt(np.maximum(0, cov0_T1 - np.dot(w, mat_T1[indmat, k])))
-                            # Draw value in N(mu, std^2)
-                            v_T_k_new[0] = np.random.normal(loc=mu_T1_k, scale=std_T1_k)
+                            v_T1_new = kernel_T1.sample_block(indb, rngs[ireal])
                         else:
-                            v_T_k_new[0] = mean_T1[x_mean_T1_grid_ind[k]]
+                            v_T1_new = v_T[indb, 0]
                         #
-                        # Solve the kriging system for T2
                         if cov_model_T2 is not None:
-                            try:
-                                w = np.linalg.solve(
-                                        mat_T2[indmat, :][:, indmat], # kriging matrix
-                                        mat_T2[indmat, k], # second member
-                                    )
-                            except:
-                                sim_ok = False
-                                if verbose > 2:
-                                    print('   ... cannot solve kriging system (for T2)')
-                                break
-                            #
-                            # Mean (kriged) value at x[k]
-                            mu_T2_k = mean_T2[x_mean_T2_grid_ind[k]] + (v_T[indmat, 1] - mean_T2[x_mean_T2_grid_ind[indmat]]).dot(w)
-                            # Standard deviation (of kriging) at x[k]
-                            std_T2_k = np.sqrt(np.maximum(0, cov0_T2 - np.dot(w, mat_T2[indmat, k])))
-                            # Draw value in N(mu, std^2)
-                            v_T_k_new[1] = np.random.normal(loc=mu_T2_k, scale=std_T2_k)
+                            v_T2_new = kernel_T2.sample_block(indb, rngs[ireal])
                         else:
-                            v_T_k_new[1] = mean_T2[x_mean_T2_grid_ind[k]]
+                            v_T2_new = v_T[indb, 1]
                         #
                         # Accept or not the new candidate
-                        if flag_value(v_T_k_new[0], v_T_k_new[1]) == v[k]:
-                            # Accept the new candidate
-                            v_T[k] = v_T_k_new
-                        elif nit < mh_iter_min and np.random.random() < p_accept:
-                            # Accept the new candidate
-                            v_T[k] = v_T_k_new
-
-                    if not sim_ok:
-                        break
-
-                if not sim_ok:
-                    continue
+                        if np.all(flag_value(v_T1_new, v_T2_new) == v[indb]) or (nit < mh_iter_min and rngs[ireal].random() < p_accept):
+                            # Accept the new candidate (conditioning ok, or accepted with probability p_accept)
+                            v_T[indb, 0] = v_T1_new
+                            v_T[indb, 1] = v_T2_new
+                            if cov_model_T1 is not None:
+                                kernel_T1.update(indb, v_T1_new)
+                            if cov_model_T2 is not None:
+                                kernel_T2.update(indb, v_T2_new)
 
                 if not stop_mh:
                     hd_ok = flag_value(v_T[:, 0], v_T[:, 1]) == v
@@ -1101,7 +1668,7 @@ def pluriGaussianSim(
                         sim_T1 = multiGaussian.multiGaussianRun(
                                 cov_model_T1, dimension, spacing, origin, x=x, v=v_T[:, 0],
                                 mode='simulation', algo=algo_T1, output_mode='array',
-                                **params_T1, nreal=1)
+                                **params_T1, nreal=1, rng=rngs[ireal])
                     except:
                         sim_ok = False
                         if verbose > 2:
@@ -1121,7 +1688,7 @@ def pluriGaussianSim(
                         sim_T2 = multiGaussian.multiGaussianRun(
                                 cov_model_T2, dimension, spacing, origin, x=x, v=v_T[:, 1],
                                 mode='simulation', algo=algo_T2, output_mode='array',
-                                **params_T2, nreal=1)
+                                **params_T2, nreal=1, rng=rngs[ireal])
                     except:
                         sim_ok = False
                         if verbose > 2:
@@ -1163,3 +1730,100 @@ def pluriGaussianSim(
     else:
         return Z
 # ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def pluriGaussianSim_mp(
+        cov_model_T1, cov_model_T2, flag_value,
+        dimension, spacing=None, origin=None,
+        x=None, v=None,
+        algo_T1='fft', params_T1={},
+        algo_T2='fft', params_T2={},
+        flag_lookup=None,
+        accept_init=0.25, accept_pow=2.0,
+        mh_iter_min=100, mh_iter_max=200, mh_block_size=1,
+        ntry_max=1,
+        retrieve_real_anyway=False,
+        nreal=1,
+        rng=None,
+        full_output=True,
+        verbose=1,
+        dtype_Z='int8',
+        nproc=-1):
+    """
+    Computes the same as the function :func:`pgs.pluriGaussianSim`, using multiprocessing.
+
+    All the parameters except `dtype_Z` and `nproc` are the same as those of
+    the function :func:`pgs.pluriGaussianSim`.
+
+    The number of processes used (in parallel) is n, and determined by the
+    parameter `nproc` (int, optional) as follows:
+
+    - if `nproc > 0`: n = `nproc`,
+    - if `nproc <= 0`: n = max(nmax+`nproc`, 1), where nmax is the total \
+    number of cpu(s) of the system (retrieved by :func:`config.cpu_count`), \
+    i.e. all cpus except `-nproc` is used (but at least one)
+
+    The arrays given in argument (data, arrays in the dictionaries of
+    parameters, ...) are put in shared memory and used (read only) by the n
+    parallel processes. The set of realizations (specified by `nreal`) is
+    distributed in a balanced way over the processes;
+    each process generates T1 and T2 for its block of realizations (one realization at a time in the conditional case, with its own Metropolis-Hasting conditioning), and
+    writes the realizations of Z (and T1, T2) directly in shared output arrays
+    (copied in the returned arrays). The array of the realizations of Z is of
+    type `dtype_Z` (str or numpy.dtype, default: 'int8'), which reduces the
+    memory used for categorical variables (an error is raised if the flag
+    values cannot be represented with this type). Note that `flag_value` must
+    be picklable (e.g. a function defined at the top level of a module, or an
+    instance of :class:`FlagLookup`).
+
+    Note that, if `nreal` < n, then n is reduced to `nreal`.
+
+    Each realization is generated with its own stream (see parameter `rng`),
+    hence the result is the same as the one of the function :func:`pgs.pluriGaussianSim`
+    with the same `rng` (except the type of the array of Z), whatever the
+    number of processes; if `rng` is `None` (default) or a
+    :class:`numpy.random.RandomState`, a seed is first drawn from it (see
+    function :func:`randomStream.seed_from_rng`) and used as `rng`.
+
+    See function :func:`pgs.pluriGaussianSim` for details.
+    """
+    fname = 'pluriGaussianSim_mp'
+
+    kwargs = dict(
+            cov_model_T1=cov_model_T1,
+            cov_model_T2=cov_model_T2,
+            flag_value=flag_value,
+            dimension=dimension,
+            spacing=spacing,
+            origin=origin,
+            x=x,
+            v=v,
+            algo_T1=algo_T1,
+            params_T1=params_T1,
+            algo_T2=algo_T2,
+            params_T2=params_T2,
+            flag_lookup=flag_lookup,
+            accept_init=accept_init,
+            accept_pow=accept_pow,
+            mh_iter_min=mh_iter_min,
+            mh_iter_max=mh_iter_max,
+            mh_block_size=mh_block_size,
+            ntry_max=ntry_max,
+            retrieve_real_anyway=retrieve_real_anyway
+            )
+
+    # Number of realization(s)
+    nreal = int(nreal) # cast to int if needed
+
+    if nreal <= 0:
+        return pluriGaussianSim(**kwargs, nreal=nreal, rng=rng, full_output=full_output, verbose=verbose)
+
+    # Random number generator: the streams of the realizations are spawned
+    # (legacy random state cannot be shared between processes)
+    if randomStream.is_legacy(rng):
+        rng = randomStream.seed_from_rng(rng)
+
+    return _pgs_mp(
+            pluriGaussianSim, kwargs, dimension, dtype_Z,
+            nreal, rng, full_output, nproc, fname, verbose)
+# ----------------------------------------------------------------------------
@@ -13,6 +13,9 @@ Module for miscellaneous algorithms based on random processes.
 
 import numpy as np
 import scipy
+from geone import img
+from geone import parallel
+from geone import randomStream
 
 # ============================================================================
 class RandProcessError(Exception):
@@ -22,12 +25,56 @@ class RandProcessError(Exception):
     pass
 # ============================================================================
 
+# Maximal number of candidates proposed at once in function
+# `acceptRejectSampler` (with oversampling), and default number of candidates
+# per chunk for evaluating the target density in a pool
+_accept_reject_batch_size_max = 2**20
+_accept_reject_chunk_size = 1024
+
+# ----------------------------------------------------------------------------
+def _accept_reject_f_eval(f, x, pool, chunk_size):
+    """
+    Evaluates a function at given points, by chunks in a pool (if given).
+
+    Parameters
+    ----------
+    f : function (`callable`)
+        function to be evaluated (see function :func:`acceptRejectSampler`)
+    x : nd-array
+        points, `x[i]` is the i-th point
+    pool : pool of workers, or `None`
+        object with a method `map` (see function :func:`acceptRejectSampler`);
+        if `None`: `f(x)` is returned
+    chunk_size : int, or `None`
+        number of points per chunk (if `None`, `_accept_reject_chunk_size`
+        is used)
+
+    Returns
+    -------
+    fx : 1d-array
+        value of `f` at each point
+    """
+    # fname = '_accept_reject_f_eval'
+
+    if pool is None:
+        return f(x)
+
+    if chunk_size is None:
+        chunk_size = _accept_reject_chunk_size
+
+    chunks = [x[i:i+chunk_size] for i in range(0, len(x), chunk_size)]
+    return np.hstack([np.asarray(fx).reshape(-1) for fx in pool.map(f, chunks)])
+# ----------------------------------------------------------------------------
+
 # ----------------------------------------------------------------------------
 def acceptRejectSampler(
         n, xmin, xmax, f,
         c=None, g=None, g_rvs=None,
         return_accept_ratio=False,
         max_trial=None,
+        oversampling=None,
+        pool=None, chunk_size=None,
+        rng=None,
         verbose=0, show_progress=None,
         opt_kwargs=None):
     """
@@ -101,6 +148,45 @@ def acceptRejectSampler(
     return_accept_ratio : bool, default: False
         indicates if the acceptance ratio is returned
 
+    max_trial : int, optional
+        maximal number of points drawn in the instrumental distribution;
+        by default (`None`): unlimited
+
+    oversampling : float, optional
+        factor used to set the number of candidates (points drawn in the
+        instrumental distribution) at each round: if m points are still
+        needed and `t` is the acceptance ratio of the previous rounds, then
+        `oversampling * m / t` candidates are drawn (doubled at each round as
+        long as no point has been accepted), at most `2**20` (or m if greater);
+        the accepted points exceeding the number needed are discarded, and
+        `max_trial` is never exceeded;
+        by default (`None`): exactly m candidates are drawn at each round (as
+        in previous versions, so that a given seed gives the same sample);
+        note: setting `oversampling` (e.g. `1.1`) reduces the number of rounds
+        (faster for low acceptance ratio), but changes the sample obtained
+        with a given seed
+
+    pool : pool of workers, optional
+        object with a method `map(func, iterable)`, e.g. a
+        :class:`concurrent.futures.ThreadPoolExecutor`, a
+        :class:`concurrent.futures.ProcessPoolExecutor` or a
+        :class:`multiprocessing.pool.Pool`, used to evaluate the function `f`
+        over chunks of candidates in parallel (useful for expensive target
+        density); note that with a pool of processes, `f` must be picklable
+        (e.g. not a lambda function);
+        by default (`None`): `f` is evaluated at all the candidates of a round
+        at once, in the current process
+
+    chunk_size : int, optional
+        number of candidates per chunk, used if `pool` is given;
+        by default (`None`): 1024
+
+    rng : int, or :class:`numpy.random.SeedSequence`, or :class:`numpy.random.Generator`, optional
+        random number generator specification (see module :mod:`randomStream`),
+        used for the uniform draws (and for the default instrumental
+        distribution, see `g_rvs`);
+        by default (`None`): the global random state of `numpy.random` is used
+
     verbose : int, default: 0
         verbose mode, higher implies more printing (info)
 
@@ -127,8 +213,9 @@ def acceptRejectSampler(
 
     t : float, optional
         acceptance ratio, returned if `return_accept_ratio=True`, i.e.
-        `t = n/ntot` where `ntot` is the number of points draws in the
-        instrumental distribution
+        `t = nacc/ntot` where `nacc` is the number of accepted points (including
+        the ones discarded, see `oversampling`) and `ntot` is the number of
+        points drawn in the instrumental distribution
     """
     fname = 'acceptRejectSampler'
 
@@ -154,6 +241,12 @@ def acceptRejectSampler(
     else:
         dom_finite = True
 
+    try:
+        rng = randomStream.rng_stream(rng)
+    except Exception as exc:
+        err_msg = f'{fname}: `rng` invalid'
+        raise RandProcessError(err_msg) from exc
+
     if n <= 0:
         x = np.zeros((n, dim))
         if dim == 1:
@@ -178,10 +271,18 @@ def acceptRejectSampler(
         # g_rvs
         if dim == 1:
             def g_rvs(size=1):
-                return xmin[0] + scipy.stats.uniform.rvs(size=size) * lx[0]
+                return xmin[0] + scipy.stats.uniform.rvs(size=size, random_state=rng) * lx[0]
         else:
             def g_rvs(size=1):
-                return xmin + scipy.stats.uniform.rvs(size=(size,dim)) * lx
+                return xmin + scipy.stats.uniform.rvs(size=(size,dim), random_state=rng) * lx
+
+    if oversampling is not None and oversampling <= 0:
+        err_msg = f'{fname}: `oversampling` invalid (must be positive)'
+        raise RandProcessError(err_msg)
+
+    if chunk_size is not None and chunk_size < 1:
+        err_msg = f'{fname}: `chunk_size` invalid (must be positive)'
+        raise RandProcessError(err_msg)
 
     if c is None:
         if not dom_finite:
@@ -203,16 +304,30 @@ def acceptRejectSampler(
         c = -res.fun + 1.e-3 # add small number to ensure the inequality
 
     # Apply accept-reject algo
-    naccept = 0
+    # The number of candidates drawn at each round is adapted according to the
+    # acceptance ratio of the previous rounds (see `oversampling`), and the
+    # accepted points are stored in a preallocated array
+    naccept = 0     # number of accepted points (kept)
+    naccept_tot = 0 # number of accepted points (including the ones discarded)
     ntot = 0
-    x = []
+    nprop = 0
+    x = None
     if max_trial is None:
         max_trial = np.inf
     if verbose > 1:
         progress = 0
         progressOld = -1
-    while naccept < n:
+    while naccept < n and ntot < max_trial:
+        # Number of candidates
         nn = n - naccept
+        if oversampling is not None:
+            if naccept_tot > 0:
+                nn = int(np.ceil(oversampling * nn * ntot / naccept_tot))
+            elif nprop > 0:
+                nn = 2 * nprop
+            nn = min(nn, max(_accept_reject_batch_size_max, n - naccept))
+            nn = int(min(nn, max_trial - ntot))
+        nprop = nn
         ntot = ntot+nn
         xnew = g_rvs(size=nn)
         ind = np.all((xnew >= xmin, xnew < xmax), axis=0)
@@ -222,36 +337,43 @@ def acceptRejectSampler(
         nn = len(xnew)
         if nn == 0:
             continue
-        u = np.random.random(size=nn)
-        xnew = xnew[u < (f(xnew)/(c*g(xnew))).reshape(nn)]
+        u = rng.random(size=nn)
+        fx = _accept_reject_f_eval(f, xnew, pool, chunk_size)
+        xnew = xnew[u < (fx/(c*g(xnew))).reshape(nn)]
         nn = len(xnew)
         if nn == 0:
             continue
-        x.extend(xnew)
+        naccept_tot = naccept_tot+nn
+        nn = min(nn, n - naccept)
+        if x is None:
+            x = np.empty((n, ) + xnew.shape[1:], dtype=xnew.dtype)
+        x[naccept:naccept+nn] = xnew[:nn]
         naccept = naccept+nn
         if verbose > 1:
             progress = int(100*naccept/n)
             if progress > progressOld:
                 print(f'A-R algo, progress: {progress:3d} %')
                 progressOld = progress
-        if ntot >= max_trial:
-            ok = False
-            break
 
-    x = np.asarray(x)
+    if x is None:
+        x = np.zeros((0, dim))
+        if dim == 1:
+            x = x.reshape(-1)
+    else:
+        x = x[:naccept]
 
     if naccept < n and verbose > 0:
         print(f'{fname}: WARNING: sample size is only {naccept}! (increase `max_trial`)')
 
     if return_accept_ratio:
-        accept_ratio = naccept/ntot
+        accept_ratio = naccept_tot/ntot
         return x, accept_ratio
     else:
         return x
 # ----------------------------------------------------------------------------
 
 # ----------------------------------------------------------------------------
-def poissonPointProcess(mu, xmin=0.0, xmax=1.0, ninterval=None):
+def poissonPointProcess(mu, xmin=0.0, xmax=1.0, ninterval=None, rng=None):
     """
     Generates random points following a Poisson point process.
 
@@ -283,6 +405,11 @@ def poissonPointProcess(mu, xmin=0.0, xmax=1.0, ninterval=None):
         `ninterval` contains the number of interval(s) in which the domain
         `[xmin, xmax[` is subdivided along each axis
 
+    rng : int, or :class:`numpy.random.SeedSequence`, or :class:`numpy.random.Generator`, optional
+        random number generator specification (see module :mod:`randomStream`),
+        used for all the random draws;
+        by default (`None`): the global random state of `numpy.random` is used
+
     Returns
     -------
     pts : 2D array of shape (npts, m)
@@ -292,6 +419,12 @@ def poissonPointProcess(mu, xmin=0.0, xmax=1.0, ninterval=None):
     """
     fname = 'poissonPointProcess'
 
+    try:
+        rng = randomStream.rng_stream(rng)
+    except Exception as exc:
+        err_msg = f'{fname}: `rng` invalid'
+        raise RandProcessError(err_msg) from exc
+
     xmin = np.atleast_1d(xmin)
     xmax = np.atleast_1d(xmax)
 
@@ -354,23 +487,201 @@ def poissonPointProcess(mu, xmin=0.0, xmax=1.0, ninterval=None):
         mu_cell = mu.reshape(-1) * vol_cell
 
     # Generate number of points in each grid cell (Poisson)
-    npts_cell = np.array([scipy.stats.poisson.rvs(m) for m in mu_cell])
+    npts_cell = np.array([scipy.stats.poisson.rvs(m, random_state=rng) for m in mu_cell])
 
     # Generate random points (uniformly) in each cell
     pts = np.array([np.hstack(
-            [a + spa[i] * (np.random.random(size=npts) - 0.5) for a, npts in zip(xx_cell_center[:,i], npts_cell)]
+            [a + spa[i] * (rng.random(size=npts) - 0.5) for a, npts in zip(xx_cell_center[:,i], npts_cell)]
         ) for i in range(dim)]).T
 
     return pts
 # ----------------------------------------------------------------------------
 
+# ----------------------------------------------------------------------------
+def poissonPointProcessImg(im, iv=0, nreal=1, rng=None, output_mode='pointset', verbose=0):
+    """
+    Generates random points following a Poisson point process, with intensity given by an image.
+
+    The intensity is given by the variable of index `iv` of the image `im`
+    (:class:`img.Img`), i.e. `im.val[iv, iz, iy, ix]` is the mean number of
+    points per unitary volume in the grid cell of index (ix, iy, iz), whose
+    volume is `im.sx*im.sy*im.sz` (the intensity is constant in each cell);
+    a value `numpy.nan` is considered as a zero intensity.
+
+    For each realization, the number of points in each cell is drawn
+    (vectorized, Poisson law), then all the points are placed uniformly in
+    their cell with a single uniform draw (no array of cell centers is built).
+
+    Parameters
+    ----------
+    im : :class:`img.Img`
+        image, the variable of index `iv` gives the intensity
+
+    iv : int, default: 0
+        index of the variable of `im` giving the intensity
+
+    nreal : int, default: 1
+        number of realization(s)
+
+    rng : int, or :class:`numpy.random.SeedSequence`, or :class:`numpy.random.Generator`, or sequence, optional
+        random number generator specification (see module :mod:`randomStream`);
+        by default (`None`): the global random state of `numpy.random` is used;
+        otherwise, each realization is generated with its own independent
+        stream spawned from `rng`
+
+    output_mode : str {'pointset', 'array'}, default: 'pointset'
+        defines the type of output:
+
+        - 'pointset': list of :class:`img.PointSet` (with the variables 'X', \
+        'Y', 'Z')
+        - 'array': list of 2D arrays of shape (npts, 3), each row being \
+        the coordinates (x, y, z) of a point
+
+    verbose : int, default: 0
+        verbose mode, higher implies more printing (info)
+
+    Returns
+    -------
+    pts : list
+        `pts[i]` is the i-th realization (see `output_mode`), the number of
+        points (npts) in each realization follows a Poisson law of mean the
+        sum of the intensity times the cell volume over all cells
+    """
+    fname = 'poissonPointProcessImg'
+
+    if output_mode not in ('pointset', 'array'):
+        err_msg = f"{fname}: unknown `output_mode` ('pointset' or 'array' expected)"
+        raise RandProcessError(err_msg)
+
+    if iv < 0:
+        iv = im.nv + iv
+
+    if iv < 0 or iv >= im.nv:
+        err_msg = f'{fname}: invalid `iv` index'
+        raise RandProcessError(err_msg)
+
+    # Number of realization(s)
+    nreal = int(nreal) # cast to int if needed
+
+    if nreal <= 0:
+        if verbose > 0:
+            print(f'{fname}: WARNING: `nreal` <= 0: empty list is returned')
+        return []
+
+    # Random number generator (stream) for each realization
+    try:
+        rngs = randomStream.rng_streams(rng, nreal)
+    except Exception as exc:
+        err_msg = f'{fname}: `rng` invalid'
+        raise RandProcessError(err_msg) from exc
+
+    # Poisson parameter (intensity times cell volume), for the cells of
+    # positive intensity only
+    mu = im.val[iv].reshape(-1)
+    if np.any(mu < 0):
+        err_msg = f'{fname}: negative intensity'
+        raise RandProcessError(err_msg)
+
+    cell_ind = np.where(mu > 0)[0] # note: nan values are excluded
+    mu_cell = mu[cell_ind] * (im.sx*im.sy*im.sz)
+
+    o = np.array([im.ox, im.oy, im.oz])
+    s = np.array([im.sx, im.sy, im.sz])
+
+    pts = []
+    for k in range(nreal):
+        # Generate number of points in each grid cell (Poisson), and index of the cell of each point
+        ind = np.repeat(cell_ind, rngs[k].poisson(mu_cell))
+        # Generate random points (uniformly) in their cell
+        ix = ind % im.nx
+        iy = (ind // im.nx) % im.ny
+        iz = ind // (im.nx*im.ny)
+        x = (np.array([ix, iy, iz]).T + rngs[k].random(size=(len(ind), 3))) * s + o
+        if output_mode == 'pointset':
+            x = img.PointSet(npt=x.shape[0], nv=3, val=x.T, varname=['X', 'Y', 'Z'])
+        pts.append(x)
+
+    return pts
+# ----------------------------------------------------------------------------
+
+# Maximal number of values (grid cells x hyper-planes) computed at once in the
+# functions `chentsov1D`, `chentsov2D`, `chentsov3D` (default chunk size)
+_chentsov_block_size = 2**20
+
+# ----------------------------------------------------------------------------
+def _chentsov_chunk_size(chunk_size, ncell, fname):
+    """
+    Checks and sets the number of hyper-planes processed at once.
+    """
+    # fname = '_chentsov_chunk_size'
+
+    if chunk_size is None:
+        return max(1, _chentsov_block_size // ncell)
+
+    try:
+        chunk_size = int(chunk_size)
+    except:
+        err_msg = f'{fname}: `chunk_size` invalid'
+        raise RandProcessError(err_msg)
+
+    if chunk_size < 1:
+        err_msg = f'{fname}: `chunk_size` invalid (must be positive)'
+        raise RandProcessError(err_msg)
+
+    return chunk_size
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _chentsov_sum(xc, direction, p, random_sign, chunk_size):
+    """
+    Sums the values of hyper-planes at given points (Chentsov's simulation).
+
+    The hyper-planes are processed by chunks: the orthogonal projections of
+    all the points onto the directions of a chunk of hyper-planes are
+    computed by one matrix product, and the signs are summed by a
+    matrix-vector product.
+
+    Parameters
+    ----------
+    xc : 2d-array of shape (ncell, dim)
+        points (centers of the grid cells), relatively to the direction origin
+    direction : 2d-array of shape (nh, dim)
+        direction (unit vector) of each hyper-plane
+    p : 1d-array of shape (nh, )
+        orthogonal projection (onto the direction) defining each hyper-plane
+    random_sign : 1d-array of shape (nh, )
+        sign (+1 or -1) of each hyper-plane
+    chunk_size : int
+        number of hyper-planes processed at once
+
+    Returns
+    -------
+    z : 1d-array of shape (ncell, )
+        sum of the values of the hyper-planes:
+        `z[j] = sum_i (sign(dot(xc[j], direction[i]) - p[i]) + sign(p[i])) * random_sign[i]`
+    """
+    # fname = '_chentsov_sum'
+
+    random_sign = np.asarray(random_sign, dtype='float')
+    z = np.full(xc.shape[0], np.sum(np.sign(p)*random_sign))
+    for i0 in range(0, len(p), chunk_size):
+        i1 = min(i0 + chunk_size, len(p))
+        proj = xc.dot(direction[i0:i1].T) # shape: ncell x (i1-i0)
+        proj -= p[i0:i1]
+        z += np.sign(proj, out=proj).dot(random_sign[i0:i1])
+
+    return z
+# ----------------------------------------------------------------------------
+
 # ----------------------------------------------------------------------------
 def chentsov1D(
         n_mean,
         dimension, spacing=1.0, origin=0.0,
         direction_origin=None,
         p_min=None, p_max=None,
+        chunk_size=None,
         nreal=1,
+        rng=None,
         verbose=0):
     """
     Generates a Chentsov's simulation in 1D.
@@ -440,9 +751,23 @@ def chentsov1D(
         by default (`None`): `p_max` is set automatically to "plus half of the
         length of the 1D simulation domain
 
+    chunk_size : int, optional
+        number of hyper-planes processed at once: the values of a chunk of
+        hyper-planes over the grid are computed by one matrix product, using
+        an amount of memory proportional to `chunk_size` times the number of
+        grid cells;
+        by default (`None`): `chunk_size` is set such that at most `2**20`
+        values are computed at once
+
     nreal : int, default: 1
         number of realization(s)
 
+    rng : int, or :class:`numpy.random.SeedSequence`, or :class:`numpy.random.Generator`, or sequence, optional
+        random number generator specification (see module :mod:`randomStream`);
+        by default (`None`): the global random state of `numpy.random` is used;
+        otherwise, each realization is generated with its own independent
+        stream spawned from `rng`
+
     verbose : int, default: 0
         verbose mode, higher implies more printing (info)
 
@@ -466,6 +791,13 @@ def chentsov1D(
             print(f'{fname}: WARNING: `nreal` <= 0: `None`, `None` is returned')
         return None, None
 
+    # Random number generator (stream) for each realization
+    try:
+        rngs = randomStream.rng_streams(rng, nreal)
+    except Exception as exc:
+        err_msg = f'{fname}: `rng` invalid'
+        raise RandProcessError(err_msg) from exc
+
     nx = dimension
     dx = spacing
     ox = origin
@@ -484,8 +816,11 @@ def chentsov1D(
         err_msg = f'{fname}: `p_min` is greater than or equal to `p_max`'
         raise RandProcessError(err_msg)
 
-    # center of each grid cell of the simulation domain
+    # center of each grid cell of the simulation domain (relatively to direction_origin)
     xc = ox + (0.5 + np.arange(nx)) * dx
+    xc = (xc - direction_origin)[:, np.newaxis] # shape: ncell x 1
+
+    chunk_size = _chentsov_chunk_size(chunk_size, nx, fname)
 
     # Volume of [p_min, p_max]
     vol_poisson_domain = (p_max - p_min)
@@ -500,7 +835,7 @@ def chentsov1D(
     for k in range(nreal):
         # Draw points via Poisson process
         try:
-            pts = poissonPointProcess(mu, p_min, p_max)
+            pts = poissonPointProcess(mu, p_min, p_max, rng=rngs[k])
         except Exception as exc:
             err_msg = f'{fname}: Poisson point process failed'
             raise RandProcessError(err_msg) from exc
@@ -508,9 +843,8 @@ def chentsov1D(
         n[k] = pts.shape[0]
 
         # Defines values of Z in each grid cell
-        random_sign = (-1)**np.random.randint(2, size=n[k])
-        for i in range(n[k]):
-            z[k] = z[k] + (np.sign((xc-direction_origin)-pts[i])+np.sign(pts[i]))*random_sign[i]
+        random_sign = rngs[k].choice([1, -1], size=n[k]) # i.e. (-1)**randint(2)
+        z[k] = _chentsov_sum(xc, np.ones((n[k], 1)), pts[:, 0], random_sign, chunk_size)
 
     z = 0.5*z
 
@@ -524,7 +858,9 @@ def chentsov2D(
         direction_origin=None,
         phi_min=0.0, phi_max=np.pi,
         p_min=None, p_max=None,
+        chunk_size=None,
         nreal=1,
+        rng=None,
         verbose=0):
     """
     Generates a Chentsov's simulation in 2D.
@@ -618,9 +954,23 @@ def chentsov2D(
         by default (`None`): `p_min` is set automatically to "plus half of the
         diagonal of the 2D simulation domain"
 
+    chunk_size : int, optional
+        number of hyper-planes processed at once: the values of a chunk of
+        hyper-planes over the grid are computed by one matrix product, using
+        an amount of memory proportional to `chunk_size` times the number of
+        grid cells;
+        by default (`None`): `chunk_size` is set such that at most `2**20`
+        values are computed at once
+
     nreal : int, default: 1
         number of realization(s)
 
+    rng : int, or :class:`numpy.random.SeedSequence`, or :class:`numpy.random.Generator`, or sequence, optional
+        random number generator specification (see module :mod:`randomStream`);
+        by default (`None`): the global random state of `numpy.random` is used;
+        otherwise, each realization is generated with its own independent
+        stream spawned from `rng`
+
     verbose : int, default: 0
         verbose mode, higher implies more printing (info)
 
@@ -645,6 +995,13 @@ def chentsov2D(
             print(f'{fname}: WARNING: `nreal` <= 0: `None`, `None` is returned')
         return None, None
 
+    # Random number generator (stream) for each realization
+    try:
+        rngs = randomStream.rng_streams(rng, nreal)
+    except Exception as exc:
+        err_msg = f'{fname}: `rng` invalid'
+        raise RandProcessError(err_msg) from exc
+
     nx, ny = dimension
     dx, dy = spacing
     ox, oy = origin
@@ -670,6 +1027,9 @@ def chentsov2D(
     # center of each grid cell of the simulation domain
     yc, xc = np.meshgrid(oy + (0.5 + np.arange(ny)) * dy, ox + (0.5 + np.arange(nx)) * dx, indexing='ij')
     xyc = np.array([xc.reshape(-1), yc.reshape(-1)]).T # shape: ncell x 2
+    xyc = xyc - direction_origin # relatively to direction_origin
+
+    chunk_size = _chentsov_chunk_size(chunk_size, nx*ny, fname)
 
     # Volume of S x [p_min, p_max], (S being parametrized by phi in [phi_min, phi_max])
     vol_poisson_domain = (phi_max - phi_min) * (p_max - p_min)
@@ -691,7 +1051,7 @@ def chentsov2D(
     for k in range(nreal):
         # Draw points via Poisson process
         try:
-            pts = poissonPointProcess(mu, [phi_min, p_min], [phi_max, p_max])
+            pts = poissonPointProcess(mu, [phi_min, p_min], [phi_max, p_max], rng=rngs[k])
         except Exception as exc:
             err_msg = f'{fname}: Poisson point process failed'
             raise RandProcessError(err_msg) from exc
@@ -699,19 +1059,10 @@ def chentsov2D(
         n[k] = pts.shape[0]
 
         # Defines values of Z in each grid cell
-        random_sign = (-1)**np.random.randint(2, size=n[k])
-        # Equivalent method below (4/ is better!)
-        # 1/
-        # vp = np.sum([np.sign((xyc-direction_origin).dot(np.array([np.cos(a), np.sin(a)]))-p)*rs for a, p, rs in zip(pts[:,0], pts[:,1], random_sign)], axis=0)
-        # v0 = np.sum([np.sign(-p)*rs for p, rs in zip(pts[:,1], random_sign)])
-        # z = 0.5 *(vp - v0)
-        # 2/
-        # z = 0.5*np.sum([(np.sign((xyc-direction_origin).dot(np.array([np.cos(a), np.sin(a)]))-p)+np.sign(p))*rs for a, p, rs in zip(pts[:,0], pts[:,1], random_sign)], axis=0)
-        # 3/
-        # z = 0.5*np.sum([(np.sign((xyc-direction_origin).dot(np.array([np.cos(pts[i,0]), np.sin(pts[i,0])]))-pts[i,1])+np.sign(pts[i,1]))*random_sign[i] for i in range(n[k])], axis=0)
-        # 4/
-        for i in range(n[k]):
-            z[k] = z[k] + (np.sign((xyc-direction_origin).dot(np.array([np.cos(pts[i,0]), np.sin(pts[i,0])]))-pts[i,1])+np.sign(pts[i,1]))*random_sign[i]
+        random_sign = rngs[k].choice([1, -1], size=n[k]) # i.e. (-1)**randint(2)
+        # Lines processed by chunks (see function `_chentsov_sum`)
+        direction = np.array([np.cos(pts[:,0]), np.sin(pts[:,0])]).T
+        z[k] = _chentsov_sum(xyc, direction, pts[:,1], random_sign, chunk_size)
 
     z = 0.5*z
 
@@ -727,7 +1078,9 @@ def chentsov3D(
         theta_min=0.0, theta_max=0.5*np.pi,
         p_min=None, p_max=None,
         ninterval_theta=100,
+        chunk_size=None,
         nreal=1,
+        rng=None,
         verbose=0):
     """
     Generates a Chentsov's simulation in 3D.
@@ -845,9 +1198,23 @@ def chentsov3D(
         number of sub-intervals in which the interval `[theta_min, theta_max]`
         is subdivided for applying the Poisson process
 
+    chunk_size : int, optional
+        number of hyper-planes processed at once: the values of a chunk of
+        hyper-planes over the grid are computed by one matrix product, using
+        an amount of memory proportional to `chunk_size` times the number of
+        grid cells;
+        by default (`None`): `chunk_size` is set such that at most `2**20`
+        values are computed at once
+
     nreal : int, default: 1
         number of realization(s)
 
+    rng : int, or :class:`numpy.random.SeedSequence`, or :class:`numpy.random.Generator`, or sequence, optional
+        random number generator specification (see module :mod:`randomStream`);
+        by default (`None`): the global random state of `numpy.random` is used;
+        otherwise, each realization is generated with its own independent
+        stream spawned from `rng`
+
     verbose : int, default: 0
         verbose mode, higher implies more printing (info)
 
@@ -872,6 +1239,13 @@ def chentsov3D(
             print(f'{fname}: WARNING: `nreal` <= 0: `None`, `None` is returned')
         return None, None
 
+    # Random number generator (stream) for each realization
+    try:
+        rngs = randomStream.rng_streams(rng, nreal)
+    except Exception as exc:
+        err_msg = f'{fname}: `rng` invalid'
+        raise RandProcessError(err_msg) from exc
+
     nx, ny, nz = dimension
     dx, dy, dz = spacing
     ox, oy, oz = origin
@@ -901,6 +1275,9 @@ def chentsov3D(
     # center of each grid cell of the simulation domain
     zc, yc, xc = np.meshgrid(oz + (0.5 + np.arange(nz)) * dz, oy + (0.5 + np.arange(ny)) * dy, ox + (0.5 + np.arange(nx)) * dx, indexing='ij')
     xyzc = np.array([xc.reshape(-1), yc.reshape(-1), zc.reshape(-1)]).T # shape: ncell x 3
+    xyzc = xyzc - direction_origin # relatively to direction_origin
+
+    chunk_size = _chentsov_chunk_size(chunk_size, nx*ny*nz, fname)
 
     # Volume of S x [p_min, p_max], (S being parametrized by phi in [phi_min, phi_max], and theta in [theta_min, theta_max])
     vol_poisson_domain = (phi_max - phi_min) * (np.sin(theta_max) - np.sin(theta_min)) * (p_max - p_min)
@@ -916,7 +1293,7 @@ def chentsov3D(
     for k in range(nreal):
         # Draw points via Poisson process
         try:
-            pts = poissonPointProcess(mu, [phi_min, theta_min, p_min], [phi_max, theta_max, p_max], ninterval=[1, ninterval_theta, 1])
+            pts = poissonPointProcess(mu, [phi_min, theta_min, p_min], [phi_max, theta_max, p_max], ninterval=[1, ninterval_theta, 1], rng=rngs[k])
         except Exception as exc:
             err_msg = f'{fname}: Poisson point process failed'
             raise RandProcessError(err_msg) from exc
@@ -924,15 +1301,364 @@ def chentsov3D(
         n[k] = pts.shape[0]
 
         # Defines values of Z in each grid cell
-        random_sign = (-1)**np.random.randint(2, size=n[k])
-        # 4/
-        for i in range(n[k]):
-            z[k] = z[k] + (np.sign((xyzc-direction_origin).dot(np.array([np.cos(pts[i,0])*np.cos(pts[i,1]), np.sin(pts[i,0])*np.cos(pts[i,1]), np.sin(pts[i,1])]))-pts[i,2])+np.sign(pts[i,2]))*random_sign[i]
+        random_sign = rngs[k].choice([1, -1], size=n[k]) # i.e. (-1)**randint(2)
+        # Planes processed by chunks (see function `_chentsov_sum`)
+        direction = np.array([np.cos(pts[:,0])*np.cos(pts[:,1]), np.sin(pts[:,0])*np.cos(pts[:,1]), np.sin(pts[:,1])]).T
+        z[k] = _chentsov_sum(xyzc, direction, pts[:,2], random_sign, chunk_size)
+
     z = 0.5*z
 
     return z.reshape(nreal, nz, ny, nx), n
 # ----------------------------------------------------------------------------
 
+# ============================================================================
+# Tools for generating Chentsov's simulations using multiprocessing
+# ============================================================================
+
+# ----------------------------------------------------------------------------
+def _chentsov_mp_worker(chentsov_func, kwargs, ireal, rng, z_desc):
+    """
+    Generates one Chentsov's simulation in a process (worker).
+
+    Parameters
+    ----------
+    chentsov_func : function
+        function :func:`chentsov1D`, :func:`chentsov2D` or :func:`chentsov3D`
+    kwargs : dict
+        keyword arguments for `chentsov_func` (except `nreal`, `rng`,
+        `verbose`)
+    ireal : int
+        index of the realization
+    rng : :class:`numpy.random.SeedSequence`
+        seed sequence of the realization
+    z_desc : tuple
+        description of the shared output array, of shape (nreal, ) + grid
+        shape (see function :func:`parallel._output_array_create`)
+
+    Returns
+    -------
+    n : int
+        number of hyper-planes drawn
+    """
+    # fname = '_chentsov_mp_worker'
+
+    shm_list = []
+    try:
+        z_real, n_real = chentsov_func(**kwargs, nreal=1, rng=[rng], verbose=0)
+        z = parallel._output_array_attach(z_desc, shm_list)
+        z[ireal] = z_real[0]
+        return n_real[0]
+
+    finally:
+        # Release references to shared memory before closing
+        z = None
+        for shm in shm_list:
+            shm.close()
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _chentsov_mp(chentsov_func, kwargs, dimension, nreal, rng, nproc, fname, verbose):
+    """
+    Generates Chentsov's simulations using multiprocessing.
+
+    The realizations are distributed one by one over a pool of processes,
+    each realization being generated by `chentsov_func` (with `nreal=1`) with
+    its own stream spawned from `rng`, and written in a shared output array.
+
+    Parameters
+    ----------
+    chentsov_func : function
+        function :func:`chentsov1D`, :func:`chentsov2D` or :func:`chentsov3D`
+    kwargs : dict
+        keyword arguments for `chentsov_func` (except `nreal`, `rng`,
+        `verbose`)
+    dimension : int or sequence of ints
+        number of grid cells (see `chentsov_func`)
+    nreal : int
+        number of realizations
+    rng : int, or :class:`numpy.random.SeedSequence`, or :class:`numpy.random.Generator`, or sequence
+        random number generator specification (see module :mod:`randomStream`),
+        not legacy
+    nproc : int
+        number of processes (see e.g. function :func:`chentsov2D_mp`)
+    fname : str
+        name of the calling function (for displaying)
+    verbose : int
+        verbose mode
+
+    Returns
+    -------
+    sim : nd-array
+        simulations (see `chentsov_func`)
+    n : 1D array of shape (nreal,)
+        numbers of hyper-planes drawn (see `chentsov_func`)
+    """
+    # fname = '_chentsov_mp'
+
+    # Independent streams, one per realization
+    try:
+        ss = randomStream.spawn_seed_sequences(rng, nreal)
+    except Exception as exc:
+        err_msg = f'{fname}: `rng` invalid'
+        raise RandProcessError(err_msg) from exc
+
+    # Set number of processes
+    nproc = parallel.get_nproc(nproc, nreal)
+
+    if verbose > 1:
+        print(f'{fname}: running simulation on {nproc} processes...')
+
+    shape = (nreal, ) + tuple(np.atleast_1d(dimension)[::-1])
+
+    shm_list = []
+    try:
+        z_desc = parallel._output_array_create(None, shape, np.dtype('float64'), shm_list)
+
+        # Set pool of nproc workers, the realizations are distributed one by one
+        # (the time needed for a realization varies with the number of hyper-planes)
+        pool = parallel.get_pool(nproc)
+        out_pool = []
+        for ireal in range(nreal):
+            out_pool.append(pool.apply_async(_chentsov_mp_worker, args=(chentsov_func, kwargs, ireal, ss[ireal], z_desc)))
+
+        # Wait for the tasks and release the pool
+        parallel.release_pool(pool, out_pool)
+
+        # Check each process (an error occurred in a process is raised)
+        n = np.array([w.get() for w in out_pool], dtype='int')
+
+        z = parallel._shared_array_attach(z_desc, shm_list)
+        z = z.copy()
+
+    finally:
+        for shm in shm_list:
+            shm.close()
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    return z, n
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def chentsov1D_mp(
+        n_mean,
+        dimension, spacing=1.0, origin=0.0,
+        direction_origin=None,
+        p_min=None, p_max=None,
+        chunk_size=None,
+        nreal=1,
+        rng=None,
+        verbose=0,
+        nproc=-1):
+    """
+    Computes the same as the function :func:`chentsov1D`, using multiprocessing.
+
+    All the parameters except `nproc` are the same as those of the function
+    :func:`chentsov1D`.
+
+    The number of processes used (in parallel) is n, and determined by the
+    parameter `nproc` (int, optional) as follows:
+
+    - if `nproc > 0`: n = `nproc`,
+    - if `nproc <= 0`: n = max(nmax+`nproc`, 1), where nmax is the total \
+    number of cpu(s) of the system (retrieved by :func:`config.cpu_count`), \
+    i.e. all cpus except `-nproc` is used (but at least one)
+
+    The realizations (specified by `nreal`) are distributed one by one over
+    the processes, each process writing its realizations directly in a
+    shared output array (copied in the returned array).
+
+    Note that, if `nreal` < n, then n is reduced to `nreal`.
+
+    Each realization is generated by the function :func:`chentsov1D` (with
+    `nreal=1`) with its own stream (see parameter `rng`), hence the result is
+    the same as the one of the function :func:`chentsov1D` with the same `rng`,
+    whatever the number of processes; if `rng` is `None` (default) or a
+    :class:`numpy.random.RandomState`, a seed is first drawn from it (see
+    function :func:`randomStream.seed_from_rng`) and used as `rng`.
+
+    See function :func:`chentsov1D` for details.
+    """
+    fname = 'chentsov1D_mp'
+
+    kwargs = dict(
+            n_mean=n_mean,
+            dimension=dimension,
+            spacing=spacing,
+            origin=origin,
+            direction_origin=direction_origin,
+            p_min=p_min,
+            p_max=p_max,
+            chunk_size=chunk_size
+            )
+
+    # Number of realization(s)
+    nreal = int(nreal) # cast to int if needed
+
+    if nreal <= 0:
+        return chentsov1D(**kwargs, nreal=nreal, rng=rng, verbose=verbose)
+
+    # Random number generator: the streams of the realizations are spawned
+    # (legacy random state cannot be shared between processes)
+    if randomStream.is_legacy(rng):
+        rng = randomStream.seed_from_rng(rng)
+
+    return _chentsov_mp(
+            chentsov1D, kwargs, dimension,
+            nreal, rng, nproc, fname, verbose)
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def chentsov2D_mp(
+        n_mean,
+        dimension, spacing=(1.0, 1.0), origin=(0.0, 0.0),
+        direction_origin=None,
+        phi_min=0.0, phi_max=np.pi,
+        p_min=None, p_max=None,
+        chunk_size=None,
+        nreal=1,
+        rng=None,
+        verbose=0,
+        nproc=-1):
+    """
+    Computes the same as the function :func:`chentsov2D`, using multiprocessing.
+
+    All the parameters except `nproc` are the same as those of the function
+    :func:`chentsov2D`.
+
+    The number of processes used (in parallel) is n, and determined by the
+    parameter `nproc` (int, optional) as follows:
+
+    - if `nproc > 0`: n = `nproc`,
+    - if `nproc <= 0`: n = max(nmax+`nproc`, 1), where nmax is the total \
+    number of cpu(s) of the system (retrieved by :func:`config.cpu_count`), \
+    i.e. all cpus except `-nproc` is used (but at least one)
+
+    The realizations (specified by `nreal`) are distributed one by one over
+    the processes, each process writing its realizations directly in a
+    shared output array (copied in the returned array).
+
+    Note that, if `nreal` < n, then n is reduced to `nreal`.
+
+    Each realization is generated by the function :func:`chentsov2D` (with
+    `nreal=1`) with its own stream (see parameter `rng`), hence the result is
+    the same as the one of the function :func:`chentsov2D` with the same `rng`,
+    whatever the number of processes; if `rng` is `None` (default) or a
+    :class:`numpy.random.RandomState`, a seed is first drawn from it (see
+    function :func:`randomStream.seed_from_rng`) and used as `rng`.
+
+    See function :func:`chentsov2D` for details.
+    """
+    fname = 'chentsov2D_mp'
+
+    kwargs = dict(
+            n_mean=n_mean,
+            dimension=dimension,
+            spacing=spacing,
+            origin=origin,
+            direction_origin=direction_origin,
+            phi_min=phi_min,
+            phi_max=phi_max,
+            p_min=p_min,
+            p_max=p_max,
+            chunk_size=chunk_size
+            )
+
+    # Number of realization(s)
+    nreal = int(nreal) # cast to int if needed
+
+    if nreal <= 0:
+        return chentsov2D(**kwargs, nreal=nreal, rng=rng, verbose=verbose)
+
+    # Random number generator: the streams of the realizations are spawned
+    # (legacy random state cannot be shared between processes)
+    if randomStream.is_legacy(rng):
+        rng = randomStream.seed_from_rng(rng)
+
+    return _chentsov_mp(
+            chentsov2D, kwargs, dimension,
+            nreal, rng, nproc, fname, verbose)
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def chentsov3D_mp(
+        n_mean,
+        dimension, spacing=(1.0, 1.0, 1.0), origin=(0.0, 0.0, 0.0),
+        direction_origin=None,
+        phi_min=0.0, phi_max=2.0*np.pi,
+        theta_min=0.0, theta_max=0.5*np.pi,
+        p_min=None, p_max=None,
+        ninterval_theta=100,
+        chunk_size=None,
+        nreal=1,
+        rng=None,
+        verbose=0,
+        nproc=-1):
+    """
+    Computes the same as the function :func:`chentsov3D`, using multiprocessing.
+
+    All the parameters except `nproc` are the same as those of the function
+    :func:`chentsov3D`.
+
+    The number of processes used (in parallel) is n, and determined by the
+    parameter `nproc` (int, optional) as follows:
+
+    - if `nproc > 0`: n = `nproc`,
+    - if `nproc <= 0`: n = max(nmax+`nproc`, 1), where nmax is the total \
+    number of cpu(s) of the system (retrieved by :func:`config.cpu_count`), \
+    i.e. all cpus except `-nproc` is used (but at least one)
+
+    The realizations (specified by `nreal`) are distributed one by one over
+    the processes, each process writing its realizations directly in a
+    shared output array (copied in the returned array).
+
+    Note that, if `nreal` < n, then n is reduced to `nreal`.
+
+    Each realization is generated by the function :func:`chentsov3D` (with
+    `nreal=1`) with its own stream (see parameter `rng`), hence the result is
+    the same as the one of the function :func:`chentsov3D` with the same `rng`,
+    whatever the number of processes; if `rng` is `None` (default) or a
+    :class:`numpy.random.RandomState`, a seed is first drawn from it (see
+    function :func:`randomStream.seed_from_rng`) and used as `rng`.
+
+    See function :func:`chentsov3D` for details.
+    """
+    fname = 'chentsov3D_mp'
+
+    kwargs = dict(
+            n_mean=n_mean,
+            dimension=dimension,
+            spacing=spacing,
+            origin=origin,
+            direction_origin=direction_origin,
+            phi_min=phi_min,
+            phi_max=phi_max,
+            theta_min=theta_min,
+            theta_max=theta_max,
+            p_min=p_min,
+            p_max=p_max,
+            ninterval_theta=ninterval_theta,
+            chunk_size=chunk_size
+            )
+
+    # Number of realization(s)
+    nreal = int(nreal) # cast to int if needed
+
+    if nreal <= 0:
+        return chentsov3D(**kwargs, nreal=nreal, rng=rng, verbose=verbose)
+
+    # Random number generator: the streams of the realizations are spawned
+    # (legacy random state cannot be shared between processes)
+    if randomStream.is_legacy(rng):
+        rng = randomStream.seed_from_rng(rng)
+
+    return _chentsov_mp(
+            chentsov3D, kwargs, dimension,
+            nreal, rng, nproc, fname, verbose)
+# ----------------------------------------------------------------------------
+
 if __name__ == "__main__":
     print("Module 'geone.randProcess'.")
 
@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# -------------------------------------------------------------------------
+# Python module:  'randomStream.py'
+# author:         agent
+# date:           oct-2026
+# -------------------------------------------------------------------------
+
+"""
+Module for handling random number generators (streams) in simulations.
+
+The simulation functions of geone accept a parameter `rng` used to generate
+the random numbers. Independent streams are spawned (see
+:class:`numpy.random.SeedSequence`) from `rng`, one per realization, the i-th
+stream depending only on `rng` and i. Each realization is generated with its
+own stream, so that it does not depend on the number of realizations
+generated in the same call, and the functions with suffix `_mp` give the same
+realizations as their serial version.
+
+The parameter `rng` can be:
+
+- `None` (default, legacy): the global random state of `numpy.random` is \
+used (successively) for all the realizations
+- an int: seed used to initialize a :class:`numpy.random.SeedSequence`
+- a :class:`numpy.random.SeedSequence`
+- a :class:`numpy.random.Generator`: its seed sequence is used (then, two \
+successive calls with the same generator give different streams)
+- a :class:`numpy.random.RandomState`: used (successively) for all the \
+realizations (legacy, as for `None`)
+- a sequence of n elements of the above type (except `None`), one per \
+realization, used directly (without spawning), e.g. a slice of the streams \
+returned by :func:`spawn_seed_sequences` (for parallel execution)
+"""
+
+import numpy as np
+
+# ============================================================================
+class RandomStreamError(Exception):
+    """
+    Custom exception related to `randomStream` module.
+    """
+    pass
+# ============================================================================
+
+# ----------------------------------------------------------------------------
+def _seed_sequence(rng):
+    """
+    Returns the seed sequence associated to `rng` (int, SeedSequence or Generator).
+    """
+    fname = '_seed_sequence'
+
+    if isinstance(rng, np.random.SeedSequence):
+        return rng
+    elif isinstance(rng, np.random.Generator):
+        # note: attribute `seed_seq` is public from numpy 1.25
+        ss = getattr(rng.bit_generator, 'seed_seq', None)
+        if ss is None:
+            ss = rng.bit_generator._seed_seq
+        return ss
+    elif isinstance(rng, (int, np.integer)) and not isinstance(rng, bool):
+        return np.random.SeedSequence(int(rng))
+    else:
+        err_msg = f'{fname}: `rng` invalid'
+        raise RandomStreamError(err_msg)
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def is_legacy(rng):
+    """
+    Checks if `rng` refers to a legacy random state.
+
+    Parameters
+    ----------
+    rng : any type
+        random number generator specification (see module :mod:`randomStream`)
+
+    Returns
+    -------
+    legacy : bool
+        `True` if `rng` is `None` or a :class:`numpy.random.RandomState`
+    """
+    # fname = 'is_legacy'
+
+    return rng is None or isinstance(rng, np.random.RandomState)
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def spawn_seed_sequences(rng, n):
+    """
+    Spawns independent seed sequences, one per realization.
+
+    Parameters
+    ----------
+    rng : int, or :class:`numpy.random.SeedSequence`, or :class:`numpy.random.Generator`, or sequence
+        random number generator specification (see module :mod:`randomStream`),
+        `None` and :class:`numpy.random.RandomState` are not accepted
+
+    n : int
+        number of seed sequences
+
+    Returns
+    -------
+    ss : list of :class:`numpy.random.SeedSequence`
+        `n` independent seed sequences, `ss[i]` is used for the i-th
+        realization; if `rng` is a sequence (of length `n`), its elements
+        are used directly
+    """
+    fname = 'spawn_seed_sequences'
+
+    if is_legacy(rng):
+        err_msg = f'{fname}: `rng` invalid (legacy random state cannot be spawned)'
+        raise RandomStreamError(err_msg)
+
+    if isinstance(rng, (list, tuple)):
+        if len(rng) != n:
+            err_msg = f'{fname}: `rng` (sequence) of invalid length'
+            raise RandomStreamError(err_msg)
+        return [_seed_sequence(r) for r in rng]
+
+    return _seed_sequence(rng).spawn(n)
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def rng_stream(rng):
+    """
+    Returns a single random number generator.
+
+    This is used by functions generating one realization (or a single sample),
+    for which no stream has to be spawned.
+
+    Parameters
+    ----------
+    rng : any type
+        random number generator specification (see module :mod:`randomStream`),
+        a sequence is not accepted
+
+    Returns
+    -------
+    rng : :class:`numpy.random.RandomState` or :class:`numpy.random.Generator`
+        random number generator:
+
+        - if `rng=None`: the global random state of `numpy.random` (legacy)
+        - if `rng` is a :class:`numpy.random.RandomState` or a \
+        :class:`numpy.random.Generator`: `rng` itself
+        - otherwise: a :class:`numpy.random.Generator` initialized with `rng`
+    """
+    # fname = 'rng_stream'
+
+    if rng is None:
+        # global RandomState instance used by the functions of `numpy.random`
+        return np.random.mtrand._rand
+
+    if isinstance(rng, (np.random.RandomState, np.random.Generator)):
+        return rng
+
+    return np.random.default_rng(_seed_sequence(rng))
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def rng_streams(rng, n):
+    """
+    Returns random number generators, one per realization.
+
+    Parameters
+    ----------
+    rng : any type
+        random number generator specification (see module :mod:`randomStream`)
+
+    n : int
+        number of realizations
+
+    Returns
+    -------
+    rngs : list
+        list of `n` random number generators, `rngs[i]` is used for the i-th
+        realization; all have the methods `normal`, `random`, `permutation`,
+        `choice` and `poisson`:
+
+        - if `rng=None`: the global random state of `numpy.random` is \
+        repeated `n` times (legacy)
+        - if `rng` is a :class:`numpy.random.RandomState`: `rng` is repeated \
+        `n` times
+        - otherwise: `n` independent :class:`numpy.random.Generator` (see \
+        function :func:`spawn_seed_sequences`)
+    """
+    fname = 'rng_streams'
+
+    if rng is None:
+        # global RandomState instance used by the functions of `numpy.random`
+        return [np.random.mtrand._rand] * n
+
+    if isinstance(rng, np.random.RandomState):
+        return [rng] * n
+
+    if isinstance(rng, (list, tuple)):
+        # one element per realization, generators are used directly
+        if len(rng) != n:
+            err_msg = f'{fname}: `rng` (sequence) of invalid length'
+            raise RandomStreamError(err_msg)
+        return [r if isinstance(r, np.random.Generator) else np.random.default_rng(_seed_sequence(r)) for r in rng]
+
+    return [np.random.default_rng(ss) for ss in spawn_seed_sequences(rng, n)]
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def seed_from_rng(rng):
+    """
+    Draws a seed (int) from a random number generator.
+
+    This is used to initialize the random number generator of C libraries
+    (e.g. `geosclassic`).
+
+    Parameters
+    ----------
+    rng : any type
+        random number generator specification (see module :mod:`randomStream`),
+        if a sequence is given, its first element is used
+
+    Returns
+    -------
+    seed : int
+        seed in `[1, 1000000[`
+    """
+    # fname = 'seed_from_rng'
+
+    if rng is None:
+        return int(np.random.randint(1, 1000000))
+
+    if isinstance(rng, np.random.RandomState):
+        return int(rng.randint(1, 1000000))
+
+    if isinstance(rng, (list, tuple)):
+        rng = rng[0]
+
+    return int(rng_stream(rng).integers(1, 1000000))
+# ----------------------------------------------------------------------------
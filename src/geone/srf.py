@@ -21,12 +21,17 @@ Stochastic Environmental Research and Risk Assessment, \
 Springer Verlag, Berlin, 256 p.
 """
 
+import collections
+import inspect
 import numpy as np
-import scipy.stats as stats
-from scipy.interpolate import interp1d
+import scipy.special
 from geone import covModel as gcm
+from geone import grf
+from geone import img
 from geone import markovChain as mc
 from geone import multiGaussian
+from geone import parallel
+from geone import randomStream
 
 # ============================================================================
 class SrfError(Exception):
@@ -36,181 +41,650 @@ class SrfError(Exception):
     pass
 # ============================================================================
 
-# ============================================================================
-# Tools for simulating categorical SRF with
-#     - multi-Gaussian simulation as directing function (latent field)
-#     - Markov chain as coding process
-# ============================================================================
-
 # ----------------------------------------------------------------------------
-def srf_mg_mc(
-        cov_model_T, kernel_Y,
-        dimension, spacing=None, origin=None,
-        spacing_Y=0.001,
-        categVal=None,
-        x=None, v=None,
-        t=None, yt=None,
-        algo_T='fft', params_T=None,
-        mh_iter=100, ntry_max=1,
-        nreal=1,
-        full_output=True,
-        verbose=1):
+def _simulate_T_preliminary(
+        cov_model_T, dimension, spacing, origin,
+        x, algo_T, params_T, fname):
     """
-    Substitution Random Function (SRF) - multi-Gaussian + Markov chain (on finite set).
+    Preliminary computation for generating the directing function T.
 
-    This function allows to generate categorical random fields in 1D, 2D, 3D, based on
-    a SRF Z defined as
+    This function is used by the functions :func:`srf_mg_mc` and
+    :func:`srf_mg_mg`. With `algo_T='fft'`, the preliminary computation of the
+    GRF simulation (circulant embedding of the covariance matrix, and for
+    conditional simulation, Cholesky decomposition of the covariance matrix
+    of the conditioning cells) is done once here (see e.g. function
+    :func:`grf._grf1D_preliminary`), and then used for all the realizations
+    (see function :func:`_simulate_T_batch`).
 
-    - Z(x) = Y(T(x))
+    Parameters
+    ----------
+    cov_model_T : :class:`geone.CovModel.CovModel<d>D`
+        covariance model for T, in 1D or 2D or 3D
+    dimension : [sequence of] int(s)
+        number of cells along each axis
+    spacing : [sequence of] float(s)
+        cell size along each axis
+    origin : [sequence of] float(s)
+        origin of the grid
+    x : 2d-array of floats of shape (npt, d), or `None`
+        conditioning locations
+    algo_T : str
+        algorithm used for generating T ('fft' or 'classic')
+    params_T : dict
+        keyword arguments for generating T (see e.g. function :func:`srf_mg_mc`),
+        with 'mean' (1d-array of size 1 or of the grid size) and 'var'
+        (`None` or 1d-array of size 1 or of the grid size) set
+    fname : str
+        name of the calling function (for displaying)
 
-    where
+    Returns
+    -------
+    prep_T : dict
+        parameters and arrays for generating T; with `algo_T='fft'`, it
+        contains the result of the preliminary computation of the GRF simulation
+        (see function :func:`grf._grf_simulate`), with the Cholesky factor of
+        the covariance matrix of the conditioning cells as 'rAAcho_c' and
+        'rAAcho_lower' (so that every array can be put in shared memory), and
+        for conditional simulation, the entries 'agg_...' used for aggregating
+        the values of T at `x` in the conditioning cells (see function
+        :func:`_simulate_T_aggregate`)
+    """
+    prep_T = {'algo': algo_T, 'cov_model': cov_model_T,
+             'dimension': dimension, 'spacing': spacing, 'origin': origin,
+             'x': x}
 
-    - T is the directing function, a multi-Gaussian random field (latent field)
-    - Y is the coding process, a Markov chain on finite sets (of categories) (1D)
+    if algo_T not in ('fft', 'FFT'):
+        return prep_T
 
-    Z and T are fields in 1D, 2D or 3D.
+    if isinstance(cov_model_T, gcm.CovModel1D):
+        grf_preliminary = grf._grf1D_preliminary
+    elif isinstance(cov_model_T, gcm.CovModel2D):
+        grf_preliminary = grf._grf2D_preliminary
+    else:
+        grf_preliminary = grf._grf3D_preliminary
+
+    # Keyword arguments (from params_T) for the preliminary computation
+    grf_preliminary_set_of_all_args = set([val.name for val in inspect.signature(grf_preliminary).parameters.values()])
+    kwargs = {key: params_T[key] for key in grf_preliminary_set_of_all_args.intersection(params_T.keys())
+              if key not in ('x', 'v', 'aggregate_data_op', 'aggregate_data_op_kwargs', 'nreal', 'rng', 'verbose')}
+
+    # Mask (applied afterward, as in the function `multiGaussian.multiGaussianRun`)
+    mask = None
+    if params_T.get('mask') is not None:
+        try:
+            mask = np.asarray(params_T['mask']).reshape(np.atleast_1d(dimension)[::-1]).astype('bool')
+        except:
+            err_msg = f'{fname}: `mask` (in `params_T`) invalid'
+            raise SrfError(err_msg)
 
-    Notes
-    -----
-    The module :mod:`multiGaussian` is used for the multi-Gaussian field T, and the
-    module :mod:`markovChain` is used for the markov chain Y.
+    prep_T['mask'] = mask
+
+    if x is None:
+        # Unconditional case
+        try:
+            sim = grf_preliminary(
+                    fname, cov_model_T, dimension, spacing, origin,
+                    nreal=1, verbose=0, **kwargs)
+        except Exception as exc:
+            err_msg = f'{fname}: preliminary computation for T failed'
+            raise SrfError(err_msg) from exc
+
+    else:
+        # Conditional case
+        # Get the conditioning cells (grid cells containing at least one
+        # point of x), and the cell of each point (i_inv, -1 if outside the grid)
+        d = x.shape[1]
+        nx, ny, nz = np.hstack((np.atleast_1d(dimension), np.ones(3-d, dtype='int')))
+        sx, sy, sz = np.hstack((np.atleast_1d(spacing), np.ones(3-d)))
+        ox, oy, oz = np.hstack((np.atleast_1d(origin), np.zeros(3-d)))
+        xyz = np.hstack((x, np.array([oy+0.5*sy, oz+0.5*sz])[d-1:] * np.ones((x.shape[0], 3-d))))
+        try:
+            xx_agg, yy_agg, zz_agg, _, i_inv = img.aggregateDataPointsWrtGrid(
+                    xyz[:, 0], xyz[:, 1], xyz[:, 2], np.zeros(x.shape[0]),
+                    nx, ny, nz, sx, sy, sz, ox, oy, oz,
+                    op='mean', return_inverse=True)
+        except Exception as exc:
+            err_msg = f'{fname}: aggregating data points (for T) in grid failed'
+            raise SrfError(err_msg) from exc
+
+        if len(xx_agg) == 0:
+            err_msg = f'{fname}: no data point (for T) in grid'
+            raise SrfError(err_msg)
+
+        # Index of the conditioning cells in the grid (flat index) and their centers
+        ic_f = (np.array((xx_agg, yy_agg, zz_agg)).T - [ox, oy, oz])/[sx, sy, sz]
+        ic = ic_f.astype(int)
+        ic = ic - 1 * np.all((ic == ic_f, ic > 0), axis=0)
+        x_agg = (np.array([ox, oy, oz]) + np.array([sx, sy, sz])*(0.5+ic))[:, :d]
+        ind_agg = ic[:, 0] + nx * (ic[:, 1] + ny * ic[:, 2])
+
+        # Preliminary computation, with one (distinct) value per conditioning cell
+        # (the order of the conditioning cells used for the GRF simulation is retrieved
+        # from the aggregated values)
+        try:
+            sim = grf_preliminary(
+                    fname, cov_model_T, dimension, spacing, origin,
+                    x=x_agg, v=np.arange(len(x_agg), dtype='float'),
+                    aggregate_data_op='mean',
+                    nreal=1, verbose=0, **kwargs)
+        except Exception as exc:
+            err_msg = f'{fname}: preliminary computation for T failed'
+            raise SrfError(err_msg) from exc
+
+        sim['agg_order'] = sim['v_agg'][0].astype('int')
+
+        # Aggregation of the values of T at x in the conditioning cells
+        aggregate_data_op = params_T.get('aggregate_data_op')
+        if aggregate_data_op is None:
+            aggregate_data_op = 'sgs' # default (see function `grf.grf1D`)
+        aggregate_data_op_kwargs = params_T.get('aggregate_data_op_kwargs')
+        if aggregate_data_op_kwargs is None:
+            aggregate_data_op_kwargs = {}
+
+        if aggregate_data_op in ('krige', 'sgs'):
+            # Mean and variance at x (interpolated, as in the function `grf.grf<d>D`)
+            # and at the conditioning cells
+            val_x, val_xu = [], []
+            for val in (params_T['mean'], params_T.get('var')):
+                if val is None or val.size == 1:
+                    val_x.append(val)
+                    val_xu.append(val)
+                else:
+                    im = img.Img(nx, ny, nz, sx, sy, sz, ox, oy, oz, nv=1, val=val)
+                    if d == 1:
+                        val_x.append(img.Img_interp_func(im, iy=0, iz=0)(x))
+                    elif d == 2:
+                        val_x.append(img.Img_interp_func(im, iz=0)(x))
+                    else:
+                        val_x.append(img.Img_interp_func(im)(x))
+                    val_xu.append(val[ind_agg])
+            sim['agg_mean_x'], sim['agg_var_x'] = val_x
+            sim['agg_mean_xu'], sim['agg_var_xu'] = val_xu
+
+        sim['agg_op'] = aggregate_data_op
+        sim['agg_op_kwargs'] = aggregate_data_op_kwargs
+        sim['agg_xyz'] = xyz
+        sim['agg_x_cells'] = x_agg
+        sim['agg_i_inv'] = i_inv
+        sim['agg_grid'] = (nx, ny, nz, sx, sy, sz, ox, oy, oz)
+        sim['v_agg'] = None
+
+    if sim.get('rAAcho') is not None:
+        sim['rAAcho_c'], sim['rAAcho_lower'] = sim['rAAcho']
+        sim['rAAcho'] = None
+
+    sim['rngs'] = None
+    prep_T.update(sim)
+
+    return prep_T
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def _simulate_T_aggregate(prep_T, v_T_batch, rngs_T, fname):
+    """
+    Aggregates the values of T at the conditioning locations in the grid cells.
+
+    The values are aggregated for each realization as it is done in the function
+    :func:`grf.grf1D` (see parameters `aggregate_data_op`,
+    `aggregate_data_op_kwargs`, given in `params_T`).
 
     Parameters
     ----------
-    cov_model_T : :class:`geone.CovModel.CovModel<d>D`
-        covariance model for T, in 1D or 2D or 3D
+    prep_T : dict
+        see function :func:`_simulate_T_preliminary`
+    v_T_batch : 2d-array of floats of shape (m, npt)
+        values of T at the conditioning locations, one row per realization
+    rngs_T : list
+        random number generators (streams) for T of the m realizations
+    fname : str
+        name of the calling function (for displaying)
 
-    kernel_Y : 2d-array of shape (n, n)
-        transition kernel for Y of a Markov chain on a set of states
-        :math:`S=\\{0, \ldots, n-1\\}`, where `n` is the number of categories
-        (states); the element at row `i` and column `j` is the probability to have
-        the state of index `j` at the next step given the state `i` at the current
-        step, i.e.
+    Returns
+    -------
+    v_agg : 2d-array of floats of shape (m, nc)
+        values of T in the conditioning cells (in the order of the cells
+        `prep_T['agg_x_cells']`), one row per realization
+    """
+    aggregate_data_op = prep_T['agg_op']
+    aggregate_data_op_kwargs = prep_T['agg_op_kwargs']
+    x = prep_T['x']
+    x_agg = prep_T['agg_x_cells']
+    i_inv = prep_T['agg_i_inv']
+
+    m = v_T_batch.shape[0]
+    v_agg = np.zeros((m, len(x_agg)))
+    try:
+        if aggregate_data_op == 'krige':
+            for i in range(m):
+                v_agg[i] = gcm.krige(
+                        x, v_T_batch[i], x_agg, prep_T['cov_model'], method='simple_kriging',
+                        mean_x=prep_T['agg_mean_x'], mean_xu=prep_T['agg_mean_xu'],
+                        var_x=prep_T['agg_var_x'], var_xu=prep_T['agg_var_xu'],
+                        verbose=0, **aggregate_data_op_kwargs)[0]
+        elif aggregate_data_op == 'sgs':
+            for i in range(m):
+                v_agg[i] = gcm.sgs(
+                        x, v_T_batch[i], x_agg, prep_T['cov_model'], method='simple_kriging',
+                        mean_x=prep_T['agg_mean_x'], mean_xu=prep_T['agg_mean_xu'],
+                        var_x=prep_T['agg_var_x'], var_xu=prep_T['agg_var_xu'],
+                        nreal=1, seed=None,
+                        rng=None if randomStream.is_legacy(rngs_T[i]) else [rngs_T[i]],
+                        verbose=0, **aggregate_data_op_kwargs)[0]
+        elif aggregate_data_op == 'random':
+            for i in range(m):
+                v_agg[i] = [v_T_batch[i, rngs_T[i].choice(np.where(i_inv==j)[0])] for j in range(len(x_agg))]
+        else:
+            xyz = prep_T['agg_xyz']
+            v_agg[:] = img.aggregateDataPointsWrtGrid(
+                    xyz[:, 0], xyz[:, 1], xyz[:, 2], v_T_batch,
+                    *prep_T['agg_grid'],
+                    op=aggregate_data_op, **aggregate_data_op_kwargs)[3]
+    except Exception as exc:
+        err_msg = f"{fname}: aggregating data points (for T) in grid failed (`aggregate_data_op='{aggregate_data_op}'`)"
+        raise SrfError(err_msg) from exc
 
-        - :math:`kernel[i][j] = P(Y_{k+1}=j\\ \\vert\\ Y_{k}=i)`
+    return v_agg
+# ----------------------------------------------------------------------------
 
-        where the sequence of random variables :math:`(Y_k)` is a Markov chain
-        on `S` defined by the kernel `kernel`.
+# ----------------------------------------------------------------------------
+def _simulate_T_batch(prep_T, params_T, v_T_batch, rng, rngs, ireal_batch, fname):
+    """
+    Generates the directing function T for a batch of realizations.
+
+    This function is used by the functions :func:`srf_mg_mc` and
+    :func:`srf_mg_mg`. The field T of each realization is generated with a
+    stream spawned from the stream of the realization, as it is done by the
+    function :func:`multiGaussian.multiGaussianRun` with this stream (and for
+    `algo_T='fft'`, the preliminary computation being done once, see function
+    :func:`_simulate_T_preliminary`); hence T of a realization depends only on
+    its stream and on its values at the conditioning locations, and not on
+    the other realizations of the batch.
+
+    For conditional simulation (`prep_T['x']` not `None`), each realization is
+    conditioned to its own values at the conditioning locations (row of
+    `v_T_batch`); with `algo_T='classic'`, the conditional fields are generated
+    one by one.
 
-        In particular, every element of `kernel` is positive or zero, and its
-        rows sum to one.
+    Parameters
+    ----------
+    prep_T : dict
+        see function :func:`_simulate_T_preliminary`
+    params_T : dict
+        keyword arguments for generating T (see e.g. function :func:`srf_mg_mc`),
+        passed to the function :func:`multiGaussian.multiGaussianRun` with
+        `algo_T='classic'`
+    v_T_batch : 2d-array of floats of shape (m, npt), or `None`
+        values of T at the conditioning locations, one row per realization of
+        the batch
+    rng : any type
+        random number generator specification given to the calling function
+    rngs : list or dict
+        random number generators (streams) of the realizations (`rngs[ireal]`
+        for the realization of index `ireal`)
+    ireal_batch : list of ints
+        indexes of the realizations of the batch (`m=len(ireal_batch)`), in
+        increasing order
+    fname : str
+        name of the calling function (for displaying)
 
-    dimension : [sequence of] int(s)
-        number of cells along each axis, for simulation in:
+    Returns
+    -------
+    sim_T_batch : nd-array of shape (m, ) + grid shape
+        fields T of the realizations of the batch
+    sim_T_ok : 1d-array of bools of shape (m, )
+        indicates for each realization of the batch if T has been generated
+        successfully
+    """
+    m = len(ireal_batch)
+    sim_T_ok = np.ones(m, dtype='bool')
+
+    # Random number generator (stream) for T, for each realization of the batch:
+    # a child of the stream of the realization (as done when one realization
+    # is passed to multiGaussianRun)
+    if randomStream.is_legacy(rng):
+        rng_T = m*[rng]
+    else:
+        rng_T = [randomStream.spawn_seed_sequences(rngs[ireal], 1)[0] for ireal in ireal_batch]
+
+    x = prep_T['x']
+    sim_T_batch = np.zeros((m, ) + tuple(np.atleast_1d(prep_T['dimension'])[::-1]), dtype=prep_T.get('dtype', 'float64'))
+
+    for j in range(m):
+        if prep_T['algo'] in ('classic', 'CLASSIC'):
+            try:
+                sim_T_batch[j] = multiGaussian.multiGaussianRun(
+                        prep_T['cov_model'], prep_T['dimension'], prep_T['spacing'], prep_T['origin'],
+                        x=x, v=None if x is None else v_T_batch[j],
+                        mode='simulation', algo=prep_T['algo'], output_mode='array',
+                        **params_T, nreal=1, rng=rng_T[j])[0]
+            except:
+                sim_T_ok[j] = False
+            continue
+
+        # FFT: field generated from the preliminary computation
+        try:
+            rngs_T = randomStream.rng_streams(rng if randomStream.is_legacy(rng) else [rng_T[j]], 1)
+            sim = dict(prep_T, nreal=1, rngs=rngs_T)
+            if sim.get('rAAcho_c') is not None:
+                sim['rAAcho'] = (sim['rAAcho_c'], sim['rAAcho_lower'])
+            if x is not None:
+                sim['v_agg'] = _simulate_T_aggregate(prep_T, v_T_batch[j:j+1], rngs_T, fname)[:, prep_T['agg_order']]
+            grf._grf_simulate(sim_T_batch[j:j+1], sim, 0, fname, 0)
+        except:
+            sim_T_ok[j] = False
+
+    if prep_T.get('mask') is not None:
+        sim_T_batch[:, ~prep_T['mask']] = np.nan
+
+    return sim_T_batch, sim_T_ok
+# ----------------------------------------------------------------------------
 
-        - 1D: `dimension=nx`
-        - 2D: `dimension=(nx, ny)`
-        - 3D: `dimension=(nx, ny, nz)`
+# ============================================================================
+# Tools for generating SRF realizations using multiprocessing
+# ============================================================================
 
-    spacing : [sequence of] float(s), optional
-        cell size along each axis, for simulation in:
+# ----------------------------------------------------------------------------
+def _srf_mp_worker(
+        srf_func, kwargs, shared_desc, ireal_list, rng, nreal, fname,
+        Z_desc, T_desc, ok_desc):
+    """
+    Generates a group of SRF realizations in a process (worker).
 
-        - 1D: `spacing=sx`
-        - 2D: `spacing=(sx, sy)`
-        - 3D: `spacing=(sx, sy, sz)`
+    Parameters
+    ----------
+    srf_func : function
+        function generating given realizations (e.g. :func:`_srf_mg_mc_simulate`),
+        called as `srf_func(rng, ireal_list, nreal, full_output, fname, verbose, **kwargs)`
+        and returning the realizations of Z, of the directing function(s) and
+        of the coding process as dictionaries (with the index of the realization
+        as key)
+    kwargs : dict
+        keyword arguments for `srf_func`, as returned by the function
+        :func:`parallel._shared_kwargs_create`
+    shared_desc : dict
+        descriptions of the shared arrays of the keyword arguments, as
+        returned by the function :func:`parallel._shared_kwargs_create`
+    ireal_list : list of ints
+        indexes of the realizations of the group
+    rng : list of :class:`numpy.random.SeedSequence`
+        seed sequences of the realizations of the group
+    nreal : int
+        total number of realizations
+    fname : str
+        name of the calling function (for displaying)
+    Z_desc : tuple
+        description of the shared output array for Z, of shape
+        (nreal, ) + grid shape (see function :func:`parallel._output_array_create`)
+    T_desc : list of tuples
+        descriptions of the shared output arrays for the directing
+        function(s), of shape (nreal, ) + grid shape (empty list if the
+        directing function(s) are not retrieved)
+    ok_desc : tuple
+        description of the shared output array of flags (bools) indicating
+        the realizations successfully generated, of shape (nreal, )
 
-        by default (`None`): 1.0 along each axis
+    Returns
+    -------
+    Y : dict
+        coding process of the realizations successfully generated (see
+        `srf_func`), `Y[ireal]` for the realization of index `ireal` (`None`
+        values if the directing function(s) are not retrieved)
+    Z_dtype : numpy.dtype or `None`
+        type of the realizations of Z (`None` if all realizations failed)
+    T_dtype : numpy.dtype or `None`
+        type of the realizations of the directing function(s) (`None` if not
+        retrieved or if all realizations failed)
+    """
+    # fname = '_srf_mp_worker'
 
-    origin : [sequence of] float(s), optional
-        origin of the grid ("corner of the first cell"), for simulation in:
+    shm_list = []
+    try:
+        kwargs = parallel._shared_kwargs_attach(kwargs, shared_desc, shm_list)
 
-        - 1D: `origin=ox`
-        - 2D: `origin=(ox, oy)`
-        - 3D: `origin=(ox, oy, oz)`
+        full_output = len(T_desc) > 0
+        out = srf_func(rng, ireal_list, nreal, full_output, fname, 0, **kwargs)
+        Z_real, T_real, Y_real = out[0], out[1:-1], out[-1]
 
-        by default (`None`): 0.0 along each axis
+        Z = parallel._output_array_attach(Z_desc, shm_list)
+        T = [parallel._output_array_attach(desc, shm_list) for desc in T_desc]
+        ok = parallel._output_array_attach(ok_desc, shm_list)
 
-    spacing_Y : float, default: 0.001
-        positive value, resolution of the Y process, spacing along abscissa
-        between two steps in the Markov chain Y (btw. two adjacent cell in
-        1D-grid for Y)
+        Y, Z_dtype, T_dtype = {}, None, None
+        for ireal in ireal_list:
+            if Z_real[ireal] is None:
+                continue
 
-    categVal : 1d-array of shape (n,), optional
-        values of categories (one value for each state `0, ..., n-1`);
-        by default (`None`) : `categVal` is set to `[0, ..., n-1]`
+            Z[ireal] = np.asarray(Z_real[ireal]).reshape(Z.shape[1:])
+            Z_dtype = np.asarray(Z_real[ireal]).dtype
+            for sim_T, T_real_k in zip(T, T_real):
+                sim_T[ireal] = T_real_k[ireal]
+                T_dtype = np.asarray(T_real_k[ireal]).dtype
+            ok[ireal] = True
+            Y[ireal] = Y_real[ireal]
+
+        return Y, Z_dtype, T_dtype
+
+    finally:
+        # Release references to shared memory before closing
+        kwargs = None
+        out, Z_real, T_real = None, None, None
+        Z, T, ok, sim_T = None, None, None, None
+        for shm in shm_list:
+            shm.close()
+# ----------------------------------------------------------------------------
 
-    x : array-like of floats, optional
-        data points locations (float coordinates), for simulation in:
+# ----------------------------------------------------------------------------
+def _srf_mp(srf_func, kwargs, dimension, Z_dtype, nT, group_size, nreal, rng, full_output, nproc, fname, verbose):
+    """
+    Generates SRF realizations using multiprocessing.
 
-        - 1D: 1D array-like of floats
-        - 2D: 2D array-like of floats of shape (m, 2)
-        - 3D: 2D array-like of floats of shape (m, 3)
+    The arrays of the keyword arguments (data, kernel, result of the preliminary
+    computation, ...) are put in shared memory (read only), and the
+    realizations are distributed by groups (of `group_size` consecutive
+    realizations) over a pool of processes, each group being generated by
+    `srf_func` with the streams spawned from `rng` for its realizations, and
+    written in shared output arrays.
 
-        note: if one point (m=1), a float in 1D, a 1D array of shape (2,) in 2D,
-        a 1D array of shape (3,) in 3D, is accepted
+    Parameters
+    ----------
+    srf_func : function
+        function generating given realizations (e.g. :func:`_srf_mg_mc_simulate`),
+        see function :func:`_srf_mp_worker`
+    kwargs : dict
+        keyword arguments for `srf_func` (except `rng`, `ireal_list`, `nreal`,
+        `full_output`, `fname`, `verbose`)
+    dimension : int or sequence of ints
+        number of grid cells
+    Z_dtype : numpy.dtype
+        type of the shared output array for Z
+    nT : int
+        number of directing functions (1 or 2)
+    group_size : int
+        number of realizations per group (task)
+    nreal : int
+        number of realizations
+    rng : int, or :class:`numpy.random.SeedSequence`, or :class:`numpy.random.Generator`, or sequence
+        random number generator specification (see module :mod:`randomStream`),
+        not legacy
+    full_output : bool
+        see e.g. function :func:`srf_mg_mc`
+    nproc : int
+        number of processes (see e.g. function :func:`srf_mg_mc_mp`)
+    fname : str
+        name of the calling function (for displaying)
+    verbose : int
+        verbose mode
 
-    v : 1d-array-like of floats, optional
-        data values at `x` (`v[i]` is the data value at `x[i]`)
+    Returns
+    -------
+    out : nd-array, or tuple
+        realizations of Z, or `(Z, T, Y)` (`(Z, T1, T2, Y)` with two directing
+        functions) if `full_output=True`, as returned by e.g. the function
+        :func:`srf_mg_mc`
+    """
+    # fname = '_srf_mp'
 
-    t : 1d-array-like of floats, or float, optional
-        values of T considered as conditioning point for Y(T) (additional constraint)
+    # Independent streams, one per realization
+    try:
+        ss = randomStream.spawn_seed_sequences(rng, nreal)
+    except:
+        err_msg = f'{fname}: `rng` invalid'
+        raise SrfError(err_msg)
 
-    yt : 1d-array-like of floats, or float, optional
-        value of Y at the conditioning point `t` (same length as `t`)
+    # Groups of realizations
+    groups = [list(range(i, min(i+group_size, nreal))) for i in range(0, nreal, group_size)]
 
-    algo_T : str
-        defines the algorithm used for generating multi-Gaussian field T:
+    # Set number of processes (n)
+    n = parallel.get_nproc(nproc)
 
-        - 'fft' or 'FFT' (default): based on circulant embedding and FFT, \
-        function called for <d>D (d = 1, 2, or 3): `geone.grf.grf<d>D`
-        - 'classic' or 'CLASSIC': classic algorithm, based on the resolution \
-        of kriging system considered points in a search ellipsoid, function \
-        called for <d>D (d = 1, 2, or 3): `geone.geoscalassicinterface.simulate<d>D`
+    n = min(n, len(groups))
 
-    params_T : dict, optional
-        keyword arguments (additional parameters) to be passed to the function
-        corresponding to what is specified by the argument `algo_T` (see the
-        corresponding function for its keyword arguments), in particular the key
-        'mean' can be specified (set to value 0 if not specified)
+    if verbose > 1:
+        print(f'{fname}: running simulation on {n} processes...')
 
-    mh_iter : int, default: 100
-        number of iteration for Metropolis-Hasting algorithm, for conditional
-        simulation only; note: used only if `x` or `t` is not `None`
+    shape = (nreal, ) + tuple(np.atleast_1d(dimension)[::-1])
 
-    ntry_max : int, default: 1
-        number of tries per realization before giving up if something goes wrong
+    shm_list = []
+    try:
+        # Shared arrays
+        kwargs_proc, shared_desc = parallel._shared_kwargs_create(kwargs, shm_list)
+        Z_desc = parallel._output_array_create(None, shape, Z_dtype, shm_list)
+        if full_output:
+            T_desc = [parallel._output_array_create(None, shape, np.dtype('float64'), shm_list) for _ in range(nT)]
+        else:
+            T_desc = []
+        ok_desc = parallel._output_array_create(None, (nreal, ), np.dtype('bool'), shm_list)
+
+        # Set pool of n workers, the groups of realizations are distributed one by one
+        # (the time needed for a realization can vary, e.g. with the number of trials)
+        pool = parallel.get_pool(n)
+        out_pool = []
+        for ireal_list in groups:
+            out_pool.append(pool.apply_async(_srf_mp_worker,
+                                             args=(srf_func, kwargs_proc, shared_desc, ireal_list,
+                                                   ss[ireal_list[0]:ireal_list[-1]+1], nreal, fname,
+                                                   Z_desc, T_desc, ok_desc)))
+
+        # Wait for the tasks and release the pool
+        parallel.release_pool(pool, out_pool)
+
+        # Check each process (an error occurred in a process is raised)
+        res = [w.get() for w in out_pool]
+        Z_dtype_real = next((r[1] for r in res if r[1] is not None), Z_dtype)
+        T_dtype_real = next((r[2] for r in res if r[2] is not None), np.dtype('float64'))
+
+        # Get result (successful realizations)
+        ok = parallel._shared_array_attach(ok_desc, shm_list)
+        ireal_ok = np.where(ok)[0]
+        ok = None
+        if verbose > 0 and len(ireal_ok) < nreal:
+            print(f'{fname}: WARNING: some realization failed (missing)')
+
+        Z = parallel._shared_array_attach(Z_desc, shm_list)
+        Z = Z[ireal_ok].astype(Z_dtype_real)
+        if full_output:
+            T = []
+            for desc in T_desc:
+                sim_T = parallel._shared_array_attach(desc, shm_list)
+                T.append(sim_T[ireal_ok].astype(T_dtype_real))
+                sim_T = None
+            Y = {}
+            for r in res:
+                Y.update(r[0])
+            Y = [Y[ireal] for ireal in ireal_ok]
+
+    finally:
+        for shm in shm_list:
+            shm.close()
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
 
-    nreal : int, default: 1
-        number of realization(s)
+    if full_output:
+        return (Z, *T, Y)
+    else:
+        return Z
+# ----------------------------------------------------------------------------
 
-    full_output : bool, default: True
-        - if `True`: simulation(s) of Z, T, and Y are retrieved in output
-        - if `False`: simulation(s) of Z only is retrieved in output
+# ============================================================================
+# Tools for simulating categorical SRF with
+#     - multi-Gaussian simulation as directing function (latent field)
+#     - Markov chain as coding process
+# ============================================================================
 
-    verbose : int, default: 1
-        verbose mode, integer >=0, higher implies more display
+# ----------------------------------------------------------------------------
+def _mc_log_prob(v_T, v_cat, spacing_Y, pinv, kernel_pow):
+    """
+    Computes the log-probability of a Markov chain taking given values.
+
+    The Markov chain Y is stationary, with invariant distribution `pinv` and
+    transition kernel (see `kernel_pow`) between two steps separated by `spacing_Y`; the
+    probability that Y takes the state `v_cat[i]` at `v_T[i]` for all i is
+    computed by ordering the locations `v_T`, the number of steps between two
+    successive locations being the integer part of their distance divided by
+    `spacing_Y`.
+
+    Parameters
+    ----------
+    v_T : 1d-array of floats
+        locations (along the axis of the Markov chain)
+    v_cat : 1d-array of ints
+        index of the states (categories) at `v_T`
+    spacing_Y : float
+        spacing between two steps of the Markov chain
+    pinv : 1d-array of shape (n, )
+        invariant distribution
+    kernel_pow : :class:`markovChain.KernelPower`
+        provider of the powers of the transition kernel
 
     Returns
     -------
-    Z : nd-array
-        all realizations, `Z[k]` is the `k`-th realization:
+    log_p : float
+        log-probability (`-numpy.inf` if the probability is zero)
+    """
+    # fname = '_mc_log_prob'
 
-        - for 1D: `Z` of shape (nreal, nx), where nx = dimension
-        - for 2D: `Z` of shape (nreal, ny, nx), where nx, ny = dimension
-        - for 3D: `Z` of shape (nreal, nz, ny, nx), where nx, ny, nz = dimension
+    inds = np.argsort(v_T)
+    c = v_cat[inds]
+    gap = ((v_T[inds[1:]] - v_T[inds[:-1]]) / spacing_Y).astype(int)
 
-    T : nd-array
-        latent fields of all realizations, `T[k]` for the `k`-th realization:
+    p = np.hstack((pinv[c[0]], kernel_pow.elements(gap, c[:-1], c[1:])))
+    with np.errstate(divide='ignore'):
+        log_p = np.sum(np.log(p))
 
-        - for 1D: `T` of shape (nreal, nx), where nx = dimension
-        - for 2D: `T` of shape (nreal, ny, nx), where nx, ny = dimension
-        - for 3D: `T` of shape (nreal, nz, ny, nx), where nx, ny, nz = dimension
+    return log_p
+# ----------------------------------------------------------------------------
 
-        returned if `full_output=True`
+# ----------------------------------------------------------------------------
+def _srf_mg_mc_preliminary(
+        fname,
+        cov_model_T, kernel_Y,
+        dimension, spacing=None, origin=None,
+        spacing_Y=0.001,
+        categVal=None,
+        x=None, v=None,
+        t=None, yt=None,
+        algo_T='fft', params_T=None,
+        mh_iter=100, mh_block_size=1, ntry_max=1):
+    """
+    Preliminary computation for the function :func:`srf_mg_mc`.
 
-    Y : list of length nreal
-        markov chains of all realizations, `Y[k]` is a list of length 4 for
-        the `k`-th realization:
+    This function checks the parameters and does the computations that do not
+    depend on the realizations (e.g. kriging matrices at the conditioning
+    locations, preliminary computation for T, see function
+    :func:`_simulate_T_preliminary`).
 
-        - Y[k][0]: int, Y_nt (number of cell along t-axis)
-        - Y[k][1]: float, Y_st (cell size along t-axis)
-        - Y[k][2]: float, Y_ot (origin)
-        - Y[k][3]: 1d-array of shape (Y_nt,), values of Y[k]
+    The parameters are the same as those of the function :func:`srf_mg_mc`
+    (except `nreal`, `rng`, `full_output`), and `fname` (str) is the name
+    of the calling function (for displaying).
 
-        returned if `full_output=True`
+    Returns
+    -------
+    prep : dict
+        parameters and arrays used for generating the realizations (keyword
+        arguments for the function :func:`_srf_mg_mc_simulate`)
     """
-    fname = 'srf_mg_mc'
-
     if algo_T not in ('fft', 'FFT', 'classic', 'CLASSIC'):
         err_msg = f"{fname}: `algo_T` invalid, should be 'fft' (default) or 'classic'"
         raise SrfError(err_msg)
@@ -365,21 +839,16 @@ def srf_mg_mc(
                     err_msg = f"{fname}: 'var' parameter for T (in `params_T`) has incompatible size"
                     raise SrfError(err_msg)
 
-    # Number of realization(s)
-    nreal = int(nreal) # cast to int if needed
-
-    if nreal <= 0:
-        if full_output:
-            if verbose > 0:
-                print(f'{fname}: WARNING: `nreal` <= 0: `None`, `None`, `None` is returned')
-            return None, None, None
-        else:
-            if verbose > 0:
-                print(f'{fname}: WARNING: `nreal` <= 0: `None` is returned')
-            return None
+    mh_block_size = int(mh_block_size) # cast to int if needed
+    if mh_block_size <= 0:
+        err_msg = f'{fname}: `mh_block_size` invalid'
+        raise SrfError(err_msg)
 
     # Note: format of data (x, v) not checked !
 
+    # Parameters set in conditional case only
+    npt, kernel_T, v_T, v_ext, v_ext_cat = None, None, None, None, None
+
     if x is None:
         # Preparation for unconditional case
         if v is not None:
@@ -461,6 +930,12 @@ def srf_mg_mc(
             varUpdate = np.sqrt(var_T[x_var_T_grid_ind]/cov0_T)
             mat_T = varUpdate*(mat_T.T*varUpdate).T
 
+        # Kernel for simulating T at x (mat_T factorized once)
+        try:
+            kernel_T = multiGaussian.GaussianConditionalKernel(mat_T, mean=mean_T[x_mean_T_grid_ind])
+        except:
+            kernel_T = None
+
         # Initialize
         #   - npt_ext: number of total conditioning point for Y, "point T(x) + additional constraint t"
         #   - v_T: values of T(x) (that are defined later) followed by values yt at additional constraint t"
@@ -481,12 +956,12 @@ def srf_mg_mc(
             mh_iter = 0 # unnecessary to apply Metropolis update !
 
     # Preparation of
+    #     - kernel_Y_pow (provider of the kernel raised to power 0, 1, 2, ...)
     #     - pinv : invariant distribution
     #     - kernel_Y_rev (reverse transition kernel)
-    #     - kernel_Y_pow (kernel raised to power 0, 1, 2, ...)
-    #     - kernel_Y_rev_pow (reverse kernel raised to power 0, 1, 2, ...)
+    kernel_Y_pow = mc.KernelPower(kernel_Y)
     try:
-        pinv_Y = mc.compute_mc_pinv(kernel_Y)
+        pinv_Y = kernel_Y_pow.pinv
     except Exception as exc:
         err_msg = f'{fname}: computing invariant distribution for Y failed'
         raise SrfError(err_msg) from exc
@@ -497,14 +972,6 @@ def srf_mg_mc(
         err_msg = f'{fname}: kernel for Y not reversible'
         raise SrfError(err_msg) from exc
 
-    m_pow = 1
-    kernel_Y_pow = np.zeros((m_pow, n, n))
-    kernel_Y_pow[0] = np.eye(n)
-
-    m_rev_pow = 1
-    kernel_Y_rev_pow = np.zeros((m_rev_pow, n, n))
-    kernel_Y_rev_pow[0] = np.eye(n)
-
     if t is not None and len(t) > 1:
         # Check validity of additional constraint (t, yt):
         #    check the compatibility with kernel_Y, i.e. that the probabilities:
@@ -521,15 +988,8 @@ def srf_mg_mc(
         yval_cat = np.array([np.where(categVal==yv)[0][0] for yv in yt], dtype='int')
         #
         inds = np.argsort(yind)
-        i0 = max(np.diff([yind[j] for j in inds]))
-        if i0 >= m_pow:
-            kernel_Y_pow = np.concatenate((kernel_Y_pow, np.zeros((i0-m_pow+1, n, n))), axis=0)
-            for i in range(m_pow, i0+1):
-                kernel_Y_pow[i] = kernel_Y_pow[i-1].dot(kernel_Y)
-            m_pow = i0+1
         # check if Prob(Y[t[inds[i+1]]]=yt[inds[i+1]], Y[t[inds[i]]]=yt[inds[i]]) = kernel^(inds[i+1]-inds[i])[yval_cat[inds[i]], yval_cat[inds[i+1]]] > 0, for all i
-        if np.any(np.isclose([kernel_Y_pow[yind[inds[i+1]]-yind[inds[i]], int(yval_cat[inds[i]]), int(yval_cat[inds[i+1]])] for i in range(len(t)-1)], 0)):
-        # if np.any([kernel_Y_pow[yind[inds[i+1]]-yind[inds[i]], int(yval_cat[inds[i]]), int(yval_cat[inds[i+1]])] < 1.e-20 for i in range(len(t)-1)]):
+        if np.any(np.isclose(kernel_Y_pow.elements(np.diff(yind[inds]), yval_cat[inds[:-1]], yval_cat[inds[1:]]), 0)):
             err_msg = f'{fname}: invalid additional constraint on Markov chain Y wrt. kernel'
             raise SrfError(err_msg)
 
@@ -542,43 +1002,191 @@ def srf_mg_mc(
         params_T['verbose'] = 0
         # params_T['verbose'] = verbose
 
-    # Initialization for output
-    Z = []
-    if full_output:
-        T = []
-        Y = []
+    # Preliminary computation for T
+    prep_T = _simulate_T_preliminary(
+            cov_model_T, dimension, spacing, origin,
+            x, algo_T, params_T, fname)
+
+    return dict(
+            categVal=categVal,
+            kernel_T=kernel_T,
+            kernel_Y=kernel_Y,
+            kernel_Y_pow=kernel_Y_pow,
+            kernel_Y_rev=kernel_Y_rev,
+            mh_block_size=mh_block_size,
+            mh_iter=mh_iter,
+            npt=npt,
+            ntry_max=ntry_max,
+            params_T=params_T,
+            pinv_Y=pinv_Y,
+            prep_T=prep_T,
+            spacing_Y=spacing_Y,
+            t=t,
+            v_T=v_T,
+            v_ext=v_ext,
+            v_ext_cat=v_ext_cat,
+            x=x,
+            yt=yt
+            )
+# ----------------------------------------------------------------------------
 
-    for ireal in range(nreal):
-        # Generate ireal-th realization
-        if verbose > 1:
-            print(f'{fname}: simulation {ireal+1} of {nreal}...')
-        for ntry in range(ntry_max):
-            sim_ok = True
-            if verbose > 2 and ntry > 0:
-                print(f'   ... new trial ({ntry+1} of {ntry_max}) for simulation {ireal+1} of {nreal}...')
-            if x is None:
-                # Unconditional case
-                # ------------------
-                # Generate T (one real)
-                try:
-                    sim_T = multiGaussian.multiGaussianRun(
-                            cov_model_T, dimension, spacing, origin,
-                            mode='simulation', algo=algo_T, output_mode='array',
-                            **params_T, nreal=1)
-                except:
+# ----------------------------------------------------------------------------
+def _srf_mg_mc_simulate(
+        rng, ireal_list, nreal, full_output, fname, verbose,
+        categVal, kernel_T, kernel_Y, kernel_Y_pow, kernel_Y_rev,
+        mh_block_size, mh_iter, npt, ntry_max, params_T, pinv_Y, prep_T,
+        spacing_Y, t, v_T, v_ext, v_ext_cat, x, yt):
+    """
+    Generates realizations for the function :func:`srf_mg_mc`.
+
+    The realizations of index in `ireal_list` are generated, the realization
+    of index `ireal` with the stream of index `ireal` of `rng` (see function
+    :func:`randomStream.rng_streams`), such that generating all the
+    realizations at once or by subsets (with the corresponding streams) gives
+    the same result (see function :func:`_simulate_T_batch`).
+
+    Parameters
+    ----------
+    rng : any type
+        random number generator specification (see module :mod:`randomStream`)
+        for the realizations of index in `ireal_list`
+    ireal_list : sequence of ints
+        indexes of the realizations to be generated, in increasing order
+    nreal : int
+        total number of realizations (for displaying)
+    full_output : bool
+        see function :func:`srf_mg_mc`
+    fname : str
+        name of the calling function (for displaying)
+    verbose : int
+        verbose mode
+    other parameters
+        result of the function :func:`_srf_mg_mc_preliminary`
+
+    Returns
+    -------
+    Z : dict
+        realizations, `Z[ireal]` is the realization of index `ireal`
+        (flattened array), or `None` if it failed
+    T : dict
+        directing function of each realization (`None` values if
+        `full_output=False`)
+    Y : dict
+        coding process of each realization (`None` values if
+        `full_output=False`)
+    """
+    # Copy of the array modified in place (given arrays can be in shared memory)
+    if v_T is not None:
+        v_T = v_T.copy()
+
+    # Random number generator (stream) for each realization
+    try:
+        rngs = dict(zip(ireal_list, randomStream.rng_streams(rng, len(ireal_list))))
+    except Exception as exc:
+        err_msg = f'{fname}: `rng` invalid'
+        raise SrfError(err_msg) from exc
+
+    # Initialization for output
+    Z = {ireal: None for ireal in ireal_list}
+    T = {ireal: None for ireal in ireal_list}
+    Y = {ireal: None for ireal in ireal_list}
+
+    # The realizations are generated by batch: at each trial, the fields T of
+    # all the realizations still to be generated are generated from the same
+    # preliminary computation (see function `_simulate_T_batch`), only the
+    # simulation of T at the conditioning locations (Metropolis-Hasting) and
+    # the simulation of Y (substitution) are done per realization
+    ireal_todo = list(ireal_list)
+    for ntry in range(ntry_max):
+        if len(ireal_todo) == 0:
+            break
+        if verbose > 2 and ntry > 0:
+            print(f'   ... new trial ({ntry+1} of {ntry_max}) for {len(ireal_todo)} simulation(s)...')
+        if x is None:
+            # Unconditional case
+            # ------------------
+            ireal_batch = ireal_todo
+            v_T_batch = None
+        else:
+            # Conditional case
+            # ----------------
+            ireal_batch = []
+            v_T_batch = []
+            for ireal in ireal_todo:
+                sim_ok = True
+                # Initialize: unconditional simulation of T at x (values in v_T)
+                if kernel_T is None:
                     sim_ok = False
                     if verbose > 2:
-                        print('   ... simulation of T failed')
+                        print('    ... cannot solve kriging system (for T, initialization)')
                     continue
-                # except Exception as exc:
-                #     err_msg = f'{fname}: simulation of T failed'
-                #     raise SrfError(err_msg) from exc
 
-                # -> nd-array of shape
-                #      (1, dimension) (for T in 1D)
-                #      (1, dimension[1], dimension[0]) (for T in 2D)
-                #      (1, dimension[2], dimension[1], dimension[0]) (for T in 3D)
+                v_T[:npt] = kernel_T.sample_unconditional(rngs[ireal])
+
+                # Update simulated values v_T at x using Metropolis-Hasting (MH) algorithm:
+                # the conditioning locations are visited (in random order) by blocks of
+                # `mh_block_size` locations, for each block B:
+                #    - new values v_T_new[B] are drawn in the conditional distribution of
+                #      T(x[B]) given the values at the other locations (using the precision
+                #      matrix of T at x, factorized once, see class
+                #      `multiGaussian.GaussianConditionalKernel`)
+                #    - the new values are accepted with probability min(1, p_new/p),
+                #      where p_new = prob(Y[v_T_new] = v_ext), p = prob(Y[v_T] = v_ext)
+                #      (with the additional constraint (t, yt), see function `_mc_log_prob`)
+                log_p = _mc_log_prob(v_T, v_ext_cat, spacing_Y, pinv_Y, kernel_Y_pow)
+                for nit in range(mh_iter):
+                    if verbose > 3:
+                        print(f'   ... sim {ireal+1} of {nreal}: MH iter {nit+1} of {mh_iter}...')
+                    kernel_T.refresh()
+                    ind = rngs[ireal].permutation(npt)
+                    for i in range(0, npt, mh_block_size):
+                        indb = ind[i:i+mh_block_size]
+                        # Draw new values in the conditional distribution
+                        v_T_new = v_T.copy()
+                        v_T_new[indb] = kernel_T.sample_block(indb, rngs[ireal])
+                        #
+                        # Compute log of MH quotient p_new / p
+                        log_p_new = _mc_log_prob(v_T_new, v_ext_cat, spacing_Y, pinv_Y, kernel_Y_pow)
+                        if log_p_new >= log_p or rngs[ireal].random() < np.exp(log_p_new - log_p):
+                            # Accept new values v_T_new[indb] at x[indb]
+                            v_T = v_T_new
+                            kernel_T.update(indb, v_T[indb])
+                            log_p = log_p_new
+
+                ireal_batch.append(ireal)
+                v_T_batch.append(v_T.copy())
+
+            if len(ireal_batch) == 0:
+                continue
+
+            v_T_batch = np.asarray(v_T_batch)
+
+        # Generate T (all realizations of the batch, conditional to (x, v_T[0:npt]) if x is not None)
+        sim_T_batch, sim_T_ok = _simulate_T_batch(
+                prep_T, params_T, None if x is None else v_T_batch[:, :npt],
+                rng, rngs, ireal_batch, fname)
+
+        # -> nd-array of shape
+        #      (m, dimension) (for T in 1D)
+        #      (m, dimension[1], dimension[0]) (for T in 2D)
+        #      (m, dimension[2], dimension[1], dimension[0]) (for T in 3D)
+        #    where m = len(ireal_batch)
+
+        for j, ireal in enumerate(ireal_batch):
+            # Generate ireal-th realization
+            if verbose > 1:
+                print(f'{fname}: simulation {ireal+1} of {nreal}...')
+            sim_ok = True
+            if not sim_T_ok[j]:
+                sim_ok = False
+                if verbose > 2:
+                    print('   ... simulation of T failed')
+                continue
 
+            sim_T = sim_T_batch[j:j+1]
+            if x is None:
+                # Unconditional case
+                # ------------------
                 # Set origin and dimension for Y
                 min_T = np.min(sim_T)
                 max_T = np.max(sim_T)
@@ -608,7 +1216,7 @@ def srf_mg_mc(
                             kernel_Y, dimension_Y,
                             categVal=categVal, data_ind=yind, data_val=yval,
                             pinv=pinv_Y, kernel_rev=kernel_Y_rev, kernel_pow=kernel_Y_pow,
-                            nreal=1)
+                            nreal=1, rng=rngs[ireal])
                 except:
                     sim_ok = False
                     if verbose > 2:
@@ -619,204 +1227,11 @@ def srf_mg_mc(
                 #     raise SrfError(err_msg) from exc
 
                 # -> 2d-array of shape (1, dimension_Y)
-
+            #
             else:
                 # Conditional case
                 # ----------------
-                # Initialize: unconditional simulation of T at x (values in v_T)
-                ind = np.random.permutation(npt)
-                for j, k in enumerate(ind):
-                    # Simulate value at x[k] (= x[ind[j]]), conditionally to the previous ones
-                    # Solve the kriging system (for T)
-                    try:
-                        w = np.linalg.solve(
-                                mat_T[ind[:j], :][:, ind[:j]], # kriging matrix
-                                mat_T[ind[:j], ind[j]], # second member
-                            )
-                    except:
-                        sim_ok = False
-                        break
-
-                    # Mean (kriged) value at x[k]
-                    mu_T_k = mean_T[x_mean_T_grid_ind[k]] + (v_T[ind[:j]] - mean_T[x_mean_T_grid_ind[ind[:j]]]).dot(w)
-                    # Standard deviation (of kriging) at x[k]
-                    std_T_k = np.sqrt(np.maximum(0, cov0_T - np.dot(w, mat_T[ind[:j], ind[j]])))
-                    # Draw value in N(mu_T_k, std_T_k^2)
-                    v_T[k] = np.random.normal(loc=mu_T_k, scale=std_T_k)
-
-                if not sim_ok:
-                    sim_ok = False
-                    if verbose > 2:
-                        print('    ... cannot solve kriging system (for T, initialization)')
-                    continue
-
-                # Update simulated values v_T at x using Metropolis-Hasting (MH) algorithm
-                for nit in range(mh_iter):
-                    if verbose > 3:
-                        print(f'   ... sim {ireal+1} of {nreal}: MH iter {nit+1} of {mh_iter}...')
-                    ind = np.random.permutation(npt)
-                    for k in ind:
-                        # Sequence of indexes without k
-                        indmat = np.hstack((np.arange(k), np.arange(k+1, npt)))
-                        # Simulate possible new value v_T_new at x[k], conditionally to all the ohter ones
-                        #
-                        # Solve the kriging system for T
-                        try:
-                            w = np.linalg.solve(
-                                    mat_T[indmat, :][:, indmat], # kriging matrix
-                                    mat_T[indmat, k], # second member
-                                )
-                        except:
-                            sim_ok = False
-                            if verbose > 2:
-                                print('   ... cannot solve kriging system (for T)')
-                            break
-                        #
-                        # Mean (kriged) value at x[k]
-                        mu_T_k = mean_T[x_mean_T_grid_ind[k]] + (v_T[indmat] - mean_T[x_mean_T_grid_ind[indmat]]).dot(w)
-                        # Standard deviation (of kriging) at x[k]
-                        std_T_k = np.sqrt(np.maximum(0, cov0_T - np.dot(w, mat_T[indmat, k])))
-                        # Draw value in N(mu, std^2)
-                        v_T_k_new = np.random.normal(loc=mu_T_k, scale=std_T_k)
-                        #
-                        # Compute MH quotient defined as
-                        #    p_new / p
-                        # where:
-                        #    p_new = prob(Y[v_T_k_new] = v[k] | Y[indmat] = v[indmat], Y[t] = yt)
-                        #    p = prob(Y[v_T[k]] = v[k] | Y[indmat] = v[indmat], Y[t] = yt)
-                        inds = np.argsort(v_T)
-                        # --- Compute p ---
-                        v_T_k_i = np.where(inds==k)[0][0]
-                        # v_T[k] = v_T[inds[v_T_k_i]]
-                        if v_T_k_i == 0:
-                            # v_T[k] is the smallest value in v_T
-                            # we have
-                            #     v_T[k]  <= v_T[inds[v_T_k_i+1]]
-                            #     p = prob(Y[v_T[k]] = v_ext[k] | Y[v_T[inds[v_T_k_i+1]]] = v_ext[inds[v_T_k_i+1]])
-                            i1 = int((v_T[inds[v_T_k_i+1]] - v_T[k]) / spacing_Y)
-                            #     p = kernel_Y_rev^i1[v_ext_cat[inds[v_T_k_i+1]], v_ext_cat[k]]
-                            if i1 >= m_rev_pow:
-                                kernel_Y_rev_pow = np.concatenate((kernel_Y_rev_pow, np.zeros((i1-m_rev_pow+1, n, n))), axis=0)
-                                for i in range(m_rev_pow, i1+1):
-                                    kernel_Y_rev_pow[i] = kernel_Y_rev_pow[i-1].dot(kernel_Y_rev)
-                                m_rev_pow = i1+1
-                            p = kernel_Y_rev_pow[i1, v_ext_cat[inds[v_T_k_i+1]], v_ext_cat[k]]
-                        elif v_T_k_i == npt_ext-1:
-                            # v_T[k] is the largest value in v_T
-                            # we have
-                            #     v_T[inds[v_T_k_i-1]] <= v_T[k]
-                            #     p = prob(Y[v_T[k]] = v_ext[k] | Y[v_T[inds[v_T_k_i-1]]] = v_ext[inds[v_T_k_i-1]])
-                            i0 = int((v_T[k] - v_T[inds[v_T_k_i-1]]) / spacing_Y)
-                            #     p = kernel_Y^i0[v_ext_cat[inds[v_T_k_i-1]], v_ext_cat[k]]
-                            if i0 >= m_pow:
-                                kernel_Y_pow = np.concatenate((kernel_Y_pow, np.zeros((i0-m_pow+1, n, n))), axis=0)
-                                for i in range(m_pow, i0+1):
-                                    kernel_Y_pow[i] = kernel_Y_pow[i-1].dot(kernel_Y)
-                                m_pow = i0+1
-                            p = kernel_Y_pow[i0, v_ext_cat[inds[v_T_k_i-1]], v_ext_cat[k]]
-                        else:
-                            # v_T[k] is neither the smallest nor the largest value in v_T
-                            # we have
-                            #     v_T[inds[v_T_k_i-1]] <= v_T[k] <= v_T[inds[v_T_k_i+1]]
-                            #     p = prob(Y[v_T[k]] = v_ext[k] | Y[v_T[inds[v_T_k_i-1]]] = v_ext[inds[v_T_k_i-1]], Y[v_T[inds[v_T_k_i+1]]] = v_ext[inds[v_T_k_i+1]])
-                            i0 = int((v_T[k] - v_T[inds[v_T_k_i-1]]) / spacing_Y)
-                            i1 = int((v_T[inds[v_T_k_i+1]] - v_T[k]) / spacing_Y)
-                            #     p = kernel_Y^i0[v_ext_cat[inds[v_T_k_i-1]], v_ext_cat[k]] * kernel_Y^i1[v_ext_cat[k], v_ext_cat[inds[v_T_k_i+1]]] / kernel_Y^(i0+i1)[v_ext_cat[inds[v_T_k_i-1]], v_ext_cat[inds[v_T_k_i+1]]]
-                            ii = i0+i1
-                            if ii >= m_pow:
-                                kernel_Y_pow = np.concatenate((kernel_Y_pow, np.zeros((ii-m_pow+1, n, n))), axis=0)
-                                for i in range(m_pow, ii+1):
-                                    kernel_Y_pow[i] = kernel_Y_pow[i-1].dot(kernel_Y)
-                                m_pow = ii+1
-                            denom = kernel_Y_pow[ii, v_ext_cat[inds[v_T_k_i-1]], v_ext_cat[inds[v_T_k_i+1]]]
-                            if np.isclose(denom, 0):
-                                # p = 0.
-                                # Accept new value v_T_new at x[k]
-                                v_T[k] = v_T_k_new
-                                continue
-                            else:
-                                p = kernel_Y_pow[i0, v_ext_cat[inds[v_T_k_i-1]], v_ext_cat[k]] * kernel_Y_pow[i1, v_ext_cat[k], v_ext_cat[inds[v_T_k_i+1]]] / denom
-                        # --- Compute p_new ---
-                        v_T_k_new_i = npt_ext
-                        for i in range(npt_ext):
-                            if v_T[inds[i]]>=v_T_k_new:
-                                v_T_k_new_i = i
-                                break
-                        if v_T_k_new_i == 0:
-                            # v_T_k_new <= v_T[i] for all i
-                            # we have
-                            #     v_T_k_new <= v_T[inds[0]]
-                            #     p_new = prob(Y[v_T_k_new] = v_ext[k] | Y[v_T[inds[0]]] = v_ext[inds[0]])
-                            i1 = int((v_T[inds[0]] - v_T_k_new) / spacing_Y)
-                            #     p_new = kernel_Y_rev^i1[v_ext_cat[inds[0]], v_ext_cat[k]]
-                            if i1 >= m_rev_pow:
-                                kernel_Y_rev_pow = np.concatenate((kernel_Y_rev_pow, np.zeros((i1-m_rev_pow+1, n, n))), axis=0)
-                                for i in range(m_rev_pow, i1+1):
-                                    kernel_Y_rev_pow[i] = kernel_Y_rev_pow[i-1].dot(kernel_Y_rev)
-                                m_rev_pow = i1+1
-                            p_new = kernel_Y_rev_pow[i1, v_ext_cat[inds[0]], v_ext_cat[k]]
-                        elif v_T_k_new_i == npt_ext:
-                            # v_T_k_new > v_T[i] for all i
-                            # we have
-                            #     v_T[inds[npt_ext-1] <= v_T_k_new
-                            #     p_new = prob(Y[v_T_k_new] = v_ext[k] | Y[v_T[inds[npt_ext-1]]] = v_ext[inds[npt_ext-1]])
-                            i0 = int((v_T_k_new - v_T[inds[npt_ext-1]]) / spacing_Y)
-                            #     p_new = kernel_Y^i0[v_ext_cat[inds[npt_ext-1]], v_ext_cat[k]]
-                            if i0 >= m_pow:
-                                kernel_Y_pow = np.concatenate((kernel_Y_pow, np.zeros((i0-m_pow+1, n, n))), axis=0)
-                                for i in range(m_pow, i0+1):
-                                    kernel_Y_pow[i] = kernel_Y_pow[i-1].dot(kernel_Y)
-                                m_pow = i0+1
-                            p_new = kernel_Y_pow[i0, v_ext_cat[npt_ext-1], v_ext_cat[k]]
-                        else:
-                            # we have
-                            #     v_T[inds[v_T_k_new_i-1]] < v_T_k_new <= v_T[inds[v_T_k_new_i]]
-                            #     p_new = prob(Y[v_T_k_new] = v_ext[k] | Y[v_T[inds[v_T_k_new_i-1]]] = v_ext[inds[v_T_k_new_i-1]], Y[v_T[inds[v_T_k_new_i]]] = v_ext[inds[v_T_k_new_i-1]])
-                            i0 = int((v_T_k_new - v_T[inds[v_T_k_new_i-1]]) / spacing_Y)
-                            i1 = int((v_T[inds[v_T_k_new_i]] - v_T_k_new) / spacing_Y)
-                            #     p = kernel_Y^i0[v_ext_cat[inds[v_T_k_new_i-1]], v_ext_cat[k]] * kernel_Y^i1[v_ext_cat[k], v_ext_cat[inds[v_T_k_new_i]]] / kernel_Y^(i0+i1)[v_ext_cat[inds[v_T_k_new_i-1]], v_ext_cat[inds[v_T_k_new_i]]]
-                            ii = i0+i1
-                            if ii >= m_pow:
-                                kernel_Y_pow = np.concatenate((kernel_Y_pow, np.zeros((ii-m_pow+1, n, n))), axis=0)
-                                for i in range(m_pow, ii+1):
-                                    kernel_Y_pow[i] = kernel_Y_pow[i-1].dot(kernel_Y)
-                                m_pow = ii+1
-                            denom = kernel_Y_pow[ii, v_ext_cat[inds[v_T_k_new_i-1]], v_ext_cat[inds[v_T_k_new_i]]]
-                            if np.isclose(denom, 0):
-                                p_new = 0.
-                            else:
-                                p_new = kernel_Y_pow[i0, v_ext_cat[inds[v_T_k_new_i-1]], v_ext_cat[k]] * kernel_Y_pow[i1, v_ext_cat[k], v_ext_cat[inds[v_T_k_new_i]]] / denom
-                        #
-                        mh_quotient = p_new/p
-                        if mh_quotient >= 1.0 or np.random.random() < mh_quotient:
-                            # Accept new value v_T_new at x[k]
-                            v_T[k] = v_T_k_new
-                    #
-                    if not sim_ok:
-                        break
-                #
-                if not sim_ok:
-                    continue
-
-                # Generate T conditional to (x, v_T[0:npt]) (one real)
-                try:
-                    sim_T = multiGaussian.multiGaussianRun(
-                            cov_model_T, dimension, spacing, origin, x=x, v=v_T[:npt],
-                            mode='simulation', algo=algo_T, output_mode='array',
-                            **params_T, nreal=1)
-                except:
-                    sim_ok = False
-                    if verbose > 2:
-                        print('   ... conditional simulation of T failed')
-                    continue
-                # except Exception as exc:
-                #     err_msg = f'{fname}: conditional simulation of T failed'
-                #     raise SrfError(err_msg) from exc
-
-                # -> nd-array of shape
-                #      (1, dimension) (for T in 1D)
-                #      (1, dimension[1], dimension[0]) (for T in 2D)
-                #      (1, dimension[2], dimension[1], dimension[0]) (for T in 3D)
+                v_T = v_T_batch[j]
 
                 # Set origin and dimension for Y
                 min_T = np.min(sim_T)
@@ -842,7 +1257,7 @@ def srf_mg_mc(
                             kernel_Y, dimension_Y,
                             categVal=categVal, data_ind=yind, data_val=v_ext,
                             pinv=pinv_Y, kernel_rev=kernel_Y_rev, kernel_pow=kernel_Y_pow,
-                            nreal=1)
+                            nreal=1, rng=rngs[ireal])
                 except:
                     sim_ok = False
                     if verbose > 2:
@@ -864,51 +1279,35 @@ def srf_mg_mc(
             Z_real = mc_Y[0][ind]
             # Z_real = mc_Y[0][np.floor((sim_T.reshape(-1) - origin_Y)/spacing_Y).astype(int)]
             if sim_ok:
-                Z.append(Z_real)
+                Z[ireal] = Z_real
                 if full_output:
-                    T.append(sim_T[0])
-                    Y.append([dimension_Y, spacing_Y, origin_Y, mc_Y.reshape(dimension_Y)])
-                break
+                    T[ireal] = sim_T[0]
+                    Y[ireal] = [dimension_Y, spacing_Y, origin_Y, mc_Y.reshape(dimension_Y)]
 
-    # Get Z
-    if verbose > 0 and len(Z) < nreal:
-        print(f'{fname}: WARNING: some realization failed (missing)')
-    Z = np.asarray(Z).reshape(len(Z), *np.atleast_1d(dimension)[::-1])
+        # Realizations to be generated at the next trial
+        ireal_todo = [ireal for ireal in ireal_todo if Z[ireal] is None]
 
-    if full_output:
-        T = np.asarray(T).reshape(len(T), *np.atleast_1d(dimension)[::-1])
-        return Z, T, Y
-    else:
-        return Z
+    return Z, T, Y
 # ----------------------------------------------------------------------------
 
-# ============================================================================
-# Tools for simulating continuous SRF with
-#     - multi-Gaussian simulation as directing function (latent field)
-#     - multi-Gaussian simulation as coding process
-# ============================================================================
-
 # ----------------------------------------------------------------------------
-def srf_mg_mg(
-        cov_model_T, cov_model_Y,
+def srf_mg_mc(
+        cov_model_T, kernel_Y,
         dimension, spacing=None, origin=None,
         spacing_Y=0.001,
+        categVal=None,
         x=None, v=None,
         t=None, yt=None,
-        vmin=None, vmax=None,
         algo_T='fft', params_T=None,
-        algo_Y='fft', params_Y=None,
-        target_distrib=None,
-        initial_distrib=None,
-        mh_iter=100,
-        ntry_max=1,
+        mh_iter=100, mh_block_size=1, ntry_max=1,
         nreal=1,
+        rng=None,
         full_output=True,
         verbose=1):
     """
-    Substitution Random Function (SRF) - multi-Gaussian + multi-Gaussian.
+    Substitution Random Function (SRF) - multi-Gaussian + Markov chain (on finite set).
 
-    This function allows to generate continuous random fields in 1D, 2D, 3D, based on
+    This function allows to generate categorical random fields in 1D, 2D, 3D, based on
     a SRF Z defined as
 
     - Z(x) = Y(T(x))
@@ -916,21 +1315,34 @@ def srf_mg_mg(
     where
 
     - T is the directing function, a multi-Gaussian random field (latent field)
-    - Y is the coding process, a multi-Gaussian random process (1D)
+    - Y is the coding process, a Markov chain on finite sets (of categories) (1D)
 
     Z and T are fields in 1D, 2D or 3D.
 
     Notes
     -----
-    The module :mod:`multiGaussian` is used for the multi-Gaussian fields T and Y.
+    The module :mod:`multiGaussian` is used for the multi-Gaussian field T, and the
+    module :mod:`markovChain` is used for the markov chain Y.
 
     Parameters
     ----------
     cov_model_T : :class:`geone.CovModel.CovModel<d>D`
         covariance model for T, in 1D or 2D or 3D
 
-    cov_model_Y : :class:`CovModel.CovModel1D`
-        covariance model for Y, in 1D
+    kernel_Y : 2d-array of shape (n, n)
+        transition kernel for Y of a Markov chain on a set of states
+        :math:`S=\\{0, \ldots, n-1\\}`, where `n` is the number of categories
+        (states); the element at row `i` and column `j` is the probability to have
+        the state of index `j` at the next step given the state `i` at the current
+        step, i.e.
+
+        - :math:`kernel[i][j] = P(Y_{k+1}=j\\ \\vert\\ Y_{k}=i)`
+
+        where the sequence of random variables :math:`(Y_k)` is a Markov chain
+        on `S` defined by the kernel `kernel`.
+
+        In particular, every element of `kernel` is positive or zero, and its
+        rows sum to one.
 
     dimension : [sequence of] int(s)
         number of cells along each axis, for simulation in:
@@ -959,8 +1371,12 @@ def srf_mg_mg(
 
     spacing_Y : float, default: 0.001
         positive value, resolution of the Y process, spacing along abscissa
-        between two cells in the field Y (btw. two adjacent cell in 1D-grid
-        for Y)
+        between two steps in the Markov chain Y (btw. two adjacent cell in
+        1D-grid for Y)
+
+    categVal : 1d-array of shape (n,), optional
+        values of categories (one value for each state `0, ..., n-1`);
+        by default (`None`) : `categVal` is set to `[0, ..., n-1]`
 
     x : array-like of floats, optional
         data points locations (float coordinates), for simulation in:
@@ -981,12 +1397,6 @@ def srf_mg_mg(
     yt : 1d-array-like of floats, or float, optional
         value of Y at the conditioning point `t` (same length as `t`)
 
-    vmin : float, optional
-        minimal value for Z (or Y); simulation are rejected if not honoured
-
-    vmax : float, optional
-        maximal value for Z (or Y); simulation are rejected if not honoured
-
     algo_T : str
         defines the algorithm used for generating multi-Gaussian field T:
 
@@ -1000,85 +1410,51 @@ def srf_mg_mg(
         keyword arguments (additional parameters) to be passed to the function
         corresponding to what is specified by the argument `algo_T` (see the
         corresponding function for its keyword arguments), in particular the key
-        'mean' can be specified (set to value 0 if not specified)
-
-    algo_Y : str
-        defines the algorithm used for generating 1D multi-Gaussian field Y:
-
-        - 'fft' or 'FFT' (default): based on circulant embedding and FFT, \
-        function called: :func:`grf.grf1D`
-        - 'classic' or 'CLASSIC': classic algorithm, based on the resolution \
-        of kriging system considered points in a search ellipsoid, function \
-        called: :func:`geoscalassicinterface.simulate1D`
-
-    params_Y : dict, optional
-        keyword arguments (additional parameters) to be passed to the function
-        corresponding to what is specified by the argument `algo_Y` (see the
-        corresponding function for its keyword arguments), in particular the key
-        'mean' can be specified (if not specified, set to the mean value of `v`
-        if `v` is not `None`, set to 0 otherwise)
-
-    target_distrib : class
-        target distribution for the value of a single realization of Z, with
-        attributes:
-
-        - target_distrib.cdf : (`func`) cdf
-        - target_distrib.ppf : (`func`) inverse cdf
-
-        See `initial_distrib` below.
-
-    initial_distrib : class
-        initial distribution for the value of a single realization of Z, with
-        attributes:
-
-        - initial_distrib.cdf : (`func`) cdf
-        - initial_distrib.ppf : (`func`) inverse cdf
-
-        The procedure is the following:
-
-        1. conditioning data value `v` (if present) are transormed:
-            * `v_tilde = initial_distrib.ppf(target_distrib.cdf(v))`
-        2. SRF realization of `z_tilde` (conditionally to `v_tilde` if present) \
-        is generated
-        3. back-transform is applied to obtain the final realization:
-            * `z = target_distrib.ppf(initial_distrib.cdf(z_tilde))`
-
-        By default:
-
-        - `target_distrib = None`
-        - `initial_distrib = None`
-
-        * For unconditional case:
-            - if `target_distrib` is `None`: no transformation is applied
-            - otherwise (not `None`): transformation is applied (step 3. above)
-        * For conditional case:
-            - if `target_distrib` is `None`: no transformation is applied
-            - otherwise (not `None`): transformation is applied (steps 1 and 3. \
-            above); this requires that `initial_distrib` is specified (not `None`), \
-            or that `t` and `yt` are specified with the value "mean_T" given in `t`
-
-        The distribution `initial_distrib` is used when needed:
-
-        * as specified (if not `None`, be sure of what is given)
-        * computed automatically otherwise (if `None`): \
-        the distribution returned by the function \
-        :func:`compute_distrib_Z_given_Y_of_mean_T`, with the keyword arguments \
-        (only for unconditional case)
-            - mean_Y  : set to `mean_Y` (see above)
-            - cov_T_0 : set to the covariance of T evaluated at 0 (`cov_model_T.func()(0)[0]`)
-            - y_mean_T: set to `yt[i0]`, where `t[i0]=mean_T` (if exists, see `t`, `yt` above) \
-            or set to Y(mean(T)) computed after step 2 above (otherwise)
+        'mean' can be specified (set to value 0 if not specified); note: for
+        conditional simulation, the keys 'aggregate_data_op',
+        'aggregate_data_op_kwargs' (aggregation of the values of T at the
+        conditioning locations in the grid cells, default: 'sgs') and
+        'conditioningMethod' are used as by the function `geone.grf.grf<d>D`,
+        and the key 'computeKrigSD' is ignored
 
     mh_iter : int, default: 100
         number of iteration for Metropolis-Hasting algorithm, for conditional
         simulation only; note: used only if `x` or `t` is not `None`
 
+    mh_block_size : int, default: 1
+        number of conditioning locations updated together (block) in the
+        Metropolis-Hasting algorithm: at each iteration, the conditioning
+        locations are visited in random order by blocks, new values of T for
+        a block are drawn in the conditional distribution of T given the
+        values at the other conditioning locations (precision matrix, see
+        class :class:`multiGaussian.GaussianConditionalKernel`), and accepted
+        or rejected together; `mh_block_size=1` gives single-site updates;
+        larger blocks reduce the number of evaluations of the acceptation
+        probability (useful with many conditioning locations), but decrease
+        the acceptation rate
+
     ntry_max : int, default: 1
-        number of tries per realization before giving up if something goes wrong
+        number of tries per realization before giving up if something goes wrong;
+        note: at each try, the simulation of T at the conditioning locations
+        (Metropolis-Hasting) is done per realization, then the fields T of all
+        the realizations still to be generated are generated (with
+        `algo_T='fft'`, from the same preliminary computation, i.e. circulant
+        embedding of the covariance matrix), and the simulation of Y is done
+        per realization
 
     nreal : int, default: 1
         number of realization(s)
 
+    rng : int, or :class:`numpy.random.SeedSequence`, or :class:`numpy.random.Generator`, or sequence, optional
+        random number generator specification (see module :mod:`randomStream`);
+        by default (`None`): the global random state of `numpy.random` is used;
+        otherwise, each realization is generated with its own independent
+        stream spawned from `rng` (used for all the random draws of the
+        realization, including the simulation of the fields T and Y); note:
+        with `algo_T='fft'` and `method=3` (default, see `params_T`), the fields
+        T of the realizations 2k and 2k+1 are generated together (see function
+        `geone.grf.grf1D`), from the streams of both realizations
+
     full_output : bool, default: True
         - if `True`: simulation(s) of Z, T, and Y are retrieved in output
         - if `False`: simulation(s) of Z only is retrieved in output
@@ -1105,7 +1481,7 @@ def srf_mg_mg(
         returned if `full_output=True`
 
     Y : list of length nreal
-        1D random fields of all realizations, `Y[k]` is a list of length 4 for
+        markov chains of all realizations, `Y[k]` is a list of length 4 for
         the `k`-th realization:
 
         - Y[k][0]: int, Y_nt (number of cell along t-axis)
@@ -1115,10 +1491,191 @@ def srf_mg_mg(
 
         returned if `full_output=True`
     """
-    fname = 'srf_mg_mg'
+    fname = 'srf_mg_mc'
 
-    if algo_T not in ('fft', 'FFT', 'classic', 'CLASSIC'):
-        err_msg = f"{fname}: `algo_T` invalid, should be 'fft' (default) or 'classic'"
+    prep = _srf_mg_mc_preliminary(
+            fname,
+            cov_model_T=cov_model_T,
+            kernel_Y=kernel_Y,
+            dimension=dimension,
+            spacing=spacing,
+            origin=origin,
+            spacing_Y=spacing_Y,
+            categVal=categVal,
+            x=x,
+            v=v,
+            t=t,
+            yt=yt,
+            algo_T=algo_T,
+            params_T=params_T,
+            mh_iter=mh_iter,
+            mh_block_size=mh_block_size,
+            ntry_max=ntry_max)
+
+    # Number of realization(s)
+    nreal = int(nreal) # cast to int if needed
+
+    if nreal <= 0:
+        if full_output:
+            if verbose > 0:
+                print(f'{fname}: WARNING: `nreal` <= 0: `None`, `None`, `None` is returned')
+            return None, None, None
+        else:
+            if verbose > 0:
+                print(f'{fname}: WARNING: `nreal` <= 0: `None` is returned')
+            return None
+
+    Z, T, Y = _srf_mg_mc_simulate(
+            rng, range(nreal), nreal, full_output, fname, verbose,
+            **prep)
+
+    # Get Z
+    ireal_ok = [ireal for ireal in range(nreal) if Z[ireal] is not None]
+    if verbose > 0 and len(ireal_ok) < nreal:
+        print(f'{fname}: WARNING: some realization failed (missing)')
+    Z = np.asarray([Z[ireal] for ireal in ireal_ok]).reshape(len(ireal_ok), *np.atleast_1d(dimension)[::-1])
+
+    if full_output:
+        T = np.asarray([T[ireal] for ireal in ireal_ok]).reshape(len(ireal_ok), *np.atleast_1d(dimension)[::-1])
+        Y = [Y[ireal] for ireal in ireal_ok]
+        return Z, T, Y
+    else:
+        return Z
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def srf_mg_mc_mp(
+        cov_model_T, kernel_Y,
+        dimension, spacing=None, origin=None,
+        spacing_Y=0.001,
+        categVal=None,
+        x=None, v=None,
+        t=None, yt=None,
+        algo_T='fft', params_T=None,
+        mh_iter=100, mh_block_size=1, ntry_max=1,
+        nreal=1,
+        rng=None,
+        full_output=True,
+        verbose=1,
+        nproc=-1):
+    """
+    Computes the same as the function :func:`srf.srf_mg_mc`, using multiprocessing.
+
+    All the parameters except `nproc` are the same as those of the function
+    :func:`srf.srf_mg_mc`.
+
+    The number of processes used (in parallel) is n, and determined by the
+    parameter `nproc` (int, optional) as follows:
+
+    - if `nproc > 0`: n = `nproc`,
+    - if `nproc <= 0`: n = max(nmax+`nproc`, 1), where nmax is the total \
+    number of cpu(s) of the system (retrieved by :func:`config.cpu_count`), \
+    i.e. all cpus except `-nproc` is used (but at least one)
+
+    The preliminary computation (checks, kriging matrices at the conditioning
+    locations, circulant embedding of the covariance matrix for T, ...) is
+    done once, and the arrays given in argument (data, kernel, arrays in the
+    dictionaries of parameters, ...) or resulting from the preliminary
+    computation are put in shared memory and used (read only) by the n
+    parallel processes. The realizations (specified by `nreal`) are
+    distributed one by one over the processes (the time needed for one
+    realization can vary, e.g. with the number of trials), each process
+    writing its realizations of Z and of the directing function directly in
+    shared output arrays (copied in the returned arrays).
+
+    Note that, if `nreal` < n, then n is reduced to `nreal`.
+
+    Each realization is generated with its own stream (see parameter `rng`),
+    as by the function :func:`srf.srf_mg_mc`, hence the result is the same as
+    the one of the function :func:`srf.srf_mg_mc` with the same `rng`, whatever
+    the number of processes; if `rng` is `None` (default) or a
+    :class:`numpy.random.RandomState`, a seed is first drawn from it (see
+    function :func:`randomStream.seed_from_rng`) and used as `rng`.
+
+    See function :func:`srf.srf_mg_mc` for details.
+    """
+    fname = 'srf_mg_mc_mp'
+
+    kwargs = dict(
+            cov_model_T=cov_model_T,
+            kernel_Y=kernel_Y,
+            dimension=dimension,
+            spacing=spacing,
+            origin=origin,
+            spacing_Y=spacing_Y,
+            categVal=categVal,
+            x=x,
+            v=v,
+            t=t,
+            yt=yt,
+            algo_T=algo_T,
+            params_T=params_T,
+            mh_iter=mh_iter,
+            mh_block_size=mh_block_size,
+            ntry_max=ntry_max
+            )
+
+    # Number of realization(s)
+    nreal = int(nreal) # cast to int if needed
+
+    if nreal <= 0:
+        return srf_mg_mc(**kwargs, nreal=nreal, rng=rng, full_output=full_output, verbose=verbose)
+
+    # Preliminary computation (done once)
+    prep = _srf_mg_mc_preliminary(fname, **kwargs)
+
+    # Random number generator: the streams of the realizations are spawned
+    # (legacy random state cannot be shared between processes)
+    if randomStream.is_legacy(rng):
+        rng = randomStream.seed_from_rng(rng)
+
+    return _srf_mp(
+            _srf_mg_mc_simulate, prep, dimension, np.asarray(prep['categVal']).dtype, 1, 1,
+            nreal, rng, full_output, nproc, fname, verbose)
+# ----------------------------------------------------------------------------
+
+# ============================================================================
+# Tools for simulating continuous SRF with
+#     - multi-Gaussian simulation as directing function (latent field)
+#     - multi-Gaussian simulation as coding process
+# ============================================================================
+
+# ----------------------------------------------------------------------------
+def _srf_mg_mg_preliminary(
+        fname,
+        cov_model_T, cov_model_Y,
+        dimension, spacing=None, origin=None,
+        spacing_Y=0.001,
+        x=None, v=None,
+        t=None, yt=None,
+        vmin=None, vmax=None,
+        algo_T='fft', params_T=None,
+        algo_Y='fft', params_Y=None,
+        target_distrib=None,
+        initial_distrib=None,
+        mh_iter=100,
+        ntry_max=1,
+        verbose=1):
+    """
+    Preliminary computation for the function :func:`srf_mg_mg`.
+
+    This function checks the parameters and does the computations that do not
+    depend on the realizations (e.g. kriging matrices at the conditioning
+    locations, preliminary computation for T, see function
+    :func:`_simulate_T_preliminary`).
+
+    The parameters are the same as those of the function :func:`srf_mg_mg`
+    (except `nreal`, `rng`, `full_output`), and `fname` (str) is the name
+    of the calling function (for displaying).
+
+    Returns
+    -------
+    prep : dict
+        parameters and arrays used for generating the realizations (keyword
+        arguments for the function :func:`_srf_mg_mg_simulate`)
+    """
+    if algo_T not in ('fft', 'FFT', 'classic', 'CLASSIC'):
+        err_msg = f"{fname}: `algo_T` invalid, should be 'fft' (default) or 'classic'"
         raise SrfError(err_msg)
 
     if algo_Y not in ('fft', 'FFT', 'classic', 'CLASSIC'):
@@ -1303,21 +1860,12 @@ def srf_mg_mg(
                         err_msg = f'{fname}: target distribution cannot be handled (cannot set `initial_distrib`: value of mean(T) should be specified in `t`)'
                         raise SrfError(err_msg)
 
-    # Number of realization(s)
-    nreal = int(nreal) # cast to int if needed
-
-    if nreal <= 0:
-        if full_output:
-            if verbose > 0:
-                print(f'{fname}: WARNING: `nreal` <= 0: `None`, `None`, `None` is returned')
-            return None, None, None
-        else:
-            if verbose > 0:
-                print(f'{fname}: WARNING: `nreal` <= 0: `None` is returned')
-            return None
-
     # Note: format of data (x, v) not checked !
 
+    # Parameters set in unconditional or conditional case only
+    compute_initial_distrib, cov_T_0, std_Y_0 = False, None, None
+    npt, npt_ext, v_T, v_ext, mat_T, mat_Y, cov0_T, cov0_Y, x_mean_T_grid_ind = None, None, None, None, None, None, None, None, None
+
     if x is None:
         if v is not None:
             err_msg = f'{fname}: `x` is not given (`None`) but `v` is given (not `None`)'
@@ -1507,100 +2055,137 @@ def srf_mg_mg(
         params_Y['verbose'] = 0
         # params_Y['verbose'] = verbose
 
-    # Initialization for output
-    Z = []
-    if full_output:
-        T = []
-        Y = []
+    # Preliminary computation for T
+    prep_T = _simulate_T_preliminary(
+            cov_model_T, dimension, spacing, origin,
+            x, algo_T, params_T, fname)
+
+    return dict(
+            algo_Y=algo_Y,
+            compute_initial_distrib=compute_initial_distrib,
+            cov0_T=cov0_T,
+            cov0_Y=cov0_Y,
+            cov_T_0=cov_T_0,
+            cov_model_Y=cov_model_Y,
+            distrib_transf=distrib_transf,
+            initial_distrib=initial_distrib,
+            mat_T=mat_T,
+            mat_Y=mat_Y,
+            mean_T=mean_T,
+            mean_Y=mean_Y,
+            mh_iter=mh_iter,
+            npt=npt,
+            npt_ext=npt_ext,
+            ntry_max=ntry_max,
+            params_T=params_T,
+            params_Y=params_Y,
+            prep_T=prep_T,
+            spacing_Y=spacing_Y,
+            std_Y_0=std_Y_0,
+            t=t,
+            target_distrib=target_distrib,
+            v=v,
+            v_T=v_T,
+            v_ext=v_ext,
+            vmax=vmax,
+            vmin=vmin,
+            x=x,
+            x_mean_T_grid_ind=x_mean_T_grid_ind,
+            yt=yt
+            )
+# ----------------------------------------------------------------------------
 
-    for ireal in range(nreal):
-        # Generate ireal-th realization
-        if verbose > 1:
-            print(f'{fname}: simulation {ireal+1} of {nreal}...')
-        for ntry in range(ntry_max):
-            sim_ok = True
-            Y_cond_aggregation = False
-            if verbose > 2 and ntry > 0:
-                print(f'   ... new trial ({ntry+1} of {ntry_max}) for simulation {ireal+1} of {nreal}...')
-            if x is None:
-                # Unconditional case
-                # ------------------
-                # Generate T (one real)
-                try:
-                    sim_T = multiGaussian.multiGaussianRun(
-                            cov_model_T, dimension, spacing, origin,
-                            mode='simulation', algo=algo_T, output_mode='array',
-                            **params_T, nreal=1)
-                except:
-                    sim_ok = False
-                    if verbose > 2:
-                        print('   ... simulation of T failed')
-                    continue
-                # except Exception as exc:
-                #     err_msg = f'{fname}: simulation of T failed'
-                #     raise SrfError(err_msg) from exc
+# ----------------------------------------------------------------------------
+def _srf_mg_mg_simulate(
+        rng, ireal_list, nreal, full_output, fname, verbose,
+        algo_Y, compute_initial_distrib, cov0_T, cov0_Y, cov_T_0, cov_model_Y,
+        distrib_transf, initial_distrib, mat_T, mat_Y, mean_T, mean_Y, mh_iter,
+        npt, npt_ext, ntry_max, params_T, params_Y, prep_T, spacing_Y, std_Y_0,
+        t, target_distrib, v, v_T, v_ext, vmax, vmin, x, x_mean_T_grid_ind, yt):
+    """
+    Generates realizations for the function :func:`srf_mg_mg`.
 
-                # -> nd-array of shape
-                #      (1, dimension) (for T in 1D)
-                #      (1, dimension[1], dimension[0]) (for T in 2D)
-                #      (1, dimension[2], dimension[1], dimension[0]) (for T in 3D)
+    The realizations of index in `ireal_list` are generated, the realization
+    of index `ireal` with the stream of index `ireal` of `rng` (see function
+    :func:`randomStream.rng_streams`), such that generating all the
+    realizations at once or by subsets (with the corresponding streams) gives
+    the same result (see function :func:`_simulate_T_batch`).
 
-                # Set origin and dimension for Y
-                min_T = np.min(sim_T)
-                max_T = np.max(sim_T)
-                if t is not None:
-                    min_T = min(t.min(), min_T)
-                    max_T = max(t.max(), max_T)
-                min_T = min_T - 0.5 * spacing_Y
-                max_T = max_T + 0.5 * spacing_Y
-                dimension_Y = int(np.ceil((max_T - min_T)/spacing_Y))
-                origin_Y = min_T - 0.5*(dimension_Y*spacing_Y - (max_T - min_T))
+    Parameters
+    ----------
+    rng : any type
+        random number generator specification (see module :mod:`randomStream`)
+        for the realizations of index in `ireal_list`
+    ireal_list : sequence of ints
+        indexes of the realizations to be generated, in increasing order
+    nreal : int
+        total number of realizations (for displaying)
+    full_output : bool
+        see function :func:`srf_mg_mg`
+    fname : str
+        name of the calling function (for displaying)
+    verbose : int
+        verbose mode
+    other parameters
+        result of the function :func:`_srf_mg_mg_preliminary`
 
-                # Generate Y conditional to possible additional constraint (t, yt) (one real)
-                try:
-                    sim_Y = multiGaussian.multiGaussianRun(
-                            cov_model_Y, dimension_Y, spacing_Y, origin_Y, x=t, v=yt,
-                            mode='simulation', algo=algo_Y, output_mode='array',
-                            **params_Y, nreal=1)
-                except:
-                    sim_ok = False
-                    if verbose > 2:
-                        print('   ... simulation of Y failed')
-                    continue
-                # except Exception as exc:
-                #     err_msg = f'{fname}: simulation of Y failed'
-                #     raise SrfError(err_msg) from exc
+    Returns
+    -------
+    Z : dict
+        realizations, `Z[ireal]` is the realization of index `ireal`
+        (flattened array), or `None` if it failed
+    T : dict
+        directing function of each realization (`None` values if
+        `full_output=False`)
+    Y : dict
+        coding process of each realization (`None` values if
+        `full_output=False`)
+    """
+    # Copy of the arrays modified in place (given arrays can be in shared memory)
+    if v_T is not None:
+        v_T = v_T.copy()
+        mat_Y = mat_Y.copy()
 
-                # -> 2d-array of shape (1, dimension_Y)
+    # Covariance function for Y
+    cov_func_Y = cov_model_Y.func()
 
-                if distrib_transf:
-                    if compute_initial_distrib:
-                        # Compute initial_distrib
-                        # (approximately based on mean(T) and y_mean_T)
-                        # print('... computing initial_distrib ...')
-                        sim_T_mean = sim_T.reshape(-1).mean()
-                        # Compute
-                        #    ind: node index (nearest node),
-                        #         rounded to lower index if between two grid nodes and index is positive
-                        ind_f = (sim_T_mean - origin_Y)/spacing_Y
-                        ind = ind_f.astype(int)
-                        ind = ind - 1 * np.all((ind == ind_f, ind > 0), axis=0)
-                        y_mean_T = sim_Y[0][ind]
-                        #y_mean_T = sim_Y[0][np.floor((sim_T_mean - origin_Y)/spacing_Y).astype(int)]
-                        initial_distrib = compute_distrib_Z_given_Y_of_mean_T(
-                            np.linspace(min(y_mean_T, mean_Y)-5.*std_Y_0, max(y_mean_T, mean_Y)+5.*std_Y_0, 501),
-                            cov_model_Y, mean_Y=mean_Y, y_mean_T=y_mean_T, cov_T_0=cov_T_0,
-                            fstd=4.5, nint=2001, assume_sorted=True
-                            )
-                    #
-                    # (Back-)transform sim_Y value
-                    sim_Y = target_distrib.ppf(initial_distrib.cdf(sim_Y))
-            #
-            else:
-                # Conditional case
-                # ----------------
+    # Random number generator (stream) for each realization
+    try:
+        rngs = dict(zip(ireal_list, randomStream.rng_streams(rng, len(ireal_list))))
+    except Exception as exc:
+        err_msg = f'{fname}: `rng` invalid'
+        raise SrfError(err_msg) from exc
+
+    # Initialization for output
+    Z = {ireal: None for ireal in ireal_list}
+    T = {ireal: None for ireal in ireal_list}
+    Y = {ireal: None for ireal in ireal_list}
+
+    # The realizations are generated by batch: at each trial, the fields T of
+    # all the realizations still to be generated are generated from the same
+    # preliminary computation (see function `_simulate_T_batch`), only the
+    # simulation of T at the conditioning locations (Metropolis-Hasting) and
+    # the simulation of Y (substitution) are done per realization
+    ireal_todo = list(ireal_list)
+    for ntry in range(ntry_max):
+        if len(ireal_todo) == 0:
+            break
+        if verbose > 2 and ntry > 0:
+            print(f'   ... new trial ({ntry+1} of {ntry_max}) for {len(ireal_todo)} simulation(s)...')
+        if x is None:
+            # Unconditional case
+            # ------------------
+            ireal_batch = ireal_todo
+            v_T_batch = None
+        else:
+            # Conditional case
+            # ----------------
+            ireal_batch = []
+            v_T_batch = []
+            for ireal in ireal_todo:
+                sim_ok = True
                 # Initialize: unconditional simulation of T at x (values in v_T)
-                ind = np.random.permutation(npt)
+                ind = rngs[ireal].permutation(npt)
                 for j, k in enumerate(ind):
                     # Simulate value at x[k] (= x[ind[j]]), conditionally to the previous ones
                     # Solve the kriging system (for T)
@@ -1618,7 +2203,7 @@ def srf_mg_mg(
                     # Standard deviation (of kriging) at x[k]
                     std_T_k = np.sqrt(np.maximum(0, cov0_T - np.dot(w, mat_T[ind[:j], ind[j]])))
                     # Draw value in N(mu_T_k, std_T_k^2)
-                    v_T[k] = np.random.normal(loc=mu_T_k, scale=std_T_k)
+                    v_T[k] = rngs[ireal].normal(loc=mu_T_k, scale=std_T_k)
 
                 if not sim_ok:
                     sim_ok = False
@@ -1649,7 +2234,7 @@ def srf_mg_mg(
                 for nit in range(mh_iter):
                     if verbose > 3:
                         print(f'   ... sim {ireal+1} of {nreal}: MH iter {nit+1} of {mh_iter}...')
-                    ind = np.random.permutation(npt)
+                    ind = rngs[ireal].permutation(npt)
                     for k in ind:
                         # Sequence of indexes without k
                         indmat = np.hstack((np.arange(k), np.arange(k+1, npt)))
@@ -1672,7 +2257,7 @@ def srf_mg_mg(
                         # Standard deviation (of kriging) at x[k]
                         std_T_k = np.sqrt(np.maximum(0, cov0_T - np.dot(w, mat_T[indmat, k])))
                         # Draw value in N(mu, std^2)
-                        v_T_k_new = np.random.normal(loc=mu_T_k, scale=std_T_k)
+                        v_T_k_new = rngs[ireal].normal(loc=mu_T_k, scale=std_T_k)
                         #
                         # Compute MH quotient defined as
                         #    prob(Y[v_T_k_new] = v[k] | Y[indmat] = v[indmat], Y[t] = yt) / prob(Y[v_T[k]] = v[k] | Y[indmat] = v[indmat], Y[t] = yt)
@@ -1704,7 +2289,7 @@ def srf_mg_mg(
                         # where phi_{mean, var} is the pdf of the normal law of given mean and var
                         # To avoid overflow in exp, compute log of mh quotient...
                         log_mh_quotient = 0.5 * (np.log(var_Y_k[0]) + (v[k]-mu_Y_k[0])**2/var_Y_k[0] - np.log(var_Y_k[1]) - (v[k]-mu_Y_k[1])**2/var_Y_k[1])
-                        if log_mh_quotient >= 0.0 or np.random.random() < np.exp(log_mh_quotient):
+                        if log_mh_quotient >= 0.0 or rngs[ireal].random() < np.exp(log_mh_quotient):
                             # Accept new value v_T_new at x[k]
                             v_T[k] = v_T_k_new
                             # Update kriging matrix for Y
@@ -1713,126 +2298,682 @@ def srf_mg_mg(
                     if not sim_ok:
                         break
 
-                if not sim_ok:
-                    continue
+                if not sim_ok:
+                    continue
+
+                ireal_batch.append(ireal)
+                v_T_batch.append(v_T.copy())
+
+            if len(ireal_batch) == 0:
+                continue
+
+            v_T_batch = np.asarray(v_T_batch)
+
+        # Generate T (all realizations of the batch, conditional to (x, v_T[0:npt]) if x is not None)
+        sim_T_batch, sim_T_ok = _simulate_T_batch(
+                prep_T, params_T, None if x is None else v_T_batch[:, :npt],
+                rng, rngs, ireal_batch, fname)
+
+        # -> nd-array of shape
+        #      (m, dimension) (for T in 1D)
+        #      (m, dimension[1], dimension[0]) (for T in 2D)
+        #      (m, dimension[2], dimension[1], dimension[0]) (for T in 3D)
+        #    where m = len(ireal_batch)
+
+        for j, ireal in enumerate(ireal_batch):
+            # Generate ireal-th realization
+            if verbose > 1:
+                print(f'{fname}: simulation {ireal+1} of {nreal}...')
+            sim_ok = True
+            Y_cond_aggregation = False
+            if not sim_T_ok[j]:
+                sim_ok = False
+                if verbose > 2:
+                    print('   ... simulation of T failed')
+                continue
+
+            sim_T = sim_T_batch[j:j+1]
+            if x is None:
+                # Unconditional case
+                # ------------------
+                # Set origin and dimension for Y
+                min_T = np.min(sim_T)
+                max_T = np.max(sim_T)
+                if t is not None:
+                    min_T = min(t.min(), min_T)
+                    max_T = max(t.max(), max_T)
+                min_T = min_T - 0.5 * spacing_Y
+                max_T = max_T + 0.5 * spacing_Y
+                dimension_Y = int(np.ceil((max_T - min_T)/spacing_Y))
+                origin_Y = min_T - 0.5*(dimension_Y*spacing_Y - (max_T - min_T))
+
+                # Generate Y conditional to possible additional constraint (t, yt) (one real)
+                try:
+                    sim_Y = multiGaussian.multiGaussianRun(
+                            cov_model_Y, dimension_Y, spacing_Y, origin_Y, x=t, v=yt,
+                            mode='simulation', algo=algo_Y, output_mode='array',
+                            **params_Y, nreal=1, rng=rngs[ireal])
+                except:
+                    sim_ok = False
+                    if verbose > 2:
+                        print('   ... simulation of Y failed')
+                    continue
+                # except Exception as exc:
+                #     err_msg = f'{fname}: simulation of Y failed'
+                #     raise SrfError(err_msg) from exc
+
+                # -> 2d-array of shape (1, dimension_Y)
+
+                if distrib_transf:
+                    if compute_initial_distrib:
+                        # Compute initial_distrib
+                        # (approximately based on mean(T) and y_mean_T)
+                        # print('... computing initial_distrib ...')
+                        sim_T_mean = sim_T.reshape(-1).mean()
+                        # Compute
+                        #    ind: node index (nearest node),
+                        #         rounded to lower index if between two grid nodes and index is positive
+                        ind_f = (sim_T_mean - origin_Y)/spacing_Y
+                        ind = ind_f.astype(int)
+                        ind = ind - 1 * np.all((ind == ind_f, ind > 0), axis=0)
+                        y_mean_T = sim_Y[0][ind]
+                        #y_mean_T = sim_Y[0][np.floor((sim_T_mean - origin_Y)/spacing_Y).astype(int)]
+                        initial_distrib = compute_distrib_Z_given_Y_of_mean_T(
+                            np.linspace(min(y_mean_T, mean_Y)-5.*std_Y_0, max(y_mean_T, mean_Y)+5.*std_Y_0, 501),
+                            cov_model_Y, mean_Y=mean_Y, y_mean_T=y_mean_T, cov_T_0=cov_T_0,
+                            fstd=4.5, nint=2001, assume_sorted=True
+                            )
+                    #
+                    # (Back-)transform sim_Y value
+                    sim_Y = target_distrib.ppf(initial_distrib.cdf(sim_Y))
+            #
+            else:
+                # Conditional case
+                # ----------------
+                v_T = v_T_batch[j]
+
+                # Set origin and dimension for Y
+                min_T = np.min(sim_T)
+                max_T = np.max(sim_T)
+                if t is not None:
+                    min_T = min(t.min(), min_T)
+                    max_T = max(t.max(), max_T)
+                min_T = min_T - 0.5 * spacing_Y
+                max_T = max_T + 0.5 * spacing_Y
+                dimension_Y = int(np.ceil((max_T - min_T)/spacing_Y))
+                origin_Y = min_T - 0.5*(dimension_Y*spacing_Y - (max_T - min_T))
+
+                # Compute
+                #    indc: node index of conditioning node (nearest node),
+                #          rounded to lower index if between two grid node and index is positive
+                indc_f = (v_T-origin_Y)/spacing_Y
+                indc = indc_f.astype(int)
+                indc = indc - 1 * np.all((indc == indc_f, indc > 0), axis=0)
+                indc_unique, indc_inv = np.unique(indc, return_inverse=True)
+                if len(indc_unique) == len(indc):
+                    v_T_unique = v_T
+                    v_ext_unique = v_ext
+                else:
+                    Y_cond_aggregation = True
+                    v_T_unique = np.array([v_T[indc_inv==j].mean() for j in range(len(indc_unique))])
+                    v_ext_unique = np.array([v_ext[indc_inv==j].mean() for j in range(len(indc_unique))])
+
+                # Generate Y conditional to (v_T, v_ext) (one real)
+                try:
+                    sim_Y = multiGaussian.multiGaussianRun(
+                            cov_model_Y, dimension_Y, spacing_Y, origin_Y, x=v_T_unique, v=v_ext_unique,
+                            mode='simulation', algo=algo_Y, output_mode='array',
+                            **params_Y, nreal=1, rng=rngs[ireal])
+                except:
+                    sim_ok = False
+                    if verbose > 2:
+                        print('   ... conditional simulation of Y failed')
+                    continue
+                # except Exception as exc:
+                #     err_msg = f'{fname}: conditional simulation of Y failed'
+                #     raise SrfError(err_msg) from exc
+
+                # -> 2d-array of shape (1, dimension_Y)
+
+                if distrib_transf:
+                    # Back-transform sim_Y value
+                    sim_Y = target_distrib.ppf(initial_distrib.cdf(sim_Y))
+
+            # Generate Z (one real)
+            # Compute
+            #    ind: node index (nearest node),
+            #         rounded to lower index if between two grid nodes and index is positive
+            ind_f = (sim_T.reshape(-1) - origin_Y)/spacing_Y
+            ind = ind_f.astype(int)
+            ind = ind - 1 * np.all((ind == ind_f, ind > 0), axis=0)
+            Z_real = sim_Y[0][ind]
+            #Z_real = sim_Y[0][np.floor((sim_T.reshape(-1) - origin_Y)/spacing_Y).astype(int)]
+            if vmin is not None and Z_real.min() < vmin:
+                sim_ok = False
+                if verbose > 2:
+                    print('   ... specified minimal value not honoured')
+                continue
+            if vmax is not None and Z_real.max() > vmax:
+                sim_ok = False
+                if verbose > 2:
+                    print('   ... specified maximal value not honoured')
+                continue
+
+            if sim_ok:
+                if Y_cond_aggregation and verbose > 0:
+                    print(f'{fname}: WARNING: conditioning points for Y falling in a same grid cell have been aggregated (mean) (real index {ireal})')
+                Z[ireal] = Z_real
+                if full_output:
+                    T[ireal] = sim_T[0]
+                    Y[ireal] = [dimension_Y, spacing_Y, origin_Y, sim_Y.reshape(dimension_Y)]
+
+        # Realizations to be generated at the next trial
+        ireal_todo = [ireal for ireal in ireal_todo if Z[ireal] is None]
+
+    return Z, T, Y
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def srf_mg_mg(
+        cov_model_T, cov_model_Y,
+        dimension, spacing=None, origin=None,
+        spacing_Y=0.001,
+        x=None, v=None,
+        t=None, yt=None,
+        vmin=None, vmax=None,
+        algo_T='fft', params_T=None,
+        algo_Y='fft', params_Y=None,
+        target_distrib=None,
+        initial_distrib=None,
+        mh_iter=100,
+        ntry_max=1,
+        nreal=1,
+        rng=None,
+        full_output=True,
+        verbose=1):
+    """
+    Substitution Random Function (SRF) - multi-Gaussian + multi-Gaussian.
+
+    This function allows to generate continuous random fields in 1D, 2D, 3D, based on
+    a SRF Z defined as
+
+    - Z(x) = Y(T(x))
+
+    where
+
+    - T is the directing function, a multi-Gaussian random field (latent field)
+    - Y is the coding process, a multi-Gaussian random process (1D)
+
+    Z and T are fields in 1D, 2D or 3D.
+
+    Notes
+    -----
+    The module :mod:`multiGaussian` is used for the multi-Gaussian fields T and Y.
+
+    Parameters
+    ----------
+    cov_model_T : :class:`geone.CovModel.CovModel<d>D`
+        covariance model for T, in 1D or 2D or 3D
+
+    cov_model_Y : :class:`CovModel.CovModel1D`
+        covariance model for Y, in 1D
+
+    dimension : [sequence of] int(s)
+        number of cells along each axis, for simulation in:
+
+        - 1D: `dimension=nx`
+        - 2D: `dimension=(nx, ny)`
+        - 3D: `dimension=(nx, ny, nz)`
+
+    spacing : [sequence of] float(s), optional
+        cell size along each axis, for simulation in:
+
+        - 1D: `spacing=sx`
+        - 2D: `spacing=(sx, sy)`
+        - 3D: `spacing=(sx, sy, sz)`
+
+        by default (`None`): 1.0 along each axis
+
+    origin : [sequence of] float(s), optional
+        origin of the grid ("corner of the first cell"), for simulation in:
+
+        - 1D: `origin=ox`
+        - 2D: `origin=(ox, oy)`
+        - 3D: `origin=(ox, oy, oz)`
+
+        by default (`None`): 0.0 along each axis
+
+    spacing_Y : float, default: 0.001
+        positive value, resolution of the Y process, spacing along abscissa
+        between two cells in the field Y (btw. two adjacent cell in 1D-grid
+        for Y)
+
+    x : array-like of floats, optional
+        data points locations (float coordinates), for simulation in:
+
+        - 1D: 1D array-like of floats
+        - 2D: 2D array-like of floats of shape (m, 2)
+        - 3D: 2D array-like of floats of shape (m, 3)
+
+        note: if one point (m=1), a float in 1D, a 1D array of shape (2,) in 2D,
+        a 1D array of shape (3,) in 3D, is accepted
+
+    v : 1d-array-like of floats, optional
+        data values at `x` (`v[i]` is the data value at `x[i]`)
+
+    t : 1d-array-like of floats, or float, optional
+        values of T considered as conditioning point for Y(T) (additional constraint)
+
+    yt : 1d-array-like of floats, or float, optional
+        value of Y at the conditioning point `t` (same length as `t`)
+
+    vmin : float, optional
+        minimal value for Z (or Y); simulation are rejected if not honoured
+
+    vmax : float, optional
+        maximal value for Z (or Y); simulation are rejected if not honoured
+
+    algo_T : str
+        defines the algorithm used for generating multi-Gaussian field T:
+
+        - 'fft' or 'FFT' (default): based on circulant embedding and FFT, \
+        function called for <d>D (d = 1, 2, or 3): `geone.grf.grf<d>D`
+        - 'classic' or 'CLASSIC': classic algorithm, based on the resolution \
+        of kriging system considered points in a search ellipsoid, function \
+        called for <d>D (d = 1, 2, or 3): `geone.geoscalassicinterface.simulate<d>D`
+
+    params_T : dict, optional
+        keyword arguments (additional parameters) to be passed to the function
+        corresponding to what is specified by the argument `algo_T` (see the
+        corresponding function for its keyword arguments), in particular the key
+        'mean' can be specified (set to value 0 if not specified); note: for
+        conditional simulation, the keys 'aggregate_data_op',
+        'aggregate_data_op_kwargs' (aggregation of the values of T at the
+        conditioning locations in the grid cells, default: 'sgs') and
+        'conditioningMethod' are used as by the function `geone.grf.grf<d>D`,
+        and the key 'computeKrigSD' is ignored
+
+    algo_Y : str
+        defines the algorithm used for generating 1D multi-Gaussian field Y:
+
+        - 'fft' or 'FFT' (default): based on circulant embedding and FFT, \
+        function called: :func:`grf.grf1D`
+        - 'classic' or 'CLASSIC': classic algorithm, based on the resolution \
+        of kriging system considered points in a search ellipsoid, function \
+        called: :func:`geoscalassicinterface.simulate1D`
+
+    params_Y : dict, optional
+        keyword arguments (additional parameters) to be passed to the function
+        corresponding to what is specified by the argument `algo_Y` (see the
+        corresponding function for its keyword arguments), in particular the key
+        'mean' can be specified (if not specified, set to the mean value of `v`
+        if `v` is not `None`, set to 0 otherwise)
+
+    target_distrib : class
+        target distribution for the value of a single realization of Z, with
+        attributes:
+
+        - target_distrib.cdf : (`func`) cdf
+        - target_distrib.ppf : (`func`) inverse cdf
+
+        See `initial_distrib` below.
+
+    initial_distrib : class
+        initial distribution for the value of a single realization of Z, with
+        attributes:
+
+        - initial_distrib.cdf : (`func`) cdf
+        - initial_distrib.ppf : (`func`) inverse cdf
+
+        The procedure is the following:
+
+        1. conditioning data value `v` (if present) are transormed:
+            * `v_tilde = initial_distrib.ppf(target_distrib.cdf(v))`
+        2. SRF realization of `z_tilde` (conditionally to `v_tilde` if present) \
+        is generated
+        3. back-transform is applied to obtain the final realization:
+            * `z = target_distrib.ppf(initial_distrib.cdf(z_tilde))`
+
+        By default:
+
+        - `target_distrib = None`
+        - `initial_distrib = None`
+
+        * For unconditional case:
+            - if `target_distrib` is `None`: no transformation is applied
+            - otherwise (not `None`): transformation is applied (step 3. above)
+        * For conditional case:
+            - if `target_distrib` is `None`: no transformation is applied
+            - otherwise (not `None`): transformation is applied (steps 1 and 3. \
+            above); this requires that `initial_distrib` is specified (not `None`), \
+            or that `t` and `yt` are specified with the value "mean_T" given in `t`
+
+        The distribution `initial_distrib` is used when needed:
+
+        * as specified (if not `None`, be sure of what is given)
+        * computed automatically otherwise (if `None`): \
+        the distribution returned by the function \
+        :func:`compute_distrib_Z_given_Y_of_mean_T`, with the keyword arguments \
+        (only for unconditional case)
+            - mean_Y  : set to `mean_Y` (see above)
+            - cov_T_0 : set to the covariance of T evaluated at 0 (`cov_model_T.func()(0)[0]`)
+            - y_mean_T: set to `yt[i0]`, where `t[i0]=mean_T` (if exists, see `t`, `yt` above) \
+            or set to Y(mean(T)) computed after step 2 above (otherwise)
+
+    mh_iter : int, default: 100
+        number of iteration for Metropolis-Hasting algorithm, for conditional
+        simulation only; note: used only if `x` or `t` is not `None`
 
-                # Generate T conditional to (x, v_T[0:npt]) (one real)
-                try:
-                    sim_T = multiGaussian.multiGaussianRun(
-                            cov_model_T, dimension, spacing, origin, x=x, v=v_T[:npt],
-                            mode='simulation', algo=algo_T, output_mode='array',
-                            **params_T, nreal=1)
-                except:
-                    sim_ok = False
-                    if verbose > 2:
-                        print('   ... conditional simulation of T failed')
-                    continue
-                # except Exception as exc:
-                #     err_msg = f'{fname}: conditional simulation of T failed'
-                #     raise SrfError(err_msg) from exc
+    ntry_max : int, default: 1
+        number of tries per realization before giving up if something goes wrong;
+        note: at each try, the simulation of T at the conditioning locations
+        (Metropolis-Hasting) is done per realization, then the fields T of all
+        the realizations still to be generated are generated (with
+        `algo_T='fft'`, from the same preliminary computation, i.e. circulant
+        embedding of the covariance matrix), and the simulation of Y is done
+        per realization
 
-                # -> nd-array of shape
-                #      (1, dimension) (for T in 1D)
-                #      (1, dimension[1], dimension[0]) (for T in 2D)
-                #      (1, dimension[2], dimension[1], dimension[0]) (for T in 3D)
+    nreal : int, default: 1
+        number of realization(s)
 
-                # Set origin and dimension for Y
-                min_T = np.min(sim_T)
-                max_T = np.max(sim_T)
-                if t is not None:
-                    min_T = min(t.min(), min_T)
-                    max_T = max(t.max(), max_T)
-                min_T = min_T - 0.5 * spacing_Y
-                max_T = max_T + 0.5 * spacing_Y
-                dimension_Y = int(np.ceil((max_T - min_T)/spacing_Y))
-                origin_Y = min_T - 0.5*(dimension_Y*spacing_Y - (max_T - min_T))
+    rng : int, or :class:`numpy.random.SeedSequence`, or :class:`numpy.random.Generator`, or sequence, optional
+        random number generator specification (see module :mod:`randomStream`);
+        by default (`None`): the global random state of `numpy.random` is used;
+        otherwise, each realization is generated with its own independent
+        stream spawned from `rng` (used for all the random draws of the
+        realization, including the simulation of the fields T and Y); note:
+        with `algo_T='fft'` and `method=3` (default, see `params_T`), the fields
+        T of the realizations 2k and 2k+1 are generated together (see function
+        `geone.grf.grf1D`), from the streams of both realizations
 
-                # Compute
-                #    indc: node index of conditioning node (nearest node),
-                #          rounded to lower index if between two grid node and index is positive
-                indc_f = (v_T-origin_Y)/spacing_Y
-                indc = indc_f.astype(int)
-                indc = indc - 1 * np.all((indc == indc_f, indc > 0), axis=0)
-                indc_unique, indc_inv = np.unique(indc, return_inverse=True)
-                if len(indc_unique) == len(indc):
-                    v_T_unique = v_T
-                    v_ext_unique = v_ext
-                else:
-                    Y_cond_aggregation = True
-                    v_T_unique = np.array([v_T[indc_inv==j].mean() for j in range(len(indc_unique))])
-                    v_ext_unique = np.array([v_ext[indc_inv==j].mean() for j in range(len(indc_unique))])
+    full_output : bool, default: True
+        - if `True`: simulation(s) of Z, T, and Y are retrieved in output
+        - if `False`: simulation(s) of Z only is retrieved in output
 
-                # Generate Y conditional to (v_T, v_ext) (one real)
-                try:
-                    sim_Y = multiGaussian.multiGaussianRun(
-                            cov_model_Y, dimension_Y, spacing_Y, origin_Y, x=v_T_unique, v=v_ext_unique,
-                            mode='simulation', algo=algo_Y, output_mode='array',
-                            **params_Y, nreal=1)
-                except:
-                    sim_ok = False
-                    if verbose > 2:
-                        print('   ... conditional simulation of Y failed')
-                    continue
-                # except Exception as exc:
-                #     err_msg = f'{fname}: conditional simulation of Y failed'
-                #     raise SrfError(err_msg) from exc
+    verbose : int, default: 1
+        verbose mode, integer >=0, higher implies more display
 
-                # -> 2d-array of shape (1, dimension_Y)
+    Returns
+    -------
+    Z : nd-array
+        all realizations, `Z[k]` is the `k`-th realization:
 
-                if distrib_transf:
-                    # Back-transform sim_Y value
-                    sim_Y = target_distrib.ppf(initial_distrib.cdf(sim_Y))
+        - for 1D: `Z` of shape (nreal, nx), where nx = dimension
+        - for 2D: `Z` of shape (nreal, ny, nx), where nx, ny = dimension
+        - for 3D: `Z` of shape (nreal, nz, ny, nx), where nx, ny, nz = dimension
 
-            # Generate Z (one real)
-            # Compute
-            #    ind: node index (nearest node),
-            #         rounded to lower index if between two grid nodes and index is positive
-            ind_f = (sim_T.reshape(-1) - origin_Y)/spacing_Y
-            ind = ind_f.astype(int)
-            ind = ind - 1 * np.all((ind == ind_f, ind > 0), axis=0)
-            Z_real = sim_Y[0][ind]
-            #Z_real = sim_Y[0][np.floor((sim_T.reshape(-1) - origin_Y)/spacing_Y).astype(int)]
-            if vmin is not None and Z_real.min() < vmin:
-                sim_ok = False
-                if verbose > 2:
-                    print('   ... specified minimal value not honoured')
-                continue
-            if vmax is not None and Z_real.max() > vmax:
-                sim_ok = False
-                if verbose > 2:
-                    print('   ... specified maximal value not honoured')
-                continue
+    T : nd-array
+        latent fields of all realizations, `T[k]` for the `k`-th realization:
 
-            if sim_ok:
-                if Y_cond_aggregation and verbose > 0:
-                    print(f'{fname}: WARNING: conditioning points for Y falling in a same grid cell have been aggregated (mean) (real index {ireal})')
-                Z.append(Z_real)
-                if full_output:
-                    T.append(sim_T[0])
-                    Y.append([dimension_Y, spacing_Y, origin_Y, sim_Y.reshape(dimension_Y)])
-                break
+        - for 1D: `T` of shape (nreal, nx), where nx = dimension
+        - for 2D: `T` of shape (nreal, ny, nx), where nx, ny = dimension
+        - for 3D: `T` of shape (nreal, nz, ny, nx), where nx, ny, nz = dimension
+
+        returned if `full_output=True`
+
+    Y : list of length nreal
+        1D random fields of all realizations, `Y[k]` is a list of length 4 for
+        the `k`-th realization:
+
+        - Y[k][0]: int, Y_nt (number of cell along t-axis)
+        - Y[k][1]: float, Y_st (cell size along t-axis)
+        - Y[k][2]: float, Y_ot (origin)
+        - Y[k][3]: 1d-array of shape (Y_nt,), values of Y[k]
+
+        returned if `full_output=True`
+    """
+    fname = 'srf_mg_mg'
+
+    prep = _srf_mg_mg_preliminary(
+            fname,
+            cov_model_T=cov_model_T,
+            cov_model_Y=cov_model_Y,
+            dimension=dimension,
+            spacing=spacing,
+            origin=origin,
+            spacing_Y=spacing_Y,
+            x=x,
+            v=v,
+            t=t,
+            yt=yt,
+            vmin=vmin,
+            vmax=vmax,
+            algo_T=algo_T,
+            params_T=params_T,
+            algo_Y=algo_Y,
+            params_Y=params_Y,
+            target_distrib=target_distrib,
+            initial_distrib=initial_distrib,
+            mh_iter=mh_iter,
+            ntry_max=ntry_max,
+            verbose=verbose)
+
+    # Number of realization(s)
+    nreal = int(nreal) # cast to int if needed
+
+    if nreal <= 0:
+        if full_output:
+            if verbose > 0:
+                print(f'{fname}: WARNING: `nreal` <= 0: `None`, `None`, `None` is returned')
+            return None, None, None
+        else:
+            if verbose > 0:
+                print(f'{fname}: WARNING: `nreal` <= 0: `None` is returned')
+            return None
+
+    Z, T, Y = _srf_mg_mg_simulate(
+            rng, range(nreal), nreal, full_output, fname, verbose,
+            **prep)
 
     # Get Z
-    if verbose > 0 and len(Z) < nreal:
+    ireal_ok = [ireal for ireal in range(nreal) if Z[ireal] is not None]
+    if verbose > 0 and len(ireal_ok) < nreal:
         print(f'{fname}: WARNING: some realization failed (missing)')
-    Z = np.asarray(Z).reshape(len(Z), *np.atleast_1d(dimension)[::-1])
+    Z = np.asarray([Z[ireal] for ireal in ireal_ok]).reshape(len(ireal_ok), *np.atleast_1d(dimension)[::-1])
 
     if full_output:
-        T = np.asarray(T).reshape(len(T), *np.atleast_1d(dimension)[::-1])
+        T = np.asarray([T[ireal] for ireal in ireal_ok]).reshape(len(ireal_ok), *np.atleast_1d(dimension)[::-1])
+        Y = [Y[ireal] for ireal in ireal_ok]
         return Z, T, Y
     else:
         return Z
 # ----------------------------------------------------------------------------
 
+# ----------------------------------------------------------------------------
+def srf_mg_mg_mp(
+        cov_model_T, cov_model_Y,
+        dimension, spacing=None, origin=None,
+        spacing_Y=0.001,
+        x=None, v=None,
+        t=None, yt=None,
+        vmin=None, vmax=None,
+        algo_T='fft', params_T=None,
+        algo_Y='fft', params_Y=None,
+        target_distrib=None,
+        initial_distrib=None,
+        mh_iter=100,
+        ntry_max=1,
+        nreal=1,
+        rng=None,
+        full_output=True,
+        verbose=1,
+        nproc=-1):
+    """
+    Computes the same as the function :func:`srf.srf_mg_mg`, using multiprocessing.
+
+    All the parameters except `nproc` are the same as those of the function
+    :func:`srf.srf_mg_mg`.
+
+    The number of processes used (in parallel) is n, and determined by the
+    parameter `nproc` (int, optional) as follows:
+
+    - if `nproc > 0`: n = `nproc`,
+    - if `nproc <= 0`: n = max(nmax+`nproc`, 1), where nmax is the total \
+    number of cpu(s) of the system (retrieved by :func:`config.cpu_count`), \
+    i.e. all cpus except `-nproc` is used (but at least one)
+
+    The preliminary computation (checks, kriging matrices at the conditioning
+    locations, circulant embedding of the covariance matrix for T, ...) is
+    done once, and the arrays given in argument (data, arrays in the
+    dictionaries of parameters, ...) or resulting from the preliminary
+    computation are put in shared memory and used (read only) by the n
+    parallel processes. The realizations (specified by `nreal`) are
+    distributed one by one over the processes (the time needed for one
+    realization can vary, e.g. with the number of trials), each process
+    writing its realizations of Z and of the directing function directly in
+    shared output arrays (copied in the returned arrays).
+
+    Note that, if `nreal` < n, then n is reduced to `nreal`.
+
+    Each realization is generated with its own stream (see parameter `rng`),
+    as by the function :func:`srf.srf_mg_mg`, hence the result is the same as
+    the one of the function :func:`srf.srf_mg_mg` with the same `rng`, whatever
+    the number of processes; if `rng` is `None` (default) or a
+    :class:`numpy.random.RandomState`, a seed is first drawn from it (see
+    function :func:`randomStream.seed_from_rng`) and used as `rng`.
+
+    See function :func:`srf.srf_mg_mg` for details.
+    """
+    fname = 'srf_mg_mg_mp'
+
+    kwargs = dict(
+            cov_model_T=cov_model_T,
+            cov_model_Y=cov_model_Y,
+            dimension=dimension,
+            spacing=spacing,
+            origin=origin,
+            spacing_Y=spacing_Y,
+            x=x,
+            v=v,
+            t=t,
+            yt=yt,
+            vmin=vmin,
+            vmax=vmax,
+            algo_T=algo_T,
+            params_T=params_T,
+            algo_Y=algo_Y,
+            params_Y=params_Y,
+            target_distrib=target_distrib,
+            initial_distrib=initial_distrib,
+            mh_iter=mh_iter,
+            ntry_max=ntry_max
+            )
+
+    # Number of realization(s)
+    nreal = int(nreal) # cast to int if needed
+
+    if nreal <= 0:
+        return srf_mg_mg(**kwargs, nreal=nreal, rng=rng, full_output=full_output, verbose=verbose)
+
+    # Preliminary computation (done once)
+    prep = _srf_mg_mg_preliminary(fname, **kwargs, verbose=verbose)
+
+    # Random number generator: the streams of the realizations are spawned
+    # (legacy random state cannot be shared between processes)
+    if randomStream.is_legacy(rng):
+        rng = randomStream.seed_from_rng(rng)
+
+    return _srf_mp(
+            _srf_mg_mg_simulate, prep, dimension, np.dtype('float64'), 1, 1,
+            nreal, rng, full_output, nproc, fname, verbose)
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+class _TabulatedFunction(object):
+    """
+    Function defined by linear interpolation of tabulated values.
+
+    Outside the range of the abscissas, the function takes the value `left`
+    (resp. `right`) given at initialization.
+    """
+    def __init__(self, xp, fp, left, right):
+        self.xp = xp
+        self.fp = fp
+        self.left = left
+        self.right = right
+
+    def __call__(self, x):
+        return np.interp(x, self.xp, self.fp, left=self.left, right=self.right)
+# ----------------------------------------------------------------------------
+
 # ----------------------------------------------------------------------------
 class Distrib (object):
     """
     Class defining a distribution by a pdf, cdf, and ppf.
+
+    **Attributes**
+
+    pdf : func
+        probability density function
+
+    cdf : func
+        cumulative distribution function
+
+    ppf : func
+        percent point function (inverse cdf)
     """
     def __init__(self, pdf=None, cdf=None, ppf=None):
         self.pdf = pdf
         self.cdf = cdf
         self.ppf = ppf
+
+    def rvs(self, size=None, rng=None):
+        """
+        Draws random values in the distribution.
+
+        The values are obtained by applying the ppf (inverse cdf) to values
+        drawn uniformly in [0, 1[ (inverse transform sampling).
+
+        Parameters
+        ----------
+        size : int or tuple of ints, optional
+            shape of the output (one value if `None`)
+
+        rng : any type, optional
+            random number generator specification (see module
+            :mod:`randomStream`), passed to function
+            :func:`randomStream.rng_stream`
+
+        Returns
+        -------
+        x : float or nd-array
+            random values
+        """
+        fname = 'rvs'
+
+        if self.ppf is None:
+            err_msg = f'{fname}: ppf not defined'
+            raise SrfError(err_msg)
+
+        return self.ppf(randomStream.rng_stream(rng).random(size))
+# ----------------------------------------------------------------------------
+
+# Cache (LRU) of the distributions computed by function
+# `compute_distrib_Z_given_Y_of_mean_T`, and its maximal size
+_distrib_Z_given_Y_of_mean_T_cache = collections.OrderedDict()
+_distrib_Z_given_Y_of_mean_T_cache_maxsize = 32
+
+# Maximal number of terms (len(z) x nint) evaluated at once in function
+# `compute_distrib_Z_given_Y_of_mean_T`
+_distrib_Z_given_Y_of_mean_T_block_size = 2**20
+
+# ----------------------------------------------------------------------------
+def _cov_model_key(cov_model):
+    """
+    Returns a hashable key identifying a (stationary) covariance model.
+
+    The key is `None` if the model cannot be identified by its parameters
+    (e.g. non-stationary model).
+    """
+    # fname = '_cov_model_key'
+
+    try:
+        key = (type(cov_model).__name__,
+               tuple((t, tuple((k, float(v)) for k, v in sorted(d.items()))) for t, d in cov_model.elem))
+    except:
+        key = None
+
+    return key
 # ----------------------------------------------------------------------------
 
 # ----------------------------------------------------------------------------
@@ -1843,7 +2984,8 @@ def compute_distrib_Z_given_Y_of_mean_T(
         cov_T_0=1.0,
         fstd=4.5,
         nint=2001,
-        assume_sorted=False):
+        assume_sorted=False,
+        use_cache=True):
     """
     Computes the distribution of Z given Y(mean(T)), for a SRF Z = Y(T).
 
@@ -1881,15 +3023,25 @@ def compute_distrib_Z_given_Y_of_mean_T(
     assume_sorted : bool, default: False
         if `True`: `z` has to be an array of monotonically increasing values
 
+    use_cache : bool, default: True
+        if `True`: the distributions computed are kept in a cache (the last
+        ones, LRU), and a distribution already computed for the same model
+        `cov_model_Y` (parameters), `y_mean_T`, `z`, and other parameters
+        is retrieved from the cache instead of being recomputed; note that the
+        returned object is then shared with the cache (it should not be
+        modified)
+
     Returns
     -------
     distrib : :class:`srf.Distrib`
         distribution, where each attribute is a function (obtained by
-        interpolation of its approximated evaluation at `z`):
+        linear interpolation of its approximated evaluation at `z`):
 
         - distrib.pdf: (func) pdf f_{Z|Y(mean(T))=y_mean_T}
         - distrib.cdf: (func) cdf F_{Z|Y(mean(T))=y_mean_T}
-        - distrib.ppf: (func) inverse cdf
+        - distrib.ppf: (func) inverse cdf (tabulated, i.e. interpolation \
+        of `z` wrt. the cdf values), used for drawing values (method \
+        `distrib.rvs`)
 
     References
     ----------
@@ -1917,24 +3069,57 @@ def compute_distrib_Z_given_Y_of_mean_T(
 
     # fname = 'compute_distrib_Z_given_Y_of_mean_T'
 
+    z = np.asarray(z, dtype='float').reshape(-1)
+    if not assume_sorted:
+        z = np.sort(z)
+
+    key = None
+    if use_cache:
+        cov_key = _cov_model_key(cov_model_Y)
+        if cov_key is not None:
+            key = (cov_key, float(mean_Y), float(y_mean_T), float(cov_T_0), float(fstd), int(nint), z.tobytes())
+            distrib = _distrib_Z_given_Y_of_mean_T_cache.get(key)
+            if distrib is not None:
+                _distrib_Z_given_Y_of_mean_T_cache.move_to_end(key)
+                return distrib
+
     std_T_0 = np.sqrt(cov_T_0)
     a = fstd*std_T_0
     h = np.linspace(-a, a, nint)
     h_weight = np.exp(-0.5*h**2/cov_T_0)
     h_weight = h_weight / h_weight.sum()
 
-    z = np.asarray(z, dtype='float').reshape(-1)
+    # Mean and standard deviation of the Gaussian distributions (one per value of h)
+    cov_Y = cov_model_Y.func()(np.hstack((0., h)))
+    cov_Y_0, cov_Y_h = cov_Y[0], cov_Y[1:]
+    loc = mean_Y + cov_Y_h/cov_Y_0 * (y_mean_T - mean_Y)
+    scale = np.maximum(np.sqrt(np.maximum(cov_Y_0-cov_Y_h**2/cov_Y_0, 0.)), 1.e-20)
+
+    # Evaluate pdf and cdf at z (array of shape (len(z), nint) weighted along
+    # axis 1), by blocks of values of z
+    pdf_value = np.zeros(len(z))
+    cdf_value = np.zeros(len(z))
+    nb = max(1, _distrib_Z_given_Y_of_mean_T_block_size // nint)
+    for i in range(0, len(z), nb):
+        u = (z[i:i+nb, np.newaxis] - loc) / scale
+        cdf_value[i:i+nb] = scipy.special.ndtr(u).dot(h_weight)
+        u = np.exp(-0.5*u**2)
+        pdf_value[i:i+nb] = u.dot(h_weight / (np.sqrt(2.0*np.pi) * scale))
+
+    # Ensure non-decreasing cdf values (rounding errors) for the inverse cdf
+    cdf_value = np.maximum.accumulate(cdf_value)
+
+    pdf = _TabulatedFunction(z, pdf_value, 0., 0.)
+    cdf = _TabulatedFunction(z, cdf_value, 0., 1.)
+    ppf = _TabulatedFunction(cdf_value, z, z[0], z[-1])
 
-    cov_Y_h = cov_model_Y.func()(h)
-    cov_Y_0 = cov_model_Y.func()(0.)
-    pdf_value = np.array([np.sum(h_weight*stats.norm.pdf(zi, loc=mean_Y + cov_Y_h/cov_Y_0 * (y_mean_T - mean_Y), scale=np.maximum(np.sqrt(cov_Y_0-cov_Y_h**2/cov_Y_0), 1.e-20))) for zi in z])
-    cdf_value = np.array([np.sum(h_weight*stats.norm.cdf(zi, loc=mean_Y + cov_Y_h/cov_Y_0 * (y_mean_T - mean_Y), scale=np.maximum(np.sqrt(cov_Y_0-cov_Y_h**2/cov_Y_0), 1.e-20))) for zi in z])
+    distrib = Distrib(pdf, cdf, ppf)
 
-    pdf = interp1d(z, pdf_value, assume_sorted=assume_sorted, bounds_error=False, fill_value=(0., 0.))
-    cdf = interp1d(z, cdf_value, assume_sorted=assume_sorted, bounds_error=False, fill_value=(0., 1.))
-    ppf = interp1d(cdf_value, z, assume_sorted=assume_sorted, bounds_error=False, fill_value=(z.min(), z.max()))
+    if key is not None:
+        _distrib_Z_given_Y_of_mean_T_cache[key] = distrib
+        if len(_distrib_Z_given_Y_of_mean_T_cache) > _distrib_Z_given_Y_of_mean_T_cache_maxsize:
+            _distrib_Z_given_Y_of_mean_T_cache.popitem(last=False)
 
-    distrib = Distrib(pdf, cdf, ppf)
     return distrib
 # ----------------------------------------------------------------------------
 
@@ -1958,6 +3143,7 @@ def srf_bimg_mg(
         mh_iter=100,
         ntry_max=1,
         nreal=1,
+        rng=None,
         full_output=True,
         verbose=1):
     """
@@ -2112,6 +3298,13 @@ def srf_bimg_mg(
     nreal : int, default: 1
         number of realization(s)
 
+    rng : int, or :class:`numpy.random.SeedSequence`, or :class:`numpy.random.Generator`, or sequence, optional
+        random number generator specification (see module :mod:`randomStream`);
+        by default (`None`): the global random state of `numpy.random` is used;
+        otherwise, each realization is generated with its own independent
+        stream spawned from `rng` (used for all the random draws of the
+        realization, including the simulation of the fields T1, T2 and Y)
+
     full_output : bool, default: True
         - if `True`: simulation(s) of Z, T1, T2, and Y are retrieved in output
         - if `False`: simulation(s) of Z only is retrieved in output
@@ -2618,6 +3811,13 @@ def srf_bimg_mg(
         params_Y['verbose'] = 0
         # params_Y['verbose'] = verbose
 
+    # Random number generator (stream) for each realization
+    try:
+        rngs = randomStream.rng_streams(rng, nreal)
+    except Exception as exc:
+        err_msg = f'{fname}: `rng` invalid'
+        raise SrfError(err_msg) from exc
+
     # Initialization for output
     Z = []
     if full_output:
@@ -2643,7 +3843,7 @@ def srf_bimg_mg(
                         sim_T1 = multiGaussian.multiGaussianRun(
                                 cov_model_T1, dimension, spacing, origin,
                                 mode='simulation', algo=algo_T1, output_mode='array',
-                                **params_T1, nreal=1)
+                                **params_T1, nreal=1, rng=rngs[ireal])
                     except:
                         sim_ok = False
                         if verbose > 2:
@@ -2666,7 +3866,7 @@ def srf_bimg_mg(
                         sim_T2 = multiGaussian.multiGaussianRun(
                                 cov_model_T2, dimension, spacing, origin,
                                 mode='simulation', algo=algo_T2, output_mode='array',
-                                **params_T2, nreal=1)
+                                **params_T2, nreal=1, rng=rngs[ireal])
                     except:
                         sim_ok = False
                         if verbose > 2:
@@ -2711,7 +3911,7 @@ def srf_bimg_mg(
                     sim_Y = multiGaussian.multiGaussianRun(
                             cov_model_Y, dimension_Y, spacing_Y, origin_Y, x=t, v=yt,
                             mode='simulation', algo=algo_Y, output_mode='array',
-                            **params_Y, nreal=1)
+                            **params_Y, nreal=1, rng=rngs[ireal])
                 except:
                     sim_ok = False
                     if verbose > 2:
@@ -2727,7 +3927,7 @@ def srf_bimg_mg(
                 # Conditional case
                 # ----------------
                 # Initialize: unconditional simulation of T1 at x (values in v_T[:,0])
-                ind = np.random.permutation(npt)
+                ind = rngs[ireal].permutation(npt)
                 for j, k in enumerate(ind):
                     if cov_model_T1 is not None:
                         # Simulate value at x[k] (= x[ind[j]]), conditionally to the previous ones
@@ -2746,7 +3946,7 @@ def srf_bimg_mg(
                         # Standard deviation (of kriging) at x[k]
                         std_T1_k = np.sqrt(np.maximum(0, cov0_T1 - np.dot(w, mat_T1[ind[:j], ind[j]])))
                         # Draw value in N(mu_T1_k, std_T1_k^2)
-                        v_T[k, 0] = np.random.normal(loc=mu_T1_k, scale=std_T1_k)
+                        v_T[k, 0] = rngs[ireal].normal(loc=mu_T1_k, scale=std_T1_k)
                     else:
                         v_T[k, 0] = mean_T1[x_mean_T1_grid_ind[k]]
 
@@ -2757,7 +3957,7 @@ def srf_bimg_mg(
                     continue
 
                 # Initialize: unconditional simulation of T2 at x (values in v_T[:,1])
-                ind = np.random.permutation(npt)
+                ind = rngs[ireal].permutation(npt)
                 for j, k in enumerate(ind):
                     if cov_model_T2 is not None:
                         # Simulate value at x[k] (= x[ind[j]]), conditionally to the previous ones
@@ -2776,7 +3976,7 @@ def srf_bimg_mg(
                         # Standard deviation (of kriging) at x[k]
                         std_T2_k = np.sqrt(np.maximum(0, cov0_T2 - np.dot(w, mat_T2[ind[:j], ind[j]])))
                         # Draw value in N(mu_T2_k, std_T2_k^2)
-                        v_T[k, 1] = np.random.normal(loc=mu_T2_k, scale=std_T2_k)
+                        v_T[k, 1] = rngs[ireal].normal(loc=mu_T2_k, scale=std_T2_k)
                     else:
                         v_T[k, 1] = mean_T2[x_mean_T2_grid_ind[k]]
 
@@ -2810,7 +4010,7 @@ def srf_bimg_mg(
                 for nit in range(mh_iter):
                     if verbose > 3:
                         print(f'   ... sim {ireal+1} of {nreal}: MH iter {nit+1} of {mh_iter}...')
-                    ind = np.random.permutation(npt)
+                    ind = rngs[ireal].permutation(npt)
                     for k in ind:
                         # Sequence of indexes without k
                         indmat = np.hstack((np.arange(k), np.arange(k+1, npt)))
@@ -2834,7 +4034,7 @@ def srf_bimg_mg(
                             # Standard deviation (of kriging) at x[k]
                             std_T1_k = np.sqrt(np.maximum(0, cov0_T1 - np.dot(w, mat_T1[indmat, k])))
                             # Draw value in N(mu, std^2)
-                            v_T_k_new[0] = np.random.normal(loc=mu_T1_k, scale=std_T1_k)
+                            v_T_k_new[0] = rngs[ireal].normal(loc=mu_T1_k, scale=std_T1_k)
                         else:
                             v_T_k_new[0] = mean_T1[x_mean_T1_grid_ind[k]]
                         #
@@ -2856,7 +4056,7 @@ def srf_bimg_mg(
                             # Standard deviation (of kriging) at x[k]
                             std_T2_k = np.sqrt(np.maximum(0, cov0_T2 - np.dot(w, mat_T2[indmat, k])))
                             # Draw value in N(mu, std^2)
-                            v_T_k_new[1] = np.random.normal(loc=mu_T2_k, scale=std_T2_k)
+                            v_T_k_new[1] = rngs[ireal].normal(loc=mu_T2_k, scale=std_T2_k)
                         else:
                             v_T_k_new[1] = mean_T2[x_mean_T2_grid_ind[k]]
                         #
@@ -2890,7 +4090,7 @@ def srf_bimg_mg(
                         # where phi_{mean, var} is the pdf of the normal law of given mean and var
                         # To avoid overflow in exp, compute log of mh quotient...
                         log_mh_quotient = 0.5 * (np.log(var_Y_k[0]) + (v[k]-mu_Y_k[0])**2/var_Y_k[0] - np.log(var_Y_k[1]) - (v[k]-mu_Y_k[1])**2/var_Y_k[1])
-                        if log_mh_quotient >= 0.0 or np.random.random() < np.exp(log_mh_quotient):
+                        if log_mh_quotient >= 0.0 or rngs[ireal].random() < np.exp(log_mh_quotient):
                             # Accept new value v_T_new at x[k]
                             v_T[k] = v_T_k_new
                             # Update kriging matrix for Y
@@ -2908,7 +4108,7 @@ def srf_bimg_mg(
                         sim_T1 = multiGaussian.multiGaussianRun(
                                 cov_model_T1, dimension, spacing, origin, x=x, v=v_T[:npt, 0],
                                 mode='simulation', algo=algo_T1, output_mode='array',
-                                **params_T1, nreal=1)
+                                **params_T1, nreal=1, rng=rngs[ireal])
                     except:
                         sim_ok = False
                         if verbose > 2:
@@ -2930,7 +4130,7 @@ def srf_bimg_mg(
                         sim_T2 = multiGaussian.multiGaussianRun(
                                 cov_model_T2, dimension, spacing, origin, x=x, v=v_T[:npt, 1],
                                 mode='simulation', algo=algo_T2, output_mode='array',
-                                **params_T2, nreal=1)
+                                **params_T2, nreal=1, rng=rngs[ireal])
                     except:
                         sim_ok = False
                         if verbose > 2:
@@ -2992,7 +4192,7 @@ def srf_bimg_mg(
                     sim_Y = multiGaussian.multiGaussianRun(
                             cov_model_Y, dimension_Y, spacing_Y, origin_Y, x=v_T_unique, v=v_ext_unique,
                             mode='simulation', algo=algo_Y, output_mode='array',
-                            **params_Y, nreal=1)
+                            **params_Y, nreal=1, rng=rngs[ireal])
                 except:
                     sim_ok = False
                     if verbose > 2:
@@ -3050,6 +4250,166 @@ def srf_bimg_mg(
         return Z
 # ----------------------------------------------------------------------------
 
+# ----------------------------------------------------------------------------
+def _srf_bimg_mg_simulate(rng, ireal_list, nreal, full_output, fname, verbose, **kwargs):
+    """
+    Generates realizations for the function :func:`srf_bimg_mg`.
+
+    The realizations of index in `ireal_list` are generated one by one by the
+    function :func:`srf_bimg_mg` (with `nreal=1`), the realization of index
+    `ireal` with the stream of index `ireal` of `rng` (see function
+    :func:`randomStream.rng_streams`), as in the function :func:`srf_bimg_mg`
+    (the realizations are generated independently of each other).
+
+    Parameters
+    ----------
+    rng : any type
+        random number generator specification (see module :mod:`randomStream`)
+        for the realizations of index in `ireal_list`
+    ireal_list : sequence of ints
+        indexes of the realizations to be generated, in increasing order
+    nreal : int
+        total number of realizations (for displaying)
+    full_output : bool
+        see function :func:`srf_bimg_mg`
+    fname : str
+        name of the calling function (for displaying)
+    verbose : int
+        verbose mode
+    kwargs : dict
+        keyword arguments for the function :func:`srf_bimg_mg` (except
+        `nreal`, `rng`, `full_output`, `verbose`)
+
+    Returns
+    -------
+    Z : dict
+        realizations, `Z[ireal]` is the realization of index `ireal`, or `None`
+        if it failed
+    T1, T2 : dict
+        directing functions of each realization (`None` values if
+        `full_output=False`)
+    Y : dict
+        coding process of each realization (`None` values if
+        `full_output=False`)
+    """
+    # Random number generator (stream) for each realization
+    try:
+        rngs = randomStream.rng_streams(rng, len(ireal_list))
+    except Exception as exc:
+        err_msg = f'{fname}: `rng` invalid'
+        raise SrfError(err_msg) from exc
+
+    Z = {ireal: None for ireal in ireal_list}
+    T1 = {ireal: None for ireal in ireal_list}
+    T2 = {ireal: None for ireal in ireal_list}
+    Y = {ireal: None for ireal in ireal_list}
+    for ireal, rng_real in zip(ireal_list, rngs):
+        if verbose > 1:
+            print(f'{fname}: simulation {ireal+1} of {nreal}...')
+        out = srf_bimg_mg(**kwargs, nreal=1, rng=[rng_real], full_output=full_output, verbose=verbose)
+        if not full_output:
+            out = (out, )
+        if len(out[0]) == 1:
+            Z[ireal] = out[0][0]
+            if full_output:
+                T1[ireal], T2[ireal], Y[ireal] = out[1][0], out[2][0], out[3][0]
+
+    return Z, T1, T2, Y
+# ----------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------
+def srf_bimg_mg_mp(
+        cov_model_T1, cov_model_T2, cov_model_Y,
+        dimension, spacing=None, origin=None,
+        spacing_Y=(0.001, 0.001),
+        x=None, v=None,
+        t=None, yt=None,
+        vmin=None, vmax=None,
+        algo_T1='fft', params_T1=None,
+        algo_T2='fft', params_T2=None,
+        algo_Y='fft', params_Y=None,
+        mh_iter=100,
+        ntry_max=1,
+        nreal=1,
+        rng=None,
+        full_output=True,
+        verbose=1,
+        nproc=-1):
+    """
+    Computes the same as the function :func:`srf.srf_bimg_mg`, using multiprocessing.
+
+    All the parameters except `nproc` are the same as those of the function
+    :func:`srf.srf_bimg_mg`.
+
+    The number of processes used (in parallel) is n, and determined by the
+    parameter `nproc` (int, optional) as follows:
+
+    - if `nproc > 0`: n = `nproc`,
+    - if `nproc <= 0`: n = max(nmax+`nproc`, 1), where nmax is the total \
+    number of cpu(s) of the system (retrieved by :func:`config.cpu_count`), \
+    i.e. all cpus except `-nproc` is used (but at least one)
+
+    The arrays given in argument (data, arrays in the dictionaries of
+    parameters, ...) are put in shared memory and used (read only) by the n
+    parallel processes. The realizations (specified by `nreal`) are
+    distributed one by one over the processes (the time needed for one
+    realization can vary, e.g. with the number of trials), each process
+    writing its realizations of Z and of the directing functions directly
+    in shared output arrays (copied in the returned arrays).
+
+    Note that, if `nreal` < n, then n is reduced to `nreal`.
+
+    Each realization is generated by the function :func:`srf.srf_bimg_mg` (with
+    `nreal=1`) with its own stream (see parameter `rng`), hence the result is
+    the same as the one of the function :func:`srf.srf_bimg_mg` with the same `rng`,
+    whatever the number of processes; if `rng` is `None` (default) or a
+    :class:`numpy.random.RandomState`, a seed is first drawn from it (see
+    function :func:`randomStream.seed_from_rng`) and used as `rng`.
+
+    See function :func:`srf.srf_bimg_mg` for details.
+    """
+    fname = 'srf_bimg_mg_mp'
+
+    kwargs = dict(
+            cov_model_T1=cov_model_T1,
+            cov_model_T2=cov_model_T2,
+            cov_model_Y=cov_model_Y,
+            dimension=dimension,
+            spacing=spacing,
+            origin=origin,
+            spacing_Y=spacing_Y,
+            x=x,
+            v=v,
+            t=t,
+            yt=yt,
+            vmin=vmin,
+            vmax=vmax,
+            algo_T1=algo_T1,
+            params_T1=params_T1,
+            algo_T2=algo_T2,
+            params_T2=params_T2,
+            algo_Y=algo_Y,
+            params_Y=params_Y,
+            mh_iter=mh_iter,
+            ntry_max=ntry_max
+            )
+
+    # Number of realization(s)
+    nreal = int(nreal) # cast to int if needed
+
+    if nreal <= 0:
+        return srf_bimg_mg(**kwargs, nreal=nreal, rng=rng, full_output=full_output, verbose=verbose)
+
+    # Random number generator: the streams of the realizations are spawned
+    # (legacy random state cannot be shared between processes)
+    if randomStream.is_legacy(rng):
+        rng = randomStream.seed_from_rng(rng)
+
+    return _srf_mp(
+            _srf_bimg_mg_simulate, kwargs, dimension, np.dtype('float64'), 2, 1,
+            nreal, rng, full_output, nproc, fname, verbose)
+# ----------------------------------------------------------------------------
+
 # # =============================================================================
 # # Function to plot details of a SRF
 # # =============================================================================
@@ -12,13 +12,15 @@ Module for miscellaneous tools.
 """
 
 import sys
-import multiprocessing
+import copy
 
 import numpy as np
+import scipy.spatial
 import matplotlib.pyplot as plt
 from matplotlib.backend_bases import MouseButton
 
 from geone import img
+from geone import parallel
 
 # -----------------------------------------------------------------------------
 def add_path_by_drawing(
@@ -164,16 +166,194 @@ def add_path_by_drawing(
     cid_key = plt.connect('key_press_event', on_key)
 # -----------------------------------------------------------------------------
 
+# Maximal number of (point, edge) pairs treated at once in function
+# `_is_in_polygon_edges`
+_is_in_polygon_block_size = 2**20
+
+# -----------------------------------------------------------------------------
+def _polygon_rings(vertices, wrap=None):
+    """
+    Returns the rings (close lines) of a polygon, a multi-polygon or a polygon with holes.
+
+    Parameters
+    ----------
+    vertices : 2D array-like, or sequence
+        vertices of one ring (2D array-like of shape (nv, 2)), or sequence of
+        such items (possibly nested), see function :func:`is_in_polygon`
+    wrap : bool, optional
+        see function :func:`is_in_polygon` (applied to each ring)
+
+    Returns
+    -------
+    rings : list of 2D arrays
+        vertices of each ring, the last vertex being linked to the first one
+        (not repeated)
+    """
+    # fname = '_polygon_rings'
+
+    try:
+        v = np.asarray(vertices, dtype='float')
+    except (ValueError, TypeError):
+        v = None
+
+    if v is not None and v.ndim == 2:
+        # Set wrap (and adjust vertices) if needed
+        w = wrap
+        if w is None:
+            w = ~np.isclose(np.sqrt(((v[-1] - v[0])**2).sum()), 0.0)
+        if not w:
+            # remove last vertice (should be equal to the first one)
+            v = v[:-1]
+        return [v]
+
+    rings = []
+    for r in vertices:
+        rings.extend(_polygon_rings(r, wrap=wrap))
+
+    return rings
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+def _polygon_edges(rings):
+    """
+    Returns the edges of rings (close lines).
+
+    Parameters
+    ----------
+    rings : list of 2D arrays
+        vertices of each ring (see function :func:`_polygon_rings`)
+
+    Returns
+    -------
+    edges : 2D array of shape (ne, 4)
+        each row `(x0, y0, x1, y1)` gives the coordinates of the two ends of
+        one edge
+    """
+    # fname = '_polygon_edges'
+
+    edges = [np.hstack((r, np.roll(r, -1, axis=0))) for r in rings if len(r)]
+    if len(edges) == 0:
+        return np.zeros((0, 4))
+
+    return np.vstack(edges)
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+def _is_in_polygon_edges(px, py, edges, **kwargs):
+    """
+    Checks if points are in a polygon given by its edges (crossing number).
+
+    A point is in the polygon if a half-line starting from it (towards +x)
+    crosses the edges an odd number of times (even-odd rule), points on the
+    boundary (distance to an edge close to zero) being considered outside.
+
+    The points out of the bounding box of the polygon are discarded first.
+    Then the space is divided in bands along the y axis, each edge is
+    registered in the bands it intersects, and the points of a band are
+    tested against the edges of that band only (vectorized, by blocks).
+
+    Parameters
+    ----------
+    px : 1D array
+        x coordinate of the points
+    py : 1D array
+        y coordinate of the points
+    edges : 2D array of shape (ne, 4)
+        edges of the polygon (see function :func:`_polygon_edges`)
+    kwargs :
+        keyword arguments passed to function `numpy.isclose` (for detecting
+        the points on the boundary)
+
+    Returns
+    -------
+    res : 1D array of bools
+        indicates for each point if it is inside (True) or outside (False)
+        the polygon
+    """
+    # fname = '_is_in_polygon_edges'
+
+    res = np.zeros(len(px), dtype='bool')
+    ne = edges.shape[0]
+    if ne == 0 or len(px) == 0:
+        return res
+
+    # Tolerance on the distance to the boundary: numpy.isclose(d, 0, **kwargs)
+    # is equivalent to d <= atol
+    atol2 = kwargs.get('atol', 1.e-8)**2
+
+    ex0, ey0, ex1, ey1 = edges.T
+    eymin = np.minimum(ey0, ey1)
+    eymax = np.maximum(ey0, ey1)
+
+    # Bounding box prefiltering
+    xmin, xmax = min(ex0.min(), ex1.min()), max(ex0.max(), ex1.max())
+    ymin, ymax = eymin.min(), eymax.max()
+    ind = np.where(np.all((px >= xmin, px <= xmax, py >= ymin, py <= ymax), axis=0))[0]
+    if len(ind) == 0:
+        return res
+
+    # Bands along y axis
+    nband = max(1, min(ne, len(ind)))
+    h = (ymax - ymin) / nband
+    if h <= 0.0:
+        nband, h = 1, 1.0
+
+    # Edges of each band (index of the edges of band b: e_band[e_ptr[b]:e_ptr[b+1]])
+    eb0 = np.minimum(((eymin - ymin) / h).astype('int'), nband-1)
+    eb1 = np.minimum(((eymax - ymin) / h).astype('int'), nband-1)
+    span = eb1 - eb0 + 1
+    e_rep = np.repeat(np.arange(ne), span)
+    b_rep = np.repeat(eb0 - np.cumsum(span) + span, span) + np.arange(span.sum())
+    order = np.argsort(b_rep, kind='stable')
+    e_band = e_rep[order]
+    e_ptr = np.searchsorted(b_rep[order], np.arange(nband+1))
+
+    # Points of each band (index of the points of band b: p_band[p_ptr[b]:p_ptr[b+1]])
+    pb = np.minimum(((py[ind] - ymin) / h).astype('int'), nband-1)
+    order = np.argsort(pb, kind='stable')
+    p_band = ind[order]
+    p_ptr = np.searchsorted(pb[order], np.arange(nband+1))
+
+    for b in np.unique(pb):
+        ie = e_band[e_ptr[b]:e_ptr[b+1]]
+        if len(ie) == 0:
+            continue
+        x0, y0, x1, y1 = ex0[ie], ey0[ie], ex1[ie], ey1[ie]
+        dx, dy = x1 - x0, y1 - y0
+        d2 = dx**2 + dy**2
+        d2[d2 == 0.0] = 1.0 # degenerated edges (t below is then 0)
+        ip_band = p_band[p_ptr[b]:p_ptr[b+1]]
+        nblock = max(1, _is_in_polygon_block_size // len(ie))
+        for i0 in range(0, len(ip_band), nblock):
+            ip = ip_band[i0:i0+nblock]
+            qx, qy = px[ip, np.newaxis], py[ip, np.newaxis]
+            # Crossings of the half-line [(qx, qy), (+inf, qy)[ with the edges
+            cross = (y0 > qy) != (y1 > qy)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                cross = cross & (qx < x0 + (qy - y0) * dx / dy)
+            inside = np.count_nonzero(cross, axis=1) % 2 == 1
+            # Points on the boundary (distance to the nearest point of the edges)
+            t = np.clip(((qx - x0)*dx + (qy - y0)*dy) / d2, 0.0, 1.0)
+            on_border = np.any((x0 + t*dx - qx)**2 + (y0 + t*dy - qy)**2 <= atol2, axis=1)
+            res[ip] = inside & ~on_border
+
+    return res
+# -----------------------------------------------------------------------------
+
 # -----------------------------------------------------------------------------
 def is_in_polygon(x, vertices, wrap=None, **kwargs):
     """
     Checks if point(s) is (are) in a polygon given by its vertices forming a close line.
 
-    To check if a point is in the polygon, the method consists in computing
-    the vectors from the given point to the vertices of the polygon and
-    the sum of signed angles between two successives vectors (and the last
-    and first one). Then, the point is in the polygon if and only if this sum
-    is equal to +/- 2 pi.
+    To check if a point is in the polygon, the method consists in counting
+    the number of edges of the polygon crossed by a half-line starting from
+    the point (crossing number): the point is in the polygon if and only if
+    this number is odd (even-odd rule). The points on the boundary of the
+    polygon are considered outside.
+
+    The computation is vectorized: the points out of the bounding box of the
+    polygon are discarded first, then the edges are indexed by bands along
+    the y axis, and each point is tested against the edges of its band only.
 
     Parameters
     ----------
@@ -181,22 +361,29 @@ def is_in_polygon(x, vertices, wrap=None, **kwargs):
         point(s) coordinates, each row `x[i]` (if 2D array-like) (or `x` if
         1D array-like) contains the two coordinates of one point
 
-    vertices : 2D array
+    vertices : 2D array, or sequence of 2D arrays
         vertices of a polygon in 2D, each row of `vertices` contains the two
         coordinates of one vertex; the segments of the polygon are obtained by
         linking two successive vertices (as well as the last one with the first
         one, if `wrap=True` (see below)), so that the vertices form a close line
-        (clockwise or counterclockwise)
+        (clockwise or counterclockwise);
+
+        a sequence (possibly nested) of such arrays can be given, e.g. for a
+        polygon with holes (exterior line and lines of the holes) or a
+        multi-polygon (lines of disjoint polygons); a point is then in the
+        polygon if it is in an odd number of the given close lines
 
     wrap : bool, optional
         - if `True`: last and first vertices has to be linked to form a close line
         - if `False`: last and first vertices should be the same ones (i.e. the \
         vertices form a close line);
 
-        by default (`None`): `wrap` is automatically computed
+        by default (`None`): `wrap` is automatically computed (for each close
+        line)
 
     kwargs :
-        keyword arguments passed to function `numpy.isclose`
+        keyword arguments passed to function `numpy.isclose`, used to detect
+        the points on the boundary (distance to the boundary close to zero)
 
     Returns
     -------
@@ -208,48 +395,10 @@ def is_in_polygon(x, vertices, wrap=None, **kwargs):
     """
     # fname = 'is_in_polygon'
 
-    # Set wrap (and adjust vertices) if needed
-    if wrap is None:
-        wrap = ~np.isclose(np.sqrt(((vertices[-1] - vertices[0])**2).sum()), 0.0)
-    if not wrap:
-        # remove last vertice (should be equal to the first one)
-        vertices = np.delete(vertices, -1, axis=0)
-
-    # Array of shifted indices (on vertices)
-    ind = np.hstack((np.arange(1, vertices.shape[0]), [0]))
-
-    # Initialization
-    xx = np.atleast_2d(x)
-    res = np.zeros(xx.shape[0], dtype='bool')
-
-    xmin, ymin = vertices.min(axis=0)
-    xmax, ymax = vertices.max(axis=0)
+    edges = _polygon_edges(_polygon_rings(vertices, wrap=wrap))
 
-    for j, xj in enumerate(xx):
-        if xj[0] < xmin or xj[0] > xmax or xj[1] < ymin or xj[1] > ymax:
-            continue
-
-        # Set a, b, c: edge of the triangles to compute angle between a and b
-        a = xj - vertices
-
-        # a_norm2: square norm of a
-        a_norm2 = (a**2).sum(axis=1)
-
-        b = a[ind]
-        b_norm2 = a_norm2[ind]
-        ab_norm = np.sqrt(a_norm2*b_norm2)
-
-        if np.any(np.isclose(ab_norm, 0, **kwargs)):
-            # xj on the border of the polygon
-            continue
-
-        # Compute the sum of angles using the theorem of cosine
-        c = b - a
-        c_norm2 = (c**2).sum(axis=1)
-        sign = 2*(a[:,0]*b[:,1] - a[:,1]*b[:,0] > 0) - 1
-        sum_angles = np.sum(sign*np.arccos(np.minimum(1.0, np.maximum(-1.0, (a_norm2 + b_norm2- c_norm2)/(2.0*ab_norm)))))
-
-        res[j] = np.isclose(np.abs(sum_angles), 2*np.pi)
+    xx = np.atleast_2d(np.asarray(x, dtype='float'))
+    res = _is_in_polygon_edges(xx[:, 0], xx[:, 1], edges, **kwargs)
 
     if np.asarray(x).ndim == 1:
         res = res[0]
@@ -257,6 +406,44 @@ def is_in_polygon(x, vertices, wrap=None, **kwargs):
     return res
 # -----------------------------------------------------------------------------
 
+# -----------------------------------------------------------------------------
+def _is_in_polygon_mp_worker(x_desc, res_desc, i0, i1, edges, kwargs):
+    """
+    Checks if points of a slice are in a polygon, in a process (worker).
+
+    Parameters
+    ----------
+    x_desc : tuple
+        description of the shared array of points, of shape (m, 2)
+        (see function :func:`parallel._shared_array_create`)
+    res_desc : tuple
+        description of the shared output array, of shape (m, )
+        (see function :func:`parallel._output_array_create`)
+    i0 : int
+        index of the first point of the slice
+    i1 : int
+        index of the last point of the slice + 1
+    edges : 2D array of shape (ne, 4)
+        edges of the polygon (see function :func:`_polygon_edges`)
+    kwargs : dict
+        keyword arguments passed to function :func:`_is_in_polygon_edges`
+    """
+    # fname = '_is_in_polygon_mp_worker'
+
+    shm_list = []
+    try:
+        x = parallel._shared_array_attach(x_desc, shm_list)
+        res = parallel._output_array_attach(res_desc, shm_list)
+        res[i0:i1] = _is_in_polygon_edges(x[i0:i1, 0], x[i0:i1, 1], edges, **kwargs)
+
+    finally:
+        # Release references to shared memory before closing
+        x = None
+        res = None
+        for shm in shm_list:
+            shm.close()
+# -----------------------------------------------------------------------------
+
 # -----------------------------------------------------------------------------
 def is_in_polygon_mp(x, vertices, wrap=None, nproc=-1, **kwargs):
     """
@@ -270,49 +457,57 @@ def is_in_polygon_mp(x, vertices, wrap=None, nproc=-1, **kwargs):
 
     - if `nproc > 0`: n = `nproc`,
     - if `nproc <= 0`: n = max(nmax+`nproc`, 1), where nmax is the total \
-    number of cpu(s) of the system (retrieved by `multiprocessing.cpu_count()`), \
+    number of cpu(s) of the system (retrieved by :func:`config.cpu_count`), \
     i.e. all cpus except `-nproc` is used (but at least one)
 
+    The points are passed to the processes, and the result retrieved from them,
+    through shared memory.
+
     See function :func:`tools.is_in_polygon`.
     """
     # fname = 'is_in_polygon_mp'
 
-    # Set wrap (and adjust vertices) if needed
-    if wrap is None:
-        wrap = ~np.isclose(np.sqrt(((vertices[-1] - vertices[0])**2).sum()), 0.0)
-    if not wrap:
-        # remove last vertice (should be equal to the first one)
-        vertices = np.delete(vertices, -1, axis=0)
-
-    # Set wrap key in keywords arguments
-    kwargs['wrap'] = True
+    edges = _polygon_edges(_polygon_rings(vertices, wrap=wrap))
 
     # Initialization
-    xx = np.atleast_2d(x)
+    xx = np.atleast_2d(np.asarray(x, dtype='float'))
 
     # Set number of processes (n)
-    if nproc > 0:
-        n = nproc
-    else:
-        n = min(multiprocessing.cpu_count()+nproc, 1)
+    n = parallel.get_nproc(nproc, xx.shape[0])
 
     # Set index for distributing tasks
     q, r = np.divmod(xx.shape[0], n)
     ids_proc = [i*q + min(i, r) for i in range(n+1)]
 
-    # Set pool of n workers
-    pool = multiprocessing.Pool(n)
-    out_pool = []
-    for i in range(n):
-        # Set i-th process
-        out_pool.append(pool.apply_async(is_in_polygon, args=(xx[ids_proc[i]:ids_proc[i+1]], vertices), kwds=kwargs))
+    shm_list = []
+    try:
+        x_desc = parallel._shared_array_create(xx, shm_list)
+        res_desc = parallel._output_array_create(None, (xx.shape[0], ), np.dtype('bool'), shm_list)
 
-    # Properly end working process
-    pool.close() # Prevents any more tasks from being submitted to the pool,
-    pool.join()  # then, wait for the worker processes to exit.
+        # Set pool of n workers
+        pool = parallel.get_pool(n)
+        out_pool = []
+        for i in range(n):
+            # Set i-th process
+            out_pool.append(pool.apply_async(_is_in_polygon_mp_worker, args=(x_desc, res_desc, ids_proc[i], ids_proc[i+1], edges, kwargs)))
 
-    # Get result from each process
-    res = np.hstack([w.get() for w in out_pool])
+        # Wait for the tasks and release the pool
+        parallel.release_pool(pool, out_pool)
+
+        # Check each process (an error occurred in a process is raised)
+        for w in out_pool:
+            w.get()
+
+        # Get result
+        res = parallel._output_array_get(res_desc, None, shm_list)
+
+    finally:
+        for shm in shm_list:
+            shm.close()
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
 
     if np.asarray(x).ndim == 1:
         res = res[0]
@@ -320,6 +515,97 @@ def is_in_polygon_mp(x, vertices, wrap=None, nproc=-1, **kwargs):
     return res
 # -----------------------------------------------------------------------------
 
+# -----------------------------------------------------------------------------
+def _rasterize_polygon_edges(x, y, edges, **kwargs):
+    """
+    Rasterizes a polygon given by its edges in a 2D grid (scanline).
+
+    For each row of cells, the crossings of the edges with the horizontal
+    line through the cell centers are computed (edge table), sorted, and the
+    cells whose center lies between two successive crossings (first and
+    second, third and fourth, etc.) are filled (even-odd rule). The cells
+    whose center is close to an edge (see `kwargs`) are then checked with the
+    function :func:`_is_in_polygon_edges`, so that the result is the same as
+    testing all the cell centers with the function :func:`is_in_polygon`.
+
+    Parameters
+    ----------
+    x : 1D array of shape (nx, )
+        x coordinates of the cell centers (increasing)
+    y : 1D array of shape (ny, )
+        y coordinates of the cell centers (increasing)
+    edges : 2D array of shape (ne, 4)
+        edges of the polygon (see function :func:`_polygon_edges`)
+    kwargs :
+        keyword arguments passed to function `numpy.isclose` (see function
+        :func:`is_in_polygon`)
+
+    Returns
+    -------
+    mask : 2D array of bools of shape (ny, nx)
+        indicates for each cell if its center is inside (True) or outside
+        (False) the polygon
+    """
+    # fname = '_rasterize_polygon_edges'
+
+    nx, ny = len(x), len(y)
+    mask = np.zeros((ny, nx+1), dtype='int8')
+    if edges.shape[0] == 0 or nx == 0 or ny == 0:
+        return mask[:, :nx].astype('bool')
+
+    ex0, ey0, ex1, ey1 = edges.T
+    eymin = np.minimum(ey0, ey1)
+    eymax = np.maximum(ey0, ey1)
+
+    # Edge table: rows crossed by each edge, i.e. with eymin <= y < eymax
+    # (same rule as in function `_is_in_polygon_edges`)
+    j0 = np.searchsorted(y, eymin, side='left')
+    j1 = np.searchsorted(y, eymax, side='left')
+    nrow = j1 - j0
+    ie = np.repeat(np.arange(len(ex0)), nrow)
+    j = np.repeat(j0 - np.cumsum(nrow) + nrow, nrow) + np.arange(nrow.sum())
+    if len(j):
+        # Crossings (each row is crossed an even number of times)
+        x_cross = ex0[ie] + (y[j] - ey0[ie]) * (ex1[ie] - ex0[ie]) / (ey1[ie] - ey0[ie])
+        order = np.lexsort((x_cross, j))
+        a, b = order[0::2], order[1::2]
+        # Fill the cells with x_cross[a] <= x < x_cross[b] (difference array along rows)
+        np.add.at(mask, (j[a], np.searchsorted(x, x_cross[a], side='left')), 1)
+        np.add.at(mask, (j[b], np.searchsorted(x, x_cross[b], side='left')), -1)
+        mask = np.cumsum(mask, axis=1) > 0
+
+    mask = mask[:, :nx].astype('bool')
+
+    # Check the cells whose center is close to an edge: cells of the rows with
+    # |y - y_edge| <= atol, and within one cell along x of the part of the edge
+    # concerned
+    atol = kwargs.get('atol', 1.e-8)
+    sx = x[1] - x[0] if nx > 1 else 1.0
+    j0 = np.searchsorted(y, eymin - atol, side='left')
+    j1 = np.searchsorted(y, eymax + atol, side='right')
+    nrow = j1 - j0
+    ie = np.repeat(np.arange(len(ex0)), nrow)
+    j = np.repeat(j0 - np.cumsum(nrow) + nrow, nrow) + np.arange(nrow.sum())
+    if len(j) == 0:
+        return mask
+
+    x0, y0, dx, dy = ex0[ie], ey0[ie], ex1[ie] - ex0[ie], ey1[ie] - ey0[ie]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t1 = np.where(dy != 0.0, (y[j] - atol - y0) / dy, 0.0)
+        t2 = np.where(dy != 0.0, (y[j] + atol - y0) / dy, 1.0)
+    t1, t2 = np.clip(np.minimum(t1, t2), 0.0, 1.0), np.clip(np.maximum(t1, t2), 0.0, 1.0)
+    xa, xb = x0 + t1*dx, x0 + t2*dx
+    i0 = np.searchsorted(x, np.minimum(xa, xb) - atol - sx, side='left')
+    i1 = np.searchsorted(x, np.maximum(xa, xb) + atol + sx, side='right')
+    ncell = i1 - i0
+    i = np.repeat(i0 - np.cumsum(ncell) + ncell, ncell) + np.arange(ncell.sum())
+    ind = np.unique(np.repeat(j, ncell) * nx + i)
+    j, i = np.divmod(ind, nx)
+    mask.reshape(-1)[ind] = _is_in_polygon_edges(x[i], y[j], edges, **kwargs)
+
+    return mask
+# -----------------------------------------------------------------------------
+
 # -----------------------------------------------------------------------------
 def rasterize_polygon_2d(
         vertices,
@@ -337,6 +623,13 @@ def rasterize_polygon_2d(
     if it is inside (1) or outside (0) the polygon defined by the given
     vertices.
 
+    The polygon is rasterized row by row (scanline): the cells lying between
+    the crossings of the edges with the horizontal line through their centers
+    are filled directly; only the cells whose center is close to the boundary
+    are tested with the point-in-polygon routine (see function
+    :func:`tools.is_in_polygon`). The result is the same as testing all the
+    cell centers with the function :func:`tools.is_in_polygon`.
+
     The grid geometry of the output image is set by the given parameters or
     computed from the vertices, as in function :func:`img.imageFromPoints`,
     i.e. for the x axis (similar for y):
@@ -353,12 +646,14 @@ def rasterize_polygon_2d(
 
     Parameters
     ----------
-    vertices : 2D array
+    vertices : 2D array, or sequence of 2D arrays
         vertices of a polygon in 2D, each row of `vertices` contains the two
         coordinates of one vertex; the segments of the polygon are obtained by
         linking two successive vertices (as well as the last one with the first
         one, if `wrap=True` (see below)), so that the vertices form a close line
-        (clockwise or counterclockwise)
+        (clockwise or counterclockwise); a sequence of such arrays can be
+        given for a polygon with holes or a multi-polygon (see function
+        :func:`tools.is_in_polygon`)
 
     nx : int, optional
         number of grid cells along x axis; see above for possible inputs
@@ -412,19 +707,58 @@ def rasterize_polygon_2d(
     """
     # fname = 'rasterize_polygon_2d'
 
+    rings = _polygon_rings(vertices, wrap=wrap)
+
     # Define grid geometry (image with no variable)
-    im = img.imageFromPoints(vertices,
+    im = img.imageFromPoints(np.vstack(rings),
                              nx=nx, ny=ny, sx=sx, sy=sy, ox=ox, oy=oy,
                              xmin_ext=xmin_ext, xmax_ext=xmax_ext,
                              ymin_ext=ymin_ext, ymax_ext=ymax_ext)
 
-    # Rasterize: for each cell, check if its center is within the grid
-    v = np.asarray(is_in_polygon(np.array((im.xx().reshape(-1), im.yy().reshape(-1))).T, vertices, wrap=wrap, **kwargs)).astype('float')
+    # Rasterize (scanline)
+    v = _rasterize_polygon_edges(im.x(), im.y(), _polygon_edges(rings), **kwargs).astype('float')
     im.append_var(v, varname='in')
 
     return im
 # -----------------------------------------------------------------------------
 
+# -----------------------------------------------------------------------------
+def _rasterize_polygon_mp_worker(mask_desc, j0, j1, x, y, edges, kwargs):
+    """
+    Rasterizes a polygon in a slice of rows of a 2D grid, in a process (worker).
+
+    Parameters
+    ----------
+    mask_desc : tuple
+        description of the shared output array, of shape (ny, nx)
+        (see function :func:`parallel._output_array_create`)
+    j0 : int
+        index of the first row of the slice
+    j1 : int
+        index of the last row of the slice + 1
+    x : 1D array of shape (nx, )
+        x coordinates of the cell centers (increasing)
+    y : 1D array of shape (ny, )
+        y coordinates of the cell centers (increasing)
+    edges : 2D array of shape (ne, 4)
+        edges of the polygon (see function :func:`_polygon_edges`)
+    kwargs : dict
+        keyword arguments passed to function :func:`_rasterize_polygon_edges`
+    """
+    # fname = '_rasterize_polygon_mp_worker'
+
+    shm_list = []
+    try:
+        mask = parallel._output_array_attach(mask_desc, shm_list)
+        mask[j0:j1] = _rasterize_polygon_edges(x, y[j0:j1], edges, **kwargs)
+
+    finally:
+        # Release references to shared memory before closing
+        mask = None
+        for shm in shm_list:
+            shm.close()
+# -----------------------------------------------------------------------------
+
 # -----------------------------------------------------------------------------
 def rasterize_polygon_2d_mp(
         vertices,
@@ -447,26 +781,205 @@ def rasterize_polygon_2d_mp(
 
     - if `nproc > 0`: n = `nproc`,
     - if `nproc <= 0`: n = max(nmax+`nproc`, 1), where nmax is the total \
-    number of cpu(s) of the system (retrieved by `multiprocessing.cpu_count()`), \
+    number of cpu(s) of the system (retrieved by :func:`config.cpu_count`), \
     i.e. all cpus except `-nproc` is used (but at least one).
 
+    The rows of cells are distributed over the processes, each process
+    rasterizing its rows (scanline, as in the function
+    :func:`tools.rasterize_polygon_2d`) and writing them in an output array in
+    shared memory.
+
     See function :func:`tools.rasterize_polygon_2d`.
     """
     # fname = 'rasterize_polygon_2d_mp'
 
+    rings = _polygon_rings(vertices, wrap=wrap)
+    edges = _polygon_edges(rings)
+
     # Define grid geometry (image with no variable)
-    im = img.imageFromPoints(vertices,
+    im = img.imageFromPoints(np.vstack(rings),
                              nx=nx, ny=ny, sx=sx, sy=sy, ox=ox, oy=oy,
                              xmin_ext=xmin_ext, xmax_ext=xmax_ext,
                              ymin_ext=ymin_ext, ymax_ext=ymax_ext)
+    x, y = im.x(), im.y()
 
-    # Rasterize: for each cell, check if its center is within the grid
-    v = np.asarray(is_in_polygon_mp(np.array((im.xx().reshape(-1), im.yy().reshape(-1))).T, vertices, wrap=wrap, nproc=nproc, **kwargs)).astype('float')
-    im.append_var(v, varname='in')
+    # Set number of processes (n)
+    n = parallel.get_nproc(nproc, im.ny)
+
+    # Set index for distributing tasks (rows of cells)
+    q, r = np.divmod(im.ny, n)
+    ids_proc = [i*q + min(i, r) for i in range(n+1)]
+
+    shm_list = []
+    try:
+        mask_desc = parallel._output_array_create(None, (im.ny, im.nx), np.dtype('bool'), shm_list)
+
+        # Set pool of n workers
+        pool = parallel.get_pool(n)
+        out_pool = []
+        for i in range(n):
+            # Set i-th process
+            out_pool.append(pool.apply_async(_rasterize_polygon_mp_worker, args=(mask_desc, ids_proc[i], ids_proc[i+1], x, y, edges, kwargs)))
+
+        # Wait for the tasks and release the pool
+        parallel.release_pool(pool, out_pool)
+
+        # Check each process (an error occurred in a process is raised)
+        for w in out_pool:
+            w.get()
+
+        # Get result
+        mask = parallel._output_array_get(mask_desc, None, shm_list)
+
+    finally:
+        for shm in shm_list:
+            shm.close()
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    im.append_var(mask.astype('float'), varname='in')
 
     return im
 # -----------------------------------------------------------------------------
 
+# -----------------------------------------------------------------------------
+def _curv_coord_2d_descent(
+        x, im_cl_dist, gradx, grady, dg, gradtol, path_len_max, return_path):
+    """
+    Descends the gradient of the distance map from points (vectorized).
+
+    All the points are advanced simultaneously (one step of length `dg` per
+    iteration), the points for which the descent is over (see function
+    :func:`curv_coord_2d_from_center_line`) being removed from the set of
+    active points.
+
+    Parameters
+    ----------
+    x : 2D array of shape (m, 2)
+        initial points
+    im_cl_dist, gradx, grady, dg, gradtol, path_len_max, return_path :
+        see function :func:`curv_coord_2d_from_center_line`
+
+    Returns
+    -------
+    x_end : 2D array of shape (m, 2)
+        end point of the path of each point
+    path_len : 1D array of ints of shape (m, )
+        number of steps of the path of each point
+    x_path : list of 2D arrays, or None
+        path of each point (including the initial point), `None` if
+        `return_path=False`
+    """
+    # fname = '_curv_coord_2d_descent'
+
+    m = x.shape[0]
+    nx, ny = im_cl_dist.nx, im_cl_dist.ny
+    ox, oy = im_cl_dist.ox, im_cl_dist.oy
+    sx, sy = im_cl_dist.sx, im_cl_dist.sy
+    # Distance and gradient maps, value of cell of index (iy, ix) in row iy*nx+ix
+    maps = np.stack((im_cl_dist.val[0, 0], gradx, grady), axis=-1).reshape(-1, 3)
+
+    x_end = np.array(x, dtype='float')
+    path_len = np.zeros(m, dtype='int')
+    if return_path:
+        ind_path = [np.arange(m)]
+        x_path_step = [x_end.copy()]
+
+    # Active points: indices, current positions and previous distances
+    ind = np.arange(m)
+    x_cur = x_end.copy()
+    d_prev = np.full(m, np.inf)
+
+    for j in range(path_len_max):
+        if len(ind) == 0:
+            break
+
+        # index in the grid (and interpolation factor) of the "current" points
+        tx = np.maximum(0, np.minimum((x_cur[:, 0] - ox)/sx - 0.5, nx - 1.00001))
+        ix = tx.astype('int')
+        tx = tx - ix
+
+        ty = np.maximum(0, np.minimum((x_cur[:, 1] - oy)/sy - 0.5, ny - 1.00001))
+        iy = ty.astype('int')
+        ty = ty - iy
+
+        # "current" distance to the center line and gradient (bilinear interpolation)
+        k = iy*nx + ix
+        tx, ty = tx[:, np.newaxis], ty[:, np.newaxis]
+        v = (1.-ty)*((1.-tx)*maps[k] + tx*maps[k+1]) + ty*((1.-tx)*maps[k+nx] + tx*maps[k+nx+1])
+        d_cur, gradx_cur, grady_cur = v.T
+        gradl = np.sqrt(gradx_cur**2 + grady_cur**2)
+
+        keep = ~np.any((d_cur < dg, d_cur > d_prev, gradl < gradtol), axis=0)
+        if not np.all(keep):
+            x_end[ind[~keep]] = x_cur[~keep]
+            ind, x_cur, d_cur = ind[keep], x_cur[keep], d_cur[keep]
+            gradx_cur, grady_cur, gradl = gradx_cur[keep], grady_cur[keep], gradl[keep]
+
+        # compute next points descending the gradient
+        x_cur = x_cur - dg*np.array([gradx_cur, grady_cur]).T/gradl[:, np.newaxis]
+        path_len[ind] += 1
+        d_prev = d_cur
+        if return_path:
+            ind_path.append(ind)
+            x_path_step.append(x_cur)
+
+    x_end[ind] = x_cur
+
+    x_path = None
+    if return_path:
+        ind_path = np.concatenate(ind_path)
+        order = np.argsort(ind_path, kind='stable')
+        x_path = np.split(np.vstack(x_path_step)[order], np.cumsum(path_len + 1)[:-1])
+
+    return x_end, path_len, x_path
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+def _curv_coord_2d_closest_segment(x, cl_position, kdtree=None):
+    """
+    Finds the closest point of a center line (first point of a segment).
+
+    Parameters
+    ----------
+    x : 2D array of shape (m, 2)
+        points
+    cl_position : 2D array of shape (n, 2)
+        position of the points of the center line
+    kdtree : :class:`scipy.spatial.cKDTree`, optional
+        k-d tree of the points `cl_position[:-1]` (built if not given)
+
+    Returns
+    -------
+    k : 1D array of ints of shape (m, )
+        index of the point of `cl_position[:-1]` closest to each point
+        (smallest index in case of tie), -1 for non-finite points
+    """
+    # fname = '_curv_coord_2d_closest_segment'
+
+    cl_pos = cl_position[:-1]
+    k = np.full(x.shape[0], -1, dtype='int')
+    ind = np.where(np.all(np.isfinite(x), axis=1))[0]
+    if len(ind) == 0 or len(cl_pos) == 0:
+        return k
+
+    if kdtree is None:
+        kdtree = scipy.spatial.cKDTree(cl_pos)
+
+    # A few nearest candidates, the closest one (with smallest index in case of
+    # tie) is selected with the distances computed as in a full scan
+    nk = min(4, len(cl_pos))
+    _, kk = kdtree.query(x[ind], k=nk)
+    kk = kk.reshape(len(ind), nk)
+    d = ((cl_pos[kk] - x[ind, np.newaxis, :])**2).sum(axis=2)
+    kk = np.where(d == d.min(axis=1, keepdims=True), kk, len(cl_pos))
+    k[ind] = kk.min(axis=1)
+
+    return k
+# -----------------------------------------------------------------------------
+
 # -----------------------------------------------------------------------------
 def curv_coord_2d_from_center_line(
         x, cl_position, im_cl_dist,
@@ -500,6 +1013,10 @@ def curv_coord_2d_from_center_line(
             * sign + for point "at left" of the center line and,
             * sign - for point "at right" of the center line.
 
+    The paths of all the points are computed simultaneously (vectorized over
+    the points not having reached the center line yet), and the closest point
+    I on the center line is retrieved using a k-d tree.
+
     Parameters
     ----------
     x : 2D array-like or 1D array-like
@@ -586,75 +1103,28 @@ def curv_coord_2d_from_center_line(
     if dg is None:
         dg = np.diff(cl_u).min()
 
-    x = np.asarray(x)
+    x = np.asarray(x, dtype='float')
     x_ndim = x.ndim
     x = np.atleast_2d(x)
-    u = np.zeros_like(x)
-
-    if return_path:
-        x_path = []
-
-    for i in range(x.shape[0]):
-        # Treat the i-th point
-        x_cur = x[i]
-        if return_path:
-            xi_path = [x_cur]
-
-        u2 = 0.0
-        d_prev = np.inf
-
-        for j in range(path_len_max):
-            # index in the grid (and interpolation factor) of the "current" point
-            tx = max(0, min((x_cur[0] - im_cl_dist.ox)/im_cl_dist.sx - 0.5, im_cl_dist.nx - 1.00001))
-            ix = int(tx)
-            tx = tx - int(tx)
-
-            ty = max(0, min((x_cur[1] - im_cl_dist.oy)/im_cl_dist.sy - 0.5, im_cl_dist.ny - 1.00001))
-            iy = int(ty)
-            ty = ty - int(ty)
 
-            # "current" distance to the center line
-            d_cur = (1.-ty)*((1.-tx)*im_cl_dist.val[0, 0, iy, ix] + tx*im_cl_dist.val[0, 0, iy, ix+1]) + ty*((1.-tx)*im_cl_dist.val[0, 0, iy+1, ix] + tx*im_cl_dist.val[0, 0, iy+1, ix+1])
+    # Descend the gradient (all points simultaneously)
+    x_end, path_len, x_path = _curv_coord_2d_descent(x, im_cl_dist, gradx, grady, dg, gradtol, path_len_max, return_path)
 
-            # if np.abs(d_cur) < dg or d_cur*d_prev < 0:
-            if d_cur < dg or d_cur > d_prev:
-                break
+    # Finalize the computation of coordinate (u1, u2)
+    k = _curv_coord_2d_closest_segment(x_end, cl_position)
+    if np.any(k < 0):
+        if verbose > 0:
+            print(f'{fname}: WARNING: closest point on center line not found for {np.sum(k < 0)} point(s) (last segment selected)')
+        k[k < 0] = len(cl_position) - 2
+    u1 = np.asarray(cl_u)[k]
 
-            # "current" gradient
-            gradx_cur = (1.-ty)*((1.-tx)*gradx[iy, ix] + tx*gradx[iy, ix+1]) + ty*((1.-tx)*gradx[iy+1, ix] + tx*gradx[iy+1, ix+1])
-            grady_cur = (1.-ty)*((1.-tx)*grady[iy, ix] + tx*grady[iy, ix+1]) + ty*((1.-tx)*grady[iy+1, ix] + tx*grady[iy+1, ix+1])
+    # u2: path length (sum of the steps), signed
+    u2 = np.hstack(([0.0], np.cumsum(np.full(path_len.max(initial=0), dg))))[path_len]
+    a = cl_position[k+1] - cl_position[k]
+    b = x - x_end
+    u2 = np.sign(a[:, 0]*b[:, 1] - a[:, 1]*b[:, 0])*u2
 
-            gradl = np.sqrt(gradx_cur**2 + grady_cur**2)
-            if gradl < gradtol:
-                break
-
-            # compute next point descending the gradient
-            # x_cur = x_cur - np.sign(d_cur) * dg*np.array([gradx_cur, grady_cur])/gradl
-            x_cur = x_cur - dg*np.array([gradx_cur, grady_cur])/gradl
-            if return_path:
-                xi_path.append(x_cur)
-
-            u2 = u2 + dg
-            d_prev = d_cur
-
-        # Finalize the computation of coordinate (u1, u2)
-        d_cur = ((cl_position[:-1,:] - x_cur)**2).sum(axis=1)
-        try:
-            k = np.where(d_cur == d_cur.min())[0][0]
-        except:
-            # k = len(cl_position[-2])
-            k = len(cl_position) - 2
-            if verbose > 0:
-                print(f'{fname}: WARNING: closest point on center line not found (last segment selected)')
-        u1 = cl_u[k]
-
-        s = np.sign(np.linalg.det(np.vstack((cl_position[k+1] - cl_position[k], x[i] - x_cur))))
-        u2 = s*u2
-
-        u[i] = np.array([u1, u2])
-
-        if return_path:
-            x_path.append(np.asarray(xi_path))
+    u = np.array((u1, u2)).T
 
     if return_path:
         if x_ndim == 1:
@@ -667,6 +1137,67 @@ def curv_coord_2d_from_center_line(
         return u
 # -----------------------------------------------------------------------------
 
+# -----------------------------------------------------------------------------
+def _curv_coord_2d_mp_worker(x_desc, u_desc, i0, i1, cl_position, im_cl_dist, kwargs, shared_desc):
+    """
+    Computes curvilinear coordinates of points of a slice, in a process (worker).
+
+    Parameters
+    ----------
+    x_desc : tuple
+        description of the shared array of points, of shape (m, 2)
+        (see function :func:`parallel._shared_array_create`)
+    u_desc : tuple
+        description of the shared output array, of shape (m, 2)
+        (see function :func:`parallel._output_array_create`)
+    i0 : int
+        index of the first point of the slice
+    i1 : int
+        index of the last point of the slice + 1
+    cl_position : 2D array of shape (n, 2)
+        position of the points of the center line
+    im_cl_dist : :class:`geone.img.Img`
+        image of the distance to the center line, whose values (`val`) are
+        given in shared memory (entry 'val' of `shared_desc`)
+    kwargs : dict
+        keyword arguments passed to function :func:`curv_coord_2d_from_center_line`
+        (see function :func:`parallel._shared_kwargs_create`)
+    shared_desc : dict
+        descriptions of the shared arrays (see function
+        :func:`parallel._shared_kwargs_create`)
+
+    Returns
+    -------
+    x_path : list of 2D arrays, or None
+        paths of the points of the slice (if `kwargs['return_path']=True`)
+    """
+    # fname = '_curv_coord_2d_mp_worker'
+
+    shm_list = []
+    try:
+        kwargs = parallel._shared_kwargs_attach(kwargs, shared_desc, shm_list)
+        im_cl_dist = copy.copy(im_cl_dist)
+        im_cl_dist.val = kwargs.pop('val')
+        x = parallel._shared_array_attach(x_desc, shm_list)
+        u = parallel._output_array_attach(u_desc, shm_list)
+        x_path = None
+        if kwargs['return_path']:
+            u[i0:i1], x_path = curv_coord_2d_from_center_line(x[i0:i1], cl_position, im_cl_dist, **kwargs)
+        else:
+            u[i0:i1] = curv_coord_2d_from_center_line(x[i0:i1], cl_position, im_cl_dist, **kwargs)
+
+    finally:
+        # Release references to shared memory before closing
+        kwargs = None
+        im_cl_dist = None
+        x = None
+        u = None
+        for shm in shm_list:
+            shm.close()
+
+    return x_path
+# -----------------------------------------------------------------------------
+
 # -----------------------------------------------------------------------------
 def curv_coord_2d_from_center_line_mp(
         x, cl_position, im_cl_dist,
@@ -689,54 +1220,90 @@ def curv_coord_2d_from_center_line_mp(
 
     - if `nproc > 0`: n = `nproc`,
     - if `nproc <= 0`: n = max(nmax+`nproc`, 1), where nmax is the total \
-    number of cpu(s) of the system (retrieved by `multiprocessing.cpu_count()`), \
+    number of cpu(s) of the system (retrieved by :func:`config.cpu_count`), \
     i.e. all cpus except `-nproc` is used (but at least one).
 
+    The points are split in n chunks of (almost) equal size, one per process,
+    each chunk being treated with the (vectorized) function
+    :func:`tools.curv_coord_2d_from_center_line`. The points, the distance map
+    and its gradient are passed to the processes, and the result retrieved from
+    them, through shared memory.
+
     See function :func:`tools.curv_coord_2d_from_center_line`.
     """
     # fname = 'curv_coord_2d_from_center_line_mp'
 
     # Initialization
-    xx = np.atleast_2d(x)
+    xx = np.atleast_2d(np.asarray(x, dtype='float'))
 
     # Set number of processes (n)
-    if nproc > 0:
-        n = nproc
-    else:
-        n = min(multiprocessing.cpu_count()+nproc, 1)
+    n = parallel.get_nproc(nproc, xx.shape[0])
+
+    # Set parameters common to all processes (computed once)
+    if cl_u is None:
+        cl_u = np.insert(np.cumsum(np.sqrt(((cl_position[1:,:] - cl_position[:-1,:])**2).sum(axis=1))), 0, 0.0)
+
+    if gradx is None or grady is None:
+        # Gradient of distance map
+        grady, gradx = np.gradient(im_cl_dist.val[0,0])
+        gradx = gradx / im_cl_dist.sx
+        grady = grady / im_cl_dist.sy
+
+    if dg is None:
+        dg = np.diff(cl_u).min()
 
     # Set index for distributing tasks
     q, r = np.divmod(xx.shape[0], n)
     ids_proc = [i*q + min(i, r) for i in range(n+1)]
 
-    kwargs = dict(cl_u=cl_u, gradx=gradx, grady=grady, dg=dg, gradtol=gradtol, path_len_max=path_len_max, return_path=return_path, verbose=0)
-    # Set pool of n workers
-    pool = multiprocessing.Pool(n)
-    out_pool = []
-    for i in range(n):
-        # Set i-th process
-        out_pool.append(pool.apply_async(curv_coord_2d_from_center_line, args=(xx[ids_proc[i]:ids_proc[i+1]], cl_position, im_cl_dist), kwds=kwargs))
+    kwargs = dict(cl_u=np.asarray(cl_u, dtype='float'), gradx=np.asarray(gradx), grady=np.asarray(grady), val=im_cl_dist.val,
+                  dg=dg, gradtol=gradtol, path_len_max=path_len_max, return_path=return_path, verbose=0)
 
-    # Properly end working process
-    pool.close() # Prevents any more tasks from being submitted to the pool,
-    pool.join()  # then, wait for the worker processes to exit.
+    # Image without values (given in shared memory)
+    im_proc = copy.copy(im_cl_dist)
+    im_proc.val = None
 
-    # Get result from each process
-    if return_path:
-        u = []
+    shm_list = []
+    try:
+        kwargs_proc, shared_desc = parallel._shared_kwargs_create(kwargs, shm_list)
+        x_desc = parallel._shared_array_create(xx, shm_list)
+        u_desc = parallel._output_array_create(None, xx.shape, np.dtype('float'), shm_list)
+
+        # Set pool of n workers
+        pool = parallel.get_pool(n)
+        out_pool = []
+        for i in range(n):
+            # Set i-th process
+            out_pool.append(pool.apply_async(_curv_coord_2d_mp_worker, args=(x_desc, u_desc, ids_proc[i], ids_proc[i+1], cl_position, im_proc, kwargs_proc, shared_desc)))
+
+        # Wait for the tasks and release the pool
+        parallel.release_pool(pool, out_pool)
+
+        # Get result from each process
         x_path = []
-        for p in out_pool:
-            u_p, x_path_p = p.get()
-            u.extend(u_p)
-            x_path.extend(x_path_p)
-        if np.asarray(x).ndim == 1:
-            u = u[0]
+        for w in out_pool:
+            x_path_p = w.get()
+            if return_path:
+                x_path.extend(x_path_p)
+
+        u = parallel._output_array_get(u_desc, None, shm_list)
+
+    finally:
+        for shm in shm_list:
+            shm.close()
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    if np.asarray(x).ndim == 1:
+        u = u[0]
+        if return_path:
             x_path = x_path[0]
+
+    if return_path:
         return u, x_path
     else:
-        u = np.vstack([p.get() for p in out_pool])
-        if np.asarray(x).ndim == 1:
-            u = u[0]
         return u
 # -----------------------------------------------------------------------------
 
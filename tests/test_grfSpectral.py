@@ -0,0 +1,59 @@
+import unittest
+import numpy as np
+import geone
+
+class TestGrfSpectral(unittest.TestCase):
+    def setUp(self):
+        self.cov_model_1D = geone.covModel.CovModel1D(elem=[
+            ('spherical', {'w':2., 'r':15.}), # elementary contribution
+            ('nugget', {'w':0.2})             # elementary contribution
+            ], name='')
+        self.cov_model_2D = geone.covModel.CovModel2D(elem=[
+            ('exponential', {'w':1., 'r':[20., 8.]}) # elementary contribution
+            ], alpha=0.0, name='')
+        self.cov_model_3D = geone.covModel.CovModel3D(elem=[
+            ('gaussian', {'w':1., 'r':[10., 8., 5.]}) # elementary contribution
+            ], alpha=20.0, name='')
+        self.x = np.array([[3.5, 4.5], [20.5, 10.5], [30.5, 25.5], [31.5, 25.5]])
+        self.v = np.array([1., -1., 0.5, 0.2])
+
+    def test_covariance_1D(self):
+        nx = 200
+        a = geone.grfSpectral.grfSpectral1D(self.cov_model_1D, nx, mean=0., nreal=100, nfeatures=200, rng=1, verbose=0)
+        h = np.arange(25)
+        cov = np.array([np.mean(a[:, :nx-k] * a[:, k:]) for k in h])
+        assert np.all(np.abs(cov - self.cov_model_1D.func()(h)) < 0.1 * self.cov_model_1D.sill())
+
+    def test_covariance_2D(self):
+        nx, ny = 50, 40
+        a = geone.grfSpectral.grfSpectral2D(self.cov_model_2D, (nx, ny), mean=0., nreal=40, nfeatures=200, rng=2, verbose=0)
+        h = np.arange(0, 20, 4)
+        cov_x = np.array([np.mean(a[:, :, :nx-k] * a[:, :, k:]) for k in h])
+        cov_y = np.array([np.mean(a[:, :ny-k, :] * a[:, k:, :]) for k in h])
+        f = self.cov_model_2D.func()
+        assert np.all(np.abs(cov_x - f(np.array((h, np.zeros_like(h))).T)) < 0.1)
+        assert np.all(np.abs(cov_y - f(np.array((np.zeros_like(h), h)).T)) < 0.1)
+
+    def test_conditioning(self):
+        # data points at cell centers (grid of origin 0 and cell size 1)
+        dimension = (40, 30)
+        a = geone.grfSpectral.grfSpectral2D(self.cov_model_2D, dimension, x=self.x, v=self.v, nreal=5, nfeatures=100, rng=3, verbose=0)
+        ix, iy = self.x.astype('int').T
+        assert np.allclose(a[:, iy, ix], self.v, rtol=0.0, atol=1.e-8)
+        # with measurement error, the data are not honored exactly
+        a = geone.grfSpectral.grfSpectral2D(self.cov_model_2D, dimension, x=self.x, v=self.v, measureErrVar=0.1, nreal=5, nfeatures=100, rng=3, verbose=0)
+        assert not np.allclose(a[:, iy, ix], self.v, rtol=0.0, atol=1.e-8)
+
+    def test_tile_size_and_nproc(self):
+        for func, cov_model, dimension, kwargs in (
+                (geone.grfSpectral.grfSpectral1D, self.cov_model_1D, 100, {}),
+                (geone.grfSpectral.grfSpectral2D, self.cov_model_2D, (40, 30), {}),
+                (geone.grfSpectral.grfSpectral2D, self.cov_model_2D, (40, 30), {'x':self.x, 'v':self.v}),
+                (geone.grfSpectral.grfSpectral3D, self.cov_model_3D, (15, 12, 10), {})):
+            a = func(cov_model, dimension, nreal=3, nfeatures=100, rng=4, verbose=0, **kwargs)
+            for tileSize, nproc in ((7, 1), (1000, 1), (7, 2), (None, 3)):
+                b = func(cov_model, dimension, nreal=3, nfeatures=100, rng=4, verbose=0, tileSize=tileSize, nproc=nproc, **kwargs)
+                assert np.array_equal(a, b)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import numpy as np
+import geone
+
+class TestKernelPower(unittest.TestCase):
+    def setUp(self):
+        self.kernels = {
+            # diagonalizable, real eigen values
+            'diagonalizable': np.array([[0.9, 0.1, 0.0], [0.2, 0.7, 0.1], [0.0, 0.3, 0.7]]),
+            # defective (eigen value 0.5 of multiplicity 2, with one eigen vector)
+            'defective': np.array([[0.5, 0.5, 0.0], [0.0, 0.5, 0.5], [0.0, 0.0, 1.0]]),
+            # periodic (period 2)
+            'periodic': np.array([[0.0, 1.0], [1.0, 0.0]]),
+            # complex eigen values
+            'complex': np.array([[0.1, 0.8, 0.1], [0.1, 0.1, 0.8], [0.8, 0.1, 0.1]]),
+        }
+        self.k = np.array([0, 1, 2, 3, 5, 8, 13, 21, 50, 2, 0, 7])
+
+    def check_powers(self, kernel, kp):
+        ref = np.array([np.linalg.matrix_power(kernel, kk) for kk in self.k])
+        for kk, r in zip(self.k, ref):
+            assert np.allclose(kp.power(kk), r, rtol=0.0, atol=1.e-12)
+        assert np.allclose(kp.powers(self.k), ref, rtol=0.0, atol=1.e-12)
+        n = kernel.shape[0]
+        i = np.arange(len(self.k)) % n
+        j = (np.arange(len(self.k)) + 1) % n
+        assert np.allclose(kp.elements(self.k, i, j), ref[np.arange(len(self.k)), i, j], rtol=0.0, atol=1.e-12)
+        assert np.allclose(kp.elements(self.k[:, np.newaxis], i[:, np.newaxis], np.arange(n)), ref[np.arange(len(self.k)), i], rtol=0.0, atol=1.e-12)
+        assert np.allclose(kp.columns(self.k, j), ref[np.arange(len(self.k)), :, j], rtol=0.0, atol=1.e-12)
+
+    def test_powers(self):
+        for name, kernel in self.kernels.items():
+            kp = geone.markovChain.KernelPower(kernel)
+            assert kp.diagonalizable == (name != 'defective')
+            self.check_powers(kernel, kp)
+
+    def test_pre_computed_powers(self):
+        for kernel in self.kernels.values():
+            kernel_pow = np.array([np.linalg.matrix_power(kernel, kk) for kk in range(4)])
+            kp = geone.markovChain.KernelPower(kernel, kernel_pow=kernel_pow)
+            self.check_powers(kernel, kp)
+            assert np.array_equal(kp.power(3), kernel_pow[3])
+
+    def test_cache(self):
+        kernel = self.kernels['defective']
+        kp = geone.markovChain.KernelPower(kernel, maxsize=3)
+        for kk in range(10):
+            p = kp.power(kk)
+            assert not p.flags.writeable
+        assert list(kp._cache.keys()) == [7, 8, 9]
+        kp.power(7)
+        kp.power(10)
+        assert list(kp._cache.keys()) == [9, 7, 10]
+        assert np.allclose(kp.power(10), np.linalg.matrix_power(kernel, 10))
+
+    def test_compute_mc_cov(self):
+        for name in ('diagonalizable', 'complex'):
+            kernel = self.kernels[name]
+            pinv = geone.markovChain.compute_mc_pinv(kernel)
+            ref = np.array([pinv[:, np.newaxis] * (np.linalg.matrix_power(kernel, kk) - pinv) for kk in range(20)])
+            assert np.allclose(geone.markovChain.compute_mc_cov(kernel, nsteps=20), ref, rtol=0.0, atol=1.e-12)
+
+class TestSimulateMc(unittest.TestCase):
+    def test_bridge_marginals(self):
+        # Prob(x[k]=j | x[0]=a, x[m]=b) = kernel^k[a, j] * kernel^(m-k)[j, b] / kernel^m[a, b]
+        kernel = np.array([[0.9, 0.1, 0.0], [0.2, 0.7, 0.1], [0.0, 0.3, 0.7]])
+        nreal, nsteps, a, m, b = 20000, 15, 0, 10, 2
+        x = geone.markovChain.simulate_mc(kernel, nsteps, data_ind=[0, m], data_val=[a, b], nreal=nreal, rng=123)
+        assert np.all(x[:, 0] == a) and np.all(x[:, m] == b)
+        mp = np.linalg.matrix_power
+        for k in range(1, nsteps):
+            if k < m:
+                prob = mp(kernel, k)[a] * mp(kernel, m-k)[:, b] / mp(kernel, m)[a, b]
+            else:
+                prob = mp(kernel, k-m)[b]
+            freq = np.array([np.mean(x[:, k] == j) for j in range(3)])
+            assert np.all(np.abs(freq - prob) <= 5.0 * np.sqrt(prob * (1.0 - prob) / nreal) + 1.e-12)
+
+    def test_pre_computed_powers(self):
+        kernel = np.array([[0.9, 0.1], [0.2, 0.8]])
+        kernel_pow = np.array([np.linalg.matrix_power(kernel, kk) for kk in range(5)])
+        kwargs = dict(data_ind=[0, 9, 19], data_val=[0, 1, 0], nreal=10, rng=3)
+        a = geone.markovChain.simulate_mc(kernel, 20, **kwargs)
+        b = geone.markovChain.simulate_mc(kernel, 20, kernel_pow=kernel_pow, **kwargs)
+        assert np.array_equal(a, b)
+
+if __name__ == '__main__':
+    unittest.main()
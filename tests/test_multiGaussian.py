@@ -0,0 +1,123 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import geone
+
+class TestMultiGaussianOutput(unittest.TestCase):
+    def setUp(self):
+        self.cov_model = geone.covModel.CovModel2D(elem=[
+            ('exponential', {'w':2., 'r':[20., 10.]}) # elementary contribution
+            ], alpha=30.0, name='')
+        self.dimension = (60, 50)
+        self.kwargs = dict(nreal=5, rng=20241001, verbose=0)
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_img_is_view_of_array(self):
+        a = np.random.default_rng(0).normal(size=(3, 1, 50, 60))
+        im = geone.img.Img(60, 50, 1, nv=3, val=a)
+        assert np.shares_memory(im.val, a)
+        assert np.shares_memory(im.val.reshape(3, 50, 60), a)
+
+    def test_img_output(self):
+        for algo in ('fft', 'spectral'):
+            a = geone.multiGaussian.multiGaussianRun(
+                    self.cov_model, self.dimension, algo=algo, output_mode='array', **self.kwargs)
+            im = geone.multiGaussian.multiGaussianRun(
+                    self.cov_model, self.dimension, algo=algo, output_mode='img', **self.kwargs)
+            assert im.nv == a.shape[0]
+            assert not im.val.flags.owndata # view of the block of realizations
+            assert np.array_equal(im.val[:, 0], a)
+
+    def test_memmap_output(self):
+        for algo in ('fft', 'spectral'):
+            for use_multiprocessing in (False, True):
+                a = geone.multiGaussian.multiGaussianRun(
+                        self.cov_model, self.dimension, algo=algo, output_mode='array',
+                        use_multiprocessing=use_multiprocessing, nproc=2, **self.kwargs)
+                filename = os.path.join(self.tmpdir.name, f'{algo}_{use_multiprocessing}.dat')
+                m = geone.multiGaussian.multiGaussianRun(
+                        self.cov_model, self.dimension, algo=algo, output_mode='memmap',
+                        memmap_filename=filename,
+                        use_multiprocessing=use_multiprocessing, nproc=2, **self.kwargs)
+                assert isinstance(m, np.memmap)
+                assert m.filename == filename
+                assert m.shape == a.shape
+                assert np.array_equal(m, a)
+                assert np.array_equal(np.fromfile(filename, dtype=a.dtype).reshape(a.shape), a)
+                del m
+
+    def test_grf_out(self):
+        a = geone.grf.grf2D(self.cov_model, self.dimension, **self.kwargs)
+        filename = os.path.join(self.tmpdir.name, 'grf.dat')
+        out = np.memmap(filename, dtype=a.dtype, mode='w+', shape=a.shape)
+        for run_f, kwargs in ((geone.grf.grf2D, {}), (geone.grf.grf2D_mp, {'nproc': 2})):
+            out[...] = 0.0
+            res = run_f(self.cov_model, self.dimension, out=out, **self.kwargs, **kwargs)
+            assert res is out
+            assert np.array_equal(out, a)
+        del out, res
+
+    def test_estimation_output(self):
+        x = np.random.default_rng(1).uniform(0., 50., size=(10, 2))
+        v = np.random.default_rng(2).normal(size=10)
+        a = geone.multiGaussian.multiGaussianRun(
+                self.cov_model, self.dimension, x=x, v=v, mode='estimation',
+                output_mode='array', verbose=0)
+        assert a.shape == (2, 50, 60)
+        filename = os.path.join(self.tmpdir.name, 'krig.dat')
+        m = geone.multiGaussian.multiGaussianRun(
+                self.cov_model, self.dimension, x=x, v=v, mode='estimation',
+                output_mode='memmap', memmap_filename=filename, verbose=0)
+        assert isinstance(m, np.memmap)
+        assert np.array_equal(m, a)
+        del m
+
+class TestRandomStreams(unittest.TestCase):
+    def setUp(self):
+        self.cov_model = geone.covModel.CovModel2D(elem=[
+            ('spherical', {'w':1., 'r':[10., 20.]}) # elementary contribution
+            ], name='')
+        self.dimension = (40, 30)
+        self.x = np.array([[3.5, 4.5], [20.5, 10.5], [30.5, 25.5]])
+        self.v = np.array([1., -1., 0.5])
+        self.seed = 7
+
+    def run_grf(self, nreal, rng, **kwargs):
+        return geone.grf.grf2D(self.cov_model, self.dimension, nreal=nreal, rng=rng, verbose=0, **kwargs)
+
+    def test_per_stream(self):
+        ss = geone.randomStream.spawn_seed_sequences(self.seed, 6)
+        for method in (1, 3):
+            for kwargs in ({}, {'x':self.x, 'v':self.v, 'conditioningMethod':1},
+                           {'x':self.x, 'v':self.v, 'conditioningMethod':2},
+                           {'x':self.x, 'v':self.v, 'conditioningMethod':3}):
+                a = self.run_grf(6, self.seed, method=method, **kwargs)
+                # realizations do not depend on nreal
+                assert np.array_equal(self.run_grf(5, self.seed, method=method, **kwargs), a[:5])
+                # any slice of streams gives the corresponding realizations, in any order
+                assert np.array_equal(self.run_grf(2, ss[3:5], method=method, **kwargs), a[3:5])
+                assert np.array_equal(self.run_grf(3, ss[5:0:-2], method=method, **kwargs), a[5:0:-2])
+                # parallel version gives the same realizations
+                assert np.array_equal(geone.grf.grf2D_mp(
+                        self.cov_model, self.dimension, nreal=5, rng=self.seed, nproc=2, method=method, verbose=0, **kwargs), a[:5])
+
+    def test_per_stream_1D(self):
+        cov_model = geone.covModel.CovModel1D(elem=[('spherical', {'w':1., 'r':10.})], name='')
+        ss = geone.randomStream.spawn_seed_sequences(self.seed, 5)
+        for method in (1, 2, 3):
+            a = geone.grf.grf1D(cov_model, 100, nreal=5, rng=self.seed, method=method, verbose=0)
+            assert np.array_equal(geone.grf.grf1D(cov_model, 100, nreal=1, rng=ss[3:4], method=method, verbose=0), a[3:4])
+
+    def test_method_3_variance(self):
+        # each realization (real part of a complex field) has the variance of the model
+        a = self.run_grf(200, self.seed, method=3)
+        assert abs(a.var() - 1.) < 0.1
+        # successive realizations are independent
+        assert abs(np.corrcoef(a[0::2].reshape(-1), a[1::2].reshape(-1))[0, 1]) < 0.05
+
+if __name__ == '__main__':
+    unittest.main()
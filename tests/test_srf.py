@@ -0,0 +1,52 @@
+import unittest
+import numpy as np
+import geone
+
+class TestSrfMultiprocessing(unittest.TestCase):
+    def setUp(self):
+        self.cov_model_T = geone.covModel.CovModel2D(elem=[
+            ('spherical', {'w':1., 'r':[20., 20.]}) # elementary contribution
+            ], name='')
+        self.cov_model_Y = geone.covModel.CovModel1D(elem=[
+            ('gaussian', {'w':1., 'r':2.}) # elementary contribution
+            ], name='')
+        self.kernel_Y = np.array([[0.9, 0.1], [0.2, 0.8]])
+        self.dimension = (40, 30)
+        self.x = np.array([[5.2, 5.3], [5.7, 5.1], [20.5, 10.5], [30.1, 25.2]])
+        self.kwargs = dict(nreal=5, rng=3, mh_iter=5, verbose=0)
+
+    def assert_same_output(self, a, b):
+        Z_a, T_a, Y_a = a
+        Z_b, T_b, Y_b = b
+        assert np.array_equal(Z_a, Z_b) and Z_a.dtype == Z_b.dtype
+        assert np.array_equal(T_a, T_b)
+        assert len(Y_a) == len(Y_b)
+        for y_a, y_b in zip(Y_a, Y_b):
+            assert y_a[:3] == y_b[:3] and np.array_equal(y_a[3], y_b[3])
+
+    def test_srf_mg_mc_mp(self):
+        for kwargs in ({}, {'x':self.x, 'v':[0, 0, 1, 1]},
+                       {'x':self.x, 'v':[0, 0, 1, 1], 'params_T':{'aggregate_data_op':'random'}}):
+            a = geone.srf.srf_mg_mc(self.cov_model_T, self.kernel_Y, self.dimension, **kwargs, **self.kwargs)
+            for nproc in (1, 2):
+                b = geone.srf.srf_mg_mc_mp(self.cov_model_T, self.kernel_Y, self.dimension, **kwargs, **self.kwargs, nproc=nproc)
+                self.assert_same_output(a, b)
+
+    def test_srf_mg_mc_per_stream(self):
+        for kwargs in ({}, {'algo_T':'classic'}, {'x':self.x, 'v':[0, 0, 1, 1]}):
+            a = geone.srf.srf_mg_mc(self.cov_model_T, self.kernel_Y, self.dimension, **kwargs, **self.kwargs)
+            kw = dict(self.kwargs)
+            for sl in (slice(3, 4), slice(4, 1, -2)):
+                # any slice of streams gives the corresponding realizations
+                kw.update(nreal=len(range(5)[sl]), rng=geone.randomStream.spawn_seed_sequences(self.kwargs['rng'], 5)[sl])
+                b = geone.srf.srf_mg_mc(self.cov_model_T, self.kernel_Y, self.dimension, **kwargs, **kw)
+                assert np.array_equal(a[0][sl], b[0]) and np.array_equal(a[1][sl], b[1])
+
+    def test_srf_mg_mg_mp(self):
+        for kwargs in ({}, {'x':self.x[1:], 'v':[0.1, 0.5, -0.3]}):
+            a = geone.srf.srf_mg_mg(self.cov_model_T, self.cov_model_Y, self.dimension, vmin=-1.5, ntry_max=5, **kwargs, **self.kwargs)
+            b = geone.srf.srf_mg_mg_mp(self.cov_model_T, self.cov_model_Y, self.dimension, vmin=-1.5, ntry_max=5, **kwargs, **self.kwargs, nproc=2)
+            self.assert_same_output(a, b)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import numpy as np
+import geone
+
+class TestIsInPolygon(unittest.TestCase):
+    def setUp(self):
+        self.square = np.array([[0., 0.], [4., 0.], [4., 4.], [0., 4.]])
+        self.hole = np.array([[1., 1.], [3., 1.], [3., 3.], [1., 3.]])
+        # star-shaped polygon (non convex)
+        t = np.linspace(0., 2.*np.pi, 200, endpoint=False)
+        r = 1. + 0.4*np.sin(5*t)
+        self.star = np.array((r*np.cos(t), r*np.sin(t))).T
+
+    def test_boundary(self):
+        # points on vertices and on edges are outside
+        x = np.array([[2., 2.], [0., 0.], [4., 4.], [4., 0.], [2., 0.], [4., 1.], [0., 3.5], [2., 4.],
+                      [2., 1.e-3], [5., 2.], [-1.e-3, 2.]])
+        ref = np.array([True, False, False, False, False, False, False, False,
+                        True, False, False])
+        assert np.array_equal(geone.tools.is_in_polygon(x, self.square), ref)
+        # one point
+        assert geone.tools.is_in_polygon([2., 2.], self.square) is np.True_
+        assert geone.tools.is_in_polygon([2., 0.], self.square) is np.False_
+
+    def test_holes_and_multipolygons(self):
+        x = np.array([[0.5, 0.5], [2., 2.], [1., 2.], [3., 3.], [3.5, 2.], [6., 2.], [8.5, 8.5], [5., 5.]])
+        # polygon with a hole
+        ref = np.array([True, False, False, False, True, False, False, False])
+        assert np.array_equal(geone.tools.is_in_polygon(x, [self.square, self.hole]), ref)
+        # multi-polygon (nested sequence)
+        other = self.square + 5.0
+        ref = np.array([True, False, False, False, True, False, True, False])
+        assert np.array_equal(geone.tools.is_in_polygon(x, [[self.square, self.hole], other]), ref)
+        ref = np.array([True, True, True, True, True, False, True, False])
+        assert np.array_equal(geone.tools.is_in_polygon(x, [self.square, other]), ref)
+
+    def test_wrap(self):
+        x = np.random.default_rng(0).uniform(-1.5, 1.5, size=(1000, 2))
+        ref = geone.tools.is_in_polygon(x, self.star, wrap=True)
+        closed = np.vstack((self.star, self.star[:1]))
+        assert np.array_equal(geone.tools.is_in_polygon(x, self.star), ref)
+        assert np.array_equal(geone.tools.is_in_polygon(x, closed), ref)
+        assert np.array_equal(geone.tools.is_in_polygon(x, closed, wrap=False), ref)
+        # with wrap=False, the last vertex is considered as a copy of the first one
+        x = np.array([[3., 1.], [1., 3.]])
+        assert np.array_equal(geone.tools.is_in_polygon(x, self.square, wrap=True), [True, True])
+        assert np.array_equal(geone.tools.is_in_polygon(x, self.square, wrap=False), [True, False])
+
+    def test_winding_number(self):
+        # result equal to the one obtained with the winding number (sum of angles)
+        x = np.random.default_rng(1).uniform(-1.5, 1.5, size=(2000, 2))
+        v0 = self.star[np.newaxis, :, :] - x[:, np.newaxis, :]
+        v1 = np.roll(self.star, -1, axis=0)[np.newaxis, :, :] - x[:, np.newaxis, :]
+        angle = np.arctan2(v0[..., 0]*v1[..., 1] - v0[..., 1]*v1[..., 0], np.sum(v0*v1, axis=-1))
+        ref = np.abs(angle.sum(axis=1)) > np.pi
+        assert np.array_equal(geone.tools.is_in_polygon(x, self.star), ref)
+
+    def test_is_in_polygon_mp(self):
+        x = np.random.default_rng(2).uniform(-0.5, 4.5, size=(5000, 2))
+        x[:4] = self.hole # points on the boundary
+        for vertices in (self.square, [self.square, self.hole]):
+            a = geone.tools.is_in_polygon(x, vertices)
+            for nproc in (1, 3):
+                b = geone.tools.is_in_polygon_mp(x, vertices, nproc=nproc)
+                assert np.array_equal(a, b)
+
+class TestRasterizePolygon(unittest.TestCase):
+    def setUp(self):
+        t = np.linspace(0., 2.*np.pi, 500, endpoint=False)
+        r = 1. + 0.3*np.sin(7*t)
+        outline = np.array((r*np.cos(t), r*np.sin(t))).T
+        hole = 0.3*np.array((np.cos(t[::10]), np.sin(t[::10]))).T
+        # square with edges through cell centers (grid of origin 0 and cell size 1)
+        square = np.array([[2.5, 2.5], [7.5, 2.5], [7.5, 7.5], [2.5, 7.5]])
+        self.cases = [
+            (outline, dict(nx=120, ny=100)),
+            ([outline, hole], dict(nx=120, ny=100)),
+            (square, dict(nx=10, ny=10, sx=1., sy=1., ox=0., oy=0.)),
+        ]
+
+    def test_rasterize_polygon_2d(self):
+        for vertices, grid in self.cases:
+            im = geone.tools.rasterize_polygon_2d(vertices, **grid)
+            x = np.array((im.xx().reshape(-1), im.yy().reshape(-1))).T
+            ref = geone.tools.is_in_polygon(x, vertices).astype('float')
+            assert np.array_equal(im.val.reshape(-1), ref)
+
+    def test_rasterize_polygon_2d_mp(self):
+        for vertices, grid in self.cases:
+            a = geone.tools.rasterize_polygon_2d(vertices, **grid)
+            for nproc in (1, 3):
+                b = geone.tools.rasterize_polygon_2d_mp(vertices, nproc=nproc, **grid)
+                assert np.array_equal(a.val, b.val)
+
+if __name__ == '__main__':
+    unittest.main()